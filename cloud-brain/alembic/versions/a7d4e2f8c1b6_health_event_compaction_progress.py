@@ -0,0 +1,46 @@
+"""Track health_events rollup compaction per month.
+
+Revision ID: a7d4e2f8c1b6
+Revises: f3b7c2d9a1e4
+Create Date: 2026-10-19
+
+Adds health_event_compaction, one row per monthly health_events partition
+holding the last day compacted into health_event_rollups. It replaces the
+single high-water mark (the newest rolled-up local_date). That mark never
+went back, so device samples backfilled into older months were never
+compacted. Ingest now moves a month's row back when such samples arrive.
+
+Existing progress is seeded from the old mark. The old task walked days in
+order, so every month with rollups is complete up to its last day or the
+mark, whichever comes first.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "a7d4e2f8c1b6"
+down_revision = "f3b7c2d9a1e4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "health_event_compaction",
+        sa.Column("month_start", sa.Date(), primary_key=True),
+        sa.Column("compacted_through", sa.Date(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.execute(
+        """
+        INSERT INTO health_event_compaction (month_start, compacted_through)
+        SELECT month_start, LEAST((month_start + interval '1 month - 1 day')::date, resume)
+        FROM (
+            SELECT DISTINCT date_trunc('month', local_date)::date AS month_start FROM health_event_rollups
+        ) months, (SELECT max(local_date) AS resume FROM health_event_rollups) mark
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("health_event_compaction")
@@ -0,0 +1,44 @@
+"""Create user_correlation_matrices table.
+
+Revision ID: c4e8a1f2b7d3
+Revises: 1cc35b5e3720
+Create Date: 2026-05-04
+
+Stores one precomputed correlation matrix per user: the dense
+date x metric matrix built from daily_summaries, the all-pairs multi-lag
+Pearson results, and the watermark (max daily_summaries.computed_at and
+row count) used to refresh it incrementally.
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "c4e8a1f2b7d3"
+down_revision = "1cc35b5e3720"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_correlation_matrices",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("window_start", sa.Date(), nullable=False),
+        sa.Column("window_days", sa.Integer(), nullable=False),
+        sa.Column("metrics", JSONB(), nullable=False),
+        sa.Column("matrix", JSONB(), nullable=False),
+        sa.Column("cells", JSONB(), nullable=False),
+        sa.Column("source_watermark", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("source_row_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "computed_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_correlation_matrices")
@@ -0,0 +1,261 @@
+"""Partition health_events by month and add hourly rollups.
+
+Revision ID: e6a0c3d4f9b5
+Revises: c4e8a1f2b7d3
+Create Date: 2026-05-06
+
+Rebuilds health_events as a native RANGE-partitioned table on local_date:
+
+  - One partition per calendar month (health_events_pYYYY_MM), created for
+    every month present in the existing data through three months ahead.
+  - A DEFAULT partition (health_events_default) so inserts with an
+    unexpected local_date never fail. health_events_ensure_partition()
+    moves any such rows into the month partition when it is created.
+  - health_events_ensure_partition(date) is installed as a SQL function so
+    the maintenance task (app.tasks.health_event_maintenance) can create
+    future partitions idempotently.
+
+Postgres requires unique indexes on a partitioned table to include the
+partition key, so the primary key becomes (id, local_date). local_date is
+also added to the device point-in-time dedup and idempotency indexes. Both
+are derived from the same payload on a retry, so dedup behaviour is
+unchanged. A BRIN index on local_date serves the day-range scans done by
+rollup compaction.
+
+Also creates health_event_rollups, which holds hourly aggregates that
+raw device samples older than HEALTH_EVENTS_RAW_RETENTION_DAYS are
+compacted into. The table keeps count, sum, min, max and the latest
+sample, so daily_summaries can still be recomputed exactly.
+
+Existing rows are copied in a single INSERT ... SELECT. On large
+installations run this during a maintenance window.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "e6a0c3d4f9b5"
+down_revision = "c4e8a1f2b7d3"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    "id, user_id, metric_type, value, unit, source, recorded_at, local_date, created_at, "
+    "updated_at, deleted_at, granularity, session_id, idempotency_key, metadata"
+)
+
+_OLD_INDEXES = (
+    "idx_health_events_device_point_dedup",
+    "idx_health_events_device_daily_dedup",
+    "idx_health_events_idempotency",
+    "idx_health_events_user_metric_time",
+    "idx_health_events_user_local_date",
+    "idx_health_events_session",
+)
+
+_ENSURE_PARTITION_FN = """
+CREATE OR REPLACE FUNCTION health_events_ensure_partition(p_month date) RETURNS text
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_start date := date_trunc('month', p_month)::date;
+    v_end   date := (date_trunc('month', p_month) + interval '1 month')::date;
+    v_name  text := format('health_events_p%s', to_char(v_start, 'YYYY_MM'));
+BEGIN
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+    -- Build the partition standalone, move any rows that landed in the
+    -- DEFAULT partition for this month, then attach. CREATE ... PARTITION OF
+    -- would fail outright if the default partition held matching rows.
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE health_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_name
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM health_events_default '
+        'WHERE local_date >= %L AND local_date < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        v_start, v_end, v_name
+    );
+    EXECUTE format(
+        'ALTER TABLE health_events ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_start, v_end
+    );
+    EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', v_name);
+    RETURN v_name;
+END;
+$$;
+"""
+
+
+def _has_auth() -> bool:
+    return bool(
+        op.get_bind()
+        .execute(sa.text("SELECT EXISTS (SELECT 1 FROM pg_namespace WHERE nspname = 'auth')"))
+        .scalar()
+    )
+
+
+def _create_event_indexes(partitioned: bool) -> None:
+    key = ["local_date"] if partitioned else []
+    op.create_index(
+        "idx_health_events_device_point_dedup",
+        "health_events",
+        ["user_id", "source", "metric_type", "recorded_at", *key],
+        unique=True,
+        postgresql_where=sa.text("source != 'manual' AND granularity = 'point_in_time'"),
+    )
+    op.create_index(
+        "idx_health_events_device_daily_dedup",
+        "health_events",
+        ["user_id", "source", "metric_type", "local_date"],
+        unique=True,
+        postgresql_where=sa.text("granularity = 'daily_aggregate'"),
+    )
+    op.create_index(
+        "idx_health_events_idempotency",
+        "health_events",
+        ["user_id", "idempotency_key", *key],
+        unique=True,
+        postgresql_where=sa.text("idempotency_key IS NOT NULL"),
+    )
+    op.create_index(
+        "idx_health_events_user_metric_time",
+        "health_events",
+        ["user_id", "metric_type", sa.text("recorded_at DESC")],
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "idx_health_events_user_local_date",
+        "health_events",
+        ["user_id", sa.text("local_date DESC")],
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "idx_health_events_session",
+        "health_events",
+        ["session_id"],
+        postgresql_where=sa.text("session_id IS NOT NULL AND deleted_at IS NULL"),
+    )
+    if partitioned:
+        op.create_index("idx_health_events_local_date_brin", "health_events", ["local_date"], postgresql_using="brin")
+
+
+def _create_events_table(partitioned: bool) -> None:
+    pk = "PRIMARY KEY (id, local_date)" if partitioned else "PRIMARY KEY (id)"
+    partition_clause = " PARTITION BY RANGE (local_date)" if partitioned else ""
+    op.execute(
+        f"""
+        CREATE TABLE health_events (
+            id UUID NOT NULL DEFAULT gen_random_uuid(),
+            user_id VARCHAR NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            metric_type TEXT NOT NULL,
+            value DOUBLE PRECISION NOT NULL,
+            unit TEXT NOT NULL,
+            source TEXT NOT NULL,
+            recorded_at TIMESTAMPTZ NOT NULL,
+            local_date DATE NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            updated_at TIMESTAMPTZ,
+            deleted_at TIMESTAMPTZ,
+            granularity TEXT NOT NULL DEFAULT 'point_in_time',
+            session_id UUID REFERENCES activity_sessions(id) ON DELETE SET NULL,
+            idempotency_key TEXT,
+            metadata JSONB,
+            {pk}
+        ){partition_clause}
+        """
+    )
+
+
+def _enable_rls() -> None:
+    op.execute("ALTER TABLE health_events ENABLE ROW LEVEL SECURITY")
+    if _has_auth():
+        op.execute(
+            'CREATE POLICY "users can read their own events" '
+            "ON health_events FOR SELECT USING (user_id = auth.uid())"
+        )
+
+
+def upgrade() -> None:
+    # 1. Move the existing table aside. Its pkey and indexes share the
+    #    schema-wide index namespace, so rename/drop them first.
+    op.execute("ALTER TABLE health_events RENAME TO health_events_unpartitioned")
+    op.execute(
+        "ALTER TABLE health_events_unpartitioned "
+        "RENAME CONSTRAINT health_events_pkey TO health_events_unpartitioned_pkey"
+    )
+    for name in _OLD_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    # 2. Partitioned parent, default partition and the partition function.
+    _create_events_table(partitioned=True)
+    op.execute("CREATE TABLE health_events_default PARTITION OF health_events DEFAULT")
+    op.execute(_ENSURE_PARTITION_FN)
+    op.execute(
+        """
+        SELECT health_events_ensure_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', LEAST(
+                COALESCE((SELECT min(local_date) FROM health_events_unpartitioned), current_date),
+                current_date
+            )),
+            date_trunc('month', current_date) + interval '3 months',
+            interval '1 month'
+        ) AS month
+        """
+    )
+
+    # 3. Copy rows, then build indexes once over the loaded partitions.
+    op.execute(f"INSERT INTO health_events ({_COLUMNS}) SELECT {_COLUMNS} FROM health_events_unpartitioned")
+    _create_event_indexes(partitioned=True)
+    op.execute("DROP TABLE health_events_unpartitioned")
+    op.execute("ALTER TABLE health_events_default ENABLE ROW LEVEL SECURITY")
+    _enable_rls()
+
+    # 4. Hourly rollups for compacted raw samples.
+    op.create_table(
+        "health_event_rollups",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("metric_type", sa.Text(), nullable=False),
+        sa.Column("source", sa.Text(), nullable=False),
+        sa.Column("local_date", sa.Date(), nullable=False),
+        sa.Column("hour_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("unit", sa.Text(), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False),
+        sa.Column("value_sum", sa.Float(precision=53), nullable=False),
+        sa.Column("value_min", sa.Float(precision=53), nullable=False),
+        sa.Column("value_max", sa.Float(precision=53), nullable=False),
+        sa.Column("last_value", sa.Float(precision=53), nullable=False),
+        sa.Column("last_recorded_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "metric_type", "local_date", "source", "hour_start"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+    )
+    op.create_index("idx_health_event_rollups_local_date", "health_event_rollups", ["local_date"])
+    op.execute("ALTER TABLE health_event_rollups ENABLE ROW LEVEL SECURITY")
+    if _has_auth():
+        op.execute(
+            'CREATE POLICY "users can read their own event rollups" '
+            "ON health_event_rollups FOR SELECT USING (user_id = auth.uid())"
+        )
+
+
+def downgrade() -> None:
+    # Compacted samples cannot be restored; rollups are dropped with their table.
+    op.drop_index("idx_health_event_rollups_local_date", table_name="health_event_rollups")
+    op.drop_table("health_event_rollups")
+
+    op.execute("ALTER TABLE health_events RENAME TO health_events_partitioned")
+    op.execute(
+        "ALTER TABLE health_events_partitioned "
+        "RENAME CONSTRAINT health_events_pkey TO health_events_partitioned_pkey"
+    )
+    for name in (*_OLD_INDEXES, "idx_health_events_local_date_brin"):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    _create_events_table(partitioned=False)
+    op.execute(f"INSERT INTO health_events ({_COLUMNS}) SELECT {_COLUMNS} FROM health_events_partitioned")
+    _create_event_indexes(partitioned=False)
+    op.execute("DROP TABLE health_events_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS health_events_ensure_partition(date)")
+    _enable_rls()
@@ -0,0 +1,36 @@
+"""Mark cross-source duplicate activities as superseded.
+
+Revision ID: f3b7c2d9a1e4
+Revises: e6a0c3d4f9b5
+Create Date: 2026-10-18
+
+Adds unified_activities.superseded_by. Activity writers run the
+write-time dedup stage in app.analytics.deduplication, which points
+every duplicate of the same real-world workout at the row that won on
+source priority. Readers that span sources filter on
+``superseded_by IS NULL``, served by a partial index over the winners.
+
+Existing rows start out as winners. They are re-evaluated the next time
+a writer touches their time window.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "f3b7c2d9a1e4"
+down_revision = "e6a0c3d4f9b5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("unified_activities", sa.Column("superseded_by", sa.String(), nullable=True))
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_unified_activities_winners "
+        "ON unified_activities (user_id, start_time) WHERE superseded_by IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_unified_activities_winners")
+    op.drop_column("unified_activities", "superseded_by")
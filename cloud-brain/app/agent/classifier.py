@@ -4,21 +4,35 @@ Zuralog Cloud Brain — Message Classifier.
 Classifies incoming user messages as 'deep_analysis' (requiring Kimi K2.5 / Zura)
 or 'standard' (handled by Qwen3.5-Flash / Zura Flash).
 
-Uses a fast-path heuristic for obviously short/simple messages, then falls back
-to a single structured LLM call for anything ambiguous. Always fails safe to
-'standard' on timeout, API error, or unexpected output.
+Resolution order for each message:
+  1. Fast-path heuristic for obviously short/simple or long/plan-heavy messages.
+  2. Normalized-text LRU cache of recent classifications.
+  3. Local logistic-regression classifier, when it is confident.
+  4. A single structured LLM call for anything still ambiguous.
+
+Always fails safe to 'standard' on timeout, API error, or unexpected output.
+Per-path hit counts are exported as ``classifier_decisions_total{path}`` and
+the cache size as ``classifier_cache_entries`` on ``/metrics``; the same
+numbers are available in-process via ``get_classifier_stats()``.
 """
 
 import asyncio
 import logging
+from collections import Counter
 from enum import Enum
 from typing import Any
 
 from openai import AsyncOpenAI
 
+from app.agent.local_classifier import ClassificationCache, LocalTierClassifier, normalize_text
 from app.config import settings
+from app.services.telemetry import CLASSIFIER_CACHE_ENTRIES, CLASSIFIER_DECISIONS
 
 logger = logging.getLogger(__name__)
+# Dedicated logger for LLM classifier outcomes — the training data for
+# scripts/train_tier_classifier.py. Only emitted when
+# CLASSIFIER_LOG_OUTCOMES is enabled since it includes message text.
+outcome_logger = logging.getLogger("app.agent.classifier.outcomes")
 
 # Module-level singleton — reuses the connection pool across all classify calls.
 _classifier_client: AsyncOpenAI | None = None
@@ -29,7 +43,7 @@ def _get_classifier_client() -> AsyncOpenAI:
     if _classifier_client is None:
         _classifier_client = AsyncOpenAI(
             api_key=settings.openrouter_api_key.get_secret_value(),
-            base_url="https://openrouter.ai/api/v1",
+            base_url=settings.openrouter_base_url,
         )
     return _classifier_client
 
@@ -41,6 +55,61 @@ class MessageTier(str, Enum):
     standard = "standard"
 
 
+_classification_cache = ClassificationCache(
+    max_entries=settings.classifier_cache_max_entries,
+    ttl_seconds=settings.classifier_cache_ttl_seconds,
+)
+_local_classifier: LocalTierClassifier | None = None
+_local_classifier_loaded = False
+
+# Which path decided each classification: fast_path, cache, local_model,
+# llm, llm_fallback (timeout/error/unexpected output).
+_path_counts: Counter[str] = Counter()
+
+
+def _record(path: str) -> None:
+    """Count the path that decided a classification, locally and in telemetry."""
+    _path_counts[path] += 1
+    CLASSIFIER_DECISIONS.inc(path)
+    CLASSIFIER_CACHE_ENTRIES.set(len(_classification_cache))
+
+
+def _get_local_classifier() -> LocalTierClassifier | None:
+    """Lazily load the local classifier; None if the weights file is unusable."""
+    global _local_classifier, _local_classifier_loaded
+    if not _local_classifier_loaded:
+        _local_classifier_loaded = True
+        try:
+            _local_classifier = LocalTierClassifier.from_file(confidence=settings.classifier_local_confidence)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Local tier classifier unavailable (%s); using LLM only", exc)
+            _local_classifier = None
+    return _local_classifier
+
+
+def get_classifier_stats() -> dict[str, Any]:
+    """Return per-path hit counts and the share of messages that avoided the LLM.
+
+    Returns:
+        ``{"paths": {path: count}, "total": int, "llm_avoided_ratio": float,
+        "cache_size": int}``.
+    """
+    total = sum(_path_counts.values())
+    llm_calls = _path_counts["llm"] + _path_counts["llm_fallback"]
+    return {
+        "paths": dict(_path_counts),
+        "total": total,
+        "llm_avoided_ratio": round(1 - llm_calls / total, 4) if total else 0.0,
+        "cache_size": len(_classification_cache),
+    }
+
+
+def reset_classifier_state() -> None:
+    """Clear the classification cache and hit counters (used by tests)."""
+    _classification_cache.clear()
+    _path_counts.clear()
+
+
 _CLASSIFIER_TIMEOUT = 3.0  # seconds before we give up and default to standard
 
 _CLASSIFIER_SYSTEM = """You are a message classifier for a health and fitness AI coach.
@@ -89,8 +158,9 @@ def _compute_signals(text: str) -> dict[str, Any]:
 async def classify_message(text: str) -> MessageTier:
     """Classify a user message as deep_analysis or standard.
 
-    Uses a fast path for obviously simple messages (< 8 words, no plan keywords).
-    Falls back to a single LLM call for anything ambiguous.
+    Uses a fast path for obviously simple messages (< 8 words, no plan keywords),
+    then the classification cache and the local model. Falls back to a single
+    LLM call only for messages the local model is not confident about.
     Always returns MessageTier.standard on any failure.
 
     Args:
@@ -103,14 +173,50 @@ async def classify_message(text: str) -> MessageTier:
 
     # Fast path: very short messages with no plan keywords are always standard.
     if signals["word_count"] < 8 and not signals["has_plan_keyword"]:
+        _record("fast_path")
         return MessageTier.standard
 
     # Positive fast path: long messages with plan keywords are always deep_analysis.
     # The LLM classifier consistently under-classifies these as standard.
     if signals["word_count"] >= 8 and signals["has_plan_keyword"]:
+        _record("fast_path")
         return MessageTier.deep_analysis
 
-    # LLM path: ask the classifier model for ambiguous cases.
+    normalized = normalize_text(text[:500])
+
+    # Cache path: near-identical messages seen recently.
+    cached = _classification_cache.get(normalized)
+    if cached is not None:
+        _record("cache")
+        return MessageTier(cached)
+
+    # Local model path: confident cases decided in-process.
+    local = _get_local_classifier()
+    if local is not None:
+        decision = local.predict(normalized)
+        if decision is not None:
+            _classification_cache.set(normalized, decision)
+            _record("local_model")
+            return MessageTier(decision)
+
+    tier = await _classify_with_llm(text)
+    if tier is not None:
+        _classification_cache.set(normalized, tier.value)
+        _record("llm")
+        if settings.classifier_log_outcomes:
+            outcome_logger.info("classifier_outcome", extra={"text": normalized, "tier": tier.value})
+        return tier
+    _record("llm_fallback")
+    return MessageTier.standard
+
+
+async def _classify_with_llm(text: str) -> MessageTier | None:
+    """Ask the classifier model for an ambiguous message.
+
+    Returns:
+        The parsed tier, or None on timeout, API error, or unexpected output
+        (the caller defaults to standard and does not cache the result).
+    """
     try:
         client = _get_classifier_client()
         response = await asyncio.wait_for(
@@ -137,10 +243,10 @@ async def classify_message(text: str) -> MessageTier:
             return MessageTier(raw)
         except ValueError:
             logger.warning("Classifier returned unexpected value %r, defaulting to standard", raw)
-            return MessageTier.standard
+            return None
     except asyncio.TimeoutError:
         logger.info("Classifier timed out, defaulting to standard")
-        return MessageTier.standard
+        return None
     except Exception as exc:
         logger.warning("Classifier error: %s, defaulting to standard", exc)
-        return MessageTier.standard
+        return None
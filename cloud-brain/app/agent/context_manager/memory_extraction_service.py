@@ -2,8 +2,9 @@
 Zuralog Cloud Brain — Memory Extraction Service.
 
 Extracts lasting facts about a user from a completed conversation and
-stores them in the memory store. Deduplicates against existing memories
-using cosine similarity (threshold 0.92).
+stores them in the memory store in one write. A fact that is a
+near-duplicate of an existing memory replaces it (see
+``memory_index.DUPLICATE_JACCARD``).
 
 Designed to be called as a fire-and-forget asyncio task after each
 assistant response — never in the critical response path.
@@ -24,10 +25,6 @@ from app.utils.sanitize import is_memory_injection_attempt
 
 logger = logging.getLogger(__name__)
 
-# Facts with a similarity score above this threshold against an existing
-# memory are treated as updates (delete + re-insert) rather than new entries.
-_DEDUP_THRESHOLD = 0.92
-
 _EXTRACTION_SYSTEM_PROMPT = (
     "Analyze this fitness coaching conversation. "
     "Extract facts about the user that should be remembered for future sessions. "
@@ -103,6 +100,7 @@ async def extract_and_store_memories(
         )
         return
 
+    to_store: list[tuple[str, str]] = []
     for fact in facts[:5]:
         content = str(fact.get("content", "")).strip()
         category = str(fact.get("category", "context")).strip()
@@ -117,29 +115,16 @@ async def extract_and_store_memories(
                 content,
             )
             continue
+        to_store.append((content, category))
 
-        try:
-            # Deduplication: check for a semantically similar existing memory.
-            existing = await memory_store.query(user_id, content, limit=1)
-            if existing and existing[0].score > _DEDUP_THRESHOLD:
-                # Delete the near-duplicate and replace with the updated fact.
-                await memory_store.delete(existing[0].id, user_id=user_id)
-                logger.debug(
-                    "Updating near-duplicate memory (score %.2f) for user %s",
-                    existing[0].score,
-                    user_id[:8],
-                )
-
-            await memory_store.add(
-                user_id=user_id,
-                content=content,
-                category=category,
-                source_conversation_id=conversation_id,
-            )
-        except Exception:
-            logger.warning(
-                "Failed to store memory fact for user %s: %s",
-                user_id[:8],
-                content[:50],
-                exc_info=True,
-            )
+    if not to_store:
+        return
+    try:
+        await memory_store.store_facts(user_id, to_store, source_conversation_id=conversation_id)
+    except Exception:
+        logger.warning(
+            "Failed to store %d memory fact(s) for user %s",
+            len(to_store),
+            user_id[:8],
+            exc_info=True,
+        )
@@ -0,0 +1,263 @@
+"""
+Zuralog Cloud Brain — Lexical Memory Index.
+
+Ranks one user's memories against a chat message without an embedding
+API. Two structures are kept over the memory texts:
+
+* **BM25 inverted index** — term → ``{memory_id: term frequency}``.
+  Terms are lower-cased words with stopwords removed and a light suffix
+  stemmer applied ("runs", "running" → "run"; "injuries" → "injury"), so
+  a message and a fact phrased differently still share terms. A query
+  only walks the posting lists of its own terms.
+* **MinHash signatures with LSH banding** — used to find a near-duplicate
+  of a newly extracted fact. Band buckets give candidates in constant
+  time, and the exact Jaccard similarity of the term sets confirms them.
+
+Scores returned by ``search`` are BM25 divided by the best hit's BM25, so
+the top match is 1.0 and the others are relative to it. Memories that
+share no term with the query are not returned. An empty query returns
+the newest memories with score 1.0.
+
+A user has tens of memories, so an index costs a few KB and a search
+takes microseconds. ``PgVectorMemoryStore`` keeps one per user in an LRU
+cache and rebuilds it from ``user_memories`` when it expires.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.agent.context_manager.memory_store import MemoryItem
+
+# BM25 parameters (Robertson/Sparck Jones defaults).
+_K1 = 1.2
+_B = 0.75
+
+# Term-set Jaccard at or above which a new fact replaces an existing one.
+# "User prefers morning workouts" → "User prefers evening workouts" is 0.5.
+DUPLICATE_JACCARD = 0.5
+
+# 16 bands × 4 rows: pairs at Jaccard 0.5 become candidates with ~65%
+# probability per fact, 0.7 with ~98%. Misses fall back to a scan of the
+# (small) index, so banding only saves work; it never loses a duplicate.
+_BANDS = 16
+_ROWS = 4
+_NUM_PERM = _BANDS * _ROWS
+# Multiply-shift hash family over uint64 (wrap-around is the modulus).
+_rng = np.random.default_rng(20260420)
+_PERM_A = _rng.integers(1, 2**63, size=_NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2**63, size=_NUM_PERM, dtype=np.uint64)
+del _rng
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    """
+    a about above after again against all am an and any are as at be because been before being below between both
+    but by can could did do does doing down during each few for from further had has have having he her here hers
+    him his how i if in into is it its just me more most my no nor not now of off on once only or other our ours
+    out over own same she should so some such than that the their theirs them then there these they this those
+    through to too under until up very was we were what when where which while who whom why will with would you
+    your yours user users im ive id ill dont also really
+    """.split()
+)
+
+
+def _stem(word: str) -> str:
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "zes", "ches", "shes")):
+        return word[:-2]
+    for suffix in ("ing", "ed", "s"):
+        if word.endswith(suffix) and not word.endswith("ss") and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            if suffix in ("ing", "ed") and len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]  # running → runn → run
+            break
+    # Drop a final "e" so "wake"/"waking" and "tire"/"tired" meet.
+    return word[:-1] if word.endswith("e") and len(word) > 3 and word[-2] not in "aeiou" else word
+
+
+def tokenize(text: str) -> list[str]:
+    """Split ``text`` into stemmed, stopword-free terms."""
+    words = _WORD_RE.findall(text.lower().replace("'", ""))
+    return [_stem(w) for w in words if w not in _STOPWORDS and (len(w) > 1 or w.isdigit())]
+
+
+def minhash(terms: set[str]) -> np.ndarray:
+    """Return the MinHash signature of a term set (empty set → all-max)."""
+    if not terms:
+        return np.full(_NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "big") for t in terms),
+        dtype=np.uint64,
+        count=len(terms),
+    )
+    with np.errstate(over="ignore"):
+        return ((np.outer(hashes, _PERM_A) + _PERM_B) >> np.uint64(32)).min(axis=0)
+
+
+def _bands(signature: np.ndarray) -> list[tuple[int, bytes]]:
+    return [(band, signature[band * _ROWS : (band + 1) * _ROWS].tobytes()) for band in range(_BANDS)]
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class _Doc:
+    item: MemoryItem
+    seq: int
+    terms: Counter
+    term_set: set[str]
+    length: int
+    signature: np.ndarray
+
+
+class MemoryIndex:
+    """BM25 + MinHash index over one user's memories.
+
+    Not thread-safe; the API mutates it from the event loop only.
+    """
+
+    def __init__(self, items: list[MemoryItem] | None = None) -> None:
+        """Build the index.
+
+        Args:
+            items: Memories oldest first (insertion order breaks score ties,
+                newest first).
+        """
+        self._docs: dict[str, _Doc] = {}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._buckets: dict[tuple[int, bytes], set[str]] = {}
+        self._total_length = 0
+        self._seq = 0
+        for item in items or []:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._docs
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, item: MemoryItem) -> None:
+        """Insert a memory (replacing one with the same ID)."""
+        self.remove(item.id)
+        terms = Counter(tokenize(item.content))
+        term_set = set(terms)
+        self._seq += 1
+        doc = _Doc(item, self._seq, terms, term_set, sum(terms.values()), minhash(term_set))
+        self._docs[item.id] = doc
+        self._total_length += doc.length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[item.id] = tf
+        for key in _bands(doc.signature):
+            self._buckets.setdefault(key, set()).add(item.id)
+
+    def remove(self, memory_id: str) -> None:
+        """Drop a memory; unknown IDs are ignored."""
+        doc = self._docs.pop(memory_id, None)
+        if doc is None:
+            return
+        self._total_length -= doc.length
+        for term in doc.terms:
+            posting = self._postings[term]
+            posting.pop(memory_id, None)
+            if not posting:
+                del self._postings[term]
+        for key in _bands(doc.signature):
+            bucket = self._buckets[key]
+            bucket.discard(memory_id)
+            if not bucket:
+                del self._buckets[key]
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def newest(self, limit: int) -> list[MemoryItem]:
+        """Return up to ``limit`` memories, newest first, with score 1.0."""
+        docs = heapq.nlargest(limit, self._docs.values(), key=lambda d: d.seq)
+        return [MemoryItem(d.item.id, d.item.content, d.item.category, 1.0) for d in docs]
+
+    def search(self, query: str, limit: int = 5) -> list[MemoryItem]:
+        """Rank memories against ``query`` with BM25.
+
+        Args:
+            query: The user's message (or any free text).
+            limit: Maximum number of results.
+
+        Returns:
+            Matching memories, best first, scored relative to the best hit.
+            Memories sharing no term with the query are left out.
+        """
+        if not query.strip():
+            return self.newest(limit)
+        if not self._docs:
+            return []
+        n = len(self._docs)
+        avg_length = self._total_length / n or 1.0
+        scores: dict[str, float] = {}
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for memory_id, tf in posting.items():
+                norm = _K1 * (1 - _B + _B * self._docs[memory_id].length / avg_length)
+                scores[memory_id] = scores.get(memory_id, 0.0) + idf * tf * (_K1 + 1) / (tf + norm)
+        if not scores:
+            return []
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda kv: (kv[1], self._docs[kv[0]].seq))
+        best = ranked[0][1]
+        return [
+            MemoryItem(doc.item.id, doc.item.content, doc.item.category, round(score / best, 4))
+            for memory_id, score in ranked
+            for doc in (self._docs[memory_id],)
+        ]
+
+    def find_duplicate(self, content: str, threshold: float = DUPLICATE_JACCARD) -> tuple[MemoryItem, float] | None:
+        """Return the most similar existing memory at or above ``threshold``.
+
+        Args:
+            content: A newly extracted fact.
+            threshold: Minimum Jaccard similarity of the term sets.
+
+        Returns:
+            ``(memory, jaccard)`` or ``None``.
+        """
+        term_set = set(tokenize(content))
+        if not term_set or not self._docs:
+            return None
+        candidates: set[str] = set()
+        for key in _bands(minhash(term_set)):
+            candidates |= self._buckets.get(key, set())
+        best = self._best_match(term_set, candidates, threshold)
+        if best is None and len(candidates) < len(self._docs):
+            # LSH is probabilistic; a few dozen exact comparisons are cheap.
+            best = self._best_match(term_set, self._docs.keys() - candidates, threshold)
+        return best
+
+    def _best_match(self, term_set: set[str], ids, threshold: float) -> tuple[MemoryItem, float] | None:
+        best: tuple[MemoryItem, float] | None = None
+        for memory_id in ids:
+            similarity = _jaccard(term_set, self._docs[memory_id].term_set)
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (self._docs[memory_id].item, similarity)
+        return best
@@ -22,7 +22,7 @@ class MemoryItem:
         id: Stable identifier for tracing and management.
         content: The remembered fact (e.g. "User has a knee injury").
         category: Semantic category — goal | injury | pr | preference | context | program.
-        score: Cosine similarity (0.0–1.0). Higher = more relevant.
+        score: Relevance to the query (0.0–1.0). Higher = more relevant.
             Defaults to 1.0 for stores without similarity scoring.
     """
 
@@ -69,6 +69,15 @@ class MemoryStore(Protocol):
         """Hard-delete a memory by ID, scoped to the owning user."""
         ...
 
+    async def store_facts(
+        self,
+        user_id: str,
+        facts: list[tuple[str, str]],
+        source_conversation_id: str | None = None,
+    ) -> None:
+        """Store ``(content, category)`` facts, replacing near-duplicate memories."""
+        ...
+
 
 class InMemoryStore:
     """Dict-backed memory store for development and testing.
@@ -116,6 +125,20 @@ class InMemoryStore:
             ]
         return results
 
+    async def store_facts(
+        self,
+        user_id: str,
+        facts: list[tuple[str, str]],
+        source_conversation_id: str | None = None,
+    ) -> None:
+        from app.agent.context_manager.memory_index import MemoryIndex  # noqa: PLC0415
+
+        for content, category in facts:
+            duplicate = MemoryIndex(self._store.get(user_id, [])).find_duplicate(content)
+            if duplicate is not None:
+                await self.delete(duplicate[0].id, user_id)
+            await self.add(user_id, content, category, source_conversation_id)
+
     async def delete(self, memory_id: str, user_id: str) -> None:
         if user_id in self._store:
             self._store[user_id] = [i for i in self._store[user_id] if i.id != memory_id]
@@ -1,10 +1,23 @@
 """
 Zuralog Cloud Brain — PgVector Memory Store.
 
-Stores user memories in Supabase (pgvector table) and retrieves them
-without any external embedding API. All memories for a user are fetched
-and the most recent ones are returned — appropriate for the realistic
-scale of health coaching memories (typically 10-50 facts per user).
+Stores user memories in Supabase (the ``user_memories`` table) and ranks
+them against the user's message without any external embedding API.
+Retrieval uses a per-user BM25 index (:mod:`memory_index`) cached in
+process: one SELECT builds it, then queries run in microseconds until the
+entry expires (``_INDEX_TTL_SECONDS``) or is evicted. Writes made through
+this store update the cached index in place.
+
+Deletes must not linger in other workers' indexes, so ``delete`` and
+``clear_memories`` bump the user's ``memories`` data version
+(:mod:`app.services.data_version`) and every query checks it: an index
+built under another version is rebuilt. New memories from other processes
+still show up when the entry expires. Without Redis, or when the version
+read fails, indexes fall back to the TTL alone.
+
+``store_facts`` writes the facts from one extraction run in a single
+session. A fact that is a near-duplicate of an existing memory (MinHash /
+term-set Jaccard) replaces it.
 
 No external API dependencies. Pure Postgres via SQLAlchemy async sessions.
 """
@@ -12,30 +25,126 @@ No external API dependencies. Pure Postgres via SQLAlchemy async sessions.
 from __future__ import annotations
 
 import logging
+import time
 import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING
 
 from sqlalchemy import text
 
+from app.agent.context_manager.memory_index import MemoryIndex
 from app.agent.context_manager.memory_store import MemoryItem
 from app.database import async_session
+from app.services.data_version import SCOPE_MEMORIES, bump_data_version, make_etag, read_versions
+
+if TYPE_CHECKING:
+    import redis.asyncio as aioredis
 
 logger = logging.getLogger(__name__)
 
+# Cached indexes are rebuilt after this long, so memories written by another
+# worker process are picked up within a minute. Deletes are seen at once
+# through the memories data version.
+_INDEX_TTL_SECONDS = 60
+_INDEX_CACHE_MAX = 5_000
+
+_INSERT_SQL = text(
+    """
+    INSERT INTO user_memories
+        (id, user_id, content, category, embedding, source_conversation_id)
+    VALUES
+        (:id, :user_id, :content, :category, NULL, :source_conv_id)
+    """
+)
+_DELETE_SQL = text("DELETE FROM user_memories WHERE id = :id AND user_id = :user_id")
+
 
 class PgVectorMemoryStore:
     """Memory store backed by Supabase postgres.
 
-    Memories are stored as plain text. Retrieval fetches the most recent
-    facts for the user — no vector similarity search, no external API.
+    Memories are stored as plain text and ranked with an in-process
+    lexical index — no vector similarity search, no external API.
 
     Attributes:
         is_available: Always True — no external dependency required.
     """
 
+    def __init__(self, redis: aioredis.Redis | None = None) -> None:
+        """Create the store.
+
+        Args:
+            redis: Shared client used to read and bump the ``memories``
+                data version. If None, cached indexes are only refreshed by
+                TTL and by writes made through this store.
+        """
+        self._redis = redis
+        # user_id -> (index, rebuild_after monotonic, memories version token)
+        self._indexes: OrderedDict[str, tuple[MemoryIndex, float, str]] = OrderedDict()
+
     @property
     def is_available(self) -> bool:
         return True
 
+    # ------------------------------------------------------------------
+    # Index cache
+    # ------------------------------------------------------------------
+
+    async def _version_token(self, user_id: str) -> str | None:
+        """Return the user's memories version token.
+
+        Returns ``""`` without Redis (TTL-only caching) and ``None`` when
+        Redis fails, in which case the index is rebuilt.
+        """
+        if self._redis is None:
+            return ""
+        try:
+            user_fields, global_fields = await read_versions(self._redis, user_id)
+        except Exception:  # noqa: BLE001
+            logger.debug("Data version read failed; rebuilding memory index", exc_info=True)
+            return None
+        return make_etag("", "", (SCOPE_MEMORIES,), user_fields, global_fields)
+
+    def _cached_index(self, user_id: str, token: str | None = None) -> MemoryIndex | None:
+        """Return the live index for ``user_id``; with ``token``, only if built under it."""
+        entry = self._indexes.get(user_id)
+        if entry is None:
+            return None
+        index, rebuild_after, entry_token = entry
+        if rebuild_after <= time.monotonic() or (token is not None and entry_token != token):
+            del self._indexes[user_id]
+            return None
+        self._indexes.move_to_end(user_id)
+        return index
+
+    async def _index(self, user_id: str) -> MemoryIndex:
+        """Return the user's index, building it from ``user_memories`` on a miss.
+
+        A cached index built under an older memories version, or any index
+        when the version cannot be read, counts as a miss.
+        """
+        token = await self._version_token(user_id)
+        index = self._cached_index(user_id, token) if token is not None else None
+        if index is not None:
+            return index
+        async with async_session() as db:
+            result = await db.execute(
+                text(
+                    """
+                    SELECT id, content, category
+                    FROM user_memories
+                    WHERE user_id = :user_id
+                    ORDER BY created_at
+                    """
+                ),
+                {"user_id": user_id},
+            )
+            rows = result.fetchall()
+        index = MemoryIndex([MemoryItem(id=str(r.id), content=str(r.content), category=str(r.category)) for r in rows])
+        self._indexes[user_id] = (index, time.monotonic() + _INDEX_TTL_SECONDS, token or "")
+        while len(self._indexes) > _INDEX_CACHE_MAX:
+            self._indexes.popitem(last=False)
+        return index
+
     # ------------------------------------------------------------------
     # MemoryStore protocol methods
     # ------------------------------------------------------------------
@@ -48,18 +157,12 @@ class PgVectorMemoryStore:
         source_conversation_id: str | None = None,
     ) -> None:
         """Insert a memory fact. Embedding column is left NULL."""
+        memory_id = str(uuid.uuid4())
         async with async_session() as db:
             await db.execute(
-                text(
-                    """
-                    INSERT INTO user_memories
-                        (id, user_id, content, category, embedding, source_conversation_id)
-                    VALUES
-                        (:id, :user_id, :content, :category, NULL, :source_conv_id)
-                    """
-                ),
+                _INSERT_SQL,
                 {
-                    "id": str(uuid.uuid4()),
+                    "id": memory_id,
                     "user_id": user_id,
                     "content": content,
                     "category": category,
@@ -67,51 +170,89 @@ class PgVectorMemoryStore:
                 },
             )
             await db.commit()
+        index = self._cached_index(user_id)
+        if index is not None:
+            index.add(MemoryItem(id=memory_id, content=content, category=category))
+
+    async def store_facts(
+        self,
+        user_id: str,
+        facts: list[tuple[str, str]],
+        source_conversation_id: str | None = None,
+    ) -> None:
+        """Insert extracted facts, replacing near-duplicates, in one session.
+
+        Replacing a near-duplicate deletes its row, so that case bumps the
+        memories version like :meth:`delete` for other workers' indexes.
+
+        Args:
+            user_id: The user the facts are about.
+            facts: ``(content, category)`` pairs from one extraction run.
+            source_conversation_id: Conversation the facts came from.
+        """
+        if not facts:
+            return
+        index = await self._index(user_id)
+        inserts: dict[str, dict] = {}
+        deletes: list[dict] = []
+        for content, category in facts:
+            duplicate = index.find_duplicate(content)
+            if duplicate is not None:
+                existing, similarity = duplicate
+                logger.debug(
+                    "Updating near-duplicate memory (jaccard %.2f) for user %s", similarity, user_id[:8]
+                )
+                index.remove(existing.id)
+                if inserts.pop(existing.id, None) is None:
+                    deletes.append({"id": existing.id, "user_id": user_id})
+            item = MemoryItem(id=str(uuid.uuid4()), content=content, category=category)
+            index.add(item)
+            inserts[item.id] = {
+                "id": item.id,
+                "user_id": user_id,
+                "content": content,
+                "category": category,
+                "source_conv_id": source_conversation_id,
+            }
+        try:
+            async with async_session() as db:
+                if deletes:
+                    await db.execute(_DELETE_SQL, deletes)
+                await db.execute(_INSERT_SQL, list(inserts.values()))
+                await db.commit()
+        except Exception:
+            # The cached index was updated optimistically; rebuild it next time.
+            self._indexes.pop(user_id, None)
+            raise
+        if deletes:
+            await bump_data_version(user_id, SCOPE_MEMORIES, redis=self._redis)
 
     async def query(
         self,
         user_id: str,
-        query_text: str = "",  # noqa: ARG002 — kept for interface compatibility
+        query_text: str = "",
         limit: int = 5,
     ) -> list[MemoryItem]:
-        """Return the most recent memories for the user.
+        """Return the user's memories ranked against ``query_text``.
 
-        query_text is accepted for interface compatibility but not used —
-        we return the newest facts rather than doing similarity search.
+        Scores are BM25 relative to the best match (which scores 1.0);
+        memories sharing no term with the query are left out. An empty
+        ``query_text`` returns the newest memories.
         """
-        async with async_session() as db:
-            result = await db.execute(
-                text(
-                    """
-                    SELECT id, content, category
-                    FROM user_memories
-                    WHERE user_id = :user_id
-                    ORDER BY created_at DESC
-                    LIMIT :limit
-                    """
-                ),
-                {"user_id": user_id, "limit": limit},
-            )
-            rows = result.fetchall()
-
-        return [
-            MemoryItem(
-                id=str(row.id),
-                content=str(row.content),
-                category=str(row.category),
-                score=1.0,
-            )
-            for row in rows
-        ]
+        index = await self._index(user_id)
+        return index.search(query_text, limit)
 
     async def delete(self, memory_id: str, user_id: str) -> None:
-        """Hard-delete a memory by ID, scoped to the owning user."""
+        """Hard-delete a memory by ID, scoped to the owning user.
+
+        Bumps the memories version so other workers drop their cached index;
+        this worker's is rebuilt on the next query for the same reason.
+        """
         async with async_session() as db:
-            await db.execute(
-                text("DELETE FROM user_memories WHERE id = :id AND user_id = :user_id"),
-                {"id": memory_id, "user_id": user_id},
-            )
+            await db.execute(_DELETE_SQL, {"id": memory_id, "user_id": user_id})
             await db.commit()
+        self._indexes.pop(user_id, None)
+        await bump_data_version(user_id, SCOPE_MEMORIES, redis=self._redis)
 
     # ------------------------------------------------------------------
     # Extended interface (for memory_routes.py)
@@ -119,12 +260,7 @@ class PgVectorMemoryStore:
 
     async def delete_memory(self, memory_id: str, user_id: str) -> bool:
         """Delete a memory by ID, scoped to the owning user."""
-        async with async_session() as db:
-            await db.execute(
-                text("DELETE FROM user_memories WHERE id = :id AND user_id = :user_id"),
-                {"id": memory_id, "user_id": user_id},
-            )
-            await db.commit()
+        await self.delete(memory_id, user_id)
         return True
 
     async def list_memories(self, user_id: str) -> list[MemoryItem]:
@@ -155,3 +291,5 @@ class PgVectorMemoryStore:
                 {"user_id": user_id},
             )
             await db.commit()
+        self._indexes.pop(user_id, None)
+        await bump_data_version(user_id, SCOPE_MEMORIES, redis=self._redis)
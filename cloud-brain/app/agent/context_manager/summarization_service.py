@@ -103,6 +103,7 @@ async def summarize_oldest_messages(
                     {"role": "user", "content": "Summarize this conversation."},
                 ],
                 temperature=0.3,
+                cache="history_summary",
             )
 
             summary = (response.choices[0].message.content or "").strip()
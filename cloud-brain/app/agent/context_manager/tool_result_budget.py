@@ -0,0 +1,338 @@
+"""
+Zuralog Cloud Brain — Tool Result Budget.
+
+Health read tools can return months of daily rows or days of intraday
+samples. Results over the orchestrator's size cap used to be replaced by
+an error, and the LLM retried with shorter date ranges, one turn at a time.
+``fit_tool_result`` serialises a result and returns it unchanged when it
+fits the token budget. Otherwise it shrinks every time series in the
+result, one step at a time, until the whole result fits:
+
+1. ``lttb`` — Largest-Triangle-Three-Buckets downsampling of the rows on
+   the series' densest numeric field, from 256 points down to 32. The kept
+   rows are unchanged, so peaks and troughs survive. Only used while it
+   keeps at least one row in seven, unless calendar buckets cannot help
+   (e.g. one day of intraday samples).
+2. ``day``, ``week`` then ``month`` — one row per day (intraday series) /
+   ISO week / calendar month with ``count`` and the ``mean``, ``min`` and
+   ``max`` of every numeric field. A period is skipped when the series
+   fits in a single bucket of it.
+3. ``summary`` — statistics for the whole range only.
+
+The steps are planned on the longest series in the result. A result that
+still does not fit, or has no time series to shrink, is returned as is
+when it is within ``max_bytes`` (the orchestrator's byte cap). The token
+budget only decides how far series are reduced, never whether an
+otherwise acceptable result is sent.
+
+A time series is a list of at least ``_MIN_SERIES_LEN`` dicts that all
+carry a date or timestamp under the same key (``_DATE_KEYS``) and share at
+least one numeric field. Numeric strings count, since Fitbit returns its
+time series values as strings. A reduced series becomes a dict with a
+``resolution`` field, so the model knows it is not looking at raw rows.
+Every reduced series also carries whole-range ``summary`` statistics.
+
+Token counting is passed in (``token_counter.count_tokens`` in the
+orchestrator), so this module has no tokenizer dependency.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from itertools import groupby
+from typing import Any
+
+# Keys holding a row's date or timestamp, in order of preference.
+_DATE_KEYS = (
+    "date",
+    "dateTime",
+    "day",
+    "summary_date",
+    "timestamp",
+    "start_time",
+    "startTime",
+    "start_date",
+    "recorded_at",
+    "datetime",
+    "time",
+)
+_MIN_SERIES_LEN = 8
+_LTTB_POINTS = (256, 128, 64, 32)
+
+RESOLUTION_RAW = "raw"
+RESOLUTION_TOO_LARGE = "too_large"
+
+TOO_LARGE_CONTENT = json.dumps({"error": "Tool result too large", "truncated": True})
+
+
+@dataclass
+class _Series:
+    """One time series found in a tool result, sorted by time."""
+
+    parent: dict | list
+    slot: str | int
+    rows: list[dict]
+    instants: list[datetime]
+    fields: list[str]
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+
+def _instant(value: Any) -> datetime | None:
+    """Parse an ISO date/datetime string or a Unix timestamp (s or ms)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        if 1e8 < value < 1e11:
+            return datetime.fromtimestamp(value, UTC)
+        if 1e11 <= value < 1e14:
+            return datetime.fromtimestamp(value / 1000, UTC)
+        return None
+    if isinstance(value, str) and len(value) >= 10 and value[4] == "-":
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+    return None
+
+
+def _number(value: Any) -> float | None:
+    """Return ``value`` as a finite float, accepting numeric strings."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return None
+    else:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _as_series(parent: dict | list, slot: str | int, rows: list) -> _Series | None:
+    if len(rows) < _MIN_SERIES_LEN or not all(isinstance(r, dict) for r in rows):
+        return None
+    for key in _DATE_KEYS:
+        instants = [_instant(r.get(key)) for r in rows]
+        if all(instants):
+            break
+    else:
+        return None
+    fields = []
+    for field in rows[0]:
+        if field == key or field == "id" or field.endswith("_id"):
+            continue
+        values = [r.get(field) for r in rows if r.get(field) is not None]
+        if values and all(_number(v) is not None for v in values):
+            fields.append(field)
+    if not fields:
+        return None
+    order = sorted(range(len(rows)), key=instants.__getitem__)
+    return _Series(parent, slot, [rows[i] for i in order], [instants[i] for i in order], fields)
+
+
+def _find_series(node: Any, out: list[_Series]) -> list[_Series]:
+    """Collect the time series in ``node``, outermost first."""
+    items = node.items() if isinstance(node, dict) else enumerate(node) if isinstance(node, list) else ()
+    for slot, child in items:
+        if isinstance(child, list):
+            series = _as_series(node, slot, child)
+            if series is not None:
+                out.append(series)
+                continue
+        if isinstance(child, (dict, list)):
+            _find_series(child, out)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Reductions
+# ---------------------------------------------------------------------------
+
+
+def lttb(xs: list[float], ys: list[float], threshold: int) -> list[int]:
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Args:
+        xs: Ascending x values.
+        ys: y values, same length as ``xs``.
+        threshold: Number of points to keep (at least 3).
+
+    Returns:
+        Ascending indices of the kept points, always including the first
+        and the last.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(xs[end:next_end]) / (next_end - end)
+        avg_y = sum(ys[end:next_end]) / (next_end - end)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+def _stats(rows: list[dict], fields: list[str], with_count: bool = True) -> dict[str, dict]:
+    stats = {}
+    for field in fields:
+        values = [v for v in (_number(r.get(field)) for r in rows) if v is not None]
+        if not values:
+            continue
+        entry = {"count": len(values)} if with_count else {}
+        entry.update(mean=round(sum(values) / len(values), 2), min=min(values), max=max(values))
+        stats[field] = entry
+    return stats
+
+
+def _downsample(series: _Series, points: int) -> dict | list:
+    if len(series.rows) <= points:
+        return series.rows
+    primary = max(series.fields, key=lambda f: sum(r.get(f) is not None for r in series.rows))
+    ys = [_number(r.get(primary)) for r in series.rows]
+    present = [y for y in ys if y is not None]
+    fill = sum(present) / len(present)
+    xs = [t.timestamp() for t in series.instants]
+    kept = lttb(xs, [fill if y is None else y for y in ys], points)
+    return {
+        "resolution": "lttb",
+        "original_count": len(series.rows),
+        "sampled_on": primary,
+        "summary": _stats(series.rows, series.fields),
+        "rows": [series.rows[i] for i in kept],
+    }
+
+
+def _period(day: date, resolution: str) -> str:
+    if resolution == "day":
+        return day.isoformat()
+    if resolution == "week":
+        iso = day.isocalendar()
+        return f"{iso.year}-W{iso.week:02d}"
+    return f"{day.year}-{day.month:02d}"
+
+
+def _aggregate(series: _Series, resolution: str) -> dict:
+    buckets = []
+    pairs = zip(series.rows, series.instants)
+    for label, group in groupby(pairs, key=lambda pair: _period(pair[1].date(), resolution)):
+        group = list(group)
+        rows = [row for row, _ in group]
+        buckets.append(
+            {
+                "period": label,
+                "start": group[0][1].date().isoformat(),
+                "end": group[-1][1].date().isoformat(),
+                "count": len(rows),
+                **_stats(rows, series.fields, with_count=False),
+            }
+        )
+    return {
+        "resolution": resolution,
+        "original_count": len(series.rows),
+        "summary": _stats(series.rows, series.fields),
+        "buckets": buckets,
+    }
+
+
+def _summarise(series: _Series) -> dict:
+    return {
+        "resolution": "summary",
+        "original_count": len(series.rows),
+        "start": series.instants[0].date().isoformat(),
+        "end": series.instants[-1].date().isoformat(),
+        "summary": _stats(series.rows, series.fields),
+    }
+
+
+def _plan(series: _Series) -> list[tuple[str, int]]:
+    """Return the ``(resolution, lttb_points)`` steps to try, finest first."""
+    days = {instant.date() for instant in series.instants}
+    periods = [
+        resolution
+        for resolution in ("day", "week", "month")
+        if len({_period(day, resolution) for day in days}) > 1 and (resolution != "day" or len(series.rows) > len(days))
+    ]
+    longest = len(series.rows)
+    steps = [("lttb", points) for points in _LTTB_POINTS if points < longest and (points * 7 >= longest or not periods)]
+    return [*steps, *((resolution, 0) for resolution in periods), ("summary", 0)]
+
+
+def _reduce(series: _Series, resolution: str, points: int) -> dict | list:
+    if resolution == "lttb":
+        return _downsample(series, points)
+    if resolution == "summary":
+        return _summarise(series)
+    return _aggregate(series, resolution)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def fit_tool_result(
+    data: Any,
+    max_tokens: int,
+    count_tokens: Callable[[str], int],
+    max_bytes: int | None = None,
+) -> tuple[str, str]:
+    """Serialise a tool result to JSON that fits ``max_tokens``.
+
+    Args:
+        data: ``ToolResult.data`` (JSON-serialisable).
+        max_tokens: Token budget for the serialised result.
+        count_tokens: Tokenizer, e.g. ``token_counter.count_tokens``.
+        max_bytes: Hard size cap. A result that cannot be reduced to the
+            token budget is still returned raw if it is within this many
+            bytes. None means no fallback.
+
+    Returns:
+        ``(content, resolution)``. ``resolution`` is ``"raw"`` when the
+        result was returned as is, the coarsest step applied otherwise
+        (``"lttb"``, ``"day"``, ``"week"``, ``"month"``, ``"summary"``), or
+        ``"too_large"`` when nothing fitted and ``content`` is
+        ``TOO_LARGE_CONTENT``.
+    """
+    raw = json.dumps(data, default=str)
+    raw_bytes = len(raw.encode("utf-8"))
+    # A token is at least one byte, so short results skip the tokenizer.
+    if raw_bytes <= max_tokens or count_tokens(raw) <= max_tokens:
+        return raw, RESOLUTION_RAW
+
+    # Wrapped so that a result which is itself a series can be replaced too.
+    wrapper = {"result": json.loads(raw)}
+    series = _find_series(wrapper, [])
+    if series:
+        for resolution, points in _plan(max(series, key=lambda s: len(s.rows))):
+            for s in series:
+                s.parent[s.slot] = _reduce(s, resolution, points)
+            content = json.dumps(wrapper["result"], default=str)
+            if count_tokens(content) <= max_tokens:
+                return content, resolution
+    if max_bytes is not None and raw_bytes <= max_bytes:
+        return raw, RESOLUTION_RAW
+    return TOO_LARGE_CONTENT, RESOLUTION_TOO_LARGE
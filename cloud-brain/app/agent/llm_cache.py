@@ -0,0 +1,248 @@
+"""
+Zuralog Cloud Brain — LLM Response Cache.
+
+Memoizes complete chat completions for call sites whose output is a pure
+function of their input: insight cards for a set of signals, a title for
+a first message, a meal parse for a description plus the user's rules,
+and a summary for a fixed set of messages. Call sites opt in by passing
+``cache="<site>"`` to ``LLMClient.chat``; each site has its own TTL in
+:data:`CALL_SITE_TTLS`.
+
+Key: ``llm_cache:<site>:<sha256>`` over the canonical JSON of the request
+(model, messages, temperature, max_tokens, tools, response_format and the
+OpenRouter ``extra_body``), so any change to the prompt, model or sampling
+parameters is a different entry.
+
+Storage is two-tier: a bounded in-process LRU, backed by Redis when
+``REDIS_URL`` is set so entries are shared across API and Celery workers.
+Identical requests already in flight in this process wait for the first
+one instead of calling the provider again (single-flight). Only complete
+answers are stored — ``finish_reason == "stop"``, non-empty content, no
+tool calls, valid JSON when JSON mode was requested, and whatever the call
+site's ``validate`` hook requires on top (e.g. a meal parse with foods).
+Cache failures never fail the call; the request simply goes to the provider.
+
+Hits, misses and saved tokens are counted per site in
+``llm_cache_requests_total`` and ``llm_cache_saved_tokens_total``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import redis.asyncio as aioredis
+from openai.types.chat import ChatCompletion
+
+from app.config import settings
+from app.services.telemetry import LLM_CACHE_REQUESTS, LLM_CACHE_SAVED_TOKENS
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "llm_cache"
+
+# Seconds an answer stays valid per call site. Insight prompts embed the
+# target date, so a day covers every retry of that day's cards.
+CALL_SITE_TTLS: dict[str, int] = {
+    "insight_cards": 24 * 3600,
+    "conversation_title": 7 * 24 * 3600,
+    "meal_parse": 7 * 24 * 3600,
+    "meal_refine": 24 * 3600,
+    "history_summary": 24 * 3600,
+}
+
+
+def cache_key(site: str, request: dict[str, Any]) -> str:
+    """Return the cache key for a completion request at ``site``."""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return f"{_KEY_PREFIX}:{site}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+
+def is_cacheable(response: Any, request: dict[str, Any]) -> bool:
+    """Return True if ``response`` is a complete answer worth replaying."""
+    choices = getattr(response, "choices", None)
+    if not choices or choices[0].finish_reason != "stop":
+        return False
+    message = choices[0].message
+    if message.tool_calls or not (message.content or "").strip():
+        return False
+    if (request.get("response_format") or {}).get("type") == "json_object":
+        try:
+            json.loads(message.content)
+        except ValueError:
+            return False
+    return True
+
+
+class LLMResponseCache:
+    """Process-wide store for cached completions plus in-flight requests.
+
+    Attributes:
+        _entries: LRU of serialized responses, newest last.
+        _inflight: Pending provider calls by cache key.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self._max_entries = max_entries
+        self._redis: aioredis.Redis | None = None
+        # key -> (serialized ChatCompletion, expires_at monotonic)
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._inflight: dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+
+    def configure(self, redis: aioredis.Redis | None) -> None:
+        """Share a long-lived Redis client (the API's ``app.state.redis``).
+
+        Without one, each lookup and store opens a short-lived client from
+        ``settings.redis_url``, which is what Celery tasks need since each
+        runs in its own ``asyncio.run`` loop.
+        """
+        self._redis = redis
+
+    def clear(self) -> None:
+        """Drop every in-process entry (tests and manual invalidation)."""
+        self._entries.clear()
+
+    async def get_or_call(
+        self,
+        site: str,
+        request: dict[str, Any],
+        call: Callable[[], Awaitable[Any]],
+        validate: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """Return the cached response for ``request`` or run ``call`` once.
+
+        Args:
+            site: Call-site name; must be a key of :data:`CALL_SITE_TTLS`.
+            request: Everything sent to the provider that shapes the answer.
+            call: Performs the request when there is no usable entry.
+            validate: Optional extra check on a fresh response; it is only
+                stored when this returns True.
+
+        Returns:
+            A ``ChatCompletion``, fresh or restored from the cache.
+        """
+        ttl = CALL_SITE_TTLS.get(site)
+        if not settings.llm_cache_enabled or not ttl:
+            LLM_CACHE_REQUESTS.inc(site, "bypass")
+            return await call()
+
+        key = cache_key(site, request)
+        cached = await self._lookup(key)
+        if cached is not None:
+            LLM_CACHE_REQUESTS.inc(site, "hit")
+            _count_saved(site, cached)
+            return cached
+
+        loop = asyncio.get_running_loop()
+        pending = self._inflight.get(key)
+        if pending is not None and pending[0] is loop:
+            try:
+                response = await asyncio.shield(pending[1])
+            except asyncio.CancelledError:
+                if not pending[1].cancelled():
+                    raise
+                # The first caller was cancelled, not us: make the call ourselves.
+            else:
+                LLM_CACHE_REQUESTS.inc(site, "shared")
+                _count_saved(site, response)
+                return response
+
+        LLM_CACHE_REQUESTS.inc(site, "miss")
+        future: asyncio.Future = loop.create_future()
+        self._inflight[key] = (loop, future)
+        try:
+            response = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Waiters re-raise it; mark it retrieved so an unshared failure is not logged as unhandled.
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+        finally:
+            if self._inflight.get(key, (None, None))[1] is future:
+                del self._inflight[key]
+
+        if is_cacheable(response, request) and (validate is None or validate(response)):
+            await self._store(key, response.model_dump_json(), ttl)
+        return response
+
+    async def _lookup(self, key: str) -> ChatCompletion | None:
+        """Return a live entry from memory, then Redis, or None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            payload, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return ChatCompletion.model_validate_json(payload)
+            del self._entries[key]
+
+        found: list = []
+
+        async def _get(client: aioredis.Redis) -> None:
+            pipe = client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.ttl(key)
+            found.extend(await pipe.execute())
+
+        try:
+            await self._with_client(_get)
+            if not found or found[0] is None:
+                return None
+            response = ChatCompletion.model_validate_json(found[0])
+        except Exception:  # noqa: BLE001
+            logger.debug("LLM cache read failed for %s", key, exc_info=True)
+            return None
+        if found[1] > 0:
+            self._remember(key, found[0], found[1])
+        return response
+
+    async def _store(self, key: str, payload: str, ttl: int) -> None:
+        self._remember(key, payload, ttl)
+
+        async def _set(client: aioredis.Redis) -> None:
+            await client.set(key, payload, ex=ttl)
+
+        try:
+            await self._with_client(_set)
+        except Exception:  # noqa: BLE001
+            logger.debug("LLM cache write failed for %s", key, exc_info=True)
+
+    def _remember(self, key: str, payload: str, ttl: int) -> None:
+        self._entries[key] = (payload, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def _with_client(self, action: Callable[[aioredis.Redis], Awaitable[None]]) -> None:
+        """Run ``action`` on the shared client, or a short-lived one, or not at all."""
+        if self._redis is not None:
+            await action(self._redis)
+            return
+        if not settings.redis_url:
+            return
+        client = aioredis.from_url(settings.redis_url, decode_responses=True)
+        try:
+            await action(client)
+        finally:
+            await client.aclose()
+
+
+def _count_saved(site: str, response: Any) -> None:
+    usage = getattr(response, "usage", None)
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if isinstance(tokens, int):
+            LLM_CACHE_SAVED_TOKENS.inc(site, kind, amount=tokens)
+
+
+llm_response_cache = LLMResponseCache(max_entries=settings.llm_cache_max_entries)
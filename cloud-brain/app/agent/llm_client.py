@@ -7,18 +7,24 @@ optional function-calling (tool use). Uses AsyncOpenAI for
 built-in retries, streaming, and structured tool_call parsing.
 
 The client is designed to be instantiated once during application
-lifespan and shared across requests.
+lifespan and shared across requests. Calls whose answer is a pure function
+of the request can opt in to the response cache with ``chat(cache=...)``
+(see :mod:`app.agent.llm_cache`).
 """
 
 import logging
 import os
+import time
+from collections.abc import Callable
 from typing import Any
 
 import openai
 import sentry_sdk
 from openai import AsyncOpenAI, APIError
 
+from app.agent.llm_cache import llm_response_cache
 from app.config import settings
+from app.services.telemetry import LLM_REQUEST_DURATION, LLM_TOKENS
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +58,7 @@ class LLMClient:
 
         self._client = AsyncOpenAI(
             api_key=api_key,
-            base_url="https://openrouter.ai/api/v1",
+            base_url=settings.openrouter_base_url,
             default_headers={
                 "HTTP-Referer": settings.openrouter_referer,
                 "X-Title": settings.openrouter_title,
@@ -120,9 +126,31 @@ class LLMClient:
         if extra_body:
             kwargs["extra_body"] = extra_body
 
-        response = await self._client.chat.completions.create(**kwargs)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._client.chat.completions.create(**kwargs)
+            outcome = "ok"
+        finally:
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - started, model, "chat", outcome)
+        usage = getattr(response, "usage", None)
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", None)
+            if isinstance(tokens, int):
+                LLM_TOKENS.inc(model, kind, amount=tokens)
         return response
 
+    async def _open_stream(self, kwargs: dict[str, Any]) -> Any:
+        """Open a streaming completion, recording the time to the first response."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            stream = await self._client.chat.completions.create(**kwargs)
+            outcome = "ok"
+            return stream
+        finally:
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - started, kwargs["model"], "stream", outcome)
+
     async def chat(
         self,
         messages: list[dict[str, Any]],
@@ -132,6 +160,8 @@ class LLMClient:
         response_format: dict[str, Any] | None = None,
         reasoning: dict[str, Any] | None = None,
         plugins: list[dict[str, Any]] | None = None,
+        cache: str | None = None,
+        cache_validate: Callable[[Any], bool] | None = None,
     ) -> Any:
         """Send a chat completion request to the LLM.
 
@@ -151,6 +181,15 @@ class LLMClient:
             plugins: Optional OpenRouter plugins array. Pass
                 ``[{"id": "response-healing"}]`` to auto-repair malformed JSON
                 at the edge (free; non-streaming only).
+            cache: Optional call-site name from ``llm_cache.CALL_SITE_TTLS``.
+                Identical requests from that site are answered from the
+                response cache and identical in-flight requests share one
+                provider call. Only for calls whose answer depends on the
+                request alone. Answers from the fallback model are never
+                stored, since the entry is keyed on the primary model.
+            cache_validate: Optional check a fresh answer must pass before
+                it is cached, for call sites that reject some valid-JSON
+                answers (see ``LLMResponseCache.get_or_call``).
 
         Returns:
             The full ChatCompletion response object from the OpenAI SDK.
@@ -158,6 +197,48 @@ class LLMClient:
         Raises:
             openai.APIError: On API communication failures (after retries).
         """
+        args = (messages, tools, temperature, max_tokens, response_format, reasoning, plugins)
+        if cache is None:
+            response, _ = await self._chat(*args)
+            return response
+        request = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "tools": tools,
+            "response_format": response_format,
+            "extra_body": {"reasoning": reasoning, "plugins": plugins},
+        }
+        answered_by: list[str] = []
+
+        async def _call() -> Any:
+            response, model = await self._chat(*args)
+            answered_by.append(model)
+            return response
+
+        def _validate(response: Any) -> bool:
+            if answered_by != [self.model]:
+                return False
+            return cache_validate is None or cache_validate(response)
+
+        return await llm_response_cache.get_or_call(cache, request, _call, _validate)
+
+    async def _chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        temperature: float,
+        max_tokens: int | None,
+        response_format: dict[str, Any] | None,
+        reasoning: dict[str, Any] | None,
+        plugins: list[dict[str, Any]] | None,
+    ) -> tuple[Any, str]:
+        """Run one chat completion with the 429/503 model fallback.
+
+        Returns:
+            ``(response, model)`` where ``model`` is the one that answered.
+        """
         logger.debug(
             "LLM request: model=%s, messages=%d, tools=%s",
             self.model,
@@ -165,9 +246,10 @@ class LLMClient:
             len(tools) if tools else 0,
         )
 
+        model = self.model
         try:
             response = await self._call_with_model(
-                model=self.model,
+                model=model,
                 messages=messages,
                 tools=tools,
                 temperature=temperature,
@@ -183,9 +265,10 @@ class LLMClient:
                     f"Primary model {self.model} unavailable ({e.status_code}), "
                     f"falling back to {settings.openrouter_fallback_model}"
                 )
+                model = settings.openrouter_fallback_model
                 try:
                     response = await self._call_with_model(
-                        model=settings.openrouter_fallback_model,
+                        model=model,
                         messages=messages,
                         tools=tools,
                         temperature=temperature,
@@ -212,13 +295,13 @@ class LLMClient:
 
         logger.info(
             "LLM response: model=%s, tokens_in=%d, tokens_out=%d",
-            self.model,
+            model,
             # Fix 4.5 (L-4): Safe attribute access on usage
             getattr(response.usage, 'prompt_tokens', 0) if response.usage else 0,
             getattr(response.usage, 'completion_tokens', 0) if response.usage else 0,
         )
 
-        return response
+        return response, model
 
     async def stream_chat(
         self,
@@ -253,7 +336,7 @@ class LLMClient:
             kwargs["tools"] = tools
 
         try:
-            return await self._client.chat.completions.create(**kwargs)
+            return await self._open_stream(kwargs)
         except openai.APIStatusError as e:
             # Fix 4.2 (H-10): Fallback model on 429/503
             if e.status_code in (429, 503) and self.model != settings.openrouter_fallback_model:
@@ -264,7 +347,7 @@ class LLMClient:
                 try:
                     fallback_kwargs = dict(kwargs)
                     fallback_kwargs["model"] = settings.openrouter_fallback_model
-                    return await self._client.chat.completions.create(**fallback_kwargs)
+                    return await self._open_stream(fallback_kwargs)
                 except APIError as fallback_exc:
                     # Fix 4.4 (M-11): Log stream errors
                     logger.exception("stream_chat_error", extra={"model": settings.openrouter_fallback_model})
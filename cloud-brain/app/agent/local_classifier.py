@@ -0,0 +1,156 @@
+"""
+Zuralog Cloud Brain — Local Tier Classifier.
+
+Two in-process layers that sit in front of the LLM classifier in
+:mod:`app.agent.classifier`:
+
+1. :class:`ClassificationCache` — a normalized-text LRU of recent results
+   with a TTL, so near-identical messages ("How did I sleep this week?" vs
+   "how did i sleep this week") are classified once.
+2. :class:`LocalTierClassifier` — a small logistic-regression model over
+   token and keyword features. Weights live in
+   ``app/data/tier_classifier_weights.json`` and are produced by
+   ``scripts/train_tier_classifier.py`` from logged LLM classifier outcomes.
+   It only answers when its probability is outside the confidence band;
+   everything else still goes to the LLM.
+
+Both are pure Python and run in microseconds.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEIGHTS_PATH = Path(__file__).resolve().parent.parent / "data" / "tier_classifier_weights.json"
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_PUNCT_RE = re.compile(r"[^\w\s?']")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize a message for cache keying and feature extraction.
+
+    Lowercases, drops punctuation other than ``?`` and apostrophes, and
+    collapses whitespace, so trivially different phrasings share a key.
+    """
+    lowered = _PUNCT_RE.sub(" ", text.lower())
+    return _SPACE_RE.sub(" ", lowered).strip()
+
+
+def extract_features(normalized: str) -> list[str]:
+    """Return the sparse binary feature names present in a normalized message.
+
+    Features:
+        ``tok:<word>`` — unigram presence.
+        ``bi:<w1>_<w2>`` — bigram presence.
+        ``len:<bucket>`` — word-count bucket (``short``/``mid``/``long``).
+        ``has_q`` — the message contains a question mark.
+    """
+    words = _WORD_RE.findall(normalized)
+    features = {f"tok:{w}" for w in words}
+    features.update(f"bi:{a}_{b}" for a, b in zip(words, words[1:]))
+    n = len(words)
+    features.add("len:short" if n < 8 else "len:mid" if n < 20 else "len:long")
+    if "?" in normalized:
+        features.add("has_q")
+    return sorted(features)
+
+
+class ClassificationCache:
+    """Process-local LRU of recent classification results with a TTL.
+
+    Not locked: every operation is synchronous, so it is safe to share
+    across coroutines on a single event loop.
+
+    Args:
+        max_entries: Maximum number of cached messages before LRU eviction.
+        ttl_seconds: Lifetime of an entry in seconds.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 3600) -> None:
+        self._store: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+
+    def get(self, key: str) -> str | None:
+        """Return the cached tier value for ``key``, or None if missing/expired."""
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() > expires_at:
+            del self._store[key]
+            return None
+        self._store.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Cache ``value`` under ``key``, evicting the least-recently-used entry if full."""
+        self._store[key] = (value, time.monotonic() + self._ttl)
+        self._store.move_to_end(key)
+        if len(self._store) > self._max_entries:
+            self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._store.clear()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class LocalTierClassifier:
+    """Logistic-regression tier classifier over sparse binary features.
+
+    ``predict_proba`` returns P(deep_analysis). The model abstains (returns
+    None from :meth:`predict`) when the probability is within the
+    confidence band, leaving the decision to the LLM.
+
+    Args:
+        weights: Mapping of feature name → weight.
+        bias: Intercept term.
+        confidence: Minimum probability (for either class) required to
+            decide locally. Must be in (0.5, 1.0].
+    """
+
+    def __init__(self, weights: dict[str, float], bias: float, confidence: float = 0.85) -> None:
+        self.weights = weights
+        self.bias = bias
+        self.confidence = confidence
+
+    @classmethod
+    def from_file(cls, path: Path | str = DEFAULT_WEIGHTS_PATH, confidence: float = 0.85) -> "LocalTierClassifier":
+        """Load a model from a weights JSON file produced by the training script."""
+        with open(path, encoding="utf-8") as fh:
+            data: dict[str, Any] = json.load(fh)
+        return cls(
+            weights={k: float(v) for k, v in data.get("weights", {}).items()},
+            bias=float(data.get("bias", 0.0)),
+            confidence=confidence,
+        )
+
+    def predict_proba(self, normalized: str) -> float:
+        """Return P(deep_analysis) for a normalized message."""
+        z = self.bias + sum(self.weights.get(f, 0.0) for f in extract_features(normalized))
+        # Clamp to avoid overflow on extreme weights.
+        z = max(-30.0, min(30.0, z))
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def predict(self, normalized: str) -> str | None:
+        """Return ``"deep_analysis"``/``"standard"`` when confident, else None."""
+        p = self.predict_proba(normalized)
+        if p >= self.confidence:
+            return "deep_analysis"
+        if p <= 1.0 - self.confidence:
+            return "standard"
+        return None
@@ -5,24 +5,52 @@ Routes incoming tool execution requests to the correct MCP server
 by querying the ``MCPServerRegistry``. This is the single entry point
 for all tool calls in the system — the orchestrator never talks to
 individual servers directly.
+
+Read tools that declare ``cache_ttl_seconds`` on their ``ToolDefinition``
+have successful results memoized per (user, tool, canonical arguments),
+so the agent loop re-asking for the same goals or date range within a
+conversation does not open another database session. Each entry records
+the user's data version token (:mod:`app.services.data_version`) for the
+tool's ``cache_scopes``. Ingest, provider syncs and REST writers bump those
+versions from any process, so a changed token turns the entry into a
+miss. Successful write tools drop the user's entries in this process and
+bump the scopes they declare in ``invalidates``. Without Redis, entries
+expire by TTL and local writes only.
 """
 
 from __future__ import annotations
 
+import json
 import logging
+import time
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
 import sentry_sdk
+from app.mcp_servers.base_server import BaseMCPServer
 from app.mcp_servers.models import ToolDefinition, ToolResult
 from app.mcp_servers.registry import MCPServerRegistry
+from app.services.data_version import bump_data_version, make_etag, read_versions
+from app.services.telemetry import TOOL_CACHE_REQUESTS, TOOL_CALL_DURATION
 
 if TYPE_CHECKING:
+    import redis.asyncio as aioredis
     from sqlalchemy.ext.asyncio import AsyncSession
 
     from app.services.user_tool_resolver import UserToolResolver
 
 logger = logging.getLogger(__name__)
 
+_RESULT_CACHE_MAX = 2_048
+
+# (user_id, tool_name, canonical params)
+_CacheKey = tuple[str, str, str]
+
+
+def _canonical_params(params: dict) -> str:
+    """Serialise tool arguments so equal dicts give equal cache keys."""
+    return json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+
 
 class MCPClient:
     """Routes tool calls to the appropriate MCP server.
@@ -33,12 +61,14 @@ class MCPClient:
 
     Attributes:
         _registry: The shared server registry.
+        _results: LRU of cached read-tool results, newest last.
     """
 
     def __init__(
         self,
         registry: MCPServerRegistry,
         tool_resolver: UserToolResolver | None = None,
+        redis: aioredis.Redis | None = None,
     ) -> None:
         """Create a new MCP client.
 
@@ -48,9 +78,15 @@ class MCPClient:
             tool_resolver: Optional resolver for per-user tool filtering.
                 If None, ``get_tools_for_user()`` falls back to returning
                 all tools (backwards compatibility).
+            redis: Shared client used to read and bump data versions. If
+                None, cached results are only invalidated by TTL and by
+                write tools run through this client.
         """
         self._registry = registry
         self._tool_resolver = tool_resolver
+        self._redis = redis
+        # key -> (result, expires_at monotonic, data version token)
+        self._results: OrderedDict[_CacheKey, tuple[ToolResult, float, str]] = OrderedDict()
 
     async def execute_tool(
         self,
@@ -63,6 +99,8 @@ class MCPClient:
         Looks up which server exposes the requested tool, then
         delegates execution. Returns an error ``ToolResult`` if no
         server owns the tool or if execution raises an exception.
+        Cacheable read tools are served from the result cache while the
+        user's data versions are unchanged.
 
         Args:
             tool_name: The tool identifier (e.g. ``"get_activities"``).
@@ -81,6 +119,46 @@ class MCPClient:
                 error=f"Tool '{tool_name}' not found in any registered server.",
             )
 
+        tool = next((t for t in server.get_tools() if t.name == tool_name), None)
+        if tool is None or not (tool.cache_ttl_seconds or tool.invalidates):
+            return await self._run(server, tool_name, params, user_id)
+
+        if not tool.cache_ttl_seconds:
+            result = await self._run(server, tool_name, params, user_id)
+            if result.success:
+                self._drop_user(user_id)
+                await bump_data_version(user_id, *tool.invalidates, redis=self._redis)
+            return result
+
+        token = await self._version_token(user_id, tool)
+        if token is None:
+            TOOL_CACHE_REQUESTS.inc(tool_name, "bypass")
+            return await self._run(server, tool_name, params, user_id)
+
+        key = (user_id, tool_name, _canonical_params(params))
+        cached = self._cached(key, token)
+        if cached is not None:
+            TOOL_CACHE_REQUESTS.inc(tool_name, "hit")
+            return cached
+        TOOL_CACHE_REQUESTS.inc(tool_name, "miss")
+
+        result = await self._run(server, tool_name, params, user_id)
+        if result.success:
+            self._results[key] = (result.model_copy(deep=True), time.monotonic() + tool.cache_ttl_seconds, token)
+            while len(self._results) > _RESULT_CACHE_MAX:
+                self._results.popitem(last=False)
+        return result
+
+    async def _run(
+        self,
+        server: BaseMCPServer,
+        tool_name: str,
+        params: dict,
+        user_id: str,
+    ) -> ToolResult:
+        """Execute the tool on ``server``, timing it and wrapping exceptions."""
+        started = time.perf_counter()
+        outcome = "error"
         try:
             logger.info(
                 "Routing tool '%s' to server '%s' for user '%s'",
@@ -88,7 +166,9 @@ class MCPClient:
                 server.name,
                 user_id,
             )
-            return await server.execute_tool(tool_name, params, user_id)
+            result = await server.execute_tool(tool_name, params, user_id)
+            outcome = "ok" if result.success else "failed"
+            return result
         except Exception as exc:
             logger.exception(
                 "Tool '%s' on server '%s' raised an exception",
@@ -100,6 +180,44 @@ class MCPClient:
                 success=False,
                 error=f"Tool execution failed: {exc}",
             )
+        finally:
+            TOOL_CALL_DURATION.observe(time.perf_counter() - started, tool_name, outcome)
+
+    # ------------------------------------------------------------------
+    # Result cache
+    # ------------------------------------------------------------------
+
+    async def _version_token(self, user_id: str, tool: ToolDefinition) -> str | None:
+        """Return the data version token for the tool's scopes.
+
+        Returns ``""`` without Redis (TTL-only caching) and ``None`` when
+        Redis fails, in which case the cache is bypassed.
+        """
+        if self._redis is None:
+            return ""
+        try:
+            user_fields, global_fields = await read_versions(self._redis, user_id)
+        except Exception:  # noqa: BLE001
+            logger.debug("Data version read failed; bypassing tool cache", exc_info=True)
+            return None
+        return make_etag("", "", tool.cache_scopes, user_fields, global_fields)
+
+    def _cached(self, key: _CacheKey, token: str) -> ToolResult | None:
+        """Return a copy of a live entry for ``key`` recorded under ``token``."""
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        result, expires_at, entry_token = entry
+        if entry_token != token or expires_at <= time.monotonic():
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return result.model_copy(deep=True)
+
+    def _drop_user(self, user_id: str) -> None:
+        """Forget every cached result for ``user_id``."""
+        for key in [k for k in self._results if k[0] == user_id]:
+            del self._results[key]
 
     def get_all_tools(self) -> list[ToolDefinition]:
         """Get a consolidated list of all tools from all servers.
@@ -29,14 +29,18 @@ import sentry_sdk
 
 from app.agent.context_manager.memory_store import MemoryItem, MemoryStore
 from app.utils.sanitize import is_memory_injection_attempt
-from app.agent.context_manager.token_counter import count_messages, truncate_to_tokens
+from app.agent.context_manager.token_counter import count_messages, count_tokens, truncate_to_tokens
+from app.agent.context_manager.tool_result_budget import RESOLUTION_RAW, TOO_LARGE_CONTENT, fit_tool_result
 from app.agent.llm_client import LLMClient
 from app.agent.mcp_client import MCPClient
 from app.agent.prompts.system import UserProfile, build_system_prompt
 from app.agent.response import AgentResponse
+from app.agent.turn_context import MEMORY_SCORE_THRESHOLD
 from app.config import settings
 from app.mcp_servers.integrations_server import get_display_name
+from app.mcp_servers.models import ToolDefinition
 from app.models.integration import Integration
+from app.services.telemetry import TOOL_RESULTS_REDUCED
 from app.services.usage_tracker import UsageTracker
 
 if TYPE_CHECKING:
@@ -82,6 +86,28 @@ _WRITE_TOOLS: frozenset[str] = frozenset({
 # A small, cheap model is preferred since this is a one-shot, low-stakes call.
 _TITLE_MODEL = settings.openrouter_title_model
 
+# Hard cap on a serialised tool result, after fit_tool_result has shrunk it.
+_TOOL_RESULT_MAX_BYTES = 32768
+
+
+def _tool_result_content(tool_name: str, data: Any) -> str:
+    """Serialise a successful tool result within the token budget.
+
+    Long health time series are downsampled or aggregated rather than
+    rejected (see ``tool_result_budget``), so the model does not spend
+    extra turns retrying with shorter date ranges. Anything else is sent
+    raw up to ``_TOOL_RESULT_MAX_BYTES``.
+    """
+    content, resolution = fit_tool_result(
+        data, settings.tool_result_max_tokens, count_tokens, max_bytes=_TOOL_RESULT_MAX_BYTES
+    )
+    if resolution != RESOLUTION_RAW:
+        TOOL_RESULTS_REDUCED.inc(tool_name, resolution)
+        logger.info("Tool result '%s' reduced to fit the token budget (%s)", tool_name, resolution)
+    if len(content.encode("utf-8")) > _TOOL_RESULT_MAX_BYTES:
+        return TOO_LARGE_CONTENT
+    return content
+
 
 class Orchestrator:
     """LLM Agent that orchestrates MCP tool calls with ReAct-style loop.
@@ -270,6 +296,7 @@ class Orchestrator:
                 # tiny output budget can be spent on hidden reasoning, leaving
                 # an empty title.
                 reasoning={"effort": "none"},
+                cache="conversation_title",
             )
             title = (response.choices[0].message.content or "").strip().strip('"').strip("'")
             # Fallback if the model returns something odd.
@@ -329,7 +356,7 @@ class Orchestrator:
             # 1. Retrieve relevant memories first (needed for prompt injection)
             if memory_enabled:
                 memory_items: list[MemoryItem] = await self.memory_store.query(user_id, query_text=message, limit=5)
-                memory_texts = [item.content for item in memory_items if item.score >= 0.70]
+                memory_texts = [item.content for item in memory_items if item.score >= MEMORY_SCORE_THRESHOLD]
             else:
                 memory_texts = []
 
@@ -493,10 +520,8 @@ class Orchestrator:
                             last_client_action = result.data
 
                         if result.success:
-                            result_content = json.dumps(result.data)
-                            if len(result_content.encode("utf-8")) > 32768:  # 32KB cap on tool results
-                                result_content = json.dumps({"error": "Tool result too large", "truncated": True})
-                            elif is_memory_injection_attempt(result_content):
+                            result_content = _tool_result_content(func_name, result.data)
+                            if is_memory_injection_attempt(result_content):
                                 logger.warning(
                                     "Potential injection attempt in tool result '%s' for user '%s'",
                                     func_name,
@@ -567,6 +592,8 @@ class Orchestrator:
         write_confirm_token: str | None = None,
         write_confirm_tool: str | None = None,
         image_urls: list[str] | None = None,
+        prefetched_memories: list[str] | None = None,
+        prefetched_tools: list[ToolDefinition] | None = None,
     ) -> AsyncGenerator[dict[str, Any], None]:
         """Process a user message and stream the final response token-by-token.
 
@@ -591,16 +618,24 @@ class Orchestrator:
             proactivity: Proactivity level key (``"medium"``, etc.).
             db: Optional DB session for per-user tool filtering.
             conversation_history: Prior messages for multi-turn context.
+            prefetched_memories: Memory texts already retrieved (and
+                score-filtered) by the caller. When provided, the memory
+                store is not queried again.
+            prefetched_tools: Tool definitions already resolved for this
+                user by the caller. When provided, tool resolution is skipped.
         """
         with sentry_sdk.start_transaction(
             op="ai.process_message_stream", name="orchestrator.process_message_stream"
         ) as txn:
 
             try:
-                # Build context (same as process_message)
-                if memory_enabled:
+                # Build context (same as process_message) unless the caller
+                # already loaded it concurrently with model routing.
+                if prefetched_memories is not None:
+                    memory_texts = prefetched_memories if memory_enabled else []
+                elif memory_enabled:
                     memory_items: list[MemoryItem] = await self.memory_store.query(user_id, query_text=message, limit=5)
-                    memory_texts = [item.content for item in memory_items if item.score >= 0.70]
+                    memory_texts = [item.content for item in memory_items if item.score >= MEMORY_SCORE_THRESHOLD]
                 else:
                     memory_texts = []
 
@@ -621,7 +656,9 @@ class Orchestrator:
                     image_urls=image_urls,
                 )
 
-                if db is not None:
+                if prefetched_tools is not None:
+                    mcp_tools = prefetched_tools
+                elif db is not None:
                     mcp_tools = await self.mcp_client.get_tools_for_user(db, user_id)
                 else:
                     mcp_tools = self.mcp_client.get_all_tools()
@@ -760,10 +797,8 @@ class Orchestrator:
                                 last_client_action = result.data
 
                             if result.success:
-                                result_content = json.dumps(result.data)
-                                if len(result_content.encode("utf-8")) > 32768:  # 32KB cap on tool results
-                                    result_content = json.dumps({"error": "Tool result too large", "truncated": True})
-                                elif is_memory_injection_attempt(result_content):
+                                result_content = _tool_result_content(func_name, result.data)
+                                if is_memory_injection_attempt(result_content):
                                     logger.warning(
                                         "Potential injection attempt in tool result '%s' for user '%s'",
                                         func_name,
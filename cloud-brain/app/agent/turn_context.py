@@ -0,0 +1,254 @@
+"""
+Zuralog Cloud Brain — Chat Turn Context Prefetch.
+
+Loads everything a chat turn needs before the first LLM call — conversation
+history, user profile, long-term memories and the per-user tool list —
+concurrently with model routing. None of this context depends on which
+model tier the router picks, so there is no reason to wait for the
+classifier (which may make its own LLM round-trip) before starting it.
+
+The database loads (profile, history, tools) share one ``AsyncSession``
+and run one after another on it, since a session cannot serve concurrent
+queries. Memory retrieval runs alongside them through the memory store.
+A turn's prefetch therefore holds at most two pooled connections (the
+shared session and the memory store's), however many loads are added.
+Failures degrade to the same defaults the sequential path used: an empty
+history, no memories, and the full static tool list.
+
+Per-stage timings are collected in a :class:`TurnTimings` so each turn can
+report where its time-to-first-token went.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterator
+
+from app.agent.context_manager.memory_store import MemoryStore
+from app.agent.mcp_client import MCPClient
+from app.agent.prompts.system import UserProfile
+from app.mcp_servers.models import ToolDefinition
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+MEMORY_SCORE_THRESHOLD = 0.40
+"""Minimum relevance score for a memory to be injected into the prompt.
+
+Scores are relative to the turn's best match (see ``memory_index``); 0.40
+keeps secondary matches such as "night shift" + "sleep goal" for a
+message about tiredness after a night shift."""
+
+MEMORY_QUERY_LIMIT = 5
+"""Number of memories requested from the store per turn."""
+
+ProfileTuple = tuple[UserProfile | None, str, str, str, bool]
+"""(profile, persona, proactivity, response_length, memory_enabled)."""
+
+_DEFAULT_PROFILE: ProfileTuple = (None, "balanced", "medium", "concise", True)
+
+
+class TurnTimings:
+    """Wall-clock timings for the stages of a single chat turn.
+
+    Stages may overlap (they run concurrently), so the values are not
+    expected to sum to the total. ``first_token`` and ``total`` are
+    measured from the moment the turn started.
+    """
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self._stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and record it under ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stages[name] = (time.perf_counter() - start) * 1000
+
+    def mark(self, name: str) -> None:
+        """Record the elapsed time since the turn started under ``name``.
+
+        Only the first mark for a given name is kept, so calling this on
+        every streamed token records time-to-first-token.
+        """
+        if name not in self._stages:
+            self._stages[name] = (time.perf_counter() - self._started) * 1000
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the recorded stages in milliseconds, rounded to 0.1 ms."""
+        return {name: round(ms, 1) for name, ms in self._stages.items()}
+
+
+@dataclass
+class TurnContext:
+    """Context assembled for one chat turn before the first LLM call."""
+
+    history: list[dict[str, Any]] = field(default_factory=list)
+    user_profile: UserProfile | None = None
+    persona: str = "balanced"
+    proactivity: str = "medium"
+    response_length: str = "concise"
+    memory_enabled: bool = True
+    memory_texts: list[str] = field(default_factory=list)
+    mcp_tools: list[ToolDefinition] | None = None
+
+
+class TurnContextPrefetch:
+    """Starts all context loads for a turn and joins them on demand.
+
+    Usage::
+
+        prefetch = TurnContextPrefetch(...)
+        prefetch.start()
+        try:
+            routing = await route_message(...)
+            ...
+            ctx = await prefetch.join()
+        finally:
+            prefetch.cancel()  # no-op once joined
+
+    Args:
+        session_factory: Callable returning an ``AsyncSession`` context
+            manager (normally ``app.database.async_session``).
+        user_id: The authenticated user's ID.
+        query_text: Text used for memory retrieval.
+        memory_store: Long-term memory backend.
+        mcp_client: Tool router used to resolve the user's tools.
+        load_history: ``async (db) -> list[dict]`` returning LLM history.
+        load_profile: ``async (db) -> ProfileTuple``.
+        timings: Collector for per-stage durations.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        user_id: str,
+        query_text: str,
+        memory_store: MemoryStore,
+        mcp_client: MCPClient,
+        load_history: Callable[[AsyncSession], Awaitable[list[dict[str, Any]]]],
+        load_profile: Callable[[AsyncSession], Awaitable[ProfileTuple]],
+        timings: TurnTimings,
+    ) -> None:
+        self._session_factory = session_factory
+        self._user_id = user_id
+        self._query_text = query_text
+        self._memory_store = memory_store
+        self._mcp_client = mcp_client
+        self._load_history = load_history
+        self._load_profile = load_profile
+        self._timings = timings
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def start(self) -> None:
+        """Schedule the database loads and memory retrieval."""
+        if self._tasks:
+            return
+        profile_ready: asyncio.Future[ProfileTuple] = asyncio.get_running_loop().create_future()
+        self._tasks = {
+            "db": asyncio.create_task(self._db_loads(profile_ready)),
+            "memory": asyncio.create_task(self._memory(profile_ready)),
+        }
+
+    def cancel(self) -> None:
+        """Cancel any loads still in flight (e.g. the turn was rejected or failed)."""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+    async def join(self) -> TurnContext:
+        """Wait for every load and assemble the :class:`TurnContext`."""
+        self.start()
+        with self._timings.stage("context_wait"):
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+        history, profile_tuple, tools = self._tasks["db"].result()
+        profile, persona, proactivity, response_length, memory_enabled = profile_tuple
+        return TurnContext(
+            history=history,
+            user_profile=profile,
+            persona=persona,
+            proactivity=proactivity,
+            response_length=response_length,
+            memory_enabled=memory_enabled,
+            memory_texts=self._tasks["memory"].result(),
+            mcp_tools=tools,
+        )
+
+    # ------------------------------------------------------------------
+    # Individual loads — each swallows its own errors so join() never raises.
+    # ------------------------------------------------------------------
+
+    async def _db_loads(
+        self, profile_ready: asyncio.Future[ProfileTuple]
+    ) -> tuple[list[dict[str, Any]], ProfileTuple, list[ToolDefinition]]:
+        # Profile first: memory retrieval is waiting on memory_enabled.
+        history: list[dict[str, Any]] = []
+        profile = _DEFAULT_PROFILE
+        tools: list[ToolDefinition] | None = None
+        try:
+            async with self._session_factory() as db:
+                profile = await self._profile(db)
+                profile_ready.set_result(profile)
+                history = await self._history(db)
+                tools = await self._tools(db)
+        except Exception as exc:
+            logger.warning("Context prefetch session failed for user '%s': %s", self._user_id[:8], exc)
+        finally:
+            if not profile_ready.done():
+                profile_ready.set_result(profile)
+        return history, profile, tools if tools is not None else self._mcp_client.get_all_tools()
+
+    async def _profile(self, db: AsyncSession) -> ProfileTuple:
+        with self._timings.stage("profile"):
+            try:
+                return await self._load_profile(db)
+            except Exception as exc:
+                logger.warning("Profile prefetch failed for user '%s': %s", self._user_id[:8], exc)
+                await db.rollback()
+                return _DEFAULT_PROFILE
+
+    async def _history(self, db: AsyncSession) -> list[dict[str, Any]]:
+        with self._timings.stage("history"):
+            try:
+                return await self._load_history(db)
+            except Exception as exc:
+                logger.warning("History prefetch failed for user '%s': %s", self._user_id[:8], exc)
+                await db.rollback()
+                return []
+
+    async def _tools(self, db: AsyncSession) -> list[ToolDefinition]:
+        with self._timings.stage("tools"):
+            try:
+                return await self._mcp_client.get_tools_for_user(db, self._user_id)
+            except Exception as exc:
+                logger.warning("Tool prefetch failed for user '%s': %s", self._user_id[:8], exc)
+                await db.rollback()
+                return self._mcp_client.get_all_tools()
+
+    async def _memory(self, profile_ready: asyncio.Future[ProfileTuple]) -> list[str]:
+        # memory_enabled lives in the user's preferences, so memory retrieval
+        # waits on the (fast) profile load rather than querying speculatively
+        # for users who have opted out.
+        _, _, _, _, memory_enabled = await profile_ready
+        if not memory_enabled:
+            return []
+        with self._timings.stage("memory"):
+            try:
+                items = await self._memory_store.query(
+                    self._user_id, query_text=self._query_text, limit=MEMORY_QUERY_LIMIT
+                )
+            except Exception as exc:
+                logger.warning("Memory prefetch failed for user '%s': %s", self._user_id[:8], exc)
+                return []
+        return [item.content for item in items if item.score >= MEMORY_SCORE_THRESHOLD]
@@ -0,0 +1,160 @@
+"""
+Zuralog Cloud Brain — Cohort Signal Detection.
+
+Computes the per-metric statistics of ``InsightSignalDetector`` categories
+A (7-day vs previous 7-day trends) and C (z-score anomalies) for a whole
+cohort of briefs at once. Each brief section becomes a NaN-padded
+``users × rows × metrics`` array, and window means, percent changes and
+z-scores are reduced along the rows axis for every user and metric in one
+pass. Python only runs for the few (user, metric) pairs that produce a
+signal, through the same ``trend_signal`` / ``anomaly_signal`` builders
+the per-user detector uses.
+
+Sums are accumulated in row order, as ``sum()`` does in the per-user
+path, so both paths emit the same signals in the same order.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.analytics.health_brief_builder import HealthBrief
+from app.analytics.insight_signal_detector import (
+    ANOMALY_DAILY_METRICS,
+    ANOMALY_MIN_BASELINE,
+    TREND_DAILY_METRICS,
+    TREND_MIN_POINTS,
+    InsightSignal,
+    anomaly_signal,
+    trend_signal,
+)
+from app.analytics.trend_detector import TrendDetector
+
+_WINDOW = TrendDetector.DEFAULT_WINDOW
+_SENSITIVITY = TrendDetector.DEFAULT_SENSITIVITY
+
+
+@dataclass
+class CohortSignals:
+    """Precomputed signals for one brief, passed to ``InsightSignalDetector``."""
+
+    trends: list[InsightSignal] = field(default_factory=list)
+    anomalies: list[InsightSignal] = field(default_factory=list)
+
+
+@dataclass
+class _Section:
+    """One brief section as a ``users × rows × metrics`` array."""
+
+    metrics: list[str]
+    values: np.ndarray
+    dates: list[list[str]]
+
+
+# Brief sections in the order category A reads them: (rows getter, [(attribute, metric name)]).
+_SECTIONS: list[tuple[Callable[[HealthBrief], list], list[tuple[str, str]]]] = [
+    (lambda b: b.daily_metrics, [(m, m) for m in TREND_DAILY_METRICS]),
+    (lambda b: b.sleep_records, [("hours", "sleep_hours"), ("quality_score", "sleep_quality")]),
+    (lambda b: b.weight, [("weight_kg", "weight_kg")]),
+    (lambda b: b.nutrition, [("calories", "calorie_intake")]),
+]
+
+
+def _section(
+    briefs: list[HealthBrief], rows_of: Callable[[HealthBrief], list], attrs: list[tuple[str, str]]
+) -> _Section:
+    per_user = [rows_of(b) for b in briefs]
+    values = np.full((len(briefs), max(map(len, per_user), default=0), len(attrs)), np.nan)
+    for u, rows in enumerate(per_user):
+        if rows:
+            values[u, : len(rows)] = np.array([[getattr(r, a) for a, _ in attrs] for r in rows], dtype=float)
+    return _Section([m for _, m in attrs], values, [[r.date for r in rows] for rows in per_user])
+
+
+def _trends(section: _Section) -> list[tuple[int, int, int, InsightSignal]]:
+    """Return ``(user, first_row, metric_index, signal)`` for every non-stable trend."""
+    values = section.values
+    n_rows = values.shape[1]
+    if n_rows < TREND_MIN_POINTS:
+        return []
+    present = ~np.isnan(values)
+    # Row indices of each series' last 14 non-null values, oldest first (-1 = missing).
+    rows = np.arange(n_rows)[None, :, None]
+    last = np.sort(np.where(present, rows, -1), axis=1)[:, -2 * _WINDOW :, :]
+    window = np.take_along_axis(values, np.maximum(last, 0), axis=1)
+    previous = window[:, :_WINDOW].sum(axis=1) / _WINDOW
+    recent = window[:, _WINDOW:].sum(axis=1) / _WINDOW
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(previous == 0, np.where(recent > 0, 100.0, 0.0), (recent - previous) / previous * 100)
+    eligible = (present.sum(axis=1) >= TREND_MIN_POINTS) & ((pct > _SENSITIVITY) | (pct < -_SENSITIVITY))
+    first = present.argmax(axis=1)
+
+    found = []
+    for u, m in zip(*np.nonzero(eligible)):
+        result = {
+            "trend": "up" if pct[u, m] > 0 else "down",
+            "percent_change": round(float(pct[u, m]), 1),
+            "recent_avg": round(float(recent[u, m]), 2),
+            "previous_avg": round(float(previous[u, m]), 2),
+        }
+        signal = trend_signal(section.metrics[m], result)
+        if signal:
+            found.append((int(u), int(first[u, m]), int(m), signal))
+    return found
+
+
+def _anomalies(section: _Section, metrics: list[str], today: list[str]) -> list[tuple[int, int, InsightSignal]]:
+    """Return ``(user, metric_order, signal)`` for every z-score anomaly in ``metrics``."""
+    columns = [section.metrics.index(m) for m in metrics]
+    values = section.values[:, :, columns]
+    if values.shape[1] == 0:
+        return []
+    today_row = np.array([dates.index(t) if t in dates else -1 for dates, t in zip(section.dates, today)])
+    users = np.arange(len(today_row))
+    current = np.where(today_row[:, None] >= 0, values[users, np.maximum(today_row, 0)], np.nan)
+    history = ~np.isnan(values) & (np.arange(values.shape[1])[None, :, None] != today_row[:, None, None])
+    count = history.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(history, values, 0.0).sum(axis=1) / count
+        std = np.sqrt(np.where(history, (values - mean[:, None, :]) ** 2, 0.0).sum(axis=1) / count)
+        deviation = np.where(std == 0, np.where(current == mean, 0.0, np.inf), np.abs(current - mean) / std)
+    eligible = (count >= ANOMALY_MIN_BASELINE) & ~np.isnan(current)
+
+    found = []
+    for u, m in zip(*np.nonzero(eligible)):
+        signal = anomaly_signal(metrics[m], float(current[u, m]), float(mean[u, m]), float(deviation[u, m]))
+        if signal:
+            found.append((int(u), int(m), signal))
+    return found
+
+
+def detect_cohort_signals(briefs: list[HealthBrief]) -> dict[str, CohortSignals]:
+    """Compute category A trends and category C z-score anomalies for a cohort.
+
+    Args:
+        briefs: Briefs built for the same target date (e.g. by ``build_briefs``).
+
+    Returns:
+        Mapping of user ID to :class:`CohortSignals`; pass ``trends`` and
+        ``anomalies`` to ``InsightSignalDetector`` for that user's brief.
+    """
+    out = {b.user_id: CohortSignals() for b in briefs}
+    if not briefs:
+        return out
+    sections = [_section(briefs, rows_of, attrs) for rows_of, attrs in _SECTIONS]
+
+    # Category A emits series in first-appearance order: section, then first row, then attribute.
+    trends = [(u, s, first, m, sig) for s, section in enumerate(sections) for u, first, m, sig in _trends(section)]
+    for u, *_, signal in sorted(trends, key=lambda t: t[:4]):
+        out[briefs[u].user_id].trends.append(signal)
+
+    today = [b.generated_at.date().isoformat() for b in briefs]
+    daily, sleep = sections[0], sections[1]
+    anomalies = [(u, 0, m, sig) for u, m, sig in _anomalies(daily, list(ANOMALY_DAILY_METRICS), today)]
+    anomalies += [(u, 1, m, sig) for u, m, sig in _anomalies(sleep, ["sleep_hours", "sleep_quality"], today)]
+    for u, *_, signal in sorted(anomalies, key=lambda t: t[:3]):
+        out[briefs[u].user_id].anomalies.append(signal)
+    return out
@@ -0,0 +1,321 @@
+"""
+Zuralog Cloud Brain — Correlation Matrix Engine.
+
+Vectorized, all-pairs, multi-lag Pearson correlation over a user's daily
+metrics. A user's ``daily_summaries`` are laid out as a dense
+``date × metric`` matrix (NaN where a day has no value) and every metric
+pair is correlated at lags 0..``MAX_LAG`` in one batched pass using
+pairwise-complete observations — no per-pair date alignment.
+
+Lag semantics: the cell ``(a, b, lag)`` pairs ``a`` on day *t* with ``b``
+on day *t + lag* ("sleep tonight vs. steps tomorrow" is
+``("sleep_hours", "steps", 1)``).
+
+All functions are pure; persistence lives in
+``app.services.correlation_store``.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Iterable
+
+import numpy as np
+
+# Correlation metric key → daily_summaries.metric_type.
+CORRELATION_METRICS: dict[str, str] = {
+    "sleep_hours": "sleep_duration",
+    "sleep_quality": "sleep_quality",
+    "steps": "steps",
+    "active_calories": "active_calories",
+    "hrv_ms": "hrv_ms",
+    "resting_heart_rate": "resting_heart_rate",
+    "calorie_intake": "calories",
+    "weight_kg": "weight_kg",
+    "distance_meters": "distance",
+}
+
+MAX_LAG = 3
+MIN_PAIRED_POINTS = 3  # below this r is undefined and the cell is dropped
+
+# Thresholds for surfacing a correlation as a highlight / category D signal.
+HIGHLIGHT_MIN_R = 0.4
+HIGHLIGHT_MIN_N = 14
+HIGHLIGHT_MAX_P = 0.05
+
+# Pairs that move together by construction — never worth surfacing.
+_TRIVIAL_PAIRS: frozenset[frozenset[str]] = frozenset(
+    {
+        frozenset({"steps", "distance_meters"}),
+        frozenset({"steps", "active_calories"}),
+        frozenset({"distance_meters", "active_calories"}),
+    }
+)
+
+
+@dataclass(frozen=True)
+class CorrelationCell:
+    """One (metric_a, metric_b, lag) correlation.
+
+    Attributes:
+        metric_a: Leading metric key (day *t*).
+        metric_b: Following metric key (day *t + lag*).
+        lag: Offset in days applied to ``metric_b``.
+        r: Pearson correlation coefficient.
+        n: Number of paired observations.
+        p_value: Two-sided p-value for H0: r = 0.
+    """
+
+    metric_a: str
+    metric_b: str
+    lag: int
+    r: float
+    n: int
+    p_value: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "metric_a": self.metric_a,
+            "metric_b": self.metric_b,
+            "lag": self.lag,
+            "r": self.r,
+            "n": self.n,
+            "p_value": self.p_value,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CorrelationCell":
+        return cls(
+            metric_a=data["metric_a"],
+            metric_b=data["metric_b"],
+            lag=int(data["lag"]),
+            r=float(data["r"]),
+            n=int(data["n"]),
+            p_value=float(data["p_value"]),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Matrix construction
+# ---------------------------------------------------------------------------
+
+
+def dense_matrix(
+    rows: Iterable[tuple[date, str, float]],
+    start: date,
+    days: int,
+    metrics: list[str],
+) -> np.ndarray:
+    """Lay ``(date, metric_key, value)`` rows out as a ``days × metrics`` array.
+
+    Rows outside ``[start, start + days)`` or for unknown metrics are
+    ignored; missing cells are NaN.
+    """
+    values = np.full((days, len(metrics)), np.nan)
+    column = {m: i for i, m in enumerate(metrics)}
+    for day, metric, value in rows:
+        offset = (day - start).days
+        col = column.get(metric)
+        if col is not None and 0 <= offset < days and value is not None:
+            values[offset, col] = float(value)
+    return values
+
+
+def shift_window(values: np.ndarray, start: date, new_start: date) -> np.ndarray:
+    """Slide a dense matrix so it starts at ``new_start`` (same length)."""
+    shift = (new_start - start).days
+    if shift == 0:
+        return values
+    out = np.full_like(values, np.nan)
+    days = values.shape[0]
+    if shift > 0 and shift < days:
+        out[: days - shift] = values[shift:]
+    elif shift < 0 and -shift < days:
+        out[-shift:] = values[: days + shift]
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+
+
+def pearson_all_pairs(values: np.ndarray, max_lag: int = MAX_LAG) -> tuple[np.ndarray, np.ndarray]:
+    """Pairwise-complete Pearson r for every metric pair at lags 0..max_lag.
+
+    Args:
+        values: ``days × metrics`` array with NaN for missing days.
+        max_lag: Largest forward lag applied to the second metric.
+
+    Returns:
+        ``(r, n)`` arrays of shape ``(max_lag + 1, M, M)``. ``r[l, i, j]``
+        correlates metric *i* on day *t* with metric *j* on day *t + l*;
+        it is NaN where fewer than ``MIN_PAIRED_POINTS`` pairs exist or a
+        series is constant. ``n`` holds the paired sample sizes.
+    """
+    days, n_metrics = values.shape
+    valid = ~np.isnan(values)
+    # Centre each column first — Pearson is shift-invariant and the raw
+    # sums below stay well-conditioned for large-valued metrics like steps.
+    col_mean = np.zeros(n_metrics)
+    counts = valid.sum(axis=0)
+    np.divide(np.where(valid, values, 0.0).sum(axis=0), counts, out=col_mean, where=counts > 0)
+    x = np.where(valid, values - col_mean, 0.0)
+    mx = valid.astype(float)
+
+    # Stack forward-shifted copies: y[l, t] = x[t + l], zero-masked past the end.
+    lags = max_lag + 1
+    y = np.zeros((lags, days, n_metrics))
+    my = np.zeros((lags, days, n_metrics))
+    for lag in range(lags):
+        if lag < days:
+            y[lag, : days - lag] = x[lag:]
+            my[lag, : days - lag] = mx[lag:]
+
+    n = np.einsum("ti,ltj->lij", mx, my)
+    sx = np.einsum("ti,ltj->lij", x, my)
+    sy = np.einsum("ti,ltj->lij", mx, y)
+    sxx = np.einsum("ti,ltj->lij", x * x, my)
+    syy = np.einsum("ti,ltj->lij", mx, y * y)
+    sxy = np.einsum("ti,ltj->lij", x, y)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+    eps = 1e-12
+    undefined = (n < MIN_PAIRED_POINTS) | (var_x <= eps) | (var_y <= eps)
+    r = np.where(undefined, np.nan, np.clip(r, -1.0, 1.0))
+    return r, n.round().astype(int)
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    """Continued fraction for the regularized incomplete beta (modified Lentz)."""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(log_front) * _betacf(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _betacf(b, a, 1.0 - x) / b
+
+
+def pearson_p_value(r: float, n: int) -> float:
+    """Two-sided p-value for a Pearson r from ``n`` pairs (Student t, n − 2 df)."""
+    df = n - 2
+    if df <= 0 or math.isnan(r):
+        return 1.0
+    if abs(r) >= 1.0:
+        return 0.0
+    t_sq = r * r * df / (1.0 - r * r)
+    return _betainc(df / 2.0, 0.5, df / (df + t_sq))
+
+
+def compute_cells(values: np.ndarray, metrics: list[str], max_lag: int = MAX_LAG) -> list[CorrelationCell]:
+    """Correlate every metric pair at every lag and return the defined cells.
+
+    Lag-0 cells are symmetric, so only ``a < b`` (by column order) is kept;
+    lagged cells are kept in both directions. Self-correlations are kept
+    only at lag ≥ 1 (autocorrelation).
+    """
+    r, n = pearson_all_pairs(values, max_lag)
+    cells: list[CorrelationCell] = []
+    lag_idx, i_idx, j_idx = np.nonzero(~np.isnan(r))
+    for lag, i, j in zip(lag_idx.tolist(), i_idx.tolist(), j_idx.tolist()):
+        if lag == 0 and i >= j:
+            continue
+        coeff = float(r[lag, i, j])
+        count = int(n[lag, i, j])
+        cells.append(
+            CorrelationCell(
+                metric_a=metrics[i],
+                metric_b=metrics[j],
+                lag=lag,
+                r=round(coeff, 4),
+                n=count,
+                p_value=round(pearson_p_value(coeff, count), 6),
+            )
+        )
+    return cells
+
+
+def pair_correlation(
+    values: np.ndarray, col_a: int, col_b: int, lag: int = 0
+) -> tuple[float | None, int, float | None]:
+    """Return ``(r, n, p_value)`` for one column pair of a dense matrix."""
+    sub = values[:, [col_a, col_b]]
+    r, n = pearson_all_pairs(sub, max_lag=lag)
+    coeff = r[lag, 0, 1]
+    count = int(n[lag, 0, 1])
+    if np.isnan(coeff):
+        return None, count, None
+    return round(float(coeff), 4), count, round(pearson_p_value(float(coeff), count), 6)
+
+
+# ---------------------------------------------------------------------------
+# Selection
+# ---------------------------------------------------------------------------
+
+
+def strongest_correlations(
+    cells: Iterable[CorrelationCell],
+    limit: int | None = None,
+    min_r: float = HIGHLIGHT_MIN_R,
+    min_n: int = HIGHLIGHT_MIN_N,
+    max_p: float = HIGHLIGHT_MAX_P,
+) -> list[CorrelationCell]:
+    """Pick the strongest significant lag per metric pair, strongest first.
+
+    Skips self-correlations and pairs that are related by construction
+    (``_TRIVIAL_PAIRS``).
+    """
+    best: dict[frozenset[str], CorrelationCell] = {}
+    for cell in cells:
+        if cell.metric_a == cell.metric_b:
+            continue
+        key = frozenset({cell.metric_a, cell.metric_b})
+        if key in _TRIVIAL_PAIRS:
+            continue
+        if abs(cell.r) < min_r or cell.n < min_n or cell.p_value > max_p:
+            continue
+        current = best.get(key)
+        if current is None or abs(cell.r) > abs(current.r):
+            best[key] = cell
+    ranked = sorted(best.values(), key=lambda c: abs(c.r), reverse=True)
+    return ranked[:limit] if limit is not None else ranked
+
+
+def window_dates(start: date, days: int) -> list[date]:
+    """Return the calendar dates covered by a dense matrix."""
+    return [start + timedelta(days=i) for i in range(days)]
@@ -9,14 +9,29 @@ a source priority hierarchy to determine which record to keep.
 
 Priority hierarchy (higher = more trusted):
 - Hardware sensors (Apple Health, Health Connect): 10
+- Wearable vendor clouds (Fitbit, Oura, Polar, Withings): 9
 - Third-party apps (Strava): 8
 - User manual input: 5
+
+Activity writers call :func:`supersede_duplicate_activities` after
+upserting ``unified_activities`` rows. It loads the user's activities
+around the touched window once, indexes them by interval, and points
+each duplicate at its winner through ``superseded_by``, so readers that
+span sources only scan rows where ``superseded_by IS NULL``.
 """
 
+import bisect
 import logging
-from datetime import datetime, timezone
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.health_data import UnifiedActivity
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,6 +50,10 @@ class SourceOfTruth:
     PRIORITY: dict[str, int] = {
         "apple_health": 10,
         "health_connect": 10,
+        "fitbit": 9,
+        "oura": 9,
+        "polar": 9,
+        "withings": 9,
         "strava": 8,
         "manual": 5,
     }
@@ -59,71 +78,34 @@ class SourceOfTruth:
         if not activities:
             return []
 
-        timed = [a for a in activities if a.get("start_time") is not None]
-        untimed = [a for a in activities if a.get("start_time") is None]
-
-        sorted_acts = sorted(timed, key=lambda x: x["start_time"])
+        timed: list[ActivityInterval] = []
+        untimed: list[dict[str, Any]] = []
+        for activity in activities:
+            interval = ActivityInterval.from_dict(activity, self.PRIORITY)
+            if interval is None:
+                untimed.append(activity)
+            else:
+                timed.append(interval)
 
-        merged: list[dict[str, Any]] = []
-        if not sorted_acts:
+        if not timed:
             return untimed
 
-        current = sorted_acts[0]
+        timed.sort(key=lambda interval: interval.start)
+        merged: list[dict[str, Any]] = []
+        current = timed[0]
 
-        for next_act in sorted_acts[1:]:
-            if self._is_overlap(current, next_act):
+        for next_act in timed[1:]:
+            if current.overlaps(next_act, self.OVERLAP_THRESHOLD):
                 current = self._pick_winner(current, next_act)
             else:
-                merged.append(current)
+                merged.append(current.ref)
                 current = next_act
 
-        merged.append(current)
+        merged.append(current.ref)
         merged.extend(untimed)
         return merged
 
-    def _is_overlap(self, a: dict[str, Any], b: dict[str, Any]) -> bool:
-        """Determine if two activities overlap by more than the threshold.
-
-        Computes the intersection of the two time intervals and compares
-        it against the shorter activity's duration. If the overlap ratio
-        exceeds ``OVERLAP_THRESHOLD``, the activities are considered
-        duplicates of the same real-world event.
-
-        Args:
-            a: First activity (must have 'start_time' and 'duration_seconds').
-            b: Second activity (must have 'start_time' and 'duration_seconds').
-
-        Returns:
-            True if the overlap ratio exceeds OVERLAP_THRESHOLD.
-        """
-        try:
-            start_a = self._parse_time(a["start_time"])
-            start_b = self._parse_time(b["start_time"])
-        except (ValueError, TypeError):
-            return False
-
-        dur_a = a.get("duration_seconds", 0)
-        dur_b = b.get("duration_seconds", 0)
-
-        if dur_a <= 0 or dur_b <= 0:
-            return False
-
-        end_a = start_a.timestamp() + dur_a
-        end_b = start_b.timestamp() + dur_b
-
-        overlap_start = max(start_a.timestamp(), start_b.timestamp())
-        overlap_end = min(end_a, end_b)
-        overlap_seconds = max(0, overlap_end - overlap_start)
-
-        if overlap_seconds == 0:
-            return False
-
-        shorter_duration = min(dur_a, dur_b)
-        overlap_ratio = overlap_seconds / shorter_duration
-
-        return overlap_ratio > self.OVERLAP_THRESHOLD
-
-    def _pick_winner(self, a: dict[str, Any], b: dict[str, Any]) -> dict[str, Any]:
+    def _pick_winner(self, a: "ActivityInterval", b: "ActivityInterval") -> "ActivityInterval":
         """Choose the higher-priority activity in a conflict.
 
         Compares the source priority of both activities. On a tie the
@@ -138,17 +120,14 @@ class SourceOfTruth:
             The activity with higher source priority. On tie, returns
             the first activity (preserving insertion order).
         """
-        priority_a = self.PRIORITY.get(a.get("source", ""), 0)
-        priority_b = self.PRIORITY.get(b.get("source", ""), 0)
-
-        winner = a if priority_a >= priority_b else b
+        winner = a if a.priority >= b.priority else b
         loser = b if winner is a else a
         logger.info(
             "Conflict resolved: kept '%s' (priority %d), discarded '%s' (priority %d)",
-            winner.get("source"),
-            max(priority_a, priority_b),
-            loser.get("source"),
-            min(priority_a, priority_b),
+            winner.source,
+            winner.priority,
+            loser.source,
+            loser.priority,
         )
         return winner
 
@@ -173,3 +152,171 @@ class SourceOfTruth:
         if dt.tzinfo is None:
             dt = dt.replace(tzinfo=timezone.utc)
         return dt
+
+
+@dataclass(slots=True)
+class ActivityInterval:
+    """An activity reduced to what overlap checks need, parsed once.
+
+    Attributes:
+        start: Start as a POSIX timestamp.
+        end: ``start`` plus the duration in seconds.
+        priority: Source priority from :attr:`SourceOfTruth.PRIORITY`.
+        source: Data source identifier.
+        ref: The row ID or dict this interval was built from.
+    """
+
+    start: float
+    end: float
+    priority: int
+    source: str
+    ref: Any
+
+    @classmethod
+    def from_dict(cls, activity: dict[str, Any], priorities: dict[str, int]) -> "ActivityInterval | None":
+        """Build from a normalized activity dict; None if it has no usable start time."""
+        try:
+            start = SourceOfTruth._parse_time(activity["start_time"]).timestamp()
+        except (KeyError, ValueError, TypeError, AttributeError):
+            return None
+        source = activity.get("source", "")
+        duration = activity.get("duration_seconds") or 0
+        return cls(start, start + duration, priorities.get(source, 0), source, activity)
+
+    def overlaps(self, other: "ActivityInterval", threshold: float) -> bool:
+        """True if the intersection exceeds ``threshold`` of the shorter activity.
+
+        Activities without a positive duration never count as duplicates.
+        """
+        shorter = min(self.end - self.start, other.end - other.start)
+        if shorter <= 0:
+            return False
+        intersection = min(self.end, other.end) - max(self.start, other.start)
+        return intersection > 0 and intersection / shorter > threshold
+
+
+class IntervalIndex:
+    """Intervals sorted by start, for overlap lookups.
+
+    Any interval overlapping ``[start, end)`` starts before ``end`` and no
+    earlier than ``start`` minus the longest interval held, so a lookup
+    bisects to that slice and only checks ends inside it.
+    """
+
+    def __init__(self) -> None:
+        self._starts: list[float] = []
+        self._intervals: list[ActivityInterval] = []
+        self._longest = 0.0
+
+    def add(self, interval: ActivityInterval) -> None:
+        position = bisect.bisect_right(self._starts, interval.start)
+        self._starts.insert(position, interval.start)
+        self._intervals.insert(position, interval)
+        self._longest = max(self._longest, interval.end - interval.start)
+
+    def overlapping(self, start: float, end: float) -> Iterator[ActivityInterval]:
+        """Yield held intervals that intersect ``[start, end)``."""
+        lo = bisect.bisect_left(self._starts, start - self._longest)
+        hi = bisect.bisect_left(self._starts, end)
+        for interval in self._intervals[lo:hi]:
+            if interval.end > start:
+                yield interval
+
+
+# Longest workout the write-time stage looks for overlaps across. Bounds
+# how far around the touched window activities are loaded.
+MAX_ACTIVITY_SPAN = timedelta(hours=24)
+
+
+async def supersede_duplicate_activities(
+    db: AsyncSession,
+    user_id: str,
+    start_times: Iterable[datetime | None],
+) -> int:
+    """Re-resolve cross-source duplicates around activities just written.
+
+    Loads the user's activities that could overlap any of ``start_times``
+    in one query, then walks them from the highest source priority down
+    (earlier start first on a tie): an activity that overlaps an already
+    kept one by more than :attr:`SourceOfTruth.OVERLAP_THRESHOLD` is
+    superseded by it, otherwise it is kept and added to the index. Only
+    rows whose ``superseded_by`` changes are updated, so a re-sync of
+    unchanged data writes nothing. Deleting a winner and calling this for
+    its start time promotes the next best duplicate.
+
+    Call after the rows are added or updated and before commit.
+
+    Args:
+        db: Async database session holding the writer's changes.
+        user_id: Owner of the activities.
+        start_times: Start times of the activities written or deleted.
+
+    Returns:
+        Number of rows whose ``superseded_by`` changed.
+    """
+    touched = [t if t.tzinfo else t.replace(tzinfo=timezone.utc) for t in start_times if isinstance(t, datetime)]
+    if not touched:
+        return 0
+    # Rows starting in [lo, hi) may have changed status; anything that can
+    # overlap one of them starts at most one span earlier.
+    lo, hi = min(touched) - MAX_ACTIVITY_SPAN, max(touched) + MAX_ACTIVITY_SPAN
+    await db.flush()
+    rows = (
+        await db.execute(
+            select(
+                UnifiedActivity.id,
+                UnifiedActivity.source,
+                UnifiedActivity.start_time,
+                UnifiedActivity.duration_seconds,
+                UnifiedActivity.superseded_by,
+            ).where(
+                UnifiedActivity.user_id == user_id,
+                UnifiedActivity.start_time >= lo - MAX_ACTIVITY_SPAN,
+                UnifiedActivity.start_time < hi,
+            )
+        )
+    ).all()
+
+    intervals: list[ActivityInterval] = []
+    current: dict[str, str | None] = {}
+    for row in rows:
+        start = row.start_time if row.start_time.tzinfo else row.start_time.replace(tzinfo=timezone.utc)
+        begin = start.timestamp()
+        priority = SourceOfTruth.PRIORITY.get(row.source, 0)
+        intervals.append(ActivityInterval(begin, begin + (row.duration_seconds or 0), priority, row.source, row.id))
+        current[row.id] = row.superseded_by
+
+    kept = IntervalIndex()
+    decided: dict[str, str | None] = {}
+    for interval in sorted(intervals, key=lambda i: (-i.priority, i.start, i.ref)):
+        winner = next(
+            (
+                k
+                for k in kept.overlapping(interval.start, interval.end)
+                if k.overlaps(interval, SourceOfTruth.OVERLAP_THRESHOLD)
+            ),
+            None,
+        )
+        if winner is None:
+            kept.add(interval)
+            decided[interval.ref] = None
+        else:
+            decided[interval.ref] = winner.ref
+
+    window = (lo.timestamp(), hi.timestamp())
+    changes: dict[str | None, list[str]] = {}
+    for interval in intervals:
+        if window[0] <= interval.start < window[1] and decided[interval.ref] != current[interval.ref]:
+            changes.setdefault(decided[interval.ref], []).append(interval.ref)
+
+    for target, ids in changes.items():
+        await db.execute(
+            update(UnifiedActivity)
+            .where(UnifiedActivity.id.in_(ids))
+            .values(superseded_by=target)
+            .execution_options(synchronize_session=False)
+        )
+    changed = sum(len(ids) for ids in changes.values())
+    if changed:
+        logger.info("Activity dedup for user '%s': %d rows re-resolved", user_id, changed)
+    return changed
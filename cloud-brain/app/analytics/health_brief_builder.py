@@ -18,6 +18,9 @@ Design decisions
 * **TDEE estimation** — uses the Harris-Benedict equation to estimate daily
   calorie burn from weight and activity level.  Returns ``None`` when weight
   is unavailable.
+* **Cohort loading** — :func:`build_briefs` assembles the same briefs for
+  hundreds of users at once with six set-based queries, for the daily
+  insight fan-out.  Both paths share the row conversion helpers below.
 * No health-score fetch — ``HealthScoreCache`` doesn't have the right shape
   for per-metric analysis, so it is intentionally excluded.
 """
@@ -27,7 +30,7 @@ from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta, timezone
 from typing import Any, Coroutine
 
-from sqlalchemy import select
+from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.daily_summary import DailySummary
@@ -247,6 +250,205 @@ def _dedup_by_source(rows: list) -> list:
     return sorted(by_date.values(), key=lambda r: r.date)
 
 
+# ---------------------------------------------------------------------------
+# Row conversion — shared by HealthBriefBuilder and build_briefs
+# ---------------------------------------------------------------------------
+
+# Map daily_summaries metric_type -> DailyMetricsRow attribute name
+_DAILY_METRIC_ATTR = {
+    "steps": "steps",
+    "active_calories": "active_calories",
+    "distance_meters": "distance_meters",
+    "flights_climbed": "flights_climbed",
+    "resting_heart_rate": "resting_heart_rate",
+    "hrv_ms": "hrv_ms",
+    "heart_rate_avg": "heart_rate_avg",
+    "vo2_max": "vo2_max",
+    "respiratory_rate": "respiratory_rate",
+    "oxygen_saturation": "oxygen_saturation",
+    "body_fat_percentage": "body_fat_percentage",
+}
+_SLEEP_TYPES = ("sleep_duration", "sleep_quality")
+_ACTIVITY_TYPES = ("active_calories", "exercise_minutes")
+_NUTRITION_TYPES = ("calories", "protein_grams", "carbs_grams", "fat_grams")
+_QUICK_LOG_LIMIT = 500
+_GOAL_LIMIT = 50
+_STREAK_LIMIT = 50
+
+
+def _date_key(d: Any) -> str:
+    return d.isoformat() if isinstance(d, date) else str(d)
+
+
+def _daily_rows(summaries: list) -> list[DailyMetricsRow]:
+    """Pivot EAV ``daily_summaries`` rows into one ``DailyMetricsRow`` per date."""
+    by_date: dict[str, DailyMetricsRow] = {}
+    for r in summaries:
+        attr = _DAILY_METRIC_ATTR.get(r.metric_type)
+        if attr is None:
+            continue
+        d = _date_key(r.date)
+        if d not in by_date:
+            by_date[d] = DailyMetricsRow(date=d)
+        setattr(by_date[d], attr, float(r.value))
+    return sorted(by_date.values(), key=lambda r: r.date)
+
+
+def _sleep_rows(summaries: list) -> list[SleepRow]:
+    """Pivot sleep summaries; ``sleep_duration`` is stored in minutes."""
+    by_date: dict[str, SleepRow] = {}
+    for r in summaries:
+        if r.metric_type not in _SLEEP_TYPES:
+            continue
+        d = _date_key(r.date)
+        if d not in by_date:
+            by_date[d] = SleepRow(date=d)
+        if r.metric_type == "sleep_duration":
+            by_date[d].hours = float(r.value) / 60.0
+        else:
+            by_date[d].quality_score = float(r.value)
+    return sorted(by_date.values(), key=lambda r: r.date)
+
+
+def _activity_rows(summaries: list) -> list[ActivityRow]:
+    """One simplified ``ActivityRow`` per date from active calories and exercise minutes."""
+    by_date: dict[str, ActivityRow] = {}
+    for r in summaries:
+        if r.metric_type not in _ACTIVITY_TYPES:
+            continue
+        d = _date_key(r.date)
+        if d not in by_date:
+            by_date[d] = ActivityRow(date=d, activity_type="daily_summary")
+        if r.metric_type == "active_calories":
+            by_date[d].calories = float(r.value)
+        else:
+            by_date[d].duration_seconds = float(r.value) * 60.0
+    return sorted(by_date.values(), key=lambda r: r.date)
+
+
+def _nutrition_rows(summaries: list) -> list[NutritionRow]:
+    """Pivot macro summaries into one ``NutritionRow`` per date."""
+    by_date: dict[str, NutritionRow] = {}
+    for r in summaries:
+        if r.metric_type not in _NUTRITION_TYPES:
+            continue
+        d = _date_key(r.date)
+        if d not in by_date:
+            by_date[d] = NutritionRow(date=d)
+        setattr(by_date[d], r.metric_type, float(r.value))
+    return sorted(by_date.values(), key=lambda r: r.date)
+
+
+def _weight_rows(summaries: list) -> list[WeightRow]:
+    rows = [
+        WeightRow(date=_date_key(r.date), weight_kg=float(r.value)) for r in summaries if r.metric_type == "weight_kg"
+    ]
+    return sorted(rows, key=lambda r: r.date)
+
+
+def _quick_log_row(r: Any) -> QuickLogRow:
+    return QuickLogRow(
+        metric_type=r.metric_type,
+        value=float(r.value) if r.value is not None else None,
+        text_value=(r.metadata_ or {}).get("text_value") if r.metadata_ else None,
+        data=r.metadata_ if isinstance(r.metadata_, dict) else {},
+        logged_at=r.recorded_at.isoformat() if r.recorded_at else "",
+    )
+
+
+def _goal_row(r: Any) -> GoalRow:
+    return GoalRow(
+        id=str(r.id),
+        metric=r.metric,
+        target_value=_float(r, "target_value") or 0.0,
+        period=str(r.period.value) if hasattr(r.period, "value") else str(r.period),
+        current_value=_float(r, "current_value"),
+        is_active=bool(r.is_active),
+        deadline=getattr(r, "deadline", None),
+    )
+
+
+def _streak_row(r: Any) -> StreakRow:
+    return StreakRow(
+        streak_type=r.streak_type,
+        current_count=int(r.current_count),
+        longest_count=int(r.longest_count),
+        last_activity_date=getattr(r, "last_activity_date", None),
+    )
+
+
+def _preferences_snapshot(prefs: Any) -> UserPreferencesSnapshot:
+    raw_goals = getattr(prefs, "goals", None)
+    goals_list: list[str] = []
+    if isinstance(raw_goals, list):
+        goals_list = [str(g) for g in raw_goals]
+
+    raw_layout = getattr(prefs, "dashboard_layout", None)
+    layout_dict: dict = raw_layout if isinstance(raw_layout, dict) else {}
+
+    return UserPreferencesSnapshot(
+        goals=goals_list,
+        dashboard_layout=layout_dict,
+        coach_persona=str(getattr(prefs, "coach_persona", "balanced") or "balanced"),
+        fitness_level=getattr(prefs, "fitness_level", None),
+        units_system=str(getattr(prefs, "units_system", "metric") or "metric"),
+        timezone=str(getattr(prefs, "timezone", "UTC") or "UTC"),
+    )
+
+
+def _integration_status(r: Any) -> IntegrationStatus:
+    return IntegrationStatus(
+        provider=r.provider,
+        is_active=bool(r.is_active),
+        last_synced_at=r.last_synced_at if isinstance(r.last_synced_at, datetime) else None,
+    )
+
+
+def _assemble_brief(
+    user_id: str,
+    daily: list[DailyMetricsRow],
+    sleep: list[SleepRow],
+    activities: list[ActivityRow],
+    nutrition: list[NutritionRow],
+    weight: list[WeightRow],
+    quick_logs: list[QuickLogRow],
+    goals: list[GoalRow],
+    streaks: list[StreakRow],
+    preferences: UserPreferencesSnapshot | None,
+    integrations: list[IntegrationStatus],
+) -> HealthBrief:
+    """Derive maturity and TDEE from the fetched rows and build the brief."""
+    # Data maturity: distinct calendar dates with *any* health data
+    all_dates = {r.date for r in daily} | {r.date for r in sleep}
+
+    # TDEE estimation using the most recent weight + 14-day avg active cals
+    latest_weight = next((r.weight_kg for r in reversed(weight) if r.weight_kg is not None), None)
+    avg_active_cals = _safe_mean(
+        [r.active_calories for r in daily[-_TDEE_ACTIVE_CAL_WINDOW:] if r.active_calories is not None]
+    )
+    estimated_tdee = HealthBriefBuilder._compute_tdee(
+        weight_kg=latest_weight,
+        avg_active_calories=avg_active_cals,
+    )
+
+    return HealthBrief(
+        user_id=user_id,
+        generated_at=datetime.now(timezone.utc),
+        daily_metrics=daily,
+        sleep_records=sleep,
+        activities=activities,
+        nutrition=nutrition,
+        weight=weight,
+        quick_logs=quick_logs,
+        goals=goals,
+        streaks=streaks,
+        integrations=integrations,
+        preferences=preferences or UserPreferencesSnapshot(),
+        data_maturity_days=len(all_dates),
+        estimated_tdee=estimated_tdee,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Builder
 # ---------------------------------------------------------------------------
@@ -306,37 +508,18 @@ class HealthBriefBuilder:
         preferences = await self._safe_fetch(self._fetch_preferences(), default=None)
         integrations = await self._safe_fetch(self._fetch_integrations())
 
-        prefs = preferences or UserPreferencesSnapshot()
-
-        # Data maturity: distinct calendar dates with *any* health data
-        all_dates = {r.date for r in daily} | {r.date for r in sleep}
-        data_maturity_days = len(all_dates)
-
-        # TDEE estimation using the most recent weight + 14-day avg active cals
-        latest_weight = next((r.weight_kg for r in reversed(weight) if r.weight_kg is not None), None)
-        avg_active_cals = _safe_mean(
-            [r.active_calories for r in daily[-_TDEE_ACTIVE_CAL_WINDOW:] if r.active_calories is not None]
-        )
-        estimated_tdee = self._compute_tdee(
-            weight_kg=latest_weight,
-            avg_active_calories=avg_active_cals,
-        )
-
-        return HealthBrief(
-            user_id=self.user_id,
-            generated_at=datetime.now(timezone.utc),
-            daily_metrics=daily,
-            sleep_records=sleep,
-            activities=activities,
-            nutrition=nutrition,
-            weight=weight,
-            quick_logs=quick_logs,
-            goals=goals,
-            streaks=streaks,
-            integrations=integrations,
-            preferences=prefs,
-            data_maturity_days=data_maturity_days,
-            estimated_tdee=estimated_tdee,
+        return _assemble_brief(
+            self.user_id,
+            daily,
+            sleep,
+            activities,
+            nutrition,
+            weight,
+            quick_logs,
+            goals,
+            streaks,
+            preferences,
+            integrations,
         )
 
     # ------------------------------------------------------------------
@@ -410,34 +593,7 @@ class HealthBriefBuilder:
                 DailySummary.date >= cutoff,
             )
         )
-        rows = result.scalars().all()
-
-        # Map metric_type -> DailyMetricsRow attribute name
-        _METRIC_ATTR = {
-            "steps": "steps",
-            "active_calories": "active_calories",
-            "distance_meters": "distance_meters",
-            "flights_climbed": "flights_climbed",
-            "resting_heart_rate": "resting_heart_rate",
-            "hrv_ms": "hrv_ms",
-            "heart_rate_avg": "heart_rate_avg",
-            "vo2_max": "vo2_max",
-            "respiratory_rate": "respiratory_rate",
-            "oxygen_saturation": "oxygen_saturation",
-            "body_fat_percentage": "body_fat_percentage",
-        }
-
-        by_date: dict[str, DailyMetricsRow] = {}
-        for r in rows:
-            d = r.date.isoformat() if isinstance(r.date, date) else str(r.date)
-            attr = _METRIC_ATTR.get(r.metric_type)
-            if attr is None:
-                continue
-            if d not in by_date:
-                by_date[d] = DailyMetricsRow(date=d)
-            setattr(by_date[d], attr, float(r.value))
-
-        return sorted(by_date.values(), key=lambda r: r.date)
+        return _daily_rows(result.scalars().all())
 
     async def _fetch_sleep_records(self) -> list[SleepRow]:
         """Fetch last 30 days of sleep data from daily_summaries.
@@ -450,22 +606,10 @@ class HealthBriefBuilder:
             select(DailySummary).where(
                 DailySummary.user_id == self.user_id,
                 DailySummary.date >= cutoff,
-                DailySummary.metric_type.in_(["sleep_duration", "sleep_quality"]),
+                DailySummary.metric_type.in_(_SLEEP_TYPES),
             )
         )
-        rows = result.scalars().all()
-
-        by_date: dict[str, SleepRow] = {}
-        for r in rows:
-            d = r.date.isoformat() if isinstance(r.date, date) else str(r.date)
-            if d not in by_date:
-                by_date[d] = SleepRow(date=d)
-            if r.metric_type == "sleep_duration":
-                by_date[d].hours = float(r.value) / 60.0
-            elif r.metric_type == "sleep_quality":
-                by_date[d].quality_score = float(r.value)
-
-        return sorted(by_date.values(), key=lambda r: r.date)
+        return _sleep_rows(result.scalars().all())
 
     async def _fetch_activities(self) -> list[ActivityRow]:
         """Fetch last 30 days of activity data from daily_summaries.
@@ -478,22 +622,10 @@ class HealthBriefBuilder:
             select(DailySummary).where(
                 DailySummary.user_id == self.user_id,
                 DailySummary.date >= cutoff,
-                DailySummary.metric_type.in_(["active_calories", "exercise_minutes"]),
+                DailySummary.metric_type.in_(_ACTIVITY_TYPES),
             )
         )
-        rows = result.scalars().all()
-
-        by_date: dict[str, ActivityRow] = {}
-        for r in rows:
-            d = r.date.isoformat() if isinstance(r.date, date) else str(r.date)
-            if d not in by_date:
-                by_date[d] = ActivityRow(date=d, activity_type="daily_summary")
-            if r.metric_type == "active_calories":
-                by_date[d].calories = float(r.value)
-            elif r.metric_type == "exercise_minutes":
-                by_date[d].duration_seconds = float(r.value) * 60.0
-
-        return sorted(by_date.values(), key=lambda r: r.date)
+        return _activity_rows(result.scalars().all())
 
     async def _fetch_nutrition(self) -> list[NutritionRow]:
         """Fetch last 30 days of nutrition data from daily_summaries.
@@ -506,28 +638,10 @@ class HealthBriefBuilder:
             select(DailySummary).where(
                 DailySummary.user_id == self.user_id,
                 DailySummary.date >= cutoff,
-                DailySummary.metric_type.in_(["calories", "protein_grams", "carbs_grams", "fat_grams"]),
+                DailySummary.metric_type.in_(_NUTRITION_TYPES),
             )
         )
-        rows = result.scalars().all()
-
-        _METRIC_ATTR = {
-            "calories": "calories",
-            "protein_grams": "protein_grams",
-            "carbs_grams": "carbs_grams",
-            "fat_grams": "fat_grams",
-        }
-
-        by_date: dict[str, NutritionRow] = {}
-        for r in rows:
-            d = r.date.isoformat() if isinstance(r.date, date) else str(r.date)
-            if d not in by_date:
-                by_date[d] = NutritionRow(date=d)
-            attr = _METRIC_ATTR.get(r.metric_type)
-            if attr is not None:
-                setattr(by_date[d], attr, float(r.value))
-
-        return sorted(by_date.values(), key=lambda r: r.date)
+        return _nutrition_rows(result.scalars().all())
 
     async def _fetch_weight(self) -> list[WeightRow]:
         """Fetch last 90 days of weight data from daily_summaries."""
@@ -539,45 +653,21 @@ class HealthBriefBuilder:
                 DailySummary.metric_type == "weight_kg",
             )
         )
-        rows = result.scalars().all()
-        weight_rows = [
-            WeightRow(
-                date=r.date.isoformat() if isinstance(r.date, date) else str(r.date),
-                weight_kg=float(r.value),
-            )
-            for r in rows
-        ]
-        return sorted(weight_rows, key=lambda r: r.date)
+        return _weight_rows(result.scalars().all())
 
     async def _fetch_quick_logs(self) -> list[QuickLogRow]:
         """Fetch last 14 days of quick-log entries from health_events."""
-        cutoff = datetime(
-            self.target_date.year,
-            self.target_date.month,
-            self.target_date.day,
-            tzinfo=timezone.utc,
-        ) - timedelta(days=_LOOKBACK_QUICK_LOGS)
         result = await self.db.execute(
             select(HealthEvent)
             .where(
                 HealthEvent.user_id == self.user_id,
-                HealthEvent.recorded_at >= cutoff,
+                HealthEvent.recorded_at >= _quick_log_cutoff(self.target_date),
                 HealthEvent.deleted_at.is_(None),
             )
             .order_by(HealthEvent.recorded_at.desc())
-            .limit(500)
+            .limit(_QUICK_LOG_LIMIT)
         )
-        rows = result.scalars().all()
-        return [
-            QuickLogRow(
-                metric_type=r.metric_type,
-                value=float(r.value) if r.value is not None else None,
-                text_value=(r.metadata_ or {}).get("text_value") if r.metadata_ else None,
-                data=r.metadata_ if isinstance(r.metadata_, dict) else {},
-                logged_at=r.recorded_at.isoformat() if r.recorded_at else "",
-            )
-            for r in rows
-        ]
+        return [_quick_log_row(r) for r in result.scalars().all()]
 
     async def _fetch_goals(self) -> list[GoalRow]:
         """Fetch all active user goals."""
@@ -587,59 +677,22 @@ class HealthBriefBuilder:
                 UserGoal.user_id == self.user_id,
                 UserGoal.is_active.is_(True),
             )
-            .limit(50)
+            .limit(_GOAL_LIMIT)
         )
-        rows = result.scalars().all()
-        return [
-            GoalRow(
-                id=str(r.id),
-                metric=r.metric,
-                target_value=_float(r, "target_value") or 0.0,
-                period=str(r.period.value) if hasattr(r.period, "value") else str(r.period),
-                current_value=_float(r, "current_value"),
-                is_active=bool(r.is_active),
-                deadline=getattr(r, "deadline", None),
-            )
-            for r in rows
-        ]
+        return [_goal_row(r) for r in result.scalars().all()]
 
     async def _fetch_streaks(self) -> list[StreakRow]:
         """Fetch all streak counters for the user."""
-        result = await self.db.execute(select(UserStreak).where(UserStreak.user_id == self.user_id).limit(50))
-        rows = result.scalars().all()
-        return [
-            StreakRow(
-                streak_type=r.streak_type,
-                current_count=int(r.current_count),
-                longest_count=int(r.longest_count),
-                last_activity_date=getattr(r, "last_activity_date", None),
-            )
-            for r in rows
-        ]
+        result = await self.db.execute(
+            select(UserStreak).where(UserStreak.user_id == self.user_id).limit(_STREAK_LIMIT)
+        )
+        return [_streak_row(r) for r in result.scalars().all()]
 
     async def _fetch_preferences(self) -> UserPreferencesSnapshot | None:
         """Fetch user preferences and return a snapshot."""
         result = await self.db.execute(select(UserPreferences).where(UserPreferences.user_id == self.user_id))
         prefs = result.scalar_one_or_none()
-        if prefs is None:
-            return None
-
-        raw_goals = getattr(prefs, "goals", None)
-        goals_list: list[str] = []
-        if isinstance(raw_goals, list):
-            goals_list = [str(g) for g in raw_goals]
-
-        raw_layout = getattr(prefs, "dashboard_layout", None)
-        layout_dict: dict = raw_layout if isinstance(raw_layout, dict) else {}
-
-        return UserPreferencesSnapshot(
-            goals=goals_list,
-            dashboard_layout=layout_dict,
-            coach_persona=str(getattr(prefs, "coach_persona", "balanced") or "balanced"),
-            fitness_level=getattr(prefs, "fitness_level", None),
-            units_system=str(getattr(prefs, "units_system", "metric") or "metric"),
-            timezone=str(getattr(prefs, "timezone", "UTC") or "UTC"),
-        )
+        return _preferences_snapshot(prefs) if prefs is not None else None
 
     async def _fetch_integrations(self) -> list[IntegrationStatus]:
         """Fetch all active integrations with sync timestamps."""
@@ -649,12 +702,143 @@ class HealthBriefBuilder:
                 Integration.is_active.is_(True),
             )
         )
-        rows = result.scalars().all()
-        return [
-            IntegrationStatus(
-                provider=r.provider,
-                is_active=bool(r.is_active),
-                last_synced_at=r.last_synced_at if isinstance(r.last_synced_at, datetime) else None,
-            )
-            for r in rows
-        ]
+        return [_integration_status(r) for r in result.scalars().all()]
+
+
+def _quick_log_cutoff(target_date: date) -> datetime:
+    midnight = datetime(target_date.year, target_date.month, target_date.day, tzinfo=timezone.utc)
+    return midnight - timedelta(days=_LOOKBACK_QUICK_LOGS)
+
+
+# ---------------------------------------------------------------------------
+# Cohort loading
+# ---------------------------------------------------------------------------
+
+
+async def _cohort_rows(db: AsyncSession, stmt: Any, what: str, scalars: bool = False) -> list:
+    """Run one cohort query, returning ``[]`` on failure like ``_safe_fetch``."""
+    try:
+        result = await db.execute(stmt)
+        return list(result.scalars().all() if scalars else result.all())
+    except Exception as exc:
+        logger.warning("build_briefs: %s fetch failed — %s: %s", what, type(exc).__name__, exc)
+        return []
+
+
+def _group(rows: list, key: str = "user_id") -> dict[str, list]:
+    grouped: dict[str, list] = {}
+    for row in rows:
+        grouped.setdefault(str(getattr(row, key)), []).append(row)
+    return grouped
+
+
+async def build_briefs(
+    db: AsyncSession,
+    user_ids: list[str],
+    target_date: date | None = None,
+) -> dict[str, HealthBrief]:
+    """Build the :class:`HealthBrief` of every user in a cohort.
+
+    Produces the same briefs as ``HealthBriefBuilder(user_id, db).build()``
+    for each user, but with six set-based queries for the whole cohort
+    instead of ten per user: one ``daily_summaries`` scan covering the
+    daily, sleep, activity, nutrition and weight windows, one windowed
+    ``health_events`` query capped at 500 rows per user, and one ``IN``
+    query each for goals, streaks, preferences and integrations.
+
+    Args:
+        db: An async SQLAlchemy session.
+        user_ids: Users to load. Duplicates are ignored.
+        target_date: Reference date for the lookback windows. Defaults to today.
+
+    Returns:
+        Mapping of user ID to brief, in ``user_ids`` order.
+    """
+    user_ids = list(dict.fromkeys(str(uid) for uid in user_ids))
+    if not user_ids:
+        return {}
+    target_date = target_date or date.today()
+    daily_cutoff = target_date - timedelta(days=_LOOKBACK_DAILY)
+
+    summaries = _group(
+        await _cohort_rows(
+            db,
+            select(DailySummary.user_id, DailySummary.date, DailySummary.metric_type, DailySummary.value).where(
+                DailySummary.user_id.in_(user_ids),
+                DailySummary.date >= target_date - timedelta(days=_LOOKBACK_WEIGHT),
+                or_(DailySummary.metric_type == "weight_kg", DailySummary.date >= daily_cutoff),
+            ),
+            "daily_summaries",
+        )
+    )
+
+    recent = (
+        select(
+            HealthEvent.user_id,
+            HealthEvent.metric_type,
+            HealthEvent.value,
+            HealthEvent.metadata_.label("metadata_"),
+            HealthEvent.recorded_at,
+            func.row_number()
+            .over(partition_by=HealthEvent.user_id, order_by=HealthEvent.recorded_at.desc())
+            .label("recency"),
+        )
+        .where(
+            HealthEvent.user_id.in_(user_ids),
+            HealthEvent.recorded_at >= _quick_log_cutoff(target_date),
+            HealthEvent.deleted_at.is_(None),
+        )
+        .subquery()
+    )
+    quick_logs = _group(
+        await _cohort_rows(
+            db,
+            select(recent).where(recent.c.recency <= _QUICK_LOG_LIMIT).order_by(recent.c.user_id, recent.c.recency),
+            "health_events",
+        )
+    )
+
+    goals = _group(
+        await _cohort_rows(
+            db,
+            select(UserGoal).where(UserGoal.user_id.in_(user_ids), UserGoal.is_active.is_(True)),
+            "user_goals",
+            scalars=True,
+        )
+    )
+    streaks = _group(
+        await _cohort_rows(db, select(UserStreak).where(UserStreak.user_id.in_(user_ids)), "user_streaks", scalars=True)
+    )
+    preferences = _group(
+        await _cohort_rows(
+            db, select(UserPreferences).where(UserPreferences.user_id.in_(user_ids)), "user_preferences", scalars=True
+        )
+    )
+    integrations = _group(
+        await _cohort_rows(
+            db,
+            select(Integration).where(Integration.user_id.in_(user_ids), Integration.is_active.is_(True)),
+            "integrations",
+            scalars=True,
+        )
+    )
+
+    briefs: dict[str, HealthBrief] = {}
+    for uid in user_ids:
+        rows = summaries.get(uid, [])
+        window = [r for r in rows if r.date >= daily_cutoff]
+        prefs = preferences.get(uid)
+        briefs[uid] = _assemble_brief(
+            uid,
+            daily=_daily_rows(window),
+            sleep=_sleep_rows(window),
+            activities=_activity_rows(window),
+            nutrition=_nutrition_rows(window),
+            weight=_weight_rows(rows),
+            quick_logs=[_quick_log_row(r) for r in quick_logs.get(uid, [])],
+            goals=[_goal_row(r) for r in goals.get(uid, [])[:_GOAL_LIMIT]],
+            streaks=[_streak_row(r) for r in streaks.get(uid, [])[:_STREAK_LIMIT]],
+            preferences=_preferences_snapshot(prefs[0]) if prefs else None,
+            integrations=[_integration_status(r) for r in integrations.get(uid, [])],
+        )
+    return briefs
@@ -182,6 +182,7 @@ class InsightCardWriter:
             # (which requires an object top-level) — rely on prompt discipline
             # for format and disable reasoning to guarantee content is emitted.
             reasoning={"effort": "none"},
+            cache="insight_cards",
         )
 
         raw = (response.choices[0].message.content or "").strip()
@@ -30,6 +30,7 @@ from app.analytics.health_brief_builder import HealthBrief
 from app.analytics.trend_detector import TrendDetector
 from app.analytics.goal_tracker import GoalTracker
 from app.analytics.correlation_analyzer import CorrelationAnalyzer
+from app.analytics.correlation_matrix import CorrelationCell, strongest_correlations
 from app.analytics.user_focus_profile import UserFocusProfileBuilder
 
 logger = logging.getLogger(__name__)
@@ -45,6 +46,36 @@ _RECOVERY_PEAK_HRV_BOOST = 0.15  # HRV boost threshold for recovery peak (15%)
 _WEEKEND_GAP_THRESHOLD = 0.60  # Weekend rate must be < weekday rate * this to fire
 _OVERTRAINING_CONSECUTIVE_DAYS = 5  # Min consecutive workout days to trigger overtraining check
 
+# Category A / C metric sets (order matters: it is the order signals are emitted in)
+TREND_DAILY_METRICS = (
+    "steps",
+    "active_calories",
+    "distance_meters",
+    "resting_heart_rate",
+    "hrv_ms",
+    "heart_rate_avg",
+    "vo2_max",
+    "respiratory_rate",
+    "oxygen_saturation",
+    "body_fat_percentage",
+    "flights_climbed",
+)
+ANOMALY_DAILY_METRICS = (
+    "resting_heart_rate",
+    "hrv_ms",
+    "steps",
+    "active_calories",
+    "heart_rate_avg",
+    "vo2_max",
+    "respiratory_rate",
+    "oxygen_saturation",
+    "body_fat_percentage",
+)
+TREND_MIN_POINTS = 14  # Non-null values a metric needs before a trend is reported
+ANOMALY_MIN_BASELINE = 14  # Historical values needed for a z-score
+ANOMALY_Z_THRESHOLD = 2.0
+_INVERTED_METRICS = {"resting_heart_rate", "body_fat_percentage"}  # Metrics where "up" is bad
+
 
 # ---------------------------------------------------------------------------
 # InsightSignal dataclass
@@ -78,6 +109,105 @@ class InsightSignal:
     data_payload: dict = field(default_factory=dict)
 
 
+# ---------------------------------------------------------------------------
+# Signal builders — shared with app.analytics.cohort_signals
+# ---------------------------------------------------------------------------
+
+
+def trend_signal(metric: str, result: dict[str, Any]) -> InsightSignal | None:
+    """Turn a :meth:`TrendDetector.detect_trend` result into a category A signal.
+
+    Returns ``None`` for stable or insufficient data.
+    """
+    if result["trend"] == "insufficient_data":
+        return None
+
+    direction = result["trend"]
+    pct = abs(result.get("percent_change", 0))
+
+    # For inverted metrics, swap up/down for severity classification
+    is_bad_direction = (direction == "down" and metric not in _INVERTED_METRICS) or (
+        direction == "up" and metric in _INVERTED_METRICS
+    )
+
+    if is_bad_direction:
+        if pct > 30:
+            severity = 4
+        elif pct > 15:
+            severity = 3
+        else:
+            severity = 2
+        return InsightSignal(
+            signal_type="trend_decline",
+            category="A",
+            metrics=[metric],
+            values={
+                "recent_avg": result["recent_avg"],
+                "previous_avg": result["previous_avg"],
+                "pct_change": -pct,
+            },
+            severity=severity,
+            actionable=True,
+            focus_relevant=False,
+            title_hint=f"{metric.replace('_', ' ').title()} declining",
+            data_payload={
+                "metric": metric,
+                "recent_avg": result["recent_avg"],
+                "pct_change": -pct,
+            },
+        )
+    if (direction == "up" and metric not in _INVERTED_METRICS) or (direction == "down" and metric in _INVERTED_METRICS):
+        return InsightSignal(
+            signal_type="trend_improvement",
+            category="A",
+            metrics=[metric],
+            values={
+                "recent_avg": result["recent_avg"],
+                "previous_avg": result["previous_avg"],
+                "pct_change": pct,
+            },
+            severity=2,
+            actionable=False,
+            focus_relevant=False,
+            title_hint=f"{metric.replace('_', ' ').title()} improving",
+            data_payload={
+                "metric": metric,
+                "recent_avg": result["recent_avg"],
+                "pct_change": pct,
+            },
+        )
+    return None
+
+
+def anomaly_signal(metric: str, current: float, mean: float, deviation: float) -> InsightSignal | None:
+    """Build a category C z-score signal, or ``None`` below the threshold."""
+    if deviation < ANOMALY_Z_THRESHOLD:
+        return None
+    severity = 5 if deviation >= 3.0 else 3
+    direction = "high" if current > mean else "low"
+    return InsightSignal(
+        signal_type="anomaly",
+        category="C",
+        metrics=[metric],
+        values={
+            "current": round(current, 2),
+            "baseline_mean": round(mean, 2),
+            "deviation": round(deviation, 2),
+            "direction": direction,
+        },
+        severity=severity,
+        actionable=True,
+        focus_relevant=False,
+        title_hint=f"Unusual {metric.replace('_', ' ')}",
+        data_payload={
+            "metric": metric,
+            "current": round(current, 2),
+            "baseline_mean": round(mean, 2),
+            "direction": direction,
+        },
+    )
+
+
 # ---------------------------------------------------------------------------
 # Detector
 # ---------------------------------------------------------------------------
@@ -90,10 +220,28 @@ class InsightSignalDetector:
     ----------
     brief:
         A fully assembled :class:`~app.analytics.health_brief_builder.HealthBrief`.
+    correlations:
+        Precomputed correlation cells from the correlation store. When
+        given, category D reads them instead of correlating the brief's
+        series pair by pair.
+    trends, anomalies:
+        Category A signals and category C z-score signals already computed
+        for this brief by :func:`app.analytics.cohort_signals.detect_cohort_signals`.
+        When given, the matching per-user loops are skipped; the weight-spike
+        rule of category C still runs here.
     """
 
-    def __init__(self, brief: HealthBrief) -> None:
+    def __init__(
+        self,
+        brief: HealthBrief,
+        correlations: list[CorrelationCell] | None = None,
+        trends: list[InsightSignal] | None = None,
+        anomalies: list[InsightSignal] | None = None,
+    ) -> None:
         self.brief = brief
+        self.correlations = correlations
+        self.trends = trends
+        self.anomalies = anomalies
         self._focus = UserFocusProfileBuilder(
             goals=brief.preferences.goals,
             dashboard_layout=brief.preferences.dashboard_layout,
@@ -141,25 +289,15 @@ class InsightSignalDetector:
 
     def _detect_category_a(self) -> list[InsightSignal]:
         """Detect improving or declining trends across 15 health metrics."""
+        if self.trends is not None:
+            return list(self.trends)
         signals: list[InsightSignal] = []
         detector = TrendDetector()
 
         metric_series: dict[str, list[float]] = {}
 
         for row in self.brief.daily_metrics:
-            for attr in (
-                "steps",
-                "active_calories",
-                "distance_meters",
-                "resting_heart_rate",
-                "hrv_ms",
-                "heart_rate_avg",
-                "vo2_max",
-                "respiratory_rate",
-                "oxygen_saturation",
-                "body_fat_percentage",
-                "flights_climbed",
-            ):
+            for attr in TREND_DAILY_METRICS:
                 v = getattr(row, attr, None)
                 if v is not None:
                     metric_series.setdefault(attr, []).append(v)
@@ -178,76 +316,12 @@ class InsightSignalDetector:
             if row.calories is not None:
                 metric_series.setdefault("calorie_intake", []).append(row.calories)
 
-        # Metrics where "up" is bad (higher value = worse)
-        inverted_metrics = {"resting_heart_rate", "body_fat_percentage"}
-
         for metric, values in metric_series.items():
-            if len(values) < 14:
+            if len(values) < TREND_MIN_POINTS:
                 continue
-            result = detector.detect_trend(values)
-            if result["trend"] == "insufficient_data":
-                continue
-
-            direction = result["trend"]
-            pct = abs(result.get("percent_change", 0))
-
-            # For inverted metrics, swap up/down for severity classification
-            is_bad_direction = (direction == "down" and metric not in inverted_metrics) or (
-                direction == "up" and metric in inverted_metrics
-            )
-
-            if is_bad_direction:
-                if pct > 30:
-                    severity = 4
-                elif pct > 15:
-                    severity = 3
-                else:
-                    severity = 2
-                signals.append(
-                    InsightSignal(
-                        signal_type="trend_decline",
-                        category="A",
-                        metrics=[metric],
-                        values={
-                            "recent_avg": result["recent_avg"],
-                            "previous_avg": result["previous_avg"],
-                            "pct_change": -pct,
-                        },
-                        severity=severity,
-                        actionable=True,
-                        focus_relevant=False,
-                        title_hint=f"{metric.replace('_', ' ').title()} declining",
-                        data_payload={
-                            "metric": metric,
-                            "recent_avg": result["recent_avg"],
-                            "pct_change": -pct,
-                        },
-                    )
-                )
-            elif (direction == "up" and metric not in inverted_metrics) or (
-                direction == "down" and metric in inverted_metrics
-            ):
-                signals.append(
-                    InsightSignal(
-                        signal_type="trend_improvement",
-                        category="A",
-                        metrics=[metric],
-                        values={
-                            "recent_avg": result["recent_avg"],
-                            "previous_avg": result["previous_avg"],
-                            "pct_change": pct,
-                        },
-                        severity=2,
-                        actionable=False,
-                        focus_relevant=False,
-                        title_hint=f"{metric.replace('_', ' ').title()} improving",
-                        data_payload={
-                            "metric": metric,
-                            "recent_avg": result["recent_avg"],
-                            "pct_change": pct,
-                        },
-                    )
-                )
+            signal = trend_signal(metric, detector.detect_trend(values))
+            if signal:
+                signals.append(signal)
 
         return signals
 
@@ -492,38 +566,11 @@ class InsightSignalDetector:
 
     def _detect_category_c(self) -> list[InsightSignal]:
         """Detect anomalous metric values using z-score against 14-day baseline."""
-        signals: list[InsightSignal] = []
         today = self.brief.generated_at.date().isoformat()
-
-        daily_metric_names = [
-            "resting_heart_rate",
-            "hrv_ms",
-            "steps",
-            "active_calories",
-            "heart_rate_avg",
-            "vo2_max",
-            "respiratory_rate",
-            "oxygen_saturation",
-            "body_fat_percentage",
-        ]
-        for metric in daily_metric_names:
-            by_date = {r.date: getattr(r, metric) for r in self.brief.daily_metrics if getattr(r, metric) is not None}
-            signal = self._compute_anomaly_signal(metric, by_date, today)
-            if signal:
-                signals.append(signal)
-
-        # Sleep anomalies
-        sleep_hours_by_date = {r.date: r.hours for r in self.brief.sleep_records if r.hours is not None}
-        s = self._compute_anomaly_signal("sleep_hours", sleep_hours_by_date, today)
-        if s:
-            signals.append(s)
-
-        sleep_quality_by_date = {
-            r.date: r.quality_score for r in self.brief.sleep_records if r.quality_score is not None
-        }
-        s = self._compute_anomaly_signal("sleep_quality", sleep_quality_by_date, today)
-        if s:
-            signals.append(s)
+        if self.anomalies is not None:
+            signals = list(self.anomalies)
+        else:
+            signals = self._zscore_anomalies(today)
 
         # Weight spike (special rule: ≥2 kg from 7-day average)
         weight_by_date = {r.date: r.weight_kg for r in self.brief.weight if r.weight_kg is not None}
@@ -557,13 +604,36 @@ class InsightSignalDetector:
 
         return signals
 
+    def _zscore_anomalies(self, today: str) -> list[InsightSignal]:
+        """Z-score anomalies for the daily metrics, then sleep hours and quality."""
+        signals: list[InsightSignal] = []
+        for metric in ANOMALY_DAILY_METRICS:
+            by_date = {r.date: getattr(r, metric) for r in self.brief.daily_metrics if getattr(r, metric) is not None}
+            signal = self._compute_anomaly_signal(metric, by_date, today)
+            if signal:
+                signals.append(signal)
+
+        # Sleep anomalies
+        sleep_hours_by_date = {r.date: r.hours for r in self.brief.sleep_records if r.hours is not None}
+        s = self._compute_anomaly_signal("sleep_hours", sleep_hours_by_date, today)
+        if s:
+            signals.append(s)
+
+        sleep_quality_by_date = {
+            r.date: r.quality_score for r in self.brief.sleep_records if r.quality_score is not None
+        }
+        s = self._compute_anomaly_signal("sleep_quality", sleep_quality_by_date, today)
+        if s:
+            signals.append(s)
+        return signals
+
     def _compute_anomaly_signal(self, metric: str, date_values: dict, today: str) -> InsightSignal | None:
         """Compute a z-score anomaly signal, or return None if no anomaly."""
         current = date_values.get(today)
         if current is None:
             return None
         historical = [v for d, v in date_values.items() if d != today]
-        if len(historical) < 14:
+        if len(historical) < ANOMALY_MIN_BASELINE:
             return None
         mean = sum(historical) / len(historical)
         variance = sum((v - mean) ** 2 for v in historical) / len(historical)
@@ -572,38 +642,25 @@ class InsightSignalDetector:
             deviation = 0.0 if current == mean else float("inf")
         else:
             deviation = abs(current - mean) / stddev
-        if deviation < 2.0:
-            return None
-        severity = 5 if deviation >= 3.0 else 3
-        direction = "high" if current > mean else "low"
-        return InsightSignal(
-            signal_type="anomaly",
-            category="C",
-            metrics=[metric],
-            values={
-                "current": round(current, 2),
-                "baseline_mean": round(mean, 2),
-                "deviation": round(deviation, 2),
-                "direction": direction,
-            },
-            severity=severity,
-            actionable=True,
-            focus_relevant=False,
-            title_hint=f"Unusual {metric.replace('_', ' ')}",
-            data_payload={
-                "metric": metric,
-                "current": round(current, 2),
-                "baseline_mean": round(mean, 2),
-                "direction": direction,
-            },
-        )
+        return anomaly_signal(metric, current, mean, deviation)
 
     # ------------------------------------------------------------------
     # Category D — Correlations
     # ------------------------------------------------------------------
 
     def _detect_category_d(self) -> list[InsightSignal]:
-        """Detect cross-metric correlations across 14 defined pairs."""
+        """Detect cross-metric correlations.
+
+        Uses the precomputed all-pairs, multi-lag cells when available
+        (strongest significant lag per pair), otherwise correlates the 14
+        defined pairs from the brief.
+        """
+        if self.correlations is not None:
+            return [
+                self._correlation_signal(c.metric_a, c.metric_b, c.r, c.lag)
+                for c in strongest_correlations(self.correlations)
+            ]
+
         signals: list[InsightSignal] = []
         analyzer = CorrelationAnalyzer()
 
@@ -646,30 +703,32 @@ class InsightSignalDetector:
                 score = abs(result.get("score", 0.0))
                 if score < 0.4:
                     continue
-                severity = 3 if score > 0.7 else 2
-                signals.append(
-                    InsightSignal(
-                        signal_type="correlation_discovery",
-                        category="D",
-                        metrics=[x_name, y_name],
-                        values={"correlation": round(result["score"], 3), "lag_days": lag},
-                        severity=severity,
-                        actionable=False,
-                        focus_relevant=False,
-                        title_hint=f"{x_name.replace('_', ' ')} linked to {y_name.replace('_', ' ')}",
-                        data_payload={
-                            "x": x_name,
-                            "y": y_name,
-                            "r": round(result["score"], 3),
-                            "lag_days": lag,
-                        },
-                    )
-                )
+                signals.append(self._correlation_signal(x_name, y_name, result["score"], lag))
             except Exception as exc:  # noqa: BLE001
                 logger.debug("Correlation pair (%s, %s) failed: %s", x_name, y_name, exc)
 
         return signals
 
+    @staticmethod
+    def _correlation_signal(x_name: str, y_name: str, r: float, lag: int) -> InsightSignal:
+        """Build a category D ``correlation_discovery`` signal."""
+        return InsightSignal(
+            signal_type="correlation_discovery",
+            category="D",
+            metrics=[x_name, y_name],
+            values={"correlation": round(r, 3), "lag_days": lag},
+            severity=3 if abs(r) > 0.7 else 2,
+            actionable=False,
+            focus_relevant=False,
+            title_hint=f"{x_name.replace('_', ' ')} linked to {y_name.replace('_', ' ')}",
+            data_payload={
+                "x": x_name,
+                "y": y_name,
+                "r": round(r, 3),
+                "lag_days": lag,
+            },
+        )
+
     def _align_with_lag(self, x_map: dict, y_map: dict, lag: int) -> tuple[list[float], list[float]]:
         """Align two date-keyed dicts with an optional forward lag."""
         if lag == 0:
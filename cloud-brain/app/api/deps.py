@@ -1,23 +1,27 @@
 """
 Zuralog Cloud Brain — Shared API Dependencies.
 
-FastAPI dependencies for authentication, authorization, and rate limiting.
-``get_authenticated_user_id`` is the canonical dependency for extracting a
-verified user ID — use it in route handlers and as the key source for
-the ``@cached`` decorator's ``key_params``.
+FastAPI dependencies for authentication, authorization, rate limiting and
+conditional GETs. ``get_authenticated_user_id`` is the canonical dependency
+for extracting a verified user ID — use it in route handlers and as the key
+source for the ``@cached`` decorator's ``key_params``.
 """
 
 import logging
+from typing import Literal
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.user import SubscriptionTier, User
+from app.services import data_version
 from app.services.auth_service import AuthService
 from app.services.rate_limiter import RateLimiter
+from app.services.telemetry import CONDITIONAL_GETS
+from app.utils.user_date import get_user_timezone, local_date_in
 
 logger = logging.getLogger(__name__)
 
@@ -144,6 +148,80 @@ def require_tier(min_tier: str):
     return _check_tier
 
 
+def conditional_get(
+    *scopes: str,
+    local_date: Literal["preference", "header"] | None = "preference",
+    timezone_header: str = "X-User-Timezone",
+):
+    """Dependency factory for ETag-guarded read endpoints.
+
+    Derives a weak ``ETag`` from the user's data versions
+    (:mod:`app.services.data_version`) and, when it matches the request's
+    ``If-None-Match``, answers ``304 Not Modified`` before the handler
+    runs. Otherwise the ``ETag`` is set on the response and returned, so
+    ``@cached`` handlers can add it to their ``key_params``.
+
+    If Redis is unavailable the request is served normally without an
+    ``ETag`` and the dependency returns ``""``.
+
+    Args:
+        *scopes: Data version scopes the response depends on.
+        local_date: Include the user's local date in the ``ETag`` so
+            "today" screens roll over at midnight. ``"preference"`` uses the
+            stored timezone preference (cached in Redis, one query on a
+            miss), ``"header"`` reads ``timezone_header``, ``None`` omits it.
+        timezone_header: Header read when ``local_date="header"``.
+
+    Returns:
+        An async dependency returning the ``ETag`` (or ``""``).
+
+    Raises:
+        HTTPException: 304 when ``If-None-Match`` matches.
+    """
+    scopes = data_version.validate_scopes(scopes or (data_version.SCOPE_DATA,))
+
+    async def _conditional_get(
+        request: Request,
+        response: Response,
+        user_id: str = Depends(get_authenticated_user_id),
+        db: AsyncSession = Depends(get_db),
+    ) -> str:
+        route = getattr(request.scope.get("route"), "path", None) or request.url.path
+        redis = getattr(request.app.state, "redis", None)
+        if redis is None:
+            CONDITIONAL_GETS.inc(route, "unavailable")
+            return ""
+        try:
+            user_fields, global_fields = await data_version.read_versions(redis, user_id)
+            day = None
+            if local_date == "header":
+                day = local_date_in(request.headers.get(timezone_header, "UTC"))
+            elif local_date == "preference":
+                tz_name = data_version.cached_timezone(user_fields)
+                if tz_name is None:
+                    tz_name = await get_user_timezone(db, user_id)
+                    await data_version.remember_timezone(redis, user_id, tz_name)
+                day = local_date_in(tz_name)
+        except Exception:  # noqa: BLE001
+            logger.warning("conditional_get: version lookup failed for route=%s", route, exc_info=True)
+            CONDITIONAL_GETS.inc(route, "unavailable")
+            return ""
+
+        etag = data_version.make_etag(
+            request.url.path, request.url.query, scopes, user_fields, global_fields, day
+        )
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and data_version.etag_matches(if_none_match, etag):
+            CONDITIONAL_GETS.inc(route, "not_modified")
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        CONDITIONAL_GETS.inc(route, "modified")
+        response.headers.update(headers)
+        return etag
+
+    return _conditional_get
+
+
 async def check_rate_limit(
     user_id: str,
     limiter: RateLimiter,
@@ -40,10 +40,11 @@ from app.api.v1.analytics_schemas import (
     UserGoalRequest,
     WeeklyTrendsResponse,
 )
-from app.api.deps import get_authenticated_user_id
+from app.api.deps import conditional_get, get_authenticated_user_id
 from app.database import async_session, get_db
 from app.models.user_goal import GoalPeriod, UserGoal
 from app.services.cache_service import cached
+from app.services.data_version import SCOPE_DATA
 from app.utils.user_date import get_user_local_date
 
 
@@ -418,10 +419,11 @@ async def dashboard_insight(
 
 @limiter.limit("60/minute")
 @router.get("/dashboard-summary", response_model=DashboardSummaryResponse)
-@cached(prefix="analytics.dashboard_summary", ttl=300, key_params=["user_id"])
+@cached(prefix="analytics.dashboard_summary", ttl=300, key_params=["user_id", "etag"])
 async def dashboard_summary(
     request: Request,
     user_id: str = Depends(get_authenticated_user_id),
+    etag: str = Depends(conditional_get(SCOPE_DATA)),
     force_refresh: bool = Query(False, description="Bypass server cache for this request"),
 ) -> DashboardSummaryResponse:
     """Return aggregated dashboard data for the Data tab Health Dashboard.
@@ -432,13 +434,15 @@ async def dashboard_summary(
     Args:
         request: Incoming FastAPI request.
         user_id: Authenticated user ID from JWT.
+        etag: Data version ETag; part of the cache key, so a cached summary
+            is never served under a newer version.
         force_refresh: When True, the @cached decorator skips the cached result
             and re-fetches fresh data, then re-populates the cache.
 
     Returns:
         DashboardSummaryResponse with category summaries and visible order.
     """
-    _ = force_refresh  # consumed by @cached
+    _ = force_refresh, etag  # consumed by @cached
     async with async_session() as temp_db:
         today = await get_user_local_date(temp_db, user_id)
     day14_ago = today - timedelta(days=14)
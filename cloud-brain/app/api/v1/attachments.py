@@ -23,7 +23,6 @@ Notes
 
 from __future__ import annotations
 
-import asyncio
 import base64
 import logging
 
@@ -38,7 +37,7 @@ from app.database import get_db
 from app.limiter import limiter
 from app.models.conversation import Conversation
 from app.models.user import User
-from app.services.attachment_processor import AttachmentProcessor, _safe_extract_health_facts
+from app.services.attachment_processor import AttachmentProcessor
 from app.services.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
@@ -75,7 +74,7 @@ async def upload_attachment(
     """Upload and process a file attachment for an existing conversation.
 
     Validates that the conversation belongs to the authenticated user,
-    then passes the file bytes through ``AttachmentProcessor.process()``.
+    then passes the file bytes through ``AttachmentProcessor.process_async()``.
     The processed metadata (including extracted text and health facts) is
     returned directly; nothing is persisted to storage.
 
@@ -221,17 +220,14 @@ async def upload_attachment(
     # 3. Process through AttachmentProcessor
     # ------------------------------------------------------------------
     try:
-        processed = await asyncio.to_thread(
-            AttachmentProcessor.process,
+        # PDF parsing runs in a worker process and CSV/text decoding in a
+        # thread, so large documents never stall the event loop.
+        processed = await AttachmentProcessor.process_async(
             file_bytes=file_bytes,
             filename=filename,
             content_type=content_type,
             user_id=str(user.id),
         )
-        # Override health_facts with the async safe version (timeout-protected,
-        # non-blocking) if there is extracted text to scan.
-        if processed.get("extracted_text"):
-            processed["health_facts"] = await _safe_extract_health_facts(processed["extracted_text"])
     except ValueError as exc:
         logger.info(
             "upload_attachment: validation error for user=%s: %s",
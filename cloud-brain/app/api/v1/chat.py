@@ -23,9 +23,11 @@ WebSocket Protocol (client → server):
 """
 
 import asyncio
+import functools
 import json
 import logging
 import time
+import uuid
 from datetime import datetime, timezone
 from typing import Annotated, Any
 
@@ -54,6 +56,7 @@ from app.agent.prompts.system import UserProfile
 from app.agent.llm_client import LLMClient
 from app.agent.mcp_client import MCPClient
 from app.agent.orchestrator import Orchestrator
+from app.agent.turn_context import TurnContextPrefetch, TurnTimings
 from app.api.deps import _get_auth_service, check_rate_limit, get_authenticated_user_id
 from app.config import settings
 from app.database import async_session, get_db
@@ -66,6 +69,7 @@ from app.services.auth_service import AuthService
 from app.services.rate_limiter import _INCR_EXPIRE_SCRIPT, RateLimiter
 from app.services.storage_service import StorageService
 from app.services.usage_tracker import UsageTracker
+from app.utils.fast_json import FastJSONResponse, fast_json
 from app.utils.sanitize import is_memory_injection_attempt, sanitize_for_llm
 
 logger = logging.getLogger(__name__)
@@ -213,14 +217,58 @@ async def _refresh_attachment_urls(
     """
     if not attachments:
         return attachments
-    refreshed = []
-    for att in attachments:
-        updated = dict(att)
-        if att.get("storage_path"):
-            bucket, _, obj_path = att["storage_path"].partition("/")
-            updated["signed_url"] = await storage_service.get_signed_url(bucket, obj_path)
-        refreshed.append(updated)
-    return refreshed
+    return (await _refresh_page_attachment_urls([attachments], storage_service))[0]
+
+
+async def _refresh_page_attachment_urls(
+    attachment_lists: list[list[dict] | None],
+    storage_service: StorageService,
+) -> list[list[dict] | None]:
+    """Refresh signed URLs for every attachment on a page of messages.
+
+    Collects all ``storage_path`` values across the page and signs them
+    with one batched storage request per bucket (cached URLs are reused),
+    so page latency does not grow with the attachment count.
+
+    Args:
+        attachment_lists: One stored attachment list (or None) per message.
+        storage_service: Storage service for generating signed URLs.
+
+    Returns:
+        The attachment lists, in the same order, with refreshed
+        ``signed_url`` fields. Attachments whose path could not be signed
+        keep their stored metadata unchanged.
+    """
+    paths_by_bucket: dict[str, list[str]] = {}
+    for attachments in attachment_lists:
+        for att in attachments or []:
+            if att.get("storage_path"):
+                bucket, _, obj_path = att["storage_path"].partition("/")
+                paths_by_bucket.setdefault(bucket, []).append(obj_path)
+
+    signed_by_bucket: dict[str, dict[str, str]] = {}
+    if paths_by_bucket:
+        results = await asyncio.gather(
+            *(storage_service.get_signed_urls(bucket, paths) for bucket, paths in paths_by_bucket.items())
+        )
+        signed_by_bucket = dict(zip(paths_by_bucket, results))
+
+    refreshed_lists: list[list[dict] | None] = []
+    for attachments in attachment_lists:
+        if not attachments:
+            refreshed_lists.append(attachments)
+            continue
+        refreshed = []
+        for att in attachments:
+            updated = dict(att)
+            if att.get("storage_path"):
+                bucket, _, obj_path = att["storage_path"].partition("/")
+                signed_url = signed_by_bucket.get(bucket, {}).get(obj_path)
+                if signed_url:
+                    updated["signed_url"] = signed_url
+            refreshed.append(updated)
+        refreshed_lists.append(refreshed)
+    return refreshed_lists
 
 
 def _message_to_dict(msg: Message) -> dict[str, Any]:
@@ -407,6 +455,37 @@ async def _load_user_profile(
         return (_default_profile, "balanced", "medium", "concise", True)
 
 
+def _log_turn_timings(
+    user_id: str,
+    model_tier: str | None,
+    classifier_result: str | None,
+    timings: TurnTimings,
+) -> None:
+    """Emit the per-stage timing breakdown for one chat turn.
+
+    Logged as a structured ``chat_turn_timing`` record and attached to the
+    current Sentry scope as measurements so time-to-first-token can be
+    tracked per model tier.
+
+    Args:
+        user_id: The authenticated user's ID.
+        model_tier: Routed model tier, if routing ran.
+        classifier_result: Classifier outcome, if routing ran.
+        timings: The turn's collected stage timings.
+    """
+    stages = timings.as_dict()
+    logger.info(
+        "chat_turn_timing user=%s tier=%s classifier=%s %s",
+        user_id[:8],
+        model_tier,
+        classifier_result,
+        " ".join(f"{name}={ms}ms" for name, ms in stages.items()),
+        extra={"turn_timings": stages, "model_tier": model_tier},
+    )
+    for name, ms in stages.items():
+        sentry_sdk.set_measurement(f"chat.{name}", ms, "millisecond")
+
+
 async def _generate_and_save_title(
     db_url: str,
     conversation_id: str,
@@ -749,119 +828,151 @@ async def websocket_chat(
                     })
                     continue
 
-            # ── Model routing + per-model rate limiting ───────────────────────
-            normalized_tier = "premium" if user_subscription_tier and user_subscription_tier not in ("", "free") else "free"
-            routed_model: str | None = None
-            routed_model_tier: str | None = None
-            classifier_result: str | None = None
-            if rate_limiter:
-                try:
-                    routing_result = await route_message(
-                        text=message_text,
-                        user_id=user_id,
-                        tier=normalized_tier,
-                        rate_limiter=rate_limiter,
-                    )
-                    routed_model = routing_result.model
-                    routed_model_tier = routing_result.model_tier
-                    classifier_result = routing_result.classifier_result
-                except LimitExhaustedException as limit_exc:
-                    reset_str = _format_reset_time(limit_exc.reset_seconds)
-                    if limit_exc.is_burst:
-                        msg = f"You're sending messages too quickly. Please wait a moment and try again."
-                    else:
-                        msg = f"You've used all your messages for this period. Resets in {reset_str}."
-                    await websocket.send_json({
-                        "type": "rate_limit",
-                        "content": msg,
-                        "reset_seconds": limit_exc.reset_seconds,
-                        "is_burst": limit_exc.is_burst,
-                    })
-                    continue
-                except Exception as routing_exc:
-                    logger.warning("Router failed (fail-open): %s", routing_exc)
-
-            _usage_incremented = False
-
-            # ── Analytics ─────────────────────────────────────────────────────
-            if analytics:
-                analytics.capture(
-                    distinct_id=user_id,
-                    event="chat_message_sent",
-                    properties={
-                        "message_length": len(message_text),
-                        "conversation_id": resolved_conv_id,
-                    },
-                )
+            # ── Speculative context prefetch ──────────────────────────────────
+            # History, profile, memories and tools don't depend on the routed
+            # model, so load them concurrently with routing/classification and
+            # join before the first LLM call. The user message ID is chosen up
+            # front so the history load can exclude it even if the insert
+            # below commits before that query runs.
+            turn_timings = TurnTimings()
+            pending_user_msg_id: str | None = None if is_regenerate else str(uuid.uuid4())
+            prefetch = TurnContextPrefetch(
+                session_factory=async_session,
+                user_id=user_id,
+                query_text=sanitize_for_llm(message_text),
+                memory_store=memory_store,
+                mcp_client=mcp_client,
+                load_history=functools.partial(
+                    _load_conversation_history,
+                    conversation_id=resolved_conv_id,
+                    limit=15,
+                    exclude_message_id=pending_user_msg_id,
+                    user_id=user_id,
+                ),
+                load_profile=functools.partial(_load_user_profile, user_id=user_id),
+                timings=turn_timings,
+            )
+            prefetch.start()
 
-            # Sanitize user input before passing to the LLM or persisting to DB.
-            message_text = sanitize_for_llm(message_text)
-
-            # ── Attachment processing ─────────────────────────────────────────
-            augmented_text = message_text
-            image_urls: list[str] = []
-            if raw_attachments:
-                extra_context, image_urls = _process_attachments(raw_attachments)
-                if extra_context:
-                    augmented_text = f"{message_text}\n\n{extra_context}" if message_text else extra_context
-
-            # When the user sends an image, force-route to the vision-capable
-            # Zura model. The Flash tier is text-only — routing there would
-            # cause the coach to respond as if the image didn't exist.
-            if image_urls:
-                from app.config import ROUTER_MODEL_ZURA
-                routed_model = ROUTER_MODEL_ZURA
-                routed_model_tier = "zura"
-
-            # ── Persist user message ──────────────────────────────────────────
-            # When regenerating, the user message is already in the DB from the
-            # original send — skip inserting a duplicate.
-            async with async_session() as db:
-                persisted_user_msg_id: str | None = None
-                if not is_regenerate:
-                    sanitized_attachments = []
-                    for att in (raw_attachments or []):
-                        if isinstance(att, dict) and "context_message" in att:
-                            att = {**att, "context_message": sanitize_for_llm(att["context_message"])}
-                        sanitized_attachments.append(att)
-                    _user_content = message_text or "[attachment]"
-                    user_msg = Message(
-                        conversation_id=resolved_conv_id,
-                        role="user",
-                        content=_user_content,
-                        attachments=sanitized_attachments or None,
-                        token_count=count_tokens(_user_content),
+            # Cancel on every exit path (rate limited, a failed insert, a
+            # dropped socket); a no-op once the prefetch has been joined.
+            try:
+                # ── Model routing + per-model rate limiting ───────────────────────
+                normalized_tier = "premium" if user_subscription_tier and user_subscription_tier not in ("", "free") else "free"
+                routed_model: str | None = None
+                routed_model_tier: str | None = None
+                classifier_result: str | None = None
+                if rate_limiter:
+                    try:
+                        with turn_timings.stage("routing"):
+                            routing_result = await route_message(
+                                text=message_text,
+                                user_id=user_id,
+                                tier=normalized_tier,
+                                rate_limiter=rate_limiter,
+                            )
+                        routed_model = routing_result.model
+                        routed_model_tier = routing_result.model_tier
+                        classifier_result = routing_result.classifier_result
+                    except LimitExhaustedException as limit_exc:
+                        reset_str = _format_reset_time(limit_exc.reset_seconds)
+                        if limit_exc.is_burst:
+                            msg = f"You're sending messages too quickly. Please wait a moment and try again."
+                        else:
+                            msg = f"You've used all your messages for this period. Resets in {reset_str}."
+                        await websocket.send_json({
+                            "type": "rate_limit",
+                            "content": msg,
+                            "reset_seconds": limit_exc.reset_seconds,
+                            "is_burst": limit_exc.is_burst,
+                        })
+                        continue
+                    except Exception as routing_exc:
+                        logger.warning("Router failed (fail-open): %s", routing_exc)
+
+                _usage_incremented = False
+
+                # ── Analytics ─────────────────────────────────────────────────────
+                if analytics:
+                    analytics.capture(
+                        distinct_id=user_id,
+                        event="chat_message_sent",
+                        properties={
+                            "message_length": len(message_text),
+                            "conversation_id": resolved_conv_id,
+                        },
                     )
-                    db.add(user_msg)
-                    await db.commit()
-                    await db.refresh(user_msg)
-                    persisted_user_msg_id = str(user_msg.id)
-
-                    # Update conversation.updated_at when a new user message is added
-                    conv_upd = await db.execute(select(Conversation).where(Conversation.id == resolved_conv_id))
-                    conversation = conv_upd.scalar_one_or_none()
-                    if conversation:
-                        conversation.updated_at = datetime.now(timezone.utc)
-                        await db.commit()
 
-                # Load conversation history for LLM context, excluding the
-                # just-persisted user message (passed separately as `message`).
-                history = await _load_conversation_history(
-                    db, resolved_conv_id, limit=15, exclude_message_id=persisted_user_msg_id, user_id=user_id
-                )
-
-                # Trim history to MAX_HISTORY_TOKENS by removing oldest messages first.
-                while len(history) > 1 and count_messages(history) > MAX_HISTORY_TOKENS:
-                    history.pop(0)
+                # Sanitize user input before passing to the LLM or persisting to DB.
+                message_text = sanitize_for_llm(message_text)
+
+                # ── Attachment processing ─────────────────────────────────────────
+                augmented_text = message_text
+                image_urls: list[str] = []
+                if raw_attachments:
+                    extra_context, image_urls = _process_attachments(raw_attachments)
+                    if extra_context:
+                        augmented_text = f"{message_text}\n\n{extra_context}" if message_text else extra_context
+
+                # When the user sends an image, force-route to the vision-capable
+                # Zura model. The Flash tier is text-only — routing there would
+                # cause the coach to respond as if the image didn't exist.
+                if image_urls:
+                    from app.config import ROUTER_MODEL_ZURA
+                    routed_model = ROUTER_MODEL_ZURA
+                    routed_model_tier = "zura"
+
+                # ── Persist user message ──────────────────────────────────────────
+                # When regenerating, the user message is already in the DB from the
+                # original send — skip inserting a duplicate.
+                async with async_session() as db:
+                    if pending_user_msg_id is not None:
+                        sanitized_attachments = []
+                        for att in (raw_attachments or []):
+                            if isinstance(att, dict) and "context_message" in att:
+                                att = {**att, "context_message": sanitize_for_llm(att["context_message"])}
+                            sanitized_attachments.append(att)
+                        _user_content = message_text or "[attachment]"
+                        user_msg = Message(
+                            id=pending_user_msg_id,
+                            conversation_id=resolved_conv_id,
+                            role="user",
+                            content=_user_content,
+                            attachments=sanitized_attachments or None,
+                            token_count=count_tokens(_user_content),
+                        )
+                        db.add(user_msg)
+                        await db.commit()
 
-                user_profile, db_persona, db_proactivity, db_response_length, memory_enabled = await _load_user_profile(db, user_id)
-                # Fix 6.6 (H-2): Validate client-supplied persona/proactivity against allowlist
-                client_persona = data.get("persona")
-                persona = client_persona if client_persona in _VALID_PERSONAS else db_persona
-                client_proactivity = data.get("proactivity")
-                proactivity = client_proactivity if client_proactivity in _VALID_PROACTIVITY else db_proactivity
-                client_response_length = data.get("response_length")
-                response_length = client_response_length if client_response_length in _VALID_RESPONSE_LENGTHS else db_response_length
+                        # Update conversation.updated_at when a new user message is added
+                        conv_upd = await db.execute(select(Conversation).where(Conversation.id == resolved_conv_id))
+                        conversation = conv_upd.scalar_one_or_none()
+                        if conversation:
+                            conversation.updated_at = datetime.now(timezone.utc)
+                            await db.commit()
+
+                # ── Join prefetched context ───────────────────────────────────────
+                turn_ctx = await prefetch.join()
+            finally:
+                prefetch.cancel()
+            history = turn_ctx.history
+            # Trim history to MAX_HISTORY_TOKENS by removing oldest messages first.
+            while len(history) > 1 and count_messages(history) > MAX_HISTORY_TOKENS:
+                history.pop(0)
+
+            # Fix 6.6 (H-2): Validate client-supplied persona/proactivity against allowlist
+            client_persona = data.get("persona")
+            persona = client_persona if client_persona in _VALID_PERSONAS else turn_ctx.persona
+            client_proactivity = data.get("proactivity")
+            proactivity = client_proactivity if client_proactivity in _VALID_PROACTIVITY else turn_ctx.proactivity
+            client_response_length = data.get("response_length")
+            response_length = (
+                client_response_length
+                if client_response_length in _VALID_RESPONSE_LENGTHS
+                else turn_ctx.response_length
+            )
+            user_profile = turn_ctx.user_profile
+            memory_enabled = turn_ctx.memory_enabled
 
             # ── Orchestrate with streaming ────────────────────────────────────
             await websocket.send_json({"type": "typing_start"})
@@ -895,6 +1006,8 @@ async def websocket_chat(
                         write_confirm_token=confirmed_write_token,
                         write_confirm_tool=_pending_write_tool if confirmed_write_token else None,
                         image_urls=image_urls or None,
+                        prefetched_memories=turn_ctx.memory_texts,
+                        prefetched_tools=turn_ctx.mcp_tools,
                     ):
                         etype = event.get("type")
 
@@ -902,6 +1015,7 @@ async def websocket_chat(
                             await websocket.send_json(event)
 
                         elif etype == "stream_token":
+                            turn_timings.mark("first_token")
                             full_content += event["content"]
                             await websocket.send_json(event)
 
@@ -947,6 +1061,9 @@ async def websocket_chat(
                     await websocket.send_json({"type": "stream_end", "content": "", "message_id": "", "conversation_id": str(resolved_conv_id), "client_action": None})
                     continue
 
+                turn_timings.mark("total")
+                _log_turn_timings(user_id, routed_model_tier, classifier_result, turn_timings)
+
                 if had_error:
                     continue
 
@@ -1217,7 +1334,7 @@ async def list_conversations(
 
 
 @limiter.limit("60/minute")
-@router.get("/conversations/{conversation_id}/messages")
+@router.get("/conversations/{conversation_id}/messages", response_model=list[dict])
 async def get_conversation_messages(
     request: Request,
     conversation_id: str,
@@ -1226,11 +1343,12 @@ async def get_conversation_messages(
     user_id: Annotated[str, Depends(get_authenticated_user_id)] = ...,
     storage_service: StorageService = Depends(_get_storage_service),
     db: AsyncSession = Depends(get_db),
-) -> list[dict]:
+) -> FastJSONResponse:
     """Return all messages for a specific conversation.
 
     Validates that the authenticated user owns the conversation.
-    Attachment signed URLs are refreshed on each request.
+    Attachment signed URLs are refreshed on each request with one batched
+    signing call per page (recently issued URLs are reused from cache).
 
     Args:
         conversation_id: The UUID of the conversation.
@@ -1239,7 +1357,8 @@ async def get_conversation_messages(
         db: Injected async database session.
 
     Returns:
-        A list of message dicts ordered chronologically.
+        A list of message dicts ordered chronologically, encoded with
+        ``fast_json``.
 
     Raises:
         HTTPException: 401 if the token is invalid.
@@ -1271,17 +1390,17 @@ async def get_conversation_messages(
     )
     messages = msg_result.scalars().all()
 
-    msg_dicts = []
-    for msg in messages:
-        msg_dict = _message_to_dict(msg)
-        if msg.attachments:
-            msg_dict["attachments"] = await _refresh_attachment_urls(
-                msg.attachments,
-                storage_service,
-            )
-        msg_dicts.append(msg_dict)
+    msg_dicts = [_message_to_dict(msg) for msg in messages]
+    # Sign every attachment on the page in one batched request per bucket.
+    refreshed = await _refresh_page_attachment_urls(
+        [msg.attachments for msg in messages],
+        storage_service,
+    )
+    for msg_dict, attachments in zip(msg_dicts, refreshed):
+        if attachments:
+            msg_dict["attachments"] = attachments
 
-    return msg_dicts
+    return fast_json(request, msg_dicts)
 
 
 # ---------------------------------------------------------------------------
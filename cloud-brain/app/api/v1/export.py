@@ -1,123 +1,111 @@
-"""User data export endpoint."""
-import json
+"""User data export endpoints.
+
+``GET /user/export`` streams the export (NDJSON or zip) straight from keyset
+pages; see :mod:`app.services.data_export`. ``POST /user/export/jobs``
+builds the zip in a Celery worker and stores it, and
+``GET /user/export/jobs/{export_id}`` returns a signed download URL when it
+is ready.
+"""
 import logging
-from collections import defaultdict
-from datetime import datetime, timezone
-from typing import Annotated
-
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import Response
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_authenticated_user_id, get_db
+import uuid
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_authenticated_user_id
+from app.config import settings
+from app.database import async_session
 from app.limiter import limiter
-from app.models.conversation import Conversation, Message
-from app.models.user_preferences import UserPreferences
+from app.services.data_export import (
+    MEDIA_TYPES,
+    export_filename,
+    export_object_path,
+    load_export_job,
+    save_export_job,
+    stream_export,
+)
+from app.services.db_guard import query_budget
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/user", tags=["user"])
 
 
-@router.get("/export")
+def _redis(request: Request):
+    redis = getattr(request.app.state, "redis", None)
+    if redis is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Export jobs are unavailable: Redis not configured.",
+        )
+    return redis
+
+
+# Statement count grows with the user's history (one per page), so the
+# per-request budget does not apply.
+@router.get("/export", dependencies=[Depends(query_budget(0))])
 @limiter.limit("1/hour")
 async def export_user_data(
     request: Request,
     user_id: Annotated[str, Depends(get_authenticated_user_id)],
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> Response:
-    """Export all user data as a downloadable JSON file."""
-    # Conversations + messages
-    result = await db.execute(
-        select(Conversation)
-        .where(Conversation.user_id == user_id, Conversation.deleted_at.is_(None))
-        .order_by(Conversation.created_at.desc())
-        .limit(200)
-    )
-    conversations = result.scalars().all()
+    format: Annotated[Literal["ndjson", "zip"], Query()] = "ndjson",
+) -> StreamingResponse:
+    """Stream all user data as a downloadable NDJSON or zip file.
 
-    # Preferences
-    pref_result = await db.execute(
-        select(UserPreferences).where(UserPreferences.user_id == user_id)
+    Each page of rows is read in its own short session, so the download
+    holds no database connection while the client reads.
+    """
+    return StreamingResponse(
+        stream_export(async_session, user_id, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(format)}"'},
     )
-    preferences = pref_result.scalar_one_or_none()
-
-    # Memories (if available)
-    memories = []
-    memories_export_partial = False
-    memory_store = getattr(request.app.state, "memory_store", None)
-    if memory_store is not None:
-        try:
-            raw = await memory_store.list_memories(user_id=user_id, limit=1000)
-            memories = [
-                {"id": str(m.get("id", "")), "text": m.get("text", ""), "metadata": m.get("metadata", {})}
-                for m in (raw or [])
-            ]
-        except Exception:
-            logger.exception("Failed to export memories for user '%s'", user_id[:8])
-            memories_export_partial = True
-
-    conv_ids = [c.id for c in conversations]
-
-    if not conv_ids:
-        messages_by_conv: dict = {}
-    else:
-        row_num_col = func.row_number().over(
-            partition_by=Message.conversation_id,
-            order_by=Message.created_at.desc()
-        ).label("rn")
-
-        subq = (
-            select(Message.id, row_num_col)
-            .where(Message.conversation_id.in_(conv_ids))
-            .subquery()
+
+
+@router.post("/export/jobs", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("1/hour")
+async def create_export_job(
+    request: Request,
+    user_id: Annotated[str, Depends(get_authenticated_user_id)],
+) -> dict:
+    """Start a background zip export. Poll ``GET /user/export/jobs/{export_id}``."""
+    redis = _redis(request)
+    export_id = str(uuid.uuid4())
+    await save_export_job(redis, export_id, user_id=user_id, status="pending", format="zip")
+    try:
+        from app.tasks.export_tasks import generate_user_export_task  # noqa: PLC0415
+
+        generate_user_export_task.delay(export_id=export_id, user_id=user_id)
+    except Exception as exc:
+        logger.error("Failed to enqueue export job %s for user %s: %s", export_id, user_id[:8], exc)
+        await save_export_job(redis, export_id, status="failed", error="enqueue_failed")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not start the export. Please try again later.",
         )
+    return {"export_id": export_id, "status": "pending"}
+
 
-        msg_result = await db.execute(
-            select(Message)
-            .join(subq, Message.id == subq.c.id)
-            .where(subq.c.rn <= 200)
-            .order_by(Message.created_at.asc())
+@router.get("/export/jobs/{export_id}")
+async def get_export_job(
+    request: Request,
+    export_id: str,
+    user_id: Annotated[str, Depends(get_authenticated_user_id)],
+) -> dict:
+    """Return the job status, with a signed ``download_url`` once it is ready."""
+    job = await load_export_job(_redis(request), export_id)
+    if not job or job.get("user_id") != user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not found.")
+
+    body: dict = {"export_id": export_id, "status": job.get("status", "pending")}
+    if body["status"] == "ready":
+        body["download_url"], body["expires_in"] = await request.app.state.storage_service.get_signed_url_with_ttl(
+            settings.export_bucket,
+            export_object_path(user_id, export_id),
+            expires_in=settings.export_url_ttl_seconds,
         )
-        messages = msg_result.scalars().all()
-
-        messages_by_conv = defaultdict(list)
-        for m in messages:
-            messages_by_conv[str(m.conversation_id)].append(m)
-
-    conversations_data = []
-    for c in conversations:
-        msgs = messages_by_conv.get(str(c.id), [])
-        conversations_data.append({
-            "id": str(c.id),
-            "title": c.title,
-            "created_at": c.created_at.isoformat() if c.created_at else None,
-            "updated_at": c.updated_at.isoformat() if c.updated_at else None,
-            "messages": [
-                {
-                    "role": m.role,
-                    "content": m.content,
-                    "created_at": m.created_at.isoformat() if m.created_at else None,
-                }
-                for m in msgs
-            ],
-        })
-
-    export_data = {
-        "exported_at": datetime.now(timezone.utc).isoformat(),
-        "conversations": conversations_data,
-        "preferences": {
-            "coach_persona": preferences.coach_persona if preferences else None,
-            "proactivity_level": preferences.proactivity_level if preferences else None,
-            "response_length": preferences.response_length if preferences else None,
-        },
-        "memories": memories,
-        "memories_export_partial": memories_export_partial,
-    }
-
-    filename = f"zuralog-export-{datetime.now(timezone.utc).strftime('%Y-%m-%d')}.json"
-    return Response(
-        content=json.dumps(export_data, indent=2, default=str),
-        media_type="application/json",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+        body["size_bytes"] = int(job.get("size_bytes", 0))
+    elif body["status"] == "failed":
+        body["error"] = job.get("error", "")
+    return body
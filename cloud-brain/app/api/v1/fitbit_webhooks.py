@@ -26,6 +26,7 @@ from fastapi.responses import Response
 from pydantic import BaseModel, ValidationError
 
 from app.config import settings
+from app.services.task_dispatch import dispatch_many
 
 logger = logging.getLogger(__name__)
 
@@ -97,7 +98,8 @@ async def fitbit_webhook_event(request: Request) -> Response:
 
     Fitbit pushes a JSON array of :class:`FitbitWebhookNotification` objects
     whenever subscribed health data changes. We MUST respond within 5 seconds,
-    so data fetching is deferred entirely to Celery tasks.
+    so data fetching is deferred entirely to Celery tasks, published as one
+    grouped batch per request.
 
     Parse errors and any internal errors are logged but NEVER surfaced to
     Fitbit — we always respond 204 to prevent Fitbit from retrying or
@@ -123,6 +125,7 @@ async def fitbit_webhook_event(request: Request) -> Response:
         )
         return Response(status_code=204)
 
+    calls: list[tuple[str, str, str]] = []
     for raw_notification in body:
         try:
             notification = FitbitWebhookNotification.model_validate(raw_notification)
@@ -147,29 +150,20 @@ async def fitbit_webhook_event(request: Request) -> Response:
             )
             continue
 
-        try:
-            # Lazy import to avoid circular imports at module load time.
-            from app.tasks.fitbit_sync import sync_fitbit_collection_task  # noqa: PLC0415
+        calls.append((notification.ownerId, notification.collectionType, notification.date))
 
-            sync_fitbit_collection_task.delay(
-                notification.ownerId,
-                notification.collectionType,
-                notification.date,
-            )
-            logger.info(
-                "Dispatched sync_fitbit_collection_task: owner=%s collection=%s date=%s",
-                notification.ownerId,
-                notification.collectionType,
-                notification.date,
-            )
-        except Exception as exc:  # noqa: BLE001
-            logger.error(
-                "Fitbit webhook: failed to dispatch task for owner=%s collection=%s: %s",
-                notification.ownerId,
-                notification.collectionType,
-                exc,
-            )
-            sentry_sdk.capture_exception(exc)
+    if calls:
+        # Lazy import to avoid circular imports at module load time.
+        from app.tasks.fitbit_sync import sync_fitbit_collection_task  # noqa: PLC0415
+
+        # One grouped publish for the whole batch; failures are logged and
+        # reported by dispatch_many, never raised.
+        dispatched = dispatch_many(sync_fitbit_collection_task, calls)
+        logger.info(
+            "Dispatched sync_fitbit_collection_task for %d of %d notification(s)",
+            dispatched.published,
+            len(calls),
+        )
 
     # PostHog capture removed: webhook context only has the Fitbit owner_id,
     # not the Zuralog user_id. Using provider IDs as distinct_id creates
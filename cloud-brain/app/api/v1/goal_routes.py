@@ -30,6 +30,7 @@ from app.api.v1.goal_schemas import (
 from app.database import get_db
 from app.limiter import limiter
 from app.models.user_goal import GoalPeriod, UserGoal
+from app.services.data_version import SCOPE_GOALS, bump_data_version
 from app.services.goal_history_service import get_goal_history
 
 _analytics = AnalyticsService()
@@ -160,7 +161,7 @@ async def list_goals(
 )
 @limiter.limit("10/minute")
 async def create_goal(
-    request: Request,  # noqa: ARG001 — required by slowapi
+    request: Request,
     body: GoalCreateRequest,
     user_id: str = Depends(get_authenticated_user_id),
     db: AsyncSession = Depends(get_db),
@@ -193,6 +194,7 @@ async def create_goal(
     )
     db.add(goal)
     await db.commit()
+    await bump_data_version(user_id, SCOPE_GOALS, redis=getattr(request.app.state, "redis", None))
     await db.refresh(goal)
     logger.info("Created goal %s for user %s", goal.id, user_id)
     return _goal_to_response(goal)
@@ -201,7 +203,7 @@ async def create_goal(
 @router.patch("/{goal_id}", response_model=GoalResponse, summary="Update a goal")
 @limiter.limit("20/minute")
 async def update_goal(
-    request: Request,  # noqa: ARG001 — required by slowapi
+    request: Request,
     goal_id: str,
     body: GoalUpdateRequest,
     user_id: str = Depends(get_authenticated_user_id),
@@ -252,6 +254,7 @@ async def update_goal(
         goal.period = _SLUG_TO_PERIOD[body.period]
 
     await db.commit()
+    await bump_data_version(user_id, SCOPE_GOALS, redis=getattr(request.app.state, "redis", None))
     await db.refresh(goal)
     logger.info("Updated goal %s for user %s", goal_id, user_id)
     return _goal_to_response(goal)
@@ -264,7 +267,7 @@ async def update_goal(
 )
 @limiter.limit("10/minute")
 async def delete_nutrition_goals(
-    request: Request,  # noqa: ARG001 — required by slowapi
+    request: Request,
     user_id: str = Depends(get_authenticated_user_id),
     db: AsyncSession = Depends(get_db),
 ) -> None:
@@ -291,6 +294,7 @@ async def delete_nutrition_goals(
     for goal in goals:
         goal.is_active = False
     await db.commit()
+    await bump_data_version(user_id, SCOPE_GOALS, redis=getattr(request.app.state, "redis", None))
     logger.info("Deactivated %d nutrition goals for user %s", len(goals), user_id)
 
 
@@ -301,7 +305,7 @@ async def delete_nutrition_goals(
 )
 @limiter.limit("20/minute")
 async def delete_goal(
-    request: Request,  # noqa: ARG001 — required by slowapi
+    request: Request,
     goal_id: str,
     user_id: str = Depends(get_authenticated_user_id),
     db: AsyncSession = Depends(get_db),
@@ -337,4 +341,5 @@ async def delete_goal(
 
     await db.delete(goal)
     await db.commit()
+    await bump_data_version(user_id, SCOPE_GOALS, redis=getattr(request.app.state, "redis", None))
     logger.info("Deleted goal %s for user %s", goal_id, user_id)
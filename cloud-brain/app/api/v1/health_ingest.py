@@ -12,7 +12,9 @@ or background sync triggers.
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterable
 from datetime import datetime, timezone
+from typing import Any
 
 import sentry_sdk
 from fastapi import APIRouter, Depends, Request
@@ -20,6 +22,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.analytics.deduplication import supersede_duplicate_activities
 from app.analytics.normalizer import DataNormalizer
 from app.api.deps import _get_auth_service
 from app.limiter import limiter
@@ -38,6 +41,7 @@ from app.models.health_data import (
     WeightMeasurement,
 )
 from app.services.auth_service import AuthService
+from app.services.data_version import bump_data_version
 
 # Celery task imports (soft — failures are caught per-task so ingest never breaks)
 try:
@@ -76,6 +80,24 @@ security = HTTPBearer()
 _normalizer = DataNormalizer()
 
 
+async def _existing_rows(
+    db: AsyncSession, model: Any, user_id: str, source: str, key: Any, values: Iterable[Any]
+) -> dict[Any, Any]:
+    """Load the user's ``source`` rows whose ``key`` column is in ``values``, in one query.
+
+    Returns:
+        ``{key value: row}``. Callers add the rows they insert so a key sent
+        twice in one payload updates the first row instead of duplicating it.
+    """
+    wanted = list(dict.fromkeys(values))
+    if not wanted:
+        return {}
+    result = await db.execute(
+        select(model).where(model.user_id == user_id, model.source == source, key.in_(wanted))
+    )
+    return {getattr(row, key.key): row for row in result.scalars().all()}
+
+
 @limiter.limit("30/minute")
 @router.post("/ingest", response_model=HealthIngestResponse)
 async def ingest_health_data(
@@ -89,7 +111,9 @@ async def ingest_health_data(
 
     Upserts all data types using user_id + source + date/original_id dedup constraints.
     The device can call this endpoint multiple times safely — duplicate records
-    are updated in place rather than inserted again.
+    are updated in place rather than inserted again. Existing rows are loaded
+    with one query per data type, and the inserts and updates are batched at
+    commit, so the statement count does not grow with the payload.
 
     Parameters
     ----------
@@ -127,10 +151,14 @@ async def ingest_health_data(
     )
     source = body.source
     counts: dict[str, int] = {}
+    workout_starts: list[datetime] = []
 
     # ------------------------------------------------------------------ #
     # Workouts                                                             #
     # ------------------------------------------------------------------ #
+    existing_workouts = await _existing_rows(
+        db, UnifiedActivity, user_id, source, UnifiedActivity.original_id, (w.original_id for w in body.workouts)
+    )
     for w in body.workouts:
         normalized = _normalizer.normalize_activity(
             source,
@@ -142,81 +170,71 @@ async def ingest_health_data(
                 "startDate": w.start_time,
             },
         )
-        existing = await db.execute(
-            select(UnifiedActivity).where(
-                UnifiedActivity.user_id == user_id,
-                UnifiedActivity.source == source,
-                UnifiedActivity.original_id == w.original_id,
-            )
-        )
-        row = existing.scalar_one_or_none()
+        row = existing_workouts.get(w.original_id)
         if row:
+            workout_starts.append(row.start_time)
             row.activity_type = normalized["type"]
             row.duration_seconds = normalized["duration_seconds"]
             row.distance_meters = normalized["distance_meters"]
             row.calories = normalized["calories"]
             if normalized.get("start_time"):
                 row.start_time = datetime.fromisoformat(normalized["start_time"])
+            workout_starts.append(row.start_time)
         else:
             start_dt = (
                 datetime.fromisoformat(normalized["start_time"])
                 if normalized.get("start_time")
                 else datetime.now(timezone.utc)
             )
-            db.add(
-                UnifiedActivity(
-                    user_id=user_id,
-                    source=source,
-                    original_id=w.original_id,
-                    activity_type=normalized["type"],
-                    duration_seconds=normalized["duration_seconds"],
-                    distance_meters=normalized["distance_meters"],
-                    calories=normalized["calories"],
-                    start_time=start_dt,
-                )
+            activity = UnifiedActivity(
+                user_id=user_id,
+                source=source,
+                original_id=w.original_id,
+                activity_type=normalized["type"],
+                duration_seconds=normalized["duration_seconds"],
+                distance_meters=normalized["distance_meters"],
+                calories=normalized["calories"],
+                start_time=start_dt,
             )
+            db.add(activity)
+            existing_workouts[w.original_id] = activity
+            workout_starts.append(start_dt)
+    if workout_starts:
+        await supersede_duplicate_activities(db, user_id, workout_starts)
     counts["workouts"] = len(body.workouts)
 
     # ------------------------------------------------------------------ #
     # Sleep                                                                #
     # ------------------------------------------------------------------ #
+    existing_sleep = await _existing_rows(
+        db, SleepRecord, user_id, source, SleepRecord.date, (s.date for s in body.sleep)
+    )
     for s in body.sleep:
-        existing = await db.execute(
-            select(SleepRecord).where(
-                SleepRecord.user_id == user_id,
-                SleepRecord.source == source,
-                SleepRecord.date == s.date,
-            )
-        )
-        row = existing.scalar_one_or_none()
+        row = existing_sleep.get(s.date)
         if row:
             row.hours = s.hours
             if s.quality_score is not None:
                 row.quality_score = s.quality_score
         else:
-            db.add(
-                SleepRecord(
-                    user_id=user_id,
-                    source=source,
-                    date=s.date,
-                    hours=s.hours,
-                    quality_score=s.quality_score,
-                )
+            row = SleepRecord(
+                user_id=user_id,
+                source=source,
+                date=s.date,
+                hours=s.hours,
+                quality_score=s.quality_score,
             )
+            db.add(row)
+            existing_sleep[s.date] = row
     counts["sleep"] = len(body.sleep)
 
     # ------------------------------------------------------------------ #
     # Nutrition                                                            #
     # ------------------------------------------------------------------ #
+    existing_nutrition = await _existing_rows(
+        db, NutritionModel, user_id, source, NutritionModel.date, (n.date for n in body.nutrition)
+    )
     for n in body.nutrition:
-        existing = await db.execute(
-            select(NutritionModel).where(
-                NutritionModel.user_id == user_id,
-                NutritionModel.source == source,
-                NutritionModel.date == n.date,
-            )
-        )
-        row = existing.scalar_one_or_none()
+        row = existing_nutrition.get(n.date)
         if row:
             row.calories = n.calories
             if n.protein_grams is not None:
@@ -226,56 +244,48 @@ async def ingest_health_data(
             if n.fat_grams is not None:
                 row.fat_grams = n.fat_grams
         else:
-            db.add(
-                NutritionModel(
-                    user_id=user_id,
-                    source=source,
-                    date=n.date,
-                    calories=n.calories,
-                    protein_grams=n.protein_grams,
-                    carbs_grams=n.carbs_grams,
-                    fat_grams=n.fat_grams,
-                )
+            row = NutritionModel(
+                user_id=user_id,
+                source=source,
+                date=n.date,
+                calories=n.calories,
+                protein_grams=n.protein_grams,
+                carbs_grams=n.carbs_grams,
+                fat_grams=n.fat_grams,
             )
+            db.add(row)
+            existing_nutrition[n.date] = row
     counts["nutrition"] = len(body.nutrition)
 
     # ------------------------------------------------------------------ #
     # Weight                                                               #
     # ------------------------------------------------------------------ #
+    existing_weight = await _existing_rows(
+        db, WeightMeasurement, user_id, source, WeightMeasurement.date, (w.date for w in body.weight)
+    )
     for w in body.weight:
-        existing = await db.execute(
-            select(WeightMeasurement).where(
-                WeightMeasurement.user_id == user_id,
-                WeightMeasurement.source == source,
-                WeightMeasurement.date == w.date,
-            )
-        )
-        row = existing.scalar_one_or_none()
+        row = existing_weight.get(w.date)
         if row:
             row.weight_kg = w.weight_kg
         else:
-            db.add(
-                WeightMeasurement(
-                    user_id=user_id,
-                    source=source,
-                    date=w.date,
-                    weight_kg=w.weight_kg,
-                )
+            row = WeightMeasurement(
+                user_id=user_id,
+                source=source,
+                date=w.date,
+                weight_kg=w.weight_kg,
             )
+            db.add(row)
+            existing_weight[w.date] = row
     counts["weight"] = len(body.weight)
 
     # ------------------------------------------------------------------ #
     # Daily Metrics (steps, HR, HRV, VO2 max, etc.)                       #
     # ------------------------------------------------------------------ #
+    existing_metrics = await _existing_rows(
+        db, DailyHealthMetrics, user_id, source, DailyHealthMetrics.date, (dm.date for dm in body.daily_metrics)
+    )
     for dm in body.daily_metrics:
-        existing = await db.execute(
-            select(DailyHealthMetrics).where(
-                DailyHealthMetrics.user_id == user_id,
-                DailyHealthMetrics.source == source,
-                DailyHealthMetrics.date == dm.date,
-            )
-        )
-        row = existing.scalar_one_or_none()
+        row = existing_metrics.get(dm.date)
         if row:
             # Partial upsert: only update fields the device actually sent
             if dm.steps is not None:
@@ -302,29 +312,30 @@ async def ingest_health_data(
             if dm.heart_rate_avg is not None:
                 row.heart_rate_avg = dm.heart_rate_avg
         else:
-            db.add(
-                DailyHealthMetrics(
-                    user_id=user_id,
-                    source=source,
-                    date=dm.date,
-                    steps=dm.steps,
-                    active_calories=dm.active_calories,
-                    resting_heart_rate=dm.resting_heart_rate,
-                    hrv_ms=dm.hrv_ms,
-                    vo2_max=dm.vo2_max,
-                    distance_meters=dm.distance_meters,
-                    flights_climbed=dm.flights_climbed,
-                    # Phase 6 new types
-                    body_fat_percentage=dm.body_fat_percentage,
-                    respiratory_rate=dm.respiratory_rate,
-                    oxygen_saturation=dm.oxygen_saturation,
-                    heart_rate_avg=dm.heart_rate_avg,
-                )
+            row = DailyHealthMetrics(
+                user_id=user_id,
+                source=source,
+                date=dm.date,
+                steps=dm.steps,
+                active_calories=dm.active_calories,
+                resting_heart_rate=dm.resting_heart_rate,
+                hrv_ms=dm.hrv_ms,
+                vo2_max=dm.vo2_max,
+                distance_meters=dm.distance_meters,
+                flights_climbed=dm.flights_climbed,
+                # Phase 6 new types
+                body_fat_percentage=dm.body_fat_percentage,
+                respiratory_rate=dm.respiratory_rate,
+                oxygen_saturation=dm.oxygen_saturation,
+                heart_rate_avg=dm.heart_rate_avg,
             )
+            db.add(row)
+            existing_metrics[dm.date] = row
     counts["daily_metrics"] = len(body.daily_metrics)
 
     with sentry_sdk.start_span(op="db.health_ingest", description=f"commit {sum(counts.values())} records"):
         await db.commit()
+    await bump_data_version(user_id, redis=getattr(request.app.state, "redis", None))
     total = sum(counts.values())
     logger.info("Health ingest user=%s source=%s counts=%s", user_id, source, counts)
 
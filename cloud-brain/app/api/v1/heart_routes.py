@@ -15,12 +15,14 @@ from pydantic import BaseModel, ConfigDict
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_authenticated_user_id
+from app.api.deps import conditional_get, get_authenticated_user_id
 from app.database import get_db
 from app.limiter import limiter
 from app.models.daily_summary import DailySummary
 from app.models.health_event import HealthEvent
 from app.models.insight import Insight
+from app.services.data_version import SCOPE_DATA
+from app.utils.fast_json import FastJSONResponse, fast_json
 from app.utils.user_date import get_user_local_date
 
 logger = logging.getLogger(__name__)
@@ -57,6 +59,11 @@ _ALL_DATA_RANGE_DAYS: dict[str, int] = {
     "7d": 7, "30d": 30, "3m": 90, "6m": 180, "1y": 365,
 }
 
+# Every key of HeartAllDataDayValues, in schema order.
+_ALL_DATA_VALUE_KEYS: tuple[str, ...] = (
+    "resting_hr", "hrv", "avg_hr", "respiratory_rate", "vo2_max", "spo2", "bp_systolic", "bp_diastolic",
+)
+
 _SOURCE_DISPLAY: dict[str, tuple[str, str]] = {
     "oura":           ("Oura Ring",      "#EC4899"),
     "fitbit":         ("Fitbit",         "#00B0B9"),
@@ -148,7 +155,11 @@ def _source_to_schema(source_name: str) -> HeartSource:
 # ---------------------------------------------------------------------------
 
 
-@router.get("/summary", response_model=HeartSummaryResponse)
+@router.get(
+    "/summary",
+    response_model=HeartSummaryResponse,
+    dependencies=[Depends(conditional_get(SCOPE_DATA))],
+)
 @limiter.limit("120/minute")
 async def get_heart_summary(
     request: Request,
@@ -336,13 +347,18 @@ async def get_heart_all_data(
     range: Annotated[
         Literal["7d", "30d", "3m", "6m", "1y"], Query()
     ] = "7d",
-) -> HeartAllDataResponse:
-    """Per-day rows for every heart metric -- powers the All-Data screen."""
+) -> FastJSONResponse:
+    """Per-day rows for every heart metric -- powers the All-Data screen.
+
+    Built from ``(date, metric_type, value)`` row tuples and encoded with
+    ``fast_json`` (no ORM objects, no Pydantic validation); the dict shape
+    matches ``HeartAllDataResponse``.
+    """
     local_date = await get_user_local_date(db, user_id)
     day_count = _ALL_DATA_RANGE_DAYS[range]
 
     result = await db.execute(
-        select(DailySummary)
+        select(DailySummary.date, DailySummary.metric_type, DailySummary.value)
         .where(
             DailySummary.user_id == user_id,
             DailySummary.metric_type.in_(_METRIC_TO_ALL_DATA_KEY.keys()),
@@ -352,30 +368,18 @@ async def get_heart_all_data(
         )
         .order_by(DailySummary.date)
     )
-    rows = result.scalars().all()
 
-    by_date: dict[str, dict[str, float]] = {}
-    for row in rows:
-        key = _METRIC_TO_ALL_DATA_KEY.get(row.metric_type)
+    by_date: dict[str, dict[str, float | None]] = {}
+    for metric_date, metric_type, value in result.all():
+        key = _METRIC_TO_ALL_DATA_KEY.get(metric_type)
         if key:
-            by_date.setdefault(str(row.date), {})[key] = row.value
-
-    return HeartAllDataResponse(
-        days=[
-            HeartAllDataDay(
-                date=d,
-                is_today=(d == str(local_date)),
-                values=HeartAllDataDayValues(
-                    resting_hr=metrics.get("resting_hr"),
-                    hrv=metrics.get("hrv"),
-                    avg_hr=metrics.get("avg_hr"),
-                    respiratory_rate=metrics.get("respiratory_rate"),
-                    vo2_max=metrics.get("vo2_max"),
-                    spo2=metrics.get("spo2"),
-                    bp_systolic=metrics.get("bp_systolic"),
-                    bp_diastolic=metrics.get("bp_diastolic"),
-                ),
-            )
-            for d, metrics in sorted(by_date.items())
-        ],
+            values = by_date.get(str(metric_date))
+            if values is None:
+                values = by_date[str(metric_date)] = dict.fromkeys(_ALL_DATA_VALUE_KEYS)
+            values[key] = value
+
+    today = str(local_date)
+    return fast_json(
+        request,
+        {"days": [{"date": d, "is_today": d == today, "values": values} for d, values in sorted(by_date.items())]},
     )
@@ -12,16 +12,18 @@ import hashlib
 import json
 import uuid
 import logging
+from collections.abc import Iterable
 from datetime import date, datetime, timezone
 from typing import Any, Literal
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from pydantic import BaseModel, Field, field_validator
-from sqlalchemy import select, text
+from sqlalchemy import insert, select, text
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_authenticated_user_id
+from app.config import settings
 from app.database import get_db
 from app.limiter import limiter
 from app.models.health_event import HealthEvent
@@ -29,7 +31,9 @@ from app.models.metric_definition import MetricDefinition
 from app.models.daily_summary import DailySummary
 from app.services.ingest_service import compute_local_date, validate_metric_value
 from app.services.aggregation_service import aggregate_events
-from app.services.ingest_post_processing import trigger_streaks_for_metric
+from app.services.data_version import bump_data_version
+from app.services.health_event_rollups import is_compactable, load_day_inputs_for_metrics, reopen_compacted_days
+from app.services.ingest_post_processing import schedule_ingest_streaks
 
 logger = logging.getLogger(__name__)
 
@@ -170,68 +174,104 @@ async def _get_metric_def(
     return row.scalar_one_or_none()
 
 
-async def _recompute_daily_summary(
+async def _get_metric_defs(
+    db: AsyncSession, metric_types: Iterable[str]
+) -> dict[str, MetricDefinition]:
+    """Load the definitions of several metric types in one query."""
+    wanted = sorted(set(metric_types))
+    if not wanted:
+        return {}
+    rows = await db.execute(select(MetricDefinition).where(MetricDefinition.metric_type.in_(wanted)))
+    return {md.metric_type: md for md in rows.scalars().all()}
+
+
+def _summary_lock_key(user_id: str, local_date: date, metric_type: str) -> int:
+    return int(hashlib.md5(f"{user_id}:{local_date}:{metric_type}".encode()).hexdigest()[:8], 16) & 0x7FFFFFFF
+
+
+async def _recompute_daily_summaries(
     db: AsyncSession,
     user_id: str,
     local_date: date,
-    metric_type: str,
-    unit: str,
-    aggregation_fn: str,
-) -> float | None:
-    """Re-aggregate all non-deleted events and upsert daily_summaries."""
-    # Acquire advisory lock to serialize concurrent recomputes for same tuple
-    lock_key = int(hashlib.md5(f"{user_id}:{local_date}:{metric_type}".encode()).hexdigest()[:8], 16) & 0x7FFFFFFF
-    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": lock_key})
-
-    rows = await db.execute(
-        select(HealthEvent.value, HealthEvent.recorded_at, HealthEvent.created_at)
-        .where(
-            HealthEvent.user_id == user_id,
-            HealthEvent.local_date == local_date,
-            HealthEvent.metric_type == metric_type,
-            HealthEvent.deleted_at.is_(None),
-        )
+    metrics: dict[str, tuple[str, str]],
+) -> dict[str, float | None]:
+    """Re-aggregate one day's metrics and upsert daily_summaries.
+
+    Runs a fixed number of statements however many metrics are passed: one
+    lock, two loads, one upsert and at most one delete.
+
+    Args:
+        metrics: ``{metric_type: (unit, aggregation_fn)}``.
+
+    Returns:
+        ``{metric_type: new daily value}``; None where no events remain.
+    """
+    # Advisory locks serialize concurrent recomputes for the same tuple. They
+    # are taken in key order so two multi-metric recomputes cannot deadlock.
+    keys = sorted({_summary_lock_key(user_id, local_date, mt) for mt in metrics})
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(k) FROM (SELECT unnest(CAST(:keys AS bigint[])) AS k ORDER BY k) AS ks"),
+        {"keys": keys},
     )
-    events = [
-        {"value": r.value, "recorded_at": r.recorded_at, "created_at": r.created_at}
-        for r in rows.fetchall()
-    ]
 
-    from app.services.aggregation_service import aggregate_events, AggregationResult
-    result = aggregate_events(events, fn=aggregation_fn, unit=unit)
+    inputs = await load_day_inputs_for_metrics(db, user_id, local_date, metrics)
 
-    if result is None:
-        # All events deleted — remove the summary row
+    now = datetime.now(tz=timezone.utc)
+    values: dict[str, float | None] = {}
+    upserts: list[dict[str, Any]] = []
+    for metric_type, (unit, aggregation_fn) in metrics.items():
+        events, rollups = inputs[metric_type]
+        result = aggregate_events(events, fn=aggregation_fn, unit=unit, rollups=rollups)
+        values[metric_type] = result.value if result is not None else None
+        if result is not None:
+            upserts.append({
+                "user_id": user_id,
+                "date": local_date,
+                "metric_type": metric_type,
+                "value": result.value,
+                "unit": result.unit,
+                "event_count": result.event_count,
+                "is_stale": False,
+                "computed_at": now,
+            })
+
+    emptied = [mt for mt, value in values.items() if value is None]
+    if emptied:
+        # All events deleted — remove the summary rows
         await db.execute(
             text(
                 "DELETE FROM daily_summaries "
-                "WHERE user_id = :uid AND date = :d AND metric_type = :mt"
+                "WHERE user_id = :uid AND date = :d AND metric_type = ANY(CAST(:mts AS text[]))"
             ),
-            {"uid": str(user_id), "d": local_date, "mt": metric_type},
+            {"uid": str(user_id), "d": local_date, "mts": emptied},
+        )
+    if upserts:
+        stmt = pg_insert(DailySummary).values(upserts)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_daily_summaries_user_date_metric",
+                set_={
+                    "value": stmt.excluded.value,
+                    "event_count": stmt.excluded.event_count,
+                    "is_stale": False,
+                    "computed_at": stmt.excluded.computed_at,
+                },
+            )
         )
-        return None
+    return values
 
-    now = datetime.now(tz=timezone.utc)
-    stmt = pg_insert(DailySummary).values(
-        user_id=user_id,
-        date=local_date,
-        metric_type=metric_type,
-        value=result.value,
-        unit=result.unit,
-        event_count=result.event_count,
-        is_stale=False,
-        computed_at=now,
-    ).on_conflict_do_update(
-        constraint="uq_daily_summaries_user_date_metric",
-        set_={
-            "value": result.value,
-            "event_count": result.event_count,
-            "is_stale": False,
-            "computed_at": now,
-        },
-    )
-    await db.execute(stmt)
-    return result.value
+
+async def _recompute_daily_summary(
+    db: AsyncSession,
+    user_id: str,
+    local_date: date,
+    metric_type: str,
+    unit: str,
+    aggregation_fn: str,
+) -> float | None:
+    """Re-aggregate all non-deleted events and upsert daily_summaries."""
+    values = await _recompute_daily_summaries(db, user_id, local_date, {metric_type: (unit, aggregation_fn)})
+    return values[metric_type]
 
 
 # ── Routes ────────────────────────────────────────────────────────────────────
@@ -241,6 +281,7 @@ async def _recompute_daily_summary(
 async def ingest_single(
     request: Request,
     body: SingleIngestRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_authenticated_user_id),
 ) -> SingleIngestResponse:
@@ -318,6 +359,10 @@ async def ingest_single(
     db.add(event)
     await db.flush()   # get the id
     logger.info("[ingest_single] event flushed — event_id=%s", event.id)
+    if is_compactable(body.source, "point_in_time", None, body.idempotency_key):
+        await reopen_compacted_days(
+            db, [local_date], datetime.now(timezone.utc).date(), settings.health_events_raw_retention_days
+        )
 
     # Synchronous aggregation
     daily_total = await _recompute_daily_summary(
@@ -325,12 +370,15 @@ async def ingest_single(
         body.metric_type, metric_def.unit, metric_def.aggregation_fn,
     )
     await db.commit()
+    await bump_data_version(user_id, redis=getattr(request.app.state, "redis", None))
     logger.info(
         "[ingest_single] ✅ committed — event_id=%s daily_total=%s",
         event.id, daily_total,
     )
 
-    await trigger_streaks_for_metric(db, user_id, body.metric_type, local_date)
+    schedule_ingest_streaks(
+        background_tasks, user_id, [(body.metric_type, local_date)], redis=getattr(request.app.state, "redis", None)
+    )
 
     return SingleIngestResponse(
         event_id=str(event.id),
@@ -345,6 +393,7 @@ async def ingest_single(
 async def ingest_session(
     request: Request,
     body: SessionIngestRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_authenticated_user_id),
 ) -> SessionIngestResponse:
@@ -387,45 +436,52 @@ async def ingest_session(
     db.add(session)
     await db.flush()
 
-    event_ids: list[str] = []
+    # Set-based from here on: one definition lookup, one insert and one
+    # recompute for all metrics, so the statement count does not grow with
+    # the session.
+    metric_defs = await _get_metric_defs(db, (m.metric_type for m in body.metrics))
+    rows: list[dict[str, Any]] = []
+    recompute: dict[str, tuple[str, str]] = {}
     for m in body.metrics:
-        metric_def = await _get_metric_def(db, m.metric_type)
+        metric_def = metric_defs.get(m.metric_type)
         if metric_def:
             try:
                 validate_metric_value(m.metric_type, m.value, metric_def.min_value, metric_def.max_value)
             except ValueError as exc:
                 raise HTTPException(status_code=422, detail=str(exc))
-
-        event = HealthEvent(
-            user_id=user_id,
-            metric_type=m.metric_type,
-            value=m.value,
-            unit=m.unit,
-            source=body.source,
-            recorded_at=datetime.fromisoformat(body.started_at),
-            local_date=local_date,
-            granularity="point_in_time",
-            session_id=session.id,
-            idempotency_key=m.idempotency_key,
-            metadata_=m.metadata,
+        rows.append({
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "metric_type": m.metric_type,
+            "value": m.value,
+            "unit": m.unit,
+            "source": body.source,
+            "recorded_at": datetime.fromisoformat(body.started_at),
+            "local_date": local_date,
+            "granularity": "point_in_time",
+            "session_id": session.id,
+            "idempotency_key": m.idempotency_key,
+            "metadata_": m.metadata,
+        })
+        recompute.setdefault(
+            m.metric_type,
+            (metric_def.unit, metric_def.aggregation_fn) if metric_def else (m.unit, "sum"),
         )
-        db.add(event)
-        await db.flush()
-        event_ids.append(str(event.id))
-
-        agg_fn = metric_def.aggregation_fn if metric_def else "sum"
-        unit = metric_def.unit if metric_def else m.unit
-        await _recompute_daily_summary(db, user_id, local_date, m.metric_type, unit, agg_fn)
+    if rows:
+        await db.execute(insert(HealthEvent), rows)
+        await _recompute_daily_summaries(db, user_id, local_date, recompute)
+    event_ids = [str(row["id"]) for row in rows]
 
     await db.commit()
-
-    # Trigger streaks for each unique (metric_type, local_date) pair in the session.
-    seen_pairs: set[tuple[str, date]] = set()
-    for m in body.metrics:
-        pair = (m.metric_type, compute_local_date(body.started_at))
-        if pair not in seen_pairs:
-            seen_pairs.add(pair)
-            await trigger_streaks_for_metric(db, user_id, m.metric_type, pair[1])
+    await bump_data_version(user_id, redis=getattr(request.app.state, "redis", None))
+
+    # Streaks for every metric in the session are evaluated after the response.
+    schedule_ingest_streaks(
+        background_tasks,
+        user_id,
+        [(m.metric_type, local_date) for m in body.metrics],
+        redis=getattr(request.app.state, "redis", None),
+    )
 
     return SessionIngestResponse(session_id=str(session.id), event_ids=event_ids, date=str(local_date))
 
@@ -435,15 +491,22 @@ async def ingest_session(
 async def ingest_bulk(
     request: Request,
     body: BulkIngestRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_authenticated_user_id),
 ) -> BulkIngestResponse:
-    """Bulk device sync — inserts all events transactionally, aggregation async."""
+    """Bulk device sync — inserts all events transactionally, aggregation async.
+
+    Set-based throughout: one definition lookup, one executemany insert,
+    one stale-mark UPDATE and at most one compaction reopen, whatever the
+    number of events.
+    """
     # Validate all events BEFORE any DB operations
+    metric_defs = await _get_metric_defs(db, (ev.metric_type for ev in body.events))
     affected_combos: set[tuple[str, date, str]] = set()
     for ev in body.events:
         local_date = compute_local_date(ev.recorded_at)
-        metric_def = await _get_metric_def(db, ev.metric_type)
+        metric_def = metric_defs.get(ev.metric_type)
         if not metric_def:
             raise HTTPException(status_code=422, detail=f"Unknown metric type: '{ev.metric_type}'")
         try:
@@ -453,35 +516,47 @@ async def ingest_bulk(
         affected_combos.add((str(user_id), local_date, ev.metric_type))
 
     # Insert all events
+    compactable_dates: set[date] = set()
+    rows: list[dict[str, Any]] = []
     for ev in body.events:
         local_date = compute_local_date(ev.recorded_at)
-        event = HealthEvent(
-            user_id=user_id,
-            metric_type=ev.metric_type,
-            value=ev.value,
-            unit=ev.unit,
-            source=body.source,
-            recorded_at=datetime.fromisoformat(ev.recorded_at),
-            local_date=local_date,
-            granularity=ev.granularity,
-            idempotency_key=ev.idempotency_key,
-            metadata_=ev.metadata,
-        )
-        db.add(event)
+        if is_compactable(body.source, ev.granularity, None, ev.idempotency_key):
+            compactable_dates.add(local_date)
+        rows.append({
+            "user_id": user_id,
+            "metric_type": ev.metric_type,
+            "value": ev.value,
+            "unit": ev.unit,
+            "source": body.source,
+            "recorded_at": datetime.fromisoformat(ev.recorded_at),
+            "local_date": local_date,
+            "granularity": ev.granularity,
+            "idempotency_key": ev.idempotency_key,
+            "metadata_": ev.metadata,
+        })
+    if rows:
+        await db.execute(insert(HealthEvent), rows)
 
     # Mark affected daily_summaries as stale BEFORE commit so both
     # event inserts and stale-marking are atomic in one transaction.
-    from app.models.daily_summary import DailySummary as DS
-    for uid, ld, mt in affected_combos:
+    if affected_combos:
+        combos = sorted(affected_combos)
         await db.execute(
             text(
                 "UPDATE daily_summaries SET is_stale = true "
-                "WHERE user_id = :uid AND date = :d AND metric_type = :mt"
+                "WHERE user_id = :uid AND (date, metric_type) IN ("
+                "SELECT * FROM unnest(CAST(:dates AS date[]), CAST(:metric_types AS text[])))"
             ),
-            {"uid": uid, "d": ld, "mt": mt},
+            {"uid": str(user_id), "dates": [ld for _, ld, _ in combos], "metric_types": [mt for _, _, mt in combos]},
         )
+    # Late device samples reopen days that rollup compaction already finished.
+    await reopen_compacted_days(
+        db, compactable_dates, datetime.now(timezone.utc).date(), settings.health_events_raw_retention_days
+    )
 
     await db.commit()
+    # Stale-marking changes what the summary screens show before aggregation finishes.
+    await bump_data_version(user_id, redis=getattr(request.app.state, "redis", None))
 
     # Enqueue Celery aggregation task
     try:
@@ -494,9 +569,13 @@ async def ingest_bulk(
         # If Celery isn't available, generate a placeholder task_id
         task_id = str(uuid.uuid4())
 
-    # Trigger streaks for each unique (metric_type, local_date) pair in the batch.
-    for uid, ld, mt in affected_combos:
-        await trigger_streaks_for_metric(db, uid, mt, ld)
+    # One streak pass per streak type over all affected dates, after the response.
+    schedule_ingest_streaks(
+        background_tasks,
+        str(user_id),
+        [(mt, ld) for _, ld, mt in affected_combos],
+        redis=getattr(request.app.state, "redis", None),
+    )
 
     return BulkIngestResponse(task_id=task_id, event_count=len(body.events), status="processing")
 
@@ -572,6 +651,7 @@ async def delete_event(
         event.metric_type, unit, agg_fn,
     )
     await db.commit()
+    await bump_data_version(str(user_id), redis=getattr(request.app.state, "redis", None))
 
     return DeleteEventResponse(
         event_id=str(event.id),
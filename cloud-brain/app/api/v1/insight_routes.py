@@ -23,6 +23,7 @@ from app.api.deps import get_authenticated_user_id
 from app.database import get_db
 from app.limiter import limiter
 from app.models.insight import Insight
+from app.services.data_version import bump_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -346,5 +347,6 @@ async def update_insight(
 
     await db.commit()
     await db.refresh(insight)
+    await bump_data_version(user_id, redis=getattr(request.app.state, "redis", None))
 
     return _insight_to_response(insight).model_dump()
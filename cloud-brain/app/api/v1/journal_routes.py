@@ -16,7 +16,7 @@ import logging
 import uuid
 from datetime import date as _date
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -24,6 +24,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_authenticated_user_id
 from app.database import get_db
 from app.models.journal_entry import JournalEntry
+from app.services.data_version import bump_data_version
 from app.services.streak_tracker import StreakTracker
 
 logger = logging.getLogger(__name__)
@@ -112,6 +113,7 @@ def _entry_to_response(entry: JournalEntry) -> dict:
 
 @router.post("", summary="Create a new journal entry", status_code=status.HTTP_201_CREATED)
 async def create_journal_entry(
+    request: Request,
     body: JournalEntryCreate,
     user_id: str = Depends(get_authenticated_user_id),
     db: AsyncSession = Depends(get_db),
@@ -119,6 +121,7 @@ async def create_journal_entry(
     """Create a new journal entry. Multiple entries per day are allowed.
 
     Args:
+        request: Incoming request (for the shared Redis client).
         body: Entry fields including the target date.
         user_id: Authenticated user ID (injected by dependency).
         db: Async database session.
@@ -145,6 +148,7 @@ async def create_journal_entry(
 
     await db.commit()
     await db.refresh(entry)
+    await bump_data_version(user_id, redis=getattr(request.app.state, "redis", None))
 
     try:
         await StreakTracker().record_activity(
@@ -152,6 +156,7 @@ async def create_journal_entry(
             streak_type="checkin",
             activity_date=_date.fromisoformat(entry.date),
             db=db,
+            redis=getattr(request.app.state, "redis", None),
         )
     except Exception:
         pass  # never block journal write on streak failure
@@ -210,6 +215,7 @@ async def list_journal_entries(
 
 @router.put("/{entry_id}", summary="Full replacement of a journal entry")
 async def update_journal_entry(
+    request: Request,
     entry_id: str,
     body: JournalEntryCreate,
     user_id: str = Depends(get_authenticated_user_id),
@@ -218,6 +224,7 @@ async def update_journal_entry(
     """Fully replace all fields of an existing journal entry.
 
     Args:
+        request: Incoming request (for the shared Redis client).
         entry_id: UUID of the entry to update.
         body: New entry field values.
         user_id: Authenticated user ID.
@@ -252,6 +259,7 @@ async def update_journal_entry(
 
     await db.commit()
     await db.refresh(entry)
+    await bump_data_version(user_id, redis=getattr(request.app.state, "redis", None))
     logger.info("Replaced journal entry %s for user %s", entry_id, user_id)
 
     try:
@@ -260,6 +268,7 @@ async def update_journal_entry(
             streak_type="checkin",
             activity_date=_date.fromisoformat(entry.date),
             db=db,
+            redis=getattr(request.app.state, "redis", None),
         )
     except Exception:
         pass  # never block journal write on streak failure
@@ -269,6 +278,7 @@ async def update_journal_entry(
 
 @router.patch("/{entry_id}", summary="Partial update of a journal entry")
 async def patch_journal_entry(
+    request: Request,
     entry_id: str,
     body: dict,
     user_id: str = Depends(get_authenticated_user_id),
@@ -303,12 +313,14 @@ async def patch_journal_entry(
 
     await db.commit()
     await db.refresh(entry)
+    await bump_data_version(user_id, redis=getattr(request.app.state, "redis", None))
     logger.info("Patched journal entry %s for user %s", entry_id, user_id)
     return _entry_to_response(entry)
 
 
 @router.delete("/{entry_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete a journal entry")
 async def delete_journal_entry(
+    request: Request,
     entry_id: str,
     user_id: str = Depends(get_authenticated_user_id),
     db: AsyncSession = Depends(get_db),
@@ -316,6 +328,7 @@ async def delete_journal_entry(
     """Hard-delete a journal entry by ID.
 
     Args:
+        request: Incoming request (for the shared Redis client).
         entry_id: UUID of the entry to delete.
         user_id: Authenticated user ID.
         db: Async database session.
@@ -342,4 +355,5 @@ async def delete_journal_entry(
 
     await db.delete(entry)
     await db.commit()
+    await bump_data_version(user_id, redis=getattr(request.app.state, "redis", None))
     logger.info("Deleted journal entry %s for user %s", entry_id, user_id)
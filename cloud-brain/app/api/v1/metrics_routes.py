@@ -7,10 +7,11 @@ from pydantic import BaseModel
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_authenticated_user_id
+from app.api.deps import conditional_get, get_authenticated_user_id
 from app.database import get_db
 from app.limiter import limiter
 from app.models.daily_summary import DailySummary
+from app.services.data_version import SCOPE_DATA
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/metrics", tags=["metrics"])
@@ -39,7 +40,11 @@ class WeightHistoryResponse(BaseModel):
 
 
 @limiter.limit("120/minute")
-@router.get("/latest", response_model=LatestMetricsResponse)
+@router.get(
+    "/latest",
+    response_model=LatestMetricsResponse,
+    dependencies=[Depends(conditional_get(SCOPE_DATA, local_date=None))],
+)
 async def metrics_latest(
     request: Request,
     types: str = Query(
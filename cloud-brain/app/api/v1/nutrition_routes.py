@@ -17,6 +17,7 @@ import json
 import logging
 import re
 import uuid
+from collections.abc import Callable
 from datetime import date, datetime, time, timezone
 from typing import Annotated, Any, Literal
 
@@ -47,8 +48,6 @@ from app.api.v1.nutrition_schemas import (
     MealUpdateRequest,
     NutritionRuleCreate,
     NutritionRuleUpdate,
-    NutritionAllDataDay,
-    NutritionAllDataDayValues,
     NutritionAllDataResponse,
     NutritionTrendDay,
     NutritionTrendResponse,
@@ -78,6 +77,7 @@ from app.services.nutrition_service import (
     recompute_nutrition_summary,
 )
 from app.services.rule_suggestion import detect_suggested_rule
+from app.utils.fast_json import FastJSONResponse, fast_json
 from app.utils.sanitize import sanitize_for_llm
 
 logger = logging.getLogger(__name__)
@@ -381,16 +381,33 @@ async def get_food_image(
 # ---------------------------------------------------------------------------
 
 
+def _has_parsed_foods(response: Any) -> bool:
+    """Cache gate for meal parses: only answers with a non-empty ``foods`` list.
+
+    ``parse_meal`` rejects anything else with a 422, so caching it would
+    replay the same failure for every identical description.
+    """
+    try:
+        parsed = json.loads(response.choices[0].message.content or "")
+    except ValueError:
+        return False
+    return isinstance(parsed, dict) and isinstance(parsed.get("foods"), list) and len(parsed["foods"]) > 0
+
+
 async def _call_llm_with_json_retry(
     llm: LLMClient,
     messages: list[dict],
     temperature: float = 0.3,
     max_tokens: int = 2048,
+    cache: str | None = None,
+    cache_validate: Callable[[Any], bool] | None = None,
 ) -> tuple[dict, str]:
     """Call the LLM with JSON mode and retry once on malformed JSON.
 
     Returns (parsed_dict, raw_content). Raises HTTPException on persistent
-    failure.
+    failure. ``cache`` names the LLM response cache site for text-only
+    calls (see ``app.agent.llm_cache``); only valid JSON answers that also
+    pass ``cache_validate`` (when given) are cached.
 
     Defence in depth, four layers:
 
@@ -415,6 +432,8 @@ async def _call_llm_with_json_retry(
                 response_format={"type": "json_object"},
                 reasoning={"effort": "none"},
                 plugins=[{"id": "response-healing"}],
+                cache=cache,
+                cache_validate=cache_validate,
             )
         except APIError as e:
             logger.error("LLM call failed (attempt %d): %s", attempt + 1, e)
@@ -638,7 +657,7 @@ async def get_nutrition_all_data_endpoint(
     user_id: str = Depends(get_authenticated_user_id),
     db: AsyncSession = Depends(get_db),
     range: str = Query(default="7d", pattern="^(7d|30d|3m|6m|1y)$"),
-) -> NutritionAllDataResponse:
+) -> FastJSONResponse:
     """Per-day rows for every nutrition metric — powers the All-Data screen.
 
     Returns one row per day that has logged meal data. Each row contains
@@ -649,16 +668,8 @@ async def get_nutrition_all_data_endpoint(
         range: '7d' (default), '30d', '3m', '6m', or '1y'. Other values return 422.
     """
     all_data = await get_nutrition_all_data(db, user_id, range)
-    return NutritionAllDataResponse(
-        days=[
-            NutritionAllDataDay(
-                date=day["date"],
-                is_today=day["is_today"],
-                values=NutritionAllDataDayValues(**day["values"]),
-            )
-            for day in all_data
-        ],
-    )
+    # The service rows already match NutritionAllDataResponse; skip re-validation.
+    return fast_json(request, {"days": all_data})
 
 
 @limiter.limit("30/minute")
@@ -729,7 +740,7 @@ async def create_meal(
     # Recompute daily summary (best-effort — never block the main response).
     try:
         summary_date = body.logged_at.date()
-        await recompute_nutrition_summary(db, user_id, summary_date)
+        await recompute_nutrition_summary(db, user_id, summary_date, redis=getattr(request.app.state, "redis", None))
     except Exception:
         logger.exception("Failed to recompute nutrition summary after create")
 
@@ -827,9 +838,9 @@ async def update_meal(
     # Recompute summaries for both old and new dates.
     new_date = body.logged_at.date()
     try:
-        await recompute_nutrition_summary(db, user_id, old_date)
+        await recompute_nutrition_summary(db, user_id, old_date, redis=getattr(request.app.state, "redis", None))
         if new_date != old_date:
-            await recompute_nutrition_summary(db, user_id, new_date)
+            await recompute_nutrition_summary(db, user_id, new_date, redis=getattr(request.app.state, "redis", None))
     except Exception:
         logger.exception("Failed to recompute nutrition summary after update")
 
@@ -865,7 +876,7 @@ async def delete_meal(
     # Recompute summary for the meal's date.
     try:
         summary_date = meal.logged_at.date()
-        await recompute_nutrition_summary(db, user_id, summary_date)
+        await recompute_nutrition_summary(db, user_id, summary_date, redis=getattr(request.app.state, "redis", None))
     except Exception:
         logger.exception("Failed to recompute nutrition summary after delete")
 
@@ -1246,6 +1257,8 @@ async def parse_meal_description(
         messages,
         temperature=0.3,
         max_tokens=2048,
+        cache="meal_parse",
+        cache_validate=_has_parsed_foods,
     )
 
     if not isinstance(parsed, dict) or "foods" not in parsed:
@@ -1390,6 +1403,7 @@ async def refine_meal(
             messages,
             temperature=0.3,
             max_tokens=2048,
+            cache="meal_refine",
         )
     except HTTPException:
         raise
@@ -1890,7 +1904,7 @@ async def create_exercise_entry(
 
     # Recompute daily summary so the net-calorie budget stays accurate.
     try:
-        await recompute_nutrition_summary(db, user_id, date.today())
+        await recompute_nutrition_summary(db, user_id, date.today(), redis=getattr(request.app.state, "redis", None))
     except Exception:
         logger.exception("Failed to recompute nutrition summary after exercise entry create")
 
@@ -1949,6 +1963,6 @@ async def delete_exercise_entry(
 
     # Recompute so the daily budget reflects the removed burn.
     try:
-        await recompute_nutrition_summary(db, user_id, entry_date)
+        await recompute_nutrition_summary(db, user_id, entry_date, redis=getattr(request.app.state, "redis", None))
     except Exception:
         logger.exception("Failed to recompute nutrition summary after exercise entry delete")
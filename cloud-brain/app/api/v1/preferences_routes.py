@@ -26,6 +26,7 @@ from app.api.deps import get_current_user
 from app.database import get_db
 from app.models.user import User
 from app.models.user_preferences import UserPreferences
+from app.services.data_version import bump_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -399,6 +400,7 @@ async def put_preferences(
     prefs = await _get_or_create_prefs(current_user.id, db)
     _apply_update(prefs, data)
     await db.commit()
+    await bump_data_version(current_user.id, redis=getattr(request.app.state, "redis", None), reset_timezone=True)
     await db.refresh(prefs)
 
     return PreferencesResponse.model_validate(prefs)
@@ -438,6 +440,7 @@ async def patch_preferences(
     prefs = await _get_or_create_prefs(current_user.id, db)
     _apply_update(prefs, data)
     await db.commit()
+    await bump_data_version(current_user.id, redis=getattr(request.app.state, "redis", None), reset_timezone=True)
     await db.refresh(prefs)
 
     return PreferencesResponse.model_validate(prefs)
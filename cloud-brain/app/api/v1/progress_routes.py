@@ -22,13 +22,14 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.analytics.analytics_service import AnalyticsService
-from app.api.deps import get_authenticated_user_id
+from app.api.deps import conditional_get, get_authenticated_user_id
 from app.database import get_db
 from app.limiter import limiter
 from app.models.achievement import Achievement as AchievementModel
 from app.models.daily_summary import DailySummary
 from app.models.user_goal import UserGoal
 from app.models.user_streak import UserStreak
+from app.services.data_version import SCOPE_DATA, SCOPE_GOALS
 from app.services.goal_history_service import get_goal_history
 
 _analytics = AnalyticsService()
@@ -292,7 +293,7 @@ def _streak_to_dict(streak: UserStreak) -> dict:
 # ---------------------------------------------------------------------------
 
 
-@router.get("/home")
+@router.get("/home", dependencies=[Depends(conditional_get(SCOPE_DATA, SCOPE_GOALS, local_date="header"))])
 @limiter.limit("30/minute")
 async def progress_home(
     request: Request,
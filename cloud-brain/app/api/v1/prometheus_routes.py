@@ -0,0 +1,105 @@
+"""
+Zuralog Cloud Brain — Prometheus Scrape Endpoint.
+
+``GET /metrics`` serves the process telemetry registry
+(:mod:`app.services.telemetry`) merged across every API and Celery process
+that has published a snapshot to Redis, plus the Beat job duration
+histograms recorded by :mod:`app.services.bulk_jobs` and the depth and
+oldest-message age of each Celery queue (:mod:`app.services.task_queues`).
+
+The endpoint is mounted at the root (not under ``/api/v1``) where scrapers
+expect it. It requires ``Authorization: Bearer <METRICS_TOKEN>`` and is
+disabled (404) when ``METRICS_TOKEN`` is unset.
+"""
+
+import hmac
+import logging
+
+from fastapi import APIRouter, Header, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.services.bulk_jobs import JOB_DURATION_BUCKETS, bucket_label, get_job_duration_histograms
+from app.services.task_queues import read_queue_lag
+from app.services.telemetry import load_snapshots, merge_snapshots, render_prometheus
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["observability"])
+
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _render_job_histograms(histograms: dict[str, dict[str, float]]) -> str:
+    if not histograms:
+        return ""
+    lines = [
+        "# HELP bulk_job_duration_seconds Celery Beat bulk job run time.",
+        "# TYPE bulk_job_duration_seconds histogram",
+    ]
+    for job, values in sorted(histograms.items()):
+        for bound in JOB_DURATION_BUCKETS:
+            le = bucket_label(bound)
+            count = int(values.get(f"le_{le}", 0))
+            lines.append(f'bulk_job_duration_seconds_bucket{{job="{job}",le="{le}"}} {count}')
+        lines.append(f'bulk_job_duration_seconds_sum{{job="{job}"}} {values.get("sum", 0.0)!r}')
+        lines.append(f'bulk_job_duration_seconds_count{{job="{job}"}} {int(values.get("count", 0))}')
+    return "\n".join(lines) + "\n"
+
+
+def _render_queue_lag(lag: dict[str, tuple[int, float]]) -> str:
+    if not lag:
+        return ""
+    lines = [
+        "# HELP celery_queue_depth Messages waiting in each Celery queue (all priorities).",
+        "# TYPE celery_queue_depth gauge",
+    ]
+    lines += [f'celery_queue_depth{{queue="{queue}"}} {depth}' for queue, (depth, _) in sorted(lag.items())]
+    lines += [
+        "# HELP celery_queue_oldest_age_seconds Age of the oldest waiting message in each Celery queue.",
+        "# TYPE celery_queue_oldest_age_seconds gauge",
+    ]
+    lines += [f'celery_queue_oldest_age_seconds{{queue="{queue}"}} {age!r}' for queue, (_, age) in sorted(lag.items())]
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(
+    request: Request,
+    authorization: str | None = Header(None),
+) -> PlainTextResponse:
+    """Return all process metrics in the Prometheus text format.
+
+    Args:
+        request: The incoming FastAPI request.
+        authorization: The Authorization header (Bearer <METRICS_TOKEN>).
+
+    Returns:
+        The merged metrics as ``text/plain; version=0.0.4``.
+
+    Raises:
+        HTTPException: 404 if ``METRICS_TOKEN`` is not configured.
+        HTTPException: 401 if the bearer token is missing or wrong.
+    """
+    token = settings.metrics_token.get_secret_value()
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not authorization or not hmac.compare_digest(authorization, f"Bearer {token}"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    redis = getattr(request.app.state, "redis", None)
+    body = render_prometheus(merge_snapshots(await load_snapshots(redis, "api")))
+    if redis is not None:
+        try:
+            body += _render_job_histograms(await get_job_duration_histograms(redis))
+        except Exception:  # noqa: BLE001
+            logger.warning("metrics: could not read bulk job histograms", exc_info=True)
+        try:
+            body += _render_queue_lag(await read_queue_lag(redis))
+        except Exception:  # noqa: BLE001
+            logger.warning("metrics: could not read Celery queue lag", exc_info=True)
+    return PlainTextResponse(body, media_type=_CONTENT_TYPE)
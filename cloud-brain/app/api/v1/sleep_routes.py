@@ -14,13 +14,15 @@ from pydantic import BaseModel, ConfigDict
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_authenticated_user_id
+from app.api.deps import conditional_get, get_authenticated_user_id
 from app.database import get_db
 from app.limiter import limiter
 from app.models.activity_session import ActivitySession
 from app.models.daily_summary import DailySummary
 from app.models.health_event import HealthEvent
 from app.models.insight import Insight
+from app.services.data_version import SCOPE_DATA
+from app.utils.fast_json import FastJSONResponse, fast_json
 from app.utils.user_date import get_user_local_date
 
 logger = logging.getLogger(__name__)
@@ -70,6 +72,11 @@ _ALL_DATA_RANGE_DAYS: dict[str, int] = {
     "1y": 365,
 }
 
+# Every key of SleepAllDataDayValues, in schema order (heart_rate has no source yet).
+_ALL_DATA_VALUE_KEYS: tuple[str, ...] = (
+    "duration", "quality", "deep_sleep", "rem", "light_sleep", "heart_rate", "efficiency",
+)
+
 # ---------------------------------------------------------------------------
 # Pydantic response schemas
 # ---------------------------------------------------------------------------
@@ -171,7 +178,11 @@ def _source_to_schema(source_name: str) -> SleepSource:
 # GET /api/v1/sleep/summary
 # ---------------------------------------------------------------------------
 
-@router.get("/summary", response_model=SleepSummaryResponse)
+@router.get(
+    "/summary",
+    response_model=SleepSummaryResponse,
+    dependencies=[Depends(conditional_get(SCOPE_DATA))],
+)
 @limiter.limit("120/minute")
 async def get_sleep_summary(
     request: Request,
@@ -408,7 +419,7 @@ async def get_sleep_all_data(
     range: Annotated[
         Literal["7d", "30d", "3m", "6m", "1y"], Query()
     ] = "7d",
-) -> SleepAllDataResponse:
+) -> FastJSONResponse:
     """Per-day rows for every sleep metric -- powers the All-Data screen.
 
     Returns one row per day that has any sleep data in DailySummary.
@@ -416,6 +427,9 @@ async def get_sleep_all_data(
     (no DailySummary source for sleeping HR yet). Days with no sleep
     data are omitted.
 
+    Rows are built from ``(date, metric_type, value)`` tuples and encoded
+    with ``fast_json``; the dict shape matches ``SleepAllDataResponse``.
+
     Query params:
         range: '7d' (default), '30d', '3m', '6m', or '1y'. Other values return 422.
     """
@@ -423,7 +437,7 @@ async def get_sleep_all_data(
     day_count = _ALL_DATA_RANGE_DAYS[range]
 
     result = await db.execute(
-        select(DailySummary)
+        select(DailySummary.date, DailySummary.metric_type, DailySummary.value)
         .where(
             DailySummary.user_id == user_id,
             DailySummary.metric_type.in_(_METRIC_TO_ALL_DATA_KEY.keys()),
@@ -433,29 +447,18 @@ async def get_sleep_all_data(
         )
         .order_by(DailySummary.date)
     )
-    rows = result.scalars().all()
 
-    by_date: dict[str, dict[str, float]] = {}
-    for row in rows:
-        key = _METRIC_TO_ALL_DATA_KEY.get(row.metric_type)
+    by_date: dict[str, dict[str, float | None]] = {}
+    for metric_date, metric_type, value in result.all():
+        key = _METRIC_TO_ALL_DATA_KEY.get(metric_type)
         if key:
-            by_date.setdefault(str(row.date), {})[key] = row.value
-
-    return SleepAllDataResponse(
-        days=[
-            SleepAllDataDay(
-                date=d,
-                is_today=(d == str(local_date)),
-                values=SleepAllDataDayValues(
-                    duration=metrics.get("duration"),
-                    quality=metrics.get("quality"),
-                    deep_sleep=metrics.get("deep_sleep"),
-                    rem=metrics.get("rem"),
-                    light_sleep=metrics.get("light_sleep"),
-                    heart_rate=None,
-                    efficiency=metrics.get("efficiency"),
-                ),
-            )
-            for d, metrics in sorted(by_date.items())
-        ],
+            values = by_date.get(str(metric_date))
+            if values is None:
+                values = by_date[str(metric_date)] = dict.fromkeys(_ALL_DATA_VALUE_KEYS)
+            values[key] = value
+
+    today = str(local_date)
+    return fast_json(
+        request,
+        {"days": [{"date": d, "is_today": d == today, "values": values} for d, values in sorted(by_date.items())]},
     )
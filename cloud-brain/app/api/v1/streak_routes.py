@@ -186,7 +186,9 @@ async def use_streak_freeze(
     }
 
     try:
-        result = await apply_streak_freeze(db=db, user_id=user_id, streak_type=streak_type)
+        result = await apply_streak_freeze(
+            db=db, user_id=user_id, streak_type=streak_type, redis=getattr(request.app.state, "redis", None)
+        )
     except ValueError as exc:
         code = str(exc)
         if code == "streak_not_found":
@@ -15,6 +15,7 @@ from app.database import get_db
 from app.limiter import limiter
 from app.models.health_event import HealthEvent
 from app.models.user_supplement import UserSupplement
+from app.services.data_version import bump_data_version
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/supplements", tags=["supplements"])
@@ -227,6 +228,7 @@ async def replace_supplements(
         new_rows.append(row)
 
     await db.commit()
+    await bump_data_version(user_id, redis=getattr(request.app.state, "redis", None))
 
     return SupplementListResponse(
         supplements=[_row_to_response(r) for r in new_rows],
@@ -266,6 +268,7 @@ async def delete_supplement_log_entry(
         .values(deleted_at=datetime.now(timezone.utc))
     )
     await db.commit()
+    await bump_data_version(user_id, redis=getattr(request.app.state, "redis", None))
 
 
 # ── Scan-label helpers ────────────────────────────────────────────────────────
@@ -9,11 +9,12 @@ import sqlalchemy as sa
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_authenticated_user_id
+from app.api.deps import conditional_get, get_authenticated_user_id
 from app.database import get_db
 from app.limiter import limiter
 from app.models.daily_summary import DailySummary
 from app.models.health_event import HealthEvent
+from app.services.data_version import SCOPE_DATA
 from app.utils.user_date import get_user_local_date
 
 logger = logging.getLogger(__name__)
@@ -54,7 +55,11 @@ class GoalProgressItem(BaseModel):
 
 
 @limiter.limit("120/minute")
-@router.get("/summary", response_model=TodaySummaryResponse)
+@router.get(
+    "/summary",
+    response_model=TodaySummaryResponse,
+    dependencies=[Depends(conditional_get(SCOPE_DATA))],
+)
 async def today_summary(
     request: Request,
     db: AsyncSession = Depends(get_db),
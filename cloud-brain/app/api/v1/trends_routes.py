@@ -6,10 +6,10 @@ Trends tab (Tab 4). Returns AI-surfaced correlation highlights and
 time-machine period summaries.
 """
 
+import math
 import re
-import statistics
 import zoneinfo
-from datetime import datetime
+from datetime import date, datetime
 from datetime import timedelta
 
 import sentry_sdk
@@ -18,8 +18,13 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.analytics.correlation_analyzer import CorrelationAnalyzer
-from app.analytics.health_brief_builder import HealthBriefBuilder
-from app.analytics.insight_signal_detector import InsightSignalDetector
+from app.analytics.correlation_matrix import (
+    CORRELATION_METRICS,
+    HIGHLIGHT_MAX_P,
+    MAX_LAG,
+    pair_correlation,
+    strongest_correlations,
+)
 from app.api.deps import get_authenticated_user_id
 from app.api.v1.analytics_schemas import (
     ChartSeriesPointSchema,
@@ -29,20 +34,11 @@ from app.api.v1.analytics_schemas import (
 )
 from app.database import get_db
 from app.limiter import limiter
+from app.services.correlation_store import CorrelationMatrix, get_correlation_matrix
 
 
 # Maps InsightSignalDetector metric names → daily_summaries.metric_type column values
-_SIGNAL_METRIC_TO_DB_TYPE: dict[str, str] = {
-    "sleep_hours": "sleep_duration",
-    "sleep_quality": "sleep_quality",
-    "steps": "steps",
-    "active_calories": "active_calories",
-    "hrv_ms": "hrv_ms",
-    "resting_heart_rate": "resting_heart_rate",
-    "calorie_intake": "calories",
-    "weight_kg": "weight_kg",
-    "distance_meters": "distance",
-}
+_SIGNAL_METRIC_TO_DB_TYPE: dict[str, str] = CORRELATION_METRICS
 
 _METRIC_DISPLAY_NAMES: dict[str, str] = {
     "sleep_hours": "Sleep Duration",
@@ -133,6 +129,33 @@ def _make_body(metric_a: str, metric_b: str, score: float, lag: int) -> str:
     )
 
 
+def _paired_points(
+    matrix: CorrelationMatrix,
+    start: date,
+    end: date,
+    metric_a: str,
+    metric_b: str,
+    lag: int = 0,
+) -> tuple[list[tuple[date, float, float]], float | None, int, float | None]:
+    """Slice two metrics out of the stored matrix and correlate them.
+
+    Returns:
+        ``(points, r, n, p_value)`` where each point is ``(date_a, a, b)``
+        with ``b`` taken ``lag`` days after ``date_a``.
+    """
+    first, rows = matrix.rows_between(start, end)
+    col_a, col_b = matrix.column(metric_a), matrix.column(metric_b)
+    points = [
+        (first + timedelta(days=t), float(rows[t, col_a]), float(rows[t + lag, col_b]))
+        for t in range(max(0, len(rows) - lag))
+        if not math.isnan(rows[t, col_a]) and not math.isnan(rows[t + lag, col_b])
+    ]
+    if len(rows) == 0:
+        return points, None, 0, None
+    r, n, p_value = pair_correlation(rows, col_a, col_b, lag)
+    return points, r, n, p_value
+
+
 async def _set_sentry_module() -> None:
     """Tag the current Sentry scope with the trends module name."""
     sentry_sdk.set_tag("api.module", "trends")
@@ -154,8 +177,9 @@ async def trends_home(
 ) -> TrendsHomeResponse:
     """Return aggregated Trends Home data.
 
-    Returns correlation highlights driven by the user's actual health data.
-    Returns an empty scaffold when the user has fewer than 7 days of data.
+    Returns the strongest significant correlations (best lag per metric
+    pair) from the user's precomputed correlation matrix. Returns an empty
+    scaffold when the user has fewer than 7 days of data in the last 30.
 
     Args:
         user_id: Authenticated user ID from JWT.
@@ -164,40 +188,38 @@ async def trends_home(
     Returns:
         TrendsHomeResponse with correlation highlights and metadata.
     """
-    brief = await HealthBriefBuilder(user_id=user_id, db=db).build()
+    user_tz = await _get_user_tz(user_id, db)
+    local_date = datetime.now(tz=user_tz).date()
+    matrix = await get_correlation_matrix(db, user_id, local_date)
 
-    if brief.data_maturity_days < _MIN_MATURITY_DAYS:
+    if matrix.maturity_days(local_date) < _MIN_MATURITY_DAYS:
         return TrendsHomeResponse()
 
-    corr_signals = InsightSignalDetector(brief).detect_correlations()
-    corr_signals.sort(key=lambda s: abs(s.values.get("correlation", 0.0)), reverse=True)
-    corr_signals = corr_signals[:10]
+    top = strongest_correlations(matrix.cells, limit=10)
 
     highlights: list[CorrelationHighlightSchema] = []
-    for s in corr_signals:
-        coefficient = s.values.get("correlation", 0.0)
+    for cell in top:
+        coefficient = round(cell.r, 3)
         direction = "positive" if coefficient > 0 else "negative" if coefficient < 0 else "neutral"
         highlights.append(
             CorrelationHighlightSchema(
-                id=_make_pattern_id(s.metrics[0], s.metrics[1]),
-                metric_a=_METRIC_DISPLAY_NAMES.get(s.metrics[0], s.metrics[0]),
-                metric_b=_METRIC_DISPLAY_NAMES.get(s.metrics[1], s.metrics[1]),
+                id=_make_pattern_id(cell.metric_a, cell.metric_b),
+                metric_a=_METRIC_DISPLAY_NAMES.get(cell.metric_a, cell.metric_a),
+                metric_b=_METRIC_DISPLAY_NAMES.get(cell.metric_b, cell.metric_b),
                 coefficient=coefficient,
                 direction=direction,
-                headline=_make_headline(s.metrics[0], s.metrics[1], coefficient),
-                body=_make_body(s.metrics[0], s.metrics[1], coefficient, s.values.get("lag_days", 0)),
-                category_color_hex=_METRIC_TO_CATEGORY.get(s.metrics[0], ("activity", "#30D158"))[1],
-                category=_METRIC_TO_CATEGORY.get(s.metrics[0], ("activity", "#30D158"))[0],
+                headline=_make_headline(cell.metric_a, cell.metric_b, coefficient),
+                body=_make_body(cell.metric_a, cell.metric_b, coefficient, cell.lag),
+                category_color_hex=_METRIC_TO_CATEGORY.get(cell.metric_a, ("activity", "#30D158"))[1],
+                category=_METRIC_TO_CATEGORY.get(cell.metric_a, ("activity", "#30D158"))[0],
             )
         )
 
-    has_enough_data = brief.data_maturity_days >= _MIN_MATURITY_DAYS
-    has_correlations = len(corr_signals) > 0
     return TrendsHomeResponse(
         correlation_highlights=highlights,
-        has_enough_data=has_enough_data,
-        has_correlations=has_correlations,
-        pattern_count=len(corr_signals),
+        has_enough_data=True,
+        has_correlations=len(top) > 0,
+        pattern_count=len(top),
     )
 
 
@@ -233,17 +255,17 @@ async def trends_correlations(
     request: Request,
     metric_a: str,
     metric_b: str,
-    lag_days: int = 0,
+    lag_days: int = Query(default=0, ge=0, le=MAX_LAG),
     time_range: str = "30d",
     custom_start: str | None = None,
     custom_end: str | None = None,
+    db: AsyncSession = Depends(get_db),
     user_id: str = Depends(get_authenticated_user_id),
 ) -> dict:
     """Run a correlation analysis between two metrics.
 
-    Currently returns an empty scaffold. Full computation (Pearson
-    coefficient, scatter data, AI annotation) will be wired in a
-    future phase.
+    Slices both metrics out of the user's precomputed correlation matrix,
+    so no per-request alignment query is needed.
 
     Args:
         metric_a: ID of the first metric.
@@ -253,20 +275,50 @@ async def trends_correlations(
         custom_start: ISO-8601 start date when ``time_range`` is ``"custom"``.
         custom_end: ISO-8601 end date when ``time_range`` is ``"custom"``.
         user_id: Authenticated user ID from JWT.
+        db: Async database session.
 
     Returns:
         dict matching the CorrelationAnalysis model shape.
     """
+    valid_metrics = set(_SIGNAL_METRIC_TO_DB_TYPE.keys())
+    if metric_a not in valid_metrics or metric_b not in valid_metrics:
+        raise HTTPException(status_code=400, detail="Invalid metric name. Must be one of: " + ", ".join(sorted(valid_metrics)))
+
+    user_tz = await _get_user_tz(user_id, db)
+    local_date = datetime.now(tz=user_tz).date()
+    if time_range == "custom" and custom_start and custom_end:
+        try:
+            start, end = date.fromisoformat(custom_start), date.fromisoformat(custom_end)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="custom_start and custom_end must be ISO-8601 dates")
+    else:
+        end = local_date
+        start = end - timedelta(days={"7d": 7, "30d": 30, "90d": 90, "365d": 365}.get(time_range, 30))
+
+    matrix = await get_correlation_matrix(db, user_id, local_date)
+    points, coefficient, sample_size, p_value = _paired_points(matrix, start, end, metric_a, metric_b, lag_days)
+
+    if coefficient is None or sample_size < CorrelationAnalyzer.MIN_DATA_POINTS:
+        interpretation = "not_enough_data"
+        annotation = "Not enough data yet to compute a correlation. Keep syncing your devices."
+    elif p_value is not None and p_value > HIGHLIGHT_MAX_P:
+        interpretation = "not_significant"
+        annotation = "No clear relationship between these metrics yet."
+    else:
+        strength = "strong" if abs(coefficient) > 0.7 else "moderate" if abs(coefficient) > 0.4 else "weak"
+        interpretation = f"{strength}_{'positive' if coefficient > 0 else 'negative'}"
+        annotation = _make_body(metric_a, metric_b, coefficient, lag_days)
+
     return {
         "metric_a_id": metric_a,
         "metric_b_id": metric_b,
         "lag_days": lag_days,
-        "coefficient": None,
-        "p_value": None,
-        "interpretation": "not_enough_data",
-        "ai_annotation": "Not enough data yet to compute a correlation. Keep syncing your devices.",
-        "scatter_data": [],
-        "sample_size": 0,
+        "coefficient": coefficient,
+        "p_value": p_value,
+        "interpretation": interpretation,
+        "ai_annotation": annotation,
+        "scatter_data": [{"date": str(d), "x": a, "y": b} for d, a, b in points],
+        "sample_size": sample_size,
     }
 
 
@@ -283,38 +335,19 @@ async def trends_correlation(
     """Correlation between two metrics over a time range."""
     valid_metrics = set(_SIGNAL_METRIC_TO_DB_TYPE.keys())
     if metric_a not in valid_metrics or metric_b not in valid_metrics:
-        raise HTTPException(status_code=400, detail="Invalid metric name. Must be one of: " + ", ".join(sorted(valid_metrics)))
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid metric name. Must be one of: " + ", ".join(sorted(valid_metrics)),
+        )
 
     user_tz = await _get_user_tz(user_id, db)
     local_date = datetime.now(tz=user_tz).date()
     start_date = local_date - timedelta(days=days)
 
-    rows = await db.execute(
-        text("""
-            SELECT a.date, a.value AS metric_a_value, b.value AS metric_b_value
-            FROM daily_summaries a
-            JOIN daily_summaries b ON a.user_id = b.user_id AND a.date = b.date
-            WHERE a.user_id = :uid
-              AND a.metric_type = :ma
-              AND b.metric_type = :mb
-              AND a.date >= :start
-            ORDER BY a.date
-        """),
-        {"uid": str(user_id), "ma": metric_a, "mb": metric_b, "start": start_date},
-    )
-    data_points = [
-        {"date": str(r.date), "a_value": r.metric_a_value, "b_value": r.metric_b_value}
-        for r in rows.fetchall()
-    ]
-
-    correlation = None
-    if len(data_points) >= 3:
-        xs = [p["a_value"] for p in data_points]
-        ys = [p["b_value"] for p in data_points]
-        try:
-            correlation = round(statistics.correlation(xs, ys), 3)
-        except statistics.StatisticsError:
-            correlation = None
+    matrix = await get_correlation_matrix(db, user_id, local_date)
+    points, coefficient, _, _ = _paired_points(matrix, start_date, local_date, metric_a, metric_b)
+    data_points = [{"date": str(d), "a_value": a, "b_value": b} for d, a, b in points]
+    correlation = round(coefficient, 3) if coefficient is not None else None
 
     return {"data_points": data_points, "correlation": correlation, "metric_a": metric_a, "metric_b": metric_b}
 
@@ -345,56 +378,30 @@ async def pattern_expand(
     time_range_days = {"7d": 7, "30d": 30, "90d": 90}.get(time_range, 30)
 
     user_tz = await _get_user_tz(user_id, db)
+    local_date = datetime.now(tz=user_tz).date()
 
-    start = (datetime.now(tz=user_tz).date() - timedelta(days=time_range_days)).isoformat()
-
-    rows = await db.execute(
-        text("""
-            SELECT a.date, a.value AS metric_a_value, b.value AS metric_b_value
-            FROM daily_summaries a
-            JOIN daily_summaries b ON a.user_id = b.user_id AND a.date = b.date
-            WHERE a.user_id = :uid
-              AND a.metric_type = :ma
-              AND b.metric_type = :mb
-              AND a.date >= :start
-              AND a.value IS NOT NULL
-              AND b.value IS NOT NULL
-            ORDER BY a.date
-        """),
-        {"uid": str(user_id), "ma": db_type_a, "mb": db_type_b, "start": start},
+    matrix = await get_correlation_matrix(db, user_id, local_date)
+    points, score, _, _ = _paired_points(
+        matrix, local_date - timedelta(days=time_range_days), local_date, metric_a_key, metric_b_key
     )
-    results = rows.fetchall()
 
-    raw_a_values: list[float] = []
-    raw_b_values: list[float] = []
     series_a: list[ChartSeriesPointSchema] = []
     series_b: list[ChartSeriesPointSchema] = []
-
-    for r in results:
-        date_str = str(r.date)
-        val_a = float(r.metric_a_value)
-        val_b = float(r.metric_b_value)
-
-        raw_a_values.append(val_a)
-        raw_b_values.append(val_b)
-
+    for day, val_a, val_b in points:
         # Convert sleep_duration from minutes to hours for display
         display_a = val_a / 60.0 if db_type_a == "sleep_duration" else val_a
         display_b = val_b / 60.0 if db_type_b == "sleep_duration" else val_b
 
-        series_a.append(ChartSeriesPointSchema(date=date_str, value=display_a))
-        series_b.append(ChartSeriesPointSchema(date=date_str, value=display_b))
-
-    coeff_result = CorrelationAnalyzer().calculate_correlation(raw_a_values, raw_b_values)
+        series_a.append(ChartSeriesPointSchema(date=str(day), value=display_a))
+        series_b.append(ChartSeriesPointSchema(date=str(day), value=display_b))
 
     data_days = len(series_a)
     a_label = _METRIC_DISPLAY_NAMES.get(metric_a_key, metric_a_key)
     b_label = _METRIC_DISPLAY_NAMES.get(metric_b_key, metric_b_key)
 
-    if data_days < CorrelationAnalyzer.MIN_DATA_POINTS or coeff_result.get("score", 0.0) == 0.0:
+    if data_days < CorrelationAnalyzer.MIN_DATA_POINTS or not score:
         ai_explanation = "Not enough overlapping data yet to compute this correlation. Keep logging and check back soon."
     else:
-        score = coeff_result.get("score", 0.0)
         strength = "strong" if abs(score) > 0.7 else "moderate"
         direction = "positive" if score > 0 else "inverse"
         ai_explanation = (
@@ -6,6 +6,7 @@ All values are loaded from environment variables or a .env file.
 """
 
 import logging
+from typing import Literal
 
 from pydantic import Field, SecretStr, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -91,6 +92,9 @@ class Settings(BaseSettings):
     # Only configurable via server-side environment variable.
     rate_limit_bypass_user_ids: str = ""
     openrouter_title: str = "Zuralog"
+    # OPENROUTER_BASE_URL — OpenAI-compatible endpoint for every LLM call;
+    # load tests point it at scripts/upstream_stub.py.
+    openrouter_base_url: str = "https://openrouter.ai/api/v1"
     openrouter_model: str = "moonshotai/kimi-k2.5"
     # OPENROUTER_MODEL — Coach / main conversational model. Kimi K2.5 has 14
     # providers on OpenRouter (zero single-provider risk), native multimodal,
@@ -111,6 +115,19 @@ class Settings(BaseSettings):
     # multimodal (text + image + video + audio + file) with a 1M context
     # window and native structured_outputs support.
     openrouter_classifier_model: str = "google/gemini-3.1-flash-lite-preview"
+    # Message-tier classifier: normalized-text cache and local model in front
+    # of the LLM classifier (see app/agent/local_classifier.py).
+    classifier_cache_ttl_seconds: int = 3600  # CLASSIFIER_CACHE_TTL_SECONDS
+    classifier_cache_max_entries: int = 2048  # CLASSIFIER_CACHE_MAX_ENTRIES
+    classifier_local_confidence: float = 0.85  # CLASSIFIER_LOCAL_CONFIDENCE — below this, ask the LLM
+    classifier_log_outcomes: bool = False  # CLASSIFIER_LOG_OUTCOMES — log LLM decisions as training data
+    # Tool results over this many tokens are downsampled or aggregated before
+    # they reach the LLM (see app/agent/context_manager/tool_result_budget.py).
+    tool_result_max_tokens: int = 6000  # TOOL_RESULT_MAX_TOKENS
+    # Response cache for deterministic LLM calls (titles, meal parses, insight
+    # cards, summaries); per-site TTLs live in app/agent/llm_cache.py.
+    llm_cache_enabled: bool = True  # LLM_CACHE_ENABLED
+    llm_cache_max_entries: int = 1024  # LLM_CACHE_MAX_ENTRIES — in-process LRU in front of Redis
     google_web_client_id: str = ""
     google_web_client_secret: SecretStr = SecretStr("")
     strava_client_id: str = ""
@@ -172,8 +189,21 @@ class Settings(BaseSettings):
     # PostHog
     posthog_api_key: str = ""
     posthog_host: str = "https://us.i.posthog.com"
+    # Bearer token for GET /metrics (Prometheus scrape). Empty disables the endpoint.
+    metrics_token: SecretStr = SecretStr("")  # METRICS_TOKEN
     # Supabase Storage — bucket names
     avatar_bucket: str = Field(default="avatars", description="Supabase Storage bucket for avatar images. Must be set to public in Supabase dashboard.")  # AVATAR_BUCKET
+    export_bucket: str = "exports"  # EXPORT_BUCKET — private; exports are served via signed URLs
+    # User data export: rows per keyset page and lifetime of the download link.
+    export_batch_size: int = 1000  # EXPORT_BATCH_SIZE
+    export_url_ttl_seconds: int = 86400  # EXPORT_URL_TTL_SECONDS
+    # Daily insights: users per cohort task enqueued by the hourly fan-out
+    # (0 = one task per user) and concurrent card-writing LLM calls per cohort.
+    insight_cohort_size: int = 250  # INSIGHT_COHORT_SIZE
+    insight_cohort_llm_concurrency: int = 8  # INSIGHT_COHORT_LLM_CONCURRENCY
+    # Smart reminders are always logged; pushing them to the user's latest
+    # registered device is a separate rollout switch.
+    smart_reminder_push_enabled: bool = False  # SMART_REMINDER_PUSH_ENABLED
     # Rate limits (Fix 1.5 / M-7)
     rate_limit_free_daily: int = 50
     rate_limit_premium_daily: int = 500
@@ -181,6 +211,27 @@ class Settings(BaseSettings):
     # Conversation count limits per user
     max_conversations_free: int = 200
     max_conversations_premium: int = 2000
+    # API database pool (see app/services/db_guard.py). DB_POOL_SIZE=0 derives the
+    # pool from DB_CONNECTION_BUDGET split across WEB_CONCURRENCY uvicorn workers.
+    db_pool_size: int = 0  # DB_POOL_SIZE
+    db_max_overflow: int = 3  # DB_MAX_OVERFLOW — only used with an explicit DB_POOL_SIZE
+    db_connection_budget: int = 5  # DB_CONNECTION_BUDGET — connections for the whole web service
+    db_pool_timeout: float = 30.0  # DB_POOL_TIMEOUT — seconds to wait for a connection
+    db_pool_wait_alert_ms: int = 250  # DB_POOL_WAIT_ALERT_MS
+    # SQL statements per request before the budget guard reacts (0 disables).
+    db_query_budget: int = 50  # DB_QUERY_BUDGET
+    db_query_budget_mode: Literal["off", "log", "raise"] = "log"  # DB_QUERY_BUDGET_MODE — "raise" in tests/CI
+    # Smallest response body compressed with br/gzip (0 disables compression).
+    response_compression_min_bytes: int = 1024  # RESPONSE_COMPRESSION_MIN_BYTES
+    # health_events partitioning, rollup compaction and retention
+    # (see app/tasks/health_event_maintenance.py)
+    health_events_partition_months_ahead: int = 3  # HEALTH_EVENTS_PARTITION_MONTHS_AHEAD
+    # Device samples older than this are compacted into hourly rollups (0 disables;
+    # compaction deletes raw rows, so it is opt-in).
+    health_events_raw_retention_days: int = 0  # HEALTH_EVENTS_RAW_RETENTION_DAYS
+    health_events_rollup_max_days_per_run: int = 14  # HEALTH_EVENTS_ROLLUP_MAX_DAYS_PER_RUN
+    health_events_archive_after_months: int = 0  # HEALTH_EVENTS_ARCHIVE_AFTER_MONTHS — 0 keeps raw partitions forever
+    health_events_archive_mode: Literal["detach", "drop"] = "detach"  # HEALTH_EVENTS_ARCHIVE_MODE
 
     @model_validator(mode="after")
     def _validate_config(self) -> "Settings":
@@ -12,19 +12,27 @@ from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.pool import NullPool
 
 from app.config import settings
+from app.services.db_guard import InstrumentedAsyncQueuePool, install_query_counter, pool_sizing
+from app.services.telemetry import instrument_engine
 
 # Async engine connected to PostgreSQL via asyncpg driver.
-# FastAPI uses a small pool — 2 connections + 3 overflow is sufficient for the
-# async request model. Each request holds a connection only while awaiting a
-# query; idle time is minimal so a small pool services many concurrent requests.
+# FastAPI uses a small pool — by default 2 connections + 3 overflow per worker
+# (DB_CONNECTION_BUDGET=5). Each request holds a connection only while awaiting
+# a query, so a small pool services many concurrent requests. Checkout waits
+# and saturation are reported by InstrumentedAsyncQueuePool.
+_pool_size, _max_overflow = pool_sizing()
 engine = create_async_engine(
     settings.database_url,
     echo=settings.app_debug,
+    poolclass=InstrumentedAsyncQueuePool,
     pool_pre_ping=True,
-    pool_size=2,
-    max_overflow=3,
+    pool_size=_pool_size,
+    max_overflow=_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
     pool_recycle=1800,
 )
+instrument_engine(engine, "api")
+install_query_counter(engine)
 
 # Session factory for creating async database sessions.
 async_session = async_sessionmaker(
@@ -43,6 +51,7 @@ _worker_engine = create_async_engine(
     pool_pre_ping=True,
     poolclass=NullPool,
 )
+instrument_engine(_worker_engine, "worker")
 worker_async_session = async_sessionmaker(
     _worker_engine,
     class_=AsyncSession,
@@ -7,6 +7,7 @@ Manages the httpx.AsyncClient lifecycle for Supabase Auth calls
 and wires up the MCP framework (registry, client, memory store).
 """
 
+import asyncio
 import logging
 import os
 from collections.abc import AsyncGenerator
@@ -21,13 +22,12 @@ from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.starlette import StarletteIntegration
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request as StarletteRequest
 
 from app.agent.context_manager.memory_store import InMemoryStore
 from app.agent.context_manager.pgvector_memory_store import PgVectorMemoryStore
-from app.middleware.posthog_analytics import PostHogAnalyticsMiddleware
-from app.middleware.sentry_context import SentryUserContextMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.request_context import AnalyticsEventQueue, RequestContextMiddleware
+from app.agent.llm_cache import llm_response_cache
 from app.agent.llm_client import LLMClient
 from app.agent.mcp_client import MCPClient
 from app.api.v1.achievement_routes import router as achievement_router
@@ -62,6 +62,7 @@ from app.api.v1.oura_routes import router as oura_router
 from app.api.v1.oura_webhooks import webhook_router as oura_webhook_router
 from app.api.v1.polar_routes import router as polar_router
 from app.api.v1.polar_webhooks import webhook_router as polar_webhook_router
+from app.api.v1.prometheus_routes import router as prometheus_router
 from app.api.v1.preferences_routes import router as preferences_router
 from app.api.v1.progress_routes import router as progress_router
 from app.api.v1.prompt_suggestions import router as prompt_suggestions_router
@@ -110,8 +111,11 @@ from app.services.rate_limiter import RateLimiter
 from app.services.strava_rate_limiter import StravaRateLimiter
 from app.services.strava_token_service import StravaTokenService
 from app.services.analytics import AnalyticsService
+from app.services.attachment_extraction import shutdown_extraction_pool, warm_extraction_pool
 from app.services.cache_service import CacheService
+from app.services.food_search_index import build_food_index, hydrate_food_index
 from app.services.storage_service import StorageService
+from app.services.telemetry import run_publisher as run_telemetry_publisher
 from app.services.user_tool_resolver import UserToolResolver
 
 # Configure root logger based on environment.
@@ -124,17 +128,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add defensive HTTP security headers to every response."""
-
-    async def dispatch(self, request: StarletteRequest, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains"
-        response.headers["X-XSS-Protection"] = "0"
-        return response
+# Request analytics buffer; flushed to PostHog by a background task started in lifespan.
+analytics_events = AnalyticsEventQueue()
 
 
 def _resolve_cors_origins() -> list[str]:
@@ -333,11 +328,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         app.state.polar_token_service = None
         app.state.polar_rate_limiter = None
 
-    # Dynamic tool injection: resolve tools per user at chat time
-    tool_resolver = UserToolResolver(registry=registry)
-    app.state.mcp_client = MCPClient(registry=registry, tool_resolver=tool_resolver)
+    # Shared Redis client for rate limiting, export throttling, and connection counting.
+    # Must be initialized before the memory store and RateLimiter so the client can be shared.
+    if settings.redis_url:
+        app.state.redis = aioredis.from_url(settings.redis_url, decode_responses=True)
+    else:
+        app.state.redis = None
     # Use PgVector for long-term memory when configured, fall back to in-memory
-    _pgvector_store = PgVectorMemoryStore()
+    _pgvector_store = PgVectorMemoryStore(redis=app.state.redis)
     app.state.memory_store = _pgvector_store if _pgvector_store.is_available else InMemoryStore()
     # Memory MCP tools: only wired when the real vector store is running.
     # Uses _pgvector_store directly (not app.state.memory_store) to guarantee
@@ -350,15 +348,25 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         app.state.llm_client = LLMClient()
     else:
         app.state.llm_client = None
-    # Shared Redis client for rate limiting, export throttling, and connection counting.
-    # Must be initialized before RateLimiter so the client can be shared.
-    if settings.redis_url:
-        app.state.redis = aioredis.from_url(settings.redis_url, decode_responses=True)
-    else:
-        app.state.redis = None
     app.state.rate_limiter = RateLimiter(redis_client=app.state.redis)
+    llm_response_cache.configure(app.state.redis)
+    # Dynamic tool injection: resolve tools per user at chat time. Redis lets
+    # the client's read-tool cache see data version bumps from other processes.
+    tool_resolver = UserToolResolver(registry=registry)
+    app.state.mcp_client = MCPClient(registry=registry, tool_resolver=tool_resolver, redis=app.state.redis)
     app.state.cache_service = CacheService()
     app.state.analytics_service = AnalyticsService()
+    analytics_events.start(app.state.analytics_service)
+    # Food search: serve from memory, seeded now and hydrated from food_cache
+    # in the background (search falls back to Postgres until then).
+    build_food_index()
+    app.state.food_index_hydration = asyncio.create_task(hydrate_food_index(async_session))
+    # Start the PDF extraction workers now rather than on the first upload.
+    app.state.extraction_pool_warmup = asyncio.create_task(warm_extraction_pool())
+    # Publish this worker's metrics so /metrics on any worker can merge them.
+    app.state.telemetry_publisher = (
+        asyncio.create_task(run_telemetry_publisher(app.state.redis, "api")) if app.state.redis is not None else None
+    )
     # Reuse push_svc / device_write_svc created above for the MCP server.
     app.state.push_service = push_svc
     app.state.device_write_service = device_write_svc
@@ -366,13 +374,21 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     yield
 
     # --- Shutdown ---
+    if not app.state.food_index_hydration.done():
+        app.state.food_index_hydration.cancel()
+    if not app.state.extraction_pool_warmup.done():
+        app.state.extraction_pool_warmup.cancel()
+    if app.state.telemetry_publisher is not None:
+        app.state.telemetry_publisher.cancel()
     if getattr(app.state, "redis", None):
         await app.state.redis.aclose()
     if getattr(app.state, "rate_limiter", None) is not None:
         await app.state.rate_limiter.close()
     await http_client.aclose()
+    await analytics_events.stop()
     if hasattr(app.state, "analytics_service"):
         app.state.analytics_service.shutdown()
+    shutdown_extraction_pool()
     print("Zuralog Cloud Brain shutting down")
 
 
@@ -394,10 +410,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(SecurityHeadersMiddleware)
-
-app.add_middleware(SentryUserContextMiddleware)
-app.add_middleware(PostHogAnalyticsMiddleware)
+# br/gzip for large bodies; inside RequestContextMiddleware so route latency includes it.
+app.add_middleware(CompressionMiddleware, minimum_size=settings.response_compression_min_bytes)
+# Security headers, Sentry user context and request analytics (pure ASGI).
+app.add_middleware(RequestContextMiddleware, events=analytics_events)
 
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(chat_router, prefix="/api/v1")  # Phase 1.9
@@ -447,6 +463,7 @@ app.include_router(export_router, prefix="/api/v1")  # User data export
 app.include_router(sleep_router, prefix="/api/v1")  # Sleep detail
 app.include_router(heart_router, prefix="/api/v1")  # Heart detail
 app.include_router(wellness_router, prefix="/api/v1")  # Wellness transcript parsing
+app.include_router(prometheus_router)  # GET /metrics (Prometheus scrape, bearer token)
 
 
 @app.get("/health")
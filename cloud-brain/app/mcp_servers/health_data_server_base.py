@@ -46,9 +46,14 @@ from app.models.health_data import (
     WeightMeasurement,
 )
 from app.models.user_device import UserDevice
+from app.services.data_version import SCOPE_DATA
 
 logger = logging.getLogger(__name__)
 
+# MCPClient reuses read results for the same arguments this long; health
+# ingest and provider syncs invalidate them sooner by bumping SCOPE_DATA.
+_READ_CACHE_TTL_SECONDS = 300
+
 
 class HealthDataServerBase(BaseMCPServer):
     """Abstract base class for health-platform MCP servers.
@@ -188,6 +193,8 @@ class HealthDataServerBase(BaseMCPServer):
                     },
                     "required": ["data_type", "start_date", "end_date"],
                 },
+                cache_ttl_seconds=_READ_CACHE_TTL_SECONDS,
+                cache_scopes=(SCOPE_DATA,),
             ),
             ToolDefinition(
                 name=self._write_tool_name,
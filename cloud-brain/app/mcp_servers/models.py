@@ -18,10 +18,18 @@ class ToolDefinition(BaseModel):
     available and how to call them. The ``input_schema`` field must
     conform to JSON Schema (draft-07+).
 
+    The cache fields are for ``MCPClient`` only and never reach the LLM.
+    Scopes are the data version scopes of :mod:`app.services.data_version`.
+
     Attributes:
         name: Machine-readable identifier (e.g. ``get_activities``).
         description: Human-readable explanation for the LLM prompt.
         input_schema: JSON Schema object defining accepted parameters.
+        cache_ttl_seconds: How long a successful result may be reused for
+            the same user and arguments. ``0`` (default) disables caching.
+        cache_scopes: Scopes the result is read from. A bump of any of them
+            invalidates cached results.
+        invalidates: Scopes a successful call writes to (write tools).
     """
 
     name: str = Field(..., min_length=1, description="Unique tool identifier.")
@@ -30,6 +38,9 @@ class ToolDefinition(BaseModel):
         default_factory=lambda: {"type": "object", "properties": {}, "required": []},
         description="JSON Schema for tool parameters.",
     )
+    cache_ttl_seconds: int = Field(default=0, ge=0, description="Result cache TTL; 0 disables caching.")
+    cache_scopes: tuple[str, ...] = Field(default=(), description="Data version scopes the result reads.")
+    invalidates: tuple[str, ...] = Field(default=(), description="Data version scopes a successful call writes.")
 
 
 class ToolResult(BaseModel):
@@ -24,6 +24,11 @@ from app.mcp_servers.models import Resource, ToolDefinition, ToolResult
 from app.models.user_goal import GoalPeriod, UserGoal
 from app.models.user_streak import UserStreak
 from app.services.achievement_tracker import AchievementTracker
+from app.services.data_version import SCOPE_GOALS
+
+# MCPClient reuses read results for the same arguments this long; goal,
+# streak and achievement writers invalidate them sooner by bumping SCOPE_GOALS.
+_READ_CACHE_TTL_SECONDS = 300
 
 # ---------------------------------------------------------------------------
 # Validation constants
@@ -124,6 +129,8 @@ class UserProgressServer(BaseMCPServer):
                     "properties": {},
                     "required": [],
                 },
+                cache_ttl_seconds=_READ_CACHE_TTL_SECONDS,
+                cache_scopes=(SCOPE_GOALS,),
             ),
             ToolDefinition(
                 name="create_goal",
@@ -163,6 +170,7 @@ class UserProgressServer(BaseMCPServer):
                     },
                     "required": ["type", "period", "title", "target_value"],
                 },
+                invalidates=(SCOPE_GOALS,),
             ),
             ToolDefinition(
                 name="update_goal",
@@ -197,6 +205,7 @@ class UserProgressServer(BaseMCPServer):
                     },
                     "required": ["goal_id"],
                 },
+                invalidates=(SCOPE_GOALS,),
             ),
             ToolDefinition(
                 name="complete_goal",
@@ -211,6 +220,7 @@ class UserProgressServer(BaseMCPServer):
                     },
                     "required": ["goal_id"],
                 },
+                invalidates=(SCOPE_GOALS,),
             ),
             ToolDefinition(
                 name="delete_goal",
@@ -225,6 +235,7 @@ class UserProgressServer(BaseMCPServer):
                     },
                     "required": ["goal_id"],
                 },
+                invalidates=(SCOPE_GOALS,),
             ),
             # ── Streaks ────────────────────────────────────────────────
             ToolDefinition(
@@ -235,6 +246,8 @@ class UserProgressServer(BaseMCPServer):
                     "properties": {},
                     "required": [],
                 },
+                cache_ttl_seconds=_READ_CACHE_TTL_SECONDS,
+                cache_scopes=(SCOPE_GOALS,),
             ),
             # ── Achievements ───────────────────────────────────────────
             ToolDefinition(
@@ -248,6 +261,8 @@ class UserProgressServer(BaseMCPServer):
                     "properties": {},
                     "required": [],
                 },
+                cache_ttl_seconds=_READ_CACHE_TTL_SECONDS,
+                cache_scopes=(SCOPE_GOALS,),
             ),
         ]
 
@@ -24,6 +24,11 @@ from app.mcp_servers.models import Resource, ToolDefinition, ToolResult
 from app.models.insight import Insight
 from app.models.journal_entry import JournalEntry
 from app.models.user_supplement import UserSupplement
+from app.services.data_version import SCOPE_DATA
+
+# MCPClient reuses read results for the same arguments this long; journal,
+# supplement and insight writers invalidate them sooner by bumping SCOPE_DATA.
+_READ_CACHE_TTL_SECONDS = 300
 
 
 class UserWellbeingServer(BaseMCPServer):
@@ -121,6 +126,8 @@ class UserWellbeingServer(BaseMCPServer):
                     },
                     "required": ["start_date", "end_date"],
                 },
+                cache_ttl_seconds=_READ_CACHE_TTL_SECONDS,
+                cache_scopes=(SCOPE_DATA,),
             ),
             # ── Supplements ────────────────────────────────────────────
             ToolDefinition(
@@ -131,6 +138,8 @@ class UserWellbeingServer(BaseMCPServer):
                     "properties": {},
                     "required": [],
                 },
+                cache_ttl_seconds=_READ_CACHE_TTL_SECONDS,
+                cache_scopes=(SCOPE_DATA,),
             ),
             ToolDefinition(
                 name="add_supplement",
@@ -153,6 +162,7 @@ class UserWellbeingServer(BaseMCPServer):
                     },
                     "required": ["name"],
                 },
+                invalidates=(SCOPE_DATA,),
             ),
             ToolDefinition(
                 name="remove_supplement",
@@ -170,6 +180,7 @@ class UserWellbeingServer(BaseMCPServer):
                     },
                     "required": ["supplement_id"],
                 },
+                invalidates=(SCOPE_DATA,),
             ),
             # ── Insights (read-only) ───────────────────────────────────
             ToolDefinition(
@@ -189,6 +200,8 @@ class UserWellbeingServer(BaseMCPServer):
                     },
                     "required": [],
                 },
+                cache_ttl_seconds=_READ_CACHE_TTL_SECONDS,
+                cache_scopes=(SCOPE_DATA,),
             ),
         ]
 
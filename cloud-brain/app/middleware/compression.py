@@ -0,0 +1,186 @@
+"""
+Response compression ASGI middleware.
+
+Compresses response bodies of at least ``RESPONSE_COMPRESSION_MIN_BYTES``
+with the best encoding the client accepts: Brotli (``br``) when the
+optional ``brotli`` package is installed, otherwise ``gzip``. Smaller
+bodies go out unchanged because compression would cost more than it
+saves.
+
+Skipped without touching the body:
+
+- responses that already carry ``Content-Encoding`` (e.g. a pre-built
+  zip export), partial content (206), and bodies that don't compress
+  (images, archives, Server-Sent Events, which must flush per event);
+- clients that send no usable ``Accept-Encoding``.
+
+Streaming bodies are compressed incrementally with a sync flush after
+each chunk, so NDJSON and similar streams still reach the client as they
+are produced. Bodies of 256 KiB or more are compressed in a worker
+thread to keep the event loop free.
+
+Every response records its on-the-wire body size per route template and
+encoding in ``http_response_body_bytes`` (:mod:`app.services.telemetry`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import zlib
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.telemetry import RESPONSE_BODY_BYTES
+
+try:
+    import brotli
+except ImportError:  # optional — gzip only
+    brotli = None  # type: ignore[assignment]
+
+# Media types that are already compressed or must not be buffered.
+_EXCLUDED_TYPES = frozenset(
+    {
+        "application/gzip",
+        "application/x-gzip",
+        "application/zip",
+        "application/octet-stream",
+        "text/event-stream",
+    }
+)
+_EXCLUDED_PREFIXES = ("image/", "audio/", "video/", "font/")
+
+_THREAD_MIN_BYTES = 256 * 1024
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Return ``"br"``, ``"gzip"`` or ``None`` for an ``Accept-Encoding`` value."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding] = q
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def _compressible(media_type: str) -> bool:
+    return media_type not in _EXCLUDED_TYPES and not media_type.startswith(_EXCLUDED_PREFIXES)
+
+
+class _Encoder:
+    """Incremental ``br``/``gzip`` encoder."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._br: Any = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def _encode(self, body: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._br.process(body)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._gzip.compress(body)
+        return out + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    async def encode(self, body: bytes, final: bool) -> bytes:
+        if len(body) >= _THREAD_MIN_BYTES:
+            return await asyncio.to_thread(self._encode, body, final)
+        return self._encode(body, final)
+
+
+class CompressionMiddleware:
+    """Negotiated ``br``/``gzip`` response compression above a size threshold.
+
+    Args:
+        app: The wrapped ASGI application.
+        minimum_size: Smallest body (bytes) worth compressing; 0 disables compression.
+        gzip_level: zlib compression level.
+        brotli_quality: Brotli quality (0-11). Low values suit dynamic responses.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept) if self.minimum_size > 0 and accept else None
+
+        start_message: Message | None = None
+        encoder: _Encoder | None = None
+        wire_bytes = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, encoder, wire_bytes
+            message_type = message["type"]
+            if message_type == "http.response.start":
+                start_message = message
+                return
+            if message_type != "http.response.body":
+                if start_message is not None:
+                    await send(start_message)
+                    start_message = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                # First body chunk: decide once for the whole response.
+                headers = list(start_message.get("headers", ()))
+                names = {name.lower(): value for name, value in headers}
+                media_type = names.get(b"content-type", b"").decode("latin-1").partition(";")[0].strip().lower()
+                eligible = (
+                    b"content-encoding" not in names
+                    and start_message["status"] != 206
+                    and _compressible(media_type)
+                    and (more_body or len(body) >= self.minimum_size)
+                )
+                if eligible:
+                    headers.append((b"vary", b"Accept-Encoding"))
+                if eligible and encoding is not None:
+                    encoder = _Encoder(encoding, self.gzip_level, self.brotli_quality)
+                    headers = [h for h in headers if h[0].lower() != b"content-length"]
+                    headers.append((b"content-encoding", encoding.encode()))
+                    body = await encoder.encode(body, final=not more_body)
+                    if not more_body:
+                        headers.append((b"content-length", str(len(body)).encode()))
+                    message = {**message, "body": body}
+                await send({**start_message, "headers": headers})
+                start_message = None
+            elif encoder is not None:
+                message = {**message, "body": await encoder.encode(body, final=not more_body)}
+
+            wire_bytes += len(message.get("body", b""))
+            await send(message)
+            if not more_body:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                RESPONSE_BODY_BYTES.observe(wire_bytes, route, encoder.encoding if encoder else "identity")
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,271 @@
+"""
+Request context ASGI middleware.
+
+One pure-ASGI layer that replaces the former ``BaseHTTPMiddleware`` stack
+(security headers, Sentry user context, PostHog request analytics).
+``BaseHTTPMiddleware`` runs every request through an extra task and
+re-streams the response body once per middleware. This layer only wraps
+``send``:
+
+- Security headers are merged into the ``http.response.start`` message.
+- The Sentry user context is set from ``scope["state"]["user_id"]`` when
+  the response starts. Route handlers populate it after validating the
+  bearer token, so it is present by then.
+- An ``api_request`` event is appended to a bounded in-memory queue
+  (:class:`AnalyticsEventQueue`). A background task drains the queue in
+  batches off the event loop. IP hashing and the PostHog ``capture``
+  calls happen there, not on the request path. When the queue is full,
+  new events are dropped and counted rather than blocking requests.
+- Route latency (to the last body byte, so background tasks are excluded)
+  and SQL statements per request go to the process telemetry registry
+  (:mod:`app.services.telemetry`), labelled by route template. The
+  statement count is checked against the request's query budget
+  (:mod:`app.services.db_guard`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+import sentry_sdk
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.db_guard import RequestQueries, check_query_budget, request_queries
+from app.services.telemetry import HTTP_REQUEST_DB_QUERIES, HTTP_REQUEST_DURATION
+
+logger = logging.getLogger(__name__)
+
+SECURITY_HEADERS: tuple[tuple[bytes, bytes], ...] = (
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"strict-transport-security", b"max-age=63072000; includeSubDomains"),
+    (b"x-xss-protection", b"0"),
+)
+_SECURITY_HEADER_NAMES = frozenset(name for name, _ in SECURITY_HEADERS)
+
+# Paths with no Sentry user context, analytics event or route metrics.
+_UNTRACKED_PATHS = frozenset({"/health", "/metrics", "/docs", "/openapi.json", "/redoc", "/favicon.ico"})
+
+
+class AnalyticsEventQueue:
+    """Bounded buffer of request events, flushed to PostHog in batches.
+
+    ``put`` is O(1) and never blocks. Events are accepted only between
+    ``start`` and ``stop``, and only when analytics is enabled.
+
+    Attributes:
+        dropped: Events discarded because the queue was full.
+    """
+
+    def __init__(self, maxsize: int = 10_000, batch_size: int = 200, flush_interval: float = 1.0) -> None:
+        self._events: deque[tuple] = deque()
+        self._maxsize = maxsize
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._analytics: Any = None
+        self.dropped = 0
+
+    @property
+    def accepting(self) -> bool:
+        return self._analytics is not None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def put(self, event: tuple) -> None:
+        """Queue a raw request event (see ``RequestContextMiddleware``)."""
+        if self._analytics is None:
+            return
+        if len(self._events) >= self._maxsize:
+            self.dropped += 1
+            return
+        self._events.append(event)
+        if len(self._events) >= self._batch_size:
+            self._wakeup.set()
+
+    def start(self, analytics: Any) -> None:
+        """Begin accepting events and start the flush loop (no-op when analytics is disabled)."""
+        if analytics is None or not getattr(analytics, "enabled", False):
+            return
+        self._analytics = analytics
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting events and flush whatever is still queued."""
+        analytics, self._analytics = self._analytics, None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if analytics is not None:
+            while self._events:
+                await asyncio.to_thread(self._flush, analytics, self._drain())
+        if self.dropped:
+            logger.warning("AnalyticsEventQueue dropped %d events (queue full)", self.dropped)
+
+    def _drain(self) -> list[tuple]:
+        batch = []
+        while self._events and len(batch) < self._batch_size:
+            batch.append(self._events.popleft())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._events:
+                try:
+                    await asyncio.to_thread(self._flush, self._analytics, self._drain())
+                except Exception:  # noqa: BLE001
+                    logger.warning("AnalyticsEventQueue flush failed", exc_info=True)
+
+    @staticmethod
+    def _flush(analytics: Any, batch: list[tuple]) -> None:
+        for event in batch:
+            distinct_id, properties, timestamp = _event_payload(*event)
+            analytics.capture(
+                distinct_id=distinct_id,
+                event="api_request",
+                properties=properties,
+                timestamp=timestamp,
+            )
+
+
+def _distinct_id(user_id: str | None, client_host: str | None, timestamp: datetime) -> str:
+    if user_id:
+        return user_id
+    if client_host:
+        # Hash the IP to avoid storing raw PII in PostHog.
+        # Daily salt rotation prevents long-term IP tracking while
+        # preserving within-day session continuity.
+        day_salt = timestamp.strftime("%Y-%m-%d")
+        ip_hash = hashlib.sha256(f"{client_host}:{day_salt}".encode()).hexdigest()[:12]
+        return f"anon_{ip_hash}"
+    return "anon_unknown"
+
+
+def _event_payload(
+    method: str,
+    path: str,
+    status_code: int,
+    duration_ms: float,
+    user_agent: str,
+    current_url: str,
+    route_pattern: str | None,
+    user_id: str | None,
+    client_host: str | None,
+    timestamp: datetime,
+) -> tuple[str, dict[str, Any], datetime]:
+    properties: dict[str, Any] = {
+        "method": method,
+        "path": path,
+        "status_code": status_code,
+        "duration_ms": duration_ms,
+        "user_agent": user_agent,
+        "$current_url": current_url,
+    }
+    if route_pattern:
+        properties["route_pattern"] = route_pattern
+    return _distinct_id(user_id, client_host, timestamp), properties, timestamp
+
+
+def _header(scope: Scope, name: bytes) -> str:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
+
+def _current_url(scope: Scope) -> str:
+    scheme = scope.get("scheme", "http")
+    host = _header(scope, b"host")
+    if not host and scope.get("server"):
+        server_host, port = scope["server"]
+        host = f"{server_host}:{port}" if port else server_host
+    return f"{scheme}://{host}{scope.get('root_path', '')}{scope['path']}"
+
+
+class RequestContextMiddleware:
+    """Security headers, Sentry user context and request analytics in one ASGI layer.
+
+    Args:
+        app: The wrapped ASGI application.
+        events: Queue that receives one raw event per tracked request.
+    """
+
+    def __init__(self, app: ASGIApp, events: AnalyticsEventQueue | None = None) -> None:
+        self.app = app
+        self.events = events
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracked = scope["path"] not in _UNTRACKED_PATHS
+        state = scope.setdefault("state", {})
+        status_code = 500
+        queries = RequestQueries()
+        finished: tuple[float, int] | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [h for h in message.get("headers", ()) if h[0].lower() not in _SECURITY_HEADER_NAMES]
+                headers.extend(SECURITY_HEADERS)
+                message = {**message, "headers": headers}
+                if tracked:
+                    sentry_sdk.set_user({"id": state["user_id"]} if state.get("user_id") else None)
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = (time.perf_counter(), queries.count)
+            await send(message)
+
+        start = time.perf_counter()
+        token = request_queries.set(queries) if tracked else None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                request_queries.reset(token)
+                # Unmatched paths share one label so scanners can't inflate cardinality.
+                route_label = getattr(scope.get("route"), "path", None) or "unmatched"
+                end, query_count = finished or (time.perf_counter(), queries.count)
+                HTTP_REQUEST_DURATION.observe(end - start, scope["method"], route_label, str(status_code))
+                HTTP_REQUEST_DB_QUERIES.observe(query_count, scope["method"], route_label)
+                check_query_budget(queries, scope["method"], route_label)
+
+        if not tracked:
+            return
+        events = self.events
+        if events is not None and events.accepting and scope["method"] != "OPTIONS":
+            client = scope.get("client")
+            events.put(
+                (
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    round((time.perf_counter() - start) * 1000, 2),
+                    _header(scope, b"user-agent"),
+                    _current_url(scope),
+                    getattr(scope.get("route"), "path", None),
+                    state.get("user_id"),
+                    client[0] if client else None,
+                    datetime.now(timezone.utc),
+                )
+            )
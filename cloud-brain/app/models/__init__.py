@@ -17,6 +17,7 @@ from app.models.exercise_entry import ExerciseEntry  # noqa: F401
 from app.models.food_cache import FoodCache  # noqa: F401
 from app.models.food_correction import FoodCorrection  # noqa: F401
 from app.models.health_event import HealthEvent  # noqa: F401
+from app.models.health_event_rollup import HealthEventCompaction, HealthEventRollup  # noqa: F401
 from app.models.health_data import (  # noqa: F401
     ActivityType,
     NutritionEntry,
@@ -37,6 +38,7 @@ from app.models.quick_log import QuickLog, VALID_METRIC_TYPES  # noqa: F401
 from app.models.report import Report, ReportType  # noqa: F401
 from app.models.rule_suggestion_snooze import RuleSuggestionSnooze  # noqa: F401
 from app.models.user import SubscriptionTier, User  # noqa: F401
+from app.models.user_correlation_matrix import UserCorrelationMatrix  # noqa: F401
 from app.models.user_device import UserDevice  # noqa: F401
 from app.models.user_goal import GoalPeriod, UserGoal  # noqa: F401
 from app.models.user_preferences import (  # noqa: F401
@@ -68,6 +70,8 @@ __all__ = [
     "FoodCorrection",
     "GoalPeriod",
     "HealthEvent",
+    "HealthEventCompaction",
+    "HealthEventRollup",
     "Insight",
     "Integration",
     "JournalEntry",
@@ -89,6 +93,7 @@ __all__ = [
     "SubscriptionTier",
     "UnifiedActivity",
     "User",
+    "UserCorrelationMatrix",
     "UserDevice",
     "UserGoal",
     "UserPreferences",
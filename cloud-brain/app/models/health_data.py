@@ -16,7 +16,7 @@ import uuid
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, UniqueConstraint, text
 from sqlalchemy import Enum as SAEnum
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -63,11 +63,22 @@ class UnifiedActivity(Base):
         distance_meters: Distance covered in meters (nullable).
         calories: Energy expenditure in kcal (default 0).
         start_time: When the activity began (timezone-aware).
+        superseded_by: ID of the higher-priority record of the same workout
+            from another source, set by the write-time dedup stage in
+            ``app.analytics.deduplication``. ``None`` for winners.
         created_at: Row creation timestamp (server-side default).
     """
 
     __tablename__ = "unified_activities"
-    __table_args__ = (UniqueConstraint("user_id", "source", "original_id", name="uq_activity_user_source_original"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "source", "original_id", name="uq_activity_user_source_original"),
+        Index(
+            "ix_unified_activities_winners",
+            "user_id",
+            "start_time",
+            postgresql_where=text("superseded_by IS NULL"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(
         String,
@@ -86,6 +97,7 @@ class UnifiedActivity(Base):
     distance_meters: Mapped[float | None] = mapped_column(Float, nullable=True)
     calories: Mapped[int] = mapped_column(Integer, default=0)
     start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    superseded_by: Mapped[str | None] = mapped_column(String, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -1,4 +1,10 @@
-"""HealthEvent ORM model — source of truth for all health data."""
+"""HealthEvent ORM model — source of truth for all health data.
+
+The table is RANGE-partitioned by month on ``local_date`` (see migration
+e6a0c3d4f9b5), so ``local_date`` is part of the primary key. Device samples
+older than the raw retention window are compacted into
+:class:`~app.models.health_event_rollup.HealthEventRollup`.
+"""
 import uuid
 from datetime import date, datetime
 
@@ -12,6 +18,7 @@ from app.database import Base
 
 class HealthEvent(Base):
     __tablename__ = "health_events"
+    __table_args__ = {"postgresql_partition_by": "RANGE (local_date)"}
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[str] = mapped_column(sa.String, nullable=False, index=True)
@@ -20,7 +27,7 @@ class HealthEvent(Base):
     unit: Mapped[str] = mapped_column(sa.String(50), nullable=False)
     source: Mapped[str] = mapped_column(sa.String(100), nullable=False)
     recorded_at: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=False)
-    local_date: Mapped[date] = mapped_column(sa.Date, nullable=False)
+    local_date: Mapped[date] = mapped_column(sa.Date, primary_key=True)
     created_at: Mapped[datetime] = mapped_column(
         sa.TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
     )
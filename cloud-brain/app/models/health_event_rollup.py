@@ -0,0 +1,51 @@
+"""HealthEventRollup ORM models — hourly aggregates of compacted device samples and compaction progress."""
+from datetime import date, datetime
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class HealthEventRollup(Base):
+    """One hour of a user's device samples for one (metric, source).
+
+    Written by ``app.services.health_event_rollups.compact_day`` when raw
+    point-in-time samples age out of ``health_events``. Carries enough
+    state (count, sum, latest sample) for ``aggregate_events`` to rebuild
+    daily_summaries exactly.
+    """
+
+    __tablename__ = "health_event_rollups"
+    __table_args__ = (sa.Index("idx_health_event_rollups_local_date", "local_date"),)
+
+    user_id: Mapped[str] = mapped_column(sa.String, primary_key=True)
+    metric_type: Mapped[str] = mapped_column(sa.Text, primary_key=True)
+    local_date: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+    source: Mapped[str] = mapped_column(sa.Text, primary_key=True)
+    hour_start: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), primary_key=True)
+    unit: Mapped[str] = mapped_column(sa.Text, nullable=False)
+    sample_count: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+    value_sum: Mapped[float] = mapped_column(sa.Float(precision=53), nullable=False)
+    value_min: Mapped[float] = mapped_column(sa.Float(precision=53), nullable=False)
+    value_max: Mapped[float] = mapped_column(sa.Float(precision=53), nullable=False)
+    last_value: Mapped[float] = mapped_column(sa.Float(precision=53), nullable=False)
+    last_recorded_at: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=False)
+    last_created_at: Mapped[datetime] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=False)
+
+
+class HealthEventCompaction(Base):
+    """Rollup compaction progress for one monthly ``health_events`` partition.
+
+    ``compacted_through`` is the last day of the month that has been
+    compacted. Ingest moves it back when late device samples land on a day
+    already compacted, so the maintenance task picks that day up again.
+    """
+
+    __tablename__ = "health_event_compaction"
+
+    month_start: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+    compacted_through: Mapped[date] = mapped_column(sa.Date, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.func.now()
+    )
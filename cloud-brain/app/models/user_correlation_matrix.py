@@ -0,0 +1,35 @@
+"""UserCorrelationMatrix ORM model — precomputed per-user correlation store."""
+from datetime import date, datetime
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class UserCorrelationMatrix(Base):
+    """One row per user: the dense daily metric matrix and its correlations.
+
+    ``matrix`` holds ``window_days`` rows (oldest first, starting at
+    ``window_start``) of ``metrics`` columns, with ``null`` for missing
+    days. ``cells`` holds every defined (metric_a, metric_b, lag) Pearson
+    result. ``source_watermark`` / ``source_row_count`` describe the
+    ``daily_summaries`` rows the matrix was built from, so a refresh only
+    has to fetch rows recomputed after the watermark.
+    """
+
+    __tablename__ = "user_correlation_matrices"
+
+    user_id: Mapped[str] = mapped_column(sa.String, primary_key=True)
+    window_start: Mapped[date] = mapped_column(sa.Date, nullable=False)
+    window_days: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+    metrics: Mapped[list] = mapped_column(JSONB, nullable=False)
+    matrix: Mapped[list] = mapped_column(JSONB, nullable=False)
+    cells: Mapped[list] = mapped_column(JSONB, nullable=False)
+    source_watermark: Mapped[datetime | None] = mapped_column(sa.TIMESTAMP(timezone=True), nullable=True)
+    source_row_count: Mapped[int] = mapped_column(sa.Integer, nullable=False, default=0)
+    computed_at: Mapped[datetime] = mapped_column(
+        sa.TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
+    )
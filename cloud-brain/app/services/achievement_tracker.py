@@ -19,11 +19,13 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any
 
+import redis.asyncio as aioredis
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.achievement import Achievement
+from app.services.data_version import SCOPE_GOALS, bump_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -170,6 +172,7 @@ class AchievementTracker:
         user_id: str,
         achievement_key: str,
         db: AsyncSession,
+        redis: aioredis.Redis | None = None,
     ) -> bool:
         """Unlock an achievement for a user if not already unlocked.
 
@@ -184,6 +187,9 @@ class AchievementTracker:
             user_id: The authenticated user's ID.
             achievement_key: Stable key from the achievement registry.
             db: Async database session.
+            redis: Client for the data-version bump, e.g.
+                ``request.app.state.redis``; ``None`` (Celery) opens a
+                short-lived one.
 
         Returns:
             ``True`` if the achievement was newly unlocked, ``False``
@@ -246,6 +252,7 @@ class AchievementTracker:
             achievement_key,
             user_id,
         )
+        await bump_data_version(user_id, SCOPE_GOALS, redis=redis)
 
         # Soft push notification — non-critical; never raises.
         self._send_unlock_notification(user_id, achievement_key)
@@ -257,6 +264,7 @@ class AchievementTracker:
         user_id: str,
         streak_count: int,
         db: AsyncSession,
+        redis: aioredis.Redis | None = None,
     ) -> list[str]:
         """Unlock any streak achievements earned by reaching ``streak_count``.
 
@@ -267,6 +275,7 @@ class AchievementTracker:
             user_id: The authenticated user's ID.
             streak_count: Current streak length in days.
             db: Async database session.
+            redis: Passed through to ``unlock()``.
 
         Returns:
             A list of achievement keys that were newly unlocked (may be
@@ -276,7 +285,7 @@ class AchievementTracker:
 
         for threshold, key in _STREAK_MILESTONES:
             if streak_count >= threshold:
-                was_unlocked = await self.unlock(user_id, key, db)
+                was_unlocked = await self.unlock(user_id, key, db, redis=redis)
                 if was_unlocked:
                     newly_unlocked.append(key)
 
@@ -2,6 +2,9 @@
 
 No database access. Takes a list of event dicts (value, recorded_at) and
 returns an aggregated result using the rule from metric_definitions.
+Hourly rollups of compacted samples (health_event_rollups) can be merged in
+alongside raw events; the result is identical to aggregating the original
+samples.
 """
 from dataclasses import dataclass
 from datetime import datetime
@@ -18,25 +21,33 @@ def aggregate_events(
     events: list[dict],   # each: {"value": float, "recorded_at": datetime}
     fn: str,              # "sum" | "avg" | "latest"
     unit: str,
+    rollups: list[dict] | None = None,  # each: {"sample_count", "value_sum", "last_value", ...}
 ) -> AggregationResult | None:
     """Compute the aggregated daily value from a list of health events.
 
-    Returns None if events is empty (caller should not upsert daily_summaries
-    for an empty event set — this means all events were deleted).
+    ``rollups`` are hourly aggregates with ``sample_count``, ``value_sum``,
+    ``last_value``, ``last_recorded_at`` and ``last_created_at`` keys; each
+    counts as ``sample_count`` events.
+
+    Returns None if there is nothing to aggregate (caller should not upsert
+    daily_summaries for an empty event set — this means all events were deleted).
     """
-    if not events:
+    rollups = rollups or []
+    count = len(events) + sum(r["sample_count"] for r in rollups)
+    if count == 0:
         return None
 
-    values = [e["value"] for e in events]
-
-    if fn == "sum":
-        return AggregationResult(value=sum(values), event_count=len(events), unit=unit)
-
-    if fn == "avg":
-        return AggregationResult(value=sum(values) / len(values), event_count=len(events), unit=unit)
+    if fn in ("sum", "avg"):
+        total = sum(e["value"] for e in events) + sum(r["value_sum"] for r in rollups)
+        value = total if fn == "sum" else total / count
+        return AggregationResult(value=value, event_count=count, unit=unit)
 
     if fn == "latest":
-        latest = max(events, key=lambda e: (e["recorded_at"], e.get("created_at", datetime.min)))
-        return AggregationResult(value=latest["value"], event_count=len(events), unit=unit)
+        candidates = events + [
+            {"value": r["last_value"], "recorded_at": r["last_recorded_at"], "created_at": r["last_created_at"]}
+            for r in rollups
+        ]
+        latest = max(candidates, key=lambda e: (e["recorded_at"], e.get("created_at", datetime.min)))
+        return AggregationResult(value=latest["value"], event_count=count, unit=unit)
 
     raise ValueError(f"Unknown aggregation_fn: {fn!r}. Must be 'sum', 'avg', or 'latest'.")
@@ -0,0 +1,464 @@
+"""
+Zuralog Cloud Brain — Attachment Text Extraction.
+
+Turns uploaded document bytes into bounded, LLM-ready text:
+
+* **PDF** — parsed page by page with ``pypdf``. The async entry point runs
+  parsing in a small process pool so a pathological PDF can never stall the
+  event loop or hold the GIL. Extraction is bounded by a per-page time
+  budget, a total time budget, and per-page / total character budgets;
+  whatever was extracted before a budget tripped is returned. Pool workers
+  are started with ``spawn``: forking the API process, with its event loop,
+  thread pools and telemetry/Sentry threads, could copy a lock held by
+  another thread and deadlock the child. ``warm_extraction_pool`` starts
+  them at application startup so the first upload does not pay for it.
+* **CSV** — read as a row stream (never decoded into one string), with the
+  dialect and header sniffed from a small sample. Instead of the raw rows,
+  the result is a compact profile: row count, per-column type, and
+  count / min / max / mean for numeric columns, plus a short preview.
+* **Plain text** — decoded up to a character budget.
+
+Results are cached in-process by SHA-256 of the content (plus MIME type),
+so re-uploading the same file skips extraction entirely.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import concurrent.futures
+import csv
+import hashlib
+import io
+import logging
+import math
+import multiprocessing
+import signal
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Budgets
+# ---------------------------------------------------------------------------
+
+PDF_MAX_PAGES = 50
+PDF_PAGE_TIME_BUDGET = 2.0  # seconds per page before the page is abandoned
+PDF_TOTAL_TIME_BUDGET = 10.0  # seconds for the whole document
+PDF_PAGE_CHAR_BUDGET = 8_000
+TEXT_CHAR_BUDGET = 50_000  # applies to PDF totals and plain text
+
+CSV_MAX_ROWS = 200_000
+CSV_MAX_COLUMNS = 50
+CSV_SNIFF_BYTES = 8_192
+CSV_PREVIEW_ROWS = 5
+CSV_TOTAL_TIME_BUDGET = 5.0
+
+_CACHE_MAX_ENTRIES = 256
+
+PDF_POOL_WORKERS = 2
+
+_pdf_pool: concurrent.futures.ProcessPoolExecutor | None = None
+
+
+def _get_pdf_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Return the lazily created PDF worker pool (shared per process)."""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=PDF_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_pool
+
+
+def _warm_worker() -> None:
+    """Import the PDF parser in a pool worker ahead of the first upload."""
+    import pypdf  # noqa: F401, PLC0415 — loaded in the worker, not the API process
+
+
+async def warm_extraction_pool() -> None:
+    """Start every PDF pool worker now (called at application startup).
+
+    Spawned workers boot a fresh interpreter, so starting them lazily would
+    add that to the first PDF upload. Failures are logged; the pool then
+    starts workers on demand as before.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pdf_pool()
+    try:
+        await asyncio.gather(*(loop.run_in_executor(pool, _warm_worker) for _ in range(PDF_POOL_WORKERS)))
+    except Exception as exc:
+        logger.warning("warm_extraction_pool: could not start PDF workers: %s", exc)
+
+
+def shutdown_extraction_pool() -> None:
+    """Shut down the PDF worker pool (called on application shutdown)."""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+# ---------------------------------------------------------------------------
+# Content-hash cache
+# ---------------------------------------------------------------------------
+
+_cache: OrderedDict[str, str | None] = OrderedDict()
+
+
+def content_key(file_bytes: bytes, content_type: str) -> str:
+    """Return the cache key for a file's extracted text."""
+    return f"{content_type}:{hashlib.sha256(file_bytes).hexdigest()}"
+
+
+def _cache_get(key: str) -> tuple[bool, str | None]:
+    if key in _cache:
+        _cache.move_to_end(key)
+        return True, _cache[key]
+    return False, None
+
+
+def _cache_put(key: str, value: str | None) -> None:
+    _cache[key] = value
+    _cache.move_to_end(key)
+    if len(_cache) > _CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+def clear_extraction_cache() -> None:
+    """Drop all cached extraction results."""
+    _cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# Plain text
+# ---------------------------------------------------------------------------
+
+
+def decode_text(file_bytes: bytes, char_budget: int = TEXT_CHAR_BUDGET) -> str | None:
+    """Decode a text file as UTF-8 (latin-1 fallback) up to ``char_budget`` chars.
+
+    Decodes incrementally so a 10 MB file does not materialise as a 10 MB
+    string when only the first ``char_budget`` characters are needed.
+    """
+    for encoding in ("utf-8", "latin-1"):
+        decoder = codecs.getincrementaldecoder(encoding)()
+        parts: list[str] = []
+        length = 0
+        try:
+            for start in range(0, len(file_bytes), 64 * 1024):
+                chunk = decoder.decode(file_bytes[start : start + 64 * 1024])
+                parts.append(chunk)
+                length += len(chunk)
+                if length >= char_budget:
+                    break
+            else:
+                parts.append(decoder.decode(b"", final=True))
+        except UnicodeDecodeError:
+            continue
+        text = "".join(parts)
+        if len(text) > char_budget:
+            text = text[:char_budget] + f"\n... [truncated at {char_budget} characters]"
+        return text
+    logger.warning("decode_text: could not decode text file — returning None")
+    return None
+
+
+# ---------------------------------------------------------------------------
+# PDF
+# ---------------------------------------------------------------------------
+
+
+class _PageTimeout(Exception):
+    """Raised inside the worker when a single page exceeds its time budget."""
+
+
+def _raise_page_timeout(signum: int, frame: Any) -> None:  # pragma: no cover — signal handler
+    raise _PageTimeout()
+
+
+def extract_pdf_text(
+    file_bytes: bytes,
+    max_pages: int = PDF_MAX_PAGES,
+    page_time_budget: float = PDF_PAGE_TIME_BUDGET,
+    total_time_budget: float = PDF_TOTAL_TIME_BUDGET,
+    page_char_budget: int = PDF_PAGE_CHAR_BUDGET,
+    total_char_budget: int = TEXT_CHAR_BUDGET,
+) -> str | None:
+    """Extract text from a PDF page by page within time and size budgets.
+
+    Safe to call in a worker process (the async path) or inline. The
+    per-page time budget uses ``SIGALRM`` and is only enforced when running
+    on the main thread of a POSIX process — always the case in the pool.
+
+    Returns:
+        The extracted text with page markers, a short note when the PDF has
+        no extractable text, or None if the PDF could not be opened.
+    """
+    from pypdf import PdfReader  # noqa: PLC0415 — keep the import in the worker
+
+    try:
+        reader = PdfReader(io.BytesIO(file_bytes))
+        page_count = len(reader.pages)
+    except Exception as exc:
+        logger.warning("extract_pdf_text: could not open PDF: %s", exc)
+        return None
+
+    use_alarm = hasattr(signal, "setitimer")
+    if use_alarm:
+        try:
+            previous_handler = signal.signal(signal.SIGALRM, _raise_page_timeout)
+        except ValueError:  # not on the main thread
+            use_alarm = False
+
+    deadline = time.monotonic() + total_time_budget
+    parts: list[str] = []
+    total_chars = 0
+    notes: list[str] = []
+    try:
+        for index in range(min(page_count, max_pages)):
+            if time.monotonic() >= deadline:
+                notes.append(f"stopped after {index} pages (time budget)")
+                break
+            try:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, page_time_budget)
+                page_text = reader.pages[index].extract_text() or ""
+            except _PageTimeout:
+                notes.append(f"page {index + 1} skipped (too slow)")
+                continue
+            except Exception as exc:
+                logger.debug("extract_pdf_text: page %d failed: %s", index + 1, exc)
+                continue
+            finally:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+
+            page_text = page_text.strip()[:page_char_budget]
+            if not page_text:
+                continue
+            remaining = total_char_budget - total_chars
+            if remaining <= 0:
+                notes.append(f"stopped at page {index + 1} (size budget)")
+                break
+            page_text = page_text[:remaining]
+            parts.append(f"[Page {index + 1}]\n{page_text}")
+            total_chars += len(page_text)
+        if page_count > max_pages:
+            notes.append(f"only the first {max_pages} of {page_count} pages were read")
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous_handler)
+
+    if not parts:
+        return "PDF contains no extractable text (it may be a scanned image)."
+    text = "\n\n".join(parts)
+    if notes:
+        text += "\n\n... [" + "; ".join(notes) + "]"
+    return text
+
+
+# ---------------------------------------------------------------------------
+# CSV
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _ColumnProfile:
+    name: str
+    count: int = 0
+    numeric: int = 0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+    mean: float = 0.0
+    samples: list[str] = field(default_factory=list)
+
+    def add(self, raw: str) -> None:
+        value = raw.strip()
+        if not value:
+            return
+        self.count += 1
+        try:
+            number = float(value.replace(",", ""))
+        except ValueError:
+            if len(self.samples) < 3 and value not in self.samples:
+                self.samples.append(value[:40])
+            return
+        if math.isnan(number) or math.isinf(number):
+            return
+        self.numeric += 1
+        self.minimum = min(self.minimum, number)
+        self.maximum = max(self.maximum, number)
+        self.mean += (number - self.mean) / self.numeric
+
+    def describe(self) -> str:
+        if self.count == 0:
+            return f"- {self.name}: empty"
+        if self.numeric and self.numeric >= 0.9 * self.count:
+            return (
+                f"- {self.name}: numeric, n={self.numeric}, min={_fmt(self.minimum)}, "
+                f"max={_fmt(self.maximum)}, mean={_fmt(self.mean)}"
+            )
+        examples = ", ".join(self.samples)
+        return f"- {self.name}: text, n={self.count}" + (f" (e.g. {examples})" if examples else "")
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.0f}" if value == int(value) and abs(value) < 1e12 else f"{value:.2f}"
+
+
+def profile_csv(
+    file_bytes: bytes,
+    max_rows: int = CSV_MAX_ROWS,
+    max_columns: int = CSV_MAX_COLUMNS,
+    time_budget: float = CSV_TOTAL_TIME_BUDGET,
+) -> str | None:
+    """Stream a CSV and return a summarized profile instead of the raw text.
+
+    Sniffs the delimiter and header from the first few KB, then reads rows
+    one at a time, keeping only running per-column statistics and a short
+    preview in memory.
+    """
+    sample = file_bytes[:CSV_SNIFF_BYTES].decode("utf-8", errors="replace")
+    if not sample.strip():
+        return None
+    sniffer = csv.Sniffer()
+    try:
+        dialect: Any = sniffer.sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    try:
+        has_header = sniffer.has_header(sample)
+    except csv.Error:
+        has_header = True
+
+    stream = io.TextIOWrapper(io.BytesIO(file_bytes), encoding="utf-8", errors="replace", newline="")
+    reader = csv.reader(stream, dialect)
+    columns: list[_ColumnProfile] = []
+    preview: list[list[str]] = []
+    rows = 0
+    truncated_reason: str | None = None
+    deadline = time.monotonic() + time_budget
+
+    try:
+        for row in reader:
+            if not columns:
+                width = min(len(row), max_columns)
+                names = row[:width] if has_header else [f"column_{i + 1}" for i in range(width)]
+                columns = [_ColumnProfile(name=(n.strip() or f"column_{i + 1}")[:60]) for i, n in enumerate(names)]
+                if has_header:
+                    continue
+            if not any(cell.strip() for cell in row):
+                continue
+            rows += 1
+            if len(preview) < CSV_PREVIEW_ROWS:
+                preview.append([cell[:40] for cell in row[: len(columns)]])
+            for col, cell in zip(columns, row):
+                col.add(cell)
+            if rows >= max_rows:
+                truncated_reason = f"stopped after {max_rows} rows"
+                break
+            if rows % 1000 == 0 and time.monotonic() >= deadline:
+                truncated_reason = f"stopped after {rows} rows (time budget)"
+                break
+    except csv.Error as exc:
+        truncated_reason = f"parse error after {rows} rows: {exc}"
+
+    if not columns:
+        return None
+
+    delimiter = getattr(dialect, "delimiter", ",")
+    lines = [f"CSV summary: {rows} data rows, {len(columns)} columns (delimiter {delimiter!r})."]
+    lines.append("Columns:")
+    lines.extend(col.describe() for col in columns)
+    if preview:
+        lines.append("First rows:")
+        lines.append(", ".join(col.name for col in columns))
+        lines.extend(", ".join(r) for r in preview)
+    if truncated_reason:
+        lines.append(f"... [{truncated_reason}]")
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Entry points
+# ---------------------------------------------------------------------------
+
+
+def _normalise(content_type: str) -> str:
+    return content_type.split(";")[0].strip().lower()
+
+
+def extract_text_sync(file_bytes: bytes, content_type: str) -> str | None:
+    """Extract text inline (no process pool), using the content-hash cache.
+
+    Args:
+        file_bytes: Raw file bytes.
+        content_type: MIME type of the file.
+
+    Returns:
+        Extracted or summarised text, or None for unsupported types.
+    """
+    normalised = _normalise(content_type)
+    if normalised not in ("text/plain", "text/csv", "application/pdf"):
+        return None
+    key = content_key(file_bytes, normalised)
+    hit, cached = _cache_get(key)
+    if hit:
+        return cached
+
+    if normalised == "text/plain":
+        result = decode_text(file_bytes)
+    elif normalised == "text/csv":
+        result = profile_csv(file_bytes)
+    else:
+        result = extract_pdf_text(file_bytes)
+    _cache_put(key, result)
+    return result
+
+
+async def extract_text(file_bytes: bytes, content_type: str) -> str | None:
+    """Extract text off the event loop, using the content-hash cache.
+
+    PDFs are parsed in the process pool under ``PDF_TOTAL_TIME_BUDGET``
+    (plus a small grace period); CSV and plain text run in a worker thread.
+
+    Args:
+        file_bytes: Raw file bytes.
+        content_type: MIME type of the file.
+
+    Returns:
+        Extracted or summarised text, or None for unsupported types or
+        when PDF extraction fails or times out.
+    """
+    normalised = _normalise(content_type)
+    if normalised not in ("text/plain", "text/csv", "application/pdf"):
+        return None
+    key = content_key(file_bytes, normalised)
+    hit, cached = _cache_get(key)
+    if hit:
+        return cached
+
+    if normalised == "application/pdf":
+        loop = asyncio.get_running_loop()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(_get_pdf_pool(), extract_pdf_text, file_bytes),
+                timeout=PDF_TOTAL_TIME_BUDGET + 2.0,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("extract_text: PDF extraction exceeded its time budget")
+            return "PDF content could not be extracted in time."
+        except Exception as exc:
+            logger.warning("extract_text: PDF extraction failed: %s", exc)
+            return None
+    elif normalised == "text/csv":
+        result = await asyncio.to_thread(profile_csv, file_bytes)
+    else:
+        result = await asyncio.to_thread(decode_text, file_bytes)
+
+    _cache_put(key, result)
+    return result
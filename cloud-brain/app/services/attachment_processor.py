@@ -17,6 +17,7 @@ import logging
 import re
 from typing import Any
 
+from app.services import attachment_extraction
 from app.utils.sanitize import sanitize_for_llm
 
 logger = logging.getLogger(__name__)
@@ -173,7 +174,8 @@ class AttachmentProcessor:
     detects food images by filename heuristics, and identifies
     health-relevant facts for injection into the LLM conversation context.
 
-    All operations are synchronous (no async I/O or ML calls).
+    ``process`` runs synchronously; ``process_async`` performs the same
+    steps with document extraction moved off the event loop.
 
     Class Attributes:
         ALLOWED_TYPES: Mapping of allowed MIME types to canonical extensions.
@@ -209,8 +211,8 @@ class AttachmentProcessor:
         Steps:
         1. Validate content type and size (raises ``ValueError`` on failure).
         2. Detect whether the file is a food image via filename heuristics.
-        3. Extract text content: decode text/CSV files; note that PDF
-           extraction is not yet available.
+        3. Extract text content: decode text files, summarise CSVs, and
+           parse PDFs page by page (see ``attachment_extraction``).
         4. Extract health-relevant facts from any text content.
         5. Build a context message suitable for injection into the LLM prompt.
 
@@ -226,8 +228,8 @@ class AttachmentProcessor:
                 - ``filename``: The original filename.
                 - ``content_type``: The validated MIME type.
                 - ``size_bytes``: File size in bytes.
-                - ``extracted_text``: Decoded text for text/CSV; ``None``
-                  for images and PDFs.
+                - ``extracted_text``: Decoded text, CSV summary, or PDF
+                  text; ``None`` for images.
                 - ``is_food_image``: ``True`` if the image filename contains
                   food-related keywords.
                 - ``health_facts``: List of extracted health-relevant fact
@@ -278,7 +280,7 @@ class AttachmentProcessor:
             )
 
         # Step 5 — build context message for LLM injection
-        context_message: str = AttachmentProcessor._build_context_message(
+        return AttachmentProcessor._build_result(
             filename=filename,
             content_type=content_type,
             file_type=file_type,
@@ -288,16 +290,63 @@ class AttachmentProcessor:
             health_facts=health_facts,
         )
 
-        return {
-            "type": file_type,
-            "filename": filename,
-            "content_type": content_type,
-            "size_bytes": size_bytes,
-            "extracted_text": extracted_text,
-            "is_food_image": is_food_image,
-            "health_facts": health_facts,
-            "context_message": context_message,
-        }
+    @staticmethod
+    async def process_async(
+        file_bytes: bytes,
+        filename: str,
+        content_type: str,
+        user_id: str,
+    ) -> dict[str, Any]:
+        """Async variant of :meth:`process` that never blocks the event loop.
+
+        PDF parsing runs in a worker process under a time budget, CSV and
+        text decoding run in a worker thread, and results are cached by
+        content hash so a re-uploaded file skips extraction. Health facts
+        are extracted with the same 2-second guard as the upload endpoint.
+
+        Args:
+            file_bytes: Raw file content in memory.
+            filename: Original filename as provided by the client.
+            content_type: MIME type declared by the client.
+            user_id: ID of the uploading user (used for logging).
+
+        Returns:
+            The same structured result dict as :meth:`process`.
+
+        Raises:
+            ValueError: If the content type is not allowed or the file
+                exceeds ``MAX_SIZE_BYTES``.
+        """
+        AttachmentProcessor.validate(file_bytes, content_type)
+
+        logger.info(
+            "AttachmentProcessor.process_async: user=%s filename=%r content_type=%s size=%d",
+            user_id,
+            filename,
+            content_type,
+            len(file_bytes),
+        )
+
+        is_image: bool = content_type.startswith("image/")
+        is_food_image = AttachmentProcessor._detect_food_image(filename) if is_image else False
+
+        extracted_text: str | None = None
+        if not is_image:
+            extracted_text = await attachment_extraction.extract_text(file_bytes, content_type)
+
+        health_facts: list[str] = []
+        if extracted_text:
+            health_facts = await _safe_extract_health_facts(extracted_text)
+
+        return AttachmentProcessor._build_result(
+            filename=filename,
+            content_type=content_type,
+            file_type="image" if is_image else "document",
+            size_bytes=len(file_bytes),
+            extracted_text=extracted_text,
+            is_food_image=is_food_image,
+            health_facts=health_facts,
+        )
 
     # Magic byte signatures for server-side MIME verification.
     # Mapping: normalised MIME type -> list of valid magic-byte prefixes.
@@ -375,12 +424,16 @@ class AttachmentProcessor:
     def _extract_text(file_bytes: bytes, content_type: str) -> str | None:
         """Attempt to extract plain text from the file.
 
-        - ``text/plain`` and ``text/csv``: decoded as UTF-8 (with
-          latin-1 fallback).
-        - ``application/pdf``: extraction is not yet available; a note
-          string is returned so callers can communicate this to users.
+        - ``text/plain``: decoded as UTF-8 (with latin-1 fallback), capped
+          at ``attachment_extraction.TEXT_CHAR_BUDGET`` characters.
+        - ``text/csv``: streamed into a column profile summary rather
+          than returned verbatim.
+        - ``application/pdf``: parsed page by page within size and time
+          budgets.
         - Images: always returns ``None`` (no text extraction).
 
+        Runs inline; async callers should use :meth:`process_async`.
+
         Args:
             file_bytes: Raw file bytes.
             content_type: Normalised MIME type of the file.
@@ -388,23 +441,7 @@ class AttachmentProcessor:
         Returns:
             Extracted or explanatory text string, or ``None`` for images.
         """
-        normalised = content_type.split(";")[0].strip().lower()
-
-        if normalised in ("text/plain", "text/csv"):
-            try:
-                return file_bytes.decode("utf-8")
-            except UnicodeDecodeError:
-                try:
-                    return file_bytes.decode("latin-1")
-                except Exception:
-                    logger.warning("_extract_text: could not decode text file — returning None")
-                    return None
-
-        if normalised == "application/pdf":
-            return "PDF content extraction not yet available."
-
-        # Images — no text extraction
-        return None
+        return attachment_extraction.extract_text_sync(file_bytes, content_type)
 
     @staticmethod
     def _extract_health_facts(text: str) -> list[str]:
@@ -439,6 +476,37 @@ class AttachmentProcessor:
 
         return facts
 
+    @staticmethod
+    def _build_result(
+        filename: str,
+        content_type: str,
+        file_type: str,
+        size_bytes: int,
+        extracted_text: str | None,
+        is_food_image: bool,
+        health_facts: list[str],
+    ) -> dict[str, Any]:
+        """Assemble the result dict shared by ``process`` and ``process_async``."""
+        context_message: str = AttachmentProcessor._build_context_message(
+            filename=filename,
+            content_type=content_type,
+            file_type=file_type,
+            size_bytes=size_bytes,
+            extracted_text=extracted_text,
+            is_food_image=is_food_image,
+            health_facts=health_facts,
+        )
+        return {
+            "type": file_type,
+            "filename": filename,
+            "content_type": content_type,
+            "size_bytes": size_bytes,
+            "extracted_text": extracted_text,
+            "is_food_image": is_food_image,
+            "health_facts": health_facts,
+            "context_message": context_message,
+        }
+
     @staticmethod
     def _build_context_message(
         filename: str,
@@ -0,0 +1,189 @@
+"""
+Zuralog Cloud Brain — Bulk Job Framework.
+
+Shared plumbing for Celery Beat jobs that touch every user (or every row
+of a table):
+
+- ``timed_job``: wraps a set-based job (one or a few SQL statements) and
+  records its duration.
+- ``run_chunked_job``: for jobs that need per-user logic. Walks user IDs
+  with keyset pagination (``WHERE id > :last ORDER BY id LIMIT :n``) so
+  each page is an index range scan regardless of how far in the job is.
+  Each chunk is handed to a callback that loads everything the chunk
+  needs in a handful of queries. Progress is logged per chunk, and a
+  failing chunk is rolled back and reported without stopping the job.
+
+Job durations are recorded in a cumulative histogram per job in Redis
+(``bulk_jobs:duration:<job>``), because Beat jobs run in worker processes
+that are not scraped. ``get_job_duration_histograms`` reads them back.
+Recording is best-effort and never fails a job.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import sentry_sdk
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import worker_async_session
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the duration histogram buckets.
+JOB_DURATION_BUCKETS: tuple[float, ...] = (1, 5, 15, 60, 300, 900, 3600, math.inf)
+DEFAULT_CHUNK_SIZE = 500
+
+_HISTOGRAM_KEY = "bulk_jobs:duration:{job}"
+
+ChunkHandler = Callable[[AsyncSession, list[str]], Awaitable[dict[str, int] | None]]
+
+
+def bucket_label(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else f"{bound:g}"
+
+
+async def record_job_duration(job: str, seconds: float) -> None:
+    """Add one observation to ``job``'s duration histogram in Redis."""
+    try:
+        import redis.asyncio as aioredis
+
+        async with aioredis.from_url(settings.redis_url, decode_responses=True) as redis:
+            pipe = redis.pipeline(transaction=False)
+            key = _HISTOGRAM_KEY.format(job=job)
+            for bound in JOB_DURATION_BUCKETS:
+                if seconds <= bound:
+                    pipe.hincrby(key, f"le_{bucket_label(bound)}", 1)
+            pipe.hincrby(key, "count", 1)
+            pipe.hincrbyfloat(key, "sum", seconds)
+            pipe.hset(key, "last", f"{seconds:.3f}")
+            await pipe.execute()
+    except Exception:  # noqa: BLE001
+        logger.debug("bulk_jobs: could not record duration for %s", job, exc_info=True)
+
+
+async def get_job_duration_histograms(redis: Any) -> dict[str, dict[str, float]]:
+    """Return ``{job: {"le_<bound>": n, ..., "count": n, "sum": s, "last": s}}``."""
+    histograms: dict[str, dict[str, float]] = {}
+    prefix = _HISTOGRAM_KEY.format(job="")
+    async for key in redis.scan_iter(match=prefix + "*"):
+        values = await redis.hgetall(key)
+        histograms[key[len(prefix):]] = {field_: float(v) for field_, v in values.items()}
+    return histograms
+
+
+@dataclass
+class JobProgress:
+    """Running totals for one execution of a bulk job."""
+
+    job: str
+    users: int = 0
+    chunks: int = 0
+    failed_chunks: int = 0
+    counters: dict[str, int] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def add(self, counters: dict[str, int] | None) -> None:
+        for key, value in (counters or {}).items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "users": self.users,
+            "chunks": self.chunks,
+            "failed_chunks": self.failed_chunks,
+            **self.counters,
+            "duration_s": round(self.elapsed, 3),
+        }
+
+
+@asynccontextmanager
+async def timed_job(job: str) -> AsyncIterator[JobProgress]:
+    """Time a set-based job and record its duration, even if it fails."""
+    progress = JobProgress(job=job)
+    try:
+        yield progress
+    finally:
+        await record_job_duration(job, progress.elapsed)
+        logger.info("bulk job %s finished in %.2fs: %s", job, progress.elapsed, progress.counters)
+
+
+async def iter_id_chunks(
+    db: AsyncSession,
+    ids_query: Select,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[list[str]]:
+    """Yield the IDs selected by ``ids_query`` in ascending keyset pages.
+
+    ``ids_query`` must select a single sortable column (``.distinct()`` is
+    fine). The ordering, bound and limit are added here.
+    """
+    column = ids_query.selected_columns[0]
+    last: Any = None
+    while True:
+        page = ids_query.order_by(column).limit(chunk_size)
+        if last is not None:
+            page = page.where(column > last)
+        ids = list((await db.execute(page)).scalars().all())
+        if not ids:
+            return
+        yield ids
+        if len(ids) < chunk_size:
+            return
+        last = ids[-1]
+
+
+async def run_chunked_job(
+    job: str,
+    ids_query: Select,
+    handle_chunk: ChunkHandler,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    session_factory: async_sessionmaker[AsyncSession] = worker_async_session,
+) -> dict[str, Any]:
+    """Run ``handle_chunk`` over every ID selected by ``ids_query``.
+
+    Args:
+        job: Job name, used for logs and the duration histogram.
+        ids_query: Single-column select of user IDs to process.
+        handle_chunk: ``async (db, ids) -> counters``. It should batch its
+            reads across ``ids`` and commit its own writes. The counters it
+            returns are summed into the job result.
+        chunk_size: IDs per chunk.
+        session_factory: Session factory (worker sessions by default).
+
+    Returns:
+        Summary dict with ``users``, ``chunks``, ``failed_chunks``, the summed
+        handler counters and ``duration_s``.
+    """
+    async with timed_job(job) as progress:
+        async with session_factory() as db:
+            async for ids in iter_id_chunks(db, ids_query, chunk_size):
+                progress.chunks += 1
+                progress.users += len(ids)
+                try:
+                    progress.add(await handle_chunk(db, ids))
+                except Exception as exc:
+                    progress.failed_chunks += 1
+                    logger.exception("bulk job %s: chunk %d failed (%d users)", job, progress.chunks, len(ids))
+                    sentry_sdk.capture_exception(exc)
+                    await db.rollback()
+                logger.info(
+                    "bulk job %s: chunk %d done — %d users in %.1fs",
+                    job,
+                    progress.chunks,
+                    progress.users,
+                    progress.elapsed,
+                )
+    return progress.to_dict()
@@ -20,10 +20,19 @@ from functools import wraps
 from typing import Any
 
 from app.config import settings
+from app.services.telemetry import CACHE_REQUESTS
 
 logger = logging.getLogger(__name__)
 
 
+def _namespace(key: str) -> str:
+    """Metrics label for a key: the ``make_key`` prefix or the text before the first ':'."""
+    parts = key.split(":", 2)
+    if len(parts) == 1:
+        return "other"
+    return parts[1] if parts[0] == "cache" else parts[0]
+
+
 class CacheService:
     """In-memory TTL cache with the same interface as the previous Upstash implementation.
 
@@ -52,12 +61,15 @@ class CacheService:
         async with self._lock:
             entry = self._store.get(key)
             if entry is None:
+                CACHE_REQUESTS.inc(_namespace(key), "miss")
                 return None
             value, expires_at = entry
             if time.monotonic() > expires_at:
                 del self._store[key]
+                CACHE_REQUESTS.inc(_namespace(key), "expired")
                 return None
             self._store.move_to_end(key)  # promote to most-recently-used
+            CACHE_REQUESTS.inc(_namespace(key), "hit")
             return value
 
     async def set(self, key: str, value: Any, ttl: int | None = None) -> None:
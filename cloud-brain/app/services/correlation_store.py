@@ -0,0 +1,270 @@
+"""
+Zuralog Cloud Brain — Correlation Store.
+
+Persists one precomputed correlation matrix per user
+(``user_correlation_matrices``) and keeps it in step with
+``daily_summaries``. Readers call :func:`get_correlation_matrix`, which
+costs a single aggregate query when nothing changed. When summaries were
+recomputed it fetches only the rows newer than the stored watermark,
+patches them into the dense matrix, and re-runs the vectorized engine in
+``app.analytics.correlation_matrix``. Deletes (detected by row count or
+value checksum drift) fall back to a full reload of the window.
+
+Readers never write: the caller's session may be a GET request's or may
+hold someone else's pending work. When the stored row is out of date the
+reader returns the fresh matrix and enqueues
+``app.tasks.correlation_tasks.refresh_correlation_matrix``, which redoes
+the refresh with :func:`refresh_correlation_matrix` on its own session
+and persists it.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics.correlation_matrix import (
+    CORRELATION_METRICS,
+    CorrelationCell,
+    compute_cells,
+    dense_matrix,
+    shift_window,
+)
+from app.models.user_correlation_matrix import UserCorrelationMatrix
+
+logger = logging.getLogger(__name__)
+
+WINDOW_DAYS = 365  # days of history kept in the stored matrix
+ANALYSIS_DAYS = 90  # trailing days the stored correlation cells are computed over
+
+_METRICS: list[str] = list(CORRELATION_METRICS)
+_METRIC_BY_DB_TYPE: dict[str, str] = {db_type: key for key, db_type in CORRELATION_METRICS.items()}
+
+_FRESHNESS_SQL = text(
+    """
+    SELECT max(computed_at) AS watermark, count(*) AS row_count, coalesce(sum(value), 0) AS checksum
+    FROM daily_summaries
+    WHERE user_id = :uid
+      AND metric_type = ANY(:types)
+      AND date BETWEEN :start AND :end
+    """
+)
+
+_ROWS_SQL = """
+    SELECT date, metric_type, value
+    FROM daily_summaries
+    WHERE user_id = :uid
+      AND metric_type = ANY(:types)
+      AND date BETWEEN :start AND :end
+"""
+
+
+@dataclass
+class CorrelationMatrix:
+    """A user's dense metric matrix and its precomputed correlation cells.
+
+    Attributes:
+        window_start: Date of the first matrix row.
+        metrics: Column order (correlation metric keys).
+        values: ``days × metrics`` array, NaN where a day has no value.
+        cells: Every defined correlation over the trailing ``ANALYSIS_DAYS``.
+    """
+
+    window_start: date
+    metrics: list[str]
+    values: np.ndarray
+    cells: list[CorrelationCell]
+
+    @property
+    def window_end(self) -> date:
+        return self.window_start + timedelta(days=self.values.shape[0] - 1)
+
+    def column(self, metric: str) -> int:
+        return self.metrics.index(metric)
+
+    def rows_between(self, start: date, end: date) -> tuple[date, np.ndarray]:
+        """Return ``(first_date, rows)`` for the inclusive range clipped to the window."""
+        first = max(0, (start - self.window_start).days)
+        last = min(self.values.shape[0] - 1, (end - self.window_start).days)
+        if last < first:
+            return start, self.values[:0]
+        return self.window_start + timedelta(days=first), self.values[first : last + 1]
+
+    def maturity_days(self, end: date, days: int = 30) -> int:
+        """Count days in the trailing ``days`` window with at least one metric value."""
+        _, rows = self.rows_between(end - timedelta(days=days - 1), end)
+        return int((~np.isnan(rows)).any(axis=1).sum())
+
+
+@dataclass
+class _Snapshot:
+    """Source state a recomputed matrix was built from, for persisting it."""
+
+    watermark: datetime | None
+    row_count: int
+
+
+async def get_correlation_matrix(db: AsyncSession, user_id: str, today: date) -> CorrelationMatrix:
+    """Return the user's up-to-date correlation matrix without writing.
+
+    The stored window never slides backwards, so callers in different
+    timezones don't thrash it; slice with :meth:`CorrelationMatrix.rows_between`.
+    If the stored row is out of date, a background refresh is enqueued to
+    persist the new one.
+
+    Args:
+        db: Async database session; only read from.
+        user_id: The user's ID.
+        today: The caller's local date; the window ends on or after it.
+
+    Returns:
+        The up-to-date :class:`CorrelationMatrix`.
+    """
+    matrix, snapshot = await _load(db, user_id, today)
+    if snapshot is not None:
+        schedule_correlation_refresh(user_id, today)
+    return matrix
+
+
+async def refresh_correlation_matrix(db: AsyncSession, user_id: str, today: date) -> CorrelationMatrix:
+    """Bring the stored matrix up to date and commit it on ``db``.
+
+    For callers that own ``db`` (the refresh task). Errors propagate so the
+    owner can roll back.
+
+    Args:
+        db: Async database session owned by the caller.
+        user_id: The user's ID.
+        today: The local date the refresh was requested for.
+
+    Returns:
+        The up-to-date :class:`CorrelationMatrix`.
+    """
+    matrix, snapshot = await _load(db, user_id, today)
+    if snapshot is not None:
+        await _save(db, user_id, matrix, snapshot)
+        await db.commit()
+    return matrix
+
+
+def schedule_correlation_refresh(user_id: str, today: date) -> None:
+    """Enqueue the background refresh; a broker failure is logged, not raised."""
+    try:
+        from app.tasks.correlation_tasks import refresh_correlation_matrix as refresh_task
+
+        refresh_task.delay(str(user_id), today.isoformat())
+    except Exception:  # noqa: BLE001
+        logger.warning("correlation store: could not enqueue refresh for user='%s'", user_id, exc_info=True)
+
+
+async def _load(db: AsyncSession, user_id: str, today: date) -> tuple[CorrelationMatrix, _Snapshot | None]:
+    """Read the stored matrix and bring it up to date in memory.
+
+    Returns:
+        The matrix, and the source snapshot it was rebuilt from, or None
+        when the stored row was already current.
+    """
+    stored = (
+        await db.execute(select(UserCorrelationMatrix).where(UserCorrelationMatrix.user_id == str(user_id)))
+    ).scalar_one_or_none()
+    if stored is not None and (stored.metrics != _METRICS or stored.window_days != WINDOW_DAYS):
+        stored = None  # metric set changed — rebuild from scratch
+
+    window_end = today
+    if stored is not None:
+        window_end = max(today, stored.window_start + timedelta(days=WINDOW_DAYS - 1))
+    window_start = window_end - timedelta(days=WINDOW_DAYS - 1)
+
+    params = {
+        "uid": str(user_id),
+        "types": list(_METRIC_BY_DB_TYPE),
+        "start": window_start,
+        "end": window_end,
+    }
+    fresh = (await db.execute(_FRESHNESS_SQL, params)).one()
+    watermark: datetime | None = fresh.watermark
+    row_count = int(fresh.row_count)
+    checksum = float(fresh.checksum)
+
+    if (
+        stored is not None
+        and stored.window_start == window_start
+        and stored.source_watermark == watermark
+        and stored.source_row_count == row_count
+    ):
+        return _from_row(stored), None
+
+    values: np.ndarray | None = None
+    if stored is not None and stored.source_watermark is not None:
+        values = shift_window(np.array(stored.matrix, dtype=float), stored.window_start, window_start)
+        delta = await _fetch_rows(db, params, since=stored.source_watermark)
+        for day, metric, value in delta:
+            values[(day - window_start).days, _METRICS.index(metric)] = value
+        if not _matches(values, row_count, checksum):
+            logger.debug("correlation store: delta drift for user='%s', reloading window", user_id)
+            values = None
+
+    if values is None:
+        values = dense_matrix(await _fetch_rows(db, params), window_start, WINDOW_DAYS, _METRICS)
+
+    cells = compute_cells(values[-ANALYSIS_DAYS:], _METRICS)
+    matrix = CorrelationMatrix(window_start=window_start, metrics=list(_METRICS), values=values, cells=cells)
+    return matrix, _Snapshot(watermark=watermark, row_count=row_count)
+
+
+async def _fetch_rows(
+    db: AsyncSession,
+    params: dict,
+    since: datetime | None = None,
+) -> list[tuple[date, str, float]]:
+    """Fetch ``(date, metric_key, value)`` rows for the window, optionally only newer ones."""
+    sql = _ROWS_SQL
+    query_params = dict(params)
+    if since is not None:
+        sql += " AND computed_at >= :since"
+        query_params["since"] = since
+    result = await db.execute(text(sql), query_params)
+    return [(r.date, _METRIC_BY_DB_TYPE[r.metric_type], float(r.value)) for r in result.fetchall()]
+
+
+def _matches(values: np.ndarray, row_count: int, checksum: float) -> bool:
+    """True when the patched matrix agrees with the source row count and value sum."""
+    present = ~np.isnan(values)
+    if int(present.sum()) != row_count:
+        return False
+    total = float(values[present].sum())
+    return math.isclose(total, checksum, rel_tol=1e-9, abs_tol=1e-6)
+
+
+def _from_row(row: UserCorrelationMatrix) -> CorrelationMatrix:
+    return CorrelationMatrix(
+        window_start=row.window_start,
+        metrics=list(row.metrics),
+        values=np.array(row.matrix, dtype=float),
+        cells=[CorrelationCell.from_dict(c) for c in row.cells],
+    )
+
+
+async def _save(db: AsyncSession, user_id: str, matrix: CorrelationMatrix, snapshot: _Snapshot) -> None:
+    """Upsert the user's matrix in the caller's transaction."""
+    rows = [[None if math.isnan(v) else v for v in row] for row in matrix.values.tolist()]
+    payload = {
+        "window_start": matrix.window_start,
+        "window_days": WINDOW_DAYS,
+        "metrics": _METRICS,
+        "matrix": rows,
+        "cells": [c.to_dict() for c in matrix.cells],
+        "source_watermark": snapshot.watermark,
+        "source_row_count": snapshot.row_count,
+        "computed_at": datetime.now(timezone.utc),
+    }
+    stmt = pg_insert(UserCorrelationMatrix).values(user_id=str(user_id), **payload)
+    stmt = stmt.on_conflict_do_update(index_elements=["user_id"], set_=payload)
+    await db.execute(stmt)
@@ -0,0 +1,343 @@
+"""
+Zuralog Cloud Brain — Streaming User Data Export.
+
+Exports everything a user owns (chat history, health data, nutrition,
+journal, supplements, memories, preferences) without loading it into
+memory. Every section is read in keyset pages,
+``WHERE (k1, k2) > (:last1, :last2) ORDER BY k1, k2 LIMIT :n``, over an
+index on the user's rows. Each page runs in its own short session through
+``AsyncSession.stream`` (a server-side cursor), and the connection goes
+back to the pool before the page is encoded and sent. A slow client
+therefore never holds a pooled connection, and memory stays at one page
+no matter how much history the user has.
+
+Pages are separate transactions, so rows written during an export may or
+may not appear in it. Keyset paging still never returns a row twice or
+skips a row that existed for the whole export.
+
+Two formats:
+
+- ``ndjson`` — one JSON object per line. A header line, then
+  ``{"section": ..., "row": {...}}`` per row, then a trailer with
+  ``"complete": true`` and per-section counts. A download that stops
+  early has no trailer.
+- ``zip`` — ``<section>.ndjson`` per section plus ``manifest.json``
+  (written last, with the counts). The archive is built on the fly
+  (``ZIP_DEFLATED``, data descriptors) and drained after every page.
+  Compression runs in a worker thread.
+
+``GET /api/v1/user/export`` streams either format. Export jobs
+(``app.tasks.export_tasks``) write the zip to Supabase Storage and hand
+out a signed URL.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+import zipfile
+from collections.abc import AsyncIterator, Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+import redis.asyncio as aioredis
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.conversation import Conversation, Message
+from app.models.daily_summary import DailySummary
+from app.models.health_event import HealthEvent
+from app.models.health_event_rollup import HealthEventRollup
+from app.models.journal_entry import JournalEntry
+from app.models.meal import Meal
+from app.models.meal_food import MealFood
+from app.models.user_preferences import UserPreferences
+from app.models.user_supplement import UserSupplement
+from app.utils.fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+ExportFormat = Literal["ndjson", "zip"]
+MEDIA_TYPES: dict[str, str] = {"ndjson": "application/x-ndjson", "zip": "application/zip"}
+
+# user_memories has no ORM model (see PgVectorMemoryStore); the embedding
+# column is left out of the export.
+_user_memories = sa.table(
+    "user_memories",
+    sa.column("id", sa.String),
+    sa.column("user_id", sa.String),
+    sa.column("content", sa.Text),
+    sa.column("category", sa.String),
+    sa.column("source_conversation_id", sa.String),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+)
+
+
+@dataclass(frozen=True)
+class ExportSection:
+    """One exported table.
+
+    Attributes:
+        name: Section name (NDJSON ``section`` field / zip entry name).
+        query: Builds the unordered, unpaged SELECT for a user's rows.
+        keys: Keyset columns. Together they must be unique per row and
+            should lead an index together with the user filter.
+    """
+
+    name: str
+    query: Callable[[str], sa.Select]
+    keys: tuple[sa.ColumnElement, ...]
+
+
+def _all_columns(table: sa.Table, *exclude: str) -> list[sa.ColumnElement]:
+    return [c for c in table.c if c.name not in exclude]
+
+
+SECTIONS: tuple[ExportSection, ...] = (
+    ExportSection(
+        "preferences",
+        lambda uid: sa.select(*_all_columns(UserPreferences.__table__)).where(UserPreferences.user_id == uid),
+        (UserPreferences.user_id,),
+    ),
+    ExportSection(
+        "conversations",
+        lambda uid: sa.select(*_all_columns(Conversation.__table__)).where(
+            Conversation.user_id == uid, Conversation.deleted_at.is_(None)
+        ),
+        (Conversation.created_at, Conversation.id),
+    ),
+    ExportSection(
+        "messages",
+        lambda uid: sa.select(*_all_columns(Message.__table__))
+        .join(Conversation, Conversation.id == Message.conversation_id)
+        .where(Conversation.user_id == uid, Conversation.deleted_at.is_(None)),
+        # Walks ix_messages_conv_created one conversation at a time.
+        (Message.conversation_id, Message.created_at, Message.id),
+    ),
+    ExportSection(
+        "memories",
+        lambda uid: sa.select(*_all_columns(_user_memories, "user_id")).where(_user_memories.c.user_id == uid),
+        (_user_memories.c.created_at, _user_memories.c.id),
+    ),
+    ExportSection(
+        "health_events",
+        lambda uid: sa.select(*_all_columns(HealthEvent.__table__)).where(
+            HealthEvent.user_id == uid, HealthEvent.deleted_at.is_(None)
+        ),
+        (HealthEvent.local_date, HealthEvent.id),
+    ),
+    # Hourly aggregates of device samples that compaction removed from health_events.
+    ExportSection(
+        "health_event_rollups",
+        lambda uid: sa.select(*_all_columns(HealthEventRollup.__table__)).where(HealthEventRollup.user_id == uid),
+        (
+            HealthEventRollup.metric_type,
+            HealthEventRollup.local_date,
+            HealthEventRollup.source,
+            HealthEventRollup.hour_start,
+        ),
+    ),
+    ExportSection(
+        "daily_summaries",
+        lambda uid: sa.select(*_all_columns(DailySummary.__table__)).where(DailySummary.user_id == uid),
+        (DailySummary.date, DailySummary.metric_type),
+    ),
+    ExportSection(
+        "meals",
+        lambda uid: sa.select(*_all_columns(Meal.__table__)).where(Meal.user_id == uid, Meal.deleted_at.is_(None)),
+        (Meal.logged_at, Meal.id),
+    ),
+    ExportSection(
+        "meal_foods",
+        lambda uid: sa.select(*_all_columns(MealFood.__table__))
+        .join(Meal, Meal.id == MealFood.meal_id)
+        .where(Meal.user_id == uid, Meal.deleted_at.is_(None)),
+        (MealFood.meal_id, MealFood.id),
+    ),
+    ExportSection(
+        "journal_entries",
+        lambda uid: sa.select(*_all_columns(JournalEntry.__table__)).where(JournalEntry.user_id == uid),
+        (JournalEntry.date, JournalEntry.id),
+    ),
+    ExportSection(
+        "supplements",
+        lambda uid: sa.select(*_all_columns(UserSupplement.__table__)).where(UserSupplement.user_id == uid),
+        (UserSupplement.created_at, UserSupplement.id),
+    ),
+)
+
+
+async def iter_section_pages(
+    session_factory: Callable[[], AsyncSession],
+    section: ExportSection,
+    user_id: str,
+    batch_size: int | None = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield a section's rows as lists of at most ``batch_size`` dicts.
+
+    Each page opens and closes its own session, so no connection is held
+    while the caller encodes or sends the page.
+
+    Args:
+        session_factory: ``async_session`` in the API, ``worker_async_session``
+            in Celery.
+        section: The section to read.
+        user_id: Owner of the rows.
+        batch_size: Rows per page; defaults to ``settings.export_batch_size``.
+    """
+    batch_size = batch_size or settings.export_batch_size
+    key_names = [key.name for key in section.keys]
+    last: Sequence[Any] | None = None
+    while True:
+        stmt = section.query(user_id).order_by(*section.keys).limit(batch_size)
+        if last is not None:
+            bound = (sa.literal(value, key.type) for key, value in zip(section.keys, last))
+            stmt = stmt.where(sa.tuple_(*section.keys) > sa.tuple_(*bound))
+        async with session_factory() as db:
+            result = await db.stream(stmt)
+            page = [dict(row._mapping) async for row in result]
+        if not page:
+            return
+        yield page
+        if len(page) < batch_size:
+            return
+        last = [page[-1][name] for name in key_names]
+
+
+def _header(user_id: str) -> dict[str, Any]:
+    return {
+        "format_version": FORMAT_VERSION,
+        "exported_at": datetime.now(timezone.utc),
+        "user_id": user_id,
+        "sections": [section.name for section in SECTIONS],
+    }
+
+
+async def stream_ndjson(
+    session_factory: Callable[[], AsyncSession],
+    user_id: str,
+    batch_size: int | None = None,
+) -> AsyncIterator[bytes]:
+    """Yield the export as NDJSON, one chunk per page.
+
+    Args:
+        session_factory: Session factory for the page queries.
+        user_id: The user to export.
+        batch_size: Rows per page; defaults to ``settings.export_batch_size``.
+    """
+    yield dumps({"export": _header(user_id)}) + b"\n"
+    counts: dict[str, int] = {}
+    for section in SECTIONS:
+        counts[section.name] = 0
+        async for page in iter_section_pages(session_factory, section, user_id, batch_size):
+            counts[section.name] += len(page)
+            yield b"".join(dumps({"section": section.name, "row": row}) + b"\n" for row in page)
+    yield dumps({"complete": True, "counts": counts}) + b"\n"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable file object that buffers what ``ZipFile`` writes until drained."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _write_page(entry: io.BufferedIOBase, page: list[dict[str, Any]]) -> None:
+    entry.write(b"".join(dumps(row) + b"\n" for row in page))
+
+
+async def stream_zip(
+    session_factory: Callable[[], AsyncSession],
+    user_id: str,
+    batch_size: int | None = None,
+) -> AsyncIterator[bytes]:
+    """Yield the export as a zip archive, drained after every page.
+
+    Args:
+        session_factory: Session factory for the page queries.
+        user_id: The user to export.
+        batch_size: Rows per page; defaults to ``settings.export_batch_size``.
+    """
+    sink = _ChunkSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+    manifest = {**_header(user_id), "counts": {}}
+    try:
+        for section in SECTIONS:
+            count = 0
+            # force_zip64: the entry size is unknown when its header is written.
+            with archive.open(f"{section.name}.ndjson", mode="w", force_zip64=True) as entry:
+                async for page in iter_section_pages(session_factory, section, user_id, batch_size):
+                    count += len(page)
+                    await asyncio.to_thread(_write_page, entry, page)
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+            manifest["counts"][section.name] = count
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        archive.writestr("manifest.json", dumps(manifest, indent=True))
+    finally:
+        archive.close()
+    yield sink.drain()
+
+
+def stream_export(
+    session_factory: Callable[[], AsyncSession],
+    user_id: str,
+    fmt: ExportFormat,
+    batch_size: int | None = None,
+) -> AsyncIterator[bytes]:
+    """Return the byte stream for ``fmt`` (``"ndjson"`` or ``"zip"``)."""
+    writer = stream_zip if fmt == "zip" else stream_ndjson
+    return writer(session_factory, user_id, batch_size)
+
+
+def export_filename(fmt: ExportFormat, now: datetime | None = None) -> str:
+    """Return the download filename, e.g. ``zuralog-export-2026-04-20.ndjson``."""
+    now = now or datetime.now(timezone.utc)
+    return f"zuralog-export-{now.strftime('%Y-%m-%d')}.{fmt}"
+
+
+# ---------------------------------------------------------------------------
+# Export jobs (state shared by the API and app.tasks.export_tasks)
+# ---------------------------------------------------------------------------
+
+JOB_KEY_PREFIX = "export_job:"
+JOB_TTL_SECONDS = 7 * 86400
+
+
+def export_object_path(user_id: str, export_id: str) -> str:
+    """Return the object path of a job's archive in ``settings.export_bucket``."""
+    return f"{user_id}/{export_id}.zip"
+
+
+async def save_export_job(redis: aioredis.Redis, export_id: str, **fields: str) -> None:
+    """Create or update an export job hash (``status``, ``user_id``, ``error``...)."""
+    key = f"{JOB_KEY_PREFIX}{export_id}"
+    pipe = redis.pipeline(transaction=False)
+    pipe.hset(key, mapping=fields)
+    pipe.expire(key, JOB_TTL_SECONDS)
+    await pipe.execute()
+
+
+async def load_export_job(redis: aioredis.Redis, export_id: str) -> dict[str, str]:
+    """Return the job hash, or an empty dict if it is unknown or expired."""
+    return await redis.hgetall(f"{JOB_KEY_PREFIX}{export_id}")
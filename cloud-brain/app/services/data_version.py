@@ -0,0 +1,226 @@
+"""
+Zuralog Cloud Brain — Per-User Data Versions.
+
+Mobile clients poll the summary screens (Today, Heart, Sleep, dashboard,
+Progress) on every screen focus. The screens only change when the user's
+data changes, so each user gets a small Redis hash of version counters.
+Every writer bumps the counters after its commit. The read endpoints hash
+the counters into an ``ETag``, and ``conditional_get``
+(:mod:`app.api.deps`) answers a matching ``If-None-Match`` with
+``304 Not Modified`` before the handler touches the database.
+
+Key layout (``data_version:<user_id>``, a hash):
+
+- ``epoch`` — random token set on first use. If the key is evicted or
+  expires, the new epoch changes every ETag, so restarted counters never
+  match a client's old ETag.
+- ``data`` — health data: ``daily_summaries``, health events, provider
+  syncs, insight cards and preferences.
+- ``goals`` — goals, streaks and achievements.
+- ``memories`` — long-term memories. Not part of any ETag; deletes bump
+  it so every worker's cached memory index is rebuilt
+  (:mod:`app.agent.context_manager.pgvector_memory_store`).
+- ``tz`` — the user's IANA timezone, cached so the ETag can include the
+  local date without a query. Cleared when preferences change.
+
+``data_version:global`` holds the same ``epoch``/scope fields for Beat
+jobs that rewrite rows for every user at once (e.g. the weekly streak
+freeze reset). Bumping it changes every user's ETags with one command.
+
+Ordering: writers bump *after* they commit. A reader that loads the
+versions before the bump may then read the new rows and tag them with the
+old version. The client then just gets a 200 on its next poll. The reverse
+case, new counters with old rows, cannot happen.
+
+Bumps never raise. A lost bump leaves ETags stale until the next write, so
+failures are logged at warning level.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import secrets
+from collections.abc import Iterable, Mapping
+from datetime import date
+
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "data_version:"
+GLOBAL_KEY = f"{KEY_PREFIX}global"
+VERSION_TTL_SECONDS = 30 * 86400
+
+SCOPE_DATA = "data"
+SCOPE_GOALS = "goals"
+SCOPE_MEMORIES = "memories"
+SCOPES = (SCOPE_DATA, SCOPE_GOALS, SCOPE_MEMORIES)
+
+_EPOCH = "epoch"
+_TZ = "tz"
+
+
+def _key(user_id: str) -> str:
+    return f"{KEY_PREFIX}{user_id}"
+
+
+def validate_scopes(scopes: Iterable[str]) -> tuple[str, ...]:
+    """Return ``scopes`` as a tuple, rejecting names outside ``SCOPES``."""
+    scopes = tuple(scopes)
+    unknown = set(scopes) - set(SCOPES)
+    if unknown:
+        raise ValueError(f"Unknown data version scope(s): {sorted(unknown)}")
+    return scopes
+
+
+async def _with_client(redis: aioredis.Redis | None, action) -> None:
+    """Run ``action(client)``, opening a short-lived client when none is given.
+
+    Celery tasks run each job in its own ``asyncio.run`` loop, so they cannot
+    share the API's long-lived client; they pass ``redis=None``.
+    """
+    if redis is not None:
+        await action(redis)
+        return
+    if not settings.redis_url:
+        return
+    client = aioredis.from_url(settings.redis_url, decode_responses=True)
+    try:
+        await action(client)
+    finally:
+        await client.aclose()
+
+
+async def bump_data_version(
+    user_ids: str | Iterable[str],
+    *scopes: str,
+    redis: aioredis.Redis | None = None,
+    reset_timezone: bool = False,
+) -> None:
+    """Increment the given scopes for one or more users. Call after commit.
+
+    Args:
+        user_ids: A user ID or an iterable of user IDs.
+        *scopes: ``SCOPE_DATA`` and/or ``SCOPE_GOALS``. Defaults to ``SCOPE_DATA``.
+        redis: Client to use, e.g. ``request.app.state.redis``. ``None`` opens
+            a short-lived client from ``settings.redis_url``.
+        reset_timezone: Drop the cached timezone (preferences changed).
+    """
+    scopes = validate_scopes(scopes or (SCOPE_DATA,))
+    users = [user_ids] if isinstance(user_ids, str) else sorted({str(u) for u in user_ids})
+    if not users:
+        return
+
+    async def _bump(client: aioredis.Redis) -> None:
+        pipe = client.pipeline(transaction=False)
+        for user_id in users:
+            key = _key(user_id)
+            pipe.hsetnx(key, _EPOCH, secrets.token_hex(4))
+            for scope in scopes:
+                pipe.hincrby(key, scope, 1)
+            if reset_timezone:
+                pipe.hdel(key, _TZ)
+            pipe.expire(key, VERSION_TTL_SECONDS)
+        await pipe.execute()
+
+    try:
+        await _with_client(redis, _bump)
+    except Exception:  # noqa: BLE001
+        logger.warning("bump_data_version failed for %d user(s) scopes=%s", len(users), scopes, exc_info=True)
+
+
+async def bump_global_version(*scopes: str, redis: aioredis.Redis | None = None) -> None:
+    """Increment the given scopes for every user at once (bulk Beat jobs).
+
+    Args:
+        *scopes: ``SCOPE_DATA`` and/or ``SCOPE_GOALS``. Defaults to ``SCOPE_DATA``.
+        redis: Client to use; ``None`` opens a short-lived client.
+    """
+    scopes = validate_scopes(scopes or (SCOPE_DATA,))
+
+    async def _bump(client: aioredis.Redis) -> None:
+        pipe = client.pipeline(transaction=False)
+        pipe.hsetnx(GLOBAL_KEY, _EPOCH, secrets.token_hex(4))
+        for scope in scopes:
+            pipe.hincrby(GLOBAL_KEY, scope, 1)
+        await pipe.execute()
+
+    try:
+        await _with_client(redis, _bump)
+    except Exception:  # noqa: BLE001
+        logger.warning("bump_global_version failed scopes=%s", scopes, exc_info=True)
+
+
+async def read_versions(redis: aioredis.Redis, user_id: str) -> tuple[dict[str, str], dict[str, str]]:
+    """Load a user's version hash and the global one in a single round trip.
+
+    Creates the epochs on first use and refreshes the user key's TTL.
+    Redis errors propagate; callers skip conditional handling on failure.
+
+    Returns:
+        ``(user_fields, global_fields)`` as string dicts.
+    """
+    key = _key(user_id)
+    pipe = redis.pipeline(transaction=False)
+    pipe.hsetnx(key, _EPOCH, secrets.token_hex(4))
+    pipe.hsetnx(GLOBAL_KEY, _EPOCH, secrets.token_hex(4))
+    pipe.hgetall(key)
+    pipe.hgetall(GLOBAL_KEY)
+    pipe.expire(key, VERSION_TTL_SECONDS)
+    _, _, user_fields, global_fields, _ = await pipe.execute()
+    return user_fields, global_fields
+
+
+async def remember_timezone(redis: aioredis.Redis, user_id: str, tz: str) -> None:
+    """Cache the user's timezone in their version hash."""
+    await redis.hset(_key(user_id), _TZ, tz)
+
+
+def cached_timezone(user_fields: Mapping[str, str]) -> str | None:
+    """Return the timezone cached by ``remember_timezone``, if any."""
+    return user_fields.get(_TZ) or None
+
+
+def make_etag(
+    path: str,
+    query: str,
+    scopes: Iterable[str],
+    user_fields: Mapping[str, str],
+    global_fields: Mapping[str, str],
+    local_date: date | None = None,
+) -> str:
+    """Build the weak ETag for one representation of a read endpoint.
+
+    Args:
+        path: Request path (different endpoints never share an ETag).
+        query: Raw query string; parameter order is normalised.
+        scopes: Scopes the endpoint's response depends on.
+        user_fields: User hash from ``read_versions``.
+        global_fields: Global hash from ``read_versions``.
+        local_date: The user's local date, for endpoints that show "today".
+
+    Returns:
+        A weak validator such as ``W/"3f9a0c1d2b4e5f60"``.
+    """
+    parts = [
+        path,
+        "&".join(sorted(query.split("&"))) if query else "",
+        user_fields.get(_EPOCH, ""),
+        global_fields.get(_EPOCH, ""),
+    ]
+    for scope in sorted(scopes):
+        parts.append(f"{scope}={user_fields.get(scope, '0')}.{global_fields.get(scope, '0')}")
+    parts.append(local_date.isoformat() if local_date else "")
+    digest = hashlib.sha1("\x1f".join(parts).encode(), usedforsecurity=False).hexdigest()[:16]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against ``etag`` (RFC 9110 §13.1.2)."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
@@ -0,0 +1,170 @@
+"""
+Zuralog Cloud Brain — Connection Pool and Query Budget Guards.
+
+Pool
+----
+``InstrumentedAsyncQueuePool`` is the API engine's pool class. It times
+every checkout (``db_pool_checkout_wait_seconds``) and counts checkout
+timeouts. It also raises a throttled saturation alert (a log warning plus
+a Sentry message) when a checkout waits longer than
+``DB_POOL_WAIT_ALERT_MS``, times out, or takes the last free connection.
+
+``pool_sizing`` derives ``pool_size``/``max_overflow``. When ``DB_POOL_SIZE``
+is set, it and ``DB_MAX_OVERFLOW`` are used as-is. Otherwise
+``DB_CONNECTION_BUDGET`` (connections the whole web service may hold) is
+divided across the uvicorn workers (``WEB_CONCURRENCY``), since each worker
+process has its own pool.
+
+Query budget
+------------
+``RequestContextMiddleware`` gives every request a ``RequestQueries``
+counter, and the engine hook from ``install_query_counter`` increments it
+per statement. ``DB_QUERY_BUDGET`` caps statements per request, and a
+route can raise its own cap with ``Depends(query_budget(n))``. Over budget,
+``DB_QUERY_BUDGET_MODE`` decides what happens:
+
+- ``log``: warn once per request, after the response, with the route and
+  count.
+- ``raise``: fail the statement that crosses the budget with
+  ``QueryBudgetExceeded``. ``tests/conftest.py`` and
+  ``scripts/bench_e2e_throughput.py`` default to it, so an N+1 loop fails
+  the run instead of passing slowly.
+- ``off``: count only.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import sentry_sdk
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import settings
+from app.services.telemetry import DB_POOL_CHECKOUT_WAIT, DB_POOL_TIMEOUTS, QUERY_BUDGET_EXCEEDED
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between saturation alerts per pool.
+_ALERT_INTERVAL_SECONDS = 60.0
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised (in ``raise`` mode) when a request exceeds its SQL statement budget."""
+
+
+def pool_sizing() -> tuple[int, int]:
+    """Return ``(pool_size, max_overflow)`` for the API engine."""
+    if settings.db_pool_size > 0:
+        return settings.db_pool_size, max(settings.db_max_overflow, 0)
+    try:
+        workers = max(int(os.environ.get("WEB_CONCURRENCY") or 1), 1)
+    except ValueError:
+        workers = 1
+    per_worker = max(settings.db_connection_budget // workers, 2)
+    # Keep the historical 2:3 split between steady and burst connections.
+    size = max(per_worker * 2 // 5, 1)
+    return size, per_worker - size
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records checkout wait and alerts on saturation."""
+
+    telemetry_name = "api"
+    _last_alert = 0.0
+
+    def _do_get(self):  # noqa: ANN202 — mirrors the SQLAlchemy signature
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except sa_exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc(self.telemetry_name)
+            self._alert("checkout timed out", time.perf_counter() - started)
+            raise
+        waited = time.perf_counter() - started
+        DB_POOL_CHECKOUT_WAIT.observe(waited, self.telemetry_name)
+        if waited * 1000 >= settings.db_pool_wait_alert_ms:
+            self._alert("slow checkout", waited)
+        elif self.checkedout() >= self.size() + max(self._max_overflow, 0):
+            self._alert("all connections in use", waited)
+        return record
+
+    def _alert(self, reason: str, waited: float) -> None:
+        now = time.monotonic()
+        if now - self._last_alert < _ALERT_INTERVAL_SECONDS:
+            return
+        self._last_alert = now
+        message = (
+            f"DB pool '{self.telemetry_name}' saturated: {reason} "
+            f"(waited {waited * 1000:.0f} ms, {self.checkedout()} checked out, "
+            f"size={self.size()}, max_overflow={self._max_overflow})"
+        )
+        logger.warning(message)
+        sentry_sdk.capture_message(message, level="warning")
+
+
+@dataclass(slots=True)
+class RequestQueries:
+    """SQL statements issued while serving one request."""
+
+    count: int = 0
+    budget: int | None = None
+    reported: bool = False
+
+    @property
+    def limit(self) -> int:
+        return self.budget if self.budget is not None else settings.db_query_budget
+
+
+request_queries: ContextVar[RequestQueries | None] = ContextVar("request_queries", default=None)
+
+
+def install_query_counter(engine) -> None:
+    """Count statements against the current request's ``RequestQueries``."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany) -> None:
+        queries = request_queries.get()
+        if queries is None:
+            return
+        queries.count += 1
+        if settings.db_query_budget_mode == "raise" and 0 < queries.limit < queries.count:
+            raise QueryBudgetExceeded(
+                f"request exceeded its query budget of {queries.limit} statements; "
+                f"next statement: {statement[:200]}"
+            )
+
+
+def query_budget(limit: int) -> Callable[[], None]:
+    """FastAPI dependency that sets this route's statement budget.
+
+    Usage:
+        @router.post("/bulk", dependencies=[Depends(query_budget(200))])
+    """
+
+    def _set_budget() -> None:
+        queries = request_queries.get()
+        if queries is not None:
+            queries.budget = limit
+
+    return _set_budget
+
+
+def check_query_budget(queries: RequestQueries, method: str, route: str) -> None:
+    """Record and (in ``log`` mode) warn about a request that went over budget."""
+    limit = queries.limit
+    if limit <= 0 or queries.count <= limit or settings.db_query_budget_mode == "off" or queries.reported:
+        return
+    queries.reported = True
+    QUERY_BUDGET_EXCEEDED.inc(method, route)
+    if settings.db_query_budget_mode == "log":
+        logger.warning(
+            "Query budget exceeded: %s %s ran %d statements (budget %d)", method, route, queries.count, limit
+        )
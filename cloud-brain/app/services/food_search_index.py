@@ -0,0 +1,510 @@
+"""
+Zuralog Cloud Brain — In-Memory Food Search Index.
+
+Answers ``GET /nutrition/foods/search`` from process memory instead of
+running a pg_trgm ``similarity()`` scan per keystroke. Two structures are
+kept over normalized food names:
+
+* **Trigram inverted index** — trigram → posting list of entry slots.
+  Trigrams are generated exactly like pg_trgm (each word padded as
+  ``"  word "``) and scored with the same Jaccard similarity, so ranking
+  matches the Postgres query it replaces. Candidate generation only walks
+  the rarest posting lists needed to reach the similarity threshold
+  (prefix filtering), so common trigrams never cause a full scan.
+* **Prefix trie** — over every word of every name, so a partially typed
+  last word ("chick") finds "chicken" before it shares enough trigrams.
+
+The index is built at startup from the USDA seed catalog, then replaced
+by a full copy hydrated from ``food_cache`` in the background (built in a
+worker thread and swapped in). The writing worker updates its own index
+whenever ``_upsert_food_cache`` or correction learning writes a food.
+Every other worker picks up the change within
+``REFRESH_INTERVAL_SECONDS``: the next search after the interval
+re-reads the rows whose ``fetched_at`` moved since the last sync (an
+indexed range scan that is usually empty). Entries whose database row has
+not been seen yet (seed entries before hydration) are *cold*: a result
+set containing them falls back to Postgres, as does a miss.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_THRESHOLD = 0.3  # mirrors food_search_service._SIMILARITY_THRESHOLD
+_PREFIX_BONUS = 0.25
+_STARTS_WITH_BONUS = 0.1
+_PREFIX_CANDIDATE_CAP = 200
+# Upper bound on trigram candidates verified per query. Bands are visited
+# best-bound first, so hitting the budget only drops the weakest matches of
+# very broad queries; it keeps worst-case latency flat as the catalog grows.
+_CANDIDATE_BUDGET = 4_000
+
+# How stale another worker's food_cache writes may be in this worker's index.
+REFRESH_INTERVAL_SECONDS = 30.0
+# Re-read window before the last sync, covering clock skew between the
+# servers that stamp fetched_at.
+_REFRESH_OVERLAP = timedelta(minutes=2)
+
+_SELECT_ROWS = (
+    "SELECT id, external_id, name, brand, serving_size, serving_unit, "
+    "calories_per_serving, protein_per_serving, carbs_per_serving, "
+    "fat_per_serving, metadata "
+    "FROM food_cache "
+)
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9 ]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a food name the same way ``food_search_service`` does."""
+    name = _NON_ALNUM_RE.sub("", name.lower().strip())
+    return _WHITESPACE_RE.sub(" ", name).strip()
+
+
+def trigrams(normalized: str) -> set[str]:
+    """Return the pg_trgm trigram set for an already-normalized string."""
+    grams: set[str] = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i : i + 3])
+    return grams
+
+
+class _TrieNode:
+    __slots__ = ("children", "slots")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.slots: array | None = None
+
+
+class FoodSearchIndex:
+    """Trigram + prefix-trie index over food_cache names.
+
+    Entries are keyed by ``external_id``. Each stored entry is the API
+    result dict returned by ``search_foods``; an entry whose ``id`` is None
+    has not been matched to a database row yet and is treated as cold.
+
+    Every posting list (and every trie word's slot list) is kept ordered
+    by the entry's trigram count. Similarity is bounded by name length
+    (``sim ≤ min(|Q|, |D|) / max(|Q|, |D|)``), so search visits length
+    bands best-bound first and stops as soon as no remaining band can beat
+    the current top ``limit`` — common trigrams are never scanned in full.
+
+    Updates never remove postings: a replaced entry's old slot is marked
+    dead and skipped at query time. Single writes insert in order; bulk
+    loads append and re-sort once at the end.
+
+    Writes take a lock; reads are lock-free and tolerate a concurrently
+    inserted slot.
+    """
+
+    def __init__(self) -> None:
+        self._entries: list[dict | None] = []
+        self._names: list[str] = []
+        self._grams: list[tuple[int, ...]] = []
+        self._lengths: list[int] = []
+        self._slot_by_external_id: dict[str, int] = {}
+        self._gram_ids: dict[str, int] = {}
+        self._postings: list[array] = []
+        self._trie = _TrieNode()
+        self._lock = threading.Lock()
+        self.hydrated = False
+        # Start of the last hydration or refresh; None until hydrated.
+        self.synced_at: datetime | None = None
+        self.refresh_due = 0.0  # time.monotonic() of the next refresh
+
+    def __len__(self) -> int:
+        return len(self._slot_by_external_id)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, external_id: str, entry: dict[str, Any]) -> None:
+        """Insert or replace one entry.
+
+        Args:
+            external_id: Stable food_cache key (``usda:…``, ``ai:…``).
+            entry: Result dict with at least ``name``; ``id`` may be None
+                for entries not yet matched to a database row.
+        """
+        with self._lock:
+            self._add_locked(external_id, entry, None)
+
+    def add_many(self, rows: Iterable[tuple[str, dict[str, Any]]]) -> int:
+        """Bulk insert ``(external_id, entry)`` pairs; returns how many were seen."""
+        touched: set[int] = set()
+        touched_nodes: list[_TrieNode] = []
+        count = 0
+        with self._lock:
+            for external_id, entry in rows:
+                self._add_locked(external_id, entry, (touched, touched_nodes))
+                count += 1
+            length_of = self._lengths.__getitem__
+            for gram_id in touched:
+                self._postings[gram_id] = array("I", sorted(self._postings[gram_id], key=length_of))
+            for node in {id(n): n for n in touched_nodes}.values():
+                node.slots = array("I", sorted(node.slots, key=length_of))  # type: ignore[arg-type]
+        return count
+
+    def _add_locked(
+        self,
+        external_id: str,
+        entry: dict[str, Any],
+        bulk: tuple[set[int], list[_TrieNode]] | None,
+    ) -> None:
+        normalized = normalize_name(entry.get("name") or "")
+        if not normalized:
+            return
+        old_slot = self._slot_by_external_id.get(external_id)
+        if old_slot is not None and self._names[old_slot] == normalized:
+            # Same name — swap the payload in place, postings are unchanged.
+            self._entries[old_slot] = entry
+            return
+
+        slot = len(self._entries)
+        grams = trigrams(normalized)
+        self._names.append(normalized)
+        self._lengths.append(len(grams))
+        length_of = self._lengths.__getitem__
+
+        gram_ids: list[int] = []
+        for gram in grams:
+            gram_id = self._gram_ids.get(gram)
+            if gram_id is None:
+                gram_id = len(self._postings)
+                self._gram_ids[gram] = gram_id
+                self._postings.append(array("I"))
+            if bulk is None:
+                insort(self._postings[gram_id], slot, key=length_of)
+            else:
+                self._postings[gram_id].append(slot)
+                bulk[0].add(gram_id)
+            gram_ids.append(gram_id)
+
+        for word in set(normalized.split()):
+            node = self._trie
+            for ch in word:
+                nxt = node.children.get(ch)
+                if nxt is None:
+                    nxt = node.children[ch] = _TrieNode()
+                node = nxt
+            if node.slots is None:
+                node.slots = array("I")
+            if bulk is None:
+                insort(node.slots, slot, key=length_of)
+            else:
+                node.slots.append(slot)
+                bulk[1].append(node)
+
+        self._grams.append(tuple(gram_ids))
+        self._entries.append(entry)
+        self._slot_by_external_id[external_id] = slot
+        if old_slot is not None:
+            self._entries[old_slot] = None
+
+    def get(self, external_id: str) -> dict | None:
+        """Return the stored entry for ``external_id``, if any."""
+        slot = self._slot_by_external_id.get(external_id)
+        return self._entries[slot] if slot is not None else None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _prefix_slots(self, prefix: str, cap: int) -> set[int]:
+        """Return up to ``cap`` slots having a word that starts with ``prefix``.
+
+        Exact-word matches come first, then the subtree breadth-first;
+        within a node the shortest names come first.
+        """
+        node = self._trie
+        for ch in prefix:
+            node = node.children.get(ch)  # type: ignore[assignment]
+            if node is None:
+                return set()
+        found: set[int] = set()
+        queue = deque([node])
+        while queue and len(found) < cap:
+            current = queue.popleft()
+            if current.slots is not None:
+                found.update(current.slots[: cap - len(found)])
+            queue.extend(current.children.values())
+        return found
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        threshold: float = SIMILARITY_THRESHOLD,
+    ) -> list[dict]:
+        """Return up to ``limit`` entries ranked like the pg_trgm query.
+
+        An entry qualifies when its trigram similarity to the query exceeds
+        ``threshold`` or when every query word is a prefix of one of its
+        words. Prefix matches and names starting with the query get a
+        small ranking bonus so keystroke searches surface the obvious hit.
+
+        Args:
+            query: Raw search text (normalized here).
+            limit: Maximum number of results.
+            threshold: Minimum trigram similarity.
+
+        Returns:
+            Result dicts, best first. Cold entries are included as-is —
+            callers decide whether to fall back to the database.
+        """
+        normalized = normalize_name(query)
+        if not normalized or limit <= 0:
+            return []
+
+        query_grams = trigrams(normalized)
+        query_size = len(query_grams)
+        query_gram_ids = [self._gram_ids[g] for g in query_grams if g in self._gram_ids]
+        query_set = frozenset(query_gram_ids)
+
+        best: list[tuple[float, int]] = []  # min-heap of (score, -slot)
+        seen: set[int] = set()
+
+        def offer(slot: int, is_prefix: bool) -> None:
+            seen.add(slot)
+            if self._entries[slot] is None:
+                return
+            doc_grams = self._grams[slot]
+            shared = len(query_set.intersection(doc_grams))
+            score = shared / (query_size + len(doc_grams) - shared) if shared else 0.0
+            if is_prefix:
+                score += _PREFIX_BONUS
+            elif score <= threshold:
+                return
+            if self._names[slot].startswith(normalized):
+                score += _STARTS_WITH_BONUS
+            item = (score, -slot)
+            if len(best) < limit:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+
+        # 1. Prefix candidates — every query word prefixes some word of the name.
+        prefix_hits: set[int] | None = None
+        for word in sorted(normalized.split(), key=len, reverse=True):
+            slots = self._prefix_slots(word, _PREFIX_CANDIDATE_CAP)
+            prefix_hits = slots if prefix_hits is None else prefix_hits & slots
+            if not prefix_hits:
+                break
+        for slot in prefix_hits or ():
+            offer(slot, True)
+
+        # 2. Trigram candidates, one name-length band at a time, best bound
+        # first. For a name with L trigrams, sim = c / (|Q| + L - c) > t needs
+        # c > t·(|Q| + L) / (1 + t) shared trigrams, so every match appears in
+        # one of the rarest (known - c_min + 1) posting lists.
+        if query_gram_ids and threshold > 0:
+            query_gram_ids.sort(key=lambda g: len(self._postings[g]))
+            postings = [self._postings[g] for g in query_gram_ids]
+            length_of = self._lengths.__getitem__
+
+            def bound(length: int) -> float:
+                return min(query_size, length) / max(query_size, length)
+
+            lo = max(1, math.ceil(threshold * query_size))
+            hi = math.floor(query_size / threshold)
+            for length in sorted(range(lo, hi + 1), key=bound, reverse=True):
+                if bound(length) <= threshold:
+                    break
+                if len(best) >= limit and bound(length) + _STARTS_WITH_BONUS <= best[0][0]:
+                    break
+                min_overlap = math.floor(threshold * (query_size + length) / (1 + threshold)) + 1
+                probe = len(postings) - min_overlap + 1
+                for posting in postings[: max(0, probe)]:
+                    start = bisect_left(posting, length, key=length_of)
+                    stop = bisect_right(posting, length, lo=start, key=length_of)
+                    stop = min(stop, start + _CANDIDATE_BUDGET - len(seen))
+                    for slot in posting[start:stop]:
+                        if slot not in seen:
+                            offer(slot, False)
+                if len(seen) >= _CANDIDATE_BUDGET:
+                    break
+
+        ranked = sorted(best, reverse=True)
+        return [self._entries[-neg_slot] for _, neg_slot in ranked]  # type: ignore[misc]
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+
+_index: FoodSearchIndex | None = None
+
+
+def get_food_index() -> FoodSearchIndex | None:
+    """Return the process-wide index, or None before startup built it."""
+    return _index
+
+
+def row_to_entry(row: Any) -> dict[str, Any]:
+    """Convert a food_cache row mapping into a search result dict."""
+    metadata = row["metadata"] or {}
+    return {
+        "id": str(row["id"]),
+        "name": row["name"],
+        "brand": row["brand"],
+        "serving_size": float(row["serving_size"]),
+        "serving_unit": row["serving_unit"],
+        "calories_per_serving": float(row["calories_per_serving"]),
+        "protein_per_serving": float(row["protein_per_serving"]),
+        "carbs_per_serving": float(row["carbs_per_serving"]),
+        "fat_per_serving": float(row["fat_per_serving"]),
+        "source": metadata.get("source", "cached"),
+    }
+
+
+def _seed_entries() -> Iterable[tuple[str, dict[str, Any]]]:
+    from app.data.usda_seed_foods import SEED_FOODS  # noqa: PLC0415
+
+    for food in SEED_FOODS:
+        yield (
+            food["external_id"],
+            {
+                "id": None,
+                "name": food["name"],
+                "brand": None,
+                "serving_size": float(food["serving_size"]),
+                "serving_unit": food["serving_unit"],
+                "calories_per_serving": float(food["calories_per_serving"]),
+                "protein_per_serving": float(food["protein_per_serving"]),
+                "carbs_per_serving": float(food["carbs_per_serving"]),
+                "fat_per_serving": float(food["fat_per_serving"]),
+                "source": "usda",
+            },
+        )
+
+
+def build_food_index() -> FoodSearchIndex:
+    """Build the process-wide index from the USDA seed catalog.
+
+    Seed entries carry ``id=None`` (cold) until ``hydrate_food_index``
+    matches them to their database rows.
+    """
+    global _index
+    index = FoodSearchIndex()
+    index.add_many(_seed_entries())
+    _index = index
+    logger.info("food search index built from seed catalog: %d entries", len(index))
+    return index
+
+
+def _build_hydrated(rows: dict[str, dict[str, Any]]) -> FoodSearchIndex:
+    """Build a full index from seed entries overlaid with ``food_cache`` rows (one sort)."""
+    entries = dict(_seed_entries())
+    entries.update(rows)
+    index = FoodSearchIndex()
+    index.add_many(entries.items())
+    return index
+
+
+async def hydrate_food_index(session_factory: Any, batch_size: int = 5_000) -> int:
+    """Load every food_cache row into a new index and swap it in.
+
+    Runs as a background task after startup; search keeps working from
+    the seed entries (falling back to Postgres for cold ones) meanwhile.
+    Rows are read in keyset pages; the index is then built in a worker
+    thread with a single bulk insert, so the event loop is not blocked.
+    Writes that land during hydration are picked up by the first
+    :func:`refresh_food_index`.
+
+    Args:
+        session_factory: Async session factory, e.g. ``app.database.async_session``.
+        batch_size: Rows fetched per round trip.
+
+    Returns:
+        Number of rows loaded, or 0 if hydration failed.
+    """
+    global _index
+    from sqlalchemy import text  # noqa: PLC0415
+
+    started = datetime.now(timezone.utc)
+    rows: dict[str, dict[str, Any]] = {}
+    last_external_id = ""
+    try:
+        async with session_factory() as db:
+            while True:
+                result = await db.execute(
+                    text(_SELECT_ROWS + "WHERE external_id > :after ORDER BY external_id LIMIT :limit"),
+                    {"after": last_external_id, "limit": batch_size},
+                )
+                page = result.mappings().all()
+                if not page:
+                    break
+                for row in page:
+                    rows[row["external_id"]] = row_to_entry(row)
+                last_external_id = page[-1]["external_id"]
+        index = await asyncio.to_thread(_build_hydrated, rows)
+    except Exception:
+        logger.exception("hydrate_food_index: failed after %d rows", len(rows))
+        return 0
+    index.hydrated = True
+    index.synced_at = started
+    index.refresh_due = time.monotonic() + REFRESH_INTERVAL_SECONDS
+    _index = index
+    logger.info("food search index hydrated: %d rows, %d entries", len(rows), len(index))
+    return len(rows)
+
+
+async def refresh_food_index(index: FoodSearchIndex, db: Any) -> int:
+    """Apply food_cache rows written since the last sync, at most once per interval.
+
+    Called on the search path. Does nothing before hydration or until
+    ``REFRESH_INTERVAL_SECONDS`` have passed since the last refresh. A
+    failed refresh is logged and retried after the next interval; search
+    carries on with the current entries.
+
+    Args:
+        index: The process-wide index.
+        db: Async session for the range query.
+
+    Returns:
+        Number of rows applied.
+    """
+    from sqlalchemy import text  # noqa: PLC0415
+
+    if index.synced_at is None or time.monotonic() < index.refresh_due:
+        return 0
+    # Claimed before the query so concurrent searches don't refresh too.
+    index.refresh_due = time.monotonic() + REFRESH_INTERVAL_SECONDS
+    started = datetime.now(timezone.utc)
+    try:
+        result = await db.execute(
+            text(_SELECT_ROWS + "WHERE fetched_at > :since ORDER BY fetched_at"),
+            {"since": index.synced_at - _REFRESH_OVERLAP},
+        )
+        rows = result.mappings().all()
+    except Exception:
+        logger.warning("refresh_food_index: query failed", exc_info=True)
+        return 0
+    if rows:
+        index.add_many((row["external_id"], row_to_entry(row)) for row in rows)
+    index.synced_at = started
+    return len(rows)
+
+
+def reset_food_index() -> None:
+    """Drop the process-wide index (used by tests)."""
+    global _index
+    _index = None
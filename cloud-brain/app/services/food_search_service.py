@@ -1,8 +1,9 @@
 """
 Zuralog Cloud Brain — Food Search Service.
 
-Handles food search against the database (USDA-seeded data and previously
-cached foods). AI estimation utilities are provided for use by the
+Handles food search against the in-process index (see
+``food_search_index``), falling back to the database (USDA-seeded data and
+previously cached foods) for cold entries. AI estimation utilities are provided for use by the
 Describe/Parse path — search itself is database-only. Also manages
 correction learning: when enough users correct the same food's nutrition
 values, the cache entry is updated with averaged corrections.
@@ -24,6 +25,7 @@ from app.agent.llm_client import LLMClient
 from app.config import settings
 from app.models.food_cache import FoodCache
 from app.models.food_correction import FoodCorrection
+from app.services.food_search_index import get_food_index, refresh_food_index, row_to_entry
 from app.utils.sanitize import sanitize_for_llm
 
 logger = logging.getLogger(__name__)
@@ -173,11 +175,20 @@ async def _upsert_food_cache(
             "fetched_at": stmt.excluded.fetched_at,
         },
     )
-    await db.execute(stmt)
+    result = await db.execute(stmt.returning(FoodCache.id))
     await db.commit()
 
-    # Return a clean dict for the caller.
-    values["id"] = str(values["id"])
+    # Return a clean dict for the caller. On conflict the existing row keeps
+    # its id, so report the persisted one rather than the generated one.
+    persisted_id = result.scalar_one_or_none()
+    values["id"] = str(persisted_id or values["id"])
+
+    index = get_food_index()
+    if index is not None:
+        index.add(
+            external_id,
+            row_to_entry(values),
+        )
     return values
 
 
@@ -240,6 +251,21 @@ async def _process_food_corrections(db: AsyncSession, food_name: str) -> None:
     )
     await db.commit()
 
+    index = get_food_index()
+    cached = index.get(external_id) if index is not None else None
+    if cached is not None:
+        index.add(
+            external_id,
+            {
+                **cached,
+                "calories_per_serving": round(float(avgs.avg_calories), 2),
+                "protein_per_serving": round(float(avgs.avg_protein), 2),
+                "carbs_per_serving": round(float(avgs.avg_carbs), 2),
+                "fat_per_serving": round(float(avgs.avg_fat), 2),
+                "source": "user_corrected",
+            },
+        )
+
     logger.info(
         "Updated food_cache for '%s' from %d user corrections: "
         "%.1f cal, %.1f p, %.1f c, %.1f f",
@@ -262,12 +288,17 @@ async def search_foods(
     query: str,
     limit: int = 10,
 ) -> list[dict]:
-    """Search for foods in the database using trigram similarity.
-
-    Queries the food_cache table (USDA-seeded data and previously cached
-    foods) using PostgreSQL trigram similarity (pg_trgm). Returns only
-    database results — no AI fallback. AI estimation is handled
-    separately through the Describe/Parse path.
+    """Search for foods by name, ranked by trigram similarity.
+
+    Served from the in-process ``FoodSearchIndex`` when every returned
+    entry is warm (matched to its database row). The index first applies
+    food_cache writes from other workers when its refresh interval has
+    passed. Otherwise — index not
+    built yet, no in-memory match, or a cold entry in the results — the
+    food_cache table is queried with PostgreSQL trigram similarity
+    (pg_trgm) and the rows are added to the index. Returns only database
+    results — no AI fallback. AI estimation is handled separately through
+    the Describe/Parse path.
 
     Args:
         db: Active async database session.
@@ -282,7 +313,15 @@ async def search_foods(
     if not normalized:
         return []
 
-    # Try the cache first using pg_trgm similarity search.
+    index = get_food_index()
+    if index is not None:
+        await refresh_food_index(index, db)
+        hits = index.search(normalized, limit=limit, threshold=_SIMILARITY_THRESHOLD)
+        if hits and all(hit["id"] for hit in hits):
+            logger.debug("Index hit for '%s': %d results", normalized, len(hits))
+            return [dict(hit) for hit in hits]
+
+    # Cold path — pg_trgm similarity search.
     result = await db.execute(
         text(
             "SELECT id, external_id, name, brand, serving_size, serving_unit, "
@@ -299,21 +338,11 @@ async def search_foods(
 
     if rows:
         logger.debug("Cache hit for '%s': %d results", normalized, len(rows))
-        return [
-            {
-                "id": str(r["id"]),
-                "name": r["name"],
-                "brand": r["brand"],
-                "serving_size": float(r["serving_size"]),
-                "serving_unit": r["serving_unit"],
-                "calories_per_serving": float(r["calories_per_serving"]),
-                "protein_per_serving": float(r["protein_per_serving"]),
-                "carbs_per_serving": float(r["carbs_per_serving"]),
-                "fat_per_serving": float(r["fat_per_serving"]),
-                "source": (r["metadata"] or {}).get("source", "cached") if r["metadata"] else "cached",
-            }
-            for r in rows
-        ]
+        foods = [row_to_entry(r) for r in rows]
+        if index is not None:
+            for row, food in zip(rows, foods):
+                index.add(row["external_id"], food)
+        return [dict(food) for food in foods]
 
     # No cache results — return empty. AI estimation only happens
     # through the Describe/Parse path, not through search.
@@ -0,0 +1,118 @@
+"""
+Zuralog Cloud Brain — Health Event Partitions.
+
+Maintains the monthly ``local_date`` partitions of ``health_events``. Future
+partitions are created ahead of time through the
+``health_events_ensure_partition`` SQL function that migration
+e6a0c3d4f9b5 installs. Expired partitions are either detached into the
+``health_archive`` schema (for export and later removal by an operator) or
+dropped outright.
+
+daily_summaries and health_event_rollups are not affected by expiry, so
+the day-level history stays intact after raw partitions go away.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA = "health_archive"
+ARCHIVE_MODES = ("detach", "drop")
+
+_PARTITION_NAME = re.compile(r"^health_events_p(\d{4})_(\d{2})$")
+
+_LIST_PARTITIONS_SQL = text(
+    """
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    WHERE p.relname = 'health_events'
+    ORDER BY c.relname
+    """
+)
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month ``months`` after ``day``'s month (negative goes back)."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_month(name: str) -> date | None:
+    """Parse ``health_events_pYYYY_MM`` into its first day; None for other partitions."""
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+async def list_partitions(db: AsyncSession) -> list[tuple[str, date]]:
+    """Return ``(name, month_start)`` for every monthly partition, oldest first."""
+    names = (await db.execute(_LIST_PARTITIONS_SQL)).scalars().all()
+    months = [(name, partition_month(name)) for name in names]
+    return sorted(((n, m) for n, m in months if m is not None), key=lambda item: item[1])
+
+
+async def ensure_partitions(db: AsyncSession, today: date, months_ahead: int) -> list[str]:
+    """Create the current month's partition and the next ``months_ahead``; return new names."""
+    created: list[str] = []
+    for offset in range(months_ahead + 1):
+        month = add_months(today, offset)
+        name = (
+            await db.execute(text("SELECT health_events_ensure_partition(:month)"), {"month": month})
+        ).scalar_one_or_none()
+        if name:
+            created.append(name)
+    await db.commit()
+    if created:
+        logger.info("health_events partitions created: %s", ", ".join(created))
+    return created
+
+
+async def expire_partitions(db: AsyncSession, today: date, retain_months: int, mode: str) -> list[str]:
+    """Detach-and-archive or drop partitions older than ``retain_months``.
+
+    A partition expires once its whole month is before the first day of
+    the month ``retain_months`` back from ``today``. ``retain_months <= 0``
+    disables expiry.
+
+    Args:
+        db: Async database session.
+        today: Reference date (UTC).
+        retain_months: Number of whole months of raw partitions to keep.
+        mode: ``"detach"`` moves the table into ``health_archive``;
+            ``"drop"`` deletes it.
+
+    Returns:
+        Names of the partitions that were expired.
+    """
+    if retain_months <= 0:
+        return []
+    if mode not in ARCHIVE_MODES:
+        raise ValueError(f"Unknown archive mode {mode!r}; expected one of {ARCHIVE_MODES}")
+
+    boundary = add_months(today, -retain_months)
+    expired = [name for name, month in await list_partitions(db) if add_months(month, 1) <= boundary]
+    if not expired:
+        return []
+
+    if mode == "detach":
+        await db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+    for name in expired:
+        # Names come from list_partitions and match _PARTITION_NAME, so they are safe to inline.
+        await db.execute(text(f"ALTER TABLE health_events DETACH PARTITION {name}"))
+        if mode == "detach":
+            await db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        else:
+            await db.execute(text(f"DROP TABLE {name}"))
+        await db.commit()
+        logger.info("health_events partition %s expired (%s)", name, mode)
+    return expired
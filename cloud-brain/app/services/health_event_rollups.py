@@ -0,0 +1,266 @@
+"""
+Zuralog Cloud Brain — Health Event Rollups.
+
+Compacts raw device samples that have aged out of the raw retention window
+into hourly aggregates (``health_event_rollups``), and loads the mixed
+raw + rollup inputs that daily_summaries recomputes need.
+
+Only rows that nothing else references are compacted: device
+(non-manual), point-in-time samples with no session and no idempotency
+key. Manual entries stay raw because users can still delete them.
+Session samples stay raw because session detail views read them, and
+idempotency-keyed rows stay raw because replays are matched against them.
+Soft-deleted rows past the window are purged because they no longer
+contribute to any aggregate.
+
+Compaction is one statement per day. ``DELETE ... RETURNING`` feeds an
+``INSERT ... ON CONFLICT`` merge, so a retried or re-run day folds into
+the existing rollups instead of double counting. The statement prunes to
+a single ``local_date`` partition.
+
+Progress is kept per monthly partition in ``health_event_compaction``
+(the last day compacted). When ingest writes compactable samples to a day
+that is already compacted, :func:`reopen_compacted_days` moves that
+month's progress back. The next run then compacts the late samples too.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.health_event import HealthEvent
+from app.models.health_event_rollup import HealthEventRollup
+from app.services.health_event_partitions import add_months
+
+logger = logging.getLogger(__name__)
+
+_COMPACTABLE = (
+    "granularity = 'point_in_time' AND source != 'manual' "
+    "AND session_id IS NULL AND idempotency_key IS NULL AND deleted_at IS NULL"
+)
+
+_COMPACT_DAY_SQL = text(
+    f"""
+    WITH moved AS (
+        DELETE FROM health_events
+        WHERE local_date = :day AND {_COMPACTABLE}
+        RETURNING user_id, metric_type, source, unit, local_date, recorded_at, created_at, value
+    ), hourly AS (
+        SELECT
+            user_id, metric_type, local_date, source,
+            date_trunc('hour', recorded_at) AS hour_start,
+            min(unit) AS unit,
+            count(*) AS sample_count,
+            sum(value) AS value_sum,
+            min(value) AS value_min,
+            max(value) AS value_max,
+            (array_agg(value ORDER BY recorded_at DESC, created_at DESC))[1] AS last_value,
+            max(recorded_at) AS last_recorded_at,
+            (array_agg(created_at ORDER BY recorded_at DESC, created_at DESC))[1] AS last_created_at
+        FROM moved
+        GROUP BY user_id, metric_type, local_date, source, date_trunc('hour', recorded_at)
+    ), merged AS (
+        INSERT INTO health_event_rollups AS r (
+            user_id, metric_type, local_date, source, hour_start, unit, sample_count,
+            value_sum, value_min, value_max, last_value, last_recorded_at, last_created_at
+        )
+        SELECT * FROM hourly
+        ON CONFLICT (user_id, metric_type, local_date, source, hour_start) DO UPDATE SET
+            sample_count = r.sample_count + EXCLUDED.sample_count,
+            value_sum = r.value_sum + EXCLUDED.value_sum,
+            value_min = LEAST(r.value_min, EXCLUDED.value_min),
+            value_max = GREATEST(r.value_max, EXCLUDED.value_max),
+            last_value = CASE
+                WHEN (EXCLUDED.last_recorded_at, EXCLUDED.last_created_at) > (r.last_recorded_at, r.last_created_at)
+                THEN EXCLUDED.last_value ELSE r.last_value END,
+            last_created_at = CASE
+                WHEN (EXCLUDED.last_recorded_at, EXCLUDED.last_created_at) > (r.last_recorded_at, r.last_created_at)
+                THEN EXCLUDED.last_created_at ELSE r.last_created_at END,
+            last_recorded_at = GREATEST(r.last_recorded_at, EXCLUDED.last_recorded_at)
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM moved) AS samples, (SELECT count(*) FROM merged) AS rollups
+    """
+)
+
+_PURGE_DELETED_SQL = text("DELETE FROM health_events WHERE local_date = :day AND deleted_at IS NOT NULL")
+
+# Advances one day at a time. If ingest moved the month back in the
+# meantime, the WHERE fails and the earlier day is kept.
+_ADVANCE_SQL = text(
+    """
+    INSERT INTO health_event_compaction AS c (month_start, compacted_through)
+    VALUES (:month, :day)
+    ON CONFLICT (month_start) DO UPDATE SET compacted_through = EXCLUDED.compacted_through, updated_at = now()
+    WHERE c.compacted_through = EXCLUDED.compacted_through - 1
+    """
+)
+
+_REOPEN_SQL = text(
+    """
+    UPDATE health_event_compaction
+    SET compacted_through = CAST(:day AS date) - 1, updated_at = now()
+    WHERE month_start = :month AND compacted_through >= :day
+    """
+)
+
+
+def is_compactable(source: str, granularity: str, session_id: object, idempotency_key: object) -> bool:
+    """Whether compaction would fold a sample with these fields into rollups."""
+    return granularity == "point_in_time" and source != "manual" and session_id is None and idempotency_key is None
+
+
+async def load_day_inputs(
+    db: AsyncSession,
+    user_id: str,
+    local_date: date,
+    metric_type: str,
+) -> tuple[list[dict], list[dict]]:
+    """Return ``(events, rollups)`` for one (user, day, metric) recompute.
+
+    Both lists are in the shapes ``aggregate_events`` expects.
+    """
+    return (await load_day_inputs_for_metrics(db, user_id, local_date, [metric_type]))[metric_type]
+
+
+async def load_day_inputs_for_metrics(
+    db: AsyncSession,
+    user_id: str,
+    local_date: date,
+    metric_types: Iterable[str],
+) -> dict[str, tuple[list[dict], list[dict]]]:
+    """Return ``{metric_type: (events, rollups)}`` for one user's day in two queries.
+
+    Every requested metric type is present in the result, with empty lists
+    when it has no samples.
+    """
+    inputs: dict[str, tuple[list[dict], list[dict]]] = {mt: ([], []) for mt in metric_types}
+    if not inputs:
+        return inputs
+    rows = await db.execute(
+        select(HealthEvent.metric_type, HealthEvent.value, HealthEvent.recorded_at, HealthEvent.created_at).where(
+            HealthEvent.user_id == user_id,
+            HealthEvent.local_date == local_date,
+            HealthEvent.metric_type.in_(list(inputs)),
+            HealthEvent.deleted_at.is_(None),
+        )
+    )
+    for r in rows.fetchall():
+        inputs[r.metric_type][0].append({"value": r.value, "recorded_at": r.recorded_at, "created_at": r.created_at})
+
+    rollup_rows = await db.execute(
+        select(
+            HealthEventRollup.metric_type,
+            HealthEventRollup.sample_count,
+            HealthEventRollup.value_sum,
+            HealthEventRollup.last_value,
+            HealthEventRollup.last_recorded_at,
+            HealthEventRollup.last_created_at,
+        ).where(
+            HealthEventRollup.user_id == user_id,
+            HealthEventRollup.metric_type.in_(list(inputs)),
+            HealthEventRollup.local_date == local_date,
+        )
+    )
+    for r in rollup_rows.fetchall():
+        rollup = dict(r._mapping)
+        inputs[rollup.pop("metric_type")][1].append(rollup)
+    return inputs
+
+
+async def compact_day(db: AsyncSession, day: date) -> dict:
+    """Fold one day's compactable samples into hourly rollups and purge deleted rows.
+
+    Runs in the caller's transaction; the caller commits.
+
+    Returns:
+        Dict with ``samples`` (raw rows compacted), ``rollups`` (hourly rows
+        written or merged) and ``purged`` (soft-deleted rows removed).
+    """
+    result = (await db.execute(_COMPACT_DAY_SQL, {"day": day})).one()
+    purged = (await db.execute(_PURGE_DELETED_SQL, {"day": day})).rowcount or 0
+    return {"samples": int(result.samples), "rollups": int(result.rollups), "purged": int(purged)}
+
+
+async def compact_expired_events(
+    db: AsyncSession,
+    today: date,
+    retention_days: int,
+    max_days: int,
+    months: Iterable[date] = (),
+) -> dict:
+    """Compact every day older than ``retention_days``, oldest month first.
+
+    Each month resumes after its ``compacted_through`` day, or starts at
+    its first day if it has no progress yet. At most ``max_days`` days are
+    processed per call, with one commit per day. ``retention_days <= 0``
+    disables compaction.
+
+    Args:
+        db: Async database session.
+        today: Reference date (UTC).
+        retention_days: Raw samples are kept this many days.
+        max_days: Day budget for this call.
+        months: First day of every monthly partition.
+
+    Returns:
+        Dict with ``days`` processed and summed ``samples`` / ``rollups`` / ``purged``.
+    """
+    totals = {"days": 0, "samples": 0, "rollups": 0, "purged": 0}
+    if retention_days <= 0:
+        return totals
+
+    cutoff = today - timedelta(days=retention_days)
+    progress = dict(
+        (await db.execute(text("SELECT month_start, compacted_through FROM health_event_compaction"))).all()
+    )
+    for month in sorted(months):
+        if month >= cutoff or totals["days"] >= max_days:
+            break
+        done = progress.get(month)
+        day = done + timedelta(days=1) if done else month
+        end = min(add_months(month, 1), cutoff)
+        while day < end and totals["days"] < max_days:
+            stats = await compact_day(db, day)
+            await db.execute(_ADVANCE_SQL, {"month": month, "day": day})
+            await db.commit()
+            for key, value in stats.items():
+                totals[key] += value
+            totals["days"] += 1
+            if stats["samples"]:
+                logger.info(
+                    "health_events compaction: day=%s samples=%d rollups=%d", day, stats["samples"], stats["rollups"]
+                )
+            day += timedelta(days=1)
+    return totals
+
+
+async def reopen_compacted_days(db: AsyncSession, days: Iterable[date], today: date, retention_days: int) -> None:
+    """Move compaction progress back for days that just received compactable samples.
+
+    Only days past the raw retention window can already be compacted.
+    Runs in the caller's transaction.
+
+    Args:
+        db: Async database session.
+        days: ``local_date`` of each compactable sample written.
+        today: Reference date (UTC).
+        retention_days: ``health_events_raw_retention_days``; ``<= 0`` is a no-op.
+
+    All affected months are updated in one executemany.
+    """
+    if retention_days <= 0:
+        return
+    cutoff = today - timedelta(days=retention_days)
+    earliest: dict[date, date] = {}
+    for day in days:
+        if day < cutoff:
+            month = day.replace(day=1)
+            earliest[month] = min(day, earliest.get(month, day))
+    if earliest:
+        await db.execute(_REOPEN_SQL, [{"month": month, "day": day} for month, day in sorted(earliest.items())])
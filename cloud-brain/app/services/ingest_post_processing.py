@@ -1,8 +1,13 @@
 """Post-processing hooks called after a successful ingest write.
 
-Triggers streak updates for the appropriate streak types given a
-metric_type. Isolated here so ingest_routes stays focused on ingestion
-and so this logic is unit-testable independently.
+Triggers streak updates for the appropriate streak types given the
+metric types and dates of an ingest. Isolated here so ingest_routes stays
+focused on ingestion and so this logic is unit-testable independently.
+
+Streaks are evaluated after the ingest commits, off the request path:
+routes call ``schedule_ingest_streaks``, which hands the affected
+(metric_type, date) pairs to a Celery task. Each task collapses them into
+one pass per streak type and writes every streak with a single upsert.
 
 Streak type mapping:
   steps / step_count          → steps + engagement
@@ -14,10 +19,15 @@ Streak type mapping:
 from __future__ import annotations
 
 import logging
+from collections import defaultdict
+from collections.abc import Iterable
 from datetime import date
 
+import redis.asyncio as aioredis
+from fastapi import BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import async_session
 from app.services.streak_tracker import StreakTracker
 
 logger = logging.getLogger(__name__)
@@ -34,38 +44,93 @@ _METRIC_TO_STREAK_TYPES: dict[str, list[str]] = {
 }
 
 
-async def trigger_streaks_for_metric(
+def streak_dates_for_metrics(metric_dates: Iterable[tuple[str, date]]) -> dict[str, list[date]]:
+    """Group ingested ``(metric_type, local_date)`` pairs by streak type.
+
+    Returns:
+        ``{streak_type: sorted unique dates}``.
+    """
+    grouped: dict[str, set[date]] = defaultdict(set)
+    for metric_type, activity_date in metric_dates:
+        for streak_type in _METRIC_TO_STREAK_TYPES.get(metric_type, ["engagement"]):
+            grouped[streak_type].add(activity_date)
+    return {streak_type: sorted(dates) for streak_type, dates in grouped.items()}
+
+
+async def evaluate_ingest_streaks(
     db: AsyncSession,
     user_id: str,
-    metric_type: str,
-    activity_date: date,
-) -> None:
-    """Record activity for all streak types associated with this metric.
+    metric_dates: Iterable[tuple[str, date]],
+    redis: aioredis.Redis | None = None,
+) -> dict[str, tuple[int, int, date | None]]:
+    """Record activity for every streak type touched by an ingest.
+
+    One pass per streak type over the sorted affected dates, written with
+    a single upsert and commit (see ``StreakTracker.record_activity_batch``).
+    Runs after the ingest has committed, from ``schedule_ingest_streaks``.
 
-    Never raises — streak failures must never block an ingest response.
+    Never raises — streak failures must never affect ingestion.
 
     Args:
-        db: Async database session (already in a transaction).
+        db: Async database session.
         user_id: Authenticated user ID.
-        metric_type: The metric type just ingested (e.g. "steps").
-        activity_date: The local calendar date of the event.
+        metric_dates: ``(metric_type, local_date)`` pairs that were ingested.
+        redis: Client for the data-version bump; ``None`` (Celery) opens a
+            short-lived one.
+
+    Returns:
+        The changed streaks as returned by ``record_activity_batch``, or
+        an empty dict on failure.
     """
-    streak_types = _METRIC_TO_STREAK_TYPES.get(metric_type, ["engagement"])
-    tracker = StreakTracker()
-    for streak_type in streak_types:
-        try:
-            await tracker.record_activity(
-                user_id=user_id,
-                streak_type=streak_type,
-                activity_date=activity_date,
-                db=db,
-            )
-            logger.debug(
-                "trigger_streaks: user=%s metric=%s streak=%s date=%s",
-                user_id[:8], metric_type, streak_type, activity_date,
-            )
-        except Exception as exc:  # noqa: BLE001
-            logger.warning(
-                "trigger_streaks: non-fatal error for user=%s streak=%s: %s",
-                user_id[:8], streak_type, exc,
-            )
+    dates_by_type = streak_dates_for_metrics(metric_dates)
+    try:
+        updated = await StreakTracker().record_activity_batch(user_id, dates_by_type, db, redis=redis)
+        logger.debug(
+            "evaluate_ingest_streaks: user=%s types=%s updated=%s",
+            user_id[:8], sorted(dates_by_type), sorted(updated),
+        )
+        return updated
+    except Exception as exc:  # noqa: BLE001
+        logger.warning(
+            "evaluate_ingest_streaks: non-fatal error for user=%s: %s",
+            user_id[:8], exc,
+        )
+        await db.rollback()
+        return {}
+
+
+async def _evaluate_in_new_session(
+    user_id: str,
+    metric_dates: list[tuple[str, date]],
+    redis: aioredis.Redis | None,
+) -> None:
+    async with async_session() as db:
+        await evaluate_ingest_streaks(db, user_id, metric_dates, redis=redis)
+
+
+def schedule_ingest_streaks(
+    background_tasks: BackgroundTasks,
+    user_id: str,
+    metric_dates: Iterable[tuple[str, date]],
+    redis: aioredis.Redis | None = None,
+) -> None:
+    """Evaluate streaks for an ingest off the request path.
+
+    Enqueues ``evaluate_streaks_for_ingest`` on Celery. If the broker is
+    unavailable, falls back to a FastAPI background task that runs after
+    the response has been sent, with its own session and the API's
+    ``redis`` client.
+    """
+    pairs = sorted(set(metric_dates))
+    if not pairs:
+        return
+    try:
+        from app.tasks.streak_tasks import evaluate_streaks_for_ingest
+
+        evaluate_streaks_for_ingest.delay(
+            user_id=user_id,
+            metric_dates=[[metric_type, d.isoformat()] for metric_type, d in pairs],
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("schedule_ingest_streaks: enqueue failed for user=%s, running in-process: %s", user_id[:8], exc)
+        background_tasks.add_task(_evaluate_in_new_session, user_id, pairs, redis)
@@ -10,6 +10,7 @@ single fast query.
 import logging
 from datetime import date, datetime, time, timedelta, timezone
 
+import redis.asyncio as aioredis
 from sqlalchemy import select
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,6 +18,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.exercise_entry import ExerciseEntry
 from app.models.meal import Meal
 from app.models.nutrition_daily_summary import NutritionDailySummary
+from app.services.data_version import SCOPE_DATA, SCOPE_GOALS, bump_data_version
 from app.utils.user_date import get_user_local_date
 
 logger = logging.getLogger(__name__)
@@ -26,6 +28,7 @@ async def recompute_nutrition_summary(
     db: AsyncSession,
     user_id: str,
     summary_date: date,
+    redis: aioredis.Redis | None = None,
 ) -> None:
     """Recompute and upsert the daily nutrition summary for a given user and date.
 
@@ -38,6 +41,8 @@ async def recompute_nutrition_summary(
         db: Active async database session.
         user_id: The authenticated user's ID.
         summary_date: The calendar date to recompute.
+        redis: Client for the data-version bump, e.g.
+            ``request.app.state.redis``; ``None`` opens a short-lived one.
     """
     # Build UTC day boundaries from the calendar date.
     day_start = datetime.combine(summary_date, time.min, tzinfo=timezone.utc)
@@ -151,6 +156,8 @@ async def recompute_nutrition_summary(
             summary_date,
         )
 
+    await bump_data_version(user_id, SCOPE_DATA, SCOPE_GOALS, redis=redis)
+
 
 # ---------------------------------------------------------------------------
 # Range helpers
@@ -238,7 +245,14 @@ async def get_nutrition_all_data(
     start_date = local_date - timedelta(days=days - 1)
 
     result = await db.execute(
-        select(NutritionDailySummary)
+        select(
+            NutritionDailySummary.date,
+            NutritionDailySummary.total_calories,
+            NutritionDailySummary.total_protein_g,
+            NutritionDailySummary.total_carbs_g,
+            NutritionDailySummary.total_fat_g,
+            NutritionDailySummary.meal_count,
+        )
         .where(
             NutritionDailySummary.user_id == user_id,
             NutritionDailySummary.date >= start_date,
@@ -246,21 +260,20 @@ async def get_nutrition_all_data(
         )
         .order_by(NutritionDailySummary.date)
     )
-    rows = result.scalars().all()
 
     return [
         {
-            "date": str(row.date),
-            "is_today": row.date == local_date,
+            "date": str(row_date),
+            "is_today": row_date == local_date,
             "values": {
-                "calories": float(row.total_calories) if row.total_calories is not None else None,
-                "protein": float(row.total_protein_g) if row.total_protein_g is not None else None,
-                "carbs": float(row.total_carbs_g) if row.total_carbs_g is not None else None,
-                "fat": float(row.total_fat_g) if row.total_fat_g is not None else None,
-                "meals": float(row.meal_count) if row.meal_count is not None else None,
+                "calories": float(calories) if calories is not None else None,
+                "protein": float(protein) if protein is not None else None,
+                "carbs": float(carbs) if carbs is not None else None,
+                "fat": float(fat) if fat is not None else None,
+                "meals": float(meals) if meals is not None else None,
             },
         }
-        for row in rows
+        for row_date, calories, protein, carbs, fat, meals in result.all()
     ]
 
 
@@ -17,6 +17,8 @@ from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -55,7 +57,7 @@ class SmartReminderEngine:
         3. Generate reminder candidates.
         4. Deduplicate: skip if same type sent within DEDUP_HOURS.
         5. Respect quiet hours.
-        6. Send via PushService + persist to notification_logs.
+        6. Persist to notification_logs, then send via PushService.
         7. Return the number of reminders actually sent.
 
         Args:
@@ -66,7 +68,6 @@ class SmartReminderEngine:
             Number of reminders sent (0 if capped or quiet hours active).
         """
         now_utc = datetime.now(timezone.utc)
-        sent_count = 0
 
         # -------------------------------------------------------------------------
         # 1. Load user preferences (soft import)
@@ -82,15 +83,7 @@ class SmartReminderEngine:
             result = await db.execute(
                 select(UserPreferences).where(UserPreferences.user_id == user_id)
             )
-            prefs = result.scalar_one_or_none()
-            if prefs:
-                # Use proactivity level to set the daily cap
-                proactivity_caps = {"low": 1, "medium": 2, "high": 3}
-                daily_cap = proactivity_caps.get(prefs.proactivity_level, MAX_DAILY_REMINDERS)
-
-                # Parse quiet hours
-                quiet_start = _parse_hhmm(prefs.quiet_hours_start)
-                quiet_end = _parse_hhmm(prefs.quiet_hours_end)
+            daily_cap, quiet_start, quiet_end = _cap_and_quiet_hours(result.scalar_one_or_none())
         except Exception:
             logger.debug(
                 "smart_reminder: could not load preferences for user=%s",
@@ -145,39 +138,8 @@ class SmartReminderEngine:
         # -------------------------------------------------------------------------
         # 4. Generate reminder candidates
         # -------------------------------------------------------------------------
-        candidates: list[dict] = []
-
-        # --- Gap reminder: no data logged today by noon ---
-        if now_utc.hour >= _GAP_NUDGE_HOUR:
-            try:
-                from sqlalchemy import select
-                from app.models.daily_metrics import DailyHealthMetrics
-
-                today_str = now_utc.strftime("%Y-%m-%d")
-                result = await db.execute(
-                    select(DailyHealthMetrics)
-                    .where(
-                        DailyHealthMetrics.user_id == user_id,
-                        DailyHealthMetrics.date == today_str,
-                    )
-                    .limit(1)
-                )
-                today_data = result.scalar_one_or_none()
-
-                if today_data is None:
-                    candidates.append({
-                        "type": "gap",
-                        "title": "Check In With Zuralog",
-                        "body": "No data logged today yet. Sync your health data to stay on track!",
-                    })
-            except Exception:
-                logger.debug(
-                    "smart_reminder: could not check data gap for user=%s",
-                    user_id,
-                    exc_info=True,
-                )
-
-        # --- Goal proximity: within 10% of step goal ---
+        has_today_data: bool | None = None
+        today_steps: int | None = None
         try:
             from sqlalchemy import select
             from app.models.daily_metrics import DailyHealthMetrics
@@ -192,30 +154,16 @@ class SmartReminderEngine:
                 .limit(1)
             )
             today_data = result.scalar_one_or_none()
-
-            if today_data and today_data.steps is not None:
-                steps = today_data.steps
-                goal = _STEP_GOAL_DEFAULT
-                threshold = goal * 0.9
-
-                if threshold <= steps < goal:
-                    remaining = goal - steps
-                    candidates.append({
-                        "type": "goal",
-                        "title": "Almost There!",
-                        "body": (
-                            f"You're {remaining:,} steps away from your goal. "
-                            f"You've got this!"
-                        ),
-                    })
+            has_today_data = today_data is not None
+            today_steps = today_data.steps if today_data else None
         except Exception:
             logger.debug(
-                "smart_reminder: could not check goal proximity for user=%s",
+                "smart_reminder: could not load today's data for user=%s",
                 user_id,
                 exc_info=True,
             )
 
-        # --- Celebration: streak milestone ---
+        streak_days = 0
         try:
             from sqlalchemy import select
             from app.models.user_streak import UserStreak
@@ -228,17 +176,6 @@ class SmartReminderEngine:
                 )
             )
             streak_days = streak_result.scalar_one_or_none() or 0
-
-            milestones = {7, 14, 30, 50, 100}
-            if streak_days in milestones:
-                candidates.append({
-                    "type": "celebration",
-                    "title": f"{streak_days}-Day Streak!",
-                    "body": (
-                        f"Amazing! You've been tracking for {streak_days} days straight. "
-                        f"Keep it up!"
-                    ),
-                })
         except Exception:
             logger.debug(
                 "smart_reminder: could not check streak for user=%s",
@@ -246,6 +183,8 @@ class SmartReminderEngine:
                 exc_info=True,
             )
 
+        candidates = _reminder_candidates(now_utc, has_today_data, today_steps, streak_days)
+
         # -------------------------------------------------------------------------
         # 5. Deduplicate: skip if same type sent within DEDUP_HOURS
         # -------------------------------------------------------------------------
@@ -279,83 +218,157 @@ class SmartReminderEngine:
         ]
 
         # -------------------------------------------------------------------------
-        # 6. Load FCM token for delivery
+        # 6. Log eligible reminders (respect remaining cap), then push
         # -------------------------------------------------------------------------
-        fcm_token: str | None = None
-        try:
-            from sqlalchemy import select
-            from app.models.device import Device
+        # Logs are committed before anything is pushed: if the commit fails,
+        # nothing was sent and the next run retries; once it succeeds, the
+        # next run's dedup sees these reminders and never pushes them twice.
+        from app.services.push_service import PushService
 
-            token_result = await db.execute(
-                select(Device.fcm_token)
-                .where(Device.user_id == user_id, Device.fcm_token.isnot(None))
-                .limit(1)
-            )
-            row = token_result.first()
-            if row:
-                fcm_token = row[0]
+        reminders = eligible[:remaining_cap]
+        _stage_logs(user_id, reminders, db)
+        try:
+            await db.commit()
         except Exception:
             logger.debug(
-                "smart_reminder: could not load FCM token for user=%s",
+                "smart_reminder: could not persist notification logs for user=%s",
                 user_id,
                 exc_info=True,
             )
-
-        # -------------------------------------------------------------------------
-        # 7. Send eligible reminders (respect remaining cap)
-        # -------------------------------------------------------------------------
-        from app.services.push_service import PushService
-
-        push = PushService()
-
-        for reminder in eligible[:remaining_cap]:
+            await db.rollback()
+            return 0
+        fcm_token: str | None = None
+        if reminders and settings.smart_reminder_push_enabled:
             try:
-                # Send push notification
-                if fcm_token:
-                    push.send_notification(
-                        token=fcm_token,
-                        title=reminder["title"],
-                        body=reminder["body"],
-                        data={"type": "reminder", "reminder_type": reminder["type"]},
-                    )
-
-                # Persist NotificationLog (soft import)
-                try:
-                    import uuid as _uuid
-                    from app.models.notification_log import NotificationLog
-
-                    log = NotificationLog(
-                        id=str(_uuid.uuid4()),
-                        user_id=user_id,
-                        title=reminder["title"],
-                        body=reminder["body"],
-                        type="reminder",
-                        deep_link=None,
-                    )
-                    db.add(log)
-                    await db.commit()
-                    sent_count += 1
-                except Exception:
-                    logger.debug(
-                        "smart_reminder: could not persist notification log for user=%s",
-                        user_id,
-                        exc_info=True,
-                    )
-                    await db.rollback()
-                logger.info(
-                    "smart_reminder: sent reminder type=%s for user=%s",
-                    reminder["type"],
-                    user_id,
-                )
+                from sqlalchemy import select
+                from app.models.user_device import UserDevice
 
+                token_result = await db.execute(
+                    select(UserDevice.fcm_token)
+                    .where(UserDevice.user_id == user_id, UserDevice.fcm_token.isnot(None))
+                    .order_by(UserDevice.last_seen_at.desc().nulls_last())
+                    .limit(1)
+                )
+                row = token_result.first()
+                if row:
+                    fcm_token = row[0]
             except Exception:
-                logger.error(
-                    "smart_reminder: failed to send reminder for user=%s",
+                logger.debug(
+                    "smart_reminder: could not load FCM token for user=%s",
                     user_id,
                     exc_info=True,
                 )
+        _push(user_id, reminders, fcm_token, PushService())
+        return len(reminders)
+
+    async def evaluate_and_send_batch(
+        self,
+        user_ids: list[str],
+        db: AsyncSession,
+    ) -> dict[str, int]:
+        """Evaluate and send reminders for a chunk of users.
 
-        return sent_count
+        Applies the same rules as :meth:`evaluate_and_send`, but loads the
+        whole chunk's preferences, recent reminder logs, today's data,
+        and engagement streaks in four queries, plus one for FCM tokens when
+        ``smart_reminder_push_enabled`` is set. All notification logs are
+        written with one commit, before any reminder is pushed; if the commit
+        fails it raises and nothing is sent.
+
+        Args:
+            user_ids: Users to evaluate (typically one keyset page).
+            db: Async database session.
+
+        Returns:
+            ``{user_id: reminders_sent}`` for users that were sent at least one.
+        """
+        from sqlalchemy import select
+
+        from app.models.daily_metrics import DailyHealthMetrics
+        from app.models.notification_log import NotificationLog
+        from app.models.user_device import UserDevice
+        from app.models.user_preferences import UserPreferences
+        from app.models.user_streak import UserStreak
+        from app.services.push_service import PushService
+
+        now_utc = datetime.now(timezone.utc)
+        today_start = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
+        dedup_cutoff = now_utc - timedelta(hours=DEDUP_HOURS)
+        today_str = now_utc.strftime("%Y-%m-%d")
+
+        prefs_rows = await db.execute(select(UserPreferences).where(UserPreferences.user_id.in_(user_ids)))
+        prefs_by_user = {p.user_id: p for p in prefs_rows.scalars().all()}
+
+        # One read covers both the daily cap (today) and dedup (DEDUP_HOURS).
+        log_rows = await db.execute(
+            select(NotificationLog.user_id, NotificationLog.type, NotificationLog.sent_at).where(
+                NotificationLog.user_id.in_(user_ids),
+                NotificationLog.type == "reminder",
+                NotificationLog.sent_at >= min(today_start, dedup_cutoff),
+            )
+        )
+        today_sent: dict[str, int] = {}
+        recent_types: dict[str, set[str]] = {}
+        for uid, type_, sent_at in log_rows.fetchall():
+            if sent_at >= today_start:
+                today_sent[uid] = today_sent.get(uid, 0) + 1
+            if sent_at >= dedup_cutoff:
+                recent_types.setdefault(uid, set()).add(type_)
+
+        data_rows = await db.execute(
+            select(DailyHealthMetrics.user_id, DailyHealthMetrics.steps).where(
+                DailyHealthMetrics.user_id.in_(user_ids),
+                DailyHealthMetrics.date == today_str,
+            )
+        )
+        steps_by_user = {uid: steps for uid, steps in data_rows.fetchall()}
+
+        streak_rows = await db.execute(
+            select(UserStreak.user_id, UserStreak.current_count).where(
+                UserStreak.user_id.in_(user_ids),
+                UserStreak.streak_type == "engagement",
+            )
+        )
+        streak_by_user = {uid: count for uid, count in streak_rows.fetchall()}
+
+        staged: dict[str, list[dict]] = {}
+        for user_id in user_ids:
+            prefs = prefs_by_user.get(user_id)
+            daily_cap, quiet_start, quiet_end = _cap_and_quiet_hours(prefs)
+            if quiet_start and quiet_end and _in_quiet_hours(now_utc, quiet_start, quiet_end):
+                continue
+            remaining_cap = daily_cap - today_sent.get(user_id, 0)
+            if remaining_cap <= 0:
+                continue
+
+            candidates = _reminder_candidates(
+                now_utc,
+                user_id in steps_by_user,
+                steps_by_user.get(user_id),
+                streak_by_user.get(user_id) or 0,
+            )
+            eligible = [c for c in candidates if c["type"] not in recent_types.get(user_id, set())]
+            reminders = eligible[:remaining_cap]
+            if reminders:
+                _stage_logs(user_id, reminders, db)
+                staged[user_id] = reminders
+
+        await db.commit()
+
+        token_by_user: dict[str, str] = {}
+        if staged and settings.smart_reminder_push_enabled:
+            token_rows = await db.execute(
+                select(UserDevice.user_id, UserDevice.fcm_token)
+                .where(UserDevice.user_id.in_(list(staged)), UserDevice.fcm_token.isnot(None))
+                .order_by(UserDevice.last_seen_at.desc().nulls_last())
+            )
+            for uid, token in token_rows.fetchall():
+                token_by_user.setdefault(uid, token)
+
+        push = PushService()
+        for user_id, reminders in staged.items():
+            _push(user_id, reminders, token_by_user.get(user_id), push)
+        return {user_id: len(reminders) for user_id, reminders in staged.items()}
 
 
 # ---------------------------------------------------------------------------
@@ -363,6 +376,113 @@ class SmartReminderEngine:
 # ---------------------------------------------------------------------------
 
 
+def _cap_and_quiet_hours(prefs) -> tuple[int, tuple[int, int] | None, tuple[int, int] | None]:
+    """Return ``(daily_cap, quiet_start, quiet_end)`` from a preferences row (or None)."""
+    if prefs is None:
+        return MAX_DAILY_REMINDERS, None, None
+    # Use proactivity level to set the daily cap
+    proactivity_caps = {"low": 1, "medium": 2, "high": 3}
+    daily_cap = proactivity_caps.get(prefs.proactivity_level, MAX_DAILY_REMINDERS)
+    return daily_cap, _parse_hhmm(prefs.quiet_hours_start), _parse_hhmm(prefs.quiet_hours_end)
+
+
+def _reminder_candidates(
+    now_utc: datetime,
+    has_today_data: bool | None,
+    today_steps: int | None,
+    streak_days: int,
+) -> list[dict]:
+    """Build reminder candidates from a user's data for today.
+
+    Args:
+        now_utc: Current UTC time.
+        has_today_data: Whether a daily metrics row exists for today;
+            ``None`` if it could not be determined (no gap reminder).
+        today_steps: Today's step count, if known.
+        streak_days: Current engagement streak length.
+    """
+    candidates: list[dict] = []
+
+    # --- Gap reminder: no data logged today by noon ---
+    if now_utc.hour >= _GAP_NUDGE_HOUR and has_today_data is False:
+        candidates.append({
+            "type": "gap",
+            "title": "Check In With Zuralog",
+            "body": "No data logged today yet. Sync your health data to stay on track!",
+        })
+
+    # --- Goal proximity: within 10% of step goal ---
+    if today_steps is not None:
+        goal = _STEP_GOAL_DEFAULT
+        if goal * 0.9 <= today_steps < goal:
+            remaining = goal - today_steps
+            candidates.append({
+                "type": "goal",
+                "title": "Almost There!",
+                "body": (
+                    f"You're {remaining:,} steps away from your goal. "
+                    f"You've got this!"
+                ),
+            })
+
+    # --- Celebration: streak milestone ---
+    milestones = {7, 14, 30, 50, 100}
+    if streak_days in milestones:
+        candidates.append({
+            "type": "celebration",
+            "title": f"{streak_days}-Day Streak!",
+            "body": (
+                f"Amazing! You've been tracking for {streak_days} days straight. "
+                f"Keep it up!"
+            ),
+        })
+
+    return candidates
+
+
+def _stage_logs(user_id: str, reminders: list[dict], db: AsyncSession) -> None:
+    """Add a notification_logs row per reminder; the caller commits before pushing."""
+    import uuid as _uuid
+
+    from app.models.notification_log import NotificationLog
+
+    for reminder in reminders:
+        db.add(
+            NotificationLog(
+                id=str(_uuid.uuid4()),
+                user_id=user_id,
+                title=reminder["title"],
+                body=reminder["body"],
+                type="reminder",
+                deep_link=None,
+            )
+        )
+
+
+def _push(user_id: str, reminders: list[dict], fcm_token: str | None, push) -> None:
+    """Push already-logged ``reminders``; a failed push is logged, not retried."""
+    for reminder in reminders:
+        try:
+            if fcm_token:
+                push.send_notification(
+                    token=fcm_token,
+                    title=reminder["title"],
+                    body=reminder["body"],
+                    data={"type": "reminder", "reminder_type": reminder["type"]},
+                )
+            logger.info(
+                "smart_reminder: sent reminder type=%s for user=%s",
+                reminder["type"],
+                user_id,
+            )
+        except Exception:
+            logger.error(
+                "smart_reminder: failed to send reminder for user=%s",
+                user_id,
+                exc_info=True,
+            )
+
+
 def _parse_hhmm(time_str: str | None) -> tuple[int, int] | None:
     """Parse an HH:MM string into (hour, minute).
 
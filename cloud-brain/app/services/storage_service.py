@@ -6,9 +6,17 @@ signed URL generation, and deletion. Uses the service role key
 so clients never need direct storage access.
 
 All methods raise HTTPExceptions with appropriate status codes.
+
+Signed URLs are cached in-process keyed by ``{bucket}/{path}`` with their
+absolute expiry, and reused only while they still have (nearly) the
+validity the caller asked for. ``get_signed_urls`` signs many objects with
+a single call to the multi-path signing endpoint.
 """
 
 import logging
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterable
 
 import httpx
 from fastapi import HTTPException, status
@@ -17,6 +25,11 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# A cached signed URL is reused while it has at least the requested
+# validity minus this many seconds left (and never with less than this).
+_SIGNED_URL_REFRESH_MARGIN = 300
+_SIGNED_URL_CACHE_MAX = 10_000
+
 
 class StorageService:
     """Service for Supabase Storage REST API interactions.
@@ -40,6 +53,8 @@ class StorageService:
         self._client = client
         self._base_url = settings.supabase_url.strip().rstrip("/")
         self._service_key = settings.supabase_service_key.get_secret_value().strip()
+        # storage_path ('{bucket}/{path}') -> (signed_url, expires_at monotonic)
+        self._signed_url_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
 
         if not self._base_url:
             logger.warning(
@@ -84,20 +99,24 @@ class StorageService:
         self,
         bucket: str,
         path: str,
-        content: bytes,
+        content: bytes | AsyncIterable[bytes],
         content_type: str,
         upsert: bool = False,
+        content_length: int | None = None,
     ) -> str:
         """Uploads a file to Supabase Storage.
 
         Args:
             bucket: The storage bucket name (e.g., 'chat-attachments').
             path: Object path within the bucket (e.g., 'user-id/uuid/photo.jpg').
-            content: Raw file bytes.
+            content: Raw file bytes, or an async iterator of chunks for large
+                files (e.g. data exports) so they are never held in memory.
             content_type: MIME type of the file (e.g., 'image/jpeg').
             upsert: When True, overwrite an existing object at the same path
                 instead of failing with a conflict error. Sends the
                 ``x-upsert: true`` header to the Supabase Storage API.
+            content_length: Size of a streamed ``content``. Sent as
+                ``Content-Length``; without it the body is sent chunked.
 
         Returns:
             The storage path ('{bucket}/{path}') for later retrieval.
@@ -115,6 +134,10 @@ class StorageService:
         headers = self._headers(content_type=content_type)
         if upsert:
             headers["x-upsert"] = "true"
+        if isinstance(content, bytes):
+            content_length = len(content)
+        elif content_length is not None:
+            headers["Content-Length"] = str(content_length)
 
         try:
             response = await self._client.post(url, headers=headers, content=content)
@@ -139,7 +162,7 @@ class StorageService:
                 detail=f"Storage upload failed: {detail}",
             )
 
-        logger.info("Uploaded %s/%s (%d bytes)", bucket, path, len(content))
+        logger.info("Uploaded %s/%s (%s bytes)", bucket, path, content_length)
         return f"{bucket}/{path}"
 
     async def get_signed_url(self, bucket: str, path: str, expires_in: int = 3600) -> str:
@@ -156,6 +179,31 @@ class StorageService:
         Raises:
             HTTPException: 502 on failure, 503 if unconfigured.
         """
+        signed_url, _ = await self.get_signed_url_with_ttl(bucket, path, expires_in)
+        return signed_url
+
+    async def get_signed_url_with_ttl(self, bucket: str, path: str, expires_in: int = 3600) -> tuple[str, int]:
+        """Generates a signed URL and reports how long it remains valid.
+
+        A cached URL may be returned, in which case the remaining validity
+        is shorter than ``expires_in`` (by at most the refresh margin).
+
+        Args:
+            bucket: The storage bucket name.
+            path: Object path within the bucket.
+            expires_in: Requested URL validity in seconds (default 1 hour).
+
+        Returns:
+            ``(signed_url, remaining_seconds)``.
+
+        Raises:
+            HTTPException: 502 on failure, 503 if unconfigured.
+        """
+        cached = self._cached_signed_url(f"{bucket}/{path}", expires_in)
+        if cached is not None:
+            signed_url, expires_at = cached
+            return signed_url, int(expires_at - time.monotonic())
+
         if not self._base_url:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -188,7 +236,113 @@ class StorageService:
 
         data = response.json()
         signed_path = data.get("signedURL", "")
-        return f"{self._base_url}/storage/v1{signed_path}"
+        signed_url = f"{self._base_url}/storage/v1{signed_path}"
+        self._cache_signed_url(f"{bucket}/{path}", signed_url, expires_in)
+        return signed_url, expires_in
+
+    async def get_signed_urls(
+        self,
+        bucket: str,
+        paths: list[str],
+        expires_in: int = 3600,
+    ) -> dict[str, str]:
+        """Generates signed URLs for many objects in one request.
+
+        Paths with a still-fresh cached URL are served from the cache; the
+        rest are signed with a single call to the multi-path signing
+        endpoint (``POST /object/sign/{bucket}`` with ``paths``).
+
+        Args:
+            bucket: The storage bucket name.
+            paths: Object paths within the bucket.
+            expires_in: URL validity in seconds (default 1 hour).
+
+        Returns:
+            A mapping of object path to signed URL. Paths the storage API
+            could not sign (e.g. missing objects) are omitted.
+
+        Raises:
+            HTTPException: 502 on failure, 503 if unconfigured.
+        """
+        signed: dict[str, str] = {}
+        missing: list[str] = []
+        for path in dict.fromkeys(paths):
+            cached = self._cached_signed_url(f"{bucket}/{path}", expires_in)
+            if cached is not None:
+                signed[path] = cached[0]
+            else:
+                missing.append(path)
+        if not missing:
+            return signed
+
+        if not self._base_url:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Storage service unavailable: SUPABASE_URL not configured.",
+            )
+
+        url = self._storage_url(f"/object/sign/{bucket}")
+        headers = self._headers(content_type="application/json")
+
+        try:
+            response = await self._client.post(
+                url,
+                headers=headers,
+                json={"expiresIn": expires_in, "paths": missing},
+            )
+        except httpx.HTTPError as exc:
+            logger.error("Batch signed URL request failed: %s — %s", url, exc)
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Storage signed URL error: {type(exc).__name__}",
+            )
+
+        if response.status_code != 200:
+            detail = self._extract_error(response)
+            logger.error("Batch signed URL rejected (%d): %s", response.status_code, detail)
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Signed URL failed: {detail}",
+            )
+
+        for item in response.json():
+            path = item.get("path")
+            signed_path = item.get("signedURL")
+            if not path or not signed_path or item.get("error"):
+                logger.warning("Storage could not sign %s/%s: %s", bucket, path, item.get("error"))
+                continue
+            signed_url = f"{self._base_url}/storage/v1{signed_path}"
+            self._cache_signed_url(f"{bucket}/{path}", signed_url, expires_in)
+            signed[path] = signed_url
+        return signed
+
+    def _cached_signed_url(self, storage_path: str, expires_in: int) -> tuple[str, float] | None:
+        """Returns ``(signed_url, expires_at)`` if a cached URL covers ``expires_in``.
+
+        The entry must have at least ``expires_in`` minus the refresh margin
+        left, so a caller asking for a longer validity than the cached URL
+        was signed with gets a freshly signed one.
+        """
+        entry = self._signed_url_cache.get(storage_path)
+        if entry is None:
+            return None
+        remaining = entry[1] - time.monotonic()
+        if remaining < _SIGNED_URL_REFRESH_MARGIN:
+            del self._signed_url_cache[storage_path]
+            return None
+        if remaining < expires_in - _SIGNED_URL_REFRESH_MARGIN:
+            return None
+        self._signed_url_cache.move_to_end(storage_path)
+        return entry
+
+    def _cache_signed_url(self, storage_path: str, signed_url: str, expires_in: int) -> None:
+        """Caches a signed URL with its absolute expiry."""
+        if expires_in <= _SIGNED_URL_REFRESH_MARGIN:
+            return
+        self._signed_url_cache[storage_path] = (signed_url, time.monotonic() + expires_in)
+        self._signed_url_cache.move_to_end(storage_path)
+        if len(self._signed_url_cache) > _SIGNED_URL_CACHE_MAX:
+            self._signed_url_cache.popitem(last=False)
 
     async def download_file(self, bucket: str, path: str) -> bytes:
         """Downloads a file's raw bytes from Supabase Storage.
@@ -270,6 +424,9 @@ class StorageService:
             detail = self._extract_error(response)
             logger.warning("Storage delete rejected (%d): %s", response.status_code, detail)
 
+        for path in paths:
+            self._signed_url_cache.pop(f"{bucket}/{path}", None)
+
         logger.info("Deleted %d file(s) from %s", len(paths), bucket)
 
     @staticmethod
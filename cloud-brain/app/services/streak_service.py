@@ -1,5 +1,6 @@
 """Streak business logic service — single source of truth for freeze operations."""
 
+import redis.asyncio as aioredis
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.user_streak import UserStreak
@@ -7,7 +8,7 @@ from app.services.streak_tracker import StreakTracker
 
 
 async def apply_streak_freeze(
-    db: AsyncSession, user_id: str, streak_type: str
+    db: AsyncSession, user_id: str, streak_type: str, redis: aioredis.Redis | None = None
 ) -> dict:
     """Apply a streak freeze for the given user and streak type.
 
@@ -18,7 +19,8 @@ async def apply_streak_freeze(
     - freeze_used_this_week is False (weekly limit not reached)
 
     Raises ValueError with a code string on ineligibility.
-    Returns a success dict on success.
+    Returns a success dict on success. ``redis`` is the client for the
+    data-version bump (``request.app.state.redis`` on the API).
     """
     result = await db.execute(
         select(UserStreak).where(
@@ -41,7 +43,7 @@ async def apply_streak_freeze(
     tokens_before = streak.freeze_count
 
     tracker = StreakTracker()
-    await tracker.use_freeze(user_id=user_id, streak_type=streak_type, db=db)
+    await tracker.use_freeze(user_id=user_id, streak_type=streak_type, db=db, redis=redis)
     # use_freeze sets is_frozen=True, decrements freeze_count, and commits.
     # Do not re-query or re-commit — the session has already been committed.
 
@@ -19,18 +19,25 @@ Milestone celebrations are returned by ``record_activity()`` for:
 
 Classes:
     - StreakTracker: Stateless service for streak management.
+
+Functions:
+    - advance_streak: Pure fold of activity dates into streak counters.
 """
 
 import logging
 import uuid
+from collections.abc import Iterable, Mapping
 from datetime import date, timedelta
 from typing import Any
 
-from sqlalchemy import select, update
+import redis.asyncio as aioredis
+from sqlalchemy import case, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user_streak import UserStreak
+from app.services.data_version import SCOPE_GOALS, bump_data_version, bump_global_version
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +50,33 @@ _MILESTONE_DAYS = frozenset({7, 14, 30, 60, 90, 180, 365})
 _MAX_FREEZE_TOKENS = 2
 
 
+def advance_streak(
+    current_count: int,
+    longest_count: int,
+    last_activity_date: date | None,
+    dates: Iterable[date],
+) -> tuple[int, int, date | None]:
+    """Fold ascending activity dates into a streak's counters.
+
+    Applies the :meth:`StreakTracker.record_activity` rules date by date:
+    the next consecutive day increments the count, and a gap restarts it
+    at 1. Dates on or before ``last_activity_date`` are skipped.
+
+    Returns:
+        The new ``(current_count, longest_count, last_activity_date)``.
+    """
+    for day in dates:
+        if last_activity_date is not None and day <= last_activity_date:
+            continue
+        if last_activity_date is not None and (day - last_activity_date).days == 1:
+            current_count += 1
+        else:
+            current_count = 1
+        last_activity_date = day
+        longest_count = max(longest_count, current_count)
+    return current_count, longest_count, last_activity_date
+
+
 class StreakTracker:
     """Stateless service for streak management.
 
@@ -56,6 +90,7 @@ class StreakTracker:
         streak_type: str,
         activity_date: date,
         db: AsyncSession,
+        redis: aioredis.Redis | None = None,
     ) -> UserStreak:
         """Record activity for a given date and update the streak accordingly.
 
@@ -72,6 +107,9 @@ class StreakTracker:
                 ``checkin``.
             activity_date: The calendar date of the activity.
             db: Async database session.
+            redis: Client for the data-version bump, e.g.
+                ``request.app.state.redis``; ``None`` (Celery) opens a
+                short-lived one.
 
         Returns:
             The updated (or newly created) :class:`UserStreak` instance.
@@ -109,6 +147,7 @@ class StreakTracker:
                     )
                 )
                 streak = result.scalar_one()
+            await bump_data_version(user_id, SCOPE_GOALS, redis=redis)
 
             logger.info(
                 "record_activity: created streak '%s' for user '%s' on %s",
@@ -154,6 +193,7 @@ class StreakTracker:
             streak.longest_count = streak.current_count
 
         await db.commit()
+        await bump_data_version(user_id, SCOPE_GOALS, redis=redis)
         await db.refresh(streak)
 
         milestone = self._check_milestone(streak.current_count)
@@ -167,11 +207,102 @@ class StreakTracker:
 
         return streak
 
+    async def record_activity_batch(
+        self,
+        user_id: str,
+        dates_by_type: Mapping[str, Iterable[date]],
+        db: AsyncSession,
+        redis: aioredis.Redis | None = None,
+    ) -> dict[str, tuple[int, int, date | None]]:
+        """Apply many activity dates across several streak types in one write.
+
+        Equivalent to calling :meth:`record_activity` for every date in
+        ascending order, but reads all affected rows in a single
+        ``SELECT ... FOR UPDATE`` and writes them back with a single
+        ``INSERT ... ON CONFLICT`` upsert and one commit. Dates on or before
+        a row's ``last_activity_date`` are ignored: a late backfill cannot
+        rewind a streak that has already moved past it.
+
+        Args:
+            user_id: The authenticated user's ID.
+            dates_by_type: Activity dates keyed by streak type.
+            db: Async database session.
+            redis: Client for the data-version bump, e.g.
+                ``request.app.state.redis``; ``None`` (Celery) opens a
+                short-lived one.
+
+        Returns:
+            ``{streak_type: (current_count, longest_count, last_activity_date)}``
+            for every streak type whose row was created or changed.
+        """
+        wanted = {t: sorted(set(d)) for t, d in dates_by_type.items() if d}
+        if not wanted:
+            return {}
+
+        result = await db.execute(
+            select(UserStreak)
+            .where(UserStreak.user_id == user_id, UserStreak.streak_type.in_(wanted))
+            .with_for_update()
+        )
+        existing = {s.streak_type: s for s in result.scalars().all()}
+
+        updates: dict[str, tuple[int, int, date | None]] = {}
+        for streak_type, dates in wanted.items():
+            row = existing.get(streak_type)
+            state = (row.current_count, row.longest_count, row.last_activity_date) if row else (0, 0, None)
+            advanced = advance_streak(*state, dates)
+            if advanced != state:
+                updates[streak_type] = advanced
+
+        if not updates:
+            return {}
+
+        stmt = pg_insert(UserStreak).values(
+            [
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "streak_type": streak_type,
+                    "current_count": current,
+                    "longest_count": longest,
+                    "last_activity_date": last,
+                    "freeze_count": 0,
+                    "freeze_used_this_week": False,
+                    "is_frozen": False,
+                }
+                for streak_type, (current, longest, last) in updates.items()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_user_streak_user_type",
+            set_={
+                "current_count": stmt.excluded.current_count,
+                "longest_count": stmt.excluded.longest_count,
+                "last_activity_date": stmt.excluded.last_activity_date,
+                "is_frozen": False,
+            },
+        )
+        await db.execute(stmt)
+        await db.commit()
+        await bump_data_version(user_id, SCOPE_GOALS, redis=redis)
+
+        for streak_type, (current, _, last) in updates.items():
+            if self._check_milestone(current):
+                logger.info(
+                    "record_activity_batch: milestone %d days for user '%s' streak '%s' on %s",
+                    current,
+                    user_id,
+                    streak_type,
+                    last,
+                )
+        return updates
+
     async def use_freeze(
         self,
         user_id: str,
         streak_type: str,
         db: AsyncSession,
+        redis: aioredis.Redis | None = None,
     ) -> bool:
         """Consume a freeze token to keep a streak alive through a missed day.
 
@@ -187,6 +318,9 @@ class StreakTracker:
             user_id: The authenticated user's ID.
             streak_type: The streak type to apply the freeze to.
             db: Async database session.
+            redis: Client for the data-version bump, e.g.
+                ``request.app.state.redis``; ``None`` (Celery) opens a
+                short-lived one.
 
         Returns:
             ``True`` if the freeze was successfully applied, ``False`` if no
@@ -234,6 +368,7 @@ class StreakTracker:
             streak.last_activity_date = streak.last_activity_date + timedelta(days=1)
 
         await db.commit()
+        await bump_data_version(user_id, SCOPE_GOALS, redis=redis)
         await db.refresh(streak)
 
         logger.info(
@@ -244,34 +379,38 @@ class StreakTracker:
         )
         return True
 
-    async def reset_weekly_freeze_flags(self, db: AsyncSession) -> None:
+    async def reset_weekly_freeze_flags(self, db: AsyncSession) -> int:
         """Reset ``freeze_used_this_week`` to False for all users.
 
         Also awards a free freeze token (up to the cap of 2) to each streak
-        row. Called by Celery Beat every Monday.
+        row. Called by Celery Beat every Monday. Runs as a single UPDATE, so
+        no rows are loaded into Python.
 
         Args:
             db: Async database session.
-        """
-        # Two-step update because SQLAlchemy async doesn't support UPDATE with
-        # CASE expressions cleanly across all dialects via the ORM update() call.
-        # We fetch all rows and update in Python for correctness.
-        result = await db.execute(select(UserStreak))
-        streaks = result.scalars().all()
-
-        for streak in streaks:
-            streak.freeze_used_this_week = False
-            # Award 1 free token per week, capped at MAX_FREEZE_TOKENS.
-            if streak.freeze_count < _MAX_FREEZE_TOKENS:
-                streak.freeze_count = min(
-                    streak.freeze_count + 1, _MAX_FREEZE_TOKENS
-                )
 
+        Returns:
+            Number of streak rows updated.
+        """
+        result = await db.execute(
+            update(UserStreak)
+            .values(
+                freeze_used_this_week=False,
+                freeze_count=case(
+                    (UserStreak.freeze_count < _MAX_FREEZE_TOKENS, UserStreak.freeze_count + 1),
+                    else_=UserStreak.freeze_count,
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
         await db.commit()
+        # Every user's streaks changed: one global bump instead of one per user.
+        await bump_global_version(SCOPE_GOALS)
         logger.info(
             "reset_weekly_freeze_flags: reset %d streak rows",
-            len(streaks),
+            result.rowcount,
         )
+        return result.rowcount
 
     async def get_all_streaks(
         self,
@@ -23,6 +23,7 @@ import sentry_sdk
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.analytics.deduplication import supersede_duplicate_activities
 from app.models.health_data import ActivityType, UnifiedActivity
 from app.models.integration import Integration
 from app.worker import celery_app
@@ -188,6 +189,7 @@ class SyncService:
                     break
 
                 new_on_page = 0
+                page_starts: list[datetime] = []
                 for activity in activities:
                     original_id = str(activity["id"])
 
@@ -239,9 +241,12 @@ class SyncService:
                         start_time=start_time,
                     )
                     db.add(new_activity)
+                    page_starts.append(start_time)
                     synced_count += 1
                     new_on_page += 1
 
+                await supersede_duplicate_activities(db, user_id, page_starts)
+
                 # If we hit an overlap boundary, stop fetching more pages.
                 if new_on_page == -1:
                     break
@@ -393,6 +398,8 @@ def sync_strava_activity_task(
                 existing = del_result.scalar_one_or_none()
                 if existing:
                     await db.delete(existing)
+                    # Promote the next best duplicate of this workout, if any.
+                    await supersede_duplicate_activities(db, target.user_id, [existing.start_time])
                     await db.commit()
                     logger.info(
                         "Webhook: deleted activity %d for user '%s'",
@@ -443,7 +450,9 @@ def sync_strava_activity_task(
             upsert_result = await db.execute(upsert_stmt)
             existing = upsert_result.scalar_one_or_none()
 
+            touched_starts = [start_time]
             if existing:
+                touched_starts.append(existing.start_time)
                 existing.activity_type = activity_type
                 existing.duration_seconds = int(activity.get("elapsed_time") or 0)
                 existing.distance_meters = activity.get("distance")
@@ -464,6 +473,7 @@ def sync_strava_activity_task(
                 db.add(new_activity)
                 action = "created"
 
+            await supersede_duplicate_activities(db, target.user_id, touched_starts)
             await db.commit()
             logger.info(
                 "Webhook: %s activity %d for user '%s'",
@@ -0,0 +1,150 @@
+"""
+Zuralog Cloud Brain — Bulk Task Dispatch.
+
+Fan-out jobs used to publish one broker message per user with
+``.delay()``. Each call checks a producer out of the pool and does its own
+round trip to Redis. At 100k users that alone takes minutes.
+``dispatch_many`` instead publishes the calls as Celery ``group``s. A group
+reuses one producer and connection for every signature in it, so the
+per-message cost drops to one ``LPUSH``.
+
+Calls are published in chunks so that a slow or failing broker affects at
+most one chunk and the signature list never has to sit in memory all at
+once. The chunk size adapts to broker latency: after each chunk, the next
+one is sized so that publishing it takes about ``TARGET_CHUNK_SECONDS``
+at the per-message latency just measured. That gives large chunks on a
+fast local Redis and small ones on a congested broker. The size learned
+for a task carries over to the next dispatch in the same process.
+
+Published, failed and chunk timings are recorded in
+``app.services.telemetry``
+(``celery_tasks_published_total``, ``celery_publish_chunk_seconds`` and
+``celery_publish_chunk_size``). The publish rate is the rate of the
+counter.
+
+Dispatched tasks should be ``ignore_result`` (the default in
+``app.worker``), since a group of fire-and-forget tasks has nothing to
+join on.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import time
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import sentry_sdk
+from celery import group
+
+from app.services import telemetry
+
+logger = logging.getLogger(__name__)
+
+TARGET_CHUNK_SECONDS = 0.25
+MIN_CHUNK_SIZE = 50
+MAX_CHUNK_SIZE = 5_000
+INITIAL_CHUNK_SIZE = 500
+
+# Task name -> chunk size learned by the last dispatch in this process.
+_chunk_sizes: dict[str, int] = {}
+
+
+@dataclass
+class DispatchResult:
+    """Outcome of a ``dispatch_many`` call.
+
+    Attributes:
+        published: Messages handed to the broker.
+        failed: Messages in chunks whose publish raised.
+        chunks: Number of chunks attempted.
+        seconds: Wall time spent publishing.
+    """
+
+    published: int = 0
+    failed: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Messages published per second."""
+        return self.published / self.seconds if self.seconds > 0 else 0.0
+
+
+def next_chunk_size(current: int, sent: int, elapsed: float) -> int:
+    """Size the next chunk from the per-message latency of the last one.
+
+    Moves halfway towards the size that would take ``TARGET_CHUNK_SECONDS``
+    so that one noisy measurement does not swing the size, and clamps to
+    ``[MIN_CHUNK_SIZE, MAX_CHUNK_SIZE]``.
+
+    Args:
+        current: Size of the chunk just published.
+        sent: Messages in that chunk.
+        elapsed: Seconds it took to publish.
+
+    Returns:
+        The size to use for the next chunk.
+    """
+    if sent <= 0 or elapsed <= 0:
+        return min(current * 2, MAX_CHUNK_SIZE)
+    ideal = TARGET_CHUNK_SECONDS * sent / elapsed
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, int((current + ideal) / 2)))
+
+
+def dispatch_many(task: Any, calls: Iterable[Sequence[Any]], **options: Any) -> DispatchResult:
+    """Publish ``task`` once per argument tuple in ``calls``, in grouped chunks.
+
+    A chunk that fails to publish is logged, reported to Sentry and counted
+    as failed. The remaining chunks are still attempted, like a per-call
+    ``.delay()`` loop that catches errors.
+
+    Args:
+        task: The Celery task to call.
+        calls: Positional arguments for each call.
+        **options: Options passed to ``apply_async`` for every call
+            (e.g. ``countdown``).
+
+    Returns:
+        A :class:`DispatchResult` with counts and timing.
+    """
+    name = task.name
+    size = _chunk_sizes.get(name, INITIAL_CHUNK_SIZE)
+    result = DispatchResult()
+    pending = iter(calls)
+
+    while chunk := list(itertools.islice(pending, size)):
+        started = time.perf_counter()
+        try:
+            group(task.s(*args) for args in chunk).apply_async(**options)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("dispatch_many: failed to publish %d %s call(s): %s", len(chunk), name, exc)
+            sentry_sdk.capture_exception(exc)
+            result.failed += len(chunk)
+            telemetry.CELERY_TASKS_PUBLISHED.inc(name, "failed", amount=len(chunk))
+            continue
+        finally:
+            elapsed = time.perf_counter() - started
+            result.chunks += 1
+            result.seconds += elapsed
+
+        result.published += len(chunk)
+        telemetry.CELERY_TASKS_PUBLISHED.inc(name, "published", amount=len(chunk))
+        telemetry.CELERY_PUBLISH_CHUNK_DURATION.observe(elapsed, name)
+        telemetry.CELERY_PUBLISH_CHUNK_SIZE.set(len(chunk), name)
+        size = next_chunk_size(size, len(chunk), elapsed)
+
+    _chunk_sizes[name] = size
+    if result.chunks:
+        logger.info(
+            "dispatch_many: published %d %s call(s) in %d chunk(s), %.0f/s (%d failed)",
+            result.published,
+            name,
+            result.chunks,
+            result.rate,
+            result.failed,
+        )
+    return result
@@ -0,0 +1,245 @@
+"""
+Zuralog Cloud Brain — Celery Queues and Routing.
+
+Every task is routed to one of six named queues so that a burst of one kind
+of work cannot starve another. For example, a wave of 90-day backfills no
+longer delays the aggregation that refreshes a user's summaries after an
+ingest.
+
+==================  =========================================================
+Queue               Work
+==================  =========================================================
+``realtime``        Triggered by a user ingest: daily summary recompute,
+                    streaks, health score, anomaly and event checks.
+``webhook_sync``    Provider push notifications (Fitbit, Oura, Withings,
+                    Polar, Strava).
+``periodic_sync``   Beat jobs: periodic syncs, token refresh, webhook
+                    upkeep, stale summaries, maintenance, the insight fan-out;
+                    correlation matrix refreshes after a stale read.
+``backfill``        Connect-time history backfills, data exports, cache seeds.
+``llm``             Insight and report generation.
+``notifications``   Morning briefings and smart reminders.
+==================  =========================================================
+
+Within a queue, ``priority`` orders messages. The Redis transport keeps one
+list per priority level and 0 is served first. Per-task rate limits
+(``task_annotations``) cap the tasks that hit provider or LLM quotas. Celery
+enforces them per worker instance.
+
+Concurrency is set per queue by running separate worker deployments
+(profiles), each consuming a subset of queues:
+
+- ``railway.celery-worker.toml``: every queue plus Beat. This is the only
+  worker a single-service deployment needs.
+- ``railway.celery-worker-realtime.toml``: ``realtime`` and
+  ``webhook_sync`` only. This reserves capacity for user-facing work.
+- ``railway.celery-worker-bulk.toml``: ``backfill`` and ``llm`` only, so
+  long-running work scales separately from everything else.
+
+``LEGACY_QUEUE`` (Celery's default ``celery`` queue) is still consumed by the
+all-queues profile. That drains messages published before the split.
+
+Queue lag is measured two ways:
+
+- ``celery_queue_wait_seconds{queue}``: publish-to-start time, observed by
+  the worker from the ``sent_at`` header stamped at publish.
+- ``celery_queue_depth{queue}`` and ``celery_queue_oldest_age_seconds{queue}``:
+  read from Redis when ``/metrics`` is scraped (:func:`read_queue_lag`).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from kombu import Queue
+
+logger = logging.getLogger(__name__)
+
+REALTIME = "realtime"
+WEBHOOK_SYNC = "webhook_sync"
+PERIODIC_SYNC = "periodic_sync"
+BACKFILL = "backfill"
+LLM = "llm"
+NOTIFICATIONS = "notifications"
+
+QUEUES: tuple[str, ...] = (REALTIME, WEBHOOK_SYNC, PERIODIC_SYNC, BACKFILL, LLM, NOTIFICATIONS)
+LEGACY_QUEUE = "celery"
+
+# Redis priority lists: "<queue>" for 0 and "<queue>:<n>" for 1..9.
+PRIORITY_STEPS: list[int] = list(range(10))
+PRIORITY_SEP = ":"
+
+# Header stamped on every message at publish, read back to measure queue wait.
+SENT_AT_HEADER = "sent_at"
+
+
+@dataclass(frozen=True)
+class Route:
+    """Where a task is published and how it is throttled.
+
+    Attributes:
+        queue: Target queue name.
+        priority: 0 (served first) to 9 within the queue.
+        rate_limit: Celery rate limit string (e.g. ``"20/m"``), or None.
+    """
+
+    queue: str
+    priority: int = 5
+    rate_limit: str | None = None
+
+
+ROUTES: dict[str, Route] = {
+    # realtime — the user is looking at the app waiting for these.
+    "app.tasks.aggregation_tasks.recompute_daily_summaries_for_batch": Route(REALTIME, 0),
+    "app.tasks.streak_tasks.evaluate_streaks_for_ingest": Route(REALTIME, 3),
+    "app.tasks.health_score_tasks.recalculate_health_score": Route(REALTIME, 5),
+    "app.tasks.anomaly_tasks.check_anomalies_for_user": Route(REALTIME, 5),
+    "app.tasks.background_alerts.check_user_events": Route(REALTIME, 6),
+    # webhook_sync
+    "app.tasks.fitbit_sync.sync_fitbit_collection_task": Route(WEBHOOK_SYNC, 3),
+    "oura.sync_webhook": Route(WEBHOOK_SYNC, 3),
+    "withings.sync_notification": Route(WEBHOOK_SYNC, 3),
+    "polar.sync_webhook": Route(WEBHOOK_SYNC, 3),
+    "app.services.sync_scheduler.sync_strava_activity_task": Route(WEBHOOK_SYNC, 3),
+    # periodic_sync — token refresh first so syncs never run on lapsed tokens.
+    "app.services.sync_scheduler.refresh_tokens_task": Route(PERIODIC_SYNC, 0),
+    "app.tasks.fitbit_sync.refresh_fitbit_tokens_task": Route(PERIODIC_SYNC, 0),
+    "oura.refresh_tokens": Route(PERIODIC_SYNC, 0),
+    "withings.refresh_tokens": Route(PERIODIC_SYNC, 0),
+    "app.tasks.aggregation_tasks.recompute_stale_summaries": Route(PERIODIC_SYNC, 2),
+    "app.tasks.insight_tasks.fan_out_daily_insights": Route(PERIODIC_SYNC, 2),
+    "app.tasks.fitbit_sync.sync_fitbit_periodic_task": Route(PERIODIC_SYNC, 5),
+    "oura.sync_periodic": Route(PERIODIC_SYNC, 5),
+    "withings.sync_periodic": Route(PERIODIC_SYNC, 5),
+    "polar.sync_periodic": Route(PERIODIC_SYNC, 5),
+    "app.tasks.fitbit_sync.register_fitbit_webhook_task": Route(PERIODIC_SYNC, 5),
+    "withings.create_webhooks": Route(PERIODIC_SYNC, 5),
+    "polar.create_webhook": Route(PERIODIC_SYNC, 5),
+    # Not realtime: the insight cohort enqueues one per mature user with a stale matrix.
+    "app.tasks.correlation_tasks.refresh_correlation_matrix": Route(PERIODIC_SYNC, 6),
+    "oura.renew_webhooks": Route(PERIODIC_SYNC, 7),
+    "polar.check_webhook_status": Route(PERIODIC_SYNC, 7),
+    "polar.monitor_token_expiry": Route(PERIODIC_SYNC, 7),
+    "app.tasks.insight_tasks.check_stale_integrations_task": Route(PERIODIC_SYNC, 7),
+    "app.tasks.streak_tasks.reset_weekly_streak_freezes": Route(PERIODIC_SYNC, 7),
+    "app.tasks.nutrition_streak_task.evaluate_nutrition_streaks_daily": Route(PERIODIC_SYNC, 7),
+    "app.tasks.health_event_maintenance.maintain_health_events": Route(PERIODIC_SYNC, 9),
+    # backfill — an export the user asked for jumps ahead of history pulls.
+    "app.tasks.export_tasks.generate_user_export_task": Route(BACKFILL, 0),
+    "app.tasks.fitbit_sync.backfill_fitbit_data_task": Route(BACKFILL, 5, "20/m"),
+    "oura.backfill": Route(BACKFILL, 5, "20/m"),
+    "withings.backfill": Route(BACKFILL, 5, "20/m"),
+    "polar.backfill": Route(BACKFILL, 5, "20/m"),
+    "seed_food_cache": Route(BACKFILL, 9),
+    # llm — post-ingest refreshes ahead of the daily cohort batches.
+    "app.tasks.insight_tasks.generate_insights_for_user": Route(LLM, 3, "120/m"),
+    "app.tasks.insight_tasks.generate_insights_for_cohort": Route(LLM, 6),
+    "app.tasks.report.generate_weekly_reports_task": Route(LLM, 6),
+    "app.tasks.report.generate_monthly_reports_task": Route(LLM, 6),
+    # notifications
+    "app.tasks.morning_briefing_task.send_morning_briefings": Route(NOTIFICATIONS, 3),
+    "app.tasks.smart_reminder_tasks.send_smart_reminders": Route(NOTIFICATIONS, 5),
+}
+
+
+def configure_routing(app: Any, routes: dict[str, Route] = ROUTES) -> None:
+    """Declare the queues and apply routes, priorities and rate limits to ``app``.
+
+    Unrouted tasks go to ``periodic_sync``, which the all-queues profile
+    consumes.
+
+    Args:
+        app: The Celery application.
+        routes: Task name to :class:`Route` map.
+    """
+    app.conf.update(
+        task_queues=[Queue(name, routing_key=name) for name in (*QUEUES, LEGACY_QUEUE)],
+        task_default_queue=PERIODIC_SYNC,
+        task_default_priority=5,
+        task_routes={name: {"queue": r.queue, "priority": r.priority} for name, r in routes.items()},
+        task_annotations={name: {"rate_limit": r.rate_limit} for name, r in routes.items() if r.rate_limit},
+        broker_transport_options={
+            **(app.conf.broker_transport_options or {}),
+            "priority_steps": PRIORITY_STEPS,
+            "sep": PRIORITY_SEP,
+            "queue_order_strategy": "priority",
+        },
+    )
+
+
+def stamp_sent_at(headers: dict[str, Any] | None) -> None:
+    """Record the publish time on an outgoing message (``before_task_publish``)."""
+    if headers is not None:
+        headers.setdefault(SENT_AT_HEADER, time.time())
+
+
+def queue_wait(request: Any, now: float | None = None) -> tuple[str, float] | None:
+    """Return ``(queue, seconds waited)`` for a task about to run, if known.
+
+    Waiting starts at publish, or at the ETA for delayed tasks and retries.
+
+    Args:
+        request: The task's ``request`` context.
+        now: Current epoch time; defaults to ``time.time()``.
+
+    Returns:
+        The queue name and wait, or None if the message has no ``sent_at``.
+    """
+    sent_at = getattr(request, SENT_AT_HEADER, None)
+    if not isinstance(sent_at, (int, float)):
+        return None
+    ready = float(sent_at)
+    eta = getattr(request, "eta", None)
+    if eta:
+        try:
+            ready = max(ready, datetime.fromisoformat(str(eta)).timestamp())
+        except ValueError:
+            pass
+    queue = (getattr(request, "delivery_info", None) or {}).get("routing_key") or "unknown"
+    return queue, max(0.0, (now if now is not None else time.time()) - ready)
+
+
+def _priority_keys(queue: str) -> list[str]:
+    return [queue] + [f"{queue}{PRIORITY_SEP}{p}" for p in PRIORITY_STEPS[1:]]
+
+
+async def read_queue_lag(redis: Any, queues: tuple[str, ...] = QUEUES) -> dict[str, tuple[int, float]]:
+    """Read depth and oldest-message age of each queue from the broker.
+
+    Kombu pushes to the head of each priority list and pops from the tail, so
+    the tail is the oldest message of that priority.
+
+    Args:
+        redis: Async Redis client connected to the broker.
+        queues: Queue names to read.
+
+    Returns:
+        ``{queue: (depth, oldest_age_seconds)}``. The age is 0 for an empty
+        queue or when no message carries ``sent_at``.
+    """
+    now = time.time()
+    lag: dict[str, tuple[int, float]] = {}
+    for queue in queues:
+        keys = _priority_keys(queue)
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.llen(key)
+                pipe.lindex(key, -1)
+            replies = await pipe.execute()
+        depth, oldest = 0, now
+        for length, tail in zip(replies[::2], replies[1::2]):
+            depth += int(length or 0)
+            if tail:
+                try:
+                    sent_at = json.loads(tail).get("headers", {}).get(SENT_AT_HEADER)
+                except (ValueError, AttributeError):
+                    sent_at = None
+                if isinstance(sent_at, (int, float)):
+                    oldest = min(oldest, float(sent_at))
+        lag[queue] = (depth, max(0.0, now - oldest))
+    return lag
@@ -0,0 +1,505 @@
+"""
+Zuralog Cloud Brain — Process Telemetry.
+
+In-process counters, gauges and histograms, rendered in the Prometheus
+text exposition format by ``GET /metrics``.
+
+Recording is a dict lookup plus an integer add (histograms add a
+``bisect`` over the bucket bounds). There are no locks, no I/O and no
+allocation beyond the first observation of a label set, so the hooks can
+sit on the hot path: request dispatch, every SQL statement, every cache
+read.
+
+Every uvicorn worker and Celery process has its own registry. To give a
+single scrape target a complete view, each process periodically writes
+its cumulative snapshot to Redis under ``telemetry:proc:<role>:<host>:<pid>``
+with a TTL. ``/metrics`` merges all live snapshots, summing counters,
+gauges and histogram buckets. When a process exits, its snapshot expires
+and the merged counters drop, which Prometheus treats as a counter reset.
+
+Hooks live next to the code they measure:
+
+- ``RequestContextMiddleware``: route latency and DB queries per request.
+- ``instrument_engine``: statement latency and pool checkout gauges
+  (attached in ``app.database``); ``app.services.db_guard``: pool checkout
+  wait, timeouts and query budget overruns.
+- ``CacheService.get``: hits and misses.
+- ``LLMClient`` and ``MCPClient.execute_tool``: call latency by model/tool.
+- ``app.worker``: Celery task durations and queue wait via task signals.
+- ``app.services.task_dispatch``: bulk publish counts and chunk timings.
+- ``app.utils.fast_json`` and ``CompressionMiddleware``: JSON encode time
+  and response body size by encoding.
+- ``conditional_get`` (``app.api.deps``): ``If-None-Match`` outcomes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY_PREFIX = "telemetry:proc:"
+SNAPSHOT_TTL_SECONDS = 120
+PUBLISH_INTERVAL_SECONDS = 15.0
+
+LATENCY_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LLM_BUCKETS: tuple[float, ...] = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+TASK_BUCKETS: tuple[float, ...] = (0.05, 0.25, 1, 5, 15, 60, 300, 900, 3600)
+COUNT_BUCKETS: tuple[float, ...] = (0, 1, 2, 5, 10, 20, 50, 100)
+SERIALIZE_BUCKETS: tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+SIZE_BUCKETS: tuple[float, ...] = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], Any] = {}
+
+    def snapshot(self) -> list[list[Any]]:
+        # list() copies in one C call, so a concurrent first observation from
+        # another thread can't break the iteration.
+        return [[list(labels), value] for labels, value in list(self._values.items())]
+
+
+class Counter(_Metric):
+    """Monotonic counter. ``inc`` takes label values positionally."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        values = self._values
+        values[labels] = values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (summed across processes when merged)."""
+
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        values = self._values
+        values[labels] = values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram.
+
+    Each label set stores ``[count per bucket..., +Inf count, sum]``. Bucket
+    counts are not cumulative until rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        slots = self._values.get(labels)
+        if slots is None:
+            slots = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        slots[bisect_left(self.buckets, value)] += 1
+        slots[-1] += value
+
+
+class MetricsRegistry:
+    """Holds every metric defined by this process."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name!r} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def __iter__(self):
+        return iter(self._metrics.values())
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def snapshot(self) -> dict[str, list[list[Any]]]:
+        """Return ``{metric: [[labels, value], ...]}`` (JSON-serialisable)."""
+        return {metric.name: metric.snapshot() for metric in self._metrics.values() if metric._values}
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "Time until the last response byte, by route template.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed while serving one request.",
+    ("method", "route"),
+    buckets=COUNT_BUCKETS,
+)
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time.",
+    ("engine",),
+)
+DB_POOL_CHECKED_OUT = registry.gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    ("engine",),
+)
+DB_POOL_CAPACITY = registry.gauge(
+    "db_pool_capacity",
+    "pool_size + max_overflow (0 for unpooled engines).",
+    ("engine",),
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total",
+    "CacheService reads by key namespace and result (hit, miss, expired).",
+    ("namespace", "result"),
+)
+LLM_REQUEST_DURATION = registry.histogram(
+    "llm_request_duration_seconds",
+    "LLM completion latency (time to first chunk for streams).",
+    ("model", "call", "outcome"),
+    buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total",
+    "Tokens reported by the LLM provider.",
+    ("model", "kind"),
+)
+TOOL_CALL_DURATION = registry.histogram(
+    "mcp_tool_call_duration_seconds",
+    "MCP tool execution latency.",
+    ("tool", "outcome"),
+    buckets=LLM_BUCKETS,
+)
+TOOL_RESULTS_REDUCED = registry.counter(
+    "mcp_tool_results_reduced_total",
+    "Tool results shrunk to fit the token budget, by resolution (lttb, week, month, summary, too_large).",
+    ("tool", "resolution"),
+)
+TOOL_CACHE_REQUESTS = registry.counter(
+    "mcp_tool_cache_requests_total",
+    "Calls to cacheable MCP tools by result (hit, miss, bypass).",
+    ("tool", "result"),
+)
+LLM_CACHE_REQUESTS = registry.counter(
+    "llm_cache_requests_total",
+    "Cache-enabled LLM calls by call site and result (hit, miss, shared, bypass).",
+    ("call", "result"),
+)
+LLM_CACHE_SAVED_TOKENS = registry.counter(
+    "llm_cache_saved_tokens_total",
+    "Provider tokens not spent thanks to cache hits and shared in-flight calls.",
+    ("call", "kind"),
+)
+CLASSIFIER_DECISIONS = registry.counter(
+    "classifier_decisions_total",
+    "Message tier classifications by deciding path (fast_path, cache, local_model, llm, llm_fallback).",
+    ("path",),
+)
+CLASSIFIER_CACHE_ENTRIES = registry.gauge(
+    "classifier_cache_entries",
+    "Entries in the in-process message classification cache.",
+)
+INSIGHT_USERS_PROCESSED = registry.counter(
+    "insight_users_processed_total",
+    "Users run through the daily insight pipeline by mode (user, cohort) and status.",
+    ("mode", "status"),
+)
+CELERY_TASK_DURATION = registry.histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time by final state.",
+    ("task", "state"),
+    buckets=TASK_BUCKETS,
+)
+CELERY_QUEUE_WAIT = registry.histogram(
+    "celery_queue_wait_seconds",
+    "Time from publish (or ETA) until a worker starts the task, by queue.",
+    ("queue",),
+    buckets=TASK_BUCKETS,
+)
+CELERY_TASKS_PUBLISHED = registry.counter(
+    "celery_tasks_published_total",
+    "Task messages sent by bulk dispatch, by task and status (published, failed).",
+    ("task", "status"),
+)
+CELERY_PUBLISH_CHUNK_DURATION = registry.histogram(
+    "celery_publish_chunk_seconds",
+    "Time to publish one bulk dispatch chunk to the broker.",
+    ("task",),
+)
+CELERY_PUBLISH_CHUNK_SIZE = registry.gauge(
+    "celery_publish_chunk_size",
+    "Size of the last chunk published by bulk dispatch, as adapted to broker latency.",
+    ("task",),
+)
+
+DB_POOL_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection (includes opening overflow connections).",
+    ("engine",),
+)
+DB_POOL_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after pool_timeout.",
+    ("engine",),
+)
+QUERY_BUDGET_EXCEEDED = registry.counter(
+    "http_request_query_budget_exceeded_total",
+    "Requests that ran more SQL statements than their query budget.",
+    ("method", "route"),
+)
+
+RESPONSE_SERIALIZE_DURATION = registry.histogram(
+    "http_response_serialize_seconds",
+    "Time spent encoding a response body to JSON (fast_json responses only).",
+    ("route",),
+    buckets=SERIALIZE_BUCKETS,
+)
+RESPONSE_BODY_BYTES = registry.histogram(
+    "http_response_body_bytes",
+    "Response body size on the wire, by content encoding.",
+    ("route", "encoding"),
+    buckets=SIZE_BUCKETS,
+)
+CONDITIONAL_GETS = registry.counter(
+    "http_conditional_get_total",
+    "ETag-guarded reads by outcome (not_modified, modified, unavailable).",
+    ("route", "result"),
+)
+
+
+# ---------------------------------------------------------------------------
+# SQLAlchemy hooks
+# ---------------------------------------------------------------------------
+
+
+def instrument_engine(engine: Any, name: str) -> None:
+    """Attach statement timing and pool checkout hooks to ``engine``.
+
+    Args:
+        engine: An ``AsyncEngine`` or sync ``Engine``.
+        name: Label value for the ``engine`` label (e.g. ``"api"``).
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    pool = sync_engine.pool
+    size = getattr(pool, "size", None)
+    overflow = getattr(pool, "_max_overflow", 0)
+    DB_POOL_CAPACITY.set(size() + max(overflow, 0) if callable(size) else 0, name)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("telemetry_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        starts = conn.info.get("telemetry_query_start")
+        if starts:
+            DB_QUERY_DURATION.observe(time.perf_counter() - starts.pop(), name)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context) -> None:
+        conn = exception_context.connection
+        if conn is not None:
+            conn.info.pop("telemetry_query_start", None)
+
+    @event.listens_for(sync_engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        DB_POOL_CHECKED_OUT.inc(name)
+
+    @event.listens_for(sync_engine, "checkin")
+    def _checkin(dbapi_connection, connection_record) -> None:
+        DB_POOL_CHECKED_OUT.dec(name)
+
+
+# ---------------------------------------------------------------------------
+# Cross-process snapshots
+# ---------------------------------------------------------------------------
+
+
+def process_id(role: str) -> str:
+    return f"{role}:{socket.gethostname()}:{os.getpid()}"
+
+
+def snapshot_key(role: str) -> str:
+    return SNAPSHOT_KEY_PREFIX + process_id(role)
+
+
+def encode_snapshot() -> str:
+    return json.dumps(registry.snapshot(), separators=(",", ":"))
+
+
+async def publish_snapshot(redis: Any, role: str) -> None:
+    """Write this process's snapshot to Redis (best-effort)."""
+    try:
+        await redis.set(snapshot_key(role), encode_snapshot(), ex=SNAPSHOT_TTL_SECONDS)
+    except Exception:  # noqa: BLE001
+        logger.debug("telemetry: snapshot publish failed", exc_info=True)
+
+
+def publish_snapshot_sync(redis: Any, role: str) -> None:
+    """Synchronous ``publish_snapshot`` for Celery signal handlers."""
+    try:
+        redis.set(snapshot_key(role), encode_snapshot(), ex=SNAPSHOT_TTL_SECONDS)
+    except Exception:  # noqa: BLE001
+        logger.debug("telemetry: snapshot publish failed", exc_info=True)
+
+
+async def run_publisher(redis: Any, role: str, interval: float = PUBLISH_INTERVAL_SECONDS) -> None:
+    """Publish this process's snapshot every ``interval`` seconds until cancelled."""
+    while True:
+        await publish_snapshot(redis, role)
+        await asyncio.sleep(interval)
+
+
+_publisher_pid: int | None = None
+
+
+def ensure_publisher_thread(redis_url: str, role: str, interval: float = PUBLISH_INTERVAL_SECONDS) -> None:
+    """Start a daemon thread that publishes snapshots, once per process.
+
+    For Celery processes, which have no event loop of their own. The PID
+    check makes it safe to call from prefork children that inherited the
+    parent's module state.
+    """
+    global _publisher_pid
+    if _publisher_pid == os.getpid() or not redis_url:
+        return
+    _publisher_pid = os.getpid()
+
+    def _loop() -> None:
+        import redis as redis_sync
+
+        client = redis_sync.Redis.from_url(redis_url)
+        while True:
+            publish_snapshot_sync(client, role)
+            time.sleep(interval)
+
+    threading.Thread(target=_loop, name="telemetry-publisher", daemon=True).start()
+
+
+async def load_snapshots(redis: Any, role: str) -> list[dict[str, list[list[Any]]]]:
+    """Return all live process snapshots, with this process's replaced by its live values."""
+    own_key = snapshot_key(role)
+    snapshots = [registry.snapshot()]
+    if redis is None:
+        return snapshots
+    try:
+        keys = [key async for key in redis.scan_iter(match=SNAPSHOT_KEY_PREFIX + "*") if key != own_key]
+        if keys:
+            snapshots.extend(json.loads(raw) for raw in await redis.mget(keys) if raw)
+    except Exception:  # noqa: BLE001
+        logger.warning("telemetry: could not read process snapshots", exc_info=True)
+    return snapshots
+
+
+def merge_snapshots(snapshots: Iterable[dict[str, list[list[Any]]]]) -> dict[str, dict[tuple[str, ...], Any]]:
+    """Sum snapshots label set by label set (histogram slots element-wise)."""
+    merged: dict[str, dict[tuple[str, ...], Any]] = {}
+    for snapshot in snapshots:
+        for name, series in snapshot.items():
+            target = merged.setdefault(name, {})
+            for labels, value in series:
+                key = tuple(labels)
+                current = target.get(key)
+                if current is None:
+                    target[key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    if len(current) == len(value):
+                        target[key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target[key] = current + value
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# Exposition
+# ---------------------------------------------------------------------------
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def render_prometheus(merged: dict[str, dict[tuple[str, ...], Any]]) -> str:
+    """Render merged snapshots in the Prometheus text format (version 0.0.4)."""
+    lines: list[str] = []
+    for metric in registry:
+        series = merged.get(metric.name)
+        if not series:
+            continue
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, value in sorted(series.items()):
+            if isinstance(metric, Histogram):
+                cumulative = 0
+                for bound, count in zip((*metric.buckets, math.inf), value[:-1]):
+                    cumulative += count
+                    le = _labels(metric.labelnames, labels, f'le="{_num(float(bound))}"')
+                    lines.append(f"{metric.name}_bucket{le} {cumulative}")
+                lines.append(f"{metric.name}_sum{_labels(metric.labelnames, labels)} {_num(float(value[-1]))}")
+                lines.append(f"{metric.name}_count{_labels(metric.labelnames, labels)} {cumulative}")
+            else:
+                lines.append(f"{metric.name}{_labels(metric.labelnames, labels)} {_num(value)}")
+    return "\n".join(lines) + "\n"
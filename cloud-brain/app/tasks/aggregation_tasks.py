@@ -8,15 +8,16 @@ from sqlalchemy import select, text
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.database import worker_async_session
-from app.models.health_event import HealthEvent
 from app.models.metric_definition import MetricDefinition
 from app.models.daily_summary import DailySummary
 from app.services.aggregation_service import aggregate_events
+from app.services.data_version import bump_data_version
+from app.services.health_event_rollups import load_day_inputs
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task(name="app.tasks.aggregation_tasks.recompute_daily_summaries_for_batch")
+@shared_task(name="app.tasks.aggregation_tasks.recompute_daily_summaries_for_batch", ignore_result=False)
 def recompute_daily_summaries_for_batch(
     batch: list[dict],   # [{"user_id": str, "local_date": "YYYY-MM-DD", "metric_type": str}]
 ) -> dict:
@@ -27,6 +28,7 @@ def recompute_daily_summaries_for_batch(
 async def _recompute_batch(batch: list[dict]) -> dict:
     success = 0
     failures = []
+    changed_users: set[str] = set()
 
     async with worker_async_session() as db:
         for item in batch:
@@ -43,22 +45,10 @@ async def _recompute_batch(batch: list[dict]) -> dict:
                 if not md:
                     continue  # Unknown metric — skip aggregation
 
-                # Get all non-deleted events
-                events_result = await db.execute(
-                    select(HealthEvent.value, HealthEvent.recorded_at, HealthEvent.created_at)
-                    .where(
-                        HealthEvent.user_id == user_id,
-                        HealthEvent.local_date == local_date,
-                        HealthEvent.metric_type == metric_type,
-                        HealthEvent.deleted_at.is_(None),
-                    )
-                )
-                events = [
-                    {"value": r.value, "recorded_at": r.recorded_at, "created_at": r.created_at}
-                    for r in events_result.fetchall()
-                ]
+                # Get all non-deleted events plus hourly rollups of compacted samples
+                events, rollups = await load_day_inputs(db, user_id, local_date, metric_type)
 
-                result = aggregate_events(events, fn=md.aggregation_fn, unit=md.unit)
+                result = aggregate_events(events, fn=md.aggregation_fn, unit=md.unit, rollups=rollups)
                 if result is None:
                     await db.execute(
                         text("DELETE FROM daily_summaries WHERE user_id=:uid AND date=:d AND metric_type=:mt"),
@@ -79,6 +69,7 @@ async def _recompute_batch(batch: list[dict]) -> dict:
 
                 await db.commit()
                 success += 1
+                changed_users.add(user_id)
             except Exception as exc:
                 logger.exception("Aggregation failed for %s", item)
                 failures.append({"item": item, "error": str(exc)})
@@ -92,6 +83,7 @@ async def _recompute_batch(batch: list[dict]) -> dict:
                 except Exception:
                     pass
 
+    await bump_data_version(changed_users)
     return {"success": success, "failures": failures}
 
 
@@ -0,0 +1,51 @@
+"""
+Zuralog Cloud Brain — Correlation Matrix Celery Task.
+
+Persists a user's refreshed correlation matrix. Readers of the
+correlation store (the trends endpoints and the insight pipeline) never
+write on their own session; when they find the stored matrix out of date
+they enqueue this task, which recomputes it on a session of its own.
+"""
+
+import asyncio
+import logging
+from datetime import date
+from typing import Any
+
+import sentry_sdk
+from celery import shared_task
+
+from app.database import worker_async_session as async_session
+from app.services.correlation_store import refresh_correlation_matrix as refresh_matrix
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="app.tasks.correlation_tasks.refresh_correlation_matrix")
+def refresh_correlation_matrix(user_id: str, today: str) -> dict[str, Any]:
+    """Recompute and store the correlation matrix for one user.
+
+    Idempotent: when an earlier run already stored the current matrix this
+    costs the store's freshness query and nothing else.
+
+    Args:
+        user_id: The Zuralog user ID.
+        today: The requesting caller's local date (ISO format); the
+            matrix window ends on or after it.
+
+    Returns:
+        A dict with ``"status"``.
+    """
+
+    async def _run() -> dict[str, Any]:
+        async with async_session() as db:
+            try:
+                await refresh_matrix(db, user_id, date.fromisoformat(today))
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("refresh_correlation_matrix: failed for user '%s'", user_id)
+                sentry_sdk.capture_exception(exc)
+                await db.rollback()
+                return {"status": "error"}
+        return {"status": "ok"}
+
+    return asyncio.run(_run())
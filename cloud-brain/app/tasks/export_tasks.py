@@ -0,0 +1,85 @@
+"""
+Zuralog Cloud Brain — User Data Export Celery Task.
+
+``generate_user_export_task`` builds a user's zip export
+(:func:`app.services.data_export.stream_zip`) in a temporary file, uploads
+it to ``settings.export_bucket`` and marks the job ``ready`` in Redis. The
+API then hands out a signed URL. The archive is spooled to disk and
+uploaded in chunks, so worker memory stays at one page of rows however
+large the export is.
+
+Uses asyncio.run() for async DB access, matching the other Celery tasks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import tempfile
+from collections.abc import AsyncIterator
+from typing import IO
+
+import httpx
+import redis.asyncio as aioredis
+import sentry_sdk
+
+from app.config import settings
+from app.database import worker_async_session
+from app.services.data_export import export_object_path, save_export_job, stream_zip
+from app.services.storage_service import StorageService
+from app.worker import celery_app
+
+logger = logging.getLogger(__name__)
+
+_UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+async def _read_chunks(file: IO[bytes]) -> AsyncIterator[bytes]:
+    while chunk := file.read(_UPLOAD_CHUNK_BYTES):
+        yield chunk
+
+
+async def _generate(export_id: str, user_id: str) -> dict:
+    redis = aioredis.from_url(settings.redis_url, decode_responses=True)
+    try:
+        await save_export_job(redis, export_id, status="running")
+        try:
+            with tempfile.TemporaryFile() as spool:
+                async for chunk in stream_zip(worker_async_session, user_id):
+                    spool.write(chunk)
+                size = spool.tell()
+                spool.seek(0)
+                async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, write=300.0)) as client:
+                    await StorageService(client).upload_file(
+                        settings.export_bucket,
+                        export_object_path(user_id, export_id),
+                        _read_chunks(spool),
+                        "application/zip",
+                        upsert=True,
+                        content_length=size,
+                    )
+        except Exception as exc:
+            logger.exception("generate_user_export_task: export %s failed for user %s", export_id, user_id[:8])
+            sentry_sdk.capture_exception(exc)
+            await save_export_job(redis, export_id, status="failed", error=type(exc).__name__)
+            return {"export_id": export_id, "status": "failed"}
+        await save_export_job(redis, export_id, status="ready", size_bytes=str(size))
+    finally:
+        await redis.aclose()
+    logger.info("generate_user_export_task: export %s ready (%d bytes)", export_id, size)
+    return {"export_id": export_id, "status": "ready", "size_bytes": size}
+
+
+@celery_app.task(name="app.tasks.export_tasks.generate_user_export_task")
+def generate_user_export_task(export_id: str, user_id: str) -> dict:
+    """Build, store and publish one user's zip export.
+
+    Args:
+        export_id: Job ID created by ``POST /api/v1/user/export/jobs``.
+        user_id: The user whose data is exported.
+
+    Returns:
+        Dict with ``export_id``, ``status`` and, when ready, ``size_bytes``.
+    """
+    sentry_sdk.set_tag("task.type", "user_export")
+    return asyncio.run(_generate(export_id, user_id))
@@ -31,6 +31,7 @@ import sentry_sdk
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.analytics.deduplication import supersede_duplicate_activities
 from app.database import worker_async_session as async_session
 from app.models.health_data import (
     ActivityType,
@@ -40,6 +41,7 @@ from app.models.health_data import (
     WeightMeasurement,
 )
 from app.models.integration import Integration
+from app.services.data_version import bump_data_version
 from app.services.fitbit_token_service import FitbitTokenService
 from app.worker import celery_app
 
@@ -144,6 +146,7 @@ async def _sync_fitbit_activities(
     data = resp.json()
     activity_list: list[dict[str, Any]] = data.get("activities", [])
     upserted = 0
+    touched_starts: list[datetime] = []
 
     for activity in activity_list:
         original_id = str(activity.get("logId", ""))
@@ -174,6 +177,7 @@ async def _sync_fitbit_activities(
         existing = result.scalar_one_or_none()
 
         if existing:
+            touched_starts.append(existing.start_time)
             existing.activity_type = activity_type
             existing.duration_seconds = duration_seconds
             existing.distance_meters = activity.get("distance")
@@ -192,9 +196,11 @@ async def _sync_fitbit_activities(
             )
             db.add(new_activity)
 
+        touched_starts.append(start_time)
         upserted += 1
 
     if upserted:
+        await supersede_duplicate_activities(db, user_id, touched_starts)
         await db.commit()
         logger.info(
             "Fitbit activities: upserted %d rows for user '%s' date '%s'",
@@ -493,6 +499,9 @@ async def _sync_fitbit_user(
 
         # TODO: HR, SpO2, HRV fetch removed — no DB models yet. Re-add when HeartRateRecord/SpO2Record/HRVRecord exist.
 
+    if total_activities or total_sleep or total_weight or total_nutrition:
+        await bump_data_version(user_id)
+
     return {
         "activities": total_activities,
         "sleep": total_sleep,
@@ -596,6 +605,8 @@ def sync_fitbit_collection_task(
             target.last_synced_at = datetime.now(timezone.utc)
             target.sync_status = "idle"
             await db.commit()
+            if upserted:
+                await bump_data_version(target.user_id)
 
             logger.info(
                 "sync_fitbit_collection_task: synced %d row(s) for user '%s' collection='%s' date='%s'",
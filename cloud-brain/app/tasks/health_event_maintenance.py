@@ -0,0 +1,81 @@
+"""
+Zuralog Cloud Brain — health_events Maintenance Task.
+
+Nightly Celery Beat job that keeps the partitioned ``health_events`` table
+healthy:
+
+1. Create the current and upcoming monthly partitions.
+2. Compact raw device samples older than HEALTH_EVENTS_RAW_RETENTION_DAYS
+   into hourly rollups, tracked per monthly partition (bounded per run;
+   catches up over several nights). Disabled when 0, the default.
+3. Archive or drop raw partitions older than
+   HEALTH_EVENTS_ARCHIVE_AFTER_MONTHS (disabled when 0).
+
+Each step runs independently so a failure in one doesn't block the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+import sentry_sdk
+from celery import shared_task
+
+from app.config import settings
+from app.database import worker_async_session
+from app.services.health_event_partitions import ensure_partitions, expire_partitions, list_partitions
+from app.services.health_event_rollups import compact_expired_events
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="app.tasks.health_event_maintenance.maintain_health_events")
+def maintain_health_events() -> dict:
+    """Celery Beat entry point: partition upkeep, rollup compaction and expiry."""
+    return asyncio.run(_maintain())
+
+
+async def _maintain() -> dict:
+    today = datetime.now(tz=timezone.utc).date()
+    summary: dict = {}
+
+    async with worker_async_session() as db:
+        try:
+            summary["partitions_created"] = await ensure_partitions(
+                db, today, settings.health_events_partition_months_ahead
+            )
+        except Exception as exc:
+            logger.exception("health_events partition creation failed")
+            sentry_sdk.capture_exception(exc)
+            await db.rollback()
+
+        try:
+            partitions = await list_partitions(db)
+            summary["compaction"] = await compact_expired_events(
+                db,
+                today,
+                retention_days=settings.health_events_raw_retention_days,
+                max_days=settings.health_events_rollup_max_days_per_run,
+                months=[month for _, month in partitions],
+            )
+        except Exception as exc:
+            logger.exception("health_events rollup compaction failed")
+            sentry_sdk.capture_exception(exc)
+            await db.rollback()
+
+        try:
+            summary["partitions_expired"] = await expire_partitions(
+                db,
+                today,
+                retain_months=settings.health_events_archive_after_months,
+                mode=settings.health_events_archive_mode,
+            )
+        except Exception as exc:
+            logger.exception("health_events partition expiry failed")
+            sentry_sdk.capture_exception(exc)
+            await db.rollback()
+
+    logger.info("health_events maintenance: %s", summary)
+    return summary
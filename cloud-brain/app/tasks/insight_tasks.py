@@ -10,11 +10,20 @@ New pipeline (replaces the old rule-based generator):
 5. InsightCardWriter — single LLM call with 3-level fallback chain.
 6. Persist — bulk insert with generation_date + signal_type set.
 
-Also provides fan_out_daily_insights task for the hourly Celery Beat schedule.
+generate_insights_for_cohort runs the same pipeline for a chunk of users due
+at the same hour: one batched date-lock query, briefs from build_briefs
+(six set-based queries), category A/C statistics computed over columnar
+arrays for the whole chunk, card-writing LLM calls with bounded concurrency,
+and one multi-row insert for every card.
+
+Also provides fan_out_daily_insights task for the hourly Celery Beat schedule,
+which enqueues cohorts of INSIGHT_COHORT_SIZE users (or one task per user
+when it is 0) through dispatch_many, in grouped publishes.
 """
 
 import asyncio
 import logging
+import time
 import uuid
 from datetime import date, datetime, timezone
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
@@ -25,8 +34,9 @@ from sqlalchemy import and_, func, select
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.analytics.health_brief_builder import HealthBriefBuilder
-from app.analytics.insight_signal_detector import InsightSignalDetector
+from app.analytics.cohort_signals import detect_cohort_signals
+from app.analytics.health_brief_builder import HealthBrief, HealthBriefBuilder, build_briefs
+from app.analytics.insight_signal_detector import InsightSignal, InsightSignalDetector
 from app.analytics.insight_card_writer import InsightCardWriter
 from app.analytics.signal_prioritizer import SignalPrioritizer
 from app.analytics.user_focus_profile import UserFocusProfileBuilder
@@ -34,10 +44,17 @@ from app.constants import MIN_DATA_DAYS_FOR_MATURITY
 from app.database import worker_async_session as async_session
 from app.models.insight import Insight
 from app.models.user_preferences import UserPreferences
+from app.services.correlation_store import get_correlation_matrix
+from app.services.data_version import bump_data_version
+from app.services.task_dispatch import dispatch_many
+from app.services.telemetry import INSIGHT_USERS_PROCESSED
 from app.worker import celery_app
 
 logger = logging.getLogger(__name__)
 
+# Postgres accepts at most 32767 bind parameters per statement (10 per card row).
+_INSERT_CHUNK_ROWS = 2000
+
 
 @celery_app.task(name="app.tasks.insight_tasks.generate_insights_for_user")
 def generate_insights_for_user(user_id: str, user_timezone: str = "UTC") -> dict:
@@ -65,11 +82,7 @@ async def _run_pipeline_async(user_id: str, db: AsyncSession, user_timezone: str
     """Testable async implementation of the 6-step insight pipeline."""
 
     # ── Step 1: Date-lock ────────────────────────────────────────────────────
-    try:
-        tz = ZoneInfo(user_timezone)
-    except (ZoneInfoNotFoundError, Exception):
-        tz = ZoneInfo("UTC")
-    today = datetime.now(tz).date()
+    today = _local_today(user_timezone)
 
     # Date-lock: counts non-dismissed cards only.
     # This allows re-generation if the user has dismissed all their cards,
@@ -95,6 +108,7 @@ async def _run_pipeline_async(user_id: str, db: AsyncSession, user_timezone: str
             today.isoformat(),
             existing_count,
         )
+        INSIGHT_USERS_PROCESSED.inc("user", "skipped_date_lock")
         return {"user_id": user_id, "insights_written": 0, "status": "skipped_date_lock"}
 
     # ── Step 2: Fetch health data ────────────────────────────────────────────
@@ -102,58 +116,33 @@ async def _run_pipeline_async(user_id: str, db: AsyncSession, user_timezone: str
 
     # ── Welcome card for immature accounts ───────────────────────────────────
     if brief.data_maturity_days < MIN_DATA_DAYS_FOR_MATURITY:
-        days_remaining = max(0, MIN_DATA_DAYS_FOR_MATURITY - brief.data_maturity_days)
-        welcome_cards = [
-            {
-                "type": "welcome",
-                "title": "Building your health baseline",
-                "body": (
-                    f"Zuralog is learning your patterns. Keep syncing — "
-                    f"personalised insights unlock in about {days_remaining} more "
-                    f"day{'s' if days_remaining != 1 else ''}."
-                ),
-                "priority": 1,
-                "reasoning": None,
-                "signal_type": "first_week",
-                "data_payload": {
-                    "days_logged": brief.data_maturity_days,
-                    "days_until_mature": days_remaining,
-                },
-            }
-        ]
-        written = await _persist_cards(user_id, welcome_cards, today, db)
+        written = await _persist_cards(user_id, _welcome_cards(brief), today, db)
+        INSIGHT_USERS_PROCESSED.inc("user", "ok")
         return {"user_id": user_id, "insights_written": written, "status": "ok"}
 
     # ── Step 3: Detect signals ───────────────────────────────────────────────
-    raw_signals = InsightSignalDetector(brief).detect_all()
+    try:
+        correlations = (await get_correlation_matrix(db, user_id, today)).cells
+    except Exception:  # noqa: BLE001
+        logger.warning("insight pipeline: correlation store unavailable for user='%s'", user_id, exc_info=True)
+        correlations = None
+    raw_signals = InsightSignalDetector(brief, correlations=correlations).detect_all()
     logger.debug("insight pipeline: user='%s' raw_signals=%d", user_id, len(raw_signals))
 
     # ── Step 4: Prioritize ───────────────────────────────────────────────────
     prioritized = SignalPrioritizer(raw_signals).prioritize()
     if not prioritized:
         logger.info("insight pipeline: no signals for user='%s'", user_id)
+        INSIGHT_USERS_PROCESSED.inc("user", "ok_no_signals")
         return {"user_id": user_id, "insights_written": 0, "status": "ok_no_signals"}
 
     # ── Step 5: Write cards via LLM ──────────────────────────────────────────
-    focus = UserFocusProfileBuilder(
-        goals=brief.preferences.goals,
-        dashboard_layout=brief.preferences.dashboard_layout,
-        coach_persona=brief.preferences.coach_persona,
-        fitness_level=brief.preferences.fitness_level,
-        units_system=brief.preferences.units_system,
-    ).build()
-
-    llm_cards = await InsightCardWriter(
-        signals=prioritized,
-        focus=focus,
-        target_date=today.isoformat(),
-    ).write_cards()
-
-    enriched = _enrich_cards(llm_cards, prioritized)
+    enriched = await _write_cards(brief, prioritized, today)
 
     # ── Step 6: Persist ──────────────────────────────────────────────────────
     written = await _persist_cards(user_id, enriched, today, db)
     logger.info("insight pipeline: wrote %d card(s) for user='%s'", written, user_id)
+    INSIGHT_USERS_PROCESSED.inc("user", "ok")
     return {"user_id": user_id, "insights_written": written, "status": "ok"}
 
 
@@ -167,26 +156,80 @@ async def _persist_cards(
     if not cards:
         return 0
 
-    rows = [
+    rows = [_card_row(user_id, card, generation_date) for card in cards]
+    stmt = pg_insert(Insight).values(rows).on_conflict_do_nothing(constraint="uq_insights_user_signal_date")
+    result = await db.execute(stmt)
+    await db.commit()
+    written = result.rowcount if result.rowcount >= 0 else len(rows)
+    if written:
+        await bump_data_version(user_id)
+    return written
+
+
+def _card_row(user_id: str, card: dict, generation_date: date) -> dict:
+    """Map a written card onto an ``insights`` row."""
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "type": card.get("type", "welcome"),
+        "title": card.get("title", "Health insight")[:200],
+        "body": card.get("body", "")[:2000],
+        "data": card.get("data_payload", card.get("data", {})),
+        "reasoning": (lambda r: str(r)[:1000] if r else None)(card.get("reasoning")),
+        "priority": int(card.get("priority", 5)),
+        "generation_date": generation_date,
+        "signal_type": card.get("signal_type", card.get("type", "welcome")),
+    }
+
+
+def _local_today(user_timezone: str) -> date:
+    try:
+        tz = ZoneInfo(user_timezone)
+    except (ZoneInfoNotFoundError, Exception):
+        tz = ZoneInfo("UTC")
+    return datetime.now(tz).date()
+
+
+def _welcome_cards(brief: HealthBrief) -> list[dict]:
+    """Single onboarding card for accounts below MIN_DATA_DAYS_FOR_MATURITY."""
+    days_remaining = max(0, MIN_DATA_DAYS_FOR_MATURITY - brief.data_maturity_days)
+    return [
         {
-            "id": str(uuid.uuid4()),
-            "user_id": user_id,
-            "type": card.get("type", "welcome"),
-            "title": card.get("title", "Health insight")[:200],
-            "body": card.get("body", "")[:2000],
-            "data": card.get("data_payload", card.get("data", {})),
-            "reasoning": (lambda r: str(r)[:1000] if r else None)(card.get("reasoning")),
-            "priority": int(card.get("priority", 5)),
-            "generation_date": generation_date,
-            "signal_type": card.get("signal_type", card.get("type", "welcome")),
+            "type": "welcome",
+            "title": "Building your health baseline",
+            "body": (
+                f"Zuralog is learning your patterns. Keep syncing — "
+                f"personalised insights unlock in about {days_remaining} more "
+                f"day{'s' if days_remaining != 1 else ''}."
+            ),
+            "priority": 1,
+            "reasoning": None,
+            "signal_type": "first_week",
+            "data_payload": {
+                "days_logged": brief.data_maturity_days,
+                "days_until_mature": days_remaining,
+            },
         }
-        for card in cards
     ]
 
-    stmt = pg_insert(Insight).values(rows).on_conflict_do_nothing(constraint="uq_insights_user_signal_date")
-    result = await db.execute(stmt)
-    await db.commit()
-    return result.rowcount if result.rowcount >= 0 else len(rows)
+
+async def _write_cards(brief: HealthBrief, prioritized: list[InsightSignal], today: date) -> list[dict]:
+    """Write cards for the prioritized signals via the LLM and attach signal metadata."""
+    focus = UserFocusProfileBuilder(
+        goals=brief.preferences.goals,
+        dashboard_layout=brief.preferences.dashboard_layout,
+        coach_persona=brief.preferences.coach_persona,
+        fitness_level=brief.preferences.fitness_level,
+        units_system=brief.preferences.units_system,
+    ).build()
+
+    llm_cards = await InsightCardWriter(
+        signals=prioritized,
+        focus=focus,
+        target_date=today.isoformat(),
+    ).write_cards()
+
+    return _enrich_cards(llm_cards, prioritized)
 
 
 def _enrich_cards(llm_cards: list[dict], signals: list) -> list[dict]:
@@ -212,6 +255,164 @@ def _enrich_cards(llm_cards: list[dict], signals: list) -> list[dict]:
     return enriched
 
 
+# ── Cohort task ──────────────────────────────────────────────────────────────
+
+
+@celery_app.task(name="app.tasks.insight_tasks.generate_insights_for_cohort")
+def generate_insights_for_cohort(users: list[list[str]]) -> dict:
+    """Generate and persist daily insight cards for a cohort of users.
+
+    Same cards as running ``generate_insights_for_user`` for each user, with
+    set-based reads, columnar signal detection, concurrent LLM calls and a
+    single insert for the whole cohort.
+
+    Args:
+        users: ``[user_id, timezone]`` pairs (JSON-serialisable for Celery).
+
+    Returns:
+        Summary dict: users, insights_written, per-status counts and
+        users_per_minute.
+    """
+    logger.info("generate_insights_for_cohort: starting for %d user(s)", len(users))
+    return asyncio.run(_run_cohort_for_celery(users))
+
+
+async def _run_cohort_for_celery(users: list[list[str]]) -> dict:
+    return await _run_cohort_async(users)
+
+
+async def _run_cohort_async(users: list[list[str]], session_factory=async_session) -> dict:
+    """Testable async implementation of the cohort pipeline.
+
+    The reads run on a session that is closed before the LLM step, so its
+    connection is not held idle-in-transaction while cards are written; the
+    insert runs on a fresh session.
+    """
+    from app.config import settings
+
+    started = time.perf_counter()
+    today_by_user = {str(user_id): _local_today(tz or "UTC") for user_id, tz in users}
+    statuses: dict[str, str] = {}
+    cards_by_user: dict[str, list[dict]] = {}
+    to_write: list[tuple[HealthBrief, list[InsightSignal]]] = []
+
+    async with session_factory() as db:
+        # ── Step 1: Date-lock for the whole cohort ───────────────────────────
+        lock_stmt = (
+            select(Insight.user_id, Insight.generation_date)
+            .where(
+                Insight.user_id.in_(list(today_by_user)),
+                Insight.generation_date.in_(set(today_by_user.values())),
+                Insight.dismissed_at.is_(None),
+            )
+            .distinct()
+        )
+        for user_id, generation_date in (await db.execute(lock_stmt)).all():
+            if today_by_user.get(user_id) == generation_date:
+                statuses[user_id] = "skipped_date_lock"
+        pending = [uid for uid in today_by_user if uid not in statuses]
+
+        # ── Step 2: Fetch health data ────────────────────────────────────────
+        briefs = await build_briefs(db, pending)
+        mature: list[HealthBrief] = []
+        for uid, brief in briefs.items():
+            if brief.data_maturity_days < MIN_DATA_DAYS_FOR_MATURITY:
+                cards_by_user[uid] = _welcome_cards(brief)
+            else:
+                mature.append(brief)
+
+        # ── Steps 3-4: Detect signals and prioritize ─────────────────────────
+        precomputed = detect_cohort_signals(mature)
+        for brief in mature:
+            uid = brief.user_id
+            try:
+                correlations = (await get_correlation_matrix(db, uid, today_by_user[uid])).cells
+            except Exception:  # noqa: BLE001
+                logger.warning("insight cohort: correlation store unavailable for user='%s'", uid, exc_info=True)
+                correlations = None
+            raw_signals = InsightSignalDetector(
+                brief,
+                correlations=correlations,
+                trends=precomputed[uid].trends,
+                anomalies=precomputed[uid].anomalies,
+            ).detect_all()
+            prioritized = SignalPrioritizer(raw_signals).prioritize()
+            if prioritized:
+                to_write.append((brief, prioritized))
+            else:
+                statuses[uid] = "ok_no_signals"
+
+    # ── Step 5: Write cards via LLM, bounded concurrency ────────────────────
+    semaphore = asyncio.Semaphore(max(1, settings.insight_cohort_llm_concurrency))
+
+    async def _bounded(brief: HealthBrief, prioritized: list[InsightSignal]) -> None:
+        async with semaphore:
+            try:
+                cards_by_user[brief.user_id] = await _write_cards(brief, prioritized, today_by_user[brief.user_id])
+            except Exception:  # noqa: BLE001
+                logger.exception("insight cohort: card writing failed for user='%s'", brief.user_id)
+                statuses[brief.user_id] = "failed"
+
+    await asyncio.gather(*(_bounded(brief, prioritized) for brief, prioritized in to_write))
+
+    # ── Step 6: Persist every card in one insert ─────────────────────────────
+    async with session_factory() as db:
+        written = await _persist_cohort_cards(cards_by_user, today_by_user, db)
+    for uid in cards_by_user:
+        statuses.setdefault(uid, "ok")
+
+    counts: dict[str, int] = {}
+    for status in statuses.values():
+        counts[status] = counts.get(status, 0) + 1
+        INSIGHT_USERS_PROCESSED.inc("cohort", status)
+    elapsed = time.perf_counter() - started
+    users_per_minute = round(len(users) / elapsed * 60, 1) if elapsed > 0 else 0.0
+    logger.info(
+        "insight cohort: %d user(s) in %.1fs (%.1f users/min), %d card(s) written, statuses=%s",
+        len(users),
+        elapsed,
+        users_per_minute,
+        sum(written.values()),
+        counts,
+    )
+    return {
+        "users": len(users),
+        "insights_written": sum(written.values()),
+        "statuses": counts,
+        "users_per_minute": users_per_minute,
+    }
+
+
+async def _persist_cohort_cards(
+    cards_by_user: dict[str, list[dict]],
+    today_by_user: dict[str, date],
+    db: AsyncSession,
+) -> dict[str, int]:
+    """Insert every user's cards in one statement and bump their data versions.
+
+    Skips conflicts on (user_id, signal_type, generation_date) like
+    ``_persist_cards``. Returns the number of rows written per user.
+    """
+    rows = [_card_row(uid, card, today_by_user[uid]) for uid, cards in cards_by_user.items() for card in cards]
+    written: dict[str, int] = {}
+    if not rows:
+        return written
+
+    for start in range(0, len(rows), _INSERT_CHUNK_ROWS):
+        stmt = (
+            pg_insert(Insight)
+            .values(rows[start : start + _INSERT_CHUNK_ROWS])
+            .on_conflict_do_nothing(constraint="uq_insights_user_signal_date")
+            .returning(Insight.user_id)
+        )
+        for (uid,) in (await db.execute(stmt)).all():
+            written[uid] = written.get(uid, 0) + 1
+    await db.commit()
+    if written:
+        await bump_data_version(list(written))
+    return written
+
+
 # ── Fan-out task ─────────────────────────────────────────────────────────────
 
 
@@ -249,6 +450,8 @@ def fan_out_daily_insights() -> dict:
 
 
 async def _fan_out_async() -> dict:
+    from app.config import settings
+
     now_utc = datetime.now(timezone.utc)
     async with async_session() as db:
         # At 1M users: replace with cursor/keyset pagination to avoid loading all rows into memory.
@@ -261,7 +464,7 @@ async def _fan_out_async() -> dict:
         result = await db.execute(stmt)
         rows = result.all()
 
-    enqueued = 0
+    due: list[list[str]] = []
     for user_id, tz_str in rows:
         try:
             tz = ZoneInfo(tz_str or "UTC")
@@ -269,11 +472,18 @@ async def _fan_out_async() -> dict:
             tz = ZoneInfo("UTC")
 
         if now_utc.astimezone(tz).hour == 6:
-            generate_insights_for_user.delay(user_id, tz_str or "UTC")
-            enqueued += 1
-
-    logger.info("fan_out_daily_insights: enqueued %d tasks", enqueued)
-    return {"enqueued": enqueued}
+            due.append([user_id, tz_str or "UTC"])
+
+    cohort_size = settings.insight_cohort_size
+    if cohort_size <= 0:
+        dispatched = dispatch_many(generate_insights_for_user, due)
+    else:
+        cohorts = ((due[start : start + cohort_size],) for start in range(0, len(due), cohort_size))
+        dispatched = dispatch_many(generate_insights_for_cohort, cohorts)
+    tasks = dispatched.published
+
+    logger.info("fan_out_daily_insights: enqueued %d user(s) in %d task(s)", len(due), tasks)
+    return {"enqueued": len(due), "tasks": tasks, "failed": dispatched.failed}
 
 
 # ── Stale integration check (unchanged) ──────────────────────────────────────
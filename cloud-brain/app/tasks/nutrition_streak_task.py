@@ -41,6 +41,7 @@ from app.database import worker_async_session
 from app.models.nutrition_daily_summary import NutritionDailySummary
 from app.models.user_goal import UserGoal
 from app.models.user_streak import UserStreak
+from app.services.data_version import SCOPE_GOALS, bump_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -104,12 +105,14 @@ async def _run_daily_evaluation() -> dict:
     updated = 0
     skipped = 0
     errors = 0
+    updated_users: list[str] = []
     for user_id in user_ids:
         try:
             async with worker_async_session() as db:
                 streak = await evaluate_nutrition_streak_for_user(db, user_id, yesterday)
             if streak is not None:
                 updated += 1
+                updated_users.append(user_id)
             else:
                 skipped += 1
         except Exception:
@@ -118,6 +121,7 @@ async def _run_daily_evaluation() -> dict:
             )
             errors += 1
 
+    await bump_data_version(updated_users, SCOPE_GOALS)
     logger.info(
         "evaluate_nutrition_streaks_daily: done for %s — updated=%d skipped=%d errors=%d",
         yesterday,
@@ -36,9 +36,11 @@ import sentry_sdk
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.analytics.deduplication import supersede_duplicate_activities
 from app.database import worker_async_session as async_session
 from app.models.health_data import ActivityType, SleepRecord, UnifiedActivity
 from app.models.integration import Integration
+from app.services.data_version import bump_data_version
 from app.services.oura_token_service import OuraTokenService
 from app.worker import celery_app
 
@@ -208,6 +210,7 @@ async def _upsert_workouts(
         Number of rows upserted.
     """
     upserted = 0
+    touched_starts: list[datetime] = []
     for record in records:
         original_id = str(record.get("id", ""))
         if not original_id:
@@ -249,6 +252,7 @@ async def _upsert_workouts(
         existing = result.scalar_one_or_none()
 
         if existing:
+            touched_starts.append(existing.start_time)
             existing.activity_type = activity_type
             existing.duration_seconds = duration_seconds
             existing.distance_meters = distance_meters
@@ -267,9 +271,11 @@ async def _upsert_workouts(
             )
             db.add(new_activity)
 
+        touched_starts.append(start_time)
         upserted += 1
 
     if upserted:
+        await supersede_duplicate_activities(db, user_id, touched_starts)
         await db.commit()
         logger.info(
             "Oura workouts: upserted %d row(s) for user '%s'",
@@ -359,6 +365,9 @@ async def _sync_oura_user_dates(
                 exc,
             )
 
+    if total_sleep or total_workouts:
+        await bump_data_version(user_id)
+
     return {"sleep": total_sleep, "workouts": total_workouts}
 
 
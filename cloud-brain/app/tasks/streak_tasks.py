@@ -0,0 +1,57 @@
+"""
+Zuralog Cloud Brain — Streak Tasks.
+
+- ``evaluate_streaks_for_ingest``: evaluates activity streaks for a
+  finished ingest. Ingest routes enqueue it after their commit (via
+  ``schedule_ingest_streaks``), so a multi-day bulk sync returns without
+  doing any streak work on the request path.
+- ``reset_weekly_streak_freezes``: Monday Beat job that clears the weekly
+  freeze flag and awards the free freeze token, in a single UPDATE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date
+
+from celery import shared_task
+
+from app.database import worker_async_session
+from app.services.bulk_jobs import timed_job
+from app.services.ingest_post_processing import evaluate_ingest_streaks
+from app.services.streak_tracker import StreakTracker
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="app.tasks.streak_tasks.evaluate_streaks_for_ingest")
+def evaluate_streaks_for_ingest(
+    user_id: str,
+    metric_dates: list[list[str]],   # [[metric_type, "YYYY-MM-DD"], ...]
+) -> dict:
+    """Record streak activity for every (metric_type, date) an ingest touched."""
+    return asyncio.run(_evaluate(user_id, metric_dates))
+
+
+async def _evaluate(user_id: str, metric_dates: list[list[str]]) -> dict:
+    pairs = [(metric_type, date.fromisoformat(day)) for metric_type, day in metric_dates]
+    async with worker_async_session() as db:
+        updated = await evaluate_ingest_streaks(db, user_id, pairs)
+    return {
+        "user_id": user_id,
+        "updated": {t: {"current": c, "longest": lc, "last": str(d)} for t, (c, lc, d) in updated.items()},
+    }
+
+
+@shared_task(name="app.tasks.streak_tasks.reset_weekly_streak_freezes")
+def reset_weekly_streak_freezes() -> dict:
+    """Celery Beat entry point: weekly freeze flag reset and token award."""
+    return asyncio.run(_reset_weekly_freezes())
+
+
+async def _reset_weekly_freezes() -> dict:
+    async with timed_job("reset_weekly_streak_freezes") as progress:
+        async with worker_async_session() as db:
+            progress.add({"rows": await StreakTracker().reset_weekly_freeze_flags(db)})
+    return progress.to_dict()
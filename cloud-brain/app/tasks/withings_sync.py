@@ -37,6 +37,7 @@ from app.database import worker_async_session as async_session
 from app.models.blood_pressure import BloodPressureRecord
 from app.models.health_data import SleepRecord, WeightMeasurement
 from app.models.integration import Integration
+from app.services.data_version import bump_data_version
 from app.services.withings_signature_service import WithingsSignatureService
 from app.services.withings_token_service import WithingsTokenService
 from app.worker import celery_app
@@ -370,6 +371,7 @@ async def _sync_by_appli(
         measure_groups = body.get("measuregrps", [])
         if appli == 1:
             await _upsert_weight_measurements(db, user_id, measure_groups)
+            await bump_data_version(user_id)
         elif appli == 4:
             # Appli 4 contains both BP (types 9,10,11) and SpO2 (type 54).
             # Split groups by measurement type to avoid discarding SpO2 data.
@@ -377,6 +379,7 @@ async def _sync_by_appli(
             spo2_groups = [g for g in measure_groups if any(m.get("type") == 54 for m in g.get("measures", []))]
             if bp_groups:
                 await _upsert_blood_pressure(db, user_id, bp_groups)
+                await bump_data_version(user_id)
             if spo2_groups:
                 # TODO(withings): upsert SpO2 into DailyHealthMetrics once
                 # that model gains a spo2_avg column. For now, log so the
@@ -394,6 +397,7 @@ async def _sync_by_appli(
     elif action == "getsummary":
         summaries = body.get("series", [])
         await _upsert_sleep(db, user_id, summaries)
+        await bump_data_version(user_id)
 
 
 async def create_withings_webhook_subscriptions(
@@ -0,0 +1,73 @@
+"""
+Zuralog Cloud Brain — Fast JSON Responses.
+
+Large read endpoints (All-Data screens, chat history, export) return
+plain dicts and lists built straight from SQL row tuples. For those,
+FastAPI's default path would validate the payload against the route's
+``response_model`` and then encode it, which costs more than the query
+for a one-year range. ``fast_json`` encodes with ``orjson`` and returns
+the ``Response`` directly, so FastAPI skips both steps. Routes keep their
+``response_model`` for the OpenAPI schema. The dicts they build must
+match it, with every key present.
+
+``orjson`` natively encodes ``datetime``/``date`` (ISO 8601, as
+``isoformat()``), ``UUID``, dataclasses and numpy scalars. ``Decimal``
+becomes a float, as with ``jsonable_encoder``.
+"""
+
+from __future__ import annotations
+
+import time
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.services.telemetry import RESPONSE_SERIALIZE_DURATION
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any, *, indent: bool = False) -> bytes:
+    """Encode ``content`` to JSON bytes with orjson."""
+    option = _OPTIONS | orjson.OPT_INDENT_2 if indent else _OPTIONS
+    return orjson.dumps(content, default=_default, option=option)
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_json(
+    request: Request,
+    content: Any,
+    status_code: int = 200,
+    headers: dict[str, str] | None = None,
+) -> FastJSONResponse:
+    """Encode ``content`` and record the encode time under the route template.
+
+    Args:
+        request: The incoming request (for the route label).
+        content: JSON-compatible dicts/lists, matching the route's response model.
+        status_code: HTTP status code.
+        headers: Extra response headers.
+
+    Returns:
+        A rendered ``FastJSONResponse``.
+    """
+    started = time.perf_counter()
+    response = FastJSONResponse(content, status_code=status_code, headers=headers)
+    route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+    RESPONSE_SERIALIZE_DURATION.observe(time.perf_counter() - started, route)
+    return response
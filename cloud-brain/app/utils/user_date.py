@@ -1,20 +1,29 @@
 """Shared helper to resolve a user's local date from their timezone preference."""
 import zoneinfo
-from datetime import date, datetime, timezone
+from datetime import date, datetime
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-async def get_user_local_date(db: AsyncSession, user_id: str) -> date:
-    """Return the user's current local date based on their IANA timezone preference."""
+async def get_user_timezone(db: AsyncSession, user_id: str) -> str:
+    """Return the user's IANA timezone preference, or ``"UTC"`` when unset."""
     row = await db.execute(
         text("SELECT timezone FROM user_preferences WHERE user_id = :uid"),
         {"uid": user_id},
     )
-    iana_tz = row.scalar_one_or_none() or "UTC"
+    return row.scalar_one_or_none() or "UTC"
+
+
+def local_date_in(iana_tz: str) -> date:
+    """Return the current date in ``iana_tz``, falling back to UTC for unknown zones."""
     try:
         user_tz = zoneinfo.ZoneInfo(iana_tz)
     except Exception:
         user_tz = zoneinfo.ZoneInfo("UTC")
     return datetime.now(tz=user_tz).date()
+
+
+async def get_user_local_date(db: AsyncSession, user_id: str) -> date:
+    """Return the user's current local date based on their IANA timezone preference."""
+    return local_date_in(await get_user_timezone(db, user_id))
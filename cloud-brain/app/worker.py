@@ -3,14 +3,18 @@ Zuralog Cloud Brain — Celery Worker Configuration.
 
 Configures the Celery application for background task processing.
 Uses Redis as the message broker (already provisioned in docker-compose).
+Tasks are routed to named queues with priorities and rate limits; see
+:mod:`app.services.task_queues` for the routing table and worker profiles.
 
 Usage:
     celery -A app.worker worker --loglevel=info
+    celery -A app.worker worker -Q realtime,webhook_sync --concurrency=4 -n realtime@%h
     celery -A app.worker beat --loglevel=info
 """
 
 import logging
 import ssl
+import time
 
 from celery import Celery
 from celery.schedules import crontab
@@ -64,6 +68,39 @@ def _flush_posthog_on_shutdown(**kwargs):
             logger.warning("PostHog worker shutdown flush failed", exc_info=True)
 
 
+from celery.signals import before_task_publish, task_postrun, task_prerun  # noqa: E402
+
+from app.services import task_queues, telemetry  # noqa: E402
+
+# task_id -> perf_counter at task start, for celery_task_duration_seconds.
+_task_started: dict[str, float] = {}
+
+
+@before_task_publish.connect
+def _stamp_publish_time(headers=None, **kwargs):
+    """Stamp outgoing messages so the worker can measure how long they queued."""
+    task_queues.stamp_sent_at(headers)
+
+
+@task_prerun.connect
+def _record_task_start(task_id=None, task=None, **kwargs):
+    """Remember when a task started and how long it queued; also starts this process's telemetry publisher."""
+    telemetry.ensure_publisher_thread(_settings.redis_url, "worker")
+    if task_id is not None:
+        _task_started[task_id] = time.perf_counter()
+    waited = task_queues.queue_wait(task.request) if task is not None else None
+    if waited is not None:
+        telemetry.CELERY_QUEUE_WAIT.observe(waited[1], waited[0])
+
+
+@task_postrun.connect
+def _record_task_duration(task_id=None, task=None, state=None, **kwargs):
+    """Observe the task's run time, labelled by task name and final state."""
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        telemetry.CELERY_TASK_DURATION.observe(time.perf_counter() - started, task.name, state or "UNKNOWN")
+
+
 celery_app = Celery(
     "zuralog",
     broker=settings.redis_url,
@@ -73,7 +110,10 @@ celery_app = Celery(
         "app.tasks.anomaly_tasks",
         "app.tasks.nutrition_streak_task",
         "app.tasks.background_alerts",
+        "app.tasks.correlation_tasks",
+        "app.tasks.export_tasks",
         "app.tasks.fitbit_sync",
+        "app.tasks.health_event_maintenance",
         "app.tasks.health_score_tasks",
         "app.tasks.insight_tasks",
         "app.tasks.morning_briefing_task",
@@ -82,6 +122,7 @@ celery_app = Celery(
         "app.tasks.report_tasks",
         "app.tasks.seed_food_cache",
         "app.tasks.smart_reminder_tasks",
+        "app.tasks.streak_tasks",
         "app.tasks.withings_sync",
         "app.services.sync_scheduler",
     ],
@@ -96,11 +137,15 @@ celery_app.conf.update(
     task_track_started=False,  # was True — saves 1,350 Redis keys/day
     task_acks_late=True,
     worker_prefetch_multiplier=1,
+    # Nothing reads task results except GET /ingest/status/{task_id}, which
+    # polls recompute_daily_summaries_for_batch (ignore_result=False there).
+    task_ignore_result=True,
     result_expires=3600,  # results expire after 1 hour (saves Redis memory)
     task_reject_on_worker_lost=True,  # requeue if worker dies mid-task
     beat_scheduler="redbeat.RedBeatScheduler",
     redbeat_redis_url=settings.redis_url,
 )
+task_queues.configure_routing(celery_app)
 
 # When using TLS Redis (rediss://), ssl_cert_reqs must be set explicitly for Celery.
 # CERT_REQUIRED enforces full certificate verification against the system CA bundle.
@@ -187,6 +232,14 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.aggregation_tasks.recompute_stale_summaries",
         "schedule": 300.0,  # every 5 minutes
     },
+    "maintain-health-events-daily": {
+        "task": "app.tasks.health_event_maintenance.maintain_health_events",
+        "schedule": crontab(hour=2, minute=30),  # 02:30 UTC — off-peak partition upkeep + rollups
+    },
+    "reset-weekly-streak-freezes-monday": {
+        "task": "app.tasks.streak_tasks.reset_weekly_streak_freezes",
+        "schedule": crontab(hour=0, minute=5, day_of_week=1),  # Monday 00:05 UTC — weekly free freeze
+    },
     "evaluate-nutrition-streaks-daily": {
         "task": "app.tasks.nutrition_streak_task.evaluate_nutrition_streaks_daily",
         "schedule": crontab(hour=0, minute=15),  # 00:15 UTC — after nightly summary aggregation
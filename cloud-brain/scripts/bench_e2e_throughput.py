@@ -0,0 +1,560 @@
+"""
+bench_e2e_throughput.py — end-to-end throughput under concurrent virtual users
+==============================================================================
+Drives the real request paths against a local Postgres and Redis, with every
+external API replaced by ``scripts/upstream_stub.py``:
+
+  chat          ``/api/v1/chat/ws``: one websocket per virtual user, each
+                operation is one message through the orchestrator, from send
+                to ``stream_end``. ``--chat-tool`` scripts a tool call so the
+                tool loop (MCP tool, second LLM round) is on the path.
+  ingest_bulk   ``POST /api/v1/ingest/bulk`` with ``--bulk-events`` events.
+  health_ingest ``POST /api/v1/health/ingest`` with a week of daily metrics,
+                sleep and weight.
+  sync          The Fitbit, Oura, Polar and Withings backfill tasks and the
+                Strava webhook task, run in this process the way a Celery
+                worker runs them (each in its own ``asyncio.run``), with
+                provider requests routed to the stub.
+
+Scenarios run one after another with ``--users`` virtual users each doing
+``--ops`` operations back to back. For each scenario the report has
+throughput, p50/p95/p99/max latency, errors and SQL statements per
+operation:
+
+  - HTTP scenarios: ``http_request_db_queries`` for the route, from the API's
+    ``/metrics`` (needs ``METRICS_TOKEN``).
+  - chat: ``db_query_duration_seconds_count{engine="api"}``, which also counts
+    background work the turn triggers (title, summaries).
+  - sync: this process's own statement count.
+
+Run the API with one worker so ``/metrics`` counts are exact (other workers
+publish every 15 s). The report is JSON with sorted keys, so two runs can be
+diffed directly, or pass ``--baseline`` to print the change per scenario.
+Seeded users (``<uuid>@bench.zuralog.dev``) are reused across runs,
+and ingested data accumulates; reset the local database between runs that
+are compared.
+
+Usage
+-----
+  # From cloud-brain/ directory, with Postgres + Redis up and migrated:
+  uv run python scripts/bench_e2e_throughput.py --spawn --users 20 --ops 10 --out bench.json
+  uv run python scripts/bench_e2e_throughput.py --spawn --scenarios chat --llm-latency 1.5 \\
+      --baseline bench.json
+
+  # Against an API started separately (OPENROUTER_BASE_URL and SUPABASE_URL
+  # pointing at a running stub, METRICS_TOKEN set):
+  uv run python scripts/bench_e2e_throughput.py --api-url http://127.0.0.1:8001 \\
+      --stub-url http://127.0.0.1:8090 --metrics-token "$METRICS_TOKEN"
+
+Withings requests are signed, so set any ``WITHINGS_CLIENT_ID`` and
+``WITHINGS_CLIENT_SECRET`` for the sync scenario.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+import websockets
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scripts.upstream_stub import BENCH_TOKEN_PREFIX, UPSTREAM_HOSTS  # noqa: E402
+
+SCENARIOS = ("chat", "ingest_bulk", "health_ingest", "sync")
+SYNC_PROVIDERS = ("fitbit", "oura", "polar", "withings", "strava")
+_USER_NAMESPACE = uuid.UUID("5b0c2f7e-4a34-4c0e-9d2a-be7c40000000")
+_METRIC_LINE = re.compile(r"^([a-zA-Z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)$")
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+@dataclass
+class ScenarioResult:
+    """Latencies and counts for one scenario run."""
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    first_token: list[float] = field(default_factory=list)
+    duration: float = 0.0
+    db_queries: float | None = None
+
+    def report(self) -> dict[str, Any]:
+        ops = len(self.latencies) + self.errors
+        out: dict[str, Any] = {
+            "ops": ops,
+            "errors": self.errors,
+            "duration_s": round(self.duration, 3),
+            "throughput_ops_s": round(len(self.latencies) / self.duration, 2) if self.duration else 0.0,
+            "latency_ms": _percentiles(self.latencies),
+            "db_queries_per_op": round(self.db_queries / ops, 2) if self.db_queries is not None and ops else None,
+        }
+        if self.first_token:
+            out["first_token_ms"] = _percentiles(self.first_token)
+        return out
+
+
+def _percentiles(values: list[float]) -> dict[str, float | None]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 2)
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": round(ordered[-1] * 1000, 2)}
+
+
+def bench_user_ids(count: int) -> list[str]:
+    """Stable IDs so repeated runs reuse the same seeded users."""
+    return [str(uuid.uuid5(_USER_NAMESPACE, f"bench-user-{i}")) for i in range(count)]
+
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+
+async def seed_users(user_ids: list[str]) -> None:
+    """Insert bench users and one active integration per sync provider."""
+    from sqlalchemy.dialects.postgresql import insert
+
+    from app.database import worker_async_session
+    from app.models.integration import Integration
+    from app.models.user import User
+
+    expires = datetime.now(timezone.utc) + timedelta(days=30)
+    async with worker_async_session() as db:
+        await db.execute(
+            insert(User)
+            .values([{"id": uid, "email": f"{uid}@bench.zuralog.dev", "onboarding_complete": True} for uid in user_ids])
+            .on_conflict_do_nothing()
+        )
+        await db.execute(
+            insert(Integration)
+            .values(
+                [
+                    {
+                        "id": str(uuid.uuid5(_USER_NAMESPACE, f"{uid}:{provider}")),
+                        "user_id": uid,
+                        "provider": provider,
+                        "access_token": f"bench-{provider}-{i}",
+                        "refresh_token": f"bench-refresh-{provider}-{i}",
+                        "token_expires_at": expires,
+                        "provider_metadata": {"athlete_id": 900_000 + i} if provider == "strava" else {},
+                        "is_active": True,
+                    }
+                    for i, uid in enumerate(user_ids)
+                    for provider in SYNC_PROVIDERS
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+        await db.commit()
+
+
+class _UpstreamTransport(httpx.AsyncBaseTransport):
+    """Sends requests for known upstream hosts to the stub instead."""
+
+    def __init__(self, stub_url: httpx.URL, **kwargs: Any) -> None:
+        self._stub = stub_url
+        self._inner = httpx.AsyncHTTPTransport(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        prefix = UPSTREAM_HOSTS.get(request.url.host)
+        if prefix is not None:
+            request.url = request.url.copy_with(
+                scheme=self._stub.scheme,
+                host=self._stub.host,
+                port=self._stub.port,
+                path=prefix + request.url.path,
+            )
+        return await self._inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def route_upstreams_to(stub_url: str) -> None:
+    """Make every ``httpx.AsyncClient`` in this process use the stub for upstream hosts."""
+    original = httpx.AsyncClient.__init__
+    target = httpx.URL(stub_url)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("transport", _UpstreamTransport(target))
+        original(self, *args, **kwargs)
+
+    httpx.AsyncClient.__init__ = __init__
+
+
+class _Spawned:
+    """The stub and a single-worker API as subprocesses."""
+
+    def __init__(self, args: argparse.Namespace, user_ids: list[str]) -> None:
+        self._procs: list[subprocess.Popen] = []
+        self.args = args
+        self.env = {
+            **os.environ,
+            "OPENROUTER_BASE_URL": f"{args.stub_url}/openrouter/api/v1",
+            "OPENROUTER_API_KEY": os.environ.get("OPENROUTER_API_KEY") or "stub",
+            "SUPABASE_URL": f"{args.stub_url}/supabase",
+            "METRICS_TOKEN": args.metrics_token,
+            "RATE_LIMIT_BYPASS_USER_IDS": ",".join(user_ids),
+            "WEB_CONCURRENCY": "1",
+            # An over-budget request fails the scenario instead of only logging.
+            "DB_QUERY_BUDGET_MODE": os.environ.get("DB_QUERY_BUDGET_MODE", "raise"),
+        }
+
+    async def __aenter__(self) -> _Spawned:
+        stub_port = httpx.URL(self.args.stub_url).port
+        api_port = httpx.URL(self.args.api_url).port
+        self._procs.append(
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    str(ROOT / "scripts" / "upstream_stub.py"),
+                    f"--port={stub_port}",
+                    f"--llm-latency={self.args.llm_latency}",
+                    f"--token-interval={self.args.token_interval}",
+                    f"--provider-latency={self.args.provider_latency}",
+                ],
+                cwd=ROOT,
+            )
+        )
+        self._procs.append(
+            subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", f"--port={api_port}", "--log-level=warning"],
+                cwd=ROOT,
+                env=self.env,
+            )
+        )
+        async with httpx.AsyncClient() as client:
+            for url in (f"{self.args.stub_url}/supabase/auth/v1/user", f"{self.args.api_url}/health"):
+                await _wait_until_up(client, url)
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        for proc in reversed(self._procs):
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+async def _wait_until_up(client: httpx.AsyncClient, url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get(url)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+async def scrape(client: httpx.AsyncClient, api_url: str, token: str) -> dict[tuple[str, tuple], float] | None:
+    """Return ``{(metric, sorted labels): value}`` from ``/metrics``, or None."""
+    if not token:
+        return None
+    resp = await client.get(f"{api_url}/metrics", headers={"Authorization": f"Bearer {token}"})
+    if resp.status_code != 200:
+        return None
+    samples = {}
+    for line in resp.text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if match:
+            labels = tuple(sorted(_LABEL.findall(match.group(2) or "")))
+            samples[(match.group(1), labels)] = float(match.group(3))
+    return samples
+
+
+def _delta(before: dict | None, after: dict | None, name: str, **labels: str) -> float | None:
+    if before is None or after is None:
+        return None
+    wanted = set(labels.items())
+
+    def total(samples: dict) -> float:
+        return sum(v for (metric, lbls), v in samples.items() if metric == name and wanted <= set(lbls))
+
+    return total(after) - total(before)
+
+
+def _local_statements() -> float:
+    from app.services.telemetry import DB_QUERY_DURATION
+
+    return float(sum(sum(slots[:-1]) for slots in list(DB_QUERY_DURATION._values.values())))
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+
+async def _run_users(
+    user_ids: list[str],
+    ops: int,
+    operation: Callable[[int, str, int, ScenarioResult], Awaitable[None]],
+) -> ScenarioResult:
+    result = ScenarioResult()
+
+    async def virtual_user(index: int, user_id: str) -> None:
+        for n in range(ops):
+            started = time.perf_counter()
+            try:
+                await operation(index, user_id, n, result)
+            except Exception as exc:  # noqa: BLE001
+                result.errors += 1
+                if result.errors <= 3:
+                    print(f"  error: {type(exc).__name__}: {exc}", file=sys.stderr)
+            else:
+                result.latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(i, uid) for i, uid in enumerate(user_ids)))
+    result.duration = time.perf_counter() - started
+    return result
+
+
+def _auth(user_id: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {BENCH_TOKEN_PREFIX}{user_id}"}
+
+
+async def run_chat(args: argparse.Namespace, user_ids: list[str]) -> ScenarioResult:
+    ws_url = httpx.URL(args.api_url).copy_with(scheme="wss" if args.api_url.startswith("https") else "ws")
+    ws_url = str(ws_url.copy_with(path="/api/v1/chat/ws"))
+    sockets: dict[str, Any] = {}
+    message = "How did I sleep and train this week?"
+    if args.chat_tool:
+        message += f" [[tool:{args.chat_tool} {{}}]]"
+
+    async def operation(index: int, user_id: str, n: int, result: ScenarioResult) -> None:
+        ws = sockets.get(user_id)
+        if ws is None:
+            ws = sockets[user_id] = await websockets.connect(ws_url, max_size=None)
+            await ws.send(json.dumps({"type": "auth", "token": f"{BENCH_TOKEN_PREFIX}{user_id}"}))
+            while json.loads(await ws.recv()).get("type") != "conversation_init":
+                pass
+        sent = time.perf_counter()
+        await ws.send(json.dumps({"message": f"{message} (#{n})"}))
+        first = None
+        while True:
+            event = json.loads(await asyncio.wait_for(ws.recv(), timeout=args.timeout))
+            kind = event.get("type")
+            if kind == "stream_token" and first is None:
+                first = time.perf_counter() - sent
+            elif kind in ("error", "rate_limit"):
+                raise RuntimeError(f"{kind}: {event.get('content')}")
+            elif kind == "stream_end":
+                break
+        if first is not None:
+            result.first_token.append(first)
+
+    try:
+        return await _run_users(user_ids, args.ops, operation)
+    finally:
+        await asyncio.gather(*(ws.close() for ws in sockets.values()), return_exceptions=True)
+
+
+async def run_ingest_bulk(args: argparse.Namespace, user_ids: list[str], client: httpx.AsyncClient) -> ScenarioResult:
+    run_id = uuid.uuid4().hex[:8]
+    metrics = (("steps", "steps", 50.0), ("resting_heart_rate", "bpm", 58.0), ("hrv_ms", "ms", 45.0))
+
+    async def operation(index: int, user_id: str, n: int, result: ScenarioResult) -> None:
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        events = []
+        for i in range(args.bulk_events):
+            metric, unit, value = metrics[i % len(metrics)]
+            events.append(
+                {
+                    "metric_type": metric,
+                    "value": value + i % 7,
+                    "unit": unit,
+                    "recorded_at": (now - timedelta(minutes=i)).isoformat(),
+                    "idempotency_key": f"bench-{run_id}-{index}-{n}-{i}",
+                }
+            )
+        resp = await client.post(
+            f"{args.api_url}/api/v1/ingest/bulk",
+            json={"source": "apple_health", "events": events},
+            headers=_auth(user_id),
+        )
+        resp.raise_for_status()
+
+    return await _run_users(user_ids, args.ops, operation)
+
+
+async def run_health_ingest(args: argparse.Namespace, user_ids: list[str], client: httpx.AsyncClient) -> ScenarioResult:
+    async def operation(index: int, user_id: str, n: int, result: ScenarioResult) -> None:
+        days = [(date.today() - timedelta(days=d)).isoformat() for d in range(7)]
+        body = {
+            "source": "apple_health",
+            "daily_metrics": [
+                {"date": d, "steps": 7000 + 100 * n, "resting_heart_rate": 58.0, "hrv_ms": 44.0 + n % 5} for d in days
+            ],
+            "sleep": [{"date": d, "hours": 7.2, "quality_score": 80} for d in days],
+            "weight": [{"date": days[0], "weight_kg": 72.4}],
+        }
+        resp = await client.post(f"{args.api_url}/api/v1/health/ingest", json=body, headers=_auth(user_id))
+        resp.raise_for_status()
+
+    return await _run_users(user_ids, args.ops, operation)
+
+
+async def run_sync(args: argparse.Namespace, user_ids: list[str]) -> ScenarioResult:
+    from app.services.sync_scheduler import sync_strava_activity_task
+    from app.tasks.fitbit_sync import backfill_fitbit_data_task
+    from app.tasks.oura_sync import backfill_oura_data_task
+    from app.tasks.polar_sync import backfill_polar_data_task
+    from app.tasks.withings_sync import backfill_withings_data_task
+
+    route_upstreams_to(args.stub_url)
+    tasks: dict[str, Callable[[int, str, int], Any]] = {
+        "fitbit": lambda i, uid, n: backfill_fitbit_data_task(uid, args.sync_days),
+        "oura": lambda i, uid, n: backfill_oura_data_task(uid, args.sync_days),
+        "polar": lambda i, uid, n: backfill_polar_data_task(uid, args.sync_days),
+        "withings": lambda i, uid, n: backfill_withings_data_task(uid, args.sync_days),
+        "strava": lambda i, uid, n: sync_strava_activity_task(900_000 + i, 10_000_000 + i * 1000 + n, "create"),
+    }
+    providers = [p for p in args.sync_providers.split(",") if p]
+    executor = ThreadPoolExecutor(max_workers=len(user_ids))
+    loop = asyncio.get_running_loop()
+
+    async def operation(index: int, user_id: str, n: int, result: ScenarioResult) -> None:
+        run = tasks[providers[n % len(providers)]]
+        outcome = await loop.run_in_executor(executor, run, index, user_id, n)
+        status = str(outcome.get("status", "")) if isinstance(outcome, dict) else ""
+        if status in ("error", "no_integration", "no_token") or status.startswith("strava_error"):
+            raise RuntimeError(f"task returned {outcome}")
+
+    before = _local_statements()
+    try:
+        result = await _run_users(user_ids, args.ops, operation)
+    finally:
+        executor.shutdown(wait=False)
+    result.db_queries = _local_statements() - before
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    user_ids = bench_user_ids(args.users)
+    await seed_users(user_ids)
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    report: dict[str, Any] = {
+        "git_commit": subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            k: getattr(args, k) for k in ("users", "ops", "bulk_events", "chat_tool", "sync_days", "sync_providers")
+        }
+        | ({"llm_latency": args.llm_latency, "token_interval": args.token_interval} if args.spawn else {}),
+        "scenarios": {},
+    }
+    http_routes = {
+        "ingest_bulk": ("POST", "/api/v1/ingest/bulk"),
+        "health_ingest": ("POST", "/api/v1/health/ingest"),
+    }
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        for name in scenarios:
+            print(f"{name}: {args.users} users x {args.ops} ops", file=sys.stderr)
+            before = await scrape(client, args.api_url, args.metrics_token)
+            if name == "chat":
+                result = await run_chat(args, user_ids)
+            elif name == "ingest_bulk":
+                result = await run_ingest_bulk(args, user_ids, client)
+            elif name == "health_ingest":
+                result = await run_health_ingest(args, user_ids, client)
+            else:
+                result = await run_sync(args, user_ids)
+            after = await scrape(client, args.api_url, args.metrics_token)
+            if name in http_routes:
+                method, route = http_routes[name]
+                result.db_queries = _delta(before, after, "http_request_db_queries_sum", method=method, route=route)
+            elif name == "chat":
+                result.db_queries = _delta(before, after, "db_query_duration_seconds_count", engine="api")
+            report["scenarios"][name] = result.report()
+    return report
+
+
+def print_comparison(report: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """Print throughput, p95 and queries/op next to a previous report."""
+    base, head = baseline.get("git_commit", "base"), report["git_commit"]
+    print(f"\n{'scenario':<14}{'metric':<20}{base:>12}{head:>12}{'change':>10}")
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        rows = (
+            ("throughput_ops_s", previous["throughput_ops_s"], current["throughput_ops_s"]),
+            ("latency_p95_ms", previous["latency_ms"]["p95"], current["latency_ms"]["p95"]),
+            ("db_queries_per_op", previous["db_queries_per_op"], current["db_queries_per_op"]),
+        )
+        for metric, old, new in rows:
+            change = f"{(new - old) / old * 100:+.1f}%" if old and new is not None else "-"
+            old, new = ("-" if v is None else v for v in (old, new))
+            print(f"{name:<14}{metric:<20}{old:>12}{new:>12}{change:>10}")
+
+
+async def _main(args: argparse.Namespace) -> None:
+    if args.spawn:
+        async with _Spawned(args, bench_user_ids(args.users)):
+            report = await run(args)
+    else:
+        report = await run(args)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+    else:
+        print(text)
+    if args.baseline:
+        print_comparison(report, json.loads(Path(args.baseline).read_text()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma-separated subset of {SCENARIOS}")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--ops", type=int, default=10, help="operations per virtual user per scenario")
+    parser.add_argument("--api-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--stub-url", default="http://127.0.0.1:8090")
+    parser.add_argument("--metrics-token", default=os.environ.get("METRICS_TOKEN", ""))
+    parser.add_argument("--spawn", action="store_true", help="start the stub and a one-worker API as subprocesses")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="stub time to first token (with --spawn)")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="stub seconds per token (with --spawn)")
+    parser.add_argument("--provider-latency", type=float, default=0.05, help="stub provider latency (with --spawn)")
+    parser.add_argument("--chat-tool", default="get_goals", help="tool the stub LLM calls first ('' for none)")
+    parser.add_argument("--bulk-events", type=int, default=50, help="events per /ingest/bulk request")
+    parser.add_argument("--sync-days", type=int, default=7, help="days_back for the backfill tasks")
+    parser.add_argument("--sync-providers", default=",".join(SYNC_PROVIDERS))
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds per operation before it fails")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="previous JSON report to compare against")
+    args = parser.parse_args()
+    if args.spawn and not args.metrics_token:
+        args.metrics_token = uuid.uuid4().hex
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
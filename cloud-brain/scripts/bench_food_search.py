@@ -0,0 +1,112 @@
+"""
+bench_food_search.py — query latency of the in-memory food search index
+======================================================================
+Builds ``app.services.food_search_index.FoodSearchIndex`` over a synthetic
+catalog derived from the USDA seed foods (seed names recombined with
+brands, preparations and modifiers) and reports build time and query
+latency percentiles for a mix of full-word, typo and keystroke-prefix
+queries.
+
+Usage
+-----
+  # From cloud-brain/ directory:
+  uv run python scripts/bench_food_search.py
+  uv run python scripts/bench_food_search.py --sizes 10000 1000000 --queries 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.data.usda_seed_foods import SEED_FOODS  # noqa: E402
+from app.services.food_search_index import FoodSearchIndex, normalize_name  # noqa: E402
+
+_BRANDS = ["kirkland", "trader joes", "great value", "organic valley", "365", "chobani", "quaker", "kelloggs"]
+_PREPS = ["raw", "grilled", "baked", "fried", "steamed", "roasted", "boiled", "frozen", "canned", "dried"]
+_MODIFIERS = ["low fat", "unsalted", "whole", "light", "original", "spicy", "honey", "vanilla", "plain"]
+
+
+def _catalog(size: int, rng: random.Random) -> list[tuple[str, dict]]:
+    bases = [normalize_name(food["name"]) for food in SEED_FOODS]
+    rows = []
+    for i in range(size):
+        parts = [rng.choice(bases)]
+        if rng.random() < 0.6:
+            parts.insert(0, rng.choice(_BRANDS))
+        if rng.random() < 0.5:
+            parts.append(rng.choice(_PREPS))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(_MODIFIERS))
+        name = " ".join(parts)
+        rows.append((f"bench:{i}", {"id": str(i), "name": name}))
+    return rows
+
+
+def _queries(count: int, rng: random.Random) -> list[str]:
+    words = sorted({w for food in SEED_FOODS for w in normalize_name(food["name"]).split() if len(w) > 3})
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        word = rng.choice(words)
+        if kind < 0.4:  # keystroke prefix
+            queries.append(word[: rng.randint(2, len(word))])
+        elif kind < 0.7:  # two words
+            queries.append(f"{word} {rng.choice(words)}")
+        elif kind < 0.85:  # typo
+            i = rng.randrange(len(word))
+            queries.append(word[:i] + word[i + 1 :])
+        else:
+            queries.append(word)
+    return queries
+
+
+def _bench(size: int, n_queries: int, seed: int) -> None:
+    rng = random.Random(seed)
+    rows = _catalog(size, rng)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    index = FoodSearchIndex()
+    index.add_many(rows)
+    build_s = time.perf_counter() - started
+    rss_growth_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024  # KiB on Linux
+
+    queries = _queries(n_queries, rng)
+    for q in queries[:50]:  # warm-up
+        index.search(q)
+    latencies = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q)
+        latencies.append((time.perf_counter() - t0) * 1_000)
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    print(
+        f"entries={size:>9,}  build={build_s:6.1f}s  rss_growth={rss_growth_mb:7.1f}MB  "
+        f"p50={pct(0.50):.3f}ms  p95={pct(0.95):.3f}ms  p99={pct(0.99):.3f}ms  "
+        f"mean={statistics.fmean(latencies):.3f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    for size in args.sizes:
+        _bench(size, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+bench_health_events_partitioning.py — health_events partitioning benchmark
+==========================================================================
+Builds two copies of the health_events schema in a scratch schema: an
+unpartitioned table with the pre-partitioning indexes, and a monthly RANGE
+partitioned table with the current indexes. Both are loaded with the same
+synthetic samples, generated server-side with generate_series. The script
+reports:
+
+  - bulk load rate (rows/s) per table
+  - steady-state ingest rate for 10k-row device batches landing in the
+    current month
+  - EXPLAIN (ANALYZE, BUFFERS) timing, buffers touched and partitions
+    scanned for the timeline, recompute, export and compaction query
+    shapes
+
+Nothing outside the scratch schema is touched, and the schema is dropped
+at the end unless --keep is passed.
+
+Usage
+-----
+  # From cloud-brain/ directory (DATABASE_URL in .env or the environment):
+  uv run python scripts/bench_health_events_partitioning.py                  # 100M rows
+  uv run python scripts/bench_health_events_partitioning.py --rows 5000000 --users 2000
+
+Requirements
+------------
+  DATABASE_URL pointing at a Postgres 14+ instance with enough disk for
+  roughly 2 x 25 GB at 100M rows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+SCHEMA = "bench_health_events"
+_CHUNK_ROWS = 2_000_000
+_METRICS = ["heart_rate_avg", "steps", "active_calories", "hrv_ms", "spo2", "respiratory_rate", "distance"]
+
+_TABLE_COLUMNS = """
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    user_id TEXT NOT NULL,
+    metric_type TEXT NOT NULL,
+    value DOUBLE PRECISION NOT NULL,
+    unit TEXT NOT NULL,
+    source TEXT NOT NULL,
+    recorded_at TIMESTAMPTZ NOT NULL,
+    local_date DATE NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    deleted_at TIMESTAMPTZ,
+    granularity TEXT NOT NULL DEFAULT 'point_in_time',
+    session_id UUID,
+    idempotency_key TEXT
+"""
+
+
+def _dsn() -> str:
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        try:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            url = os.environ.get("DATABASE_URL")
+        except ImportError:
+            pass
+    if not url:
+        sys.exit("DATABASE_URL is not set")
+    return re.sub(r"^postgresql\+\w+://", "postgresql://", url)
+
+
+def _month_starts(first: date, last: date) -> list[date]:
+    months, cur = [], first.replace(day=1)
+    while cur <= last:
+        months.append(cur)
+        cur = (cur + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def _create_tables(cur, first: date, last: date) -> None:
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"CREATE TABLE {SCHEMA}.events_flat ({_TABLE_COLUMNS}, PRIMARY KEY (id))")
+    cur.execute(
+        f"CREATE TABLE {SCHEMA}.events_part ({_TABLE_COLUMNS}, PRIMARY KEY (id, local_date)) "
+        "PARTITION BY RANGE (local_date)"
+    )
+    for month in _month_starts(first, last + timedelta(days=31)):
+        nxt = (month + timedelta(days=32)).replace(day=1)
+        cur.execute(
+            f"CREATE TABLE {SCHEMA}.events_part_p{month:%Y_%m} PARTITION OF {SCHEMA}.events_part "
+            f"FOR VALUES FROM ('{month}') TO ('{nxt}')"
+        )
+    cur.execute(f"CREATE TABLE {SCHEMA}.events_part_default PARTITION OF {SCHEMA}.events_part DEFAULT")
+
+
+def _create_indexes(cur, table: str, partitioned: bool) -> None:
+    key = ", local_date" if partitioned else ""
+    cur.execute(
+        f"CREATE UNIQUE INDEX ON {SCHEMA}.{table} (user_id, source, metric_type, recorded_at{key}) "
+        "WHERE source != 'manual' AND granularity = 'point_in_time'"
+    )
+    cur.execute(
+        f"CREATE UNIQUE INDEX ON {SCHEMA}.{table} (user_id, idempotency_key{key}) WHERE idempotency_key IS NOT NULL"
+    )
+    cur.execute(
+        f"CREATE INDEX ON {SCHEMA}.{table} (user_id, metric_type, recorded_at DESC) WHERE deleted_at IS NULL"
+    )
+    cur.execute(f"CREATE INDEX ON {SCHEMA}.{table} (user_id, local_date DESC) WHERE deleted_at IS NULL")
+    if partitioned:
+        cur.execute(f"CREATE INDEX ON {SCHEMA}.{table} USING brin (local_date)")
+
+
+def _bulk_load(cur, table: str, rows: int, users: int, first: date, days: int) -> float:
+    """Generate ``rows`` samples spread evenly over ``days`` days and ``users`` users."""
+    metrics = "ARRAY[" + ",".join(f"'{m}'" for m in _METRICS) + "]"
+    started = time.perf_counter()
+    for offset in range(0, rows, _CHUNK_ROWS):
+        n = min(_CHUNK_ROWS, rows - offset)
+        # Sample i lands on day (i * days / rows) so every chunk covers a
+        # contiguous slice of time, as device syncs would.
+        cur.execute(
+            f"""
+            INSERT INTO {SCHEMA}.{table} (user_id, metric_type, value, unit, source, recorded_at, local_date)
+            SELECT
+                'user-' || (i % %(users)s),
+                ({metrics})[1 + (i / %(users)s) % {len(_METRICS)}],
+                random() * 200,
+                'u',
+                'apple_health',
+                ts,
+                (ts AT TIME ZONE 'UTC')::date
+            FROM (
+                SELECT i, %(first)s::timestamptz
+                    + make_interval(secs => (i::float8 / %(rows)s) * %(days)s * 86400) AS ts
+                FROM generate_series(%(lo)s::bigint, %(hi)s::bigint) AS i
+            ) g
+            """,
+            {"users": users, "first": first, "rows": rows, "days": days, "lo": offset, "hi": offset + n - 1},
+        )
+        print(f"  {table}: {offset + n:,}/{rows:,} rows", end="\r", flush=True)
+    print()
+    return rows / (time.perf_counter() - started)
+
+
+def _ingest_rate(cur, table: str, users: int, batches: int, batch_size: int) -> float:
+    """Device-sync shaped inserts into the newest day, with all indexes in place."""
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    for b in range(batches):
+        rows = [
+            (
+                f"user-{random.randrange(users)}",
+                random.choice(_METRICS),
+                random.random() * 200,
+                "u",
+                "bench_ingest",
+                now - timedelta(seconds=b * batch_size + i),
+                (now - timedelta(seconds=b * batch_size + i)).date(),
+                str(uuid.uuid4()),
+            )
+            for i in range(batch_size)
+        ]
+        execute_values(
+            cur,
+            f"INSERT INTO {SCHEMA}.{table} "
+            "(user_id, metric_type, value, unit, source, recorded_at, local_date, idempotency_key) VALUES %s",
+            rows,
+        )
+    return batches * batch_size / (time.perf_counter() - started)
+
+
+def _explain(cur, sql: str, params: dict) -> tuple[float, int, int]:
+    cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()[0][0]
+    root = plan["Plan"]
+    buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+
+    scanned: set[str] = set()
+
+    def walk(node: dict) -> None:
+        if "Relation Name" in node:
+            scanned.add(node["Relation Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(root)
+    return plan["Execution Time"], buffers, len(scanned)
+
+
+def _queries(first: date, days: int) -> dict[str, tuple[str, dict]]:
+    recent = first + timedelta(days=days - 3)
+    return {
+        "timeline (user, day)": (
+            "SELECT * FROM {t} WHERE user_id = %(u)s AND local_date = %(d)s AND deleted_at IS NULL "
+            "ORDER BY recorded_at DESC LIMIT 50",
+            {"u": "user-7", "d": recent},
+        ),
+        "recompute (user, day, metric)": (
+            "SELECT value, recorded_at, created_at FROM {t} WHERE user_id = %(u)s AND local_date = %(d)s "
+            "AND metric_type = 'steps' AND deleted_at IS NULL",
+            {"u": "user-7", "d": recent},
+        ),
+        "export (user, 90 days)": (
+            "SELECT count(*), sum(value) FROM {t} WHERE user_id = %(u)s "
+            "AND local_date BETWEEN %(s)s AND %(e)s AND deleted_at IS NULL",
+            {"u": "user-7", "s": recent - timedelta(days=90), "e": recent},
+        ),
+        "compaction scan (all users, day)": (
+            "SELECT user_id, metric_type, date_trunc('hour', recorded_at), count(*), sum(value) FROM {t} "
+            "WHERE local_date = %(d)s AND granularity = 'point_in_time' AND source != 'manual' "
+            "AND session_id IS NULL AND idempotency_key IS NULL AND deleted_at IS NULL GROUP BY 1, 2, 3",
+            {"d": first + timedelta(days=days // 4)},
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=730, help="history span in days")
+    parser.add_argument("--ingest-batches", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="leave the scratch schema in place")
+    args = parser.parse_args()
+
+    today = date.today()
+    first = today - timedelta(days=args.days)
+    conn = psycopg2.connect(_dsn())
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        _create_tables(cur, first, today)
+        results: dict[str, dict] = {}
+        for table, partitioned in (("events_flat", False), ("events_part", True)):
+            print(f"Loading {table} …")
+            load_rate = _bulk_load(cur, table, args.rows, args.users, first, args.days)
+            t0 = time.perf_counter()
+            _create_indexes(cur, table, partitioned)
+            index_s = time.perf_counter() - t0
+            cur.execute(f"VACUUM ANALYZE {SCHEMA}.{table}")
+            results[table] = {
+                "load_rate": load_rate,
+                "index_s": index_s,
+                "ingest_rate": _ingest_rate(cur, table, args.users, args.ingest_batches, 10_000),
+            }
+            for name, (sql, params) in _queries(first, args.days).items():
+                # Warm once, then measure.
+                _explain(cur, sql.format(t=f"{SCHEMA}.{table}"), params)
+                results[table][name] = _explain(cur, sql.format(t=f"{SCHEMA}.{table}"), params)
+
+        print(f"\nrows={args.rows:,} users={args.users:,} days={args.days}")
+        for table, res in results.items():
+            print(f"\n[{table}]")
+            print(f"  bulk load      {res['load_rate']:>12,.0f} rows/s   index build {res['index_s']:.0f}s")
+            print(f"  device ingest  {res['ingest_rate']:>12,.0f} rows/s   (10k-row batches)")
+            for name in _queries(first, args.days):
+                ms, buffers, relations = res[name]
+                print(f"  {name:<34} {ms:>9.2f} ms  buffers={buffers:<9,} relations={relations}")
+    finally:
+        if not args.keep:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+bench_insight_cohort.py — per-user vs cohort insight pipeline throughput
+========================================================================
+Runs the read and detection stages of the daily insight pipeline for the
+same users twice and reports users per minute for each path:
+
+  - per-user: what each ``generate_insights_for_user`` task does — a fresh
+    worker session, ``HealthBriefBuilder.build`` (ten queries), the full
+    ``InsightSignalDetector`` and the prioritizer, then one simulated
+    card-writing LLM call.
+  - cohort: what ``generate_insights_for_cohort`` does per chunk —
+    ``build_briefs`` (six set-based queries), columnar category A/C
+    detection, the rest of the detector and the prioritizer, then the
+    simulated LLM calls under an ``asyncio.Semaphore``.
+
+Both paths run in one process, so the figures are per worker slot; multiply
+by worker concurrency for fleet throughput. The LLM is simulated with a
+fixed sleep (``--llm-latency``) and correlations are skipped, so nothing is
+written: the script is read-only and safe against a production replica.
+It also checks that both paths produce the same prioritized signals.
+
+Usage
+-----
+  # From cloud-brain/ directory (DATABASE_URL in .env or the environment):
+  uv run python scripts/bench_insight_cohort.py
+  uv run python scripts/bench_insight_cohort.py --users 1000 --cohort-size 250 --llm-latency 2.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select  # noqa: E402
+
+from app.analytics.cohort_signals import detect_cohort_signals  # noqa: E402
+from app.analytics.health_brief_builder import HealthBriefBuilder, build_briefs  # noqa: E402
+from app.analytics.insight_signal_detector import InsightSignalDetector  # noqa: E402
+from app.analytics.signal_prioritizer import SignalPrioritizer  # noqa: E402
+from app.constants import MIN_DATA_DAYS_FOR_MATURITY  # noqa: E402
+from app.database import worker_async_session  # noqa: E402
+from app.models.user_preferences import UserPreferences  # noqa: E402
+
+
+def _fingerprint(signals: list) -> list[tuple]:
+    return [(s.signal_type, tuple(s.metrics), s.severity) for s in signals]
+
+
+async def _per_user(user_ids: list[str], llm_latency: float) -> dict[str, list[tuple]]:
+    out = {}
+    for user_id in user_ids:
+        async with worker_async_session() as db:
+            brief = await HealthBriefBuilder(user_id=user_id, db=db).build()
+        if brief.data_maturity_days < MIN_DATA_DAYS_FOR_MATURITY:
+            out[user_id] = []
+            continue
+        prioritized = SignalPrioritizer(InsightSignalDetector(brief).detect_all()).prioritize()
+        if prioritized:
+            await asyncio.sleep(llm_latency)
+        out[user_id] = _fingerprint(prioritized)
+    return out
+
+
+async def _cohorts(user_ids: list[str], size: int, llm_latency: float, concurrency: int) -> dict[str, list[tuple]]:
+    out = {}
+    for start in range(0, len(user_ids), size):
+        async with worker_async_session() as db:
+            briefs = await build_briefs(db, user_ids[start : start + size])
+        mature = [b for b in briefs.values() if b.data_maturity_days >= MIN_DATA_DAYS_FOR_MATURITY]
+        out.update({uid: [] for uid, b in briefs.items() if b not in mature})
+        precomputed = detect_cohort_signals(mature)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _write() -> None:
+            async with semaphore:
+                await asyncio.sleep(llm_latency)
+
+        writes = []
+        for brief in mature:
+            signals = InsightSignalDetector(
+                brief,
+                trends=precomputed[brief.user_id].trends,
+                anomalies=precomputed[brief.user_id].anomalies,
+            ).detect_all()
+            prioritized = SignalPrioritizer(signals).prioritize()
+            if prioritized:
+                writes.append(_write())
+            out[brief.user_id] = _fingerprint(prioritized)
+        await asyncio.gather(*writes)
+    return out
+
+
+async def _run(args: argparse.Namespace) -> None:
+    async with worker_async_session() as db:
+        rows = await db.execute(select(UserPreferences.user_id).order_by(UserPreferences.user_id).limit(args.users))
+        user_ids = [str(uid) for uid in rows.scalars().all()]
+    if not user_ids:
+        print("no users found in user_preferences")
+        return
+    print(f"users={len(user_ids)} cohort_size={args.cohort_size} llm_latency={args.llm_latency}s")
+
+    started = time.perf_counter()
+    single = await _per_user(user_ids, args.llm_latency)
+    per_user_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cohort = await _cohorts(user_ids, args.cohort_size, args.llm_latency, args.concurrency)
+    cohort_s = time.perf_counter() - started
+
+    per_user_rate = len(user_ids) / per_user_s * 60
+    cohort_rate = len(user_ids) / cohort_s * 60
+    print(f"per-user : {per_user_s:8.2f}s  {per_user_rate:10.1f} users/min")
+    print(f"cohort   : {cohort_s:8.2f}s  {cohort_rate:10.1f} users/min  ({cohort_rate / per_user_rate:.1f}x)")
+    mismatched = [uid for uid in user_ids if single.get(uid) != cohort.get(uid)]
+    print(f"signal mismatches: {len(mismatched)}" + (f" (e.g. {mismatched[:3]})" if mismatched else ""))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--cohort-size", type=int, default=250)
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent LLM calls per cohort")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated seconds per card-writing call")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
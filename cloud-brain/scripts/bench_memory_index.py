@@ -0,0 +1,98 @@
+"""
+bench_memory_index.py — recall and latency of the lexical memory index
+======================================================================
+Reports recall@k and top-1 accuracy of
+``app.agent.context_manager.memory_index.MemoryIndex`` on the labelled
+fixture set (``tests/agent/context_manager/fixtures/memory_retrieval.json``)
+at the prompt-injection threshold, then build time, search latency and
+near-duplicate lookup latency for synthetic users with many memories
+(facts recombined from the fixture).
+
+Usage
+-----
+  # From cloud-brain/ directory:
+  uv run python scripts/bench_memory_index.py
+  uv run python scripts/bench_memory_index.py --sizes 20 200 2000 --queries 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.agent.context_manager.memory_index import MemoryIndex  # noqa: E402
+from app.agent.context_manager.memory_store import MemoryItem  # noqa: E402
+from app.agent.turn_context import MEMORY_QUERY_LIMIT, MEMORY_SCORE_THRESHOLD  # noqa: E402
+
+_FIXTURE = Path(__file__).resolve().parent.parent / "tests/agent/context_manager/fixtures/memory_retrieval.json"
+
+
+def _recall(users: list[dict], k: int, threshold: float) -> tuple[float, float, float]:
+    found = relevant = returned = top = queries = 0
+    for user in users:
+        index = MemoryIndex([MemoryItem(m["id"], m["content"], m["category"]) for m in user["memories"]])
+        for query in user["queries"]:
+            ids = [item.id for item in index.search(query["text"], k) if item.score >= threshold]
+            found += len(set(ids) & set(query["relevant"]))
+            relevant += len(query["relevant"])
+            returned += len(ids)
+            top += bool(ids) and ids[0] in query["relevant"]
+            queries += 1
+    return found / relevant, found / max(returned, 1), top / queries
+
+
+def _percentiles(samples: list[float]) -> str:
+    q = statistics.quantiles(samples, n=100)
+    return f"p50={q[49]:7.1f}µs p95={q[94]:7.1f}µs p99={q[98]:7.1f}µs"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 200, 1000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    users = json.loads(_FIXTURE.read_text())["users"]
+    for k in (1, 3, MEMORY_QUERY_LIMIT):
+        recall, precision, top = _recall(users, k, MEMORY_SCORE_THRESHOLD)
+        print(
+            f"fixture k={k} threshold={MEMORY_SCORE_THRESHOLD}: "
+            f"recall={recall:.3f} precision={precision:.3f} top1={top:.3f}"
+        )
+
+    rng = random.Random(args.seed)
+    facts = [m["content"] for u in users for m in u["memories"]]
+    words = sorted({w for fact in facts for w in fact.split()})
+    messages = [q["text"] for u in users for q in u["queries"]]
+    for size in args.sizes:
+        items = [
+            MemoryItem(str(i), f"{rng.choice(facts)} {' '.join(rng.sample(words, 3))}", "context")
+            for i in range(size)
+        ]
+        started = time.perf_counter()
+        index = MemoryIndex(items)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        search, dedup = [], []
+        for _ in range(args.queries):
+            message = rng.choice(messages)
+            t0 = time.perf_counter()
+            index.search(message, MEMORY_QUERY_LIMIT)
+            t1 = time.perf_counter()
+            index.find_duplicate(rng.choice(facts))
+            t2 = time.perf_counter()
+            search.append((t1 - t0) * 1e6)
+            dedup.append((t2 - t1) * 1e6)
+        print(f"memories={size:>5} build={build_ms:7.2f}ms search {_percentiles(search)}  dedup {_percentiles(dedup)}")
+
+
+if __name__ == "__main__":
+    main()
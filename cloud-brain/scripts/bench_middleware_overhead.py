@@ -0,0 +1,141 @@
+"""
+bench_middleware_overhead.py — per-request middleware cost
+===========================================================
+Measures what the middleware stack adds to a request. A trivial JSON
+route is served three ways:
+
+  bare     no middleware
+  legacy   the former BaseHTTPMiddleware stack (security headers, Sentry
+           user context, PostHog capture with inline IP hashing),
+           reproduced here for comparison
+  asgi     app.middleware.request_context.RequestContextMiddleware
+
+Requests go through httpx's in-process ASGI transport, and are timed with
+time.perf_counter like tests/performance/test_endpoint_latency.py. No
+network or server is involved.
+
+Usage
+-----
+  # From cloud-brain/ directory:
+  uv run python scripts/bench_middleware_overhead.py
+  uv run python scripts/bench_middleware_overhead.py --requests 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import sentry_sdk
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.middleware.request_context import AnalyticsEventQueue, RequestContextMiddleware  # noqa: E402
+
+
+class _NullAnalytics:
+    enabled = True
+
+    def capture(self, **kwargs) -> None:
+        pass
+
+
+class _LegacySecurityHeaders(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains"
+        response.headers["X-XSS-Protection"] = "0"
+        return response
+
+
+class _LegacySentry(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        user_id = getattr(request.state, "user_id", None)
+        sentry_sdk.set_user({"id": user_id} if user_id else None)
+        return response
+
+
+class _LegacyPostHog(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        day_salt = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        ip_hash = hashlib.sha256(f"{request.client.host}:{day_salt}".encode()).hexdigest()[:12]
+        _NullAnalytics().capture(
+            distinct_id=f"anon_{ip_hash}",
+            event="api_request",
+            properties={
+                "method": request.method,
+                "path": request.url.path,
+                "status_code": response.status_code,
+                "duration_ms": duration_ms,
+                "user_agent": request.headers.get("user-agent", ""),
+                "$current_url": str(request.url.replace(query="")),
+            },
+        )
+        return response
+
+
+def _app(variant: str, events: AnalyticsEventQueue) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping(request: Request) -> dict:
+        request.state.user_id = "bench-user"
+        return {"ok": True}
+
+    if variant == "legacy":
+        app.add_middleware(_LegacySecurityHeaders)
+        app.add_middleware(_LegacySentry)
+        app.add_middleware(_LegacyPostHog)
+    elif variant == "asgi":
+        app.add_middleware(RequestContextMiddleware, events=events)
+    return app
+
+
+async def _measure(variant: str, n: int) -> list[float]:
+    events = AnalyticsEventQueue(maxsize=n + 1000)
+    events.start(_NullAnalytics())
+    transport = httpx.ASGITransport(app=_app(variant, events), client=("203.0.113.7", 5000))
+    samples: list[float] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(min(500, n)):  # warm-up
+            await client.get("/api/v1/ping")
+        for _ in range(n):
+            start = time.perf_counter()
+            await client.get("/api/v1/ping")
+            samples.append((time.perf_counter() - start) * 1_000_000)
+    await events.stop()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = {variant: asyncio.run(_measure(variant, args.requests)) for variant in ("bare", "legacy", "asgi")}
+    bare = statistics.median(results["bare"])
+    print(f"{'variant':<8} {'p50 µs':>9} {'p95 µs':>9} {'overhead p50 µs':>16}")
+    for variant, samples in results.items():
+        p50 = statistics.median(samples)
+        p95 = statistics.quantiles(samples, n=20)[-1]
+        print(f"{variant:<8} {p50:>9.1f} {p95:>9.1f} {p50 - bare:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
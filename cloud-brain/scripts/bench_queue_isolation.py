@@ -0,0 +1,232 @@
+"""
+bench_queue_isolation.py — aggregation latency during a backfill storm
+=======================================================================
+Checks that a flood of backfill tasks does not delay the ``realtime``
+aggregation task that a user ingest triggers. Runs two layouts with the
+same total worker capacity:
+
+  shared    Every task in one queue, consumed by one worker. This is the
+            layout before queues were split.
+  isolated  The routing from ``app.services.task_queues``: aggregation goes
+            to ``realtime`` and backfills go to ``backfill``, each consumed
+            by its own worker (the realtime and bulk profiles).
+
+Each layout is measured twice: probe aggregations alone (``idle``), then the
+same probes published right after ``--backfills`` backfill tasks
+(``storm``). Latency is publish-to-start, the wait the user sees before
+their summaries begin to recompute. Task bodies only sleep, so the numbers
+isolate queueing from database work.
+
+The task names are the real ones (``recompute_daily_summaries_for_batch``,
+``oura.backfill``), and routes and priorities come from ``ROUTES``. Rate
+limits are left off so the storm is not throttled before it reaches the
+queue. Workers run as threads in this process.
+
+Usage
+-----
+  # From cloud-brain/ directory (in-memory broker, no services needed):
+  uv run python scripts/bench_queue_isolation.py
+
+  # Against a real Redis (use a spare database; queues are purged):
+  uv run python scripts/bench_queue_isolation.py --broker redis://localhost:6379/15 \\
+      --backfills 2000 --backfill-seconds 0.2 --out isolation.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any
+
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+from celery.signals import before_task_publish
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.task_queues import (  # noqa: E402
+    BACKFILL,
+    PERIODIC_SYNC,
+    REALTIME,
+    ROUTES,
+    Route,
+    configure_routing,
+    queue_wait,
+    stamp_sent_at,
+)
+from scripts.bench_e2e_throughput import _percentiles  # noqa: E402
+
+AGGREGATE_TASK = "app.tasks.aggregation_tasks.recompute_daily_summaries_for_batch"
+BACKFILL_TASK = "oura.backfill"
+LAYOUTS = ("shared", "isolated")
+
+
+@dataclass
+class StormConfig:
+    """Load shape for one run.
+
+    Attributes:
+        broker: Celery broker URL.
+        backfills: Backfill tasks published at the start of the storm.
+        backfill_seconds: Run time of one backfill task.
+        probes: Aggregation tasks published per phase.
+        probe_interval: Seconds between probe publishes.
+        aggregate_seconds: Run time of one aggregation task.
+        concurrency: Worker threads per queue group (shared gets twice this).
+    """
+
+    broker: str = "memory://"
+    backfills: int = 200
+    backfill_seconds: float = 0.05
+    probes: int = 20
+    probe_interval: float = 0.02
+    aggregate_seconds: float = 0.005
+    concurrency: int = 2
+
+
+def _routes(layout: str) -> dict[str, Route]:
+    if layout == "shared":
+        return {AGGREGATE_TASK: Route(PERIODIC_SYNC), BACKFILL_TASK: Route(PERIODIC_SYNC)}
+    return {name: replace(ROUTES[name], rate_limit=None) for name in (AGGREGATE_TASK, BACKFILL_TASK)}
+
+
+def _build_app(config: StormConfig, layout: str, waits: list[float]) -> tuple[Celery, Any, Any]:
+    app = Celery(f"queue-isolation-{layout}", broker=config.broker, set_as_current=False)
+    app.conf.update(
+        task_ignore_result=True,
+        # Production prefetches 1. The in-memory transport's synchronous
+        # consumer loop refills a prefetch of 1 only every few hundred ms,
+        # which would swamp the queueing being measured.
+        worker_prefetch_multiplier=4 if config.broker.startswith("memory://") else 1,
+        task_acks_late=True,
+        broker_transport_options={"polling_interval": 0.01},
+    )
+    configure_routing(app, _routes(layout))
+
+    # Registered eagerly and unshared so these stand-ins win over the real
+    # tasks of the same name if app.worker's modules are already imported.
+    @app.task(name=AGGREGATE_TASK, bind=True, shared=False, lazy=False)
+    def aggregate(self) -> None:
+        waited = queue_wait(self.request)
+        if waited is not None:
+            waits.append(waited[1])
+        time.sleep(config.aggregate_seconds)
+
+    @app.task(name=BACKFILL_TASK, shared=False, lazy=False)
+    def backfill() -> None:
+        time.sleep(config.backfill_seconds)
+
+    return app, aggregate, backfill
+
+
+def _wait_for(waits: list[float], count: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while len(waits) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def run_layout(config: StormConfig, layout: str) -> dict[str, Any]:
+    """Measure probe latency idle and during a storm for one queue layout."""
+    waits: list[float] = []
+    app, aggregate, backfill = _build_app(config, layout, waits)
+    with app.connection_for_write() as conn:
+        for queue in app.amqp.queues:
+            conn.default_channel.queue_purge(queue)
+
+    groups = [(PERIODIC_SYNC,)] if layout == "shared" else [(REALTIME,), (BACKFILL,)]
+    concurrency = config.concurrency * (2 if layout == "shared" else 1)
+    storm_drain = config.backfills * config.backfill_seconds / max(concurrency, 1)
+    results: dict[str, Any] = {}
+
+    def stamp(headers=None, **kwargs) -> None:
+        stamp_sent_at(headers)
+
+    before_task_publish.connect(stamp, weak=False)
+    workers = [
+        start_worker(
+            app,
+            pool="threads",
+            concurrency=concurrency,
+            queues=list(queues),
+            perform_ping_check=False,
+            shutdown_timeout=storm_drain + 30,
+            hostname=f"{layout}-{queues[0]}@bench",
+        )
+        for queues in groups
+    ]
+    try:
+        for worker in workers:
+            worker.__enter__()
+        for phase in ("idle", "storm"):
+            waits.clear()
+            if phase == "storm":
+                for _ in range(config.backfills):
+                    backfill.delay()
+            for _ in range(config.probes):
+                aggregate.delay()
+                time.sleep(config.probe_interval)
+            _wait_for(waits, config.probes, timeout=storm_drain + 30)
+            results[phase] = {"completed": len(waits), "latency_ms": _percentiles(list(waits))}
+        with app.connection_for_write() as conn:
+            for queue in app.amqp.queues:
+                conn.default_channel.queue_purge(queue)
+    finally:
+        for worker in reversed(workers):
+            worker.__exit__(None, None, None)
+        before_task_publish.disconnect(stamp)
+    return results
+
+
+def run(config: StormConfig, layouts: tuple[str, ...] = LAYOUTS) -> dict[str, Any]:
+    """Run every layout and return the report."""
+    return {
+        "config": {k: v for k, v in vars(config).items() if k != "broker"},
+        "layouts": {layout: run_layout(config, layout) for layout in layouts},
+    }
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    print(f"{'layout':<10} {'phase':<6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for layout, phases in report["layouts"].items():
+        for phase, result in phases.items():
+            latency = result["latency_ms"]
+            p50, p95, worst = latency["p50"], latency["p95"], latency["max"]
+            print(f"{layout:<10} {phase:<6} {p50!s:>9} {p95!s:>9} {worst!s:>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    defaults = StormConfig()
+    parser.add_argument("--broker", default=defaults.broker)
+    parser.add_argument("--backfills", type=int, default=defaults.backfills)
+    parser.add_argument("--backfill-seconds", type=float, default=defaults.backfill_seconds)
+    parser.add_argument("--probes", type=int, default=defaults.probes)
+    parser.add_argument("--probe-interval", type=float, default=defaults.probe_interval)
+    parser.add_argument("--aggregate-seconds", type=float, default=defaults.aggregate_seconds)
+    parser.add_argument("--concurrency", type=int, default=defaults.concurrency)
+    parser.add_argument("--layouts", default=",".join(LAYOUTS), help="Comma-separated subset of: shared, isolated")
+    parser.add_argument("--out", type=Path, help="Write the JSON report here")
+    args = parser.parse_args()
+
+    config = StormConfig(
+        broker=args.broker,
+        backfills=args.backfills,
+        backfill_seconds=args.backfill_seconds,
+        probes=args.probes,
+        probe_interval=args.probe_interval,
+        aggregate_seconds=args.aggregate_seconds,
+        concurrency=args.concurrency,
+    )
+    report = run(config, tuple(name.strip() for name in args.layouts.split(",") if name.strip()))
+    _print_report(report)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+bench_response_serialization.py — payload size and encode time of large reads
+==============================================================================
+Builds the one-year (``range=1y``) All-Data payloads for heart, sleep and
+nutrition, plus a 200-message chat history page, from synthetic row
+tuples, and encodes each one two ways:
+
+  pydantic  the former path: response models built per row, then
+            validated and dumped by FastAPI's response_model handling
+  fast      dicts built straight from the row tuples, encoded by
+            app.utils.fast_json (orjson)
+
+For each endpoint it reports the median build+encode time and the body
+size uncompressed, gzip (level 6, as CompressionMiddleware) and Brotli
+(quality 4, when the optional ``brotli`` package is installed).
+
+Usage
+-----
+  # From cloud-brain/ directory:
+  uv run python scripts/bench_response_serialization.py
+  uv run python scripts/bench_response_serialization.py --repeat 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+import zlib
+from collections.abc import Callable
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.api.v1 import heart_routes, sleep_routes  # noqa: E402
+from app.api.v1.nutrition_schemas import (  # noqa: E402
+    NutritionAllDataDay,
+    NutritionAllDataDayValues,
+    NutritionAllDataResponse,
+)
+from app.utils.fast_json import dumps  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_TODAY = date(2026, 4, 20)
+_DAYS = 365
+
+
+def _metric_rows(metric_map: dict[str, str], rng: random.Random) -> list[tuple[date, str, float]]:
+    rows = []
+    for offset in range(_DAYS - 1, -1, -1):
+        day = _TODAY - timedelta(days=offset)
+        for metric in metric_map:
+            if rng.random() < 0.9:
+                rows.append((day, metric, round(rng.uniform(10, 200), 1)))
+    return rows
+
+
+def _fast_metric_payload(rows, metric_map: dict[str, str], value_keys: tuple[str, ...]) -> dict[str, Any]:
+    by_date: dict[str, dict[str, float | None]] = {}
+    for metric_date, metric_type, value in rows:
+        key = metric_map.get(metric_type)
+        if key:
+            values = by_date.get(str(metric_date))
+            if values is None:
+                values = by_date[str(metric_date)] = dict.fromkeys(value_keys)
+            values[key] = value
+    today = str(_TODAY)
+    return {"days": [{"date": d, "is_today": d == today, "values": v} for d, v in sorted(by_date.items())]}
+
+
+def _pydantic_metric_payload(rows, module, prefix: str):
+    by_date: dict[str, dict[str, float]] = {}
+    for metric_date, metric_type, value in rows:
+        key = module._METRIC_TO_ALL_DATA_KEY.get(metric_type)
+        if key:
+            by_date.setdefault(str(metric_date), {})[key] = value
+    day_cls = getattr(module, f"{prefix}AllDataDay")
+    values_cls = getattr(module, f"{prefix}AllDataDayValues")
+    response_cls = getattr(module, f"{prefix}AllDataResponse")
+    return response_cls(
+        days=[
+            day_cls(date=d, is_today=d == str(_TODAY), values=values_cls(**metrics))
+            for d, metrics in sorted(by_date.items())
+        ]
+    )
+
+
+def _nutrition_rows(rng: random.Random) -> list[tuple]:
+    return [
+        (
+            _TODAY - timedelta(days=offset),
+            rng.uniform(1200, 3200),
+            rng.uniform(40, 200),
+            rng.uniform(100, 400),
+            rng.uniform(30, 120),
+            rng.randint(1, 6),
+        )
+        for offset in range(_DAYS - 1, -1, -1)
+    ]
+
+
+def _nutrition_dicts(rows) -> list[dict[str, Any]]:
+    return [
+        {
+            "date": str(row_date),
+            "is_today": row_date == _TODAY,
+            "values": {
+                "calories": float(calories),
+                "protein": float(protein),
+                "carbs": float(carbs),
+                "fat": float(fat),
+                "meals": float(meals),
+            },
+        }
+        for row_date, calories, protein, carbs, fat, meals in rows
+    ]
+
+
+def _messages(rng: random.Random) -> list[dict[str, Any]]:
+    start = datetime(2026, 4, 20, 8, tzinfo=timezone.utc)
+    words = "sleep heart rate recovery protein training zone rest goal trend week".split()
+    return [
+        {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": " ".join(rng.choices(words, k=rng.randint(10, 220))),
+            "created_at": (start + timedelta(seconds=30 * i)).isoformat(),
+            "attachments": [],
+        }
+        for i in range(200)
+    ]
+
+
+def _cases(rng: random.Random) -> dict[str, tuple[Callable[[], bytes], Callable[[], bytes]]]:
+    heart_rows = _metric_rows(heart_routes._METRIC_TO_ALL_DATA_KEY, rng)
+    sleep_rows = _metric_rows(sleep_routes._METRIC_TO_ALL_DATA_KEY, rng)
+    nutrition_rows = _nutrition_rows(rng)
+    messages = _messages(rng)
+    heart_keys = heart_routes._ALL_DATA_VALUE_KEYS
+    sleep_keys = sleep_routes._ALL_DATA_VALUE_KEYS
+
+    heart_adapter = TypeAdapter(heart_routes.HeartAllDataResponse)
+    sleep_adapter = TypeAdapter(sleep_routes.SleepAllDataResponse)
+    nutrition_adapter = TypeAdapter(NutritionAllDataResponse)
+    messages_adapter = TypeAdapter(list[dict])
+
+    def heart_pydantic() -> bytes:
+        model = _pydantic_metric_payload(heart_rows, heart_routes, "Heart")
+        return heart_adapter.dump_json(heart_adapter.validate_python(model, from_attributes=True))
+
+    def sleep_pydantic() -> bytes:
+        model = _pydantic_metric_payload(sleep_rows, sleep_routes, "Sleep")
+        return sleep_adapter.dump_json(sleep_adapter.validate_python(model, from_attributes=True))
+
+    def nutrition_pydantic() -> bytes:
+        model = NutritionAllDataResponse(
+            days=[
+                NutritionAllDataDay(
+                    date=day["date"], is_today=day["is_today"], values=NutritionAllDataDayValues(**day["values"])
+                )
+                for day in _nutrition_dicts(nutrition_rows)
+            ]
+        )
+        return nutrition_adapter.dump_json(nutrition_adapter.validate_python(model, from_attributes=True))
+
+    return {
+        "heart/all-data": (
+            heart_pydantic,
+            lambda: dumps(_fast_metric_payload(heart_rows, heart_routes._METRIC_TO_ALL_DATA_KEY, heart_keys)),
+        ),
+        "sleep/all-data": (
+            sleep_pydantic,
+            lambda: dumps(_fast_metric_payload(sleep_rows, sleep_routes._METRIC_TO_ALL_DATA_KEY, sleep_keys)),
+        ),
+        "nutrition/all-data": (nutrition_pydantic, lambda: dumps({"days": _nutrition_dicts(nutrition_rows)})),
+        "chat/messages": (
+            lambda: messages_adapter.dump_json(messages_adapter.validate_python(messages)),
+            lambda: dumps(messages),
+        ),
+    }
+
+
+def _median_ms(fn: Callable[[], bytes], repeat: int) -> float:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(
+        f"{'endpoint (1y)':<20} {'pydantic ms':>12} {'fast ms':>9} {'speedup':>8} "
+        f"{'raw KiB':>8} {'gzip KiB':>9} {'br KiB':>7}"
+    )
+    for name, (pydantic_fn, fast_fn) in _cases(random.Random(args.seed)).items():
+        body = fast_fn()
+        slow_ms = _median_ms(pydantic_fn, args.repeat)
+        fast_ms = _median_ms(fast_fn, args.repeat)
+        gzip_size = len(zlib.compress(body, 6, wbits=16 + zlib.MAX_WBITS))
+        br_size = f"{len(brotli.compress(body, quality=4)) / 1024:>7.1f}" if brotli is not None else f"{'n/a':>7}"
+        print(
+            f"{name:<20} {slow_ms:>12.2f} {fast_ms:>9.2f} {slow_ms / fast_ms:>7.1f}x "
+            f"{len(body) / 1024:>8.1f} {gzip_size / 1024:>9.1f} {br_size}"
+        )
+
+
+if __name__ == "__main__":
+    main()
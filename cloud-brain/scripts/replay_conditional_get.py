@@ -0,0 +1,248 @@
+"""
+replay_conditional_get.py — 304 share and DB queries saved by ETags
+===================================================================
+Replays a request trace against the data version / ETag logic of
+``conditional_get`` (app.api.deps) and reports, per polled endpoint, how
+many reads would be answered with ``304 Not Modified`` and how many SQL
+statements that saves.
+
+Each simulated client keeps the last ``ETag`` per endpoint and sends it
+as ``If-None-Match``, as the mobile app's HTTP cache does. ETags come
+from the real ``app.services.data_version.make_etag``. Versions live in
+an in-memory copy of the Redis hashes, bumped by the trace's writes.
+
+Trace format (JSON Lines, ordered by ``ts`` in epoch seconds):
+
+  {"ts": 1776664800.0, "user": "u1", "kind": "get", "path": "/api/v1/today/summary"}
+  {"ts": 1776664805.2, "user": "u1", "kind": "write", "scopes": ["data"]}
+  {"ts": 1776668400.0, "user": null, "kind": "write", "scopes": ["goals"]}
+
+A write with ``"user": null`` is a global bump (bulk Beat job). GETs may
+carry ``"query"`` and ``"tz"``. Without ``--trace`` a synthetic day is
+generated: app opens sync HealthKit (a data write, then the aggregation
+follow-up), every screen focus polls its endpoints, and webhooks,
+goal edits and streak updates write in between.
+
+Statements per full (200) response come from ``--metrics``: a saved
+``GET /metrics`` scrape, using ``http_request_db_queries_sum / _count``
+per route. Otherwise the counts read off the handlers are used (see
+``_DEFAULT_QUERIES``). A 304 runs no statements, apart from the one
+timezone lookup per user before it is cached.
+
+Usage
+-----
+  # From cloud-brain/ directory:
+  uv run python scripts/replay_conditional_get.py
+  uv run python scripts/replay_conditional_get.py --users 500 --seed 3
+  uv run python scripts/replay_conditional_get.py --dump-trace day.jsonl
+  uv run python scripts/replay_conditional_get.py --trace day.jsonl --metrics scrape.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import zoneinfo
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.data_version import SCOPE_DATA, SCOPE_GOALS, etag_matches, make_etag  # noqa: E402
+
+# path -> (scopes, local date source), as wired with conditional_get.
+_ROUTES: dict[str, tuple[tuple[str, ...], str | None]] = {
+    "/api/v1/today/summary": ((SCOPE_DATA,), "preference"),
+    "/api/v1/metrics/latest": ((SCOPE_DATA,), None),
+    "/api/v1/heart/summary": ((SCOPE_DATA,), "preference"),
+    "/api/v1/sleep/summary": ((SCOPE_DATA,), "preference"),
+    "/api/v1/analytics/dashboard-summary": ((SCOPE_DATA,), "preference"),
+    "/api/v1/progress/home": ((SCOPE_DATA, SCOPE_GOALS), "header"),
+}
+
+# Statements per 200 response, counted from the handlers. Progress assumes
+# three active goals (two statements each for live value and history).
+_DEFAULT_QUERIES: dict[str, float] = {
+    "/api/v1/today/summary": 2,
+    "/api/v1/metrics/latest": 1,
+    "/api/v1/heart/summary": 6,
+    "/api/v1/sleep/summary": 6,
+    "/api/v1/analytics/dashboard-summary": 11,
+    "/api/v1/progress/home": 12,
+}
+
+# Screen -> endpoints polled on focus.
+_SCREENS: dict[str, list[tuple[str, str]]] = {
+    "today": [("/api/v1/today/summary", ""), ("/api/v1/metrics/latest", "types=steps,weight_kg,sleep_duration")],
+    "heart": [("/api/v1/heart/summary", "")],
+    "sleep": [("/api/v1/sleep/summary", "")],
+    "data": [("/api/v1/analytics/dashboard-summary", "")],
+    "progress": [("/api/v1/progress/home", "")],
+}
+_SCREEN_WEIGHTS = {"today": 5, "heart": 1, "sleep": 1.5, "data": 2, "progress": 1.5}
+_TIMEZONES = ["UTC", "Europe/London", "America/New_York", "Asia/Tokyo", "Australia/Sydney"]
+
+_METRIC_LINE = re.compile(r'^http_request_db_queries_(sum|count)\{([^}]*)\}\s+([0-9.eE+-]+)$')
+
+
+@dataclass
+class _RouteStats:
+    requests: int = 0
+    not_modified: int = 0
+    queries_run: float = 0.0
+    queries_saved: float = 0.0
+
+
+@dataclass
+class _Versions:
+    users: dict[str, dict[str, str]] = field(default_factory=dict)
+    global_fields: dict[str, str] = field(default_factory=lambda: {"epoch": "g0"})
+
+    def user(self, user_id: str) -> dict[str, str]:
+        return self.users.setdefault(user_id, {"epoch": f"e-{user_id}"})
+
+    def bump(self, user_id: str | None, scopes: list[str]) -> None:
+        fields = self.global_fields if user_id is None else self.user(user_id)
+        for scope in scopes:
+            fields[scope] = str(int(fields.get(scope, "0")) + 1)
+
+
+def _synthetic_trace(users: int, rng: random.Random) -> list[dict[str, Any]]:
+    start = datetime(2026, 4, 20, 0, 0, tzinfo=zoneinfo.ZoneInfo("UTC")).timestamp()
+    screens, weights = list(_SCREEN_WEIGHTS), list(_SCREEN_WEIGHTS.values())
+    events: list[dict[str, Any]] = []
+    for n in range(users):
+        user = f"user-{n:04d}"
+        tz = rng.choice(_TIMEZONES)
+        first_sync_of_day = True
+        for _ in range(rng.randint(4, 14)):
+            t = start + rng.uniform(0, 86400)
+            if rng.random() < 0.7:
+                # App open: HealthKit/Health Connect sync, then bulk aggregation.
+                events.append({"ts": t, "user": user, "kind": "write", "scopes": [SCOPE_DATA]})
+                events.append({"ts": t + rng.uniform(2, 20), "user": user, "kind": "write", "scopes": [SCOPE_DATA]})
+                if first_sync_of_day:
+                    events.append({"ts": t + 1, "user": user, "kind": "write", "scopes": [SCOPE_GOALS]})
+                    first_sync_of_day = False
+            t += 1
+            for _ in range(rng.randint(2, 9)):
+                t += rng.uniform(3, 90)
+                for path, query in _SCREENS[rng.choices(screens, weights)[0]]:
+                    events.append({"ts": t, "user": user, "kind": "get", "path": path, "query": query, "tz": tz})
+        for _ in range(rng.randint(0, 3)):  # provider webhooks
+            events.append({"ts": start + rng.uniform(0, 86400), "user": user, "kind": "write", "scopes": [SCOPE_DATA]})
+        if rng.random() < 0.1:  # goal edit
+            events.append({"ts": start + rng.uniform(0, 86400), "user": user, "kind": "write", "scopes": [SCOPE_GOALS]})
+    events.sort(key=lambda e: e["ts"])
+    return events
+
+
+def _load_metrics(path: Path) -> dict[str, float]:
+    sums: dict[str, float] = {}
+    counts: dict[str, float] = {}
+    for line in path.read_text().splitlines():
+        match = _METRIC_LINE.match(line.strip())
+        if not match:
+            continue
+        kind, labels, value = match.groups()
+        route = dict(re.findall(r'(\w+)="([^"]*)"', labels))
+        if route.get("method") != "GET":
+            continue
+        (sums if kind == "sum" else counts)[route.get("route", "")] = float(value)
+    return {route: sums[route] / counts[route] for route in sums if counts.get(route)}
+
+
+def replay(events: list[dict[str, Any]], queries: dict[str, float]) -> dict[str, _RouteStats]:
+    versions = _Versions()
+    client_etags: dict[tuple[str, str, str], str] = {}
+    known_tz: set[str] = set()
+    stats: dict[str, _RouteStats] = defaultdict(_RouteStats)
+
+    for event in events:
+        user = event.get("user")
+        if event["kind"] == "write":
+            versions.bump(user, event.get("scopes") or [SCOPE_DATA])
+            continue
+        path = event["path"]
+        if path not in _ROUTES:
+            continue
+        scopes, date_source = _ROUTES[path]
+        query = event.get("query", "")
+        tz = zoneinfo.ZoneInfo(event.get("tz") or "UTC")
+        local_date = datetime.fromtimestamp(event["ts"], tz).date() if date_source else None
+
+        route = stats[path]
+        route.requests += 1
+        if date_source == "preference" and user not in known_tz:
+            known_tz.add(user)
+            route.queries_run += 1
+        etag = make_etag(path, query, scopes, versions.user(user), versions.global_fields, local_date)
+        cache_key = (user, path, query)
+        cached = client_etags.get(cache_key)
+        full_cost = queries.get(path, _DEFAULT_QUERIES[path])
+        if cached and etag_matches(cached, etag):
+            route.not_modified += 1
+            route.queries_saved += full_cost
+        else:
+            route.queries_run += full_cost
+            client_etags[cache_key] = etag
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", type=Path, help="JSONL trace to replay (default: synthetic day)")
+    parser.add_argument("--metrics", type=Path, help="saved GET /metrics scrape for per-route query counts")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--dump-trace", type=Path, help="write the synthetic trace as JSONL and exit")
+    args = parser.parse_args()
+
+    if args.trace:
+        events = [json.loads(line) for line in args.trace.read_text().splitlines() if line.strip()]
+    else:
+        events = _synthetic_trace(args.users, random.Random(args.seed))
+    if args.dump_trace:
+        args.dump_trace.write_text("".join(json.dumps(e) + "\n" for e in events))
+        print(f"wrote {len(events)} events to {args.dump_trace}")
+        return
+
+    queries = dict(_DEFAULT_QUERIES)
+    if args.metrics:
+        queries.update(_load_metrics(args.metrics))
+
+    stats = replay(events, queries)
+    writes = sum(1 for e in events if e["kind"] == "write")
+    print(f"events={len(events)} writes={writes}")
+    print(f"{'route':<38} {'requests':>9} {'304':>7} {'304 %':>6} {'queries run':>12} {'saved':>8} {'saved %':>8}")
+    total = _RouteStats()
+    for path in _ROUTES:
+        s = stats.get(path)
+        if not s or not s.requests:
+            continue
+        spent = s.queries_run + s.queries_saved
+        print(
+            f"{path:<38} {s.requests:>9} {s.not_modified:>7} {100 * s.not_modified / s.requests:>5.1f}% "
+            f"{s.queries_run:>12.0f} {s.queries_saved:>8.0f} {100 * s.queries_saved / spent:>7.1f}%"
+        )
+        total.requests += s.requests
+        total.not_modified += s.not_modified
+        total.queries_run += s.queries_run
+        total.queries_saved += s.queries_saved
+    if total.requests:
+        spent = total.queries_run + total.queries_saved
+        print(
+            f"{'total':<38} {total.requests:>9} {total.not_modified:>7} "
+            f"{100 * total.not_modified / total.requests:>5.1f}% "
+            f"{total.queries_run:>12.0f} {total.queries_saved:>8.0f} {100 * total.queries_saved / spent:>7.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -354,21 +354,32 @@ def _det_uuid(key: str) -> str:
     return str(uuid.uuid5(uuid.NAMESPACE_DNS, key))
 
 
+# Daily metric definitions: (metric_type, unit, base, amplitude, trend_per_day).
+# Shared with seed_population.py, which draws per-user baselines around them.
+DAILY_METRIC_SPECS = [
+    ("steps", "steps", 8500, 2500, 0),
+    ("active_calories", "kcal", 475, 175, 0),
+    ("distance", "m", 6000, 3000, 0),
+    ("exercise_minutes", "min", 37, 22, 0),
+    ("floors_climbed", "floors", 15, 10, 0),
+    ("resting_heart_rate", "bpm", 65, 6, -0.07),   # trends down slightly
+    ("hrv_ms", "ms", 57, 17, 0.1),                 # trends up slightly
+    ("heart_rate_avg", "bpm", 75, 7, 0),
+    ("vo2_max", "mL/kg/min", 45, 3, 0.02),
+]
+
+# Sleep metric definitions: (metric_type, unit, base, amplitude).
+SLEEP_METRIC_SPECS = [
+    ("sleep_duration", "min", 450, 75),       # 6–8.5 hrs in minutes
+    ("sleep_efficiency", "%", 88, 13),
+    ("deep_sleep_minutes", "min", 85, 70),
+    ("rem_sleep_minutes", "min", 100, 60),
+    ("sleep_quality", "score", 80, 20),
+]
+
+
 def seed_unified_health_metrics(cur):
     """30 days of daily_aggregate health_events + daily_summaries for 9 metrics."""
-    # Metric definitions: (metric_type, unit, base, amplitude, trend_per_day)
-    metric_specs = [
-        ("steps", "steps", 8500, 2500, 0),
-        ("active_calories", "kcal", 475, 175, 0),
-        ("distance", "m", 6000, 3000, 0),
-        ("exercise_minutes", "min", 37, 22, 0),
-        ("floors_climbed", "floors", 15, 10, 0),
-        ("resting_heart_rate", "bpm", 65, 6, -0.07),   # trends down slightly
-        ("hrv_ms", "ms", 57, 17, 0.1),                 # trends up slightly
-        ("heart_rate_avg", "bpm", 75, 7, 0),
-        ("vo2_max", "mL/kg/min", 45, 3, 0.02),
-    ]
-
     he_rows = []
     ds_rows = []
 
@@ -376,7 +387,7 @@ def seed_unified_health_metrics(cur):
         d = days_ago(29 - i)
         ts = datetime(d.year, d.month, d.day, 8, 0, 0, tzinfo=timezone.utc)
 
-        for metric_type, unit, base, amplitude, trend in metric_specs:
+        for metric_type, unit, base, amplitude, trend in DAILY_METRIC_SPECS:
             val = base + trend * i + random.uniform(-amplitude / 2, amplitude / 2)
             # Keep vo2_max stable-ish
             if metric_type == "vo2_max":
@@ -438,14 +449,6 @@ def seed_unified_health_metrics(cur):
 
 def seed_sleep_v2(cur):
     """30 days of sleep metrics in health_events + daily_summaries."""
-    sleep_metrics = [
-        ("sleep_duration", "min", 450, 75),       # 6–8.5 hrs in minutes
-        ("sleep_efficiency", "%", 88, 13),
-        ("deep_sleep_minutes", "min", 85, 70),
-        ("rem_sleep_minutes", "min", 100, 60),
-        ("sleep_quality", "score", 80, 20),
-    ]
-
     he_rows = []
     ds_rows = []
 
@@ -456,7 +459,7 @@ def seed_sleep_v2(cur):
         dow = d.weekday()
         weekend_bonus = 20 if dow >= 5 else 0  # sleep longer on weekends
 
-        for metric_type, unit, base, amplitude in sleep_metrics:
+        for metric_type, unit, base, amplitude in SLEEP_METRIC_SPECS:
             bonus = weekend_bonus if metric_type == "sleep_duration" else 0
             val = base + bonus + random.uniform(-amplitude / 2, amplitude / 2)
             val = max(1, round(val, 1))
@@ -1062,9 +1065,9 @@ def seed_achievements(cur):
     print(f"  achievements: {len(rows)} rows")
 
 
-def seed_insights(cur):
-    """Seed one card of every insight type for thorough UI coverage."""
-    rows = [
+def demo_insight_rows():
+    """One demo-full card of every insight type, keyed by ``ins-demo-NNN`` slugs."""
+    return [
         # sleep_analysis
         (
             "ins-demo-001",
@@ -1250,6 +1253,11 @@ def seed_insights(cur):
             None,
         ),
     ]
+
+
+def seed_insights(cur):
+    """Seed one card of every insight type for thorough UI coverage."""
+    rows = demo_insight_rows()
     # The GET /insights/{id} route requires a UUID-formatted ID (FastAPI
     # Path regex ^[0-9a-fA-F-]{36}$). The literal "ins-demo-NNN" slugs in
     # the tuples above are fine for INSERT but fail the API validator when
@@ -1528,29 +1536,9 @@ def seed_emergency_card(cur):
     print("  emergency_health_cards: 1 row (fully populated)")
 
 
-def seed_conversations(cur):
-    """Seed 2 conversations with realistic message threads."""
-    # Conversation 1: Health check-in (older)
-    cur.execute(
-        """
-        INSERT INTO conversations (id, user_id, title, created_at, updated_at)
-        VALUES (%s, %s, 'Health check-in', %s, %s)
-        ON CONFLICT (id) DO NOTHING
-    """,
-        ("conv-demo-001", FULL_ID, ts_ago(days=3), ts_ago(days=3)),
-    )
-
-    # Conversation 2: Training plan (more recent)
-    cur.execute(
-        """
-        INSERT INTO conversations (id, user_id, title, archived, created_at, updated_at)
-        VALUES (%s, %s, 'Training plan for next month', false, %s, %s)
-        ON CONFLICT (id) DO NOTHING
-    """,
-        ("conv-demo-002", FULL_ID, ts_ago(days=1), ts_ago(hours=2)),
-    )
-
-    msgs = [
+def demo_messages():
+    """The two demo-full conversation threads as (id, conversation_id, role, content, created_at)."""
+    return [
         # Conversation 1
         ("msg-demo-001", "conv-demo-001", "user", "How was my sleep this week?", ts_ago(days=3)),
         (
@@ -1592,6 +1580,31 @@ def seed_conversations(cur):
             ts_ago(hours=2),
         ),
     ]
+
+
+def seed_conversations(cur):
+    """Seed 2 conversations with realistic message threads."""
+    # Conversation 1: Health check-in (older)
+    cur.execute(
+        """
+        INSERT INTO conversations (id, user_id, title, created_at, updated_at)
+        VALUES (%s, %s, 'Health check-in', %s, %s)
+        ON CONFLICT (id) DO NOTHING
+    """,
+        ("conv-demo-001", FULL_ID, ts_ago(days=3), ts_ago(days=3)),
+    )
+
+    # Conversation 2: Training plan (more recent)
+    cur.execute(
+        """
+        INSERT INTO conversations (id, user_id, title, archived, created_at, updated_at)
+        VALUES (%s, %s, 'Training plan for next month', false, %s, %s)
+        ON CONFLICT (id) DO NOTHING
+    """,
+        ("conv-demo-002", FULL_ID, ts_ago(days=1), ts_ago(hours=2)),
+    )
+
+    msgs = demo_messages()
     execute_values(
         cur,
         """
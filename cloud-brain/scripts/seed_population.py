@@ -0,0 +1,543 @@
+"""
+seed_population.py — synthetic user population for load and query-plan work
+===========================================================================
+Generates many synthetic users with correlated health history and loads
+them with COPY from parallel worker processes, so query plans and
+benchmarks for daily_summaries, health_events, messages and insights see
+production-like data volumes and distributions.
+
+Each user gets:
+
+  - a users row and an integrations row for their device
+  - one daily_aggregate health_events row and one daily_summaries row per
+    metric per worn day, from the metric specs in seed_demo_data.py
+  - optional point-in-time heart rate samples (--samples-per-day)
+  - weigh-ins on a per-user fraction of days
+  - conversations/messages and insights, using the demo-full threads and
+    insight cards as templates
+
+The series are correlated the way real data is: a night of short sleep
+lowers the next day's HRV, lower HRV goes with a higher resting heart rate
+and fewer steps, and active calories, distance and exercise minutes follow
+steps. Baselines vary per user around a fitness trait, and the device mix
+decides which metrics a user has at all (no HRV from Withings, no floors
+from Oura, and so on).
+
+Everything is derived from --seed and the user's index, so the same seed,
+user count and --end-date always produce the same rows, however many
+workers run. Users are loaded in chunks, one transaction each; a chunk
+whose first user already exists is skipped, so an interrupted run can be
+resumed with the same arguments. Population users have emails ending in
+@population.zuralog.dev; --reset removes them and everything they own.
+
+Usage
+-----
+  # From cloud-brain/ directory (DATABASE_URL in .env or the environment):
+  uv run python scripts/seed_population.py --users 1000 --days 90
+  uv run python scripts/seed_population.py --users 100000 --days 365 --workers 16 --end-date 2026-06-30
+  uv run python scripts/seed_population.py --users 1000 --dry-run      # generate only, report rows/s
+  uv run python scripts/seed_population.py --reset
+
+Requirements
+------------
+  DATABASE_URL pointing at a migrated database. health_events partitions
+  for the whole history are created with health_events_ensure_partition()
+  before loading. With the default mix there are roughly 11 health_events
+  rows (and as many daily_summaries rows) per user-day before intraday
+  samples; 100k users x 1 year is ~400M of each, so size the disk
+  accordingly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import functools
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.seed_demo_data import (  # noqa: E402
+    DAILY_METRIC_SPECS,
+    SLEEP_METRIC_SPECS,
+    demo_insight_rows,
+    demo_messages,
+    get_connection,
+)
+
+EMAIL_DOMAIN = "population.zuralog.dev"
+_NAMESPACE = uuid.UUID("7c1e0f55-2b7a-4f0e-9a61-3d2c5e8b9a40")
+
+DEFAULT_DEVICE_MIX = "apple_health=45,health_connect=25,fitbit=12,oura=8,withings=5,polar=5"
+
+# Metrics each device reports. Anything else is absent for its users.
+DEVICE_METRICS: dict[str, set[str]] = {
+    "apple_health": {m[0] for m in DAILY_METRIC_SPECS + SLEEP_METRIC_SPECS} | {"weight_kg"},
+    "health_connect": {m[0] for m in DAILY_METRIC_SPECS + SLEEP_METRIC_SPECS} - {"hrv_ms", "vo2_max"} | {"weight_kg"},
+    "fitbit": {m[0] for m in DAILY_METRIC_SPECS + SLEEP_METRIC_SPECS} | {"weight_kg"},
+    "oura": {"steps", "active_calories", "resting_heart_rate", "hrv_ms", "heart_rate_avg"}
+    | {m[0] for m in SLEEP_METRIC_SPECS},
+    "withings": {"steps", "distance", "heart_rate_avg", "sleep_duration", "sleep_efficiency", "weight_kg"},
+    "polar": {
+        "steps",
+        "active_calories",
+        "distance",
+        "exercise_minutes",
+        "resting_heart_rate",
+        "hrv_ms",
+        "heart_rate_avg",
+        "vo2_max",
+        "sleep_duration",
+        "sleep_quality",
+    },
+}
+
+_UNITS = {m[0]: m[1] for m in DAILY_METRIC_SPECS + SLEEP_METRIC_SPECS} | {"weight_kg": "kg"}
+_INTEGER_METRICS = {"steps", "floors_climbed", "exercise_minutes"}
+
+# (table, columns, COPY format). Loaded in this order inside each chunk.
+TABLES: list[tuple[str, tuple[str, ...], str]] = [
+    (
+        "users",
+        ("id", "email", "display_name", "onboarding_complete", "coach_persona", "subscription_tier", "created_at"),
+        "csv",
+    ),
+    ("integrations", ("id", "user_id", "provider", "is_active", "last_synced_at", "sync_status"), "csv"),
+    ("conversations", ("id", "user_id", "title", "archived", "created_at", "updated_at"), "csv"),
+    ("messages", ("id", "conversation_id", "role", "content", "created_at"), "csv"),
+    (
+        "insights",
+        (
+            "id",
+            "user_id",
+            "type",
+            "title",
+            "body",
+            "data",
+            "priority",
+            "created_at",
+            "read_at",
+            "dismissed_at",
+            "generation_date",
+        ),
+        "csv",
+    ),
+    (
+        "health_events",
+        ("id", "user_id", "metric_type", "value", "unit", "source", "recorded_at", "local_date", "granularity"),
+        "text",
+    ),
+    (
+        "daily_summaries",
+        ("id", "user_id", "date", "metric_type", "value", "unit", "event_count", "is_stale"),
+        "text",
+    ),
+]
+
+
+@dataclass(frozen=True)
+class PopulationConfig:
+    """Parameters that, with the user index, fully determine a user's rows."""
+
+    users: int
+    days: int
+    end_date: date
+    seed: int = 42
+    device_mix: dict[str, float] = field(default_factory=lambda: parse_device_mix(DEFAULT_DEVICE_MIX))
+    samples_per_day: int = 0
+    conversations_per_month: float = 2.0
+    insights_per_week: float = 3.0
+
+    @property
+    def start_date(self) -> date:
+        return self.end_date - timedelta(days=self.days - 1)
+
+
+def parse_device_mix(text: str) -> dict[str, float]:
+    """Parse ``"apple_health=45,oura=10"`` into normalised weights."""
+    weights: dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in DEVICE_METRICS:
+            raise ValueError(f"unknown device {name!r}; expected one of {sorted(DEVICE_METRICS)}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("device mix needs at least one positive weight")
+    return {name: w / total for name, w in weights.items()}
+
+
+def population_user_id(seed: int, index: int) -> str:
+    return str(uuid.uuid5(_NAMESPACE, f"{seed}:{index}"))
+
+
+def _hex_ids(rng: np.random.Generator, n: int) -> list[str]:
+    """``n`` random UUIDs as 32 hex digits (Postgres accepts the unhyphenated form)."""
+    raw = rng.bytes(16 * n).hex()
+    return [raw[k : k + 32] for k in range(0, 32 * n, 32)]
+
+
+def _ar1(rng: np.random.Generator, n: int, phi: float) -> np.ndarray:
+    """Unit-variance AR(1) series."""
+    eps = rng.standard_normal(n) * np.sqrt(1 - phi * phi)
+    out = np.empty(n)
+    prev = rng.standard_normal()
+    for t in range(n):
+        prev = out[t] = phi * prev + eps[t]
+    return out
+
+
+def daily_series(rng: np.random.Generator, weekdays: np.ndarray, fitness: float) -> dict[str, np.ndarray]:
+    """Correlated daily values for every metric in the demo specs.
+
+    Sleep is the driver: a latent sleep score feeds the next day's HRV,
+    HRV moves resting heart rate (down) and readiness (up), and readiness
+    plus the day of week sets steps, from which the activity metrics
+    follow. ``fitness`` is a standard-normal per-user trait that shifts
+    the baselines.
+    """
+    n = len(weekdays)
+    spec = {m[0]: m for m in DAILY_METRIC_SPECS} | {m[0]: m for m in SLEEP_METRIC_SPECS}
+    weekend = weekdays >= 5
+
+    def base(metric: str, per_fitness: float = 0.0) -> float:
+        amplitude = spec[metric][3]
+        return spec[metric][2] + amplitude * (per_fitness * fitness + 0.25 * rng.standard_normal())
+
+    sleep = _ar1(rng, n, 0.4)
+    # Last night's sleep drives today's recovery; HRV has its own persistence.
+    recovery = 0.55 * np.concatenate(([0.0], sleep[:-1])) + 0.45 * sleep
+    hrv_state = 0.6 * recovery + 0.8 * _ar1(rng, n, 0.5)
+    activity = 0.45 * hrv_state + rng.standard_normal(n) * 0.9
+    # Months-long training blocks and lapses, in place of the demo specs' linear 30-day trends.
+    conditioning = _ar1(rng, n, 0.995)
+
+    out: dict[str, np.ndarray] = {}
+    sleep_min = base("sleep_duration") + 20 * weekend + 0.45 * spec["sleep_duration"][3] * sleep
+    out["sleep_duration"] = np.clip(sleep_min, 180, 720)
+    out["sleep_efficiency"] = np.clip(base("sleep_efficiency") + 4 * sleep + rng.normal(0, 2, n), 60, 99)
+    out["deep_sleep_minutes"] = np.clip(out["sleep_duration"] * (0.19 + 0.02 * sleep) + rng.normal(0, 8, n), 10, 240)
+    out["rem_sleep_minutes"] = np.clip(out["sleep_duration"] * 0.22 + rng.normal(0, 10, n), 10, 240)
+    out["sleep_quality"] = np.clip(base("sleep_quality") + 7 * sleep + rng.normal(0, 4, n), 20, 100)
+
+    hrv = base("hrv_ms", 0.6) * (1 + 0.12 * hrv_state + 0.05 * conditioning)
+    out["hrv_ms"] = np.clip(hrv, 8, 200)
+    rhr = base("resting_heart_rate", -0.6) - 2.2 * hrv_state - 1.5 * conditioning + rng.normal(0, 1, n)
+    out["resting_heart_rate"] = np.clip(rhr, 38, 100)
+
+    steps = base("steps", 0.5) * np.exp(0.22 * activity - 0.12 * weekend)
+    out["steps"] = np.clip(steps, 300, 45000)
+    stride = 0.72 + 0.04 * rng.standard_normal()
+    out["distance"] = out["steps"] * stride * rng.normal(1, 0.03, n)
+    out["active_calories"] = np.clip(out["steps"] * 0.052 + rng.normal(0, 40, n), 20, 3000)
+    out["exercise_minutes"] = np.clip((out["steps"] - 4000) / 160 + rng.normal(0, 6, n), 0, 300)
+    out["floors_climbed"] = rng.poisson(np.clip(out["steps"] / 700, 0.5, 80))
+    out["heart_rate_avg"] = out["resting_heart_rate"] + 9 + out["steps"] / 2500 + rng.normal(0, 1.5, n)
+    out["vo2_max"] = base("vo2_max", 1.5) + 1.2 * conditioning + rng.normal(0, 0.3, n)
+    return out
+
+
+def generate_user(config: PopulationConfig, index: int) -> dict[str, list]:
+    """Rows for one user, keyed by table name.
+
+    ``text`` tables hold ready-to-COPY lines; ``csv`` tables hold tuples.
+    """
+    rng = np.random.default_rng([config.seed, index])
+    user_id = population_user_id(config.seed, index)
+    devices = list(config.device_mix)
+    device = devices[rng.choice(len(devices), p=list(config.device_mix.values()))]
+    metrics = DEVICE_METRICS[device]
+    fitness = float(rng.standard_normal())
+
+    days = [config.start_date + timedelta(days=d) for d in range(config.days)]
+    day_iso = [d.isoformat() for d in days]
+    weekdays = np.array([d.weekday() for d in days])
+    series = daily_series(rng, weekdays, fitness)
+    worn = rng.random(config.days) < rng.beta(9, 1.5)
+    slept_with = rng.random(config.days) < rng.beta(6, 2)
+    weigh_ins = rng.random(config.days) < rng.uniform(0.05, 0.5)
+    weight = 62 + 14 * rng.random() - 2 * fitness + np.cumsum(rng.normal(-0.005, 0.08, config.days))
+    created = datetime.combine(config.start_date, datetime.min.time(), timezone.utc)
+
+    rows: dict[str, list] = {table: [] for table, _, _ in TABLES}
+    rows["users"].append(
+        (user_id, f"pop-{config.seed}-{index}@{EMAIL_DOMAIN}", f"Population {index}", True, "balanced", "free", created)
+    )
+    rows["integrations"].append((_hex_ids(rng, 1)[0], user_id, device, True, created, "idle"))
+
+    he, ds = rows["health_events"], rows["daily_summaries"]
+    sleep_metrics = {m[0] for m in SLEEP_METRIC_SPECS}
+    for metric, _, *_ in DAILY_METRIC_SPECS + SLEEP_METRIC_SPECS:
+        if metric not in metrics:
+            continue
+        present = np.flatnonzero(slept_with if metric in sleep_metrics else worn)
+        values = series[metric][present]
+        text = [f"{v:.0f}" for v in values] if metric in _INTEGER_METRICS else [f"{v:.1f}" for v in values]
+        ids = _hex_ids(rng, 2 * len(present))
+        unit = _UNITS[metric]
+        counts = config.samples_per_day + 1 if metric == "heart_rate_avg" and config.samples_per_day else 1
+        for k, (d, v) in enumerate(zip(present, text)):
+            day = day_iso[d]
+            he.append(
+                f"{ids[2 * k]}\t{user_id}\t{metric}\t{v}\t{unit}\t{device}\t{day} 08:00:00+00\t{day}\tdaily_aggregate\n"
+            )
+            ds.append(f"{ids[2 * k + 1]}\t{user_id}\t{day}\t{metric}\t{v}\t{unit}\t{counts}\tf\n")
+
+    if "weight_kg" in metrics:
+        present = np.flatnonzero(weigh_ins)
+        ids = _hex_ids(rng, 2 * len(present))
+        for k, d in enumerate(present):
+            day, v = day_iso[d], f"{weight[d]:.1f}"
+            he.append(
+                f"{ids[2 * k]}\t{user_id}\tweight_kg\t{v}\tkg\t{device}\t{day} 07:30:00+00\t{day}\tpoint_in_time\n"
+            )
+            ds.append(f"{ids[2 * k + 1]}\t{user_id}\t{day}\tweight_kg\t{v}\tkg\t1\tf\n")
+
+    if config.samples_per_day and "heart_rate_avg" in metrics:
+        step = 1440 // config.samples_per_day
+        minutes = np.arange(config.samples_per_day) * step
+        # Lower overnight, peaking mid-afternoon.
+        shape = 8 * np.sin((minutes / 1440 - 0.3) * 2 * np.pi)
+        clock = [f"{m // 60:02d}:{m % 60:02d}:00+00" for m in minutes]
+        for d in np.flatnonzero(worn):
+            day = day_iso[d]
+            values = series["heart_rate_avg"][d] + shape + rng.normal(0, 4, config.samples_per_day)
+            ids = _hex_ids(rng, config.samples_per_day)
+            he.extend(
+                f"{ids[k]}\t{user_id}\theart_rate_avg\t{values[k]:.0f}\tbpm\t{device}\t{day} {clock[k]}\t{day}"
+                "\tpoint_in_time\n"
+                for k in range(config.samples_per_day)
+            )
+
+    _generate_conversations(rng, config, user_id, rows)
+    _generate_insights(rng, config, user_id, rows)
+    return rows
+
+
+@functools.cache
+def _message_templates() -> dict[str, list[str]]:
+    messages = demo_messages()
+    return {role: [m[3] for m in messages if m[2] == role] for role in ("user", "assistant")}
+
+
+@functools.cache
+def _insight_templates() -> list[tuple]:
+    """(type, title, body, data, priority) of each demo card."""
+    return [r[2:7] for r in demo_insight_rows()]
+
+
+def _at(day: date, seconds: float) -> datetime:
+    return datetime.combine(day, datetime.min.time(), timezone.utc) + timedelta(seconds=float(seconds))
+
+
+def _generate_conversations(
+    rng: np.random.Generator, config: PopulationConfig, user_id: str, rows: dict[str, list]
+) -> None:
+    by_role = _message_templates()
+    titles = ["Health check-in", "Training plan for next month", "Sleep questions", "Nutrition review"]
+    for _ in range(rng.poisson(config.conversations_per_month * config.days / 30)):
+        conv_id = str(uuid.UUID(_hex_ids(rng, 1)[0]))
+        started = _at(config.start_date + timedelta(days=int(rng.integers(config.days))), rng.uniform(6, 23) * 3600)
+        turns = 2 * int(rng.integers(1, 9))
+        stamp = started
+        for k, msg_id in enumerate(_hex_ids(rng, turns)):
+            role = "user" if k % 2 == 0 else "assistant"
+            pool = by_role[role]
+            stamp += timedelta(seconds=float(rng.uniform(5, 240)))
+            rows["messages"].append((str(uuid.UUID(msg_id)), conv_id, role, pool[int(rng.integers(len(pool)))], stamp))
+        rows["conversations"].append(
+            (conv_id, user_id, titles[int(rng.integers(len(titles)))], bool(rng.random() < 0.1), started, stamp)
+        )
+
+
+def _generate_insights(rng: np.random.Generator, config: PopulationConfig, user_id: str, rows: dict[str, list]) -> None:
+    templates = _insight_templates()
+    count = rng.poisson(config.insights_per_week * config.days / 7)
+    for insight_id in _hex_ids(rng, count):
+        kind, title, body, data, priority = templates[int(rng.integers(len(templates)))]
+        day = config.start_date + timedelta(days=int(rng.integers(config.days)))
+        created = _at(day, rng.uniform(5, 8) * 3600)
+        read_at = created + timedelta(hours=float(rng.uniform(0.5, 30))) if rng.random() < 0.6 else None
+        dismissed_at = read_at + timedelta(hours=float(rng.uniform(0, 48))) if read_at and rng.random() < 0.5 else None
+        rows["insights"].append(
+            (
+                str(uuid.UUID(insight_id)),
+                user_id,
+                kind,
+                title,
+                body,
+                data,
+                priority,
+                created,
+                read_at,
+                dismissed_at,
+                day,
+            )
+        )
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+
+def _copy(cur, table: str, columns: tuple[str, ...], fmt: str, rows: list) -> None:
+    if not rows:
+        return
+    if fmt == "text":
+        buf = io.StringIO("".join(rows))
+        cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+        return
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def _generate_chunk(config: PopulationConfig, first: int, last: int) -> dict[str, list]:
+    chunk: dict[str, list] = {table: [] for table, _, _ in TABLES}
+    for index in range(first, last):
+        for table, rows in generate_user(config, index).items():
+            chunk[table].extend(rows)
+    return chunk
+
+
+_worker_conn = None
+
+
+def _load_chunk(task: tuple[PopulationConfig, int, int, bool]) -> dict[str, int]:
+    """Generate and COPY one chunk of users in a single transaction."""
+    global _worker_conn
+    config, first, last, dry_run = task
+    if dry_run:
+        return {table: len(rows) for table, rows in _generate_chunk(config, first, last).items()}
+    if _worker_conn is None:
+        _worker_conn = get_connection()
+    with _worker_conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM users WHERE id = %s", (population_user_id(config.seed, first),))
+        if cur.fetchone():
+            _worker_conn.rollback()
+            return {"skipped_users": last - first}
+        chunk = _generate_chunk(config, first, last)
+        for table, columns, fmt in TABLES:
+            _copy(cur, table, columns, fmt, chunk[table])
+    _worker_conn.commit()
+    return {table: len(rows) for table, rows in chunk.items()}
+
+
+def ensure_partitions(cur, start: date, end: date) -> None:
+    """Create the monthly health_events partitions the history lands in."""
+    cur.execute("SELECT to_regprocedure('health_events_ensure_partition(date)') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return
+    month = date(start.year, start.month, 1)
+    while month <= end:
+        cur.execute("SELECT health_events_ensure_partition(%s)", (month,))
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def reset_population(cur) -> None:
+    """Delete every population user and the rows they own."""
+    params = {"pattern": f"%@{EMAIL_DOMAIN}"}
+    owned = "SELECT id FROM users WHERE email LIKE %(pattern)s"
+    cur.execute(
+        f"DELETE FROM messages WHERE conversation_id IN (SELECT id FROM conversations WHERE user_id IN ({owned}))",
+        params,
+    )
+    for table in ("conversations", "insights", "daily_summaries", "health_events", "integrations"):
+        cur.execute(f"DELETE FROM {table} WHERE user_id IN ({owned})", params)
+        print(f"  {table}: {cur.rowcount} rows deleted")
+    cur.execute("DELETE FROM users WHERE email LIKE %(pattern)s", params)
+    print(f"  users: {cur.rowcount} rows deleted")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365, help="history length per user")
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=datetime.now(timezone.utc).date(),
+        help="last day of history (pin it to reproduce a run exactly)",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--device-mix", default=DEFAULT_DEVICE_MIX, help="device=weight pairs")
+    parser.add_argument("--samples-per-day", type=int, default=0, help="intraday heart rate samples per worn day")
+    parser.add_argument("--conversations-per-month", type=float, default=2.0)
+    parser.add_argument("--insights-per-week", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-users", type=int, default=100, help="users per COPY transaction")
+    parser.add_argument("--dry-run", action="store_true", help="generate rows without touching the database")
+    parser.add_argument("--reset", action="store_true", help="delete the population and exit")
+    args = parser.parse_args()
+
+    if args.reset:
+        conn = get_connection()
+        with conn.cursor() as cur:
+            reset_population(cur)
+        conn.commit()
+        conn.close()
+        return
+
+    config = PopulationConfig(
+        users=args.users,
+        days=args.days,
+        end_date=args.end_date,
+        seed=args.seed,
+        device_mix=parse_device_mix(args.device_mix),
+        samples_per_day=args.samples_per_day,
+        conversations_per_month=args.conversations_per_month,
+        insights_per_week=args.insights_per_week,
+    )
+    print(f"\nPopulation: {config.users} users x {config.days} days ending {config.end_date}, seed {config.seed}")
+    print(f"  device mix: {json.dumps({k: round(v, 3) for k, v in config.device_mix.items()})}")
+
+    if not args.dry_run:
+        conn = get_connection()
+        with conn.cursor() as cur:
+            ensure_partitions(cur, config.start_date, config.end_date)
+        conn.commit()
+        conn.close()
+
+    tasks = [
+        (config, first, min(first + args.chunk_users, config.users), args.dry_run)
+        for first in range(0, config.users, args.chunk_users)
+    ]
+    totals: dict[str, int] = {}
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        for done, counts in enumerate(pool.imap_unordered(_load_chunk, tasks), start=1):
+            for table, n in counts.items():
+                totals[table] = totals.get(table, 0) + n
+            rows = sum(n for t, n in totals.items() if t != "skipped_users")
+            elapsed = time.perf_counter() - started
+            print(f"\r  chunks {done}/{len(tasks)}  rows {rows:,}  {rows / elapsed:,.0f} rows/s", end="", flush=True)
+    elapsed = time.perf_counter() - started
+    print(f"\n\nDone in {elapsed:.1f}s.")
+    for table, n in totals.items():
+        print(f"  {table}: {n:,}")
+
+    if not args.dry_run:
+        conn = get_connection()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            for table, _, _ in TABLES:
+                cur.execute(f"ANALYZE {table}")
+        conn.close()
+        print("  tables analyzed")
+
+
+if __name__ == "__main__":
+    main()
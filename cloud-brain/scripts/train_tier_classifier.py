@@ -0,0 +1,139 @@
+"""
+train_tier_classifier.py — fit the local message-tier classifier
+================================================================
+Trains the logistic-regression model used by
+``app.agent.local_classifier.LocalTierClassifier`` from logged LLM
+classifier outcomes and writes ``app/data/tier_classifier_weights.json``.
+
+Training data
+-------------
+Enable ``CLASSIFIER_LOG_OUTCOMES=true`` on the API. Every LLM-decided
+classification is then logged on the ``app.agent.classifier.outcomes``
+logger with ``text`` (normalized message) and ``tier`` fields. Export those
+records as JSON Lines, one object per line::
+
+  {"text": "how has my resting heart rate changed", "tier": "deep_analysis"}
+  {"text": "log a 30 minute walk", "tier": "standard"}
+
+Usage
+-----
+  # From cloud-brain/ directory:
+  uv run python scripts/train_tier_classifier.py outcomes.jsonl
+  uv run python scripts/train_tier_classifier.py outcomes.jsonl --epochs 30 --l2 1e-4
+
+The script prints held-out accuracy and how many held-out messages the
+model would have decided locally at the configured confidence.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.agent.local_classifier import (  # noqa: E402
+    DEFAULT_WEIGHTS_PATH,
+    LocalTierClassifier,
+    extract_features,
+    normalize_text,
+)
+
+
+def _load(path: Path) -> list[tuple[list[str], int]]:
+    samples: list[tuple[list[str], int]] = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            tier = row.get("tier")
+            if tier not in ("deep_analysis", "standard"):
+                continue
+            samples.append((extract_features(normalize_text(row.get("text", ""))), int(tier == "deep_analysis")))
+    return samples
+
+
+def _train(
+    samples: list[tuple[list[str], int]],
+    epochs: int,
+    lr: float,
+    l2: float,
+    seed: int,
+) -> tuple[dict[str, float], float]:
+    """Plain SGD logistic regression with L2 regularisation."""
+    rng = random.Random(seed)
+    weights: dict[str, float] = defaultdict(float)
+    bias = 0.0
+    order = list(range(len(samples)))
+    for epoch in range(epochs):
+        rng.shuffle(order)
+        step = lr / (1 + epoch * 0.1)
+        for i in order:
+            features, label = samples[i]
+            z = bias + sum(weights[f] for f in features)
+            z = max(-30.0, min(30.0, z))
+            grad = 1.0 / (1.0 + math.exp(-z)) - label
+            bias -= step * grad
+            for f in features:
+                weights[f] -= step * (grad + l2 * weights[f])
+    return dict(weights), bias
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("outcomes", type=Path, help="JSONL file of {text, tier} records")
+    parser.add_argument("--out", type=Path, default=DEFAULT_WEIGHTS_PATH)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--lr", type=float, default=0.1)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--min-weight", type=float, default=0.05, help="drop features with |w| below this")
+    parser.add_argument("--holdout", type=float, default=0.1)
+    parser.add_argument("--confidence", type=float, default=0.85)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    samples = _load(args.outcomes)
+    if len(samples) < 50:
+        sys.exit(f"Only {len(samples)} usable samples — need at least 50 to train.")
+
+    random.Random(args.seed).shuffle(samples)
+    n_holdout = max(1, int(len(samples) * args.holdout))
+    holdout, train = samples[:n_holdout], samples[n_holdout:]
+
+    weights, bias = _train(train, args.epochs, args.lr, args.l2, args.seed)
+    weights = {f: round(w, 4) for f, w in sorted(weights.items()) if abs(w) >= args.min_weight}
+
+    model = LocalTierClassifier(weights=weights, bias=bias, confidence=args.confidence)
+    decided = correct = 0
+    for features, label in holdout:
+        z = max(-30.0, min(30.0, bias + sum(weights.get(f, 0.0) for f in features)))
+        p = 1.0 / (1.0 + math.exp(-z))
+        if p >= model.confidence or p <= 1.0 - model.confidence:
+            decided += 1
+            correct += int((p >= 0.5) == bool(label))
+    print(f"train={len(train)} holdout={len(holdout)} features={len(weights)}")
+    accuracy = correct / decided if decided else 0
+    print(f"holdout decided locally: {decided}/{len(holdout)}; accuracy when decided: {accuracy:.3f}")
+
+    payload = {
+        "version": 1,
+        "source": args.outcomes.name,
+        "trained_on": len(train),
+        "bias": round(bias, 4),
+        "weights": weights,
+    }
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2)
+        fh.write("\n")
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
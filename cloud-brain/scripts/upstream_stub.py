@@ -0,0 +1,376 @@
+"""
+upstream_stub.py — local stand-ins for the APIs the backend calls
+==================================================================
+One ASGI app that answers for every upstream the chat, ingest and sync
+paths talk to, so they can be load-tested without network access or API
+spend:
+
+  /openrouter/api/v1/chat/completions
+      OpenAI/OpenRouter-compatible chat completions, both JSON and SSE
+      streaming. Latency is configurable: time to first token, then one
+      token every ``--token-interval`` seconds. Tool calls are scripted by
+      the user message: ``[[tool:get_goals {}]]`` makes the next completion
+      call that tool (several markers give parallel calls), and the
+      completion after the tool results answers in text. JSON mode returns
+      a JSON object; the message classifier gets ``standard``.
+  /supabase/auth/v1/user
+      GoTrue user lookup. A bearer token ``bench:<user id>`` is that user.
+  /fitbit, /oura, /polar, /withings, /strava
+      The endpoints the sync tasks read, with small deterministic payloads
+      derived from the access token and date, after ``--provider-latency``.
+
+The API process reaches the first two through settings
+(``OPENROUTER_BASE_URL`` and ``SUPABASE_URL``). Provider base URLs are
+constants in the sync modules, so ``scripts/bench_e2e_throughput.py``
+runs the sync tasks in its own process and rewrites their requests with
+:data:`UPSTREAM_HOSTS`.
+
+Usage
+-----
+  # From cloud-brain/ directory:
+  uv run python scripts/upstream_stub.py --port 8090 --llm-latency 0.8 --token-interval 0.02
+  OPENROUTER_BASE_URL=http://127.0.0.1:8090/openrouter/api/v1 \\
+  SUPABASE_URL=http://127.0.0.1:8090/supabase \\
+    uv run uvicorn app.main:app --port 8001
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import time
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Upstream host -> path prefix on the stub.
+UPSTREAM_HOSTS: dict[str, str] = {
+    "openrouter.ai": "/openrouter",
+    "api.fitbit.com": "/fitbit",
+    "api.ouraring.com": "/oura",
+    "www.polaraccesslink.com": "/polar",
+    "wbsapi.withings.net": "/withings",
+    "www.strava.com": "/strava",
+}
+
+BENCH_TOKEN_PREFIX = "bench:"
+
+_TOOL_MARKER = re.compile(r"\[\[tool:(\w+)\s*(\{.*?\})?\]\]")
+_REPLY = (
+    "Your recent numbers look steady. Sleep averaged a little over seven hours, resting heart rate "
+    "held flat and step counts were above your weekly goal on five of seven days. Keep the evening "
+    "routine consistent and add one longer walk at the weekend to push the weekly total further."
+).split(" ")
+
+
+@dataclass
+class StubConfig:
+    """Latency and size knobs for the stub."""
+
+    llm_latency: float = 0.5
+    token_interval: float = 0.01
+    completion_tokens: int = 60
+    provider_latency: float = 0.05
+
+
+# ---------------------------------------------------------------------------
+# Chat completions
+# ---------------------------------------------------------------------------
+
+
+def _scripted_tool_calls(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Tool calls requested by the last user message, unless already answered."""
+    for message in reversed(messages):
+        if message.get("role") == "tool":
+            return []
+        if message.get("role") == "user":
+            content = message.get("content")
+            text = content if isinstance(content, str) else json.dumps(content)
+            return [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": args or "{}"},
+                }
+                for name, args in _TOOL_MARKER.findall(text)
+            ]
+    return []
+
+
+def _reply_text(body: dict[str, Any], config: StubConfig) -> str:
+    messages = body.get("messages") or []
+    system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+    if isinstance(system, str) and "message classifier" in system:
+        return "standard"
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps({"foods": [], "summary": "stub"})
+    words = [_REPLY[i % len(_REPLY)] for i in range(max(config.completion_tokens, 1))]
+    return " ".join(words)
+
+
+def _usage(body: dict[str, Any], completion_tokens: int) -> dict[str, int]:
+    prompt_tokens = len(json.dumps(body.get("messages") or [])) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _chunk(completion_id: str, model: str, delta: dict[str, Any], finish_reason: str | None = None) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def _stream(body: dict[str, Any], config: StubConfig) -> AsyncIterator[str]:
+    completion_id = f"gen-{uuid.uuid4().hex}"
+    model = body.get("model", "stub")
+    await asyncio.sleep(config.llm_latency)
+    tool_calls = _scripted_tool_calls(body.get("messages") or []) if body.get("tools") else []
+    if tool_calls:
+        deltas = [{"index": i, **call} for i, call in enumerate(tool_calls)]
+        yield _chunk(completion_id, model, {"role": "assistant", "tool_calls": deltas})
+        yield _chunk(completion_id, model, {}, "tool_calls")
+    else:
+        words = _reply_text(body, config).split(" ")
+        for i, word in enumerate(words):
+            yield _chunk(completion_id, model, {"role": "assistant", "content": word if i == 0 else f" {word}"})
+            if config.token_interval:
+                await asyncio.sleep(config.token_interval)
+        yield _chunk(completion_id, model, {}, "stop")
+    yield "data: [DONE]\n\n"
+
+
+async def _complete(body: dict[str, Any], config: StubConfig) -> dict[str, Any]:
+    tool_calls = _scripted_tool_calls(body.get("messages") or []) if body.get("tools") else []
+    text = "" if tool_calls else _reply_text(body, config)
+    completion_tokens = len(text.split(" ")) if text else 10 * len(tool_calls)
+    await asyncio.sleep(config.llm_latency + config.token_interval * completion_tokens)
+    message: dict[str, Any] = {"role": "assistant", "content": text or None}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return {
+        "id": f"gen-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+        "usage": _usage(body, completion_tokens),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Provider payloads
+# ---------------------------------------------------------------------------
+
+
+def _seed(*parts: str) -> int:
+    return int(hashlib.sha256("|".join(parts).encode()).hexdigest()[:8], 16)
+
+
+def _token(request: Request) -> str:
+    return request.headers.get("authorization", "").removeprefix("Bearer ")
+
+
+def _fitbit(kind: str, day: str, token: str) -> dict[str, Any]:
+    n = _seed(token, day, kind)
+    if kind == "activities":
+        return {
+            "activities": [
+                {
+                    "logId": n,
+                    "activityTypeId": 90009,
+                    "startTime": f"{day}T07:{n % 60:02d}:00.000",
+                    "duration": (1800 + n % 1800) * 1000,
+                    "distance": 3.0 + n % 50 / 10,
+                    "calories": 250 + n % 200,
+                }
+            ],
+            "summary": {"steps": 6000 + n % 6000},
+        }
+    if kind == "sleep":
+        minutes = 360 + n % 120
+        return {
+            "summary": {"totalMinutesAsleep": minutes},
+            "sleep": [{"isMainSleep": True, "efficiency": 80 + n % 20, "minutesAsleep": minutes}],
+        }
+    if kind == "weight":
+        return {"weight": [{"date": day, "weight": 70 + n % 100 / 10, "logId": n}]}
+    return {"summary": {"calories": 1800 + n % 900, "protein": 90.0, "carbs": 220.0, "fat": 70.0}}
+
+
+def _oura(collection: str, params: dict[str, str], token: str) -> dict[str, Any]:
+    start = date.fromisoformat(params.get("start_date") or date.today().isoformat())
+    end = date.fromisoformat(params.get("end_date") or start.isoformat())
+    records = []
+    day = start
+    while day <= end:
+        n = _seed(token, day.isoformat(), collection)
+        record: dict[str, Any] = {"id": f"{collection}-{n}", "day": day.isoformat(), "score": 60 + n % 40}
+        if collection == "daily_sleep":
+            record["total_sleep_duration"] = 6 * 3600 + n % 7200
+        elif collection == "workout":
+            record.update(
+                activity="running",
+                calories=200 + n % 300,
+                distance=4000.0 + n % 4000,
+                start_datetime=f"{day.isoformat()}T18:00:00+00:00",
+                end_datetime=f"{day.isoformat()}T18:45:00+00:00",
+            )
+        records.append(record)
+        day += timedelta(days=1)
+    return {"data": records, "next_token": None}
+
+
+def _withings(endpoint: str, form: dict[str, str], token: str) -> dict[str, Any]:
+    action = form.get("action", "")
+    if action == "getnonce":
+        return {"status": 0, "body": {"nonce": uuid.uuid4().hex}}
+    start = int(form.get("startdate") or time.time() - 7 * 86400)
+    end = int(form.get("enddate") or time.time())
+    days = [start + i * 86400 for i in range(max((end - start) // 86400, 1))]
+    if action == "getmeas":
+        groups = [
+            {
+                "grpid": _seed(token, str(ts)),
+                "date": ts,
+                "measures": [
+                    {"type": 1, "value": 70000 + _seed(token, str(ts)) % 10000, "unit": -3},
+                    {"type": 9, "value": 78, "unit": 0},
+                    {"type": 10, "value": 122, "unit": 0},
+                    {"type": 54, "value": 97, "unit": 0},
+                ],
+            }
+            for ts in days
+        ]
+        return {"status": 0, "body": {"measuregrps": groups}}
+    if action == "getsummary":
+        series = []
+        for ts in days:
+            n = _seed(token, str(ts), "sleep")
+            series.append(
+                {
+                    "date": datetime.fromtimestamp(ts, tz=timezone.utc).date().isoformat(),
+                    "startdate": ts,
+                    "data": {
+                        "lightsleepduration": 14400 + n % 3600,
+                        "deepsleepduration": 5400,
+                        "remsleepduration": 5400,
+                        "sleep_score": 70 + n % 30,
+                    },
+                }
+            )
+        return {"status": 0, "body": {"series": series}}
+    return {"status": 0, "body": {"activities": [], "series": []}}
+
+
+def _strava_activity(activity_id: int) -> dict[str, Any]:
+    started = datetime.now(timezone.utc) - timedelta(hours=activity_id % 240)
+    return {
+        "id": activity_id,
+        "name": "Stub run",
+        "type": "Run",
+        "start_date": started.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "elapsed_time": 1800 + activity_id % 1800,
+        "distance": 5000.0 + activity_id % 5000,
+        "calories": 300 + activity_id % 300,
+    }
+
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+
+
+def create_app(config: StubConfig | None = None) -> FastAPI:
+    """Build the stub app. Tests mount it with ``httpx.ASGITransport``."""
+    config = config or StubConfig()
+    app = FastAPI(title="upstream stub", docs_url=None, redoc_url=None, openapi_url=None)
+    app.state.config = config
+
+    @app.post("/openrouter/api/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if body.get("stream"):
+            return StreamingResponse(_stream(body, config), media_type="text/event-stream")
+        return JSONResponse(await _complete(body, config))
+
+    @app.get("/supabase/auth/v1/user")
+    async def supabase_user(request: Request):
+        token = _token(request)
+        if not token.startswith(BENCH_TOKEN_PREFIX):
+            return JSONResponse({"msg": "invalid JWT"}, status_code=401)
+        user_id = token.removeprefix(BENCH_TOKEN_PREFIX)
+        return {"id": user_id, "email": f"{user_id}@bench.zuralog.dev", "aud": "authenticated"}
+
+    @app.get("/fitbit/{version}/user/-/{path:path}")
+    async def fitbit(request: Request, version: str, path: str):
+        await asyncio.sleep(config.provider_latency)
+        match = re.search(r"(\d{4}-\d{2}-\d{2})", path)
+        day = match.group(1) if match else date.today().isoformat()
+        kind = next((k for k in ("activities", "sleep", "weight", "foods") if k in path), "activities")
+        return _fitbit(kind, day, _token(request))
+
+    @app.get("/oura/v2/{prefix:path}/{collection}")
+    async def oura(request: Request, prefix: str, collection: str):
+        await asyncio.sleep(config.provider_latency)
+        return _oura(collection, dict(request.query_params), _token(request))
+
+    @app.api_route("/polar/{path:path}", methods=["GET", "POST"])
+    async def polar(path: str):
+        await asyncio.sleep(config.provider_latency)
+        return {}
+
+    @app.post("/withings/{endpoint:path}")
+    async def withings(request: Request, endpoint: str):
+        await asyncio.sleep(config.provider_latency)
+        form = {k: str(v) for k, v in (await request.form()).items()}
+        return _withings(endpoint, form, _token(request))
+
+    @app.get("/strava/api/v3/activities/{activity_id}")
+    async def strava_activity(activity_id: int):
+        await asyncio.sleep(config.provider_latency)
+        return _strava_activity(activity_id)
+
+    @app.get("/strava/api/v3/athlete/activities")
+    async def strava_activities(request: Request):
+        await asyncio.sleep(config.provider_latency)
+        page = int(request.query_params.get("page", "1"))
+        if page > 1:
+            return []
+        return [_strava_activity(_seed(_token(request), str(i))) for i in range(10)]
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds before the first token")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="seconds between streamed tokens")
+    parser.add_argument("--completion-tokens", type=int, default=60, help="tokens per text answer")
+    parser.add_argument("--provider-latency", type=float, default=0.05, help="seconds per provider API call")
+    args = parser.parse_args()
+    config = StubConfig(args.llm_latency, args.token_interval, args.completion_tokens, args.provider_latency)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
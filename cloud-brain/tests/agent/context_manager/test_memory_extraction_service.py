@@ -8,7 +8,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from app.agent.context_manager.memory_extraction_service import extract_and_store_memories
-from app.agent.context_manager.memory_store import InMemoryStore, MemoryItem
+from app.agent.context_manager.memory_store import InMemoryStore
 
 
 def _mock_llm_response(facts: list[dict]) -> MagicMock:
@@ -50,7 +50,7 @@ class TestExtractAndStoreMemories:
 
     @pytest.mark.asyncio
     async def test_deduplicates_near_duplicate_facts(self) -> None:
-        """A fact with score > 0.92 against an existing memory updates rather than duplicates."""
+        """A fact that near-duplicates an existing memory updates rather than duplicates."""
         mock_llm = AsyncMock()
         mock_llm.chat.return_value = _mock_llm_response([
             {"content": "User wants to run a marathon", "category": "goal"},
@@ -59,19 +59,7 @@ class TestExtractAndStoreMemories:
         # Pre-populate store with a near-duplicate
         store = InMemoryStore()
         await store.add("user-1", "User wants to complete a marathon", "goal")
-        existing = await store.query("user-1")
-        assert len(existing) == 1
-
-        # Patch InMemoryStore.query to return high score for the near-duplicate
-        original_query = store.query
-
-        async def mock_query(user_id, query_text="", limit=5):
-            if query_text:
-                # Simulate high similarity for the near-duplicate
-                return [MemoryItem(id=existing[0].id, content=existing[0].content, category="goal", score=0.95)]
-            return await original_query(user_id, query_text, limit)
-
-        store.query = mock_query
+        await store.add("user-1", "User has a knee injury", "injury")
 
         with patch(
             "app.agent.context_manager.memory_extraction_service.async_session"
@@ -86,12 +74,9 @@ class TestExtractAndStoreMemories:
 
             await extract_and_store_memories("conv-1", "user-1", mock_llm, store)
 
-        # The old item was deleted and new one added — still only 1 item
-        # (InMemoryStore.query is patched so we check via original)
-        store.query = original_query
+        # The old item was deleted and the new one added; the unrelated one stays.
         items = await store.query("user-1")
-        assert len(items) == 1
-        assert items[0].content == "User wants to run a marathon"
+        assert [i.content for i in items] == ["User has a knee injury", "User wants to run a marathon"]
 
     @pytest.mark.asyncio
     async def test_handles_malformed_llm_response_gracefully(self) -> None:
@@ -0,0 +1,73 @@
+"""Tests for the BM25 + MinHash memory index."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from app.agent.context_manager.memory_index import MemoryIndex, tokenize
+from app.agent.context_manager.memory_store import MemoryItem
+from app.agent.turn_context import MEMORY_QUERY_LIMIT, MEMORY_SCORE_THRESHOLD
+
+_FIXTURE = Path(__file__).parent / "fixtures" / "memory_retrieval.json"
+
+
+def _index(memories: list[dict]) -> MemoryIndex:
+    return MemoryIndex([MemoryItem(id=m["id"], content=m["content"], category=m["category"]) for m in memories])
+
+
+def test_recall_on_labelled_fixture() -> None:
+    users = json.loads(_FIXTURE.read_text())["users"]
+    found = relevant = top_hits = queries = 0
+    for user in users:
+        index = _index(user["memories"])
+        for query in user["queries"]:
+            results = [
+                item.id
+                for item in index.search(query["text"], MEMORY_QUERY_LIMIT)
+                if item.score >= MEMORY_SCORE_THRESHOLD
+            ]
+            found += len(set(results) & set(query["relevant"]))
+            relevant += len(query["relevant"])
+            top_hits += bool(results) and results[0] in query["relevant"]
+            queries += 1
+
+    # Misses are paraphrases with no shared term ("meat" vs "vegetarian").
+    assert found / relevant >= 0.85
+    assert top_hits / queries >= 0.8
+
+
+def test_search_ranks_and_scores_relative_to_best_match() -> None:
+    index = MemoryIndex([
+        MemoryItem(id="1", content="User has a knee injury", category="injury"),
+        MemoryItem(id="2", content="User is training for a marathon", category="goal"),
+        MemoryItem(id="3", content="User's knee hurts on marathon training runs", category="injury"),
+    ])
+
+    results = index.search("my knee hurts after marathon training", limit=5)
+    assert [r.id for r in results] == ["3", "2", "1"]
+    assert results[0].score == 1.0
+    assert all(0 < r.score < 1 for r in results[1:])
+    assert index.search("what should I cook tonight", limit=5) == []
+    assert [r.id for r in index.search("", limit=2)] == ["3", "2"]
+
+
+def test_find_duplicate_uses_term_set_jaccard() -> None:
+    index = MemoryIndex([
+        MemoryItem(id="1", content="User wants to complete a marathon", category="goal"),
+        MemoryItem(id="2", content="User has a knee injury", category="injury"),
+    ])
+
+    match = index.find_duplicate("User wants to run a marathon")
+    assert match is not None and match[0].id == "1"
+    assert match[1] == 0.5
+    assert index.find_duplicate("User has a shoulder injury") is None
+
+    index.remove("1")
+    assert index.find_duplicate("User wants to run a marathon") is None
+    assert "1" not in index and len(index) == 1
+
+
+def test_tokenize_stems_and_drops_stopwords() -> None:
+    assert tokenize("User's knee injuries hurt when running") == ["knee", "injury", "hurt", "run"]
+    assert tokenize("waking") == tokenize("wakes")
@@ -1,4 +1,4 @@
-"""Tests for PgVectorMemoryStore — uses mocked DB and embedding calls."""
+"""Tests for PgVectorMemoryStore — uses a mocked DB session."""
 
 from __future__ import annotations
 
@@ -11,25 +11,30 @@ from app.agent.context_manager.memory_store import MemoryItem
 from app.agent.context_manager.pgvector_memory_store import PgVectorMemoryStore
 
 
-def _fake_embedding(text: str) -> list[float]:
-    """Deterministic fake embedding for testing (not meaningful for similarity)."""
-    import hashlib
-    seed = int(hashlib.md5(text.encode()).hexdigest(), 16)
-    rng = __import__("random").Random(seed)
-    return [rng.uniform(-1, 1) for _ in range(1536)]
+def _row(content: str, category: str = "context") -> MagicMock:
+    row = MagicMock()
+    row.id = str(uuid.uuid4())
+    row.content = content
+    row.category = category
+    return row
+
+
+def _mock_db(rows: list[MagicMock] | None = None) -> AsyncMock:
+    mock_db = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.fetchall.return_value = rows or []
+    mock_db.execute.return_value = mock_result
+    return mock_db
 
 
 class TestPgVectorMemoryStore:
     @pytest.mark.asyncio
-    async def test_add_embeds_and_inserts(self) -> None:
+    async def test_add_inserts(self) -> None:
         store = PgVectorMemoryStore()
 
-        with (
-            patch.object(store, "_embed_sync", side_effect=_fake_embedding),
-            patch(
-                "app.agent.context_manager.pgvector_memory_store.async_session"
-            ) as mock_session_factory,
-        ):
+        with patch(
+            "app.agent.context_manager.pgvector_memory_store.async_session"
+        ) as mock_session_factory:
             mock_db = AsyncMock()
             mock_session_factory.return_value.__aenter__.return_value = mock_db
 
@@ -39,56 +44,49 @@ class TestPgVectorMemoryStore:
             mock_db.commit.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_query_returns_memory_items(self) -> None:
+    async def test_query_ranks_against_message_from_cached_index(self) -> None:
         store = PgVectorMemoryStore()
+        rows = [_row("User has a knee injury", "injury"), _row("User is vegetarian"), _row("User likes yoga")]
 
-        fake_row = MagicMock()
-        fake_row.id = str(uuid.uuid4())
-        fake_row.content = "user has knee injury"
-        fake_row.category = "injury"
-        fake_row.score = 0.85
-
-        with (
-            patch.object(store, "_embed_sync", side_effect=_fake_embedding),
-            patch(
-                "app.agent.context_manager.pgvector_memory_store.async_session"
-            ) as mock_session_factory,
-        ):
-            mock_db = AsyncMock()
-            mock_result = MagicMock()
-            mock_result.fetchall.return_value = [fake_row]
-            mock_db.execute.return_value = mock_result
+        with patch(
+            "app.agent.context_manager.pgvector_memory_store.async_session"
+        ) as mock_session_factory:
+            mock_db = _mock_db(rows)
             mock_session_factory.return_value.__aenter__.return_value = mock_db
 
-            results = await store.query("user1", "running injury")
+            results = await store.query("user1", "my knee hurts")
+            again = await store.query("user1", "any vegetarian recipes?")
 
         assert len(results) == 1
         assert isinstance(results[0], MemoryItem)
-        assert results[0].content == "user has knee injury"
+        assert results[0].content == "User has a knee injury"
         assert results[0].category == "injury"
-        assert results[0].score == 0.85
+        assert results[0].score == 1.0
+        assert [r.content for r in again] == ["User is vegetarian"]
+        # One SELECT builds the index; the second query is served from memory.
+        assert mock_db.execute.await_count == 1
 
     @pytest.mark.asyncio
-    async def test_query_empty_text_returns_empty_list(self) -> None:
+    async def test_query_empty_text_returns_newest(self) -> None:
         store = PgVectorMemoryStore()
-        results = await store.query("user1", query_text="")
-        assert results == []
+
+        with patch(
+            "app.agent.context_manager.pgvector_memory_store.async_session"
+        ) as mock_session_factory:
+            mock_session_factory.return_value.__aenter__.return_value = _mock_db([_row("old"), _row("new")])
+            results = await store.query("user1", query_text="", limit=1)
+
+        assert [r.content for r in results] == ["new"]
 
     @pytest.mark.asyncio
     async def test_user_isolation_different_user_ids(self) -> None:
         """Query uses WHERE user_id = :user_id — verified by checking the SQL call."""
         store = PgVectorMemoryStore()
 
-        with (
-            patch.object(store, "_embed_sync", side_effect=_fake_embedding),
-            patch(
-                "app.agent.context_manager.pgvector_memory_store.async_session"
-            ) as mock_session_factory,
-        ):
-            mock_db = AsyncMock()
-            mock_result = MagicMock()
-            mock_result.fetchall.return_value = []
-            mock_db.execute.return_value = mock_result
+        with patch(
+            "app.agent.context_manager.pgvector_memory_store.async_session"
+        ) as mock_session_factory:
+            mock_db = _mock_db()
             mock_session_factory.return_value.__aenter__.return_value = mock_db
 
             await store.query("user_A", "anything")
@@ -98,6 +96,40 @@ class TestPgVectorMemoryStore:
             params = call_kwargs[0][1] if len(call_kwargs[0]) > 1 else call_kwargs[1]
             assert params.get("user_id") == "user_A"
 
+    @pytest.mark.asyncio
+    async def test_store_facts_replaces_near_duplicates_in_one_session(self) -> None:
+        store = PgVectorMemoryStore()
+        existing = _row("User wants to complete a marathon", "goal")
+
+        with (
+            patch("app.agent.context_manager.pgvector_memory_store.async_session") as mock_session_factory,
+            patch("app.agent.context_manager.pgvector_memory_store.bump_data_version", AsyncMock()) as bump,
+        ):
+            mock_db = _mock_db([existing, _row("User has a knee injury", "injury")])
+            mock_session_factory.return_value.__aenter__.return_value = mock_db
+
+            await store.store_facts(
+                "user1",
+                [("User wants to run a marathon", "goal"), ("User eats 120 g protein daily", "context")],
+                source_conversation_id="conv-1",
+            )
+            results = await store.query("user1", "marathon plan")
+
+        # Index build + one batched DELETE + one batched INSERT, one commit.
+        assert mock_session_factory.call_count == 2
+        assert mock_db.execute.await_count == 3
+        mock_db.commit.assert_awaited_once()
+        delete_params = mock_db.execute.await_args_list[1].args[1]
+        insert_params = mock_db.execute.await_args_list[2].args[1]
+        assert delete_params == [{"id": existing.id, "user_id": "user1"}]
+        assert [p["content"] for p in insert_params] == [
+            "User wants to run a marathon",
+            "User eats 120 g protein daily",
+        ]
+        assert [r.content for r in results] == ["User wants to run a marathon"]
+        # The replaced row was deleted, so other workers must drop their index.
+        bump.assert_awaited_once_with("user1", "memories", redis=None)
+
     @pytest.mark.asyncio
     async def test_delete_scopes_by_user_id(self):
         """delete() must include user_id in the WHERE clause."""
@@ -118,3 +150,82 @@ class TestPgVectorMemoryStore:
         assert "user_id" in captured_params
         assert captured_params["user_id"] == "user-abc"
         assert captured_params["id"] == "mem-123"
+
+
+class TestCrossWorkerInvalidation:
+    @pytest.mark.asyncio
+    async def test_index_rebuilt_when_memories_version_changes(self) -> None:
+        store = PgVectorMemoryStore(redis=MagicMock())
+        versions = [({"epoch": "e", "memories": "1"}, {"epoch": "g"})] * 2
+        versions.append(({"epoch": "e", "memories": "2"}, {"epoch": "g"}))
+
+        with (
+            patch("app.agent.context_manager.pgvector_memory_store.async_session") as mock_session_factory,
+            patch(
+                "app.agent.context_manager.pgvector_memory_store.read_versions",
+                AsyncMock(side_effect=versions),
+            ),
+        ):
+            mock_db = _mock_db([_row("User has a knee injury", "injury")])
+            mock_session_factory.return_value.__aenter__.return_value = mock_db
+
+            await store.query("user1", "knee")
+            await store.query("user1", "knee")
+            assert mock_db.execute.await_count == 1
+
+            # Another worker deleted a memory and bumped the version.
+            mock_db.execute.return_value.fetchall.return_value = []
+            results = await store.query("user1", "knee")
+
+        assert results == []
+        assert mock_db.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_version_read_failure_rebuilds_index(self) -> None:
+        store = PgVectorMemoryStore(redis=MagicMock())
+
+        with (
+            patch("app.agent.context_manager.pgvector_memory_store.async_session") as mock_session_factory,
+            patch(
+                "app.agent.context_manager.pgvector_memory_store.read_versions",
+                AsyncMock(side_effect=ConnectionError("redis down")),
+            ),
+        ):
+            mock_db = _mock_db([_row("User has a knee injury", "injury")])
+            mock_session_factory.return_value.__aenter__.return_value = mock_db
+            await store.query("user1", "knee")
+            await store.query("user1", "knee")
+
+        assert mock_db.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_delete_and_clear_bump_memories_version(self) -> None:
+        redis = MagicMock()
+        store = PgVectorMemoryStore(redis=redis)
+
+        with (
+            patch("app.agent.context_manager.pgvector_memory_store.async_session") as mock_session_factory,
+            patch("app.agent.context_manager.pgvector_memory_store.bump_data_version", AsyncMock()) as bump,
+        ):
+            mock_session_factory.return_value.__aenter__.return_value = _mock_db()
+            await store.delete_memory("mem-1", "user1")
+            await store.clear_memories("user1")
+
+        assert bump.await_args_list == [
+            (("user1", "memories"), {"redis": redis}),
+            (("user1", "memories"), {"redis": redis}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_store_facts_without_replacements_does_not_bump(self) -> None:
+        store = PgVectorMemoryStore(redis=MagicMock())
+
+        with (
+            patch("app.agent.context_manager.pgvector_memory_store.async_session") as mock_session_factory,
+            patch("app.agent.context_manager.pgvector_memory_store.read_versions", AsyncMock(return_value=({}, {}))),
+            patch("app.agent.context_manager.pgvector_memory_store.bump_data_version", AsyncMock()) as bump,
+        ):
+            mock_session_factory.return_value.__aenter__.return_value = _mock_db([_row("User has a knee injury")])
+            await store.store_facts("user1", [("User eats 120 g protein daily", "context")])
+
+        bump.assert_not_awaited()
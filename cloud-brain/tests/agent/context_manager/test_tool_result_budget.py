@@ -0,0 +1,106 @@
+"""Tests for fitting large tool results into the token budget."""
+
+from __future__ import annotations
+
+import json
+from datetime import date, timedelta
+
+from app.agent.context_manager.tool_result_budget import TOO_LARGE_CONTENT, fit_tool_result, lttb
+
+
+def _tokens(text: str) -> int:
+    """~4 characters per token, close enough to cl100k for JSON."""
+    return len(text) // 4
+
+
+def _daily_summary(days: int) -> dict:
+    start = date(2025, 1, 1)
+    records = [
+        {
+            "date": (start + timedelta(days=i)).isoformat(),
+            "steps": 8000 + (i % 7) * 500,
+            "resting_heart_rate_bpm": 55 + i % 5 if i % 3 else None,
+            "hrv_ms": 60.5,
+        }
+        for i in range(days)
+    ]
+    if days > 100:
+        records[100]["steps"] = 42000  # race day
+    return {"data_type": "daily_summary", "records": records, "record_count": days}
+
+
+def test_small_result_is_returned_as_is() -> None:
+    data = _daily_summary(10)
+    content, resolution = fit_tool_result(data, 2000, _tokens)
+    assert resolution == "raw"
+    assert json.loads(content) == data
+
+
+def test_long_range_is_downsampled_with_lttb_and_keeps_extremes() -> None:
+    content, resolution = fit_tool_result(_daily_summary(365), 6000, _tokens)
+    result = json.loads(content)
+    records = result["records"]
+
+    assert resolution == "lttb"
+    assert _tokens(content) <= 6000
+    assert result["data_type"] == "daily_summary" and result["record_count"] == 365
+    assert records["original_count"] == 365 and records["sampled_on"] == "steps"
+    kept_dates = [r["date"] for r in records["rows"]]
+    assert kept_dates[0] == "2025-01-01" and kept_dates[-1] == "2025-12-31"
+    assert "2025-04-11" in kept_dates  # the 42k step outlier survives
+    assert records["summary"]["steps"]["max"] == 42000
+    assert records["summary"]["resting_heart_rate_bpm"]["count"] == 243
+
+
+def test_tight_budget_falls_back_to_calendar_buckets() -> None:
+    content, resolution = fit_tool_result(_daily_summary(365), 1200, _tokens)
+    records = json.loads(content)["records"]
+
+    assert resolution == "month"
+    assert [b["period"] for b in records["buckets"]][:2] == ["2025-01", "2025-02"]
+    assert sum(b["count"] for b in records["buckets"]) == 365
+    january = records["buckets"][0]
+    assert (january["start"], january["end"]) == ("2025-01-01", "2025-01-31")
+    assert january["hrv_ms"] == {"mean": 60.5, "min": 60.5, "max": 60.5}
+
+
+def test_numeric_strings_and_nested_series_are_reduced() -> None:
+    start = date(2024, 1, 1)
+    data = {
+        "activities-steps": [
+            {"dateTime": (start + timedelta(days=i)).isoformat(), "value": str(5000 + i)} for i in range(730)
+        ]
+    }
+    content, resolution = fit_tool_result(data, 1000, _tokens)
+    series = json.loads(content)["activities-steps"]
+
+    assert resolution == "month"
+    assert len(series["buckets"]) == 24
+    assert series["summary"]["value"] == {"count": 730, "mean": 5364.5, "min": 5000.0, "max": 5729.0}
+
+
+def test_result_without_time_series_is_rejected() -> None:
+    data = {"notes": ["x" * 200 for _ in range(200)]}
+    assert fit_tool_result(data, 1000, _tokens) == (TOO_LARGE_CONTENT, "too_large")
+
+
+def test_result_without_time_series_within_byte_cap_is_returned_raw() -> None:
+    # ~31.7 KB of journal text: over the 6000-token budget, under the 32 KB cap.
+    data = {"entries": [{"id": i, "content": "y" * 300} for i in range(100)]}
+    content, resolution = fit_tool_result(data, 6000, _tokens, max_bytes=32768)
+    assert 6000 * 4 < len(content.encode("utf-8")) <= 32768
+    assert resolution == "raw"
+    assert json.loads(content) == data
+
+    data["entries"].extend({"id": i, "content": "y" * 300} for i in range(100, 110))
+    assert fit_tool_result(data, 6000, _tokens, max_bytes=32768) == (TOO_LARGE_CONTENT, "too_large")
+
+
+def test_lttb_keeps_endpoints_and_spikes() -> None:
+    xs = [float(i) for i in range(1000)]
+    ys = [0.0] * 1000
+    ys[437] = 100.0
+    kept = lttb(xs, ys, 20)
+    assert len(kept) == 20
+    assert kept[0] == 0 and kept[-1] == 999 and 437 in kept
+    assert kept == sorted(kept)
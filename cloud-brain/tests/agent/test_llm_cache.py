@@ -0,0 +1,225 @@
+"""
+Zuralog Cloud Brain — LLM Response Cache Tests.
+
+Verifies that opted-in completions are replayed for identical requests,
+that identical in-flight requests share one provider call, and that only
+complete answers are stored.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from openai.types.chat import ChatCompletion
+
+from app.agent.llm_cache import LLMResponseCache, cache_key
+from app.agent.llm_client import LLMClient
+from app.services.telemetry import LLM_CACHE_REQUESTS, LLM_CACHE_SAVED_TOKENS
+
+
+def _completion(content: str = "Morning Run Recap", finish_reason: str = "stop") -> ChatCompletion:
+    return ChatCompletion.model_validate(
+        {
+            "id": "gen-1",
+            "object": "chat.completion",
+            "created": 1_760_000_000,
+            "model": "test/model",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": finish_reason,
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+            "usage": {"prompt_tokens": 40, "completion_tokens": 6, "total_tokens": 46},
+        }
+    )
+
+
+def _request(text: str = "2 eggs and toast", **overrides) -> dict:
+    return {
+        "model": "test/model",
+        "messages": [{"role": "user", "content": text}],
+        "temperature": 0.3,
+        **overrides,
+    }
+
+
+class _FakeRedis:
+    """In-memory subset of redis.asyncio used by the cache."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    def pipeline(self, transaction: bool = True) -> "_FakePipeline":
+        return _FakePipeline(self)
+
+    async def set(self, key: str, value: str, ex: int) -> None:
+        self.values[key], self.ttls[key] = value, ex
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list = []
+
+    def get(self, key: str) -> None:
+        self._ops.append(self._redis.values.get(key))
+
+    def ttl(self, key: str) -> None:
+        self._ops.append(self._redis.ttls.get(key, -2))
+
+    async def execute(self) -> list:
+        return self._ops
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_served_from_cache():
+    cache = LLMResponseCache()
+    call = AsyncMock(return_value=_completion())
+    hits = LLM_CACHE_REQUESTS._values.get(("meal_parse", "hit"), 0)
+    saved = LLM_CACHE_SAVED_TOKENS._values.get(("meal_parse", "prompt"), 0)
+
+    first = await cache.get_or_call("meal_parse", _request(), call)
+    second = await cache.get_or_call("meal_parse", _request(), call)
+    await cache.get_or_call("meal_parse", _request(temperature=0.7), call)
+
+    assert call.await_count == 2
+    assert second.choices[0].message.content == first.choices[0].message.content
+    assert LLM_CACHE_REQUESTS._values[("meal_parse", "hit")] == hits + 1
+    assert LLM_CACHE_SAVED_TOKENS._values[("meal_parse", "prompt")] == saved + 40
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_call():
+    cache = LLMResponseCache()
+    release = asyncio.Event()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return _completion()
+
+    tasks = [asyncio.create_task(cache.get_or_call("conversation_title", _request("hi"), call)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert {r.choices[0].message.content for r in results} == {"Morning Run Recap"}
+
+
+@pytest.mark.asyncio
+async def test_failures_reach_waiters_and_are_not_cached():
+    cache = LLMResponseCache()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(
+        cache.get_or_call("meal_parse", _request(), failing),
+        cache.get_or_call("meal_parse", _request(), failing),
+        return_exceptions=True,
+    )
+
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    retry = AsyncMock(return_value=_completion())
+    await cache.get_or_call("meal_parse", _request(), retry)
+    assert retry.await_count == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("response", "request_overrides"),
+    [
+        (_completion(finish_reason="length"), {}),
+        (_completion(content="  "), {}),
+        (_completion(content='{"foods": ['), {"response_format": {"type": "json_object"}}),
+    ],
+)
+async def test_incomplete_answers_are_not_cached(response, request_overrides):
+    cache = LLMResponseCache()
+    call = AsyncMock(return_value=response)
+
+    await cache.get_or_call("meal_parse", _request(**request_overrides), call)
+    await cache.get_or_call("meal_parse", _request(**request_overrides), call)
+
+    assert call.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_entries_are_shared_through_redis():
+    redis = _FakeRedis()
+    writer, reader = LLMResponseCache(), LLMResponseCache()
+    writer.configure(redis)
+    reader.configure(redis)
+    call = AsyncMock(return_value=_completion())
+
+    await writer.get_or_call("history_summary", _request(), call)
+    restored = await reader.get_or_call("history_summary", _request(), call)
+
+    assert call.await_count == 1
+    assert redis.ttls[cache_key("history_summary", _request())] == 24 * 3600
+    assert restored.usage.completion_tokens == 6
+
+
+@pytest.mark.asyncio
+async def test_unknown_site_bypasses_cache():
+    cache = LLMResponseCache()
+    call = AsyncMock(return_value=_completion())
+
+    await cache.get_or_call("not_a_site", _request(), call)
+    await cache.get_or_call("not_a_site", _request(), call)
+
+    assert call.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_chat_caches_only_opted_in_calls(monkeypatch):
+    cache = LLMResponseCache()
+    monkeypatch.setattr("app.agent.llm_client.llm_response_cache", cache)
+    client = LLMClient.__new__(LLMClient)
+    client.model = "test/model"
+    client._call_with_model = AsyncMock(return_value=_completion())
+    messages = [{"role": "user", "content": "First message"}]
+
+    for _ in range(2):
+        await client.chat(messages, temperature=0.3, reasoning={"effort": "none"}, cache="conversation_title")
+    await client.chat(messages, temperature=0.3, reasoning={"effort": "none"})
+
+    assert client._call_with_model.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_answers_rejected_by_validate_are_not_cached():
+    cache = LLMResponseCache()
+    call = AsyncMock(return_value=_completion(content='{"foods": []}'))
+    request = _request(response_format={"type": "json_object"})
+
+    for _ in range(2):
+        await cache.get_or_call("meal_parse", request, call, validate=lambda response: False)
+
+    assert call.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_chat_does_not_cache_fallback_model_answers(monkeypatch):
+    cache = LLMResponseCache()
+    monkeypatch.setattr("app.agent.llm_client.llm_response_cache", cache)
+    client = LLMClient.__new__(LLMClient)
+    client.model = "test/model"
+    client._chat = AsyncMock(return_value=(_completion(), "fallback/model"))
+    messages = [{"role": "user", "content": "First message"}]
+
+    for _ in range(2):
+        await client.chat(messages, temperature=0.3, cache="conversation_title")
+
+    assert client._chat.await_count == 2
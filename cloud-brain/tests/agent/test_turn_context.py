@@ -0,0 +1,136 @@
+"""Tests for the speculative chat-turn context prefetch."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.agent.context_manager.memory_store import MemoryItem
+from app.agent.turn_context import TurnContextPrefetch, TurnTimings
+
+
+def _make_prefetch(
+    *,
+    memory_enabled: bool = True,
+    memories: list[MemoryItem] | None = None,
+    history_delay: float = 0.0,
+    history_error: Exception | None = None,
+    tools_side_effect=None,
+    sessions: list[MagicMock] | None = None,
+) -> tuple[TurnContextPrefetch, MagicMock, TurnTimings]:
+    @asynccontextmanager
+    async def _fake_session():
+        db = MagicMock()
+        db.rollback = AsyncMock()
+        if sessions is not None:
+            sessions.append(db)
+        yield db
+
+    memory_store = MagicMock()
+    memory_store.query = AsyncMock(return_value=memories or [])
+    mcp_client = MagicMock()
+    mcp_client.get_all_tools.return_value = ["static-tool"]
+    mcp_client.get_tools_for_user = AsyncMock(return_value=["user-tool"], side_effect=tools_side_effect)
+
+    async def _load_history(db):
+        await asyncio.sleep(history_delay)
+        if history_error is not None:
+            raise history_error
+        return [{"role": "user", "content": "earlier"}]
+
+    async def _load_profile(db):
+        return ("profile", "gentle", "low", "detailed", memory_enabled)
+
+    timings = TurnTimings()
+    prefetch = TurnContextPrefetch(
+        session_factory=_fake_session,
+        user_id="user-123",
+        query_text="how did I sleep?",
+        memory_store=memory_store,
+        mcp_client=mcp_client,
+        load_history=_load_history,
+        load_profile=_load_profile,
+        timings=timings,
+    )
+    return prefetch, memory_store, timings
+
+
+class TestTurnContextPrefetch:
+    @pytest.mark.asyncio
+    async def test_join_assembles_all_context(self):
+        memories = [
+            MemoryItem(id="1", content="likes running", category="preference", score=0.9),
+            MemoryItem(id="2", content="irrelevant", category="context", score=0.2),
+        ]
+        prefetch, memory_store, timings = _make_prefetch(memories=memories)
+        prefetch.start()
+        ctx = await prefetch.join()
+
+        assert ctx.history == [{"role": "user", "content": "earlier"}]
+        assert ctx.user_profile == "profile"
+        assert (ctx.persona, ctx.proactivity, ctx.response_length) == ("gentle", "low", "detailed")
+        assert ctx.memory_texts == ["likes running"]
+        assert ctx.mcp_tools == ["user-tool"]
+        memory_store.query.assert_awaited_once_with("user-123", query_text="how did I sleep?", limit=5)
+        assert {"history", "profile", "memory", "tools", "context_wait"} <= timings.as_dict().keys()
+
+    @pytest.mark.asyncio
+    async def test_memory_skipped_when_disabled(self):
+        prefetch, memory_store, _ = _make_prefetch(memory_enabled=False)
+        ctx = await prefetch.join()
+        assert ctx.memory_texts == []
+        memory_store.query.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_loads_overlap_with_caller_work(self):
+        """Context loads run while the caller awaits routing."""
+        prefetch, _, timings = _make_prefetch(history_delay=0.05)
+        prefetch.start()
+        await asyncio.sleep(0.06)  # stands in for classification
+        ctx = await prefetch.join()
+        assert ctx.history
+        assert timings.as_dict()["context_wait"] < 40
+
+    @pytest.mark.asyncio
+    async def test_tool_failure_falls_back_to_static_tools(self):
+        prefetch, _, _ = _make_prefetch(tools_side_effect=RuntimeError("db down"))
+        ctx = await prefetch.join()
+        assert ctx.mcp_tools == ["static-tool"]
+
+    @pytest.mark.asyncio
+    async def test_database_loads_share_one_session(self):
+        sessions: list[MagicMock] = []
+        prefetch, _, _ = _make_prefetch(sessions=sessions)
+        ctx = await prefetch.join()
+        assert len(sessions) == 1
+        assert ctx.history and ctx.user_profile == "profile" and ctx.mcp_tools == ["user-tool"]
+
+    @pytest.mark.asyncio
+    async def test_failed_load_rolls_back_and_later_loads_still_run(self):
+        sessions: list[MagicMock] = []
+        prefetch, _, _ = _make_prefetch(history_error=RuntimeError("db down"), sessions=sessions)
+        ctx = await prefetch.join()
+        assert ctx.history == []
+        assert ctx.mcp_tools == ["user-tool"]
+        sessions[0].rollback.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_pending_loads(self):
+        prefetch, _, _ = _make_prefetch(history_delay=10)
+        prefetch.start()
+        await asyncio.sleep(0)
+        prefetch.cancel()
+        await asyncio.sleep(0)
+        assert all(task.cancelled() or task.done() for task in prefetch._tasks.values())
+
+
+class TestTurnTimings:
+    def test_mark_keeps_first_value(self):
+        timings = TurnTimings()
+        timings.mark("first_token")
+        first = timings.as_dict()["first_token"]
+        timings.mark("first_token")
+        assert timings.as_dict()["first_token"] == first
@@ -0,0 +1,94 @@
+"""Tests for columnar category A/C detection over a cohort of briefs."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.analytics.cohort_signals import detect_cohort_signals
+from app.analytics.health_brief_builder import (
+    DailyMetricsRow,
+    HealthBrief,
+    NutritionRow,
+    SleepRow,
+    UserPreferencesSnapshot,
+    WeightRow,
+)
+from app.analytics.insight_signal_detector import InsightSignalDetector
+
+_NOW = datetime(2026, 3, 18, 6, 0, tzinfo=timezone.utc)
+
+
+def _brief(user_id: str, rng: random.Random) -> HealthBrief:
+    days = rng.randint(0, 31)
+    dates = [(_NOW.date() - timedelta(days=days - 1 - i)).isoformat() for i in range(days)]
+    daily, sleep, weight, nutrition = [], [], [], []
+    for d in dates:
+        row = DailyMetricsRow(date=d)
+        for metric in ("hrv_ms", "steps", "resting_heart_rate", "active_calories", "body_fat_percentage"):
+            if rng.random() < 0.8:
+                setattr(row, metric, rng.choice([rng.uniform(0, 100), float(rng.randint(0, 3)), 50.0]))
+        daily.append(row)
+        if rng.random() < 0.9:
+            sleep.append(SleepRow(date=d, hours=rng.uniform(4, 9), quality_score=rng.choice([None, 80.0])))
+        if rng.random() < 0.6:
+            weight.append(WeightRow(date=d, weight_kg=rng.uniform(70, 80)))
+        if rng.random() < 0.7:
+            nutrition.append(NutritionRow(date=d, calories=rng.uniform(1000, 3000)))
+    return HealthBrief(
+        user_id=user_id,
+        generated_at=_NOW,
+        daily_metrics=daily,
+        sleep_records=sleep,
+        activities=[],
+        nutrition=nutrition,
+        weight=weight,
+        quick_logs=[],
+        goals=[],
+        streaks=[],
+        integrations=[],
+        preferences=UserPreferencesSnapshot(),
+        data_maturity_days=days,
+    )
+
+
+def test_cohort_signals_match_per_user_detector():
+    rng = random.Random(7)
+    briefs = [_brief(f"user-{i}", rng) for i in range(300)]
+
+    cohort = detect_cohort_signals(briefs)
+
+    emitted = 0
+    for brief in briefs:
+        per_user = InsightSignalDetector(brief)
+        assert cohort[brief.user_id].trends == per_user._detect_category_a()
+        assert cohort[brief.user_id].anomalies == per_user._zscore_anomalies(_NOW.date().isoformat())
+        emitted += len(cohort[brief.user_id].trends) + len(cohort[brief.user_id].anomalies)
+    assert emitted > 100
+
+
+def test_trends_keep_first_appearance_order():
+    """A metric first seen on an earlier row is reported first, as in the per-user loop."""
+    rows = []
+    for i in range(15):
+        row = DailyMetricsRow(date=(_NOW.date() - timedelta(days=14 - i)).isoformat(), hrv_ms=40.0 if i < 8 else 80.0)
+        if i >= 1:
+            row.steps = 1000.0 if i < 8 else 5000.0
+        rows.append(row)
+    brief = _brief("ordered", random.Random(0))
+    brief.daily_metrics, brief.sleep_records, brief.weight, brief.nutrition = rows, [], [], []
+
+    trends = detect_cohort_signals([brief])["ordered"].trends
+
+    assert trends == InsightSignalDetector(brief)._detect_category_a()
+    assert [s.metrics[0] for s in trends] == ["hrv_ms", "steps"]
+    assert trends[1].values == {"recent_avg": 5000.0, "previous_avg": 1000.0, "pct_change": 400.0}
+
+
+def test_detector_uses_precomputed_signals():
+    brief = _brief("empty", random.Random(1))
+    brief.daily_metrics = [DailyMetricsRow(date=_NOW.date().isoformat(), steps=1.0)] * 20
+    precomputed = detect_cohort_signals([_brief("x", random.Random(2))])["x"]
+
+    detector = InsightSignalDetector(brief, trends=precomputed.trends, anomalies=[])
+
+    assert detector._detect_category_a() == precomputed.trends
+    assert [s for s in detector._detect_category_c() if s.metrics != ["weight_kg"]] == []
@@ -0,0 +1,104 @@
+"""Tests for the vectorized all-pairs, multi-lag correlation engine."""
+
+from __future__ import annotations
+
+import statistics
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.analytics.correlation_matrix import (
+    compute_cells,
+    dense_matrix,
+    pair_correlation,
+    pearson_all_pairs,
+    pearson_p_value,
+    shift_window,
+    strongest_correlations,
+)
+
+_METRICS = ["sleep_hours", "steps", "hrv_ms"]
+
+
+@pytest.fixture
+def values() -> np.ndarray:
+    rng = np.random.default_rng(7)
+    days = 60
+    sleep = rng.normal(420, 40, days)
+    steps = np.empty(days)
+    steps[0] = 8000
+    steps[1:] = sleep[:-1] * 20 + rng.normal(0, 400, days - 1)  # next-day effect
+    hrv = rng.normal(55, 8, days)
+    out = np.column_stack([sleep, steps, hrv])
+    out[rng.random(out.shape) < 0.15] = np.nan
+    return out
+
+
+def _reference(values: np.ndarray, i: int, j: int, lag: int) -> tuple[float, int]:
+    days = values.shape[0]
+    x, y = values[: days - lag, i], values[lag:, j]
+    mask = ~np.isnan(x) & ~np.isnan(y)
+    return statistics.correlation(x[mask].tolist(), y[mask].tolist()), int(mask.sum())
+
+
+def test_matches_pairwise_reference_at_every_lag(values):
+    r, n = pearson_all_pairs(values, max_lag=3)
+    for lag in range(4):
+        for i in range(3):
+            for j in range(3):
+                if lag == 0 and i == j:
+                    continue
+                expected_r, expected_n = _reference(values, i, j, lag)
+                assert n[lag, i, j] == expected_n
+                assert r[lag, i, j] == pytest.approx(expected_r, abs=1e-9)
+
+
+def test_lag_direction(values):
+    r, _ = pearson_all_pairs(values, max_lag=1)
+    assert r[1, 0, 1] > 0.8  # sleep today → steps tomorrow
+    assert abs(r[1, 1, 0]) < 0.5  # steps today → sleep tomorrow
+
+
+def test_constant_or_sparse_series_is_undefined():
+    values = np.array([[1.0, 5.0], [2.0, 5.0], [3.0, 5.0], [4.0, np.nan]])
+    r, n = pearson_all_pairs(values, max_lag=0)
+    assert np.isnan(r[0, 0, 1])
+    assert n[0, 0, 1] == 3
+    assert pair_correlation(values, 0, 1) == (None, 3, None)
+
+
+def test_p_value_matches_t_distribution():
+    # Reference values from scipy.stats.pearsonr.
+    assert pearson_p_value(0.5, 20) == pytest.approx(0.0247696, rel=1e-4)
+    assert pearson_p_value(-0.3, 50) == pytest.approx(0.0342862, rel=1e-4)
+    assert pearson_p_value(0.0, 30) == pytest.approx(1.0)
+    assert pearson_p_value(0.9, 2) == 1.0
+
+
+def test_compute_cells_and_strongest(values):
+    cells = compute_cells(values, _METRICS)
+    assert not any(c.lag == 0 and c.metric_a == c.metric_b for c in cells)
+    best = strongest_correlations(cells)
+    assert best[0].metric_a == "sleep_hours"
+    assert best[0].metric_b == "steps"
+    assert best[0].lag == 1
+    assert best[0].p_value < 0.05
+
+
+def test_dense_matrix_and_shift():
+    start = date(2026, 1, 1)
+    rows = [
+        (start, "steps", 1000.0),
+        (start + timedelta(days=2), "sleep_hours", 400.0),
+        (start + timedelta(days=9), "steps", 5.0),  # outside the window
+        (start, "unknown", 1.0),
+    ]
+    matrix = dense_matrix(rows, start, 3, _METRICS)
+    assert matrix[0, 1] == 1000.0
+    assert matrix[2, 0] == 400.0
+    assert int((~np.isnan(matrix)).sum()) == 2
+
+    shifted = shift_window(matrix, start, start + timedelta(days=2))
+    assert shifted[0, 0] == 400.0
+    assert np.isnan(shifted[1:]).all()
@@ -101,3 +101,69 @@ def test_dedup_by_source_preserves_multiple_dates():
     ]
     result = _dedup_by_source(rows)
     assert len(result) == 2
+
+
+@pytest.mark.asyncio
+async def test_build_briefs_groups_cohort_rows_per_user():
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+
+    from app.analytics.health_brief_builder import build_briefs
+
+    today = date(2026, 3, 18)
+
+    def _summary(user_id, days_ago, metric_type, value):
+        return SimpleNamespace(
+            user_id=user_id, date=today - timedelta(days=days_ago), metric_type=metric_type, value=value
+        )
+
+    summaries = [
+        _summary("user-a", 1, "steps", 9000),
+        _summary("user-a", 1, "sleep_duration", 450),
+        _summary("user-a", 2, "calories", 2100),
+        _summary("user-a", 2, "exercise_minutes", 30),
+        _summary("user-a", 60, "weight_kg", 81.0),  # outside the 30-day window, inside the weight window
+        _summary("user-a", 3, "weight_kg", 80.0),
+    ]
+    events = [
+        SimpleNamespace(
+            user_id="user-a",
+            metric_type="mood",
+            value=4,
+            metadata_={"text_value": "good"},
+            recorded_at=datetime(2026, 3, 17, tzinfo=timezone.utc),
+        )
+    ]
+    prefs = SimpleNamespace(user_id="user-a", goals=["sleep"], coach_persona="tough_love", timezone="Europe/Paris")
+
+    def _result(rows, scalars=False):
+        result = MagicMock()
+        result.all.return_value = [] if scalars else rows
+        result.scalars.return_value.all.return_value = rows
+        return result
+
+    db = AsyncMock()
+    db.execute.side_effect = [
+        _result(summaries),
+        _result(events),
+        _result([], scalars=True),
+        _result([], scalars=True),
+        _result([prefs], scalars=True),
+        _result([], scalars=True),
+    ]
+
+    briefs = await build_briefs(db, ["user-a", "user-b", "user-a"], target_date=today)
+
+    assert db.execute.await_count == 6
+    assert list(briefs) == ["user-a", "user-b"]
+    a, b = briefs["user-a"], briefs["user-b"]
+    assert [(r.date, r.steps) for r in a.daily_metrics] == [("2026-03-17", 9000.0)]
+    assert a.sleep_records[0].hours == 7.5
+    assert a.activities[0].duration_seconds == 1800.0
+    assert a.nutrition[0].calories == 2100.0
+    assert [w.weight_kg for w in a.weight] == [81.0, 80.0]
+    assert a.quick_logs[0].text_value == "good"
+    assert a.preferences.coach_persona == "tough_love" and a.preferences.timezone == "Europe/Paris"
+    assert a.data_maturity_days == 1
+    assert a.estimated_tdee is not None
+    assert b.daily_metrics == [] and b.data_maturity_days == 0 and b.preferences.coach_persona == "balanced"
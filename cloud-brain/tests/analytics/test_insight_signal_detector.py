@@ -357,6 +357,25 @@ def test_detect_correlations_empty_on_no_data():
     assert signals == []
 
 
+def test_detect_correlations_uses_precomputed_cells():
+    """With store cells, category D picks the strongest significant lag per pair."""
+    from app.analytics.correlation_matrix import CorrelationCell
+    from app.analytics.insight_signal_detector import InsightSignalDetector
+
+    cells = [
+        CorrelationCell("sleep_hours", "steps", lag=0, r=0.45, n=60, p_value=0.001),
+        CorrelationCell("sleep_hours", "steps", lag=2, r=0.81, n=58, p_value=0.0001),
+        CorrelationCell("hrv_ms", "resting_heart_rate", lag=0, r=-0.9, n=10, p_value=0.001),  # too few points
+        CorrelationCell("steps", "distance_meters", lag=0, r=0.99, n=60, p_value=0.0),  # trivial pair
+    ]
+    signals = InsightSignalDetector(_brief(), correlations=cells).detect_correlations()
+
+    assert len(signals) == 1
+    assert signals[0].metrics == ["sleep_hours", "steps"]
+    assert signals[0].values == {"correlation": 0.81, "lag_days": 2}
+    assert signals[0].severity == 3
+
+
 # ---------------------------------------------------------------------------
 # Category E — Compound patterns
 # ---------------------------------------------------------------------------
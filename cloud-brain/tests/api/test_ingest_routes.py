@@ -69,10 +69,15 @@ def mock_db():
 
         if is_metric_def:
             result.scalar_one_or_none = MagicMock(return_value=metric_row)
+            # Batched lookups (metric_type IN (...)) get a definition per requested type.
+            requested = query.whereclause.right.value
+            types = requested if isinstance(requested, list) else [requested]
+            defs = [SimpleNamespace(**{**vars(metric_row), "metric_type": mt}) for mt in types]
+            result.scalars = MagicMock(return_value=MagicMock(all=MagicMock(return_value=defs)))
         else:
             result.scalar_one_or_none = MagicMock(return_value=None)
+            result.scalars = MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))
         result.fetchall = MagicMock(return_value=[])
-        result.scalars = MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))
         return result
 
     db.execute = AsyncMock(side_effect=execute_side_effect)
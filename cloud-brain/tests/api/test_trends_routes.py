@@ -49,11 +49,27 @@ def client(mock_auth, mock_db):
     return TestClient(app)
 
 
-def _make_brief(data_maturity_days: int):
-    """Create a minimal HealthBrief stub for testing."""
-    brief = MagicMock()
-    brief.data_maturity_days = data_maturity_days
-    return brief
+def _make_matrix(days_with_data: int = 0, cells: list | None = None, columns: dict | None = None):
+    """Build a CorrelationMatrix ending today with ``days_with_data`` populated days."""
+    from datetime import date, timedelta
+
+    import numpy as np
+
+    from app.analytics.correlation_matrix import CORRELATION_METRICS
+    from app.services.correlation_store import CorrelationMatrix
+
+    metrics = list(CORRELATION_METRICS)
+    values = np.full((90, len(metrics)), np.nan)
+    if days_with_data:
+        values[-days_with_data:, metrics.index("steps")] = 8000.0
+    for metric, series in (columns or {}).items():
+        values[-len(series):, metrics.index(metric)] = series
+    return CorrelationMatrix(
+        window_start=date.today() - timedelta(days=89),
+        metrics=metrics,
+        values=values,
+        cells=cells or [],
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -131,18 +147,10 @@ def test_make_body_strong_and_inverse():
 def test_trends_home_low_maturity_returns_empty_scaffold(client):
     """When the user has fewer than 7 days of data, the response should
     indicate not enough data and return no correlation cards."""
-    from app.analytics.health_brief_builder import HealthBrief
-
-    mock_brief = MagicMock(spec=HealthBrief)
-    mock_brief.data_maturity_days = 3
-
     with patch(
-        "app.api.v1.trends_routes.HealthBriefBuilder"
-    ) as MockBuilder:
-        instance = AsyncMock()
-        instance.build = AsyncMock(return_value=mock_brief)
-        MockBuilder.return_value = instance
-
+        "app.api.v1.trends_routes.get_correlation_matrix",
+        AsyncMock(return_value=_make_matrix(days_with_data=3)),
+    ):
         resp = client.get("/api/v1/trends/home", headers=AUTH_HEADER)
 
     assert resp.status_code == 200
@@ -152,38 +160,16 @@ def test_trends_home_low_maturity_returns_empty_scaffold(client):
 
 
 def test_trends_home_returns_cards_when_signals_detected(client):
-    """When the builder returns mature data and the detector finds a
-    correlation signal, the response should include that card."""
-    from app.analytics.health_brief_builder import HealthBrief
-    from app.analytics.insight_signal_detector import InsightSignal
-
-    mock_brief = MagicMock(spec=HealthBrief)
-    mock_brief.data_maturity_days = 30
-
-    signal = InsightSignal(
-        signal_type="correlation_discovery",
-        category="D",
-        metrics=["sleep_hours", "steps"],
-        values={"correlation": 0.72, "lag_days": 1},
-        severity=3,
-        actionable=False,
-        focus_relevant=False,
-        title_hint="sleep hours linked to steps",
-    )
+    """When the stored matrix is mature and holds a significant
+    correlation, the response should include that card."""
+    from app.analytics.correlation_matrix import CorrelationCell
 
-    with patch(
-        "app.api.v1.trends_routes.HealthBriefBuilder"
-    ) as MockBuilder, patch(
-        "app.api.v1.trends_routes.InsightSignalDetector"
-    ) as MockDetector:
-        builder_instance = AsyncMock()
-        builder_instance.build = AsyncMock(return_value=mock_brief)
-        MockBuilder.return_value = builder_instance
-
-        detector_instance = MagicMock()
-        detector_instance.detect_correlations = MagicMock(return_value=[signal])
-        MockDetector.return_value = detector_instance
+    cell = CorrelationCell("sleep_hours", "steps", lag=1, r=0.72, n=30, p_value=0.0001)
 
+    with patch(
+        "app.api.v1.trends_routes.get_correlation_matrix",
+        AsyncMock(return_value=_make_matrix(days_with_data=30, cells=[cell])),
+    ):
         resp = client.get("/api/v1/trends/home", headers=AUTH_HEADER)
 
     assert resp.status_code == 200
@@ -220,14 +206,10 @@ def test_trends_metrics_returns_metric_types_from_db(client, mock_db):
 
 def test_trends_home_mature_data_but_no_signals(client, mock_db):
     """Mature data with zero correlation signals: has_enough_data=True, has_correlations=False."""
-    brief = _make_brief(data_maturity_days=30)
-    with (
-        patch("app.api.v1.trends_routes.HealthBriefBuilder") as mock_builder,
-        patch("app.api.v1.trends_routes.InsightSignalDetector") as mock_detector,
+    with patch(
+        "app.api.v1.trends_routes.get_correlation_matrix",
+        AsyncMock(return_value=_make_matrix(days_with_data=30)),  # no cells at all
     ):
-        mock_builder.return_value.build = AsyncMock(return_value=brief)
-        mock_detector.return_value.detect_correlations.return_value = []  # no signals at all
-
         response = client.get("/api/v1/trends/home", headers=AUTH_HEADER)
 
     assert response.status_code == 200
@@ -263,15 +245,13 @@ def test_trends_correlation_rejects_invalid_metric(client, mock_auth, mock_db):
 
 def test_trends_correlation_uses_fixed_response_keys(client, mock_auth, mock_db):
     """Data points from the /correlation endpoint use a_value/b_value keys."""
-    row1 = SimpleNamespace(date="2026-01-01", metric_a_value=7.5, metric_b_value=8000.0)
-    row2 = SimpleNamespace(date="2026-01-02", metric_a_value=6.0, metric_b_value=6500.0)
-    mock_db.execute.return_value.fetchall = MagicMock(return_value=[row1, row2])
-    mock_db.execute.return_value.scalar_one_or_none = MagicMock(return_value=None)
+    matrix = _make_matrix(columns={"sleep_hours": [450.0, 360.0], "steps": [8000.0, 6500.0]})
 
-    response = client.get(
-        "/api/v1/trends/correlation?metric_a=sleep_hours&metric_b=steps&days=30",
-        headers=AUTH_HEADER,
-    )
+    with patch("app.api.v1.trends_routes.get_correlation_matrix", AsyncMock(return_value=matrix)):
+        response = client.get(
+            "/api/v1/trends/correlation?metric_a=sleep_hours&metric_b=steps&days=30",
+            headers=AUTH_HEADER,
+        )
 
     assert response.status_code == 200
     data = response.json()
@@ -282,36 +262,14 @@ def test_trends_correlation_uses_fixed_response_keys(client, mock_auth, mock_db)
 
 def test_trends_home_discovered_at_is_null(client, mock_auth, mock_db):
     """Correlation highlights returned by the home endpoint have discovered_at == None."""
-    from app.analytics.health_brief_builder import HealthBrief
-    from app.analytics.insight_signal_detector import InsightSignal
-
-    mock_brief = MagicMock(spec=HealthBrief)
-    mock_brief.data_maturity_days = 30
-
-    signal = InsightSignal(
-        signal_type="correlation_discovery",
-        category="D",
-        metrics=["sleep_hours", "steps"],
-        values={"correlation": 0.72, "lag_days": 1},
-        severity=3,
-        actionable=False,
-        focus_relevant=False,
-        title_hint="sleep hours linked to steps",
-    )
+    from app.analytics.correlation_matrix import CorrelationCell
 
-    with patch(
-        "app.api.v1.trends_routes.HealthBriefBuilder"
-    ) as MockBuilder, patch(
-        "app.api.v1.trends_routes.InsightSignalDetector"
-    ) as MockDetector:
-        builder_instance = AsyncMock()
-        builder_instance.build = AsyncMock(return_value=mock_brief)
-        MockBuilder.return_value = builder_instance
-
-        detector_instance = MagicMock()
-        detector_instance.detect_correlations = MagicMock(return_value=[signal])
-        MockDetector.return_value = detector_instance
+    cell = CorrelationCell("sleep_hours", "steps", lag=1, r=0.72, n=30, p_value=0.0001)
 
+    with patch(
+        "app.api.v1.trends_routes.get_correlation_matrix",
+        AsyncMock(return_value=_make_matrix(days_with_data=30, cells=[cell])),
+    ):
         resp = client.get("/api/v1/trends/home", headers=AUTH_HEADER)
 
     assert resp.status_code == 200
@@ -319,3 +277,31 @@ def test_trends_home_discovered_at_is_null(client, mock_auth, mock_db):
     highlights = data["correlation_highlights"]
     assert len(highlights) >= 1
     assert all(h["discovered_at"] is None for h in highlights)
+
+
+def test_trends_correlations_reads_lagged_pair_from_store(client, mock_auth, mock_db):
+    """/correlations slices the stored matrix and applies the lag to metric_b."""
+    sleep = [420.0, 380.0, 460.0, 400.0, 440.0, 390.0, 470.0, 410.0, 430.0, 450.0]
+    steps = [6000.0] + [s * 20 for s in sleep[:-1]]  # tomorrow's steps track tonight's sleep
+    matrix = _make_matrix(columns={"sleep_hours": sleep, "steps": steps})
+
+    with patch("app.api.v1.trends_routes.get_correlation_matrix", AsyncMock(return_value=matrix)):
+        response = client.get(
+            "/api/v1/trends/correlations?metric_a=sleep_hours&metric_b=steps&lag_days=1&time_range=30d",
+            headers=AUTH_HEADER,
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["sample_size"] == 9
+    assert data["coefficient"] == pytest.approx(1.0)
+    assert data["interpretation"] == "strong_positive"
+    assert len(data["scatter_data"]) == 9
+
+
+def test_trends_correlations_rejects_lag_out_of_range(client, mock_auth, mock_db):
+    response = client.get(
+        "/api/v1/trends/correlations?metric_a=sleep_hours&metric_b=steps&lag_days=7",
+        headers=AUTH_HEADER,
+    )
+    assert response.status_code == 422
@@ -1,9 +1,10 @@
-"""Tests that ingest_single triggers streak updates via ingest_post_processing.
+"""Tests that ingest routes hand streak updates to ingest_post_processing.
 
 Verifies:
-- A "steps" metric triggers StreakTracker.record_activity with streak_type "steps"
-  and streak_type "engagement".
-- An unknown metric type triggers StreakTracker.record_activity with "engagement" only.
+- A "steps" metric maps to the "steps" and "engagement" streak types.
+- An unknown metric type maps to "engagement" only.
+- All affected dates are grouped into one batch call per ingest.
+- Scheduling enqueues the Celery task and falls back to a background task.
 """
 
 from __future__ import annotations
@@ -13,89 +14,59 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from app.services.ingest_post_processing import trigger_streaks_for_metric
+from app.services.ingest_post_processing import (
+    evaluate_ingest_streaks,
+    schedule_ingest_streaks,
+    streak_dates_for_metrics,
+)
+
+_D1 = date(2026, 3, 24)
+_D2 = date(2026, 3, 25)
 
 
 # ---------------------------------------------------------------------------
-# Unit tests for trigger_streaks_for_metric directly
+# streak_dates_for_metrics
 # ---------------------------------------------------------------------------
 
 
-@pytest.mark.asyncio
-async def test_steps_metric_triggers_steps_and_engagement():
-    """Steps metric triggers both 'steps' and 'engagement' streak types."""
-    mock_db = AsyncMock()
+def test_steps_metric_maps_to_steps_and_engagement():
+    assert streak_dates_for_metrics([("steps", _D2)]) == {"steps": [_D2], "engagement": [_D2]}
 
-    with patch(
-        "app.services.ingest_post_processing.StreakTracker"
-    ) as MockTracker:
-        instance = AsyncMock()
-        instance.record_activity = AsyncMock(return_value=MagicMock())
-        MockTracker.return_value = instance
 
-        await trigger_streaks_for_metric(
-            db=mock_db,
-            user_id="test-user-abc",
-            metric_type="steps",
-            activity_date=date(2026, 3, 25),
-        )
+def test_unknown_metric_maps_to_engagement_only():
+    assert streak_dates_for_metrics([("heart_rate_variability", _D2)]) == {"engagement": [_D2]}
 
-    assert instance.record_activity.call_count == 2
-    calls = instance.record_activity.call_args_list
-    streak_types_called = [c.kwargs["streak_type"] for c in calls]
-    assert "steps" in streak_types_called
-    assert "engagement" in streak_types_called
 
+def test_workout_duration_maps_to_workouts_and_engagement():
+    assert set(streak_dates_for_metrics([("workout_duration", _D2)])) == {"workouts", "engagement"}
 
-@pytest.mark.asyncio
-async def test_unknown_metric_triggers_engagement_only():
-    """An unknown/unmapped metric triggers only the 'engagement' streak type."""
-    mock_db = AsyncMock()
 
-    with patch(
-        "app.services.ingest_post_processing.StreakTracker"
-    ) as MockTracker:
-        instance = AsyncMock()
-        instance.record_activity = AsyncMock(return_value=MagicMock())
-        MockTracker.return_value = instance
+def test_dates_are_deduplicated_and_sorted_per_streak_type():
+    grouped = streak_dates_for_metrics([("steps", _D2), ("hrv_ms", _D1), ("steps", _D1), ("workouts", _D2)])
+    assert grouped == {"steps": [_D1, _D2], "engagement": [_D1, _D2], "workouts": [_D2]}
 
-        await trigger_streaks_for_metric(
-            db=mock_db,
-            user_id="test-user-abc",
-            metric_type="heart_rate_variability",
-            activity_date=date(2026, 3, 25),
-        )
 
-    assert instance.record_activity.call_count == 1
-    call = instance.record_activity.call_args_list[0]
-    assert call.kwargs["streak_type"] == "engagement"
+# ---------------------------------------------------------------------------
+# evaluate_ingest_streaks
+# ---------------------------------------------------------------------------
 
 
 @pytest.mark.asyncio
-async def test_workout_duration_triggers_workouts_and_engagement():
-    """workout_duration metric triggers 'workouts' and 'engagement'."""
+async def test_evaluate_makes_one_batch_call():
     mock_db = AsyncMock()
 
-    with patch(
-        "app.services.ingest_post_processing.StreakTracker"
-    ) as MockTracker:
-        instance = AsyncMock()
-        instance.record_activity = AsyncMock(return_value=MagicMock())
+    with patch("app.services.ingest_post_processing.StreakTracker") as MockTracker:
+        instance = MagicMock()
+        instance.record_activity_batch = AsyncMock(return_value={"steps": (2, 2, _D2)})
         MockTracker.return_value = instance
 
-        await trigger_streaks_for_metric(
-            db=mock_db,
-            user_id="test-user-abc",
-            metric_type="workout_duration",
-            activity_date=date(2026, 3, 25),
-        )
+        updated = await evaluate_ingest_streaks(mock_db, "test-user-abc", [("steps", _D1), ("steps", _D2)])
 
-    streak_types_called = [
-        c.kwargs["streak_type"]
-        for c in instance.record_activity.call_args_list
-    ]
-    assert "workouts" in streak_types_called
-    assert "engagement" in streak_types_called
+    instance.record_activity_batch.assert_awaited_once()
+    user_id, dates_by_type, _ = instance.record_activity_batch.await_args.args
+    assert user_id == "test-user-abc"
+    assert dates_by_type == {"steps": [_D1, _D2], "engagement": [_D1, _D2]}
+    assert updated == {"steps": (2, 2, _D2)}
 
 
 @pytest.mark.asyncio
@@ -103,17 +74,48 @@ async def test_streak_failure_does_not_raise():
     """A StreakTracker error must be swallowed — never propagated to the caller."""
     mock_db = AsyncMock()
 
-    with patch(
-        "app.services.ingest_post_processing.StreakTracker"
-    ) as MockTracker:
-        instance = AsyncMock()
-        instance.record_activity = AsyncMock(side_effect=RuntimeError("DB exploded"))
+    with patch("app.services.ingest_post_processing.StreakTracker") as MockTracker:
+        instance = MagicMock()
+        instance.record_activity_batch = AsyncMock(side_effect=RuntimeError("DB exploded"))
         MockTracker.return_value = instance
 
-        # Should not raise
-        await trigger_streaks_for_metric(
-            db=mock_db,
-            user_id="test-user-abc",
-            metric_type="steps",
-            activity_date=date(2026, 3, 25),
-        )
+        assert await evaluate_ingest_streaks(mock_db, "test-user-abc", [("steps", _D2)]) == {}
+
+    mock_db.rollback.assert_awaited_once()
+
+
+# ---------------------------------------------------------------------------
+# schedule_ingest_streaks
+# ---------------------------------------------------------------------------
+
+
+def test_schedule_enqueues_celery_task():
+    background = MagicMock()
+    with patch("app.tasks.streak_tasks.evaluate_streaks_for_ingest") as task:
+        schedule_ingest_streaks(background, "u1", [("steps", _D2), ("steps", _D1), ("steps", _D2)])
+
+    task.delay.assert_called_once_with(
+        user_id="u1", metric_dates=[["steps", "2026-03-24"], ["steps", "2026-03-25"]]
+    )
+    background.add_task.assert_not_called()
+
+
+def test_schedule_falls_back_to_background_task():
+    background = MagicMock()
+    redis = MagicMock()
+    with patch("app.tasks.streak_tasks.evaluate_streaks_for_ingest") as task:
+        task.delay.side_effect = ConnectionError("broker down")
+        schedule_ingest_streaks(background, "u1", [("steps", _D2)], redis=redis)
+
+    background.add_task.assert_called_once()
+    # The in-process fallback bumps data versions on the API's shared client.
+    assert background.add_task.call_args.args[1:] == ("u1", [("steps", _D2)], redis)
+
+
+def test_schedule_nothing_for_empty_ingest():
+    background = MagicMock()
+    with patch("app.tasks.streak_tasks.evaluate_streaks_for_ingest") as task:
+        schedule_ingest_streaks(background, "u1", [])
+
+    task.delay.assert_not_called()
+    background.add_task.assert_not_called()
@@ -20,6 +20,12 @@ import pytest
 # ---------------------------------------------------------------------------
 
 
+def _request(redis=None) -> MagicMock:
+    request = MagicMock()
+    request.app.state.redis = redis
+    return request
+
+
 @pytest.mark.asyncio
 async def test_create_journal_entry_triggers_checkin_streak():
     """POST journal upsert calls StreakTracker with streak_type='checkin'."""
@@ -68,13 +74,15 @@ async def test_create_journal_entry_triggers_checkin_streak():
         instance.record_activity = AsyncMock(return_value=MagicMock())
         MockTracker.return_value = instance
 
-        await create_journal_entry(body=body, user_id="user-001", db=mock_db)
+        redis = MagicMock()
+        await create_journal_entry(request=_request(redis), body=body, user_id="user-001", db=mock_db)
 
     instance.record_activity.assert_called_once()
     call_kwargs = instance.record_activity.call_args.kwargs
     assert call_kwargs["streak_type"] == "checkin"
     assert call_kwargs["user_id"] == "user-001"
     assert call_kwargs["activity_date"] == date(2026, 3, 25)
+    assert call_kwargs["redis"] is redis
 
 
 @pytest.mark.asyncio
@@ -119,7 +127,7 @@ async def test_update_journal_entry_triggers_checkin_streak():
         MockTracker.return_value = instance
 
         await update_journal_entry(
-            entry_id="entry-002", body=body, user_id="user-001", db=mock_db
+            request=_request(), entry_id="entry-002", body=body, user_id="user-001", db=mock_db
         )
 
     instance.record_activity.assert_called_once()
@@ -169,6 +177,6 @@ async def test_journal_streak_failure_does_not_block_response():
         MockTracker.return_value = instance
 
         # Should not raise
-        result = await create_journal_entry(body=body, user_id="user-001", db=mock_db)
+        result = await create_journal_entry(request=_request(), body=body, user_id="user-001", db=mock_db)
 
     assert result["date"] == "2026-03-25"
@@ -63,6 +63,8 @@ def _make_summary_row(metric_date: date, metric_type: str, value: float) -> Magi
 def _mock_db_with_rows(mock_db: AsyncMock, rows: list) -> None:
     result_mock = MagicMock()
     result_mock.scalars.return_value.all.return_value = rows
+    # all-data selects (date, metric_type, value) tuples instead of ORM rows.
+    result_mock.all.return_value = [(r.date, r.metric_type, r.value) for r in rows]
     mock_db.execute = AsyncMock(return_value=result_mock)
 
 
@@ -15,6 +15,7 @@ Fixtures:
         (yields tuple of client, mock_auth, mock_db).
 """
 
+import os
 import sys
 import types
 from unittest.mock import AsyncMock
@@ -22,6 +23,10 @@ from unittest.mock import AsyncMock
 import pytest
 from fastapi.testclient import TestClient
 
+# Fail the request that crosses its SQL statement budget instead of logging,
+# so an N+1 loop fails the suite. Set before ``app.config`` is imported.
+os.environ.setdefault("DB_QUERY_BUDGET_MODE", "raise")
+
 # ---------------------------------------------------------------------------
 # Pre-import stubs for Phase-2 routes that are incompatible with Python 3.14.
 # These stubs must be inserted before ``app.main`` is imported so that the
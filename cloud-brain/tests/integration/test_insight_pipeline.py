@@ -9,6 +9,8 @@ Covered scenarios:
 - Date-lock prevents a second run for the same day.
 - Immature accounts (< 7 days of data) get a welcome card, no LLM call.
 - fan_out_daily_insights enqueues tasks only for users whose local time is 6 AM.
+- The cohort pipeline honours the date-lock, writes welcome cards and LLM
+  cards, and persists the whole cohort with one insert.
 """
 
 import pytest
@@ -171,7 +173,9 @@ async def test_fan_out_enqueues_users_at_6am():
     User 1: UTC timezone, 6 AM UTC  → should be enqueued.
     User 2: Asia/Karachi (UTC+5), so local time is 11 AM → should NOT be enqueued.
     """
-    from app.tasks.insight_tasks import _fan_out_async
+    from app.config import settings
+    from app.services.task_dispatch import DispatchResult
+    from app.tasks.insight_tasks import _fan_out_async, generate_insights_for_user
 
     # 6:00 AM UTC on a fixed date
     test_utc_now = datetime(2026, 3, 18, 6, 0, 0, tzinfo=timezone.utc)
@@ -183,21 +187,137 @@ async def test_fan_out_enqueues_users_at_6am():
     mock_result.all.return_value = mock_rows
     mock_db.execute.return_value = mock_result
 
-    enqueued_users: list[str] = []
-
     with (
         patch("app.tasks.insight_tasks.async_session") as mock_session_ctx,
         patch("app.tasks.insight_tasks.datetime") as mock_datetime,
-        patch("app.tasks.insight_tasks.generate_insights_for_user") as mock_task,
+        patch("app.tasks.insight_tasks.dispatch_many", return_value=DispatchResult(published=1)) as mock_dispatch,
+        patch.object(settings, "insight_cohort_size", 0),
     ):
         mock_session_ctx.return_value.__aenter__ = AsyncMock(return_value=mock_db)
         mock_session_ctx.return_value.__aexit__ = AsyncMock(return_value=None)
         # Patch datetime.now so the fan-out sees our fixed UTC time
         mock_datetime.now.return_value = test_utc_now
-        mock_task.delay = MagicMock(side_effect=lambda uid, tz="UTC": enqueued_users.append(uid))
 
         result = await _fan_out_async()
 
+    task, calls = mock_dispatch.call_args.args
+    enqueued_users = [uid for uid, _tz in calls]
+    assert task is generate_insights_for_user
     assert "user-utc" in enqueued_users
     assert "user-karachi" not in enqueued_users
     assert result["enqueued"] == 1
+
+
+# ---------------------------------------------------------------------------
+# Cohort mode
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_fan_out_chunks_due_users_into_cohorts():
+    """With INSIGHT_COHORT_SIZE set, due users are enqueued as cohort tasks."""
+    from app.config import settings
+    from app.services.task_dispatch import DispatchResult
+    from app.tasks.insight_tasks import _fan_out_async, generate_insights_for_cohort
+
+    test_utc_now = datetime(2026, 3, 18, 6, 0, 0, tzinfo=timezone.utc)
+    mock_rows = [("u1", "UTC"), ("u2", None), ("u3", "Europe/London"), ("u4", "Asia/Karachi")]
+
+    mock_db = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.all.return_value = mock_rows
+    mock_db.execute.return_value = mock_result
+
+    with (
+        patch("app.tasks.insight_tasks.async_session") as mock_session_ctx,
+        patch("app.tasks.insight_tasks.datetime") as mock_datetime,
+        patch("app.tasks.insight_tasks.dispatch_many", return_value=DispatchResult(published=2)) as mock_dispatch,
+        patch.object(settings, "insight_cohort_size", 2),
+    ):
+        mock_session_ctx.return_value.__aenter__ = AsyncMock(return_value=mock_db)
+        mock_session_ctx.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_datetime.now.return_value = test_utc_now
+
+        result = await _fan_out_async()
+
+    task, calls = mock_dispatch.call_args.args
+    chunks = [args[0] for args in calls]
+    assert task is generate_insights_for_cohort
+    assert chunks == [[["u1", "UTC"], ["u2", "UTC"]], [["u3", "Europe/London"]]]
+    mock_dispatch.assert_called_once()
+    assert result == {"enqueued": 3, "tasks": 2, "failed": 0}
+
+
+@pytest.mark.asyncio
+async def test_cohort_pipeline_persists_all_cards_in_one_insert():
+    """Date-locked users are skipped; welcome and LLM cards land in one INSERT."""
+    from app.analytics.health_brief_builder import DailyMetricsRow, HealthBrief, UserPreferencesSnapshot
+    from app.tasks.insight_tasks import _run_cohort_async
+
+    today = date.today()
+
+    def _brief(user_id: str, days: int) -> HealthBrief:
+        daily = [
+            DailyMetricsRow(date=(today - timedelta(days=i)).isoformat(), steps=8000.0 if i >= 7 else 5000.0)
+            for i in reversed(range(days))
+        ]
+        return HealthBrief(
+            user_id=user_id,
+            generated_at=datetime.now(timezone.utc),
+            daily_metrics=daily,
+            sleep_records=[],
+            activities=[],
+            nutrition=[],
+            weight=[],
+            quick_logs=[],
+            goals=[],
+            streaks=[],
+            integrations=[],
+            preferences=UserPreferencesSnapshot(),
+            data_maturity_days=days,
+        )
+
+    briefs = {"new-user": _brief("new-user", 3), "mature-user": _brief("mature-user", 30)}
+    lock_result = MagicMock()
+    lock_result.all.return_value = [("locked-user", today)]
+    insert_result = MagicMock()
+    insert_result.all.return_value = [("new-user",), ("mature-user",)]
+    read_db = AsyncMock()
+    read_db.execute = AsyncMock(return_value=lock_result)
+    write_db = AsyncMock()
+    write_db.execute = AsyncMock(return_value=insert_result)
+    read_closed = AsyncMock(return_value=False)
+    sessions = MagicMock()
+    sessions.return_value.__aenter__ = AsyncMock(side_effect=[read_db, write_db])
+    sessions.return_value.__aexit__ = read_closed
+
+    llm_card_json = '[{"type":"trend_decline","title":"Steps dropping","body":"Down 37%.","priority":3}]'
+    mock_llm_response = MagicMock()
+    mock_llm_response.choices = [MagicMock(message=MagicMock(content=llm_card_json))]
+
+    async def _chat(*args, **kwargs):
+        # The read session must already be released while the LLM runs.
+        assert read_closed.await_count == 1
+        return mock_llm_response
+
+    with (
+        patch("app.tasks.insight_tasks.build_briefs", AsyncMock(return_value=briefs)) as mock_build,
+        patch("app.tasks.insight_tasks.get_correlation_matrix", AsyncMock(side_effect=RuntimeError)),
+        patch("app.tasks.insight_tasks.bump_data_version", AsyncMock()) as mock_bump,
+        patch("app.analytics.insight_card_writer.LLMClient") as MockLLM,
+    ):
+        MockLLM.return_value.chat = AsyncMock(side_effect=_chat)
+        users = [["locked-user", "UTC"], ["new-user", "UTC"], ["mature-user", "UTC"]]
+        result = await _run_cohort_async(users, sessions)
+
+    assert mock_build.await_args.args == (read_db, ["new-user", "mature-user"])
+    read_db.execute.assert_awaited_once()  # date-lock
+    read_db.commit.assert_not_awaited()
+    write_db.execute.assert_awaited_once()  # one INSERT for the whole cohort
+    inserted = write_db.execute.await_args.args[0].compile().params
+    assert {v for k, v in inserted.items() if k.startswith("signal_type")} == {"first_week", "trend_decline"}
+    write_db.commit.assert_awaited_once()
+    assert read_closed.await_count == 2
+    mock_bump.assert_awaited_once_with(["new-user", "mature-user"])
+    assert result["statuses"] == {"skipped_date_lock": 1, "ok": 2}
+    assert result["insights_written"] == 2
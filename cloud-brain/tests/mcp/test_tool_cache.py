@@ -0,0 +1,157 @@
+"""
+Zuralog Cloud Brain — MCP Client Read-Tool Cache Tests.
+
+Verifies that cacheable read tools are memoized per user and canonical
+arguments, and that data version bumps and write tools invalidate them.
+"""
+
+import pytest
+
+from app.agent.mcp_client import MCPClient
+from app.mcp_servers.base_server import BaseMCPServer
+from app.mcp_servers.models import Resource, ToolDefinition, ToolResult
+from app.mcp_servers.registry import MCPServerRegistry
+from app.services.data_version import SCOPE_DATA, SCOPE_GOALS, bump_data_version
+from app.services.telemetry import TOOL_CACHE_REQUESTS
+
+
+class _FakeRedis:
+    """In-memory subset of redis.asyncio used by data_version."""
+
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    def pipeline(self, transaction: bool = True) -> "_FakePipeline":
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self._ops.append((name, args))
+
+        return queue
+
+    async def execute(self) -> list:
+        results = []
+        for name, args in self._ops:
+            h = self._redis.hashes.setdefault(args[0], {})
+            if name == "hsetnx":
+                results.append(int(args[1] not in h))
+                h.setdefault(args[1], args[2])
+            elif name == "hincrby":
+                h[args[1]] = str(int(h.get(args[1], "0")) + args[2])
+                results.append(int(h[args[1]]))
+            elif name == "hgetall":
+                results.append(dict(h))
+            else:  # expire
+                results.append(True)
+        return results
+
+
+class GoalsServer(BaseMCPServer):
+    """Mock server with one cacheable read tool and one write tool."""
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.fail_reads = False
+
+    @property
+    def name(self) -> str:
+        return "goals_server"
+
+    @property
+    def description(self) -> str:
+        return "Mock goals server."
+
+    def get_tools(self) -> list[ToolDefinition]:
+        return [
+            ToolDefinition(
+                name="get_goals",
+                description="List goals.",
+                cache_ttl_seconds=300,
+                cache_scopes=(SCOPE_GOALS,),
+            ),
+            ToolDefinition(name="create_goal", description="Create a goal.", invalidates=(SCOPE_GOALS,)),
+            ToolDefinition(name="ping", description="Uncached tool."),
+        ]
+
+    async def execute_tool(self, tool_name: str, params: dict, user_id: str) -> ToolResult:
+        self.calls.append(tool_name)
+        if tool_name == "get_goals" and self.fail_reads:
+            return ToolResult(success=False, error="db down")
+        return ToolResult(success=True, data={"goals": [{"title": "10k steps"}], "params": params})
+
+    async def get_resources(self, user_id: str) -> list[Resource]:
+        return []
+
+
+def _client(redis=None) -> tuple[MCPClient, GoalsServer]:
+    server = GoalsServer()
+    registry = MCPServerRegistry()
+    registry.register(server)
+    return MCPClient(registry=registry, redis=redis), server
+
+
+@pytest.mark.asyncio
+async def test_same_arguments_are_served_from_cache() -> None:
+    client, server = _client(_FakeRedis())
+    hits_before = TOOL_CACHE_REQUESTS._values.get(("get_goals", "hit"), 0)
+
+    first = await client.execute_tool("get_goals", {"status": "active", "limit": 5}, "user-1")
+    first.data["goals"].clear()  # callers mutating a result must not corrupt the cache
+    second = await client.execute_tool("get_goals", {"limit": 5, "status": "active"}, "user-1")
+    await client.execute_tool("get_goals", {"limit": 10, "status": "active"}, "user-1")
+    await client.execute_tool("get_goals", {"limit": 5, "status": "active"}, "user-2")
+
+    assert server.calls == ["get_goals", "get_goals", "get_goals"]
+    assert second.data["goals"] == [{"title": "10k steps"}]
+    assert TOOL_CACHE_REQUESTS._values[("get_goals", "hit")] == hits_before + 1
+
+
+@pytest.mark.asyncio
+async def test_data_version_bump_from_another_writer_invalidates() -> None:
+    redis = _FakeRedis()
+    client, server = _client(redis)
+
+    await client.execute_tool("get_goals", {}, "user-1")
+    await bump_data_version("user-1", SCOPE_DATA, redis=redis)
+    await client.execute_tool("get_goals", {}, "user-1")
+    assert server.calls == ["get_goals"]  # unrelated scope
+
+    await bump_data_version("user-1", SCOPE_GOALS, redis=redis)
+    await client.execute_tool("get_goals", {}, "user-1")
+    assert server.calls == ["get_goals", "get_goals"]
+
+
+@pytest.mark.asyncio
+async def test_write_tool_drops_entries_and_bumps_its_scopes() -> None:
+    redis = _FakeRedis()
+    client, server = _client(redis)
+
+    await client.execute_tool("get_goals", {}, "user-1")
+    await client.execute_tool("create_goal", {"title": "Sleep 8h"}, "user-1")
+    await client.execute_tool("get_goals", {}, "user-1")
+
+    assert server.calls == ["get_goals", "create_goal", "get_goals"]
+    assert redis.hashes["data_version:user-1"][SCOPE_GOALS] == "1"
+
+
+@pytest.mark.asyncio
+async def test_without_redis_caches_by_ttl_and_skips_failures() -> None:
+    client, server = _client()
+    server.fail_reads = True
+
+    await client.execute_tool("get_goals", {}, "user-1")
+    server.fail_reads = False
+    await client.execute_tool("get_goals", {}, "user-1")
+    await client.execute_tool("get_goals", {}, "user-1")
+    await client.execute_tool("ping", {}, "user-1")
+    await client.execute_tool("ping", {}, "user-1")
+
+    assert server.calls == ["get_goals", "get_goals", "ping", "ping"]
+    assert ("ping", "miss") not in TOOL_CACHE_REQUESTS._values
@@ -185,3 +185,17 @@ class TestEndpointLatency:
             f"{LATENCY_THRESHOLD_MS} ms threshold "
             f"(all latencies: {[f'{lat:.1f}' for lat in latencies]})"
         )
+
+    def test_middleware_applies_security_headers(self) -> None:
+        """The single ASGI middleware layer still sets every security header.
+
+        Guards the pure-ASGI rewrite of the former BaseHTTPMiddleware
+        stack: headers are injected in ``send`` without an extra task per
+        request.
+        """
+        response, latency_ms = _measure_latency(self.client, "GET", "/health")
+
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert response.headers["x-frame-options"] == "DENY"
+        assert response.headers["strict-transport-security"].startswith("max-age=")
+        assert latency_ms < LATENCY_THRESHOLD_MS
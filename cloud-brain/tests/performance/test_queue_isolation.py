@@ -0,0 +1,23 @@
+"""
+Zuralog Cloud Brain — Queue Isolation Load Test.
+
+Runs ``scripts/bench_queue_isolation.py`` on the in-memory broker: with the
+queue split, aggregation latency during a backfill storm stays at its idle
+level, while in a single shared queue it waits for the whole storm.
+"""
+
+from scripts.bench_queue_isolation import StormConfig, run
+
+
+def test_aggregation_latency_stays_flat_during_backfill_storm():
+    config = StormConfig(backfills=20, backfill_seconds=0.05, probes=5)
+    # Lower bound on how long a shared queue makes the probes wait.
+    storm_ms = config.backfills * config.backfill_seconds / (2 * config.concurrency) * 1000
+
+    report = run(config)["layouts"]
+    shared, isolated = report["shared"], report["isolated"]
+
+    assert all(phase["completed"] == config.probes for layout in report.values() for phase in layout.values())
+    assert isolated["storm"]["latency_ms"]["max"] < 250
+    assert shared["storm"]["latency_ms"]["p50"] > storm_ms
+    assert shared["storm"]["latency_ms"]["p50"] > 10 * isolated["storm"]["latency_ms"]["p95"]
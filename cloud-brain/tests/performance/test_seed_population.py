@@ -0,0 +1,66 @@
+"""
+Zuralog Cloud Brain — Synthetic Population Tests.
+
+Benchmarks are only comparable if ``scripts/seed_population.py`` produces
+the same rows for the same seed, and query plans are only realistic if
+the series it generates are correlated the way real data is.
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from scripts.seed_population import (
+    DEVICE_METRICS,
+    PopulationConfig,
+    daily_series,
+    generate_user,
+    parse_device_mix,
+)
+
+
+def _config(**overrides) -> PopulationConfig:
+    return PopulationConfig(**{"users": 10, "days": 60, "end_date": date(2026, 6, 30), **overrides})
+
+
+def test_same_seed_produces_identical_rows():
+    assert generate_user(_config(), 3) == generate_user(_config(), 3)
+    assert generate_user(_config(), 3) != generate_user(_config(seed=7), 3)
+
+
+def test_series_follow_sleep_hrv_steps_chain():
+    rng = np.random.default_rng(0)
+    weekdays = np.arange(3000) % 7
+    series = daily_series(rng, weekdays, fitness=0.0)
+
+    def corr(a: str, b: str) -> float:
+        return float(np.corrcoef(series[a], series[b])[0, 1])
+
+    assert corr("sleep_duration", "hrv_ms") > 0.2
+    assert corr("hrv_ms", "resting_heart_rate") < -0.2
+    assert corr("hrv_ms", "steps") > 0.1
+    assert corr("steps", "active_calories") > 0.8
+
+
+def test_device_mix_limits_metrics():
+    rows = generate_user(_config(device_mix=parse_device_mix("withings=1")), 0)
+    metrics = {line.split("\t")[2] for line in rows["health_events"]}
+
+    assert rows["integrations"][0][2] == "withings"
+    assert metrics <= DEVICE_METRICS["withings"]
+    assert "hrv_ms" not in metrics
+
+
+def test_intraday_samples_are_point_in_time():
+    config = _config(device_mix=parse_device_mix("fitbit=1"), samples_per_day=24)
+    events = [line.split("\t") for line in generate_user(config, 0)["health_events"]]
+    samples = [e for e in events if e[8] == "point_in_time\n" and e[2] == "heart_rate_avg"]
+
+    assert samples
+    assert len(samples) % 24 == 0
+
+
+def test_unknown_device_is_rejected():
+    with pytest.raises(ValueError, match="unknown device"):
+        parse_device_mix("garmin=1")
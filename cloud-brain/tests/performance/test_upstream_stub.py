@@ -0,0 +1,108 @@
+"""
+Zuralog Cloud Brain — Upstream Stub Tests.
+
+The end-to-end throughput benchmark replaces OpenRouter, Supabase and the
+wearable APIs with ``scripts/upstream_stub.py``. These tests drive the stub
+through the real OpenAI SDK so the benchmark measures the code paths it is
+meant to, not a stub that the client rejects.
+"""
+
+import json
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from scripts.bench_e2e_throughput import _UpstreamTransport
+from scripts.upstream_stub import BENCH_TOKEN_PREFIX, StubConfig, create_app
+
+
+@pytest.fixture
+def stub_transport():
+    return httpx.ASGITransport(app=create_app(StubConfig(llm_latency=0, token_interval=0, provider_latency=0)))
+
+
+@pytest.fixture
+def openai_client(stub_transport):
+    return AsyncOpenAI(
+        api_key="stub",
+        base_url="http://stub/openrouter/api/v1",
+        http_client=httpx.AsyncClient(transport=stub_transport),
+    )
+
+
+@pytest.mark.asyncio
+async def test_streamed_reply_is_plain_text(openai_client):
+    stream = await openai_client.chat.completions.create(
+        model="stub/model",
+        messages=[{"role": "user", "content": "How did I sleep?"}],
+        stream=True,
+    )
+    parts, finish = [], None
+    async for chunk in stream:
+        parts.append(chunk.choices[0].delta.content or "")
+        finish = chunk.choices[0].finish_reason or finish
+
+    assert finish == "stop"
+    assert len("".join(parts).split(" ")) == StubConfig().completion_tokens
+
+
+@pytest.mark.asyncio
+async def test_tool_marker_yields_tool_call_until_answered(openai_client):
+    tools = [{"type": "function", "function": {"name": "get_goals", "parameters": {"type": "object"}}}]
+    messages = [{"role": "user", "content": 'Goals? [[tool:get_goals {"limit": 3}]]'}]
+
+    first = await openai_client.chat.completions.create(model="stub/model", messages=messages, tools=tools)
+    call = first.choices[0].message.tool_calls[0]
+    messages += [
+        {"role": "assistant", "content": None, "tool_calls": [call.model_dump()]},
+        {"role": "tool", "tool_call_id": call.id, "content": "{}"},
+    ]
+    second = await openai_client.chat.completions.create(model="stub/model", messages=messages, tools=tools)
+
+    assert first.choices[0].finish_reason == "tool_calls"
+    assert call.function.name == "get_goals"
+    assert json.loads(call.function.arguments) == {"limit": 3}
+    assert second.choices[0].finish_reason == "stop"
+    assert second.choices[0].message.content
+
+
+@pytest.mark.asyncio
+async def test_json_mode_returns_json(openai_client):
+    response = await openai_client.chat.completions.create(
+        model="stub/model",
+        messages=[{"role": "user", "content": "2 eggs"}],
+        response_format={"type": "json_object"},
+    )
+
+    assert "foods" in json.loads(response.choices[0].message.content)
+
+
+@pytest.mark.asyncio
+async def test_supabase_user_accepts_bench_tokens_only(stub_transport):
+    async with httpx.AsyncClient(transport=stub_transport, base_url="http://stub") as client:
+        ok = await client.get("/supabase/auth/v1/user", headers={"Authorization": f"Bearer {BENCH_TOKEN_PREFIX}u-1"})
+        rejected = await client.get("/supabase/auth/v1/user", headers={"Authorization": "Bearer real-jwt"})
+
+    assert ok.json()["id"] == "u-1"
+    assert rejected.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_upstream_hosts_are_rewritten_to_stub():
+    seen = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url))
+        return httpx.Response(200, json={})
+
+    transport = _UpstreamTransport(httpx.URL("http://127.0.0.1:8090"))
+    transport._inner = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(transport=transport) as client:
+        await client.get("https://api.ouraring.com/v2/usercollection/sleep?start_date=2026-01-01")
+        await client.get("https://example.com/untouched")
+
+    assert seen == [
+        "http://127.0.0.1:8090/oura/v2/usercollection/sleep?start_date=2026-01-01",
+        "https://example.com/untouched",
+    ]
@@ -43,3 +43,41 @@ def test_sum_single_event():
     result = aggregate_events([_event(10000.0)], fn="sum", unit="steps")
     assert result.value == 10000.0
     assert result.event_count == 1
+
+
+def _rollup(values: list[float], last_at: datetime) -> dict:
+    return {
+        "sample_count": len(values),
+        "value_sum": sum(values),
+        "last_value": values[-1],
+        "last_recorded_at": last_at,
+        "last_created_at": last_at,
+    }
+
+
+def test_rollups_merge_exactly_for_sum_and_avg():
+    t = datetime(2026, 3, 22, 8, 0, tzinfo=timezone.utc)
+    raw = [120.0, 80.0, 60.0, 40.0, 100.0]
+    compacted = [_rollup(raw[:3], t)]
+    remaining = [_event(v, t) for v in raw[3:]]
+
+    for fn in ("sum", "avg"):
+        expected = aggregate_events([_event(v, t) for v in raw], fn=fn, unit="steps")
+        merged = aggregate_events(remaining, fn=fn, unit="steps", rollups=compacted)
+        assert merged.value == expected.value
+        assert merged.event_count == expected.event_count == 5
+
+
+def test_rollups_latest_picks_newest_across_raw_and_rollups():
+    t1 = datetime(2026, 3, 22, 8, 0, tzinfo=timezone.utc)
+    t2 = datetime(2026, 3, 22, 20, 0, tzinfo=timezone.utc)
+    result = aggregate_events([_event(70.0, t1)], fn="latest", unit="kg", rollups=[_rollup([71.0, 71.5], t2)])
+    assert result.value == 71.5
+    assert result.event_count == 3
+
+
+def test_rollups_only_day():
+    t = datetime(2026, 3, 22, 8, 0, tzinfo=timezone.utc)
+    result = aggregate_events([], fn="sum", unit="steps", rollups=[_rollup([1.0, 2.0], t), _rollup([3.0], t)])
+    assert result.value == 6.0
+    assert result.event_count == 3
@@ -0,0 +1,97 @@
+"""Tests for bounded, cached attachment text extraction."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.services import attachment_extraction
+from app.services.attachment_extraction import (
+    clear_extraction_cache,
+    decode_text,
+    extract_text,
+    extract_text_sync,
+    profile_csv,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_extraction_cache()
+    yield
+    clear_extraction_cache()
+
+
+class TestProfileCsv:
+    def test_numeric_and_text_columns(self):
+        data = b"date,steps,note\n2026-01-01,1000,easy\n2026-01-02,3000,hard\n2026-01-03,2000,\n"
+        summary = profile_csv(data)
+        assert "3 data rows, 3 columns" in summary
+        assert "- steps: numeric, n=3, min=1000, max=3000, mean=2000" in summary
+        assert "- note: text, n=2" in summary
+
+    def test_sniffs_semicolon_delimiter(self):
+        data = b"metric;value\nhr;60\nhr;70\nhr;80\n"
+        summary = profile_csv(data)
+        assert "delimiter ';'" in summary
+        assert "- value: numeric, n=3, min=60, max=80, mean=70" in summary
+
+    def test_row_cap(self):
+        data = b"a,b\n" + b"".join(f"{i},{i * 2}\n".encode() for i in range(500))
+        summary = profile_csv(data, max_rows=100)
+        assert "100 data rows" in summary
+        assert "stopped after 100 rows" in summary
+
+    def test_empty_returns_none(self):
+        assert profile_csv(b"   \n") is None
+
+
+class TestDecodeText:
+    def test_latin1_fallback(self):
+        assert decode_text("café".encode("latin-1")) == "café"
+
+    def test_char_budget(self):
+        text = decode_text(b"x" * 500, char_budget=100)
+        assert text.startswith("x" * 100)
+        assert "[truncated at 100 characters]" in text
+
+
+class TestCache:
+    def test_sync_extraction_is_cached_by_content(self):
+        data = b"a,b\n1,2\n3,4\n"
+        with patch.object(attachment_extraction, "profile_csv", wraps=profile_csv) as spy:
+            first = extract_text_sync(data, "text/csv")
+            second = extract_text_sync(data, "text/csv; charset=utf-8")
+        assert first == second
+        assert spy.call_count == 1
+
+    def test_images_are_not_extracted(self):
+        assert extract_text_sync(b"\xff\xd8\xff", "image/jpeg") is None
+
+    @pytest.mark.asyncio
+    async def test_async_path_shares_cache(self):
+        data = b"resting heart rate 52 bpm"
+        extract_text_sync(data, "text/plain")
+        with patch.object(attachment_extraction, "decode_text") as spy:
+            result = await extract_text(data, "text/plain")
+        assert result == "resting heart rate 52 bpm"
+        spy.assert_not_called()
+
+
+class TestPdf:
+    def test_unreadable_pdf_returns_none(self):
+        pytest.importorskip("pypdf")
+        assert attachment_extraction.extract_pdf_text(b"%PDF-1.4 not really a pdf") is None
+
+
+class TestPdfPool:
+    @pytest.mark.asyncio
+    async def test_pool_spawns_and_warms_every_worker(self):
+        pytest.importorskip("pypdf")
+        attachment_extraction.shutdown_extraction_pool()
+        try:
+            await attachment_extraction.warm_extraction_pool()
+            pool = attachment_extraction._get_pdf_pool()
+            assert pool._mp_context.get_start_method() == "spawn"
+            assert len(pool._processes) == attachment_extraction.PDF_POOL_WORKERS
+        finally:
+            attachment_extraction.shutdown_extraction_pool()
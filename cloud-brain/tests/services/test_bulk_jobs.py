@@ -0,0 +1,106 @@
+"""Tests for the bulk job framework (keyset chunking, progress, durations)."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.services.bulk_jobs import iter_id_chunks, run_chunked_job
+
+_meta = MetaData()
+_metrics = Table("metrics", _meta, Column("user_id", String), Column("date", String))
+_USERS = [f"user-{i:02d}" for i in range(7)]
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(_meta.create_all)
+        # Two rows per user so the query needs DISTINCT.
+        rows = [{"user_id": u, "date": d} for u in reversed(_USERS) for d in ("2026-05-01", "2026-05-02")]
+        await conn.execute(insert(_metrics), rows)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_iter_id_chunks_keyset_pages(session_factory):
+    query = select(_metrics.c.user_id).distinct()
+    async with session_factory() as db:
+        pages = [ids async for ids in iter_id_chunks(db, query, chunk_size=3)]
+
+    assert pages == [_USERS[0:3], _USERS[3:6], _USERS[6:7]]
+
+
+@pytest.mark.asyncio
+async def test_iter_id_chunks_exact_multiple_and_filter(session_factory):
+    query = select(_metrics.c.user_id).where(_metrics.c.user_id != "user-06").distinct()
+    async with session_factory() as db:
+        pages = [ids async for ids in iter_id_chunks(db, query, chunk_size=3)]
+
+    assert pages == [_USERS[0:3], _USERS[3:6]]
+
+
+@pytest.mark.asyncio
+async def test_run_chunked_job_sums_counters_and_records_duration(session_factory):
+    seen: list[list[str]] = []
+
+    async def handle(db, ids):
+        seen.append(ids)
+        return {"sent": len(ids) * 2}
+
+    with patch("app.services.bulk_jobs.record_job_duration", AsyncMock()) as record:
+        result = await run_chunked_job(
+            "test_job", select(_metrics.c.user_id).distinct(), handle, chunk_size=4, session_factory=session_factory
+        )
+
+    assert seen == [_USERS[0:4], _USERS[4:7]]
+    assert result["users"] == 7
+    assert result["chunks"] == 2
+    assert result["failed_chunks"] == 0
+    assert result["sent"] == 14
+    record.assert_awaited_once()
+    assert record.await_args.args[0] == "test_job"
+
+
+@pytest.mark.asyncio
+async def test_run_chunked_job_failed_chunk_does_not_stop_job(session_factory):
+    async def handle(db, ids):
+        if "user-00" in ids:
+            raise RuntimeError("boom")
+        return {"sent": 1}
+
+    with (
+        patch("app.services.bulk_jobs.record_job_duration", AsyncMock()),
+        patch("app.services.bulk_jobs.sentry_sdk") as sentry,
+    ):
+        result = await run_chunked_job(
+            "test_job", select(_metrics.c.user_id).distinct(), handle, chunk_size=3, session_factory=session_factory
+        )
+
+    assert result["chunks"] == 3
+    assert result["failed_chunks"] == 1
+    assert result["sent"] == 2
+    sentry.capture_exception.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_record_job_duration_fills_cumulative_buckets():
+    from app.services.bulk_jobs import record_job_duration
+
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    redis = MagicMock()
+    redis.pipeline.return_value = pipe
+    redis.__aenter__ = AsyncMock(return_value=redis)
+    redis.__aexit__ = AsyncMock(return_value=False)
+
+    with patch("redis.asyncio.from_url", return_value=redis):
+        await record_job_duration("test_job", 12.0)
+
+    buckets = [c.args[1] for c in pipe.hincrby.call_args_list]
+    assert buckets == ["le_15", "le_60", "le_300", "le_900", "le_3600", "le_+Inf", "count"]
+    pipe.hincrbyfloat.assert_called_once_with("bulk_jobs:duration:test_job", "sum", 12.0)
@@ -0,0 +1,158 @@
+"""Tests for the per-user correlation store and its incremental refresh."""
+
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from app.analytics.correlation_matrix import CORRELATION_METRICS
+from app.models.user_correlation_matrix import UserCorrelationMatrix
+from app.services.correlation_store import WINDOW_DAYS, get_correlation_matrix, refresh_correlation_matrix
+
+_TODAY = date(2026, 5, 1)
+_START = _TODAY - timedelta(days=WINDOW_DAYS - 1)
+_T0 = datetime(2026, 5, 1, 6, 0, tzinfo=timezone.utc)
+_T1 = datetime(2026, 5, 1, 7, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def scheduled():
+    with patch("app.services.correlation_store.schedule_correlation_refresh") as schedule:
+        yield schedule
+
+
+def _summary_rows(days: int = 30) -> list[SimpleNamespace]:
+    rows = []
+    for i in range(days):
+        day = _TODAY - timedelta(days=days - 1 - i)
+        sleep = 400.0 + (i % 7) * 10
+        rows.append(SimpleNamespace(date=day, metric_type="sleep_duration", value=sleep))
+        rows.append(SimpleNamespace(date=day, metric_type="steps", value=sleep * 20 + (i % 3)))
+    return rows
+
+
+def _result(*, stored=None, fresh=None, rows=None) -> MagicMock:
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = stored
+    result.one.return_value = fresh
+    result.fetchall.return_value = rows or []
+    return result
+
+
+def _fresh(rows: list[SimpleNamespace], watermark: datetime) -> SimpleNamespace:
+    return SimpleNamespace(watermark=watermark, row_count=len(rows), checksum=sum(r.value for r in rows))
+
+
+def _db(*results: MagicMock) -> MagicMock:
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[*results, MagicMock()])  # trailing result for the upsert
+    db.commit = AsyncMock()
+    db.rollback = AsyncMock()
+    return db
+
+
+def _stored_from(rows: list[SimpleNamespace], watermark: datetime) -> UserCorrelationMatrix:
+    metrics = list(CORRELATION_METRICS)
+    by_type = {v: k for k, v in CORRELATION_METRICS.items()}
+    matrix = np.full((WINDOW_DAYS, len(metrics)), np.nan)
+    for r in rows:
+        matrix[(r.date - _START).days, metrics.index(by_type[r.metric_type])] = r.value
+    return UserCorrelationMatrix(
+        user_id="u1",
+        window_start=_START,
+        window_days=WINDOW_DAYS,
+        metrics=metrics,
+        matrix=[[None if np.isnan(v) else v for v in row] for row in matrix.tolist()],
+        cells=[],
+        source_watermark=watermark,
+        source_row_count=len(rows),
+    )
+
+
+async def test_cold_build_loads_window_and_schedules_persist(scheduled):
+    rows = _summary_rows()
+    db = _db(_result(stored=None), _result(fresh=_fresh(rows, _T0)), _result(rows=rows))
+
+    matrix = await get_correlation_matrix(db, "u1", _TODAY)
+
+    assert matrix.window_start == _START
+    assert matrix.maturity_days(_TODAY) == 30
+    best = next(c for c in matrix.cells if (c.metric_a, c.metric_b, c.lag) == ("sleep_hours", "steps", 0))
+    assert best.r > 0.99
+    assert best.n == 30
+    # Readers never write on the caller's session.
+    assert db.execute.await_count == 3
+    db.commit.assert_not_awaited()
+    db.rollback.assert_not_awaited()
+    scheduled.assert_called_once_with("u1", _TODAY)
+
+
+async def test_refresh_persists_on_owned_session(scheduled):
+    rows = _summary_rows()
+    db = _db(_result(stored=None), _result(fresh=_fresh(rows, _T0)), _result(rows=rows))
+
+    await refresh_correlation_matrix(db, "u1", _TODAY)
+
+    assert db.execute.await_count == 4  # select, freshness, full load, upsert
+    db.commit.assert_awaited_once()
+    scheduled.assert_not_called()
+
+
+async def test_refresh_failure_propagates_without_rollback():
+    rows = _summary_rows()
+    db = _db(
+        _result(stored=None), _result(fresh=_fresh(rows, _T0)), _result(rows=rows), RuntimeError("upsert failed")
+    )
+
+    with pytest.raises(RuntimeError):
+        await refresh_correlation_matrix(db, "u1", _TODAY)
+
+    db.commit.assert_not_awaited()
+    db.rollback.assert_not_awaited()
+
+
+async def test_unchanged_summaries_skip_recompute(scheduled):
+    rows = _summary_rows()
+    stored = _stored_from(rows, _T0)
+    db = _db(_result(stored=stored), _result(fresh=_fresh(rows, _T0)))
+
+    matrix = await get_correlation_matrix(db, "u1", _TODAY)
+
+    assert db.execute.await_count == 2
+    db.commit.assert_not_awaited()
+    scheduled.assert_not_called()
+    assert int((~np.isnan(matrix.values)).sum()) == len(rows)
+
+
+async def test_changed_summaries_apply_delta_only():
+    rows = _summary_rows()
+    stored = _stored_from(rows, _T0)
+    changed = SimpleNamespace(date=_TODAY, metric_type="steps", value=123.0)
+    current = rows[:-1] + [changed]
+    db = _db(_result(stored=stored), _result(fresh=_fresh(current, _T1)), _result(rows=[changed]))
+
+    matrix = await get_correlation_matrix(db, "u1", _TODAY)
+
+    assert matrix.values[-1, matrix.column("steps")] == 123.0
+    assert db.execute.await_count == 3  # select, freshness, delta — no full reload
+    delta_params = db.execute.await_args_list[2].args[1]
+    assert delta_params["since"] == _T0
+
+
+async def test_deleted_summary_forces_full_reload():
+    rows = _summary_rows()
+    stored = _stored_from(rows, _T0)
+    current = rows[:-1]  # last steps row deleted
+    db = _db(
+        _result(stored=stored),
+        _result(fresh=_fresh(current, _T0)),
+        _result(rows=[]),
+        _result(rows=current),
+    )
+
+    matrix = await get_correlation_matrix(db, "u1", _TODAY)
+
+    assert np.isnan(matrix.values[-1, matrix.column("steps")])
+    assert db.execute.await_count == 4
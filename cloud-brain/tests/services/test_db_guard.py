@@ -0,0 +1,135 @@
+"""Tests for pool sizing, pool saturation alerts and the per-request query budget."""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import exc as sa_exc
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.middleware.request_context import RequestContextMiddleware
+from app.services import db_guard, telemetry
+from app.services.db_guard import (
+    InstrumentedAsyncQueuePool,
+    QueryBudgetExceeded,
+    RequestQueries,
+    install_query_counter,
+    pool_sizing,
+    query_budget,
+    request_queries,
+)
+
+
+@pytest.fixture
+def guard_settings():
+    with patch.object(db_guard, "settings") as settings:
+        settings.db_pool_size = 0
+        settings.db_max_overflow = 3
+        settings.db_connection_budget = 5
+        settings.db_pool_wait_alert_ms = 250
+        settings.db_query_budget = 3
+        settings.db_query_budget_mode = "log"
+        yield settings
+
+
+def test_pool_sizing_default_keeps_two_plus_three(guard_settings, monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert pool_sizing() == (2, 3)
+
+
+def test_pool_sizing_splits_budget_across_workers(guard_settings, monkeypatch):
+    guard_settings.db_connection_budget = 40
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert pool_sizing() == (4, 6)
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "40")
+    assert pool_sizing() == (1, 1)  # never below two connections per worker
+
+
+def test_pool_sizing_explicit_size_wins(guard_settings, monkeypatch):
+    guard_settings.db_pool_size = 8
+    guard_settings.db_max_overflow = 2
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert pool_sizing() == (8, 2)
+
+
+@pytest.mark.asyncio
+async def test_pool_records_wait_and_alerts_on_timeout(guard_settings, tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    timeouts_before = telemetry.DB_POOL_TIMEOUTS._values.get(("api",), 0)
+    try:
+        with patch.object(db_guard.sentry_sdk, "capture_message") as capture:
+            async with engine.connect():
+                with pytest.raises(sa_exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+    finally:
+        await engine.dispose()
+
+    assert telemetry.DB_POOL_TIMEOUTS._values[("api",)] == timeouts_before + 1
+    assert telemetry.DB_POOL_CHECKOUT_WAIT._values[("api",)][:-1] != [0] * (len(telemetry.LATENCY_BUCKETS) + 1)
+    # One alert for the full pool on the first checkout; the timeout falls in the same throttle window.
+    capture.assert_called_once()
+    assert "all connections in use" in capture.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_raise_mode_fails_the_statement_over_budget(guard_settings):
+    guard_settings.db_query_budget_mode = "raise"
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    install_query_counter(engine)
+    queries = RequestQueries()
+    token = request_queries.set(queries)
+    try:
+        async with engine.connect() as conn:
+            for _ in range(3):
+                await conn.execute(text("SELECT 1"))
+            with pytest.raises(QueryBudgetExceeded):
+                await conn.execute(text("SELECT 1"))
+    finally:
+        request_queries.reset(token)
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_log_mode_warns_once_per_request_and_route_override(guard_settings, caplog):
+    app = FastAPI()
+
+    async def _run(n: int) -> dict:
+        # Statements run in a child task, as with a parallel async_session().
+        async def child() -> None:
+            request_queries.get().count += n
+
+        await asyncio.create_task(child())
+        return {}
+
+    @app.get("/chatty")
+    async def chatty() -> dict:
+        return await _run(5)
+
+    @app.get("/bulk", dependencies=[Depends(query_budget(10))])
+    async def bulk() -> dict:
+        return await _run(5)
+
+    app.add_middleware(RequestContextMiddleware)
+    transport = httpx.ASGITransport(app=app)
+    before = telemetry.QUERY_BUDGET_EXCEEDED._values.get(("GET", "/chatty"), 0)
+    with caplog.at_level("WARNING", logger="app.services.db_guard"):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/chatty")).status_code == 200
+            assert (await client.get("/bulk")).status_code == 200
+
+    assert telemetry.QUERY_BUDGET_EXCEEDED._values[("GET", "/chatty")] == before + 1
+    assert ("GET", "/bulk") not in telemetry.QUERY_BUDGET_EXCEEDED._values
+    assert [r.getMessage() for r in caplog.records] == [
+        "Query budget exceeded: GET /chatty ran 5 statements (budget 3)"
+    ]
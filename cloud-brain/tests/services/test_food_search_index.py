@@ -0,0 +1,203 @@
+"""Tests for the in-memory food search index and its use in search_foods."""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import food_search_index
+from app.services.food_search_index import (
+    FoodSearchIndex,
+    build_food_index,
+    get_food_index,
+    hydrate_food_index,
+    refresh_food_index,
+    reset_food_index,
+    trigrams,
+)
+
+
+def _entry(name: str, entry_id: str | None = "1") -> dict:
+    return {
+        "id": entry_id,
+        "name": name,
+        "brand": None,
+        "serving_size": 100.0,
+        "serving_unit": "g",
+        "calories_per_serving": 100.0,
+        "protein_per_serving": 1.0,
+        "carbs_per_serving": 1.0,
+        "fat_per_serving": 1.0,
+        "source": "usda",
+    }
+
+
+@pytest.fixture
+def index() -> FoodSearchIndex:
+    idx = FoodSearchIndex()
+    idx.add_many(
+        [
+            ("usda:1", _entry("Chicken breast, skinless, cooked", "1")),
+            ("usda:2", _entry("Chicken thigh, skinless, cooked", "2")),
+            ("usda:3", _entry("Chickpeas, canned", "3")),
+            ("usda:4", _entry("Banana, raw", "4")),
+        ]
+    )
+    return idx
+
+
+def test_trigrams_match_pg_trgm():
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+
+
+def test_full_word_ranked_by_similarity(index):
+    names = [r["name"] for r in index.search("chicken breast")]
+    assert names[0] == "Chicken breast, skinless, cooked"
+    assert "Banana, raw" not in names
+
+
+def test_prefix_matches_partial_word(index):
+    names = [r["name"] for r in index.search("chick")]
+    assert set(names) == {
+        "Chicken breast, skinless, cooked",
+        "Chicken thigh, skinless, cooked",
+        "Chickpeas, canned",
+    }
+
+
+def test_typo_tolerated(index):
+    assert index.search("banan")[0]["name"] == "Banana, raw"
+
+
+def test_incremental_add_and_rename(index):
+    index.add("ai:acai-bowl", _entry("Acai bowl", "9"))
+    assert index.search("acai")[0]["id"] == "9"
+
+    index.add("ai:acai-bowl", _entry("Pitaya bowl", "9"))
+    assert index.search("acai") == []
+    assert index.search("pitaya")[0]["id"] == "9"
+    assert len(index) == 5
+
+
+def test_limit(index):
+    assert len(index.search("chicken", limit=1)) == 1
+
+
+def test_seed_build_is_cold():
+    try:
+        idx = build_food_index()
+        hits = idx.search("banana")
+        assert hits
+        assert all(hit["id"] is None for hit in hits)
+    finally:
+        reset_food_index()
+
+
+@pytest.mark.asyncio
+async def test_search_foods_serves_warm_hits_without_db(index):
+    from app.services.food_search_service import search_foods
+
+    db = MagicMock()
+    db.execute = AsyncMock()
+    with patch("app.services.food_search_service.get_food_index", return_value=index):
+        foods = await search_foods(db, "banana")
+    assert foods[0]["name"] == "Banana, raw"
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_search_foods_falls_back_for_cold_entries(index):
+    from app.services.food_search_service import search_foods
+
+    index.add("usda:4", _entry("Banana, raw", None))
+    row = {
+        "id": "db-4",
+        "external_id": "usda:4",
+        "name": "Banana, raw",
+        "brand": None,
+        "serving_size": 100,
+        "serving_unit": "g",
+        "calories_per_serving": 89,
+        "protein_per_serving": 1.1,
+        "carbs_per_serving": 22.8,
+        "fat_per_serving": 0.3,
+        "metadata": {"source": "usda"},
+        "fetched_at": None,
+    }
+    result = MagicMock()
+    result.mappings.return_value.all.return_value = [row]
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    with patch("app.services.food_search_service.get_food_index", return_value=index):
+        foods = await search_foods(db, "banana")
+        assert foods[0]["id"] == "db-4"
+        db.execute.reset_mock()
+        # The row is now warm in the index.
+        assert (await search_foods(db, "banana"))[0]["id"] == "db-4"
+    db.execute.assert_not_awaited()
+
+
+def _row(external_id: str, name: str, row_id: str, calories: float = 89.0) -> dict:
+    return {
+        "id": row_id,
+        "external_id": external_id,
+        "name": name,
+        "brand": None,
+        "serving_size": 100,
+        "serving_unit": "g",
+        "calories_per_serving": calories,
+        "protein_per_serving": 1.1,
+        "carbs_per_serving": 22.8,
+        "fat_per_serving": 0.3,
+        "metadata": {"source": "user_corrected"},
+    }
+
+
+def _rows_result(rows: list[dict]) -> MagicMock:
+    result = MagicMock()
+    result.mappings.return_value.all.return_value = rows
+    return result
+
+
+@pytest.mark.asyncio
+async def test_refresh_applies_other_workers_writes_once_per_interval(index):
+    index.synced_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=_rows_result([_row("usda:4", "Banana, raw", "4", calories=95.0)]))
+
+    assert await refresh_food_index(index, db) == 1
+    assert index.get("usda:4")["calories_per_serving"] == 95.0
+    assert index.synced_at > datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    # Within the interval the next search does not query again.
+    assert await refresh_food_index(index, db) == 0
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_skipped_before_hydration(index):
+    db = MagicMock()
+    db.execute = AsyncMock()
+    assert await refresh_food_index(index, db) == 0
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_hydrate_builds_and_swaps_in_a_warm_index():
+    db = MagicMock()
+    db.execute = AsyncMock(
+        side_effect=[_rows_result([_row("usda:x", "Dragon fruit, raw", "db-x")]), _rows_result([])]
+    )
+    session = MagicMock()
+    session.return_value.__aenter__ = AsyncMock(return_value=db)
+    session.return_value.__aexit__ = AsyncMock(return_value=False)
+    try:
+        seeded = build_food_index()
+        with patch.object(food_search_index, "_seed_entries", return_value=[]):
+            assert await hydrate_food_index(session) == 1
+        hydrated = get_food_index()
+        assert hydrated is not seeded
+        assert hydrated.hydrated and hydrated.synced_at is not None
+        assert hydrated.search("dragon fruit")[0]["id"] == "db-x"
+    finally:
+        reset_food_index()
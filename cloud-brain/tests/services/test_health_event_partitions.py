@@ -0,0 +1,96 @@
+"""Tests for health_events monthly partition upkeep and expiry."""
+
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.health_event_partitions import (
+    ARCHIVE_SCHEMA,
+    add_months,
+    ensure_partitions,
+    expire_partitions,
+    partition_month,
+)
+
+_TODAY = date(2026, 5, 14)
+
+
+def _names(*names: str) -> MagicMock:
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = list(names)
+    return result
+
+
+def _db(*results) -> MagicMock:
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[*results, *[MagicMock()] * 10])
+    db.commit = AsyncMock()
+    return db
+
+
+def _statements(db: MagicMock) -> list[str]:
+    return [str(c.args[0]) for c in db.execute.await_args_list]
+
+
+def test_add_months_crosses_year_boundaries():
+    assert add_months(date(2026, 11, 20), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 31), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 5, 14), 0) == date(2026, 5, 1)
+
+
+def test_partition_month_parses_only_monthly_partitions():
+    assert partition_month("health_events_p2026_03") == date(2026, 3, 1)
+    assert partition_month("health_events_default") is None
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_returns_newly_created():
+    created, existing = MagicMock(), MagicMock()
+    created.scalar_one_or_none.return_value = "health_events_p2026_08"
+    existing.scalar_one_or_none.return_value = None
+    db = _db(existing, existing, existing, created)
+
+    names = await ensure_partitions(db, _TODAY, months_ahead=3)
+
+    assert names == ["health_events_p2026_08"]
+    months = [c.args[1]["month"] for c in db.execute.await_args_list]
+    assert months == [date(2026, 5, 1), date(2026, 6, 1), date(2026, 7, 1), date(2026, 8, 1)]
+    db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_expire_partitions_detaches_into_archive_schema():
+    db = _db(
+        _names("health_events_default", "health_events_p2026_02", "health_events_p2025_12", "health_events_p2026_03")
+    )
+
+    expired = await expire_partitions(db, _TODAY, retain_months=2, mode="detach")
+
+    # Boundary is 2026-03-01: December and February are wholly before it.
+    assert expired == ["health_events_p2025_12", "health_events_p2026_02"]
+    statements = _statements(db)
+    assert f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}" in statements
+    assert "ALTER TABLE health_events DETACH PARTITION health_events_p2025_12" in statements
+    assert f"ALTER TABLE health_events_p2026_02 SET SCHEMA {ARCHIVE_SCHEMA}" in statements
+    assert not any(s.startswith("DROP") for s in statements)
+
+
+@pytest.mark.asyncio
+async def test_expire_partitions_drop_mode():
+    db = _db(_names("health_events_p2025_12", "health_events_p2026_04"))
+
+    expired = await expire_partitions(db, _TODAY, retain_months=2, mode="drop")
+
+    assert expired == ["health_events_p2025_12"]
+    assert "DROP TABLE health_events_p2025_12" in _statements(db)
+
+
+@pytest.mark.asyncio
+async def test_expire_partitions_disabled_and_invalid_mode():
+    db = _db()
+    assert await expire_partitions(db, _TODAY, retain_months=0, mode="drop") == []
+    db.execute.assert_not_awaited()
+
+    with pytest.raises(ValueError):
+        await expire_partitions(db, _TODAY, retain_months=6, mode="truncate")
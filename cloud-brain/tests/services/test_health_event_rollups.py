@@ -0,0 +1,185 @@
+"""Tests for health_events rollup compaction and recompute inputs."""
+
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.health_event_rollups import (
+    compact_day,
+    compact_expired_events,
+    load_day_inputs,
+    load_day_inputs_for_metrics,
+    reopen_compacted_days,
+)
+
+_TODAY = date(2026, 5, 1)
+_T = datetime(2026, 1, 10, 8, 0, tzinfo=timezone.utc)
+
+
+def _db(*results) -> MagicMock:
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    db.commit = AsyncMock()
+    return db
+
+
+@pytest.mark.asyncio
+async def test_load_day_inputs_returns_events_and_rollups():
+    events = MagicMock()
+    events.fetchall.return_value = [SimpleNamespace(metric_type="steps", value=5.0, recorded_at=_T, created_at=_T)]
+    rollups = MagicMock()
+    rollups.fetchall.return_value = [
+        SimpleNamespace(
+            _mapping={
+                "metric_type": "steps",
+                "sample_count": 3,
+                "value_sum": 9.0,
+                "last_value": 4.0,
+                "last_recorded_at": _T,
+                "last_created_at": _T,
+            }
+        )
+    ]
+    db = _db(events, rollups)
+
+    got_events, got_rollups = await load_day_inputs(db, "u1", date(2026, 1, 10), "steps")
+
+    assert got_events == [{"value": 5.0, "recorded_at": _T, "created_at": _T}]
+    assert got_rollups[0]["sample_count"] == 3
+    assert db.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_compact_day_reports_counts():
+    compacted = MagicMock()
+    compacted.one.return_value = SimpleNamespace(samples=120, rollups=4)
+    purged = MagicMock(rowcount=2)
+    db = _db(compacted, purged)
+
+    stats = await compact_day(db, date(2026, 1, 10))
+
+    assert stats == {"samples": 120, "rollups": 4, "purged": 2}
+    assert db.execute.await_args_list[0].args[1] == {"day": date(2026, 1, 10)}
+    db.commit.assert_not_awaited()
+
+
+def _progress(*rows) -> MagicMock:
+    result = MagicMock()
+    result.all.return_value = list(rows)
+    return result
+
+
+def _compacted_days(compact: AsyncMock) -> list[date]:
+    return [c.args[1] for c in compact.await_args_list]
+
+
+@pytest.mark.asyncio
+async def test_compact_expired_events_resumes_each_month():
+    # Cutoff is 2026-01-31. December is done; January resumes after the 28th.
+    db = _db(_progress((date(2025, 12, 1), date(2025, 12, 31)), (date(2026, 1, 1), date(2026, 1, 28))), *[None] * 2)
+    stats = {"samples": 10, "rollups": 1, "purged": 0}
+    months = [date(2026, 1, 1), date(2025, 12, 1), date(2026, 2, 1)]
+    with patch("app.services.health_event_rollups.compact_day", AsyncMock(return_value=stats)) as compact:
+        totals = await compact_expired_events(db, _TODAY, retention_days=90, max_days=14, months=months)
+
+    assert _compacted_days(compact) == [date(2026, 1, 29), date(2026, 1, 30)]
+    assert totals == {"days": 2, "samples": 20, "rollups": 2, "purged": 0}
+    assert db.commit.await_count == 2
+    advance = db.execute.await_args_list[-1].args[1]
+    assert advance == {"month": date(2026, 1, 1), "day": date(2026, 1, 30)}
+
+
+@pytest.mark.asyncio
+async def test_compact_expired_events_revisits_reopened_month():
+    # November was reopened to the 9th by a late backfill; it is compacted
+    # again even though later months are already done.
+    db = _db(
+        _progress((date(2025, 11, 1), date(2025, 11, 9)), (date(2025, 12, 1), date(2025, 12, 31))),
+        *[None] * 3,
+    )
+    stats = {"samples": 0, "rollups": 0, "purged": 0}
+    months = [date(2025, 11, 1), date(2025, 12, 1)]
+    with patch("app.services.health_event_rollups.compact_day", AsyncMock(return_value=stats)) as compact:
+        await compact_expired_events(db, _TODAY, retention_days=90, max_days=3, months=months)
+
+    assert _compacted_days(compact) == [date(2025, 11, 10), date(2025, 11, 11), date(2025, 11, 12)]
+
+
+@pytest.mark.asyncio
+async def test_compact_expired_events_bounded_by_max_days():
+    db = _db(_progress(), *[None] * 3)
+    stats = {"samples": 0, "rollups": 0, "purged": 0}
+    with patch("app.services.health_event_rollups.compact_day", AsyncMock(return_value=stats)) as compact:
+        totals = await compact_expired_events(
+            db, _TODAY, retention_days=90, max_days=3, months=[date(2025, 6, 1), date(2025, 7, 1)]
+        )
+
+    assert _compacted_days(compact) == [date(2025, 6, 1), date(2025, 6, 2), date(2025, 6, 3)]
+    assert totals["days"] == 3
+
+
+@pytest.mark.asyncio
+async def test_compact_expired_events_nothing_before_cutoff():
+    db = _db(_progress((date(2026, 1, 1), date(2026, 1, 30))))
+    with patch("app.services.health_event_rollups.compact_day", AsyncMock()) as compact:
+        totals = await compact_expired_events(
+            db, _TODAY, retention_days=90, max_days=14, months=[date(2026, 1, 1), date(2026, 2, 1)]
+        )
+
+    compact.assert_not_awaited()
+    assert totals["days"] == 0
+
+
+@pytest.mark.asyncio
+async def test_compact_expired_events_disabled_by_zero_retention():
+    db = _db()
+    with patch("app.services.health_event_rollups.compact_day", AsyncMock()) as compact:
+        totals = await compact_expired_events(db, _TODAY, retention_days=0, max_days=14, months=[date(2020, 1, 1)])
+
+    compact.assert_not_awaited()
+    db.execute.assert_not_awaited()
+    assert totals["days"] == 0
+
+
+@pytest.mark.asyncio
+async def test_reopen_compacted_days_moves_back_earliest_late_day_per_month():
+    db = _db(None, None)
+    days = [date(2025, 11, 20), date(2025, 11, 3), date(2025, 12, 5), date(2026, 4, 20)]
+
+    await reopen_compacted_days(db, days, _TODAY, retention_days=90)
+
+    # 2026-04-20 is inside the raw window, so nothing of April can be compacted yet.
+    # Every month is reopened by a single executemany.
+    assert db.execute.await_count == 1
+    assert db.execute.await_args.args[1] == [
+        {"month": date(2025, 11, 1), "day": date(2025, 11, 3)},
+        {"month": date(2025, 12, 1), "day": date(2025, 12, 5)},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_reopen_compacted_days_noop_when_disabled():
+    db = _db()
+    await reopen_compacted_days(db, [date(2020, 1, 1)], _TODAY, retention_days=0)
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_load_day_inputs_for_metrics_groups_by_metric_in_two_queries():
+    events = MagicMock()
+    events.fetchall.return_value = [
+        SimpleNamespace(metric_type="steps", value=5.0, recorded_at=_T, created_at=_T),
+        SimpleNamespace(metric_type="distance", value=800.0, recorded_at=_T, created_at=_T),
+    ]
+    rollups = MagicMock()
+    rollups.fetchall.return_value = []
+    db = _db(events, rollups)
+
+    inputs = await load_day_inputs_for_metrics(db, "u1", date(2026, 1, 10), ["steps", "distance", "floors"])
+
+    assert inputs["steps"] == ([{"value": 5.0, "recorded_at": _T, "created_at": _T}], [])
+    assert inputs["distance"][0][0]["value"] == 800.0
+    assert inputs["floors"] == ([], [])
+    assert db.execute.await_count == 2
@@ -10,7 +10,7 @@ It returns the number of reminders sent. Internally it:
 - Generates candidates
 - Deduplicates via notification_logs
 - Respects quiet hours
-- Sends via PushService
+- Persists notification_logs, then sends via PushService
 
 Tests cover:
 - Returns 0 when no preferences row exists (graceful degradation)
@@ -22,13 +22,13 @@ Tests cover:
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from app.config import settings
 from app.services.smart_reminder import SmartReminderEngine, _in_quiet_hours
 
-
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -106,6 +106,99 @@ class TestEvaluateAndSend:
         assert result == 0
 
 
+class TestEvaluateAndSendBatch:
+    @staticmethod
+    def _rows(rows) -> MagicMock:
+        result = MagicMock()
+        result.fetchall.return_value = rows
+        return result
+
+    @pytest.mark.asyncio
+    async def test_chunk_loaded_in_four_queries_and_committed_once(self):
+        """The whole chunk is evaluated with four reads and one commit."""
+        engine = SmartReminderEngine()
+        now = datetime.now(timezone.utc)
+
+        prefs_result = MagicMock()
+        prefs_result.scalars.return_value.all.return_value = [
+            MagicMock(user_id="capped", proactivity_level="low", quiet_hours_start=None, quiet_hours_end=None),
+        ]
+        db = MagicMock()
+        db.add = MagicMock()
+        db.commit = AsyncMock()
+        db.execute = AsyncMock(
+            side_effect=[
+                prefs_result,
+                self._rows([("capped", "reminder", now)]),       # notification logs
+                self._rows([("near-goal", 9_500), ("capped", 9_500)]),  # today's data
+                self._rows([("streaker", 7)]),                    # engagement streaks
+            ]
+        )
+
+        push = MagicMock()
+        with patch("app.services.push_service.PushService", return_value=push):
+            sent = await engine.evaluate_and_send_batch(["capped", "near-goal", "streaker"], db)
+
+        assert db.execute.await_count == 4
+        db.commit.assert_awaited_once()
+        # "capped" already used its low-proactivity cap of 1 today.
+        assert "capped" not in sent
+        assert sent["near-goal"] >= 1
+        assert sent["streaker"] >= 1
+        push.send_notification.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_push_enabled_sends_to_latest_device_after_commit(self):
+        """With pushes enabled, tokens are loaded after the commit and used to send."""
+        engine = SmartReminderEngine()
+        prefs_result = MagicMock()
+        prefs_result.scalars.return_value.all.return_value = []
+        calls = []
+        db = MagicMock()
+        db.add = MagicMock()
+        db.commit = AsyncMock(side_effect=lambda: calls.append("commit"))
+        db.execute = AsyncMock(
+            side_effect=[
+                prefs_result,
+                self._rows([]),
+                self._rows([]),
+                self._rows([("streaker", 7)]),
+                self._rows([("streaker", "tok-new"), ("streaker", "tok-old")]),  # FCM tokens
+            ]
+        )
+        push = MagicMock()
+        push.send_notification.side_effect = lambda **kw: calls.append(kw["token"])
+
+        with (
+            patch.object(settings, "smart_reminder_push_enabled", True),
+            patch("app.services.push_service.PushService", return_value=push),
+        ):
+            sent = await engine.evaluate_and_send_batch(["streaker"], db)
+
+        assert db.execute.await_count == 5
+        assert sent == {"streaker": 1}
+        assert calls == ["commit", "tok-new"]
+
+    @pytest.mark.asyncio
+    async def test_failed_commit_sends_nothing(self):
+        """Reminders are only pushed once their logs are committed."""
+        engine = SmartReminderEngine()
+        db = MagicMock()
+        db.add = MagicMock()
+        db.commit = AsyncMock(side_effect=Exception("commit failed"))
+        prefs_result = MagicMock()
+        prefs_result.scalars.return_value.all.return_value = []
+        db.execute = AsyncMock(
+            side_effect=[prefs_result, self._rows([]), self._rows([]), self._rows([("streaker", 7)])]
+        )
+
+        with patch("app.services.smart_reminder._push") as push:
+            with pytest.raises(Exception, match="commit failed"):
+                await engine.evaluate_and_send_batch(["streaker"], db)
+
+        push.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # _in_quiet_hours helper
 # ---------------------------------------------------------------------------
@@ -0,0 +1,102 @@
+"""Tests for batched, cached signed-URL generation in StorageService."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.storage_service import StorageService
+
+
+def _response(status_code: int, payload) -> MagicMock:
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.json.return_value = payload
+    return resp
+
+
+@pytest.fixture
+def storage():
+    with patch("app.services.storage_service.settings") as mock_settings:
+        mock_settings.supabase_url = "https://proj.supabase.co"
+        mock_settings.supabase_service_key.get_secret_value.return_value = "service-key"
+        client = MagicMock()
+        client.post = AsyncMock()
+        yield StorageService(client)
+
+
+@pytest.mark.asyncio
+async def test_get_signed_urls_uses_one_request(storage):
+    storage._client.post.return_value = _response(
+        200,
+        [
+            {"path": "u1/a.jpg", "signedURL": "/object/sign/chat/u1/a.jpg?token=a", "error": None},
+            {"path": "u1/b.jpg", "signedURL": "/object/sign/chat/u1/b.jpg?token=b", "error": None},
+        ],
+    )
+    urls = await storage.get_signed_urls("chat", ["u1/a.jpg", "u1/b.jpg", "u1/a.jpg"])
+
+    assert urls == {
+        "u1/a.jpg": "https://proj.supabase.co/storage/v1/object/sign/chat/u1/a.jpg?token=a",
+        "u1/b.jpg": "https://proj.supabase.co/storage/v1/object/sign/chat/u1/b.jpg?token=b",
+    }
+    storage._client.post.assert_awaited_once()
+    _, kwargs = storage._client.post.call_args
+    assert kwargs["json"] == {"expiresIn": 3600, "paths": ["u1/a.jpg", "u1/b.jpg"]}
+
+
+@pytest.mark.asyncio
+async def test_get_signed_urls_serves_cached_paths(storage):
+    storage._client.post.return_value = _response(
+        200, [{"path": "u1/a.jpg", "signedURL": "/object/sign/chat/u1/a.jpg?token=a", "error": None}]
+    )
+    await storage.get_signed_urls("chat", ["u1/a.jpg"])
+    storage._client.post.reset_mock()
+
+    urls = await storage.get_signed_urls("chat", ["u1/a.jpg"])
+    assert "u1/a.jpg" in urls
+    storage._client.post.assert_not_awaited()
+    # The single-object path shares the same cache.
+    assert await storage.get_signed_url("chat", "u1/a.jpg") == urls["u1/a.jpg"]
+    storage._client.post.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_signed_urls_skips_unsignable_paths(storage):
+    storage._client.post.return_value = _response(
+        200, [{"path": "u1/gone.jpg", "signedURL": None, "error": "Object not found"}]
+    )
+    assert await storage.get_signed_urls("chat", ["u1/gone.jpg"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_short_lived_urls_are_not_cached(storage):
+    storage._client.post.return_value = _response(
+        200, [{"path": "u1/a.jpg", "signedURL": "/object/sign/chat/u1/a.jpg?token=a", "error": None}]
+    )
+    await storage.get_signed_urls("chat", ["u1/a.jpg"], expires_in=60)
+    await storage.get_signed_urls("chat", ["u1/a.jpg"], expires_in=60)
+    assert storage._client.post.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_url_is_reused_only_while_it_covers_the_requested_validity(storage):
+    storage._client.post.return_value = _response(200, {"signedURL": "/object/sign/exports/u1/e1.zip?token=a"})
+    with patch("app.services.storage_service.time.monotonic", return_value=1000.0):
+        url, ttl = await storage.get_signed_url_with_ttl("exports", "u1/e1.zip", expires_in=3600)
+    assert ttl == 3600
+
+    # Shortly after signing: the cached URL is reused and reports its real remaining life.
+    with patch("app.services.storage_service.time.monotonic", return_value=1100.0):
+        assert await storage.get_signed_url_with_ttl("exports", "u1/e1.zip", expires_in=3600) == (url, 3500)
+        # A longer validity than the cached URL has left needs a fresh signature.
+        await storage.get_signed_url_with_ttl("exports", "u1/e1.zip", expires_in=86400)
+    assert storage._client.post.await_count == 2
+
+    # Once less than the requested validity minus the margin is left, it is re-signed.
+    storage._client.post.reset_mock()
+    storage._signed_url_cache.clear()
+    with patch("app.services.storage_service.time.monotonic", return_value=1000.0):
+        await storage.get_signed_url("exports", "u1/e1.zip", expires_in=3600)
+    with patch("app.services.storage_service.time.monotonic", return_value=1000.0 + 301):
+        await storage.get_signed_url("exports", "u1/e1.zip", expires_in=3600)
+    assert storage._client.post.await_count == 2
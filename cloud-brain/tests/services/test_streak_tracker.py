@@ -70,6 +70,7 @@ async def db_session():
         Column("last_activity_date", Date, nullable=True),
         Column("freeze_count", Integer, default=1),
         Column("freeze_used_this_week", Boolean, default=False),
+        Column("is_frozen", Boolean, default=False),
         Column("created_at", DateTime(timezone=True), nullable=True),
         Column("updated_at", DateTime(timezone=True), nullable=True),
         UniqueConstraint("user_id", "streak_type", name="uq_user_streak_user_type"),
@@ -433,3 +434,79 @@ async def test_use_freeze_returns_false_when_already_used(db_session, tracker):
 
     result = await tracker.use_freeze("user-17", StreakType.ENGAGEMENT, db_session)
     assert result is False
+
+
+# ---------------------------------------------------------------------------
+# Batched evaluation
+# ---------------------------------------------------------------------------
+
+
+def test_advance_streak_matches_sequential_rules():
+    """advance_streak applies the record_activity rules to sorted dates."""
+    from app.services.streak_tracker import advance_streak
+
+    d = date(2026, 3, 1)
+    days = [d, d + timedelta(days=1), d + timedelta(days=2), d + timedelta(days=5), d + timedelta(days=6)]
+
+    assert advance_streak(0, 0, None, days) == (2, 3, d + timedelta(days=6))
+    # Continues an existing streak ending the day before.
+    assert advance_streak(4, 9, d - timedelta(days=1), days[:2]) == (6, 9, d + timedelta(days=1))
+    # Dates on or before the last activity are ignored.
+    assert advance_streak(5, 5, d + timedelta(days=2), days[:3]) == (5, 5, d + timedelta(days=2))
+
+
+@pytest.mark.asyncio
+async def test_record_activity_batch_single_upsert(tracker):
+    """record_activity_batch reads once, upserts once and commits once."""
+    from unittest.mock import AsyncMock, MagicMock, patch
+
+    from app.services.data_version import SCOPE_GOALS
+
+    from sqlalchemy.dialects import postgresql
+
+    d = date(2026, 3, 10)
+    existing = UserStreak(
+        user_id="user-b", streak_type="steps", current_count=3, longest_count=3,
+        last_activity_date=d - timedelta(days=1),
+    )
+    read = MagicMock()
+    read.scalars.return_value.all.return_value = [existing]
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[read, MagicMock()])
+    db.commit = AsyncMock()
+
+    redis = MagicMock()
+    with patch("app.services.streak_tracker.bump_data_version", AsyncMock()) as bump:
+        updated = await tracker.record_activity_batch(
+            "user-b",
+            {"steps": [d + timedelta(days=1), d], "engagement": [d]},
+            db,
+            redis=redis,
+        )
+
+    assert updated == {"steps": (5, 5, d + timedelta(days=1)), "engagement": (1, 1, d)}
+    bump.assert_awaited_once_with("user-b", SCOPE_GOALS, redis=redis)
+    assert db.execute.await_count == 2
+    db.commit.assert_awaited_once()
+    upsert = str(db.execute.await_args_list[1].args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uq_user_streak_user_type DO UPDATE" in upsert
+
+
+@pytest.mark.asyncio
+async def test_record_activity_batch_no_change_skips_write(tracker):
+    """Dates already covered by the streak cause no write at all."""
+    from unittest.mock import AsyncMock, MagicMock
+
+    d = date(2026, 3, 10)
+    existing = UserStreak(
+        user_id="user-c", streak_type="engagement", current_count=2, longest_count=2, last_activity_date=d,
+    )
+    read = MagicMock()
+    read.scalars.return_value.all.return_value = [existing]
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=read)
+    db.commit = AsyncMock()
+
+    assert await tracker.record_activity_batch("user-c", {"engagement": [d]}, db) == {}
+    db.execute.assert_awaited_once()
+    db.commit.assert_not_awaited()
@@ -0,0 +1,91 @@
+"""Tests for bulk task dispatch (grouped publishing, adaptive chunk size, metrics)."""
+
+from unittest.mock import patch
+
+import pytest
+from celery import Celery
+
+from app.services import task_dispatch, telemetry
+from app.services.task_dispatch import (
+    MAX_CHUNK_SIZE,
+    MIN_CHUNK_SIZE,
+    dispatch_many,
+    next_chunk_size,
+)
+
+
+@pytest.fixture
+def app():
+    app = Celery("dispatch-test", broker="memory://")
+    app.conf.task_ignore_result = True
+    return app
+
+
+@pytest.fixture
+def echo(app):
+    @app.task(name="tests.echo")
+    def _echo(user_id: str, tz: str) -> None:
+        return None
+
+    task_dispatch._chunk_sizes.pop(_echo.name, None)
+    return _echo
+
+
+def _queued(app) -> list[list]:
+    with app.connection_for_write() as conn:
+        queue = conn.SimpleQueue("celery")
+        bodies = []
+        while queue.qsize():
+            message = queue.get(timeout=1)
+            bodies.append(message.payload[0])
+            message.ack()
+        queue.close()
+    return bodies
+
+
+def test_publishes_every_call_in_chunks(app, echo):
+    calls = [(f"user-{i}", "UTC") for i in range(120)]
+
+    with patch.object(task_dispatch, "INITIAL_CHUNK_SIZE", 50):
+        result = dispatch_many(echo, calls)
+
+    assert result.published == 120
+    assert result.failed == 0
+    assert result.chunks >= 2
+    assert sorted(_queued(app)) == sorted([list(c) for c in calls])
+
+
+def test_failed_chunk_is_counted_and_later_chunks_still_sent(app, echo):
+    real_group = task_dispatch.group
+    attempts = []
+
+    def flaky_group(signatures):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("broker down")
+        return real_group(signatures)
+
+    before = telemetry.CELERY_TASKS_PUBLISHED.snapshot()
+    with patch.object(task_dispatch, "INITIAL_CHUNK_SIZE", 50), patch.object(task_dispatch, "group", flaky_group):
+        result = dispatch_many(echo, [(f"user-{i}", "UTC") for i in range(100)])
+
+    assert result.failed == 50
+    assert result.published == 50
+    assert len(_queued(app)) == 50
+    assert telemetry.CELERY_TASKS_PUBLISHED.snapshot() != before
+
+
+def test_chunk_size_tracks_broker_latency():
+    # 1 ms per message → ideal 250 per chunk; moves halfway from 1000.
+    assert next_chunk_size(1000, 1000, 1.0) == 625
+    # Fast broker grows the chunk, clamped at the maximum.
+    assert next_chunk_size(4000, 4000, 0.001) == MAX_CHUNK_SIZE
+    # Very slow broker shrinks it, clamped at the minimum.
+    assert next_chunk_size(100, 100, 30.0) == MIN_CHUNK_SIZE
+
+
+def test_learned_chunk_size_carries_over(app, echo):
+    dispatch_many(echo, [(f"user-{i}", "UTC") for i in range(10)])
+
+    assert len(_queued(app)) == 10
+    assert task_dispatch._chunk_sizes[echo.name] != task_dispatch.INITIAL_CHUNK_SIZE
@@ -0,0 +1,111 @@
+"""Tests for Celery queue routing and queue lag measurement."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.task_queues import (
+    QUEUES,
+    ROUTES,
+    SENT_AT_HEADER,
+    queue_wait,
+    read_queue_lag,
+    stamp_sent_at,
+)
+from app.worker import celery_app
+
+
+def test_every_registered_task_has_a_route():
+    celery_app.loader.import_default_modules()
+    registered = {name for name in celery_app.tasks if not name.startswith("celery.")}
+
+    assert registered == set(ROUTES)
+    assert {route.queue for route in ROUTES.values()} == set(QUEUES)
+
+
+def test_ingest_aggregation_is_routed_ahead_of_everything():
+    route = celery_app.amqp.router.route({}, "app.tasks.aggregation_tasks.recompute_daily_summaries_for_batch")
+    backfill = celery_app.amqp.router.route({}, "oura.backfill")
+
+    assert route["queue"].name == "realtime"
+    assert route["priority"] == 0
+    assert backfill["queue"].name == "backfill"
+    assert celery_app.conf.task_annotations["oura.backfill"] == {"rate_limit": "20/m"}
+
+
+def test_correlation_refreshes_stay_off_realtime():
+    # The insight cohort enqueues one refresh per mature user with a stale matrix.
+    route = celery_app.amqp.router.route({}, "app.tasks.correlation_tasks.refresh_correlation_matrix")
+
+    assert route["queue"].name == "periodic_sync"
+
+
+def test_queue_wait_counts_from_publish_or_eta():
+    headers = {}
+    stamp_sent_at(headers)
+    sent_at = headers[SENT_AT_HEADER]
+    request = SimpleNamespace(sent_at=sent_at, eta=None, delivery_info={"routing_key": "realtime"})
+    delayed = SimpleNamespace(sent_at=1000.0, eta="1970-01-01T00:30:00+00:00", delivery_info={"routing_key": "llm"})
+
+    assert queue_wait(request, now=sent_at + 2) == ("realtime", 2)
+    assert queue_wait(delayed, now=1810.0) == ("llm", 10.0)
+    assert queue_wait(SimpleNamespace(), now=0) is None
+
+
+class _FakePipeline:
+    def __init__(self, lists: dict[str, list[bytes]]) -> None:
+        self._lists = lists
+        self._ops: list = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def llen(self, key):
+        self._ops.append(len(self._lists.get(key, [])))
+
+    def lindex(self, key, index):
+        items = self._lists.get(key, [])
+        self._ops.append(items[index] if items else None)
+
+    async def execute(self):
+        return self._ops
+
+
+def _message(sent_at: float) -> bytes:
+    return json.dumps({"body": "", "headers": {"task": "x", SENT_AT_HEADER: sent_at}}).encode()
+
+
+@pytest.mark.asyncio
+async def test_read_queue_lag_sums_priorities_and_finds_oldest(monkeypatch):
+    monkeypatch.setattr("app.services.task_queues.time.time", lambda: 1000.0)
+    lists = {
+        "realtime": [_message(990.0), _message(980.0)],
+        "realtime:5": [_message(950.0)],
+    }
+    redis = MagicMock()
+    redis.pipeline = lambda transaction=False: _FakePipeline(lists)
+
+    lag = await read_queue_lag(redis, ("realtime", "backfill"))
+
+    assert lag == {"realtime": (3, 50.0), "backfill": (0, 0.0)}
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_renders_queue_lag(monkeypatch):
+    from app.api.v1 import prometheus_routes
+
+    monkeypatch.setattr(prometheus_routes, "read_queue_lag", AsyncMock(return_value={"realtime": (3, 1.5)}))
+    monkeypatch.setattr(prometheus_routes, "get_job_duration_histograms", AsyncMock(return_value={}))
+    monkeypatch.setattr(prometheus_routes.settings, "metrics_token", MagicMock(get_secret_value=lambda: "t"))
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(redis=MagicMock())))
+    monkeypatch.setattr(prometheus_routes, "load_snapshots", AsyncMock(return_value=[]))
+
+    response = await prometheus_routes.prometheus_metrics(request, authorization="Bearer t")
+
+    assert 'celery_queue_depth{queue="realtime"} 3' in response.body.decode()
+    assert 'celery_queue_oldest_age_seconds{queue="realtime"} 1.5' in response.body.decode()
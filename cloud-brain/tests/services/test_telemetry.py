@@ -0,0 +1,177 @@
+"""Tests for the process telemetry registry, its hooks and the /metrics endpoint."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from pydantic import SecretStr
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.api.v1.prometheus_routes import router as prometheus_router
+from app.middleware.request_context import RequestContextMiddleware
+from app.services import telemetry
+from app.services.cache_service import CacheService
+from app.services.db_guard import RequestQueries, install_query_counter, request_queries
+from app.services.telemetry import (
+    MetricsRegistry,
+    instrument_engine,
+    merge_snapshots,
+    render_prometheus,
+)
+
+
+def _series(metric, *labels):
+    return metric._values.get(labels)
+
+
+def test_histogram_buckets_are_cumulative_when_rendered():
+    reg = MetricsRegistry()
+    hist = reg.histogram("op_seconds", "Op latency.", ("op",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        hist.observe(value, "read")
+
+    assert _series(hist, "read") == [2, 1, 1, 3.65]
+
+    with patch.object(telemetry, "registry", reg):
+        body = render_prometheus(merge_snapshots([reg.snapshot()]))
+    assert 'op_seconds_bucket{op="read",le="0.1"} 2' in body
+    assert 'op_seconds_bucket{op="read",le="1"} 3' in body
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 4' in body
+    assert 'op_seconds_count{op="read"} 4' in body
+    assert "# TYPE op_seconds histogram" in body
+
+
+def test_merge_sums_process_snapshots():
+    reg = MetricsRegistry()
+    counter = reg.counter("hits_total", "Hits.", ("result",))
+    hist = reg.histogram("lat_seconds", "Latency.", buckets=(1,))
+    counter.inc("hit", amount=3)
+    hist.observe(0.5)
+    other = json.loads(json.dumps(reg.snapshot()))  # as read back from Redis
+    counter.inc("miss")
+
+    merged = merge_snapshots([reg.snapshot(), other])
+
+    assert merged["hits_total"] == {("hit",): 6, ("miss",): 1}
+    assert merged["lat_seconds"][()] == [2, 0, 1.0]
+
+
+def test_label_values_are_escaped():
+    reg = MetricsRegistry()
+    reg.counter("c_total", "C.", ("route",)).inc('/a"b\\')
+    with patch.object(telemetry, "registry", reg):
+        body = render_prometheus(merge_snapshots([reg.snapshot()]))
+    assert 'c_total{route="/a\\"b\\\\"} 1' in body
+
+
+@pytest.mark.asyncio
+async def test_load_snapshots_replaces_own_entry_with_live_values():
+    redis = MagicMock()
+
+    async def scan_iter(match):
+        for key in (telemetry.snapshot_key("api"), "telemetry:proc:worker:host:1"):
+            yield key
+
+    redis.scan_iter = scan_iter
+    redis.mget = AsyncMock(return_value=[json.dumps({"hits_total": [[["hit"], 5]]})])
+
+    snapshots = await telemetry.load_snapshots(redis, "api")
+
+    redis.mget.assert_awaited_once_with(["telemetry:proc:worker:host:1"])
+    assert snapshots[1] == {"hits_total": [[["hit"], 5]]}
+
+
+@pytest.mark.asyncio
+async def test_engine_hooks_count_queries_and_pool_checkouts():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine, "test")
+    install_query_counter(engine)
+    before = (_series(telemetry.DB_QUERY_DURATION, "test") or [0])[:-1]
+    queries = RequestQueries()
+    token = request_queries.set(queries)
+    try:
+        async with engine.connect() as conn:
+            assert _series(telemetry.DB_POOL_CHECKED_OUT, "test") == 1
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+    finally:
+        request_queries.reset(token)
+        await engine.dispose()
+
+    assert queries.count == 2
+    assert _series(telemetry.DB_POOL_CHECKED_OUT, "test") == 0
+    assert sum(_series(telemetry.DB_QUERY_DURATION, "test")[:-1]) - sum(before) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_and_misses_by_namespace():
+    cache = CacheService()
+    key = CacheService.make_key("telemetry.test", "user-1")
+    await cache.get(key)
+    await cache.set(key, {"a": 1})
+    await cache.get(key)
+
+    assert _series(telemetry.CACHE_REQUESTS, "telemetry.test", "miss") == 1
+    assert _series(telemetry.CACHE_REQUESTS, "telemetry.test", "hit") == 1
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.state.redis = None
+
+    @app.get("/telemetry-test/{item_id}")
+    async def item(item_id: str, request: Request) -> dict:
+        request_queries.get().count += 3  # what the engine hook does per statement
+        return {"id": item_id}
+
+    app.include_router(prometheus_router)
+    app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+async def _get(app: FastAPI, path: str, **headers) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_route_template_and_query_count():
+    app = _app()
+    await _get(app, "/telemetry-test/1")
+    await _get(app, "/telemetry-test/2")
+    await _get(app, "/no-such-route")
+
+    route = "/telemetry-test/{item_id}"
+    assert _series(telemetry.HTTP_REQUEST_DURATION, "GET", route, "200")[:-1].count(0) == len(
+        telemetry.LATENCY_BUCKETS
+    )
+    queries = _series(telemetry.HTTP_REQUEST_DB_QUERIES, "GET", route)
+    assert queries[-1] == 6
+    assert _series(telemetry.HTTP_REQUEST_DURATION, "GET", "unmatched", "404") is not None
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_requires_token():
+    app = _app()
+    with patch("app.api.v1.prometheus_routes.settings") as settings:
+        settings.metrics_token = SecretStr("")
+        assert (await _get(app, "/metrics")).status_code == 404
+
+        settings.metrics_token = SecretStr("s3cret")
+        assert (await _get(app, "/metrics")).status_code == 401
+        assert (await _get(app, "/metrics", authorization="Bearer nope")).status_code == 401
+
+        await _get(app, "/telemetry-test/1")
+        response = await _get(app, "/metrics", authorization="Bearer s3cret")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/telemetry-test/{item_id}",status="200"}' in (
+        response.text
+    )
+    # Scrapes themselves are not recorded.
+    assert 'route="/metrics"' not in response.text
@@ -0,0 +1,40 @@
+"""Tests for the correlation matrix refresh task."""
+
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.tasks.correlation_tasks import refresh_correlation_matrix
+
+
+def _session(db: MagicMock) -> MagicMock:
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=db)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return factory
+
+
+def test_refresh_runs_on_its_own_session():
+    db = MagicMock()
+    db.rollback = AsyncMock()
+    refresh = AsyncMock()
+    with (
+        patch("app.tasks.correlation_tasks.async_session", _session(db)),
+        patch("app.tasks.correlation_tasks.refresh_matrix", refresh),
+    ):
+        assert refresh_correlation_matrix("u1", "2026-05-01") == {"status": "ok"}
+
+    refresh.assert_awaited_once_with(db, "u1", date(2026, 5, 1))
+    db.rollback.assert_not_awaited()
+
+
+def test_refresh_failure_rolls_back_its_session():
+    db = MagicMock()
+    db.rollback = AsyncMock()
+    with (
+        patch("app.tasks.correlation_tasks.async_session", _session(db)),
+        patch("app.tasks.correlation_tasks.refresh_matrix", AsyncMock(side_effect=RuntimeError("db down"))),
+        patch("app.tasks.correlation_tasks.sentry_sdk"),
+    ):
+        assert refresh_correlation_matrix("u1", "2026-05-01") == {"status": "error"}
+
+    db.rollback.assert_awaited_once()
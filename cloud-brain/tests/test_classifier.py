@@ -4,7 +4,23 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from app.agent.classifier import MessageTier, _compute_signals, classify_message
+from app.agent.classifier import (
+    MessageTier,
+    _compute_signals,
+    classify_message,
+    get_classifier_stats,
+    reset_classifier_state,
+)
+from app.agent.local_classifier import ClassificationCache, LocalTierClassifier, normalize_text
+from app.services.telemetry import CLASSIFIER_CACHE_ENTRIES, CLASSIFIER_DECISIONS
+
+
+@pytest.fixture(autouse=True)
+def _reset_classifier():
+    """Isolate the module-level cache and counters between tests."""
+    reset_classifier_state()
+    yield
+    reset_classifier_state()
 
 
 class TestComputeSignals:
@@ -123,3 +139,90 @@ class TestClassifyMessage:
                 "build me a 12 week training program for a half marathon"
             )
         assert result == MessageTier.standard
+
+
+class TestClassificationCache:
+    def test_normalization_shares_key(self):
+        assert normalize_text("How did I sleep this week?!") == normalize_text("how did i  sleep this week?")
+
+    def test_ttl_expiry(self):
+        cache = ClassificationCache(ttl_seconds=-1)
+        cache.set("k", "standard")
+        assert cache.get("k") is None
+
+    def test_lru_eviction(self):
+        cache = ClassificationCache(max_entries=2)
+        cache.set("a", "standard")
+        cache.set("b", "standard")
+        cache.get("a")
+        cache.set("c", "deep_analysis")
+        assert cache.get("b") is None
+        assert cache.get("a") == "standard"
+
+    @pytest.mark.asyncio
+    async def test_repeat_message_served_from_cache(self):
+        """A near-identical repeat skips the LLM entirely."""
+        create = AsyncMock(return_value=TestClassifyMessage()._mock_response("deep_analysis"))
+        client = MagicMock()
+        client.chat.completions.create = create
+        with (
+            patch("app.agent.classifier._get_classifier_client", return_value=client),
+            patch("app.agent.classifier._get_local_classifier", return_value=None),
+        ):
+            first = await classify_message("make a plan")
+            second = await classify_message("Make a plan!")
+        assert first == second == MessageTier.deep_analysis
+        assert create.await_count == 1
+        assert get_classifier_stats()["paths"] == {"llm": 1, "cache": 1}
+
+    @pytest.mark.asyncio
+    async def test_llm_failure_not_cached(self):
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(side_effect=Exception("boom"))
+        with (
+            patch("app.agent.classifier._get_classifier_client", return_value=client),
+            patch("app.agent.classifier._get_local_classifier", return_value=None),
+        ):
+            await classify_message("make a plan")
+            await classify_message("make a plan")
+        assert client.chat.completions.create.await_count == 2
+        assert get_classifier_stats()["paths"] == {"llm_fallback": 2}
+
+
+class TestLocalTierClassifier:
+    def test_confident_standard(self):
+        model = LocalTierClassifier(weights={"tok:thanks": -5.0}, bias=0.0)
+        assert model.predict(normalize_text("thanks so much for all the help today coach")) == "standard"
+
+    def test_confident_deep(self):
+        model = LocalTierClassifier(weights={"tok:correlation": 5.0}, bias=0.0)
+        assert model.predict("show the correlation") == "deep_analysis"
+
+    def test_abstains_inside_band(self):
+        model = LocalTierClassifier(weights={}, bias=0.0)
+        assert model.predict("anything at all") is None
+
+    def test_shipped_weights_load(self):
+        model = LocalTierClassifier.from_file()
+        assert model.weights
+        assert 0.0 < model.predict_proba("hello") < 1.0
+
+    @pytest.mark.asyncio
+    async def test_local_decision_skips_llm(self):
+        model = LocalTierClassifier(weights={"tok:thanks": -5.0}, bias=0.0)
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock()
+        before = {tuple(labels): value for labels, value in CLASSIFIER_DECISIONS.snapshot()}
+        with (
+            patch("app.agent.classifier._get_classifier_client", return_value=client),
+            patch("app.agent.classifier._get_local_classifier", return_value=model),
+        ):
+            result = await classify_message("thanks so much for all the help today coach")
+        assert result == MessageTier.standard
+        client.chat.completions.create.assert_not_awaited()
+        stats = get_classifier_stats()
+        assert stats["paths"] == {"local_model": 1}
+        assert stats["llm_avoided_ratio"] == 1.0
+        after = {tuple(labels): value for labels, value in CLASSIFIER_DECISIONS.snapshot()}
+        assert after[("local_model",)] - before.get(("local_model",), 0) == 1
+        assert CLASSIFIER_CACHE_ENTRIES.snapshot() == [[[], 1]]
@@ -0,0 +1,161 @@
+"""Tests for per-user data versions and the conditional_get dependency."""
+
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from app.api.deps import conditional_get, get_authenticated_user_id
+from app.database import get_db
+from app.services import data_version, telemetry
+from app.services.data_version import SCOPE_DATA, SCOPE_GOALS, bump_data_version, bump_global_version
+
+
+class _FakeRedis:
+    """In-memory subset of redis.asyncio used by data_version."""
+
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    def pipeline(self, transaction: bool = True) -> "_FakePipeline":
+        return _FakePipeline(self)
+
+    async def hset(self, key: str, field: str, value: str) -> int:
+        self.hashes.setdefault(key, {})[field] = value
+        return 1
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self._ops.append((name, args))
+
+        return queue
+
+    async def execute(self) -> list:
+        results = []
+        for name, args in self._ops:
+            h = self._redis.hashes.setdefault(args[0], {})
+            if name == "hsetnx":
+                results.append(int(args[1] not in h))
+                h.setdefault(args[1], args[2])
+            elif name == "hincrby":
+                h[args[1]] = str(int(h.get(args[1], "0")) + args[2])
+                results.append(int(h[args[1]]))
+            elif name == "hdel":
+                results.append(int(h.pop(args[1], None) is not None))
+            elif name == "hgetall":
+                results.append(dict(h))
+            else:  # expire
+                results.append(True)
+        return results
+
+
+def _app(redis, db) -> FastAPI:
+    app = FastAPI()
+    app.state.redis = redis
+    app.dependency_overrides[get_authenticated_user_id] = lambda: "user-1"
+    app.dependency_overrides[get_db] = lambda: db
+
+    @app.get("/summary")
+    async def summary(etag: str = Depends(conditional_get(SCOPE_DATA))) -> dict:
+        return {"etag": etag}
+
+    @app.get("/home", dependencies=[Depends(conditional_get(SCOPE_DATA, SCOPE_GOALS, local_date="header"))])
+    async def home() -> dict:
+        return {"ok": True}
+
+    return app
+
+
+def _db(tz: str = "Europe/Berlin") -> MagicMock:
+    db = MagicMock()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = tz
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+async def _get(app: FastAPI, path: str, headers: dict | None = None) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers or {})
+
+
+@pytest.mark.asyncio
+async def test_matching_etag_returns_304_until_data_changes():
+    redis, db = _FakeRedis(), _db()
+    app = _app(redis, db)
+
+    first = await _get(app, "/summary")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.json() == {"etag": etag}
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+    # The timezone is looked up once, then served from the version hash.
+    assert db.execute.await_count == 1
+    assert redis.hashes["data_version:user-1"]["tz"] == "Europe/Berlin"
+
+    before = telemetry.CONDITIONAL_GETS._values.get(("/summary", "not_modified"), 0)
+    cached = await _get(app, "/summary", {"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert db.execute.await_count == 1
+    assert telemetry.CONDITIONAL_GETS._values[("/summary", "not_modified")] == before + 1
+
+    await bump_data_version("user-1", redis=redis)
+    changed = await _get(app, "/summary", {"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_scopes_and_global_bumps_select_which_etags_change():
+    redis = _FakeRedis()
+    app = _app(redis, _db())
+    summary = (await _get(app, "/summary")).headers["etag"]
+    home = (await _get(app, "/home", {"X-User-Timezone": "Asia/Tokyo"})).headers["etag"]
+
+    await bump_data_version(["user-1"], SCOPE_GOALS, redis=redis)
+    assert (await _get(app, "/summary", {"If-None-Match": summary})).status_code == 304
+    assert (await _get(app, "/home", {"If-None-Match": home, "X-User-Timezone": "Asia/Tokyo"})).status_code == 200
+
+    home = (await _get(app, "/home", {"X-User-Timezone": "Asia/Tokyo"})).headers["etag"]
+    await bump_global_version(SCOPE_GOALS, redis=redis)
+    assert (await _get(app, "/home", {"If-None-Match": home, "X-User-Timezone": "Asia/Tokyo"})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_serves_normally_without_etag():
+    redis = MagicMock()
+    redis.pipeline.return_value.execute = AsyncMock(side_effect=ConnectionError("down"))
+    response = await _get(_app(redis, _db()), "/summary", {"If-None-Match": "*"})
+
+    assert response.status_code == 200
+    assert response.json() == {"etag": ""}
+    assert "etag" not in response.headers
+    # Bumps swallow the same failure.
+    await bump_data_version("user-1", redis=redis)
+
+
+def test_make_etag_depends_on_epoch_date_and_normalised_query():
+    user = {"epoch": "a1", "data": "3"}
+    base = data_version.make_etag("/api/v1/metrics/latest", "types=steps&x=1", [SCOPE_DATA], user, {})
+
+    assert base == data_version.make_etag("/api/v1/metrics/latest", "x=1&types=steps", [SCOPE_DATA], user, {})
+    assert base != data_version.make_etag(
+        "/api/v1/metrics/latest", "types=steps&x=1", [SCOPE_DATA], {**user, "epoch": "b2"}, {}
+    )
+    assert base != data_version.make_etag(
+        "/api/v1/metrics/latest", "types=steps&x=1", [SCOPE_DATA], user, {}, date(2026, 4, 20)
+    )
+    assert data_version.etag_matches(f'"other", {base.removeprefix("W/")}', base)
+    assert not data_version.etag_matches('W/"other"', base)
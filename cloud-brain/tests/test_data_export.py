@@ -0,0 +1,130 @@
+"""Tests for the keyset-paged streaming data export."""
+
+import io
+import json
+import zipfile
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.dialects import postgresql
+
+from app.api.deps import get_authenticated_user_id
+from app.api.v1 import export
+from app.services import data_export
+
+_MESSAGES = [
+    {"id": f"m{i}", "conversation_id": "c1", "role": "user", "content": f"hi {i}",
+     "created_at": datetime(2026, 4, 20, 8, i, tzinfo=timezone.utc)}
+    for i in range(5)
+]
+
+
+class _FakeStream:
+    def __init__(self, rows: list[dict]) -> None:
+        self._rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return SimpleNamespace(_mapping=next(self._rows))
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class _FakeSessions:
+    """Session factory serving pre-sorted rows per table, one page per session."""
+
+    def __init__(self, tables: dict[str, list[dict]]) -> None:
+        self.tables = tables
+        self.served: dict[str, int] = {}
+        self.statements: list[tuple[str, dict]] = []
+        self.open_sessions = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        self.open_sessions += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self.open_sessions -= 1
+
+    async def stream(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        table = stmt.selected_columns[0].table.name
+        self.statements.append((table, compiled.params))
+        limit = compiled.params[[k for k in compiled.params if k.startswith("param_")][-1]]
+        start = self.served.get(table, 0)
+        page = self.tables.get(table, [])[start:start + limit]
+        self.served[table] = start + len(page)
+        return _FakeStream(page)
+
+
+@pytest.mark.asyncio
+async def test_ndjson_pages_by_keyset_with_one_session_per_page():
+    sessions = _FakeSessions({"messages": _MESSAGES})
+    lines = []
+    async for chunk in data_export.stream_ndjson(sessions, "user-1", batch_size=2):
+        assert sessions.open_sessions == 0  # no connection held while the chunk is sent
+        lines.extend(json.loads(line) for line in chunk.splitlines())
+
+    assert lines[0]["export"]["user_id"] == "user-1"
+    rows = [line["row"] for line in lines[1:-1]]
+    assert [r["id"] for r in rows] == ["m0", "m1", "m2", "m3", "m4"]
+    assert {line["section"] for line in lines[1:-1]} == {"messages"}
+    assert lines[-1]["complete"] is True
+    assert lines[-1]["counts"]["messages"] == 5
+    assert lines[-1]["counts"]["health_events"] == 0
+
+    message_queries = [params for table, params in sessions.statements if table == "messages"]
+    assert len(message_queries) == 3
+    # The second page starts after the last key of the first: (conversation_id, created_at, id).
+    assert {"c1", _MESSAGES[1]["created_at"], "m1"} <= set(message_queries[1].values())
+
+
+@pytest.mark.asyncio
+async def test_zip_streams_one_entry_per_section_and_manifest():
+    sessions = _FakeSessions({"messages": _MESSAGES})
+    chunks = [chunk async for chunk in data_export.stream_zip(sessions, "user-1", batch_size=2)]
+
+    assert len(chunks) > 1
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    names = archive.namelist()
+    assert names[-1] == "manifest.json"
+    assert {f"{s.name}.ndjson" for s in data_export.SECTIONS} <= set(names)
+    messages = [json.loads(line) for line in archive.read("messages.ndjson").splitlines()]
+    assert [m["content"] for m in messages] == [f"hi {i}" for i in range(5)]
+    assert archive.read("health_events.ndjson") == b""
+    assert json.loads(archive.read("manifest.json"))["counts"]["messages"] == 5
+
+
+@pytest.mark.asyncio
+async def test_export_job_status_is_owner_only_and_signs_ready_archive():
+    app = FastAPI()
+    app.include_router(export.router)
+    app.dependency_overrides[get_authenticated_user_id] = lambda: "user-1"
+    app.state.redis = MagicMock()
+    app.state.redis.hgetall = AsyncMock(return_value={"user_id": "user-1", "status": "ready", "size_bytes": "42"})
+    app.state.storage_service = MagicMock()
+    app.state.storage_service.get_signed_url_with_ttl = AsyncMock(return_value=("https://signed", 1234))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        ready = await client.get("/user/export/jobs/e1")
+        app.state.redis.hgetall.return_value = {"user_id": "someone-else", "status": "ready"}
+        other = await client.get("/user/export/jobs/e1")
+
+    assert ready.json()["download_url"] == "https://signed"
+    assert ready.json()["size_bytes"] == 42
+    assert ready.json()["expires_in"] == 1234  # remaining validity of the (possibly cached) URL
+    app.state.storage_service.get_signed_url_with_ttl.assert_awaited_once_with(
+        "exports", "user-1/e1.zip", expires_in=data_export.settings.export_url_ttl_seconds
+    )
+    assert other.status_code == 404
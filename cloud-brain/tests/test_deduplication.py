@@ -5,9 +5,18 @@ Tests overlap detection and priority-based conflict resolution
 for activities recorded by multiple sources.
 """
 
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 
-from app.analytics.deduplication import SourceOfTruth
+from app.analytics.deduplication import (
+    ActivityInterval,
+    IntervalIndex,
+    SourceOfTruth,
+    supersede_duplicate_activities,
+)
 
 
 @pytest.fixture
@@ -164,3 +173,101 @@ def test_overlap_threshold_50_percent(sot):
     ]
     result = sot.resolve_conflicts(activities)
     assert len(result) == 2
+
+
+def test_interval_index_finds_long_interval_started_earlier():
+    """A long interval starting well before the query window is still found."""
+    index = IntervalIndex()
+    index.add(ActivityInterval(0, 10_000, 9, "fitbit", "long"))
+    index.add(ActivityInterval(5_000, 5_100, 9, "fitbit", "short"))
+    index.add(ActivityInterval(20_000, 21_000, 9, "fitbit", "later"))
+
+    found = [i.ref for i in index.overlapping(9_000, 9_500)]
+
+    assert found == ["long"]
+
+
+def _row(id: str, source: str, hour: int, duration: int, superseded_by: str | None = None):
+    return SimpleNamespace(
+        id=id,
+        source=source,
+        start_time=datetime(2026, 2, 20, hour, tzinfo=timezone.utc),
+        duration_seconds=duration,
+        superseded_by=superseded_by,
+    )
+
+
+def _db_returning(rows: list) -> AsyncMock:
+    db = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = rows
+    db.execute.return_value = result
+    return db
+
+
+def _updates(db: AsyncMock) -> dict:
+    """Map each superseded_by target to the IDs the stage pointed at it."""
+    updates = {}
+    for call in db.execute.call_args_list[1:]:
+        params = call.args[0].compile().params
+        updates[params["superseded_by"]] = sorted(params["id_1"])
+    return updates
+
+
+@pytest.mark.asyncio
+async def test_supersede_points_duplicates_at_highest_priority():
+    """Lower-priority duplicates are superseded by the trusted source; others are untouched."""
+    db = _db_returning(
+        [
+            _row("strava-run", "strava", 8, 3600),
+            _row("watch-run", "apple_health", 8, 3500),
+            _row("fitbit-run", "fitbit", 8, 3400),
+            _row("evening-walk", "strava", 18, 1800),
+        ]
+    )
+
+    changed = await supersede_duplicate_activities(db, "user-1", [datetime(2026, 2, 20, 8, tzinfo=timezone.utc)])
+
+    assert changed == 2
+    assert _updates(db) == {"watch-run": ["fitbit-run", "strava-run"]}
+
+
+@pytest.mark.asyncio
+async def test_supersede_promotes_next_best_after_winner_removed():
+    """Once the winner is gone, the best remaining duplicate becomes the winner."""
+    db = _db_returning(
+        [
+            _row("strava-run", "strava", 8, 3600, superseded_by="watch-run"),
+            _row("fitbit-run", "fitbit", 8, 3400, superseded_by="watch-run"),
+        ]
+    )
+
+    changed = await supersede_duplicate_activities(db, "user-1", [datetime(2026, 2, 20, 8)])
+
+    assert changed == 2
+    assert _updates(db) == {None: ["fitbit-run"], "fitbit-run": ["strava-run"]}
+
+
+@pytest.mark.asyncio
+async def test_supersede_writes_nothing_when_unchanged():
+    """A re-sync of already resolved rows issues no updates."""
+    db = _db_returning(
+        [
+            _row("watch-run", "apple_health", 8, 3500),
+            _row("strava-run", "strava", 8, 3600, superseded_by="watch-run"),
+        ]
+    )
+
+    changed = await supersede_duplicate_activities(db, "user-1", [datetime(2026, 2, 20, 8, tzinfo=timezone.utc)])
+
+    assert changed == 0
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_supersede_skips_query_without_start_times():
+    """Nothing to re-resolve means no flush and no query."""
+    db = AsyncMock()
+
+    assert await supersede_duplicate_activities(db, "user-1", [None]) == 0
+    db.execute.assert_not_awaited()
@@ -12,7 +12,12 @@ from pydantic import SecretStr
 
 from app.main import app
 
-_TASK_PATH = "app.tasks.fitbit_sync.sync_fitbit_collection_task"
+_DISPATCH_PATH = "app.api.v1.fitbit_webhooks.dispatch_many"
+
+
+def _dispatched(mock_dispatch: MagicMock) -> list[tuple[str, str, str]]:
+    """Notification calls handed to dispatch_many, across all its invocations."""
+    return [c for call in mock_dispatch.call_args_list for c in call.args[1]]
 
 
 @pytest.fixture
@@ -90,8 +95,8 @@ class TestFitbitWebhookEvent:
 
     def test_valid_notification_returns_204_and_dispatches_task(self, client):
         """Valid notification array → 204 and Celery task dispatched."""
-        mock_task = MagicMock()
-        with patch(_TASK_PATH, mock_task):
+        mock_dispatch = MagicMock()
+        with patch(_DISPATCH_PATH, mock_dispatch):
             response = client.post(
                 "/api/v1/webhooks/fitbit",
                 json=[self._valid_notification()],
@@ -99,48 +104,48 @@ class TestFitbitWebhookEvent:
 
         assert response.status_code == 204
         assert response.content == b""
-        mock_task.delay.assert_called_once_with("FIT123", "activities", "2026-02-28")
+        assert _dispatched(mock_dispatch) == [("FIT123", "activities", "2026-02-28")]
 
     def test_multiple_notifications_dispatch_multiple_tasks(self, client):
         """Multiple notifications → task dispatched for each one."""
-        mock_task = MagicMock()
+        mock_dispatch = MagicMock()
         notifications = [
             self._valid_notification(collection_type="activities", date="2026-02-28"),
             self._valid_notification(collection_type="sleep", date="2026-02-28"),
             self._valid_notification(collection_type="body", date="2026-02-27"),
         ]
-        with patch(_TASK_PATH, mock_task):
+        with patch(_DISPATCH_PATH, mock_dispatch):
             response = client.post(
                 "/api/v1/webhooks/fitbit",
                 json=notifications,
             )
 
         assert response.status_code == 204
-        assert mock_task.delay.call_count == 3
+        assert len(_dispatched(mock_dispatch)) == 3
 
     def test_sleep_collection_dispatches_task(self, client):
         """Sleep collection type is dispatched correctly."""
-        mock_task = MagicMock()
-        with patch(_TASK_PATH, mock_task):
+        mock_dispatch = MagicMock()
+        with patch(_DISPATCH_PATH, mock_dispatch):
             response = client.post(
                 "/api/v1/webhooks/fitbit",
                 json=[self._valid_notification(collection_type="sleep", date="2026-02-27")],
             )
 
         assert response.status_code == 204
-        mock_task.delay.assert_called_once_with("FIT123", "sleep", "2026-02-27")
+        assert _dispatched(mock_dispatch) == [("FIT123", "sleep", "2026-02-27")]
 
     def test_body_collection_dispatches_task(self, client):
         """Body collection type is dispatched correctly."""
-        mock_task = MagicMock()
-        with patch(_TASK_PATH, mock_task):
+        mock_dispatch = MagicMock()
+        with patch(_DISPATCH_PATH, mock_dispatch):
             response = client.post(
                 "/api/v1/webhooks/fitbit",
                 json=[self._valid_notification(collection_type="body", date="2026-02-26")],
             )
 
         assert response.status_code == 204
-        mock_task.delay.assert_called_once_with("FIT123", "body", "2026-02-26")
+        assert _dispatched(mock_dispatch) == [("FIT123", "body", "2026-02-26")]
 
     def test_invalid_json_returns_204(self, client):
         """Completely invalid (non-JSON) body → 204, never expose errors to Fitbit."""
@@ -154,60 +159,58 @@ class TestFitbitWebhookEvent:
 
     def test_non_array_body_returns_204(self, client):
         """JSON object (not array) body → 204, no tasks dispatched."""
-        mock_task = MagicMock()
-        with patch(_TASK_PATH, mock_task):
+        mock_dispatch = MagicMock()
+        with patch(_DISPATCH_PATH, mock_dispatch):
             response = client.post(
                 "/api/v1/webhooks/fitbit",
                 json={"collectionType": "activities"},  # object, not array
             )
         assert response.status_code == 204
-        mock_task.delay.assert_not_called()
+        mock_dispatch.assert_not_called()
 
     def test_notification_missing_required_field_still_returns_204(self, client):
         """Malformed notification (missing field) → skip that item, still return 204."""
-        mock_task = MagicMock()
+        mock_dispatch = MagicMock()
         bad_notification = {"collectionType": "activities"}  # missing ownerId, date, etc.
-        with patch(_TASK_PATH, mock_task):
+        with patch(_DISPATCH_PATH, mock_dispatch):
             response = client.post(
                 "/api/v1/webhooks/fitbit",
                 json=[bad_notification],
             )
         assert response.status_code == 204
-        mock_task.delay.assert_not_called()
+        mock_dispatch.assert_not_called()
 
     def test_mixed_valid_and_invalid_notifications(self, client):
         """Mix of valid and invalid → only valid ones dispatch tasks."""
-        mock_task = MagicMock()
+        mock_dispatch = MagicMock()
         notifications = [
             self._valid_notification(collection_type="activities"),  # valid
             {"collectionType": "sleep"},  # invalid — missing required fields
             self._valid_notification(collection_type="body", date="2026-02-25"),  # valid
         ]
-        with patch(_TASK_PATH, mock_task):
+        with patch(_DISPATCH_PATH, mock_dispatch):
             response = client.post(
                 "/api/v1/webhooks/fitbit",
                 json=notifications,
             )
 
         assert response.status_code == 204
-        assert mock_task.delay.call_count == 2
+        assert len(_dispatched(mock_dispatch)) == 2
 
     def test_empty_array_returns_204(self, client):
         """Empty notification array → 204, no tasks dispatched."""
-        mock_task = MagicMock()
-        with patch(_TASK_PATH, mock_task):
+        mock_dispatch = MagicMock()
+        with patch(_DISPATCH_PATH, mock_dispatch):
             response = client.post(
                 "/api/v1/webhooks/fitbit",
                 json=[],
             )
         assert response.status_code == 204
-        mock_task.delay.assert_not_called()
+        mock_dispatch.assert_not_called()
 
     def test_task_dispatch_failure_still_returns_204(self, client):
-        """If Celery task dispatch raises, we still return 204."""
-        mock_task = MagicMock()
-        mock_task.delay.side_effect = Exception("Redis down")
-        with patch(_TASK_PATH, mock_task):
+        """If publishing to the broker raises, we still return 204."""
+        with patch("app.services.task_dispatch.group", side_effect=Exception("Redis down")):
             response = client.post(
                 "/api/v1/webhooks/fitbit",
                 json=[self._valid_notification()],
@@ -217,13 +220,13 @@ class TestFitbitWebhookEvent:
     def test_unknown_subscription_id_is_skipped(self, client):
         """Notification with a subscriptionId not matching our configured ID is
         silently dropped — no task dispatched, but still returns 204."""
-        mock_task = MagicMock()
+        mock_dispatch = MagicMock()
         with patch("app.api.v1.fitbit_webhooks.settings") as mock_settings:
             mock_settings.fitbit_webhook_subscriber_id = SecretStr("our-real-subscriber-id")
-            with patch(_TASK_PATH, mock_task):
+            with patch(_DISPATCH_PATH, mock_dispatch):
                 response = client.post(
                     "/api/v1/webhooks/fitbit",
                     json=[self._valid_notification(subscription_id="forged-id")],
                 )
         assert response.status_code == 204
-        mock_task.delay.assert_not_called()
+        mock_dispatch.assert_not_called()
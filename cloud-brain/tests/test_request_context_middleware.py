@@ -0,0 +1,139 @@
+"""Tests for the pure-ASGI request context middleware.
+
+Covers security headers, Sentry user context, and the bounded analytics
+queue that replaces inline PostHog capture.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.middleware.request_context import AnalyticsEventQueue, RequestContextMiddleware
+
+
+def _app(events: AnalyticsEventQueue) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str, request: Request) -> dict:
+        request.state.user_id = "user-123"
+        return {"id": item_id}
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    @app.get("/framed")
+    async def framed() -> JSONResponse:
+        return JSONResponse({}, headers={"X-Frame-Options": "SAMEORIGIN"})
+
+    app.add_middleware(RequestContextMiddleware, events=events)
+    return app
+
+
+def _analytics() -> MagicMock:
+    analytics = MagicMock()
+    analytics.enabled = True
+    return analytics
+
+
+async def _get(app: FastAPI, path: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app, client=("198.51.100.4", 1234))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, params={"q": "secret"}, headers={"user-agent": "pytest"})
+
+
+@pytest.mark.asyncio
+async def test_security_headers_added_and_override_existing():
+    response = await _get(_app(AnalyticsEventQueue()), "/framed")
+
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["strict-transport-security"] == "max-age=63072000; includeSubDomains"
+    assert response.headers.get_list("x-frame-options") == ["DENY"]
+
+
+@pytest.mark.asyncio
+async def test_sentry_user_context_from_request_state():
+    with patch("app.middleware.request_context.sentry_sdk") as sentry:
+        await _get(_app(AnalyticsEventQueue()), "/items/7")
+
+    sentry.set_user.assert_called_once_with({"id": "user-123"})
+
+
+@pytest.mark.asyncio
+async def test_request_event_queued_and_flushed_in_batch():
+    analytics = _analytics()
+    events = AnalyticsEventQueue(flush_interval=60)
+    events.start(analytics)
+    app = _app(events)
+
+    await _get(app, "/items/7")
+    await _get(app, "/health")  # untracked
+    assert len(events) == 1
+    analytics.capture.assert_not_called()
+
+    await events.stop()
+    analytics.capture.assert_called_once()
+    kwargs = analytics.capture.call_args.kwargs
+    assert kwargs["distinct_id"] == "user-123"
+    assert kwargs["event"] == "api_request"
+    props = kwargs["properties"]
+    assert props["route_pattern"] == "/items/{item_id}"
+    assert props["status_code"] == 200
+    assert props["user_agent"] == "pytest"
+    assert props["$current_url"] == "http://test/items/7"
+
+
+@pytest.mark.asyncio
+async def test_background_flush_when_batch_fills():
+    analytics = _analytics()
+    events = AnalyticsEventQueue(batch_size=2, flush_interval=60)
+    events.start(analytics)
+    app = _app(events)
+
+    await _get(app, "/items/1")
+    await _get(app, "/items/2")
+    for _ in range(50):
+        if analytics.capture.call_count == 2:
+            break
+        await asyncio.sleep(0.01)
+
+    assert analytics.capture.call_count == 2
+    await events.stop()
+
+
+def test_queue_is_bounded_and_counts_drops():
+    events = AnalyticsEventQueue(maxsize=2, batch_size=100)
+    events._analytics = _analytics()  # accept without starting the flush loop
+    for i in range(5):
+        events.put((i,))
+
+    assert len(events) == 2
+    assert events.dropped == 3
+
+
+def test_queue_ignores_events_when_analytics_disabled():
+    events = AnalyticsEventQueue()
+    disabled = MagicMock(enabled=False)
+    events.start(disabled)
+    events.put(("GET",))
+
+    assert len(events) == 0
+
+
+def test_anonymous_distinct_id_is_hashed():
+    from datetime import datetime, timezone
+
+    from app.middleware.request_context import _distinct_id
+
+    day = datetime(2026, 5, 1, tzinfo=timezone.utc)
+    anon = _distinct_id(None, "198.51.100.4", day)
+    assert anon.startswith("anon_") and "198.51.100.4" not in anon
+    assert anon == _distinct_id(None, "198.51.100.4", day)
+    assert _distinct_id(None, None, day) == "anon_unknown"
@@ -0,0 +1,125 @@
+"""Tests for CompressionMiddleware and fast_json responses."""
+
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding
+from app.services import telemetry
+from app.utils.fast_json import fast_json
+
+_BIG = {"days": [{"date": f"2026-01-{i % 28 + 1:02d}", "values": {"hrv": 55.0, "spo2": None}} for i in range(200)]}
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/big/{item_id}")
+    async def big(item_id: str, request: Request):
+        return fast_json(request, _BIG)
+
+    @app.get("/small")
+    async def small() -> dict:
+        return {"ok": True}
+
+    @app.get("/zipped")
+    async def zipped() -> Response:
+        return Response(b"x" * 4096, media_type="application/zip")
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def lines():
+            for i in range(50):
+                yield json.dumps({"i": i, "pad": "y" * 40}).encode() + b"\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=512)
+    return app
+
+
+async def _get(path: str, accept_encoding: str | None) -> httpx.Response:
+    headers = {"accept-encoding": accept_encoding} if accept_encoding is not None else {}
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+def test_negotiate_encoding_prefers_br_only_when_available():
+    with patch.object(compression, "brotli", None):
+        assert negotiate_encoding("gzip, deflate, br") == "gzip"
+        assert negotiate_encoding("br") is None
+        assert negotiate_encoding("*") == "gzip"
+        assert negotiate_encoding("gzip;q=0, *") is None
+    with patch.object(compression, "brotli", object()):
+        assert negotiate_encoding("gzip, br") == "br"
+        assert negotiate_encoding("br;q=0, gzip") == "gzip"
+
+
+@pytest.mark.asyncio
+async def test_large_json_is_gzipped_and_recorded():
+    before = (telemetry.RESPONSE_BODY_BYTES._values.get(("/big/{item_id}", "gzip")) or [0])[-1]
+    with patch.object(compression, "brotli", None):
+        response = await _get("/big/1", "gzip, br")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == _BIG  # httpx decodes the body
+    wire = int(response.headers["content-length"])
+    assert wire < len(json.dumps(_BIG)) // 4
+    assert telemetry.RESPONSE_BODY_BYTES._values[("/big/{item_id}", "gzip")][-1] == before + wire
+    assert telemetry.RESPONSE_SERIALIZE_DURATION._values[("/big/{item_id}",)][-1] > 0
+
+
+@pytest.mark.asyncio
+async def test_small_encoded_and_unaccepted_bodies_pass_through():
+    small = await _get("/small", "gzip")
+    assert "content-encoding" not in small.headers
+    assert "vary" not in small.headers
+
+    zipped = await _get("/zipped", "gzip")
+    assert "content-encoding" not in zipped.headers
+    assert zipped.content == b"x" * 4096
+
+    identity = await _get("/big/1", "identity")
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["vary"] == "Accept-Encoding"
+    assert identity.json() == _BIG
+
+
+@pytest.mark.asyncio
+async def test_streaming_body_is_compressed_incrementally():
+    response = await _get("/stream", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = response.text.splitlines()
+    assert len(lines) == 50
+    assert json.loads(lines[-1])["i"] == 49
+
+
+def test_fast_json_encodes_dates_decimals_and_matches_json():
+    class _Req:
+        scope = {}
+
+    payload = {
+        "day": date(2026, 4, 20),
+        "at": datetime(2026, 4, 20, 8, 30, tzinfo=timezone.utc),
+        "kcal": Decimal("1234.5"),
+        "values": {"hrv": None},
+    }
+    body = fast_json(_Req(), payload).body
+
+    assert json.loads(body) == {
+        "day": "2026-04-20",
+        "at": "2026-04-20T08:30:00+00:00",
+        "kcal": 1234.5,
+        "values": {"hrv": None},
+    }
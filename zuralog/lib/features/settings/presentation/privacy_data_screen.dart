@@ -58,12 +58,13 @@ class _PrivacyDataScreenState extends ConsumerState<PrivacyDataScreen> {
       final apiClient = ref.read(apiClientProvider);
       final response = await apiClient.get(
         '/api/v1/user/export',
+        queryParameters: {'format': 'zip'},
         options: Options(responseType: ResponseType.bytes),
       );
       final bytes = Uint8List.fromList(response.data as List<int>);
       final dir = await getTemporaryDirectory();
       final date = DateTime.now().toIso8601String().substring(0, 10);
-      final file = File('${dir.path}/zuralog-export-$date.json');
+      final file = File('${dir.path}/zuralog-export-$date.zip');
       await file.writeAsBytes(bytes);
       await Share.shareXFiles([XFile(file.path)], text: 'ZuraLog Data Export');
     } catch (e) {